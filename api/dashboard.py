@@ -17,6 +17,8 @@ from typing import Any, Dict, List, Optional, Union
 import re
 import uuid
 
+from core.financial_rollups import FinancialRollups, parse_period, window_start
+
 # ============================================================
 # CONFIGURATION
 # ============================================================
@@ -104,6 +106,10 @@ def query_db(sql: str) -> Dict[str, Any]:
     return _db.query(sql)
 
 
+# Revenue/cost aggregates come from the rollups maintained by migration 019
+_rollups = FinancialRollups(query_fn=query_db)
+
+
 # ============================================================
 # AUTHENTICATION & RATE LIMITING
 # ============================================================
@@ -224,39 +230,22 @@ class DashboardData:
         }
         
         # Revenue summary (last 30 days)
+        since = window_start(30)
         try:
-            revenue_sql = """
-                SELECT 
-                    COALESCE(SUM(gross_amount), 0) as total_revenue,
-                    COALESCE(SUM(net_amount), 0) as net_revenue,
-                    COUNT(*) as transaction_count
-                FROM revenue_events
-                WHERE recorded_at >= NOW() - INTERVAL '30 days'
-            """
-            rev_data = query_db(revenue_sql)
-            if rev_data.get("rows"):
-                row = rev_data["rows"][0]
-                result["revenue"] = {
-                    "total_30d": float(row.get("total_revenue", 0)),
-                    "net_30d": float(row.get("net_revenue", 0)),
-                    "transaction_count": int(row.get("transaction_count", 0))
-                }
+            row = _rollups.revenue_total(since)
+            result["revenue"] = {
+                "total_30d": row["gross_amount"],
+                "net_30d": row["net_amount"],
+                "transaction_count": row["event_count"]
+            }
         except Exception as e:
             result["revenue"]["error"] = str(e)
         
         # Cost summary
         try:
-            cost_sql = """
-                SELECT 
-                    COALESCE(SUM(amount_cents), 0) / 100.0 as total_cost
-                FROM cost_events
-                WHERE recorded_at >= NOW() - INTERVAL '30 days'
-            """
-            cost_data = query_db(cost_sql)
-            if cost_data.get("rows"):
-                result["costs"] = {
-                    "total_30d": float(cost_data["rows"][0].get("total_cost", 0))
-                }
+            result["costs"] = {
+                "total_30d": _rollups.cost_total(since)["amount_cents"] / 100.0
+            }
         except Exception as e:
             result["costs"]["error"] = str(e)
         
@@ -618,28 +607,11 @@ def get_revenue_summary(
     Returns:
         Revenue data grouped by time period
     """
-    if group_by == "week":
-        date_trunc = "week"
-    elif group_by == "month":
-        date_trunc = "month"
-    else:
-        date_trunc = "day"
-    
-    sql = f"""
-        SELECT 
-            DATE_TRUNC('{date_trunc}', recorded_at) as period,
-            COUNT(*) as transactions,
-            COALESCE(SUM(gross_amount), 0) as gross_revenue,
-            COALESCE(SUM(net_amount), 0) as net_revenue,
-            COALESCE(SUM(gross_amount - net_amount), 0) as total_fees
-        FROM revenue_events
-        WHERE recorded_at >= NOW() - INTERVAL '{days} days'
-        GROUP BY DATE_TRUNC('{date_trunc}', recorded_at)
-        ORDER BY period DESC
-    """
+    if group_by not in ("day", "week", "month"):
+        group_by = "day"
     
     try:
-        result = query_db(sql)
+        rows = _rollups.revenue(window_start(days), group_by=(group_by,))
         return {
             "success": True,
             "period": f"last_{days}_days",
@@ -647,12 +619,12 @@ def get_revenue_summary(
             "data": [
                 {
                     "period": row["period"],
-                    "transactions": int(row["transactions"]),
-                    "gross_revenue": float(row["gross_revenue"]),
-                    "net_revenue": float(row["net_revenue"]),
-                    "total_fees": float(row["total_fees"])
+                    "transactions": row["event_count"],
+                    "gross_revenue": row["gross_amount"],
+                    "net_revenue": row["net_amount"],
+                    "total_fees": row["gross_amount"] - row["net_amount"]
                 }
-                for row in result.get("rows", [])
+                for row in rows
             ]
         }
     except Exception as e:
@@ -669,37 +641,58 @@ def get_revenue_by_source(days: int = 30) -> Dict[str, Any]:
     Returns:
         Revenue grouped by source
     """
-    sql = f"""
-        SELECT 
-            source,
-            COUNT(*) as transactions,
-            COALESCE(SUM(gross_amount), 0) as gross_revenue,
-            COALESCE(SUM(net_amount), 0) as net_revenue
-        FROM revenue_events
-        WHERE recorded_at >= NOW() - INTERVAL '{days} days'
-        GROUP BY source
-        ORDER BY gross_revenue DESC
-    """
-    
     try:
-        result = query_db(sql)
+        rows = _rollups.revenue(window_start(days), group_by=("source",))
+        rows.sort(key=lambda row: row["gross_amount"], reverse=True)
         return {
             "success": True,
             "period": f"last_{days}_days",
             "data": [
                 {
                     "source": row["source"],
-                    "transactions": int(row["transactions"]),
-                    "gross_revenue": float(row["gross_revenue"]),
-                    "net_revenue": float(row["net_revenue"])
+                    "transactions": row["event_count"],
+                    "gross_revenue": row["gross_amount"],
+                    "net_revenue": row["net_amount"]
                 }
-                for row in result.get("rows", [])
+                for row in rows
             ]
         }
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
+def get_monthly_revenue(months: int = 12) -> Dict[str, Any]:
+    """
+    Get gross revenue per month for the last year.
+    
+    Args:
+        months: Number of most recent months to return
+    
+    Returns:
+        Year total, month/year to date and per-month revenue, jobs and average ticket
+    """
+    now = datetime.now(timezone.utc)
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    rows = _rollups.revenue(window_start(365, now), group_by=("month",))[:months]
+    starts = [parse_period(row["period"]) for row in rows]
+    
+    return {
+        "total": sum(row["gross_amount"] for row in rows),
+        "mtd": sum(row["gross_amount"] for row, start in zip(rows, starts) if start >= month_start),
+        "ytd": sum(row["gross_amount"] for row, start in zip(rows, starts) if start >= month_start.replace(month=1)),
+        "monthlyData": [
+            {
+                "period": start.strftime("%b %Y"),
+                "revenue": row["gross_amount"],
+                "jobs": row["event_count"],
+                "avgTicket": row["gross_amount"] / row["event_count"] if row["event_count"] else 0,
+                "change": 0
+            }
+            for row, start in zip(rows, starts)
+        ]
+    }
+
+
 # ============================================================
 # EXPERIMENT STATUS VIEWS (Phase 7.1)
 # ============================================================
@@ -723,7 +716,7 @@ def get_experiment_status() -> Dict[str, Any]:
             e.budget_limit,
             e.budget_spent,
             COALESCE(
-                (SELECT SUM(net_amount) FROM revenue_events WHERE attribution->>'experiment_id' = e.id::text),
+                (SELECT SUM(net_amount) FROM revenue_rollups WHERE grain = 'day' AND experiment_id = e.id::text),
                 0
             ) as revenue_generated
         FROM experiments e
@@ -1035,43 +1028,17 @@ def get_profit_loss(days: int = 30, experiment_id: str = None) -> Dict[str, Any]
     Returns:
         Detailed P&L breakdown
     """
-    exp_filter = f"AND experiment_id = '{experiment_id}'" if experiment_id else ""
-    
-    # Revenue
-    revenue_sql = f"""
-        SELECT 
-            COALESCE(SUM(gross_amount), 0) as gross_revenue,
-            COALESCE(SUM(net_amount), 0) as net_revenue,
-            COALESCE(SUM(gross_amount - net_amount), 0) as fees,
-            COUNT(*) as transactions
-        FROM revenue_events
-        WHERE recorded_at >= NOW() - INTERVAL '{days} days'
-        {exp_filter}
-    """
-    
-    # Costs by category
-    costs_sql = f"""
-        SELECT 
-            category,
-            COALESCE(SUM(amount_cents), 0) / 100.0 as total
-        FROM cost_events
-        WHERE recorded_at >= NOW() - INTERVAL '{days} days'
-        {exp_filter}
-        GROUP BY category
-    """
+    since = window_start(days)
     
     try:
-        revenue_result = query_db(revenue_sql)
-        costs_result = query_db(costs_sql)
-        
-        revenue_row = revenue_result.get("rows", [{}])[0]
-        gross_revenue = float(revenue_row.get("gross_revenue", 0))
-        net_revenue = float(revenue_row.get("net_revenue", 0))
-        fees = float(revenue_row.get("fees", 0))
+        revenue_row = _rollups.revenue_total(since, experiment_id=experiment_id)
+        gross_revenue = revenue_row["gross_amount"]
+        net_revenue = revenue_row["net_amount"]
+        fees = gross_revenue - net_revenue
         
         costs_by_category = {
-            row["category"]: float(row["total"])
-            for row in costs_result.get("rows", [])
+            row["category"]: row["amount_cents"] / 100.0
+            for row in _rollups.costs(since, group_by=("category",), experiment_id=experiment_id)
         }
         total_costs = sum(costs_by_category.values())
         
@@ -1086,7 +1053,7 @@ def get_profit_loss(days: int = 30, experiment_id: str = None) -> Dict[str, Any]
                 "gross": gross_revenue,
                 "net": net_revenue,
                 "fees": fees,
-                "transactions": int(revenue_row.get("transactions", 0))
+                "transactions": revenue_row["event_count"]
             },
             "costs": {
                 "total": total_costs,
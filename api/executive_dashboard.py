@@ -2,7 +2,8 @@
 Executive Dashboard API Endpoint.
 
 Provides a simple /api/dashboard endpoint for executive reporting.
-Uses pre-computed database views (v_*) for efficient queries.
+Uses pre-computed database views (v_*) and the financial rollups
+(core.financial_rollups) for efficient queries.
 
 Part of L5 requirement: Executive reporting and dashboard.
 """
@@ -15,6 +16,8 @@ import urllib.request
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
+from core.financial_rollups import FinancialRollups
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -78,9 +81,12 @@ def _execute_query(sql: str) -> Dict[str, Any]:
         raise ExecutiveDashboardError(f"Database connection error: {exc.reason}") from exc
 
 
+_rollups = FinancialRollups(query_fn=_execute_query)
+
+
 def get_revenue_metrics() -> Dict[str, Any]:
     """
-    Get revenue metrics from v_revenue_by_source and v_profit_loss views.
+    Get all-time revenue metrics from the financial rollups.
 
     Returns:
         Dictionary containing revenue summary metrics.
@@ -92,29 +98,28 @@ def get_revenue_metrics() -> Dict[str, Any]:
     }
 
     try:
-        # Query v_revenue_by_source
-        revenue_data = _execute_query("SELECT * FROM v_revenue_by_source;")
-        sources: List[Dict[str, Any]] = []
-        total_revenue = 0.0
-
-        for row in revenue_data.get("rows", []):
-            source_revenue = float(row.get("total_revenue", 0) or 0)
-            total_revenue += source_revenue
-            sources.append({
-                "source_name": row.get("source_name"),
-                "source_type": row.get("source_type"),
-                "opportunity_count": int(row.get("opportunity_count", 0) or 0),
-                "won_count": int(row.get("won_count", 0) or 0),
-                "total_revenue": source_revenue
-            })
-
-        result["total_revenue"] = total_revenue
-        result["sources"] = sources
-
-        # Query v_profit_loss
-        pnl_data = _execute_query("SELECT * FROM v_profit_loss LIMIT 1;")
-        if pnl_data.get("rows"):
-            result["profit_loss"] = pnl_data["rows"][0]
+        rows = _rollups.revenue(group_by=("source",), include_refunds=False)
+        rows.sort(key=lambda row: row["gross_amount"], reverse=True)
+
+        result["total_revenue"] = sum(row["gross_amount"] for row in rows)
+        result["sources"] = [
+            {
+                "source_name": row["source"],
+                "transaction_count": row["event_count"],
+                "total_revenue": row["gross_amount"],
+                "net_revenue": row["net_amount"]
+            }
+            for row in rows
+        ]
+
+        revenue = _rollups.revenue_total()
+        cost_cents = _rollups.cost_total()["amount_cents"]
+        result["profit_loss"] = {
+            "gross_revenue": revenue["gross_amount"],
+            "net_revenue": revenue["net_amount"],
+            "total_costs": cost_cents / 100,
+            "net_profit": revenue["net_amount"] - cost_cents / 100
+        }
 
     except ExecutiveDashboardError as exc:
         logger.warning("Failed to fetch revenue metrics: %s", exc)
@@ -298,7 +303,7 @@ def get_executive_dashboard() -> Dict[str, Any]:
     Returns:
         Dictionary containing all executive dashboard metrics:
         - timestamp: Current UTC timestamp
-        - revenue: Revenue metrics from v_revenue_by_source
+        - revenue: Revenue metrics from the financial rollups
         - tasks_completed: Task completion statistics
         - active_experiments: Running experiment count and details
         - system_health: System health status from v_system_health
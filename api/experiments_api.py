@@ -55,7 +55,7 @@ async def handle_list_experiments(query_params: Dict[str, Any]) -> Dict[str, Any
             e.budget_allocated,
             e.actual_cost,
             COALESCE(
-                (SELECT SUM(net_amount) FROM revenue_events WHERE attribution->>'experiment_id' = e.id::text),
+                (SELECT SUM(net_amount) FROM revenue_rollups WHERE grain = 'day' AND experiment_id = e.id::text),
                 0
             ) as revenue_generated,
             e.roi,
@@ -3,6 +3,9 @@ JUGGERNAUT Health Check Endpoint
 Public endpoint for monitoring and load balancers.
 
 No authentication required.
+
+The database is probed in the background by a HealthMonitor; requests are
+answered from its cached result.
 """
 
 import json
@@ -11,7 +14,9 @@ import os
 import urllib.request
 import urllib.error
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
+
+from core.health import HealthMonitor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -60,17 +65,37 @@ def check_database_connection(connection_string: str = None) -> bool:
         return False
 
 
+def _check_database() -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """Database probe for the health monitor."""
+    if check_database_connection():
+        return True, "Database reachable", None
+    return False, "Database unreachable", None
+
+
+HEALTH_MONITOR = HealthMonitor("juggernaut-api")
+HEALTH_MONITOR.register("database", _check_database, critical=True)
+
+
 def get_health_status(connection_string: str = None) -> Dict[str, Any]:
     """
     Get the health status of the API.
 
     Args:
-        connection_string: PostgreSQL connection string (optional)
+        connection_string: PostgreSQL connection string (optional). When
+            given, that database is checked directly; otherwise the cached
+            background probe of DATABASE_URL is used.
 
     Returns:
         Health status dictionary with status, timestamp, db_connected, and version
     """
-    db_connected = check_database_connection(connection_string)
+    if connection_string:
+        db_connected = check_database_connection(connection_string)
+    else:
+        HEALTH_MONITOR.start()
+        # Only the first request after startup waits for a probe
+        HEALTH_MONITOR.first_run.wait(HEALTH_MONITOR.timeout + 1)
+        database = HEALTH_MONITOR.snapshot()["checks"]["database"]
+        db_connected = database["status"] == "healthy"
 
     return {
         "status": "healthy" if db_connected else "unhealthy",
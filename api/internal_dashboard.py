@@ -12,6 +12,7 @@ from api.dashboard import (
     get_experiment_details,
     get_experiment_status,
     get_goal_progress,
+    get_monthly_revenue,
     get_pending_approvals,
     get_profit_loss,
     get_revenue_by_source,
@@ -203,39 +204,9 @@ def internal_revenue_summary(
     if cached is not None:
         return cached
 
-    summary_sql = """
-        SELECT
-          COALESCE(SUM(CASE WHEN date_trunc('month', occurred_at) = date_trunc('month', NOW()) THEN gross_amount ELSE 0 END), 0) as mtd,
-          COALESCE(SUM(CASE WHEN date_trunc('year', occurred_at) = date_trunc('year', NOW()) THEN gross_amount ELSE 0 END), 0) as ytd,
-          COALESCE(SUM(gross_amount), 0) as total
-        FROM revenue_events
-        WHERE occurred_at >= NOW() - INTERVAL '1 year'
-    """
-
-    monthly_sql = """
-        SELECT
-          TO_CHAR(date_trunc('month', occurred_at), 'Mon YYYY') as period,
-          COALESCE(SUM(gross_amount), 0) as revenue,
-          COUNT(*) as jobs,
-          COALESCE(AVG(gross_amount), 0) as "avgTicket",
-          0 as change
-        FROM revenue_events
-        WHERE occurred_at >= NOW() - INTERVAL '12 months'
-        GROUP BY date_trunc('month', occurred_at)
-        ORDER BY date_trunc('month', occurred_at) DESC
-        LIMIT 12
-    """
-
-    summary_rows = query_db(summary_sql).get("rows", [])
-    monthly_rows = query_db(monthly_sql).get("rows", [])
-    summary = (summary_rows[0] or {}) if summary_rows else {}
-
     result = {
         "success": True,
-        "total": float(summary.get("total", 0) or 0),
-        "mtd": float(summary.get("mtd", 0) or 0),
-        "ytd": float(summary.get("ytd", 0) or 0),
-        "monthlyData": monthly_rows,
+        **get_monthly_revenue(),
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
     _cache.set(cache_key, result, int(cache_seconds))
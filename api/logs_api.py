@@ -19,6 +19,7 @@ from typing import Dict, Any
 
 from core.log_crawler import get_log_crawler
 from core.alert_rules import get_alert_engine
+from core.alert_windows import get_alert_windows
 from core.task_creator import get_task_creator
 from core.database import fetch_all
 
@@ -215,6 +216,7 @@ def handle_resolve_error(error_id: str) -> Dict[str, Any]:
         """
         
         execute_sql(query, (datetime.now(timezone.utc).isoformat(), error_id))
+        get_alert_windows().set_status(error_id, 'resolved')
         
         return _make_response(200, {
             "success": True,
@@ -17,6 +17,8 @@ from typing import Any, Dict, List, Optional
 
 # Import database functions from dashboard module
 from dashboard import query_db, _db
+from core.schema_registry import get_schema_registry
+from core.notification_queue import get_notification_queue, payload_key, render_slack_digest
 
 
 # ============================================================
@@ -139,20 +141,82 @@ CREATE INDEX IF NOT EXISTS idx_digest_queue_scheduled ON notification_digest_que
 """
 
 
+# Bump when NOTIFICATION_TABLES_SQL changes
+NOTIFICATION_SCHEMA_VERSION = 1
+
+NOTIFICATION_SCHEMA_COLUMNS = {
+    "notifications": ["id", "notification_type", "title", "message", "severity", "recipient_type",
+                      "recipient", "metadata", "status", "sent_at", "read_at", "error_message", "created_at"],
+    "notification_preferences": ["id", "user_id", "email", "slack_user_id", "preferences"],
+    "notification_digest_queue": ["id", "user_id", "notification_id", "digest_type", "scheduled_for", "sent"],
+}
+NOTIFICATION_SCHEMA_INDEXES = (
+    "idx_notifications_type", "idx_notifications_status", "idx_notifications_created",
+    "idx_notification_prefs_user", "idx_digest_queue_scheduled",
+)
+
+
 def ensure_notification_tables():
-    """Create notification tables if they don't exist."""
+    """Create notification tables if they don't exist (at most once per process)."""
+    registry = get_schema_registry(query_db)
+    if registry.is_ensured("notifications", NOTIFICATION_SCHEMA_VERSION,
+                           columns=NOTIFICATION_SCHEMA_COLUMNS, indexes=NOTIFICATION_SCHEMA_INDEXES):
+        return True
     try:
         # Split and execute each statement
         for statement in NOTIFICATION_TABLES_SQL.split(";"):
             statement = statement.strip()
             if statement:
                 query_db(statement)
+        registry.mark_ensured("notifications", NOTIFICATION_SCHEMA_VERSION)
         return True
     except Exception as e:
         print(f"Failed to create notification tables: {e}")
         return False
 
 
+# ============================================================
+# DELIVERY QUEUE
+# ============================================================
+
+# Deliveries go through the outbound notification queue
+# (core.notification_queue): callers never block on SMTP or Slack,
+# identical notifications are coalesced, failures are retried from the
+# notification_outbox table, and info-level notifications are grouped
+# into a digest per recipient.
+EMAIL_CHANNEL = "email"
+SLACK_CHANNEL = "notifications-slack"
+
+SEVERITY_PRIORITY = {"critical": "critical", "error": "high", "warning": "normal", "info": "low"}
+
+
+def _notification_queue():
+    """Get the notification queue with this module's channels registered."""
+    queue = get_notification_queue()
+    queue.register_channel(EMAIL_CHANNEL, _deliver_email, rate_per_minute=30, burst=5,
+                           render_digest=_render_email_digest, annotate=_annotate_email)
+    queue.register_channel(SLACK_CHANNEL, _deliver_slack, rate_per_minute=60, burst=10,
+                           render_digest=_render_slack_digest)
+    return queue
+
+
+def _mark_notifications(notification_ids: List[str], error: Optional[str] = None):
+    """Record the delivery outcome of notification rows."""
+    ids = [i for i in notification_ids if validate_uuid(i)]
+    if not ids:
+        return
+    ids_str = "', '".join(ids)
+    if error is None:
+        sql = f"UPDATE notifications SET status = 'sent', sent_at = NOW() WHERE id IN ('{ids_str}')"
+    else:
+        error_msg = sanitize_string(error)
+        sql = f"UPDATE notifications SET status = 'failed', error_message = '{error_msg}' WHERE id IN ('{ids_str}')"
+    try:
+        query_db(sql)
+    except Exception as e:
+        print(f"Failed to record notification status: {e}")
+
+
 # ============================================================
 # NOTIFICATION CREATION
 # ============================================================
@@ -178,7 +242,7 @@ def create_notification(
         recipient_type: How to deliver (email, slack, in_app)
         recipient: Email address, Slack channel, or user ID
         metadata: Additional data to store with notification
-        send_immediately: Whether to send right away or queue for digest
+        send_immediately: Whether to queue delivery right away or leave it for a digest
     
     Returns:
         Notification UUID or None on failure
@@ -199,11 +263,12 @@ def create_notification(
         notification_id = _db.insert("notifications", data)
         
         if send_immediately and notification_id:
+            notification = dict(data, id=notification_id)
             # Send based on recipient type
             if recipient_type == "email" and recipient:
-                send_email_notification(notification_id)
+                _queue_email(notification)
             elif recipient_type == "slack":
-                send_slack_notification(notification_id)
+                _queue_slack(notification)
         
         return notification_id
     except Exception as e:
@@ -211,77 +276,81 @@ def create_notification(
         return None
 
 
+def _get_notification(notification_id: str) -> Optional[Dict[str, Any]]:
+    sql = f"SELECT * FROM notifications WHERE id = '{notification_id}'"
+    result = query_db(sql)
+    rows = result.get("rows") or []
+    return rows[0] if rows else None
+
+
 # ============================================================
 # EMAIL NOTIFICATIONS
 # ============================================================
 
 def send_email_notification(notification_id: str) -> bool:
     """
-    Send an email notification.
+    Queue an email notification for delivery.
     
     Args:
         notification_id: UUID of the notification to send
     
     Returns:
-        True if sent successfully, False otherwise
+        True if queued, False otherwise
     """
     # Validate UUID to prevent SQL injection
     if not validate_uuid(notification_id):
         return False
     
-    # Get notification details
-    sql = f"SELECT * FROM notifications WHERE id = '{notification_id}'"
-    result = query_db(sql)
-    
-    if not result.get("rows"):
+    notification = _get_notification(notification_id)
+    if not notification:
         return False
-    
-    notification = result["rows"][0]
+    return _queue_email(notification)
+
+
+def _queue_email(notification: Dict[str, Any]) -> bool:
     recipient = notification.get("recipient")
     
     if not recipient or not SMTP_USER:
-        # Mark as failed
-        update_sql = f"""
-            UPDATE notifications 
-            SET status = 'failed', 
-                error_message = 'No recipient or SMTP not configured'
-            WHERE id = '{notification_id}'
-        """
-        query_db(update_sql)
+        _mark_notifications([str(notification["id"])], "No recipient or SMTP not configured")
         return False
     
-    try:
-        # Build email
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = f"[JUGGERNAUT] {notification['title']}"
-        msg["From"] = EMAIL_FROM
-        msg["To"] = recipient
-        
-        # Plain text version
-        text_body = f"""
+    return _notification_queue().enqueue(
+        EMAIL_CHANNEL,
+        _email_payload(notification),
+        priority=SEVERITY_PRIORITY.get(notification.get("severity"), "normal"),
+        key=f"{notification['notification_type']}:{recipient}:{notification['title']}:{notification['message']}"
+    )
+
+
+def _email_payload(notification: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the queued email for a notification row."""
+    severity = notification.get("severity") or "info"
+    
+    # Plain text version
+    text_body = f"""
 {notification['title']}
 {'=' * len(notification['title'])}
 
 {notification['message']}
 
 ---
-Severity: {notification['severity'].upper()}
+Severity: {severity.upper()}
 Type: {notification['notification_type']}
 Time: {notification['created_at']}
 
 This is an automated notification from JUGGERNAUT.
-        """
-        
-        # HTML version
-        severity_colors = {
-            "info": "#3498db",
-            "warning": "#f39c12",
-            "error": "#e74c3c",
-            "critical": "#8e44ad"
-        }
-        color = severity_colors.get(notification['severity'], "#3498db")
-        
-        html_body = f"""
+    """
+    
+    # HTML version
+    severity_colors = {
+        "info": "#3498db",
+        "warning": "#f39c12",
+        "error": "#e74c3c",
+        "critical": "#8e44ad"
+    }
+    color = severity_colors.get(severity, "#3498db")
+    
+    html_body = f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -300,7 +369,7 @@ This is an automated notification from JUGGERNAUT.
             <h1 style="margin: 0;">{notification['title']}</h1>
         </div>
         <div class="content">
-            <p><span class="severity">{notification['severity'].upper()}</span></p>
+            <p><span class="severity">{severity.upper()}</span></p>
             <p>{notification['message'].replace(chr(10), '<br>')}</p>
             <div class="footer">
                 <p>Type: {notification['notification_type']}<br>
@@ -311,38 +380,59 @@ This is an automated notification from JUGGERNAUT.
     </div>
 </body>
 </html>
-        """
-        
-        msg.attach(MIMEText(text_body, "plain"))
-        msg.attach(MIMEText(html_body, "html"))
+    """
+    
+    return {
+        "to": notification["recipient"],
+        "subject": f"[JUGGERNAUT] {notification['title']}",
+        "text": text_body,
+        "html": html_body,
+        # Digest fields
+        "title": notification["title"],
+        "message": notification["message"],
+        "notification_type": notification["notification_type"],
+        "severity": severity,
+        "notification_ids": [str(notification["id"])],
+    }
+
+
+def _annotate_email(payload: Dict[str, Any], count: int) -> Dict[str, Any]:
+    return dict(payload, subject=f"{payload['subject']} (x{count})")
+
+
+def _render_email_digest(payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One digest email for a recipient's held info-level notifications."""
+    notifications = [
+        {key: p.get(key, "") for key in ("title", "message", "notification_type", "severity")}
+        for p in payloads
+    ]
+    digest = _digest_email_payload(payloads[0]["to"], notifications, "Digest")
+    digest["notification_ids"] = [i for p in payloads for i in p.get("notification_ids", [])]
+    return digest
+
+
+def _deliver_email(payload: Dict[str, Any]) -> bool:
+    """Send a queued email (the queue's send function) and record the outcome."""
+    notification_ids = payload.get("notification_ids") or []
+    try:
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = payload["subject"]
+        msg["From"] = EMAIL_FROM
+        msg["To"] = payload["to"]
+        if payload.get("text"):
+            msg.attach(MIMEText(payload["text"], "plain"))
+        msg.attach(MIMEText(payload["html"], "html"))
         
-        # Send email
         with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
             server.starttls()
             server.login(SMTP_USER, SMTP_PASSWORD)
-            server.sendmail(EMAIL_FROM, recipient, msg.as_string())
-        
-        # Mark as sent
-        update_sql = f"""
-            UPDATE notifications 
-            SET status = 'sent', 
-                sent_at = NOW()
-            WHERE id = '{notification_id}'
-        """
-        query_db(update_sql)
-        return True
-        
+            server.sendmail(EMAIL_FROM, payload["to"], msg.as_string())
     except Exception as e:
-        # Mark as failed
-        error_msg = str(e).replace("'", "''")
-        update_sql = f"""
-            UPDATE notifications 
-            SET status = 'failed', 
-                error_message = '{error_msg}'
-            WHERE id = '{notification_id}'
-        """
-        query_db(update_sql)
+        _mark_notifications(notification_ids, str(e))
         return False
+    
+    _mark_notifications(notification_ids)
+    return True
 
 
 # ============================================================
@@ -351,33 +441,36 @@ This is an automated notification from JUGGERNAUT.
 
 def send_slack_notification(notification_id: str, channel: str = None) -> bool:
     """
-    Send a Slack notification.
+    Queue a Slack notification for delivery.
     
     Args:
         notification_id: UUID of the notification to send
         channel: Slack channel to post to (defaults to war-room)
     
     Returns:
-        True if sent successfully, False otherwise
+        True if queued, False otherwise
     """
-    # Get notification details
-    sql = f"SELECT * FROM notifications WHERE id = '{notification_id}'"
-    result = query_db(sql)
-    
-    if not result.get("rows"):
+    if not validate_uuid(notification_id):
         return False
     
-    notification = result["rows"][0]
+    notification = _get_notification(notification_id)
+    if not notification:
+        return False
+    return _queue_slack(notification, channel)
+
+
+def _queue_slack(notification: Dict[str, Any], channel: str = None) -> bool:
     target_channel = channel or notification.get("recipient") or SLACK_WAR_ROOM_CHANNEL
     
     # Build Slack message
+    severity = notification.get("severity") or "info"
     severity_emoji = {
         "info": ":information_source:",
         "warning": ":warning:",
         "error": ":x:",
         "critical": ":rotating_light:"
     }
-    emoji = severity_emoji.get(notification['severity'], ":bell:")
+    emoji = severity_emoji.get(severity, ":bell:")
     
     blocks = [
         {
@@ -400,7 +493,7 @@ def send_slack_notification(notification_id: str, channel: str = None) -> bool:
             "elements": [
                 {
                     "type": "mrkdwn",
-                    "text": f"*Type:* {notification['notification_type']} | *Severity:* {notification['severity'].upper()}"
+                    "text": f"*Type:* {notification['notification_type']} | *Severity:* {severity.upper()}"
                 }
             ]
         }
@@ -409,9 +502,30 @@ def send_slack_notification(notification_id: str, channel: str = None) -> bool:
     payload = {
         "channel": target_channel,
         "blocks": blocks,
-        "text": f"{notification['title']}: {notification['message']}"
+        "text": f"{notification['title']}: {notification['message']}",
+        "notification_ids": [str(notification["id"])],
     }
     
+    return _notification_queue().enqueue(
+        SLACK_CHANNEL,
+        payload,
+        priority=SEVERITY_PRIORITY.get(severity, "normal"),
+        key=f"{notification['notification_type']}:{target_channel}:{payload['text']}"
+    )
+
+
+def _render_slack_digest(payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    digest = render_slack_digest(payloads)
+    digest["notification_ids"] = [i for p in payloads for i in p.get("notification_ids", [])]
+    return digest
+
+
+def _deliver_slack(payload: Dict[str, Any]) -> bool:
+    """Post a queued Slack message (the queue's send function) and record the outcome."""
+    payload = dict(payload)
+    notification_ids = payload.pop("notification_ids", None) or []
+    payload.setdefault("channel", SLACK_WAR_ROOM_CHANNEL)
+    
     try:
         # Use bot token if available, otherwise webhook
         if SLACK_BOT_TOKEN:
@@ -432,36 +546,25 @@ def send_slack_notification(notification_id: str, channel: str = None) -> bool:
         req = urllib.request.Request(url, data=data, headers=headers, method='POST')
         
         with urllib.request.urlopen(req, timeout=10) as response:
-            result = json.loads(response.read().decode('utf-8'))
+            body = response.read().decode('utf-8')
+            # Webhooks answer "ok" as plain text
+            result = json.loads(body) if body.startswith("{") else {}
             
-            if not result.get("ok", True):  # Webhooks don't return "ok"
+            if not result.get("ok", True):
                 raise Exception(result.get("error", "Unknown Slack error"))
-        
-        # Mark as sent
-        update_sql = f"""
-            UPDATE notifications 
-            SET status = 'sent', 
-                sent_at = NOW()
-            WHERE id = '{notification_id}'
-        """
-        query_db(update_sql)
-        return True
-        
     except Exception as e:
-        error_msg = str(e).replace("'", "''")
-        update_sql = f"""
-            UPDATE notifications 
-            SET status = 'failed', 
-                error_message = '{error_msg}'
-            WHERE id = '{notification_id}'
-        """
-        query_db(update_sql)
+        _mark_notifications(notification_ids, str(e))
+        if not notification_ids:
+            print(f"Slack notification error: {type(e).__name__}")
         return False
+    
+    _mark_notifications(notification_ids)
+    return True
 
 
 def send_slack_direct(message: str, channel: str = None, emoji: str = None) -> bool:
     """
-    Send a direct Slack message without creating a notification record.
+    Queue a direct Slack message without creating a notification record.
     
     Args:
         message: Message text (supports markdown)
@@ -469,8 +572,11 @@ def send_slack_direct(message: str, channel: str = None, emoji: str = None) -> b
         emoji: Optional emoji prefix
     
     Returns:
-        True if sent successfully
+        True if queued
     """
+    if not SLACK_BOT_TOKEN and not SLACK_WEBHOOK_URL:
+        return False
+    
     target_channel = channel or SLACK_WAR_ROOM_CHANNEL
     text = f"{emoji} {message}" if emoji else message
     
@@ -479,30 +585,7 @@ def send_slack_direct(message: str, channel: str = None, emoji: str = None) -> b
         "text": text,
         "mrkdwn": True
     }
-    
-    try:
-        if SLACK_BOT_TOKEN:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {SLACK_BOT_TOKEN}"
-            }
-            url = "https://slack.com/api/chat.postMessage"
-        elif SLACK_WEBHOOK_URL:
-            headers = {"Content-Type": "application/json"}
-            url = SLACK_WEBHOOK_URL
-            del payload["channel"]
-        else:
-            return False
-        
-        data = json.dumps(payload).encode('utf-8')
-        req = urllib.request.Request(url, data=data, headers=headers, method='POST')
-        
-        with urllib.request.urlopen(req, timeout=10) as response:
-            return True
-    except Exception as e:
-        # Log the error but don't expose details
-        print(f"Slack notification error: {type(e).__name__}")
-        return False
+    return _notification_queue().enqueue(SLACK_CHANNEL, payload)
 
 
 # ============================================================
@@ -836,84 +919,82 @@ def queue_for_digest(notification_id: str, user_id: str, digest_type: str = "dai
         print(f"Failed to queue notification for digest: {e}")
 
 
-def send_pending_digests():
+def send_pending_digests() -> int:
     """
-    Process and send all pending notification digests.
+    Queue all due notification digests.
     Should be called by a scheduled job.
+    
+    Due entries, their notifications and the recipients' emails are read in
+    one query; one digest email per user and digest type is handed to the
+    notification queue, and the entries of accepted digests are marked sent
+    in one update. Entries whose digest was rejected (queue full) or whose
+    user has no email stay pending for the next run.
+    
+    Returns:
+        Number of digest emails queued
     """
-    # Get pending digests
     sql = """
         SELECT 
-            user_id,
-            digest_type,
-            array_agg(notification_id) as notification_ids
-        FROM notification_digest_queue
-        WHERE NOT sent AND scheduled_for <= NOW()
-        GROUP BY user_id, digest_type
-    """
-    
-    try:
-        result = query_db(sql)
-        
-        for row in result.get("rows", []):
-            user_id = row["user_id"]
-            notification_ids = row["notification_ids"]
-            
-            # Get user preferences
-            prefs = get_notification_preferences(user_id)
-            email = prefs.get("email")
-            
-            if email:
-                # Build digest email
-                send_digest_email(user_id, email, notification_ids)
-            
-            # Mark as sent
-            ids_str = "', '".join(notification_ids)
-            update_sql = f"""
-                UPDATE notification_digest_queue 
-                SET sent = TRUE
-                WHERE notification_id IN ('{ids_str}')
-            """
-            query_db(update_sql)
-            
-    except Exception as e:
-        print(f"Failed to process digests: {e}")
-
-
-def send_digest_email(user_id: str, email: str, notification_ids: List[str]):
-    """Send a digest email containing multiple notifications."""
-    # Get notifications
-    ids_str = "', '".join(notification_ids)
-    sql = f"""
-        SELECT * FROM notifications 
-        WHERE id IN ('{ids_str}')
-        ORDER BY created_at DESC
+            q.id AS queue_id,
+            q.user_id,
+            q.digest_type,
+            p.email,
+            n.title,
+            n.message,
+            n.notification_type,
+            n.severity
+        FROM notification_digest_queue q
+        JOIN notifications n ON n.id = q.notification_id
+        LEFT JOIN notification_preferences p ON p.user_id = q.user_id
+        WHERE NOT q.sent AND q.scheduled_for <= NOW()
+        ORDER BY q.user_id, q.digest_type, n.created_at DESC
     """
     
     try:
         result = query_db(sql)
-        notifications = result.get("rows", [])
+        rows = result.get("rows") or []
+        if not rows:
+            return 0
         
-        if not notifications:
-            return
+        digests: Dict[tuple, List[Dict[str, Any]]] = {}
+        for row in rows:
+            digests.setdefault((row["user_id"], row["digest_type"], row.get("email")), []).append(row)
         
-        # Build email content
-        items_html = ""
-        for n in notifications:
-            items_html += f"""
-            <div style="margin: 10px 0; padding: 10px; background: #f5f5f5; border-radius: 4px;">
-                <strong>{n['title']}</strong><br>
-                <small style="color: #666;">{n['notification_type']} - {n['severity']}</small><br>
-                {n['message']}
-            </div>
-            """
+        queue = _notification_queue()
+        queued = 0
+        sent_ids: List[str] = []
+        for (user_id, digest_type, email), notifications in digests.items():
+            if not email:
+                continue
+            payload = _digest_email_payload(email, notifications, f"{(digest_type or 'daily').title()} Digest")
+            if queue.enqueue(EMAIL_CHANNEL, payload, key=f"digest:{user_id}:{digest_type}:{payload_key(payload)}"):
+                queued += 1
+                sent_ids.extend(str(n["queue_id"]) for n in notifications)
         
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = f"[JUGGERNAUT] Daily Digest - {len(notifications)} notifications"
-        msg["From"] = EMAIL_FROM
-        msg["To"] = email
+        # Mark only the accepted entries as sent
+        if sent_ids:
+            ids_str = "', '".join(sent_ids)
+            query_db(f"UPDATE notification_digest_queue SET sent = TRUE WHERE id IN ('{ids_str}')")
+        return queued
         
-        html_body = f"""
+    except Exception as e:
+        print(f"Failed to process digests: {e}")
+        return 0
+
+
+def _digest_email_payload(email: str, notifications: List[Dict[str, Any]], label: str) -> Dict[str, Any]:
+    """Build a digest email containing multiple notifications."""
+    items_html = ""
+    for n in notifications:
+        items_html += f"""
+        <div style="margin: 10px 0; padding: 10px; background: #f5f5f5; border-radius: 4px;">
+            <strong>{n['title']}</strong><br>
+            <small style="color: #666;">{n['notification_type']} - {n['severity']}</small><br>
+            {n['message']}
+        </div>
+        """
+    
+    html_body = f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -924,7 +1005,7 @@ def send_digest_email(user_id: str, email: str, notification_ids: List[str]):
 </head>
 <body>
     <div class="container">
-        <h1>JUGGERNAUT Daily Digest</h1>
+        <h1>JUGGERNAUT {label}</h1>
         <p>You have {len(notifications)} notifications:</p>
         {items_html}
         <p style="margin-top: 20px; color: #666; font-size: 12px;">
@@ -933,17 +1014,13 @@ def send_digest_email(user_id: str, email: str, notification_ids: List[str]):
     </div>
 </body>
 </html>
-        """
-        
-        msg.attach(MIMEText(html_body, "html"))
-        
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PASSWORD)
-            server.sendmail(EMAIL_FROM, email, msg.as_string())
-            
-    except Exception as e:
-        print(f"Failed to send digest email: {e}")
+    """
+    
+    return {
+        "to": email,
+        "subject": f"[JUGGERNAUT] {label} - {len(notifications)} notifications",
+        "html": html_body,
+    }
 
 
 # ============================================================
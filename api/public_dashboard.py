@@ -12,7 +12,8 @@ from datetime import datetime, timezone
 
 from fastapi import APIRouter, Query
 
-from api.dashboard import query_db, validate_uuid
+from api.dashboard import get_monthly_revenue, query_db, validate_uuid
+from core.financial_rollups import FinancialRollups, window_start
 
 
 class _TTLCache:
@@ -57,6 +58,23 @@ def _iso(dt: datetime) -> str:
     return dt.isoformat()
 
 
+# Revenue/cost aggregates come from the rollups maintained by migration 019
+_rollups = FinancialRollups(query_fn=query_db)
+
+
+def _revenue_summary() -> Dict[str, float]:
+    totals = _rollups.calendar_totals()
+    return {
+        "total": totals["total"],
+        "mtd": totals["mtd"],
+        "qtd": totals["qtd"],
+        "ytd": totals["ytd"],
+        "costs": totals["costs"],
+        "profit": totals["total"] - totals["costs"],
+        "mtdCosts": totals["mtd_costs"],
+    }
+
+
 def _rows(sql: str) -> list:
     return query_db(sql).get("rows", [])
 
@@ -555,30 +573,8 @@ def public_stats(
     # Revenue stats
     revenue_summary = {"total": 0, "mtd": 0, "qtd": 0, "ytd": 0, "costs": 0, "profit": 0}
     try:
-        summary_result = query_db("""
-            SELECT
-                COALESCE(SUM(gross_amount), 0) as total,
-                COALESCE(SUM(CASE WHEN date_trunc('month', occurred_at) = date_trunc('month', NOW()) THEN gross_amount ELSE 0 END), 0) as mtd,
-                COALESCE(SUM(CASE WHEN date_trunc('quarter', occurred_at) = date_trunc('quarter', NOW()) THEN gross_amount ELSE 0 END), 0) as qtd,
-                COALESCE(SUM(CASE WHEN date_trunc('year', occurred_at) = date_trunc('year', NOW()) THEN gross_amount ELSE 0 END), 0) as ytd
-            FROM revenue_events
-        """)
-        summary = (summary_result.get("rows", [{}])[0] or {})
-        cost_result = query_db("""
-            SELECT COALESCE(SUM(amount_cents), 0) / 100.0 as total_cost
-            FROM cost_events
-        """)
-        costs = (cost_result.get("rows", [{}])[0] or {})
-        total_revenue = _to_float(summary.get("total"), 0)
-        total_cost = _to_float(costs.get("total_cost"), 0)
-        revenue_summary = {
-            "total": total_revenue,
-            "mtd": _to_float(summary.get("mtd"), 0),
-            "qtd": _to_float(summary.get("qtd"), 0),
-            "ytd": _to_float(summary.get("ytd"), 0),
-            "costs": total_cost,
-            "profit": total_revenue - total_cost
-        }
+        revenue_summary = _revenue_summary()
+        revenue_summary.pop("mtdCosts")
     except Exception:
         pass  # Keep defaults if query fails
 
@@ -657,44 +653,9 @@ def public_revenue_summary(
     if cached is not None:
         return cached
 
-    # Summary stats
-    summary_sql = """
-    SELECT
-        COALESCE(SUM(gross_amount), 0) as total,
-        COALESCE(SUM(CASE WHEN date_trunc('month', occurred_at) = date_trunc('month', NOW()) THEN gross_amount ELSE 0 END), 0) as mtd,
-        COALESCE(SUM(CASE WHEN date_trunc('quarter', occurred_at) = date_trunc('quarter', NOW()) THEN gross_amount ELSE 0 END), 0) as qtd,
-        COALESCE(SUM(CASE WHEN date_trunc('year', occurred_at) = date_trunc('year', NOW()) THEN gross_amount ELSE 0 END), 0) as ytd
-    FROM revenue_events
-    """
-
-    summary_result = query_db(summary_sql)
-    summary = (summary_result.get("rows", [{}])[0] or {})
-
-    # Cost summary
-    cost_sql = """
-    SELECT
-        COALESCE(SUM(amount_cents), 0) / 100.0 as total_cost,
-        COALESCE(SUM(CASE WHEN occurred_at >= date_trunc('month', NOW()) THEN amount_cents ELSE 0 END), 0) / 100.0 as mtd_cost
-    FROM cost_events
-    """
-
-    cost_result = query_db(cost_sql)
-    costs = (cost_result.get("rows", [{}])[0] or {})
-
-    total_revenue = _to_float(summary.get("total"), 0)
-    total_cost = _to_float(costs.get("total_cost"), 0)
-
     result = {
         "success": True,
-        "data": {
-            "total": total_revenue,
-            "mtd": _to_float(summary.get("mtd"), 0),
-            "qtd": _to_float(summary.get("qtd"), 0),
-            "ytd": _to_float(summary.get("ytd"), 0),
-            "costs": total_cost,
-            "profit": total_revenue - total_cost,
-            "mtdCosts": _to_float(costs.get("mtd_cost"), 0)
-        },
+        "data": _revenue_summary(),
         "timestamp": _iso(_utc_now())
     }
     _cache.set(cache_key, result, int(cache_seconds))
@@ -712,30 +673,6 @@ def public_revenue(
     if cached is not None:
         return cached
 
-    # Summary stats
-    summary_sql = """
-    SELECT
-        COALESCE(SUM(gross_amount), 0) as total,
-        COALESCE(SUM(CASE WHEN date_trunc('month', occurred_at) = date_trunc('month', NOW()) THEN gross_amount ELSE 0 END), 0) as mtd,
-        COALESCE(SUM(CASE WHEN date_trunc('quarter', occurred_at) = date_trunc('quarter', NOW()) THEN gross_amount ELSE 0 END), 0) as qtd,
-        COALESCE(SUM(CASE WHEN date_trunc('year', occurred_at) = date_trunc('year', NOW()) THEN gross_amount ELSE 0 END), 0) as ytd
-    FROM revenue_events
-    """
-
-    summary_result = query_db(summary_sql)
-    summary = (summary_result.get("rows", [{}])[0] or {})
-
-    # Cost summary
-    cost_sql = """
-    SELECT
-        COALESCE(SUM(amount_cents), 0) / 100.0 as total_cost,
-        COALESCE(SUM(CASE WHEN occurred_at >= date_trunc('month', NOW()) THEN amount_cents ELSE 0 END), 0) / 100.0 as mtd_cost
-    FROM cost_events
-    """
-
-    cost_result = query_db(cost_sql)
-    costs = (cost_result.get("rows", [{}])[0] or {})
-
     # Recent transactions
     safe_limit = min(int(limit), 200)
     transactions_sql = f"""
@@ -755,20 +692,9 @@ def public_revenue(
     transactions_result = query_db(transactions_sql)
     transactions = transactions_result.get("rows", [])
 
-    total_revenue = _to_float(summary.get("total"), 0)
-    total_cost = _to_float(costs.get("total_cost"), 0)
-
     result = {
         "success": True,
-        "summary": {
-            "total": total_revenue,
-            "mtd": _to_float(summary.get("mtd"), 0),
-            "qtd": _to_float(summary.get("qtd"), 0),
-            "ytd": _to_float(summary.get("ytd"), 0),
-            "costs": total_cost,
-            "profit": total_revenue - total_cost,
-            "mtdCosts": _to_float(costs.get("mtd_cost"), 0)
-        },
+        "summary": _revenue_summary(),
         "transactions": transactions,
         "timestamp": _iso(_utc_now())
     }
@@ -996,34 +922,16 @@ def public_cost(
     today = week = month = all_time = 0.0
 
     try:
-        summary_rows = _rows(
-            """
-            SELECT
-              COALESCE(SUM(CASE WHEN recorded_at >= date_trunc('day', NOW()) THEN amount_cents ELSE 0 END), 0) as today_cents,
-              COALESCE(SUM(CASE WHEN recorded_at >= NOW() - INTERVAL '7 days' THEN amount_cents ELSE 0 END), 0) as week_cents,
-              COALESCE(SUM(CASE WHEN recorded_at >= date_trunc('month', NOW()) THEN amount_cents ELSE 0 END), 0) as month_cents,
-              COALESCE(SUM(amount_cents), 0) as all_time_cents
-            FROM cost_events
-            """
-        )
-        s = (summary_rows[0] or {}) if summary_rows else {}
-        today = _to_float(s.get("today_cents"), 0.0) / 100.0
-        week = _to_float(s.get("week_cents"), 0.0) / 100.0
-        month = _to_float(s.get("month_cents"), 0.0) / 100.0
-        all_time = _to_float(s.get("all_time_cents"), 0.0) / 100.0
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        today = _rollups.cost_total(today_start)["amount_cents"] / 100.0
+        week = _rollups.cost_total(window_start(7, now))["amount_cents"] / 100.0
+        month = _rollups.cost_total(today_start.replace(day=1))["amount_cents"] / 100.0
 
-        breakdown_rows = _rows(
-            """
-            SELECT
-              COALESCE(category, 'other') as category,
-              COALESCE(SUM(amount_cents), 0) as cents
-            FROM cost_events
-            GROUP BY COALESCE(category, 'other')
-            """
-        )
+        breakdown_rows = _rollups.costs(group_by=("category",))
+        all_time = sum(r["amount_cents"] for r in breakdown_rows) / 100.0
         for r in breakdown_rows:
             cat = str(r.get("category") or "other").lower()
-            amt = _to_float(r.get("cents"), 0.0) / 100.0
+            amt = r["amount_cents"] / 100.0
             if "ai" in cat or "llm" in cat or "openrouter" in cat:
                 breakdown["ai"] += amt
             elif "railway" in cat or "compute" in cat:
@@ -1095,39 +1003,9 @@ def public_revenue_summary(
     if cached is not None:
         return cached
 
-    summary_sql = """
-        SELECT
-          COALESCE(SUM(CASE WHEN date_trunc('month', occurred_at) = date_trunc('month', NOW()) THEN gross_amount ELSE 0 END), 0) as mtd,
-          COALESCE(SUM(CASE WHEN date_trunc('year', occurred_at) = date_trunc('year', NOW()) THEN gross_amount ELSE 0 END), 0) as ytd,
-          COALESCE(SUM(gross_amount), 0) as total
-        FROM revenue_events
-        WHERE occurred_at >= NOW() - INTERVAL '1 year'
-    """
-
-    monthly_sql = """
-        SELECT
-          TO_CHAR(date_trunc('month', occurred_at), 'Mon YYYY') as period,
-          COALESCE(SUM(gross_amount), 0) as revenue,
-          COUNT(*) as jobs,
-          COALESCE(AVG(gross_amount), 0) as "avgTicket",
-          0 as change
-        FROM revenue_events
-        WHERE occurred_at >= NOW() - INTERVAL '12 months'
-        GROUP BY date_trunc('month', occurred_at)
-        ORDER BY date_trunc('month', occurred_at) DESC
-        LIMIT 12
-    """
-
-    summary_rows = query_db(summary_sql).get("rows", [])
-    monthly_rows = query_db(monthly_sql).get("rows", [])
-    summary = (summary_rows[0] or {}) if summary_rows else {}
-
     result = {
         "success": True,
-        "total": float(summary.get("total", 0) or 0),
-        "mtd": float(summary.get("mtd", 0) or 0),
-        "ytd": float(summary.get("ytd", 0) or 0),
-        "monthlyData": monthly_rows,
+        **get_monthly_revenue(),
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
     _cache.set(cache_key, result, int(cache_seconds))
@@ -13,10 +13,14 @@ from typing import Any, Dict, Optional
 from fastapi import APIRouter, Query
 
 from api.dashboard import query_db
+from core.financial_rollups import FinancialRollups
 
 
 router = APIRouter(prefix="")
 
+# Revenue/cost aggregates come from the rollups maintained by migration 019
+_rollups = FinancialRollups(query_fn=query_db)
+
 
 def _to_float(value: Any, default: float = 0.0) -> float:
     try:
@@ -179,29 +183,7 @@ def public_revenue(
 ) -> Dict[str, Any]:
     """Get revenue summary and recent transactions."""
     try:
-        # Summary stats
-        summary_sql = """
-        SELECT
-            COALESCE(SUM(gross_amount), 0) as total,
-            COALESCE(SUM(CASE WHEN date_trunc('month', occurred_at) = date_trunc('month', NOW()) THEN gross_amount ELSE 0 END), 0) as mtd,
-            COALESCE(SUM(CASE WHEN date_trunc('quarter', occurred_at) = date_trunc('quarter', NOW()) THEN gross_amount ELSE 0 END), 0) as qtd,
-            COALESCE(SUM(CASE WHEN date_trunc('year', occurred_at) = date_trunc('year', NOW()) THEN gross_amount ELSE 0 END), 0) as ytd
-        FROM revenue_events
-        """
-        
-        summary_result = query_db(summary_sql)
-        summary = (summary_result.get("rows", [{}])[0] or {})
-        
-        # Cost summary - use occurred_at for filtering
-        cost_sql = """
-        SELECT
-            COALESCE(SUM(amount_cents), 0) / 100.0 as total_cost,
-            COALESCE(SUM(CASE WHEN occurred_at >= date_trunc('month', NOW()) THEN amount_cents ELSE 0 END), 0) / 100.0 as mtd_cost
-        FROM cost_events
-        """
-        
-        cost_result = query_db(cost_sql)
-        costs = (cost_result.get("rows", [{}])[0] or {})
+        totals = _rollups.calendar_totals()
         
         # Recent transactions - use actual columns: source (not source_type), opportunity_id (not source_id)
         safe_limit = min(int(limit), 200)
@@ -222,19 +204,16 @@ def public_revenue(
         transactions_result = query_db(transactions_sql)
         transactions = transactions_result.get("rows", [])
         
-        total_revenue = _to_float(summary.get("total"), 0)
-        total_cost = _to_float(costs.get("total_cost"), 0)
-        
         return {
             "success": True,
             "summary": {
-                "total": total_revenue,
-                "mtd": _to_float(summary.get("mtd"), 0),
-                "qtd": _to_float(summary.get("qtd"), 0),
-                "ytd": _to_float(summary.get("ytd"), 0),
-                "costs": total_cost,
-                "profit": total_revenue - total_cost,
-                "mtdCosts": _to_float(costs.get("mtd_cost"), 0)
+                "total": totals["total"],
+                "mtd": totals["mtd"],
+                "qtd": totals["qtd"],
+                "ytd": totals["ytd"],
+                "costs": totals["costs"],
+                "profit": totals["total"] - totals["costs"],
+                "mtdCosts": totals["mtd_costs"]
             },
             "transactions": transactions,
             "timestamp": datetime.now(timezone.utc).isoformat()
@@ -261,20 +240,17 @@ def public_revenue_summary() -> Dict[str, Any]:
 def public_revenue_by_source() -> Dict[str, Any]:
     """Get revenue breakdown by source."""
     try:
-        # Use 'source' column (actual schema) not 'source_type'
-        sql = """
-        SELECT 
-            COALESCE(source, 'unknown') as source,
-            COUNT(*) as transaction_count,
-            COALESCE(SUM(gross_amount), 0) as total_revenue,
-            COALESCE(AVG(gross_amount), 0) as avg_transaction
-        FROM revenue_events
-        GROUP BY source
-        ORDER BY total_revenue DESC
-        """
-        
-        result = query_db(sql)
-        sources = result.get("rows", [])
+        rows = _rollups.revenue(group_by=("source",))
+        rows.sort(key=lambda row: row["gross_amount"], reverse=True)
+        sources = [
+            {
+                "source": row["source"] or "unknown",
+                "transaction_count": row["event_count"],
+                "total_revenue": row["gross_amount"],
+                "avg_transaction": row["gross_amount"] / row["event_count"] if row["event_count"] else 0
+            }
+            for row in rows
+        ]
         
         return {
             "success": True,
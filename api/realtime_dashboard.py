@@ -18,6 +18,8 @@ import urllib.error
 from datetime import datetime, timezone, timedelta
 from typing import Any, Dict, List, Optional
 
+from core.financial_rollups import FinancialRollups
+
 # ============================================================
 # CONFIGURATION
 # ============================================================
@@ -221,37 +223,40 @@ def get_activity_feed(limit: int = 50) -> Dict[str, Any]:
 # REVENUE API
 # ============================================================
 
-def get_revenue_summary() -> Dict[str, Any]:
-    """Get revenue summary with today, month, and all-time totals."""
-    today = datetime.now(timezone.utc).date()
-    month_start = today.replace(day=1)
-    
-    sql = f"""
-        SELECT 
-            COALESCE(SUM(CASE WHEN DATE(occurred_at) = '{today}' THEN net_amount ELSE 0 END), 0) as today,
-            COALESCE(SUM(CASE WHEN DATE(occurred_at) >= '{month_start}' THEN net_amount ELSE 0 END), 0) as month,
-            COALESCE(SUM(net_amount), 0) as all_time,
-            COUNT(*) as total_events
-        FROM revenue_events
-    """
-    
+def _rollup_query(sql: str) -> Dict[str, Any]:
     result = execute_dashboard_sql(sql)
-    
     if "error" in result:
-        return {"success": False, "error": result["error"]}
+        raise RuntimeError(result["error"])
+    return result
+
+
+# Revenue totals come from the rollups maintained by migration 019
+_rollups = FinancialRollups(query_fn=_rollup_query)
+
+
+def get_revenue_summary() -> Dict[str, Any]:
+    """Get revenue summary with today, month, and all-time totals."""
+    now = datetime.now(timezone.utc)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    month_start = today_start.replace(day=1)
     
-    row = result.get("rows", [{}])[0] if result.get("rows") else {}
+    try:
+        today = _rollups.revenue_total(today_start)
+        month = _rollups.revenue_total(month_start)
+        all_time = _rollups.revenue_total()
+    except RuntimeError as exc:
+        return {"success": False, "error": str(exc)}
     
     return {
         "success": True,
         "revenue": {
-            "today": float(row.get("today", 0)),
-            "month": float(row.get("month", 0)),
-            "all_time": float(row.get("all_time", 0)),
+            "today": today["net_amount"],
+            "month": month["net_amount"],
+            "all_time": all_time["net_amount"],
             "goal": 100000000,
-            "total_events": int(row.get("total_events", 0))
+            "total_events": all_time["event_count"]
         },
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "timestamp": now.isoformat()
     }
 
 
@@ -5,6 +5,8 @@ Endpoints:
 - GET /revenue/summary - MTD/QTD/YTD totals
 - GET /revenue/transactions - Transaction history
 - GET /revenue/charts - Revenue over time data
+
+Summary and chart data come from the financial rollups (core.financial_rollups).
 """
 
 import json
@@ -12,6 +14,7 @@ from datetime import datetime, timezone, timedelta
 from typing import Any, Dict, List, Optional
 
 from core.database import query_db
+from core.financial_rollups import get_financial_rollups, parse_period, window_start
 
 
 def _make_response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
@@ -33,6 +36,26 @@ def _error_response(status_code: int, message: str) -> Dict[str, Any]:
     return _make_response(status_code, {"error": message})
 
 
+def _to_cents(amount: float) -> int:
+    return int(round(amount * 100))
+
+
+def _period_totals(since: Optional[datetime]) -> Dict[str, Any]:
+    """Revenue, cost and profit in cents since a point in time (all time when None)."""
+    rollups = get_financial_rollups()
+    revenue = rollups.revenue_total(since, include_refunds=False)
+    revenue_cents = _to_cents(revenue["gross_amount"])
+    cost_cents = rollups.cost_total(since)["amount_cents"]
+    return {
+        "revenue_cents": revenue_cents,
+        "cost_cents": cost_cents,
+        "profit_cents": revenue_cents - cost_cents,
+        "transaction_count": revenue["event_count"],
+        "first_revenue_at": revenue["first_at"],
+        "last_revenue_at": revenue["last_at"]
+    }
+
+
 async def handle_revenue_summary() -> Dict[str, Any]:
     """Get MTD/QTD/YTD revenue totals."""
     try:
@@ -44,71 +67,17 @@ async def handle_revenue_summary() -> Dict[str, Any]:
         quarter_start = now.replace(month=quarter_month, day=1, hour=0, minute=0, second=0, microsecond=0)
         year_start = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
         
-        # Get revenue by period
-        sql = f"""
-        SELECT 
-            SUM(CASE WHEN event_type = 'revenue' THEN amount_cents ELSE 0 END) as total_revenue_cents,
-            SUM(CASE WHEN event_type = 'cost' THEN amount_cents ELSE 0 END) as total_cost_cents,
-            SUM(CASE WHEN event_type = 'revenue' THEN amount_cents ELSE 0 END) - 
-            SUM(CASE WHEN event_type = 'cost' THEN amount_cents ELSE 0 END) as net_profit_cents,
-            COUNT(*) FILTER (WHERE event_type = 'revenue') as transaction_count,
-            MIN(recorded_at) FILTER (WHERE event_type = 'revenue') as first_revenue_at,
-            MAX(recorded_at) FILTER (WHERE event_type = 'revenue') as last_revenue_at
-        FROM revenue_events
-        WHERE recorded_at >= '{month_start.isoformat()}'
-        """
-        
-        mtd_result = await query_db(sql.replace(month_start.isoformat(), month_start.isoformat()))
-        mtd = mtd_result.get("rows", [{}])[0]
-        
-        qtd_result = await query_db(sql.replace(month_start.isoformat(), quarter_start.isoformat()))
-        qtd = qtd_result.get("rows", [{}])[0]
-        
-        ytd_result = await query_db(sql.replace(month_start.isoformat(), year_start.isoformat()))
-        ytd = ytd_result.get("rows", [{}])[0]
-        
-        # All-time totals
-        all_time_sql = """
-        SELECT 
-            SUM(CASE WHEN event_type = 'revenue' THEN amount_cents ELSE 0 END) as total_revenue_cents,
-            SUM(CASE WHEN event_type = 'cost' THEN amount_cents ELSE 0 END) as total_cost_cents,
-            SUM(CASE WHEN event_type = 'revenue' THEN amount_cents ELSE 0 END) - 
-            SUM(CASE WHEN event_type = 'cost' THEN amount_cents ELSE 0 END) as net_profit_cents,
-            COUNT(*) FILTER (WHERE event_type = 'revenue') as transaction_count
-        FROM revenue_events
-        """
-        
-        all_time_result = await query_db(all_time_sql)
-        all_time = all_time_result.get("rows", [{}])[0]
+        mtd = _period_totals(month_start)
+        periods = {
+            "qtd": _period_totals(quarter_start),
+            "ytd": _period_totals(year_start),
+            "all_time": _period_totals(None)
+        }
+        for totals in periods.values():
+            totals.pop("first_revenue_at")
+            totals.pop("last_revenue_at")
         
-        return _make_response(200, {
-            "mtd": {
-                "revenue_cents": mtd.get("total_revenue_cents") or 0,
-                "cost_cents": mtd.get("total_cost_cents") or 0,
-                "profit_cents": mtd.get("net_profit_cents") or 0,
-                "transaction_count": mtd.get("transaction_count") or 0,
-                "first_revenue_at": mtd.get("first_revenue_at"),
-                "last_revenue_at": mtd.get("last_revenue_at")
-            },
-            "qtd": {
-                "revenue_cents": qtd.get("total_revenue_cents") or 0,
-                "cost_cents": qtd.get("total_cost_cents") or 0,
-                "profit_cents": qtd.get("net_profit_cents") or 0,
-                "transaction_count": qtd.get("transaction_count") or 0
-            },
-            "ytd": {
-                "revenue_cents": ytd.get("total_revenue_cents") or 0,
-                "cost_cents": ytd.get("total_cost_cents") or 0,
-                "profit_cents": ytd.get("net_profit_cents") or 0,
-                "transaction_count": ytd.get("transaction_count") or 0
-            },
-            "all_time": {
-                "revenue_cents": all_time.get("total_revenue_cents") or 0,
-                "cost_cents": all_time.get("total_cost_cents") or 0,
-                "profit_cents": all_time.get("net_profit_cents") or 0,
-                "transaction_count": all_time.get("transaction_count") or 0
-            }
-        })
+        return _make_response(200, {"mtd": mtd, **periods})
         
     except Exception as e:
         return _error_response(500, f"Failed to fetch revenue summary: {str(e)}")
@@ -166,42 +135,40 @@ async def handle_revenue_charts(query_params: Dict[str, Any]) -> Dict[str, Any]:
     """Get revenue over time for charts."""
     try:
         days = int(query_params.get("days", ["30"])[0] if isinstance(query_params.get("days"), list) else query_params.get("days", 30))
+        rollups = get_financial_rollups()
+        since = window_start(days)
         
         # Daily revenue for the last N days
-        sql = f"""
-        SELECT 
-            DATE(recorded_at) as date,
-            SUM(CASE WHEN event_type = 'revenue' THEN amount_cents ELSE 0 END) as revenue_cents,
-            SUM(CASE WHEN event_type = 'cost' THEN amount_cents ELSE 0 END) as cost_cents,
-            SUM(CASE WHEN event_type = 'revenue' THEN amount_cents ELSE 0 END) - 
-            SUM(CASE WHEN event_type = 'cost' THEN amount_cents ELSE 0 END) as profit_cents,
-            COUNT(*) FILTER (WHERE event_type = 'revenue') as transaction_count
-        FROM revenue_events
-        WHERE recorded_at >= NOW() - INTERVAL '{days} days'
-        GROUP BY DATE(recorded_at)
-        ORDER BY date DESC
-        """
-        
-        result = await query_db(sql)
-        daily_data = result.get("rows", [])
+        daily: Dict[str, Dict[str, Any]] = {}
+        
+        def _day(period: Any) -> Dict[str, Any]:
+            date = parse_period(period).date().isoformat()
+            return daily.setdefault(date, {
+                "date": date, "revenue_cents": 0, "cost_cents": 0, "profit_cents": 0, "transaction_count": 0
+            })
+        
+        for row in rollups.revenue(since, group_by=("day",), include_refunds=False):
+            entry = _day(row["period"])
+            entry["revenue_cents"] += _to_cents(row["gross_amount"])
+            entry["transaction_count"] += row["event_count"]
+        for row in rollups.costs(since, group_by=("day",)):
+            _day(row["period"])["cost_cents"] += row["amount_cents"]
+        for entry in daily.values():
+            entry["profit_cents"] = entry["revenue_cents"] - entry["cost_cents"]
         
         # By source
-        source_sql = f"""
-        SELECT 
-            source,
-            SUM(CASE WHEN event_type = 'revenue' THEN amount_cents ELSE 0 END) as revenue_cents,
-            COUNT(*) FILTER (WHERE event_type = 'revenue') as transaction_count
-        FROM revenue_events
-        WHERE recorded_at >= NOW() - INTERVAL '{days} days'
-        GROUP BY source
-        ORDER BY revenue_cents DESC
-        """
-        
-        source_result = await query_db(source_sql)
-        by_source = source_result.get("rows", [])
+        by_source = [
+            {
+                "source": row["source"],
+                "revenue_cents": _to_cents(row["gross_amount"]),
+                "transaction_count": row["event_count"]
+            }
+            for row in rollups.revenue(since, group_by=("source",), include_refunds=False)
+        ]
+        by_source.sort(key=lambda row: row["revenue_cents"], reverse=True)
         
         return _make_response(200, {
-            "daily": daily_data,
+            "daily": sorted(daily.values(), key=lambda entry: entry["date"], reverse=True),
             "by_source": by_source,
             "period_days": days
         })
@@ -1,19 +1,15 @@
 import json
 import logging
 import os
-import threading
-import time
-import urllib.error
-import urllib.request
-from collections import deque
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
+from core.circuit_breaker import CircuitOpenError
+from core.llm_cache import CachePolicy
+from core.llm_transport import LLM_API_BASE, LLM_CHAT_ENDPOINT, LLMTransportError, get_llm_transport  # noqa: F401
+
 logger = logging.getLogger(__name__)
 
-_OPENROUTER_DEFAULT = "https://openrouter.ai/api/v1/chat/completions"
-LLM_API_BASE = (os.getenv("LLM_API_BASE") or os.getenv("OPENROUTER_ENDPOINT") or _OPENROUTER_DEFAULT).strip().rstrip("/")
-LLM_CHAT_ENDPOINT = f"{LLM_API_BASE}/chat/completions" if not LLM_API_BASE.endswith("/chat/completions") else LLM_API_BASE
 # Backward compat alias
 OPENROUTER_ENDPOINT = LLM_CHAT_ENDPOINT
 DEFAULT_MODEL = os.getenv("LLM_MODEL") or os.getenv("OPENROUTER_MODEL") or "openrouter/auto"
@@ -97,10 +93,6 @@ def select_model_for_task(task_type: str) -> str:
     return MODEL_WORKHORSE
 
 
-_LLM_CALL_LOCK = threading.Lock()
-_LLM_CALL_TIMES = deque(maxlen=10000)
-
-
 def _truthy_env(name: str, default: str = "0") -> bool:
     return (os.getenv(name, default) or "").strip().lower() in ("1", "true", "yes", "y", "on")
 
@@ -109,30 +101,6 @@ def _using_openrouter_endpoint() -> bool:
     return "openrouter.ai" in (OPENROUTER_ENDPOINT or "").lower()
 
 
-def _enforce_llm_limits() -> None:
-    if _truthy_env("LLM_DISABLED", "0") or _truthy_env("LLM_EMERGENCY_STOP", "0"):
-        raise RuntimeError("LLM execution disabled via LLM_DISABLED/LLM_EMERGENCY_STOP")
-
-    safe_mode = _truthy_env("LLM_SAFE_MODE", "0")
-    rpm_raw = os.getenv("LLM_MAX_REQUESTS_PER_MINUTE", "10" if safe_mode else "60")
-    try:
-        rpm = int(rpm_raw)
-    except (TypeError, ValueError):
-        rpm = 60
-
-    if rpm <= 0:
-        return
-
-    now = time.time()
-    cutoff = now - 60.0
-    with _LLM_CALL_LOCK:
-        while _LLM_CALL_TIMES and _LLM_CALL_TIMES[0] < cutoff:
-            _LLM_CALL_TIMES.popleft()
-        if len(_LLM_CALL_TIMES) >= rpm:
-            raise RuntimeError(f"LLM rate limit exceeded ({rpm}/min) — refusing to call provider")
-        _LLM_CALL_TIMES.append(now)
-
-
 @dataclass
 class AIResponse:
     content: str
@@ -182,11 +150,14 @@ class AIExecutor:
 
         return {"max_price": {"prompt": prompt_price, "completion": completion_price}}
 
-    def chat(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> AIResponse:
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int] = None,
+        cache: Optional[CachePolicy] = None,
+    ) -> AIResponse:
         from core.tracing import start_generation
 
-        _enforce_llm_limits()
-
         safe_mode = _truthy_env("LLM_SAFE_MODE", "0")
         if safe_mode:
             try:
@@ -215,41 +186,23 @@ class AIExecutor:
         if provider is not None and _using_openrouter_endpoint():
             payload["provider"] = provider
 
-        data = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(
-            OPENROUTER_ENDPOINT,
-            data=data,
-            headers=self._headers(),
-            method="POST",
-        )
-
         try:
-            with urllib.request.urlopen(req, timeout=self.timeout_seconds) as response:
-                raw = json.loads(response.read().decode("utf-8"))
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode("utf-8")
-            gen.end(error=f"HTTP {e.code}: {error_body[:200]}", model=self.model)
-            raise RuntimeError(f"OpenRouter HTTP {e.code}: {error_body}") from e
-        except urllib.error.URLError as e:
-            gen.end(error=f"Connection error: {e}", model=self.model)
-            raise RuntimeError(f"OpenRouter connection error: {e}") from e
-        except json.JSONDecodeError as e:
-            gen.end(error=f"Invalid JSON: {e}", model=self.model)
-            raise RuntimeError(f"OpenRouter invalid JSON response: {e}") from e
-
-        choices = raw.get("choices") or []
-        if not choices:
-            gen.end(error="Response missing choices", model=self.model)
-            raise RuntimeError("OpenRouter response missing choices")
-
-        content = ((choices[0] or {}).get("message") or {}).get("content") or ""
-        usage = raw.get("usage") or {}
+            result = get_llm_transport().complete(
+                payload, headers=self._headers(), timeout=self.timeout_seconds, cache=cache
+            )
+        except (LLMTransportError, CircuitOpenError) as e:
+            gen.end(error=str(e)[:200], model=self.model)
+            raise RuntimeError(f"OpenRouter request failed: {e}") from e
+
+        content = result.content
         gen.end(
             output=content[:2000],
-            model=raw.get("model", self.model),
-            usage={"prompt_tokens": usage.get("prompt_tokens", 0), "completion_tokens": usage.get("completion_tokens", 0), "total_tokens": usage.get("total_tokens", 0)} if usage else None,
+            model=result.model or self.model,
+            usage=result.usage.as_dict(),
+            metadata={"cost_cents": result.usage.cost_cents, "ttft_ms": result.ttft_ms, "cached": result.cached},
+            completion_start_time=result.first_token_at,
         )
-        return AIResponse(content=content, raw=raw)
+        return AIResponse(content=content, raw=result.raw)
 
     def chat_with_tools(
         self,
@@ -290,8 +243,6 @@ class AIExecutor:
             metadata={"max_iterations": max_iterations, "tool_count": len(tools)},
         )
 
-        _enforce_llm_limits()
-
         safe_mode = _truthy_env("LLM_SAFE_MODE", "0")
         if safe_mode:
             try:
@@ -309,6 +260,8 @@ class AIExecutor:
         all_tool_calls = []
         iteration = 0
         conversation = list(messages)  # mutable copy
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        cost_cents = 0.0
 
         while iteration < max_iterations:
             iteration += 1
@@ -329,32 +282,20 @@ class AIExecutor:
             if provider is not None and _using_openrouter_endpoint():
                 payload["provider"] = provider
 
-            data = json.dumps(payload).encode("utf-8")
-            req = urllib.request.Request(
-                OPENROUTER_ENDPOINT,
-                data=data,
-                headers=self._headers(),
-                method="POST",
-            )
-
             try:
-                _enforce_llm_limits()
-                with urllib.request.urlopen(req, timeout=self.timeout_seconds) as response:
-                    raw = json.loads(response.read().decode("utf-8"))
-            except urllib.error.HTTPError as e:
-                error_body = e.read().decode("utf-8")
-                raise RuntimeError(f"OpenRouter HTTP {e.code}: {error_body}") from e
-            except urllib.error.URLError as e:
-                raise RuntimeError(f"OpenRouter connection error: {e}") from e
-            except json.JSONDecodeError as e:
-                raise RuntimeError(f"OpenRouter returned invalid JSON: {e}") from e
-
-            choices = raw.get("choices") or []
-            if not choices:
-                raise RuntimeError("OpenRouter response missing choices")
-
-            message = (choices[0] or {}).get("message") or {}
-            finish_reason = (choices[0] or {}).get("finish_reason") or ""
+                response = get_llm_transport().complete(
+                    payload, headers=self._headers(), timeout=self.timeout_seconds
+                )
+            except (LLMTransportError, CircuitOpenError) as e:
+                _trace_gen.end(error=str(e)[:200], model=self.model, usage=usage,
+                               metadata={"iterations": iteration, "tool_calls": len(all_tool_calls)})
+                raise RuntimeError(f"OpenRouter request failed: {e}") from e
+
+            for key, value in response.usage.as_dict().items():
+                usage[key] += value
+            cost_cents += response.usage.cost_cents
+            raw = response.raw
+            message = response.message
             tool_calls = message.get("tool_calls")
 
             # If the model returned tool calls, execute them
@@ -407,8 +348,9 @@ class AIExecutor:
             content = message.get("content") or ""
             _trace_gen.end(
                 output=content[:2000],
-                model=raw.get("model", self.model),
-                metadata={"iterations": iteration, "tool_calls": len(all_tool_calls)},
+                model=response.model or self.model,
+                usage=usage,
+                metadata={"iterations": iteration, "tool_calls": len(all_tool_calls), "cost_cents": cost_cents},
             )
             return AIResponse(
                 content=content,
@@ -422,7 +364,8 @@ class AIExecutor:
         _trace_gen.end(
             error=f"Max iterations reached ({max_iterations})",
             model=self.model,
-            metadata={"iterations": iteration, "tool_calls": len(all_tool_calls)},
+            usage=usage,
+            metadata={"iterations": iteration, "tool_calls": len(all_tool_calls), "cost_cents": cost_cents},
         )
         return AIResponse(
             content=f"[Tool loop reached max {max_iterations} iterations. Last tool calls: {len(all_tool_calls)}]",
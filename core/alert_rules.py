@@ -3,6 +3,11 @@ Alert Rules Engine
 
 Evaluates error patterns and triggers task creation when rules match.
 
+Rules are evaluated in one pass against the in-process occurrence windows
+(core.alert_windows); the per-rule SQL checks remain as the fallback when
+the windows cannot be loaded. Cooldowns are tracked in memory and rule
+state is written back in one batched UPDATE per evaluation.
+
 Part of Milestone 3: Railway Logs Crawler
 """
 
@@ -11,6 +16,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone, timedelta
 
 from core.database import fetch_all, execute_sql
+from core.alert_windows import AlertWindows, get_alert_windows
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +24,13 @@ logger = logging.getLogger(__name__)
 class AlertRulesEngine:
     """Evaluates alert rules and triggers actions."""
     
+    def __init__(self, windows: Optional[AlertWindows] = None):
+        self.windows = windows or get_alert_windows()
+        # rule_id -> last trigger time seen by this process
+        self._last_triggered: Dict[str, datetime] = {}
+        # rule_id -> [last_triggered, trigger count] not yet written
+        self._pending_triggers: Dict[str, List[Any]] = {}
+    
     def get_active_rules(self) -> List[Dict[str, Any]]:
         """Get all enabled alert rules."""
         try:
@@ -42,18 +55,24 @@ class AlertRulesEngine:
     def is_in_cooldown(self, rule: Dict[str, Any]) -> bool:
         """Check if rule is in cooldown period."""
         last_triggered = rule.get('last_triggered')
-        if not last_triggered:
+        local_triggered = self._last_triggered.get(str(rule.get('id')))
+        if not last_triggered and not local_triggered:
             return False
         
         cooldown_minutes = int(rule.get('cooldown_minutes', 30))
         
-        # Parse last_triggered timestamp
-        if isinstance(last_triggered, str):
-            last_triggered = datetime.fromisoformat(last_triggered.replace('Z', '+00:00'))
+        if last_triggered:
+            # Parse last_triggered timestamp
+            if isinstance(last_triggered, str):
+                last_triggered = datetime.fromisoformat(last_triggered.replace('Z', '+00:00'))
+            
+            # Ensure timezone-aware (handle naive datetimes from database)
+            if last_triggered.tzinfo is None:
+                last_triggered = last_triggered.replace(tzinfo=timezone.utc)
         
-        # Ensure timezone-aware (handle naive datetimes from database)
-        if last_triggered.tzinfo is None:
-            last_triggered = last_triggered.replace(tzinfo=timezone.utc)
+        # Trigger recorded here but possibly not yet visible in the row
+        if local_triggered and (not last_triggered or local_triggered > last_triggered):
+            last_triggered = local_triggered
         
         cooldown_until = last_triggered + timedelta(minutes=cooldown_minutes)
         return datetime.now(timezone.utc) < cooldown_until
@@ -77,6 +96,49 @@ class AlertRulesEngine:
         except Exception as e:
             logger.exception(f"Error updating rule trigger: {e}")
     
+    def record_trigger(self, rule_id: str, when: Optional[datetime] = None):
+        """Start the rule's cooldown now; persisted by flush_rule_state()."""
+        when = when or datetime.now(timezone.utc)
+        self._last_triggered[rule_id] = when
+        pending = self._pending_triggers.setdefault(rule_id, [when, 0])
+        pending[0] = when
+        pending[1] += 1
+    
+    def flush_rule_state(self) -> int:
+        """
+        Write pending trigger timestamps and counts in one UPDATE.
+        
+        Returns:
+            Number of rules written
+        """
+        if not self._pending_triggers:
+            return 0
+        pending = self._pending_triggers
+        self._pending_triggers = {}
+        rows = ", ".join(["(%s, %s, %s)"] * len(pending))
+        params = []
+        for rule_id, (when, count) in pending.items():
+            params.extend([rule_id, when.isoformat(), count])
+        query = f"""
+            UPDATE log_alert_rules AS r
+            SET 
+                last_triggered = v.last_triggered::timestamptz,
+                trigger_count = COALESCE(r.trigger_count, 0) + v.n,
+                updated_at = NOW()
+            FROM (VALUES {rows}) AS v(id, last_triggered, n)
+            WHERE r.id::text = v.id
+        """
+        try:
+            execute_sql(query, tuple(params))
+        except Exception as e:
+            logger.exception(f"Error writing alert rule state: {e}")
+            # Keep them for the next flush
+            for rule_id, (when, count) in pending.items():
+                merged = self._pending_triggers.setdefault(rule_id, [when, 0])
+                merged[1] += count
+            return 0
+        return len(pending)
+    
     def check_new_fingerprint_rule(self, rule: Dict[str, Any]) -> List[str]:
         """
         Check for new error fingerprints.
@@ -242,26 +304,32 @@ class AlertRulesEngine:
         Returns:
             Dict mapping rule IDs to lists of triggered fingerprint IDs
         """
-        triggered = {}
-        rules = self.get_active_rules()
-        
-        for rule in rules:
-            rule_id = str(rule['id'])
-            
+        now = datetime.now(timezone.utc)
+        rules = []
+        for rule in self.get_active_rules():
             # Check cooldown
             if self.is_in_cooldown(rule):
                 logger.debug(f"Rule {rule['name']} is in cooldown")
                 continue
-            
-            # Evaluate rule
-            fingerprint_ids = self.evaluate_rule(rule)
-            
-            if fingerprint_ids:
-                triggered[rule_id] = fingerprint_ids
-                logger.info(f"Rule {rule['name']} triggered for {len(fingerprint_ids)} fingerprints")
-                
-                # Update rule trigger timestamp
-                self.update_rule_triggered(rule_id)
+            rules.append(rule)
+        if not rules:
+            return {}
+        
+        if self.windows.ensure_fresh(fetch_all):
+            triggered = self.windows.evaluate(rules, now)
+        else:
+            # Windows unavailable: fall back to per-rule SQL
+            triggered = {}
+            for rule in rules:
+                fingerprint_ids = self.evaluate_rule(rule)
+                if fingerprint_ids:
+                    triggered[str(rule['id'])] = fingerprint_ids
+        
+        names = {str(rule['id']): rule.get('name') for rule in rules}
+        for rule_id, fingerprint_ids in triggered.items():
+            logger.info(f"Rule {names.get(rule_id)} triggered for {len(fingerprint_ids)} fingerprints")
+            self.record_trigger(rule_id, now)
+        self.flush_rule_state()
         
         return triggered
 
@@ -0,0 +1,339 @@
+"""
+Alert Windows
+
+In-process sliding windows over the error-occurrence stream, so alert rules
+are evaluated from memory instead of per-rule aggregate SQL over
+error_occurrences.
+
+- Each fingerprint keeps a ring buffer of per-minute occurrence counts
+  (and a second one for CRITICAL occurrences) covering ``horizon_minutes``.
+- LogCrawler feeds occurrences as it records them and registers the stored
+  fingerprint state (task_created / status) of every fingerprint it sees, new
+  or recurring; TaskCreator and the resolve endpoint keep that state in sync.
+- On first use the windows are bootstrapped with the last ``horizon_minutes``
+  of occurrences; fingerprint state is re-read every
+  ``STATE_REFRESH_SECONDS``. Neither depends on how much older history the
+  database holds.
+- ``evaluate`` checks every rule against every live fingerprint in one pass.
+
+Windows have minute granularity: an N-minute window covers the current
+minute and the N-1 before it.
+
+Part of Milestone 3: Railway Logs Crawler
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Minutes of history kept per fingerprint (longest rule window supported)
+ALERT_WINDOW_MINUTES = int(os.getenv("ALERT_WINDOW_MINUTES", "60"))
+
+# Seconds between fingerprint state re-reads (task_created, status)
+STATE_REFRESH_SECONDS = int(os.getenv("ALERT_STATE_REFRESH_SECONDS", "300"))
+
+# Window used by the new_fingerprint and critical rules
+RECENT_WINDOW_MINUTES = 5
+
+
+def _to_minute(value: Any) -> Optional[int]:
+    """Epoch minute for a datetime, ISO string or epoch seconds (None if unparseable)."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value // 60)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() // 60)
+    return None
+
+
+def _rule_condition(rule: Dict[str, Any]) -> Dict[str, Any]:
+    condition = rule.get('condition') or {}
+    if isinstance(condition, str):
+        try:
+            condition = json.loads(condition)
+        except ValueError:
+            condition = {}
+    return condition
+
+
+class MinuteRing:
+    """Fixed-size ring of per-minute counters."""
+
+    __slots__ = ("size", "minutes", "counts")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.minutes = [-1] * size
+        self.counts = [0] * size
+
+    def add(self, minute: int, count: int = 1) -> None:
+        i = minute % self.size
+        if self.minutes[i] != minute:
+            if self.minutes[i] > minute:
+                # Slot already reused by a newer minute: too old to count
+                return
+            self.minutes[i] = minute
+            self.counts[i] = 0
+        self.counts[i] += count
+
+    def total(self, now_minute: int, window: int) -> int:
+        """Occurrences in the ``window`` minutes ending at ``now_minute``."""
+        total = 0
+        for minute in range(now_minute - min(window, self.size) + 1, now_minute + 1):
+            i = minute % self.size
+            if self.minutes[i] == minute:
+                total += self.counts[i]
+        return total
+
+    def latest(self) -> int:
+        return max(self.minutes)
+
+
+class _FingerprintState:
+    __slots__ = ("first_seen", "task_created", "active")
+
+    def __init__(self, first_seen: Optional[int] = None, task_created: bool = False, active: bool = True):
+        self.first_seen = first_seen
+        self.task_created = task_created
+        self.active = active
+
+
+class AlertWindows:
+    """Per-fingerprint occurrence windows and the one-pass rule evaluator."""
+
+    def __init__(self, horizon_minutes: int = ALERT_WINDOW_MINUTES):
+        self.horizon = max(RECENT_WINDOW_MINUTES, horizon_minutes)
+        self._lock = threading.Lock()
+        self._occurrences: Dict[str, MinuteRing] = {}
+        self._critical: Dict[str, MinuteRing] = {}
+        self._state: Dict[str, _FingerprintState] = {}
+        self.loaded = False
+        self._state_loaded_at = 0.0
+
+    # ------------------------------------------------------------------ #
+    # Stream input
+    # ------------------------------------------------------------------ #
+
+    def record(self, fingerprint_id: str, occurred_at: Any = None, level: Optional[str] = None, count: int = 1) -> None:
+        """Count one occurrence of a fingerprint."""
+        minute = _to_minute(occurred_at) if occurred_at is not None else None
+        if minute is None:
+            minute = int(time.time() // 60)
+        fingerprint_id = str(fingerprint_id)
+        with self._lock:
+            ring = self._occurrences.get(fingerprint_id)
+            if ring is None:
+                ring = self._occurrences[fingerprint_id] = MinuteRing(self.horizon)
+            ring.add(minute, count)
+            if level and level.upper() == 'CRITICAL':
+                critical = self._critical.get(fingerprint_id)
+                if critical is None:
+                    critical = self._critical[fingerprint_id] = MinuteRing(self.horizon)
+                critical.add(minute, count)
+            if fingerprint_id not in self._state:
+                self._state[fingerprint_id] = _FingerprintState()
+
+    def track_fingerprint(self, fingerprint_id: str, first_seen: Any = None,
+                          task_created: bool = False, status: str = 'active') -> None:
+        """Register a fingerprint and its current state (task_created / status)."""
+        if isinstance(task_created, str):
+            task_created = task_created.lower() in ('t', 'true', '1')
+        with self._lock:
+            self._state[str(fingerprint_id)] = _FingerprintState(
+                _to_minute(first_seen), bool(task_created), status == 'active'
+            )
+
+    def mark_task_created(self, fingerprint_id: str) -> None:
+        with self._lock:
+            state = self._state.get(str(fingerprint_id))
+            if state is not None:
+                state.task_created = True
+
+    def set_status(self, fingerprint_id: str, status: str) -> None:
+        with self._lock:
+            state = self._state.get(str(fingerprint_id))
+            if state is not None:
+                state.active = status == 'active'
+
+    # ------------------------------------------------------------------ #
+    # Bootstrap / refresh
+    # ------------------------------------------------------------------ #
+
+    def load(self, fetch: Callable[..., List[Dict[str, Any]]]) -> None:
+        """Rebuild the windows from the last ``horizon`` minutes in the database."""
+        since = (datetime.now(timezone.utc) - timedelta(minutes=self.horizon)).isoformat()
+        occurrences = fetch("""
+            SELECT fingerprint_id, date_trunc('minute', occurred_at) AS minute, COUNT(*) AS n
+            FROM error_occurrences
+            WHERE occurred_at > %s
+            GROUP BY 1, 2
+        """, (since,))
+        critical = fetch("""
+            SELECT f.id AS fingerprint_id, date_trunc('minute', l.timestamp) AS minute, COUNT(*) AS n
+            FROM railway_logs l
+            JOIN error_fingerprints f ON f.fingerprint = l.fingerprint
+            WHERE l.log_level = 'CRITICAL' AND l.timestamp > %s
+            GROUP BY 1, 2
+        """, (since,))
+        states = self._fetch_states(fetch)
+
+        with self._lock:
+            self._occurrences.clear()
+            self._critical.clear()
+            for rows, rings in ((occurrences, self._occurrences), (critical, self._critical)):
+                for row in rows:
+                    minute = _to_minute(row.get('minute'))
+                    if minute is None:
+                        continue
+                    fingerprint_id = str(row['fingerprint_id'])
+                    ring = rings.get(fingerprint_id)
+                    if ring is None:
+                        ring = rings[fingerprint_id] = MinuteRing(self.horizon)
+                    ring.add(minute, int(row.get('n') or 0))
+            self._apply_states(states, replace=True)
+            self.loaded = True
+        logger.info(f"Alert windows loaded: {len(self._occurrences)} fingerprints, "
+                    f"{len(occurrences)} occurrence buckets")
+
+    def refresh_state(self, fetch: Callable[..., List[Dict[str, Any]]]) -> None:
+        """Re-read task_created/status for recently seen fingerprints."""
+        states = self._fetch_states(fetch)
+        with self._lock:
+            self._apply_states(states, replace=False)
+
+    def _fetch_states(self, fetch: Callable[..., List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        since = (datetime.now(timezone.utc) - timedelta(minutes=self.horizon)).isoformat()
+        rows = fetch("""
+            SELECT id, first_seen, task_created, status
+            FROM error_fingerprints
+            WHERE last_seen > %s OR first_seen > %s
+        """, (since, since))
+        self._state_loaded_at = time.time()
+        return rows
+
+    def _apply_states(self, rows: List[Dict[str, Any]], replace: bool) -> None:
+        if replace:
+            self._state.clear()
+        for row in rows:
+            task_created = row.get('task_created')
+            if isinstance(task_created, str):
+                task_created = task_created.lower() in ('t', 'true', '1')
+            self._state[str(row['id'])] = _FingerprintState(
+                _to_minute(row.get('first_seen')), bool(task_created), row.get('status') == 'active'
+            )
+
+    def ensure_fresh(self, fetch: Callable[..., List[Dict[str, Any]]]) -> bool:
+        """Bootstrap on first use, then refresh fingerprint state periodically.
+
+        Returns False if the windows could not be loaded.
+        """
+        try:
+            if not self.loaded:
+                self.load(fetch)
+            elif time.time() - self._state_loaded_at > STATE_REFRESH_SECONDS:
+                self.refresh_state(fetch)
+        except Exception as e:
+            logger.exception(f"Error loading alert windows: {e}")
+        return self.loaded
+
+    # ------------------------------------------------------------------ #
+    # Evaluation
+    # ------------------------------------------------------------------ #
+
+    def evaluate(self, rules: List[Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, List[str]]:
+        """Evaluate all rules against all live fingerprints in one pass.
+
+        Returns:
+            Dict mapping rule IDs to lists of triggered fingerprint IDs
+        """
+        now_minute = _to_minute(now or datetime.now(timezone.utc))
+        checks = []
+        for rule in rules:
+            rule_type = rule.get('rule_type')
+            condition = _rule_condition(rule)
+            if rule_type == 'spike':
+                window = int(condition.get('window_minutes', 5))
+                threshold = int(condition.get('rate_per_minute', 10)) * window
+            elif rule_type == 'sustained':
+                window = int(condition.get('duration_minutes', 5))
+                threshold = int(condition.get('min_occurrences', 3))
+            elif rule_type in ('new_fingerprint', 'critical'):
+                window, threshold = RECENT_WINDOW_MINUTES, 1
+            else:
+                logger.warning(f"Unknown rule type: {rule_type}")
+                continue
+            checks.append((str(rule['id']), rule_type, min(window, self.horizon), threshold))
+
+        triggered: Dict[str, List[str]] = {rule_id: [] for rule_id, _, _, _ in checks}
+        stale_before = now_minute - self.horizon
+        with self._lock:
+            for fingerprint_id, state in list(self._state.items()):
+                ring = self._occurrences.get(fingerprint_id)
+                if ring is None or ring.latest() <= stale_before:
+                    ring = None
+                    self._occurrences.pop(fingerprint_id, None)
+                    self._critical.pop(fingerprint_id, None)
+                    if state.first_seen is None or state.first_seen <= stale_before:
+                        # Nothing left in the window: forget it
+                        del self._state[fingerprint_id]
+                        continue
+                if state.task_created or not state.active:
+                    continue
+
+                totals: Dict[int, int] = {}
+                for rule_id, rule_type, window, threshold in checks:
+                    if rule_type == 'new_fingerprint':
+                        hit = state.first_seen is not None and state.first_seen > now_minute - window
+                    elif rule_type == 'critical':
+                        critical = self._critical.get(fingerprint_id)
+                        hit = critical is not None and critical.total(now_minute, window) > 0
+                    elif ring is None:
+                        hit = False
+                    else:
+                        if window not in totals:
+                            totals[window] = ring.total(now_minute, window)
+                        hit = totals[window] >= threshold
+                    if hit:
+                        triggered[rule_id].append(fingerprint_id)
+
+        return {rule_id: ids for rule_id, ids in triggered.items() if ids}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "horizon_minutes": self.horizon,
+            "fingerprints": len(self._state),
+            "with_occurrences": len(self._occurrences),
+        }
+
+
+# Singleton instance
+_alert_windows: Optional[AlertWindows] = None
+_alert_windows_lock = threading.Lock()
+
+
+def get_alert_windows() -> AlertWindows:
+    """Get or create the process-wide alert windows."""
+    global _alert_windows
+    if _alert_windows is None:
+        with _alert_windows_lock:
+            if _alert_windows is None:
+                _alert_windows = AlertWindows()
+    return _alert_windows
+
+
+__all__ = ["AlertWindows", "MinuteRing", "get_alert_windows", "ALERT_WINDOW_MINUTES"]
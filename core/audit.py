@@ -5,6 +5,12 @@ This module provides functions for logging auditable events with an immutable
 hash chain to ensure log integrity. Each audit log entry includes a hash of
 the previous entry, creating a tamper-evident chain.
 
+Events are buffered and written in signed, hash-chained segments (see
+core.audit_chain). audit_log() returns once its event's segment is written,
+so concurrent callers share one write and each still learns whether its
+event was persisted; verification only re-checks segments written since the
+last verified checkpoint unless a full check is requested.
+
 Usage:
     from core.audit import audit_log
     
@@ -23,13 +29,14 @@ Usage:
     )
 """
 
-import json
+import asyncio
 import logging
 import hashlib
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Union
 from uuid import UUID, uuid4
 
+from .audit_chain import AuditChainVerifier, get_audit_writer
 from .database import query_db
 
 logger = logging.getLogger(__name__)
@@ -79,11 +86,15 @@ async def audit_log(
         ip_address: Optional IP address of the actor
         user_agent: Optional user agent of the actor
         
+    The event is written with the next segment (at most the writer's flush
+    interval away, sooner if the segment fills); the call returns only once
+    that write has succeeded.
+    
     Returns:
-        ID of the created audit log entry
+        ID of the persisted audit log entry
         
     Raises:
-        AuditError: If audit logging fails
+        AuditError: If the event is invalid or could not be written
     """
     log_id = str(uuid4())
     
@@ -94,46 +105,51 @@ async def audit_log(
         if isinstance(session_id, UUID):
             session_id = str(session_id)
         
-        # Execute insert query
-        result = await query_db(
-            """
-            INSERT INTO audit_log (
-                id, event_type, actor_type, actor_id, action,
-                resource_type, resource_id, action_details,
-                prev_state, new_state, success, error_message,
-                duration_ms, cost_usd, request_id, session_id,
-                ip_address, user_agent
-            ) VALUES (
-                $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18
-            )
-            RETURNING id, current_hash
-            """,
-            [
-                log_id, event_type, actor_type, actor_id, action,
-                resource_type, resource_id, 
-                json.dumps(action_details) if action_details else None,
-                json.dumps(prev_state) if prev_state else None,
-                json.dumps(new_state) if new_state else None,
-                success, error_message, duration_ms, cost_usd,
-                request_id, session_id, ip_address, user_agent
-            ]
-        )
-        
-        if not result or "rows" not in result or not result["rows"]:
-            raise AuditError("Failed to insert audit log entry")
-        
-        current_hash = result["rows"][0].get("current_hash")
-        logger.debug(f"Audit log entry created: {log_id}, hash: {current_hash}")
+        writer = get_audit_writer()
+        written = writer.submit_and_track({
+            "id": log_id,
+            "event_type": event_type,
+            "actor_type": actor_type,
+            "actor_id": actor_id,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "action_details": action_details or None,
+            "prev_state": prev_state or None,
+            "new_state": new_state or None,
+            "success": success,
+            "error_message": error_message,
+            "duration_ms": duration_ms,
+            "cost_usd": cost_usd,
+            "request_id": request_id,
+            "session_id": session_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })
+        if writer.pending() >= writer.segment_size or writer.flush_interval <= 0:
+            try:
+                await asyncio.to_thread(writer.flush)
+            except Exception:
+                pass  # the error reaches us through ``written``
+        await asyncio.wrap_future(written)
         
+        logger.debug(f"Audit log entry written: {log_id}")
         return log_id
     except Exception as e:
         logger.error(f"Failed to create audit log entry: {e}")
         raise AuditError(f"Failed to create audit log entry: {e}")
 
-async def verify_audit_log_integrity() -> Dict[str, Any]:
+async def verify_audit_log_integrity(full: bool = False) -> Dict[str, Any]:
     """
     Verify the integrity of the audit log chain.
     
+    Pending events are flushed first. By default only segments written since
+    the last verified checkpoint are re-checked.
+    
+    Args:
+        full: Re-check every segment and the legacy (pre-segment) chain
+    
     Returns:
         Dict with verification results
         
@@ -141,24 +157,20 @@ async def verify_audit_log_integrity() -> Dict[str, Any]:
         AuditError: If verification fails
     """
     try:
-        result = await query_db(
-            """
-            SELECT * FROM verify_audit_log_integrity()
-            """,
-            []
-        )
-        
-        if not result or "rows" not in result:
-            raise AuditError("Failed to verify audit log integrity")
+        await asyncio.to_thread(get_audit_writer().flush)
+        report = await asyncio.to_thread(AuditChainVerifier().verify, full)
         
-        invalid_entries = [row for row in result["rows"] if not row.get("hash_valid", True)]
+        if full:
+            # Rows written by the old per-row trigger
+            result = await asyncio.to_thread(query_db, "SELECT * FROM verify_audit_log_integrity()", [])
+            if not result or "rows" not in result:
+                raise AuditError("Failed to verify audit log integrity")
+            legacy_invalid = [row for row in result["rows"] if not row.get("hash_valid", True)]
+            report["invalid_entries"] = legacy_invalid + report["invalid_entries"]
+            report["valid"] = not report["invalid_entries"]
+            report["total_entries"] += max(0, len(result["rows"]) - 1)
         
-        return {
-            "valid": len(invalid_entries) == 0,
-            "invalid_entries": invalid_entries,
-            "total_entries": len(result["rows"]),
-            "verified_at": datetime.now().isoformat()
-        }
+        return report
     except Exception as e:
         logger.error(f"Failed to verify audit log integrity: {e}")
         raise AuditError(f"Failed to verify audit log integrity: {e}")
@@ -0,0 +1,599 @@
+"""
+Batched, segment-checkpointed audit hash chain.
+
+audit_log() used to insert one row per event and let a database trigger
+chain the hashes; verify_audit_log_integrity() re-walked the whole table on
+every check. This module moves both into batches:
+
+- AuditSegmentWriter buffers events and writes them in ordered segments.
+  The chain is computed client-side: every row stores ``prev_hash`` and
+  ``current_hash = sha256(prev_hash | canonical row)``, and a segment is
+  written with one statement (checkpoint row + multi-row INSERT).
+- Each segment gets a checkpoint in audit_segments (seq range, row count,
+  start/end hash) signed with HMAC-SHA256 under AUDIT_SIGNING_KEY.
+- AuditChainVerifier re-checks only segments written since the last
+  verified checkpoint (``full=True`` re-checks everything) and marks the
+  ones that pass as verified.
+
+Concurrent writers in other processes are serialized by the checkpoint's
+primary key: a conflicting segment id fails the whole statement, the
+writer reloads the chain head and rebuilds the segment.
+
+Events are type-checked when submitted (UUID and INET columns), so the
+caller gets the error. If the database still rejects a segment's data, the
+events are written one per segment and any it rejects on its own is moved to
+the dead-letter log instead of blocking every later event.
+
+submit_and_track() returns a future resolved once the event's segment is
+written (or has failed), so a caller can wait for persistence while its event
+still shares a segment with concurrent ones.
+
+Schema: migrations/018_audit_segments.sql
+"""
+
+import atexit
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from decimal import Decimal
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+dead_letter_logger = logging.getLogger(f"{__name__}.dead_letter")
+
+GENESIS_HASH = "GENESIS"
+
+# Events per segment (one INSERT and one checkpoint each)
+AUDIT_SEGMENT_SIZE = int(os.getenv("AUDIT_SEGMENT_SIZE", "100"))
+
+# Seconds a partial segment may wait before the background flush
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "2.0"))
+
+# Columns written per event, in INSERT order
+AUDIT_COLUMNS = (
+    "id", "event_type", "actor_type", "actor_id", "action",
+    "resource_type", "resource_id", "action_details",
+    "prev_state", "new_state", "success", "error_message",
+    "duration_ms", "cost_usd", "request_id", "session_id",
+    "ip_address", "user_agent", "created_at",
+)
+_JSON_COLUMNS = frozenset({"action_details", "prev_state", "new_state"})
+_UUID_COLUMNS = frozenset({"id", "request_id", "session_id"})
+_INET_COLUMNS = frozenset({"ip_address"})
+
+# Database errors caused by an event's values rather than by the database
+_DATA_ERROR_MARKERS = (
+    "invalid input syntax", "invalid input value", "out of range",
+    "value too long", "violates check constraint", "violates not-null constraint",
+    "malformed",
+)
+
+# Rejected events kept in memory for inspection (all are also logged)
+MAX_DEAD_LETTERS = 100
+
+_warned_unsigned = False
+
+
+def _signing_key() -> bytes:
+    global _warned_unsigned
+    key = os.getenv("AUDIT_SIGNING_KEY", "")
+    if not key and not _warned_unsigned:
+        logger.warning("AUDIT_SIGNING_KEY not set: audit checkpoints only detect accidental corruption")
+        _warned_unsigned = True
+    return key.encode()
+
+
+def _epoch_micros(value: Any) -> int:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(round(value.timestamp() * 1_000_000))
+
+
+def _canonical(column: str, value: Any) -> Any:
+    """Column value in a form that survives the database round trip."""
+    if value is None:
+        return None
+    if column in _JSON_COLUMNS:
+        return json.loads(value) if isinstance(value, str) else value
+    if column == "created_at":
+        return _epoch_micros(value)
+    if column == "cost_usd":
+        return f"{Decimal(str(value)):.4f}"
+    if column == "duration_ms":
+        return int(value)
+    if column == "success":
+        return value.lower() in ("t", "true", "1") if isinstance(value, str) else bool(value)
+    if column in _UUID_COLUMNS:
+        return str(value).lower()
+    return str(value)
+
+
+def _literal(value: Any) -> str:
+    """SQL literal; strings use E'' so escaped backslashes read back unchanged."""
+    from .database import escape_sql_value
+
+    literal = escape_sql_value(value)
+    return f"E{literal}" if literal.startswith("'") else literal
+
+
+def validate_event(event: Dict[str, Any]) -> None:
+    """Raise ValueError if a UUID or INET column holds a value Postgres would reject."""
+    for column in _UUID_COLUMNS:
+        value = event.get(column)
+        if value is not None and not isinstance(value, UUID):
+            try:
+                UUID(str(value))
+            except ValueError:
+                raise ValueError(f"{column} is not a UUID: {value!r}") from None
+    for column in _INET_COLUMNS:
+        value = event.get(column)
+        if value is not None:
+            try:
+                ipaddress.ip_interface(str(value))
+            except ValueError:
+                raise ValueError(f"{column} is not an IP address: {value!r}") from None
+
+
+def _is_data_error(error: Exception) -> bool:
+    if type(error).__name__ in ("DataError", "InvalidTextRepresentation"):
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in _DATA_ERROR_MARKERS)
+
+
+def compute_row_hash(prev_hash: str, chain_seq: int, row: Dict[str, Any]) -> str:
+    """Hash of one audit row chained to ``prev_hash``."""
+    payload = json.dumps(
+        [int(chain_seq)] + [_canonical(c, row.get(c)) for c in AUDIT_COLUMNS],
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(f"{prev_hash}|{payload}".encode()).hexdigest()
+
+
+def sign_segment(segment: Dict[str, Any], key: Optional[bytes] = None) -> str:
+    """HMAC-SHA256 over a segment checkpoint."""
+    message = "|".join(str(segment[k]) for k in
+                       ("id", "first_seq", "last_seq", "row_count", "start_hash", "end_hash"))
+    return hmac.new(_signing_key() if key is None else key, message.encode(), hashlib.sha256).hexdigest()
+
+
+def build_segment(
+    segment_id: int, first_seq: int, start_hash: str, events: List[Dict[str, Any]]
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Chain ``events`` after ``start_hash``; returns (checkpoint, rows)."""
+    rows = []
+    prev_hash = start_hash
+    for offset, event in enumerate(events):
+        seq = first_seq + offset
+        current = compute_row_hash(prev_hash, seq, event)
+        rows.append({**event, "segment_id": segment_id, "chain_seq": seq,
+                     "prev_hash": prev_hash, "current_hash": current})
+        prev_hash = current
+    segment = {
+        "id": segment_id,
+        "first_seq": first_seq,
+        "last_seq": first_seq + len(events) - 1,
+        "row_count": len(events),
+        "start_hash": start_hash,
+        "end_hash": prev_hash,
+    }
+    segment["signature"] = sign_segment(segment)
+    return segment, rows
+
+
+class AuditSegmentWriter:
+    """Buffers audit events and writes them as hash-chained segments."""
+
+    def __init__(
+        self,
+        query_fn: Optional[Callable[..., Dict[str, Any]]] = None,
+        segment_size: int = AUDIT_SEGMENT_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+    ):
+        if query_fn is None:
+            from .database import query_db as query_fn
+        self._query = query_fn
+        self.segment_size = max(1, segment_size)
+        self.flush_interval = flush_interval
+
+        self._pending: List[Dict[str, Any]] = []
+        # event id -> future of a caller waiting for that event to be written
+        self._waiters: Dict[str, "Future[None]"] = {}
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._head: Optional[Tuple[int, int, str]] = None  # (last segment id, last seq, end hash)
+
+        self.segments_written = 0
+        self.rows_written = 0
+        self.conflicts = 0
+        self.dead_letters: Deque[Dict[str, Any]] = deque(maxlen=MAX_DEAD_LETTERS)
+        self.dead_lettered = 0
+
+    # ------------------------------------------------------------------ #
+    # Buffering
+    # ------------------------------------------------------------------ #
+
+    def submit(self, event: Dict[str, Any], flush_when_full: bool = True) -> bool:
+        """Queue one event (a dict keyed by AUDIT_COLUMNS).
+
+        Returns True if a full segment is waiting. With ``flush_when_full``
+        it is written right away; async callers pass False and run flush()
+        off the event loop instead.
+
+        Raises:
+            ValueError: if a UUID or INET column holds an invalid value
+        """
+        validate_event(event)
+        with self._cond:
+            self._pending.append(event)
+            full = len(self._pending) >= self.segment_size
+            if self.flush_interval > 0 and (self._thread is None or not self._thread.is_alive()):
+                self._stopped = False
+                self._thread = threading.Thread(target=self._loop, name="audit-writer", daemon=True)
+                self._thread.start()
+        if full and flush_when_full:
+            self.flush()
+        return full
+
+    def submit_and_track(self, event: Dict[str, Any]) -> "Future[None]":
+        """Queue one event and return a future resolved when it is written.
+
+        The future fails with the write error if the segment cannot be
+        written (the event is then dropped from the queue rather than
+        retried behind the caller's back) and with ValueError if the
+        database rejects the event itself.
+
+        Raises:
+            ValueError: if a UUID or INET column holds an invalid value
+        """
+        future: "Future[None]" = Future()
+        with self._cond:
+            self._waiters[str(event.get("id"))] = future
+        try:
+            self.submit(event, flush_when_full=False)
+        except Exception:
+            with self._cond:
+                self._waiters.pop(str(event.get("id")), None)
+            raise
+        return future
+
+    def _resolve(self, events: Iterable[Dict[str, Any]], error: Optional[Exception] = None) -> None:
+        """Settle waiters for written (or failed) events; failed waited-on events leave the queue."""
+        settled = []
+        with self._cond:
+            for event in events:
+                future = self._waiters.pop(str(event.get("id")), None)
+                if future is not None:
+                    settled.append((event, future))
+            if error is not None and settled:
+                failed = {id(event) for event, _ in settled}
+                self._pending = [e for e in self._pending if id(e) not in failed]
+        for _, future in settled:
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                # Only stop() notifies; submit() leaves partial segments to the timer
+                self._cond.wait(timeout=self.flush_interval)
+                if self._stopped:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Audit flush failed, will retry: {e}")
+
+    # ------------------------------------------------------------------ #
+    # Writing
+    # ------------------------------------------------------------------ #
+
+    def flush(self) -> int:
+        """Write all pending events as segments; returns rows written.
+
+        Events that could not be written stay queued (in order) and the
+        error is raised. If the database rejects a segment's data, its
+        events are retried one by one and the ones rejected on their own
+        are dead-lettered.
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    batch = self._pending[:self.segment_size]
+                if not batch:
+                    return written
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    self._head = None
+                    if not _is_data_error(e):
+                        self._resolve(batch, e)
+                        raise
+                    written += self._write_singly(batch)
+                    continue
+                with self._cond:
+                    del self._pending[:len(batch)]
+                self._resolve(batch)
+                written += len(batch)
+
+    def _write_singly(self, batch: List[Dict[str, Any]]) -> int:
+        """Write the head of the queue one event per segment (caller holds the flush lock)."""
+        written = 0
+        for i, event in enumerate(batch):
+            try:
+                self._write_batch([event])
+                written += 1
+            except Exception as e:
+                self._head = None
+                if not _is_data_error(e):
+                    self._resolve(batch[i:], e)
+                    raise
+                self._dead_letter(event, e)
+                with self._cond:
+                    del self._pending[0]
+                self._resolve([event], ValueError(f"Audit event rejected by the database: {e}"))
+                continue
+            with self._cond:
+                del self._pending[0]
+            self._resolve([event])
+        return written
+
+    def _dead_letter(self, event: Dict[str, Any], error: Exception) -> None:
+        self.dead_lettered += 1
+        self.dead_letters.append({"event": event, "error": str(error)})
+        dead_letter_logger.error(
+            "Audit event rejected by the database: %s | %s",
+            error, json.dumps(event, sort_keys=True, default=str),
+        )
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        for attempt in range(3):
+            if self._head is None:
+                self._head = self._load_head()
+            last_id, last_seq, end_hash = self._head
+            segment, rows = build_segment(last_id + 1, last_seq + 1, end_hash, batch)
+            try:
+                self._write_segment(segment, rows)
+            except Exception as e:
+                if attempt < 2 and "duplicate key" in str(e).lower():
+                    # Another writer took this segment id: rebuild on the new head
+                    self.conflicts += 1
+                    self._head = None
+                    continue
+                raise
+            self._head = (segment["id"], segment["last_seq"], segment["end_hash"])
+            self.segments_written += 1
+            self.rows_written += len(rows)
+            return
+
+    def _load_head(self) -> Tuple[int, int, str]:
+        result = self._query(
+            "SELECT id, last_seq, end_hash FROM audit_segments ORDER BY id DESC LIMIT 1"
+        )
+        rows = result.get("rows") or []
+        if rows:
+            return int(rows[0]["id"]), int(rows[0]["last_seq"]), rows[0]["end_hash"]
+        # First segment continues the legacy trigger-built chain
+        result = self._query(
+            "SELECT current_hash FROM audit_log WHERE chain_seq IS NULL ORDER BY created_at DESC LIMIT 1"
+        )
+        rows = result.get("rows") or []
+        return 0, 0, (rows[0].get("current_hash") if rows else None) or GENESIS_HASH
+
+    def _write_segment(self, segment: Dict[str, Any], rows: List[Dict[str, Any]]) -> None:
+        """Checkpoint and rows in one statement (both or neither)."""
+        columns = AUDIT_COLUMNS + ("segment_id", "chain_seq", "prev_hash", "current_hash")
+        values = []
+        for row in rows:
+            cells = []
+            for column in columns:
+                value = row.get(column)
+                if column in _JSON_COLUMNS and value is not None:
+                    cells.append(f"{_literal(value)}::jsonb")
+                else:
+                    cells.append(_literal(value))
+            values.append(f"({', '.join(cells)})")
+        checkpoint = ", ".join(_literal(segment[k]) for k in
+                               ("id", "first_seq", "last_seq", "row_count", "start_hash", "end_hash", "signature"))
+        self._query(f"""
+            WITH segment AS (
+                INSERT INTO audit_segments (id, first_seq, last_seq, row_count, start_hash, end_hash, signature)
+                VALUES ({checkpoint})
+                RETURNING id
+            ), inserted AS (
+                INSERT INTO audit_log ({', '.join(columns)})
+                VALUES {', '.join(values)}
+                RETURNING id
+            )
+            SELECT (SELECT id FROM segment) AS segment_id, (SELECT COUNT(*) FROM inserted) AS row_count
+        """)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self.pending(),
+            "segments_written": self.segments_written,
+            "rows_written": self.rows_written,
+            "conflicts": self.conflicts,
+            "dead_lettered": self.dead_lettered,
+        }
+
+
+class AuditChainVerifier:
+    """Incremental verification of segment checkpoints and their rows."""
+
+    def __init__(self, query_fn: Optional[Callable[..., Dict[str, Any]]] = None):
+        if query_fn is None:
+            from .database import query_db as query_fn
+        self._query = query_fn
+
+    def _fetch_segments(self, full: bool) -> List[Dict[str, Any]]:
+        if full:
+            sql = "SELECT * FROM audit_segments ORDER BY id"
+        else:
+            # Last verified checkpoint (the trusted anchor) and everything after it
+            sql = """
+                SELECT * FROM audit_segments
+                WHERE id >= COALESCE((SELECT MAX(id) FROM audit_segments WHERE verified_at IS NOT NULL), 0)
+                ORDER BY id
+            """
+        return self._query(sql).get("rows") or []
+
+    def _fetch_rows(self, first_seq: int) -> List[Dict[str, Any]]:
+        return self._query(
+            "SELECT * FROM audit_log WHERE chain_seq >= $1 ORDER BY chain_seq", [first_seq]
+        ).get("rows") or []
+
+    def _mark_verified(self, segment_ids: List[int]) -> None:
+        if segment_ids:
+            self._query(
+                f"UPDATE audit_segments SET verified_at = NOW() WHERE id IN ({', '.join(str(int(i)) for i in segment_ids)})"
+            )
+
+    def verify(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Verify checkpoints and rows.
+
+        Args:
+            full: Re-check every segment instead of only unverified ones
+
+        Returns:
+            Dict with valid, invalid_entries, total_entries, segments_checked
+        """
+        key = _signing_key()
+        segments = self._fetch_segments(full)
+        invalid: List[Dict[str, Any]] = []
+
+        anchor = None
+        if segments and not full and segments[0].get("verified_at"):
+            anchor = segments.pop(0)
+            if not hmac.compare_digest(sign_segment(anchor, key), anchor.get("signature") or ""):
+                invalid.append(self._issue(anchor, None, "Checkpoint signature mismatch"))
+        rows = self._fetch_rows(int(segments[0]["first_seq"])) if segments else []
+
+        by_seq = {int(r["chain_seq"]): r for r in rows}
+        passed: List[int] = []
+        prev = anchor
+        for segment in segments:
+            issues = self._check_segment(segment, prev, by_seq, key)
+            invalid.extend(issues)
+            if not issues and not invalid:
+                passed.append(int(segment["id"]))
+            prev = segment
+
+        if segments:
+            # Rows past the last checkpoint were never part of a signed segment
+            last_seq = int(segments[-1]["last_seq"])
+            for seq in sorted(s for s in by_seq if s > last_seq):
+                invalid.append(self._issue(None, by_seq[seq], "Row outside any checkpoint"))
+
+        self._mark_verified(passed)
+        return {
+            "valid": not invalid,
+            "invalid_entries": invalid,
+            "total_entries": len(rows),
+            "segments_checked": len(segments),
+            "mode": "full" if full else "incremental",
+            "verified_at": datetime.now().isoformat(),
+        }
+
+    def _check_segment(self, segment: Dict[str, Any], prev: Optional[Dict[str, Any]],
+                       by_seq: Dict[int, Dict[str, Any]], key: bytes) -> List[Dict[str, Any]]:
+        issues = []
+        if not hmac.compare_digest(sign_segment(segment, key), segment.get("signature") or ""):
+            issues.append(self._issue(segment, None, "Checkpoint signature mismatch"))
+        first_seq, last_seq = int(segment["first_seq"]), int(segment["last_seq"])
+        if prev is not None:
+            if int(segment["id"]) != int(prev["id"]) + 1 or first_seq != int(prev["last_seq"]) + 1:
+                issues.append(self._issue(segment, None, "Missing segment before this checkpoint"))
+            if segment["start_hash"] != prev["end_hash"]:
+                issues.append(self._issue(segment, None, "Segment does not continue the previous one"))
+        if last_seq - first_seq + 1 != int(segment["row_count"]):
+            issues.append(self._issue(segment, None, "Checkpoint row count mismatch"))
+
+        running = segment["start_hash"]
+        for seq in range(first_seq, last_seq + 1):
+            row = by_seq.get(seq)
+            if row is None:
+                issues.append(self._issue(segment, None, f"Row {seq} missing"))
+                continue
+            if str(row.get("segment_id")) != str(segment["id"]):
+                issues.append(self._issue(segment, row, "Row assigned to another segment"))
+            if row.get("prev_hash") != running:
+                issues.append(self._issue(segment, row, "Previous hash mismatch"))
+            computed = compute_row_hash(running, seq, row)
+            if row.get("current_hash") != computed:
+                issues.append(self._issue(segment, row, "Current hash mismatch"))
+            running = computed
+        if running != segment["end_hash"]:
+            issues.append(self._issue(segment, None, "Segment end hash does not match checkpoint"))
+        return issues
+
+    @staticmethod
+    def _issue(segment: Optional[Dict[str, Any]], row: Optional[Dict[str, Any]], message: str) -> Dict[str, Any]:
+        return {
+            "id": row.get("id") if row else None,
+            "chain_seq": row.get("chain_seq") if row else None,
+            "segment_id": segment.get("id") if segment else (row.get("segment_id") if row else None),
+            "hash_valid": False,
+            "error_message": message,
+        }
+
+
+def _flush_at_exit(writer: AuditSegmentWriter) -> None:
+    try:
+        writer.flush()
+    except Exception as e:
+        logger.error(f"Audit events lost at exit ({writer.pending()} pending): {e}")
+
+
+# Singleton instance
+_audit_writer: Optional[AuditSegmentWriter] = None
+_audit_writer_lock = threading.Lock()
+
+
+def get_audit_writer(query_fn: Optional[Callable[..., Dict[str, Any]]] = None) -> AuditSegmentWriter:
+    """Get or create the process-wide audit segment writer."""
+    global _audit_writer
+    if _audit_writer is None:
+        with _audit_writer_lock:
+            if _audit_writer is None:
+                _audit_writer = AuditSegmentWriter(query_fn)
+                atexit.register(_flush_at_exit, _audit_writer)
+    return _audit_writer
+
+
+__all__ = [
+    "AuditSegmentWriter",
+    "AuditChainVerifier",
+    "build_segment",
+    "compute_row_hash",
+    "get_audit_writer",
+    "sign_segment",
+    "validate_event",
+    "AUDIT_COLUMNS",
+    "GENESIS_HASH",
+]
@@ -16,6 +16,7 @@ from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
 from core.database import query_db as _query, escape_sql_value as _format_value
+from core.schema_registry import get_schema_registry
 
 # Configure module logger
 logger = logging.getLogger(__name__)
@@ -83,13 +84,34 @@ class ConflictRecord:
 # LOCK TABLE INITIALIZATION
 # ============================================================
 
+# Bump when the DDL in ensure_tables_exist changes
+CONFLICT_SCHEMA_VERSION = 1
+
+CONFLICT_SCHEMA_COLUMNS = {
+    "resource_locks": ["id", "resource_type", "resource_id", "worker_id", "priority",
+                       "acquired_at", "expires_at", "status", "metadata", "created_at"],
+    "conflict_log": ["id", "resource_type", "resource_id", "requesting_worker", "holding_worker",
+                     "requesting_priority", "holding_priority", "resolution", "resolved_at",
+                     "escalated", "escalation_id", "metadata", "created_at"],
+}
+CONFLICT_SCHEMA_INDEXES = ("idx_resource_locks_lookup", "idx_resource_locks_unique_active")
+
+
 def ensure_tables_exist() -> bool:
     """
     Ensure the resource_locks and conflict_log tables exist.
     
+    Runs the DDL at most once per process, and not at all when the schema
+    registry already shows the tables and indexes.
+    
     Returns:
         True if tables exist or were created successfully, False otherwise
     """
+    registry = get_schema_registry()
+    if registry.is_ensured("conflict_tables", CONFLICT_SCHEMA_VERSION,
+                           columns=CONFLICT_SCHEMA_COLUMNS, indexes=CONFLICT_SCHEMA_INDEXES):
+        return True
+    
     create_locks_sql = """
     CREATE TABLE IF NOT EXISTS resource_locks (
         id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -141,6 +163,7 @@ def ensure_tables_exist() -> bool:
         _query(create_conflicts_sql)
         _query(create_index_sql)
         _query(create_unique_index_sql)
+        registry.mark_ensured("conflict_tables", CONFLICT_SCHEMA_VERSION)
         logger.info("Conflict management tables verified/created")
         return True
     except (urllib.error.HTTPError, urllib.error.URLError) as e:
@@ -0,0 +1,504 @@
+"""
+Context Window - token counting, per-model budgets and history compaction
+
+BrainService used to estimate tokens as ``len(text) // 4`` and send every
+message of a tool loop in full, so each iteration resent a larger payload than
+the last. This module counts tokens properly and fits a conversation into a
+per-model input budget before every request.
+
+- Tokens are counted with ``tiktoken`` when it is installed and its encoding
+  is available locally; otherwise with a bundled offline counter that splits
+  text the way cl100k-style BPE tokenizers pre-tokenize it (letters, 1-3 digit
+  groups, punctuation runs, whitespace) and prices each piece. Counts are
+  cached by a digest of the message text, so the cache holds no copies of it.
+- The input budget is the model's context window minus the response
+  reservation, capped by BRAIN_MAX_INPUT_TOKENS so a 1M-token model doesn't
+  mean 1M-token requests.
+- ``ContextWindow.fit`` never changes the caller's list. The system prompt
+  (first message) and the latest user message are pinned. Older "Reasoning
+  Progress" notes and repeated tool calls are superseded, and every tool output
+  is capped. If the request is still over budget, old tool outputs are
+  summarised, then the oldest history is dropped, then old tool outputs are
+  replaced with a stub and the oldest tool exchanges dropped, and finally
+  recent tool outputs are truncated.
+
+Usage:
+    from core.context_window import ContextWindow, count_tokens
+
+    window = ContextWindow(model, max_output_tokens=4096)
+    request_messages, report = window.fit(messages, tools)
+    print(report.input_tokens, report.budget, report.as_dict())
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Chat formatting overhead (role markers, separators) per message and per reply
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_PRIMING_TOKENS = 3
+
+# Hard cap on input tokens per request, whatever the model's window
+BRAIN_MAX_INPUT_TOKENS = int(os.getenv("BRAIN_MAX_INPUT_TOKENS", "32000"))
+
+# Tokens kept back from the window in addition to the response reservation
+CONTEXT_SAFETY_MARGIN = 1024
+
+# Any single tool output is capped at this many tokens
+TOOL_RESULT_MAX_TOKENS = int(os.getenv("BRAIN_TOOL_RESULT_MAX_TOKENS", "4000"))
+
+# Tool outputs older than the most recent few are summarised to this size
+OLD_TOOL_RESULT_TOKENS = 300
+KEEP_RECENT_TOOL_RESULTS = 2
+
+# Context windows by model id or id prefix (longest prefix wins)
+MODEL_CONTEXT_WINDOWS = {
+    "deepseek/": 64_000,
+    "google/gemini": 1_048_576,
+    "qwen/": 131_072,
+    "moonshotai/kimi": 262_144,
+    "openai/gpt-4o": 128_000,
+    "openai/gpt-4.1": 1_047_576,
+    "meta-llama/": 131_072,
+    "mistralai/": 128_000,
+    "openrouter/auto": 128_000,
+}
+DEFAULT_CONTEXT_WINDOW = 32_768
+
+# Text counted once is remembered; messages are resent every iteration
+_COUNT_CACHE_SIZE = 4096
+_COUNT_CACHE_MIN_CHARS = 64
+
+REASONING_PROGRESS_PREFIX = "## Reasoning Progress"
+
+_PRETOKEN_RE = re.compile(
+    r"'(?:s|t|re|ve|m|ll|d)"
+    r"|(?:[^\r\n\w]|_)?[^\W\d_]+"
+    r"|\d{1,3}"
+    r"| ?(?:[^\s\w]|_)+[\r\n]*"
+    r"|\s*[\r\n]+"
+    r"|\s+(?!\S)"
+    r"|\s+",
+    re.IGNORECASE,
+)
+
+
+class _LRU:
+    """Small thread-safe LRU map."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+
+# Both caches are keyed by _text_key(text), never by the text itself
+_counts = _LRU(_COUNT_CACHE_SIZE)
+_compacted = _LRU(512)
+_encoding = None
+_encoding_failed = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """tiktoken's cl100k_base, or None when tiktoken or its encoding file is unavailable."""
+    global _encoding, _encoding_failed
+    if _encoding is None and TIKTOKEN_AVAILABLE and not _encoding_failed:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_failed:
+                try:
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:  # no cached encoding and no network
+                    _encoding_failed = True
+                    logger.info("tiktoken encoding unavailable, using the bundled token counter: %s", e)
+    return _encoding
+
+
+def _piece_tokens(piece: str) -> int:
+    """Tokens for one pre-tokenized piece under a cl100k-style vocabulary."""
+    stripped = piece.strip()
+    if not stripped:
+        return 1
+    if stripped[0].isdigit():
+        return 1
+    if stripped[-1].isalpha():
+        # At most one leading symbol or space merges into a word piece
+        letters = stripped if stripped[0].isalpha() else stripped[1:]
+        wide = sum(1 for c in letters if ord(c) >= 0x2E80)  # CJK: about a token per character
+        other = sum(1 for c in letters if 0x80 <= ord(c) < 0x2E80)
+        ascii_len = len(letters) - wide - other
+        tokens = wide + math.ceil(other / 2)
+        if ascii_len:
+            # Common words are single tokens; long identifiers split every ~7 characters
+            tokens += 1 + (ascii_len - 1) // 7
+        return max(1, tokens)
+    # Punctuation runs: pairs like '":' and '},' are single tokens; symbols outside ASCII are not
+    wide = sum(1 for c in stripped if ord(c) >= 0x80)
+    return max(1, math.ceil((len(stripped) - wide) / 2) + wide * 2)
+
+
+def _count_offline(text: str) -> int:
+    return sum(_piece_tokens(piece) for piece in _PRETOKEN_RE.findall(text))
+
+
+def _text_key(text: str) -> bytes:
+    """Fixed-size cache key for ``text``."""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def _count_uncached(text: str) -> int:
+    encoding = _get_encoding()
+    return len(encoding.encode(text, disallowed_special=())) if encoding is not None else _count_offline(text)
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in ``text`` (cached for long strings)."""
+    if not text:
+        return 0
+    if len(text) < _COUNT_CACHE_MIN_CHARS:
+        return _count_uncached(text)
+    key = _text_key(text)
+    cached = _counts.get(key)
+    if cached is not None:
+        return cached
+    count = _count_uncached(text)
+    _counts.put(key, count)
+    return count
+
+
+def _content_text(content: Any) -> str:
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, default=str)
+
+
+def count_message_tokens(message: Dict[str, Any]) -> int:
+    """Tokens one chat message costs, including tool calls and formatting overhead."""
+    tokens = MESSAGE_OVERHEAD_TOKENS + count_tokens(_content_text(message.get("content")))
+    if message.get("tool_calls"):
+        tokens += count_tokens(json.dumps(message["tool_calls"], default=str))
+    if message.get("name"):
+        tokens += count_tokens(str(message["name"]))
+    return tokens
+
+
+def count_request_tokens(messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> int:
+    """Input tokens for a chat-completions request with ``messages`` and ``tools``."""
+    total = REPLY_PRIMING_TOKENS + sum(count_message_tokens(m) for m in messages)
+    if tools:
+        total += count_tokens(json.dumps(tools, default=str))
+    return total
+
+
+def context_window_for(model: str) -> int:
+    """Context window of ``model`` in tokens."""
+    if model in MODEL_CONTEXT_WINDOWS:
+        return MODEL_CONTEXT_WINDOWS[model]
+    matches = [prefix for prefix in MODEL_CONTEXT_WINDOWS if model.startswith(prefix)]
+    return MODEL_CONTEXT_WINDOWS[max(matches, key=len)] if matches else DEFAULT_CONTEXT_WINDOW
+
+
+def input_budget_for(model: str, max_output_tokens: int = 0, max_input_tokens: Optional[int] = None) -> int:
+    """Input tokens a request to ``model`` may use, leaving room for the response."""
+    available = context_window_for(model) - max_output_tokens - CONTEXT_SAFETY_MARGIN
+    cap = BRAIN_MAX_INPUT_TOKENS if max_input_tokens is None else max_input_tokens
+    return max(1024, min(available, cap))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to about ``max_tokens`` tokens, noting what was removed."""
+    total = count_tokens(text)
+    if total <= max_tokens:
+        return text
+    marker = f"\n[... truncated from {total} tokens]"
+    keep = max(0, max_tokens - count_tokens(marker))
+    chars = int(len(text) * keep / total)
+    # Probed prefixes are never seen again, so they stay out of the count cache
+    while chars > 0 and _count_uncached(text[:chars]) > keep:
+        chars = int(chars * 0.9)
+    return text[:chars] + marker
+
+
+def _shrink(value: Any, items: int, chars: int, depth: int = 0) -> Any:
+    if isinstance(value, list):
+        if depth >= 3:
+            return f"[{len(value)} items]"
+        head = [_shrink(v, items, chars, depth + 1) for v in value[:items]]
+        if len(value) > items:
+            head.append(f"... {len(value) - items} more items")
+        return head
+    if isinstance(value, dict):
+        if depth >= 3:
+            return f"{{{len(value)} keys}}"
+        return {k: _shrink(v, items, chars, depth + 1) for k, v in value.items()}
+    if isinstance(value, str) and len(value) > chars:
+        return value[:chars] + "..."
+    return value
+
+
+def summarize_tool_output(text: str, max_tokens: int) -> str:
+    """
+    Shrink a tool result to about ``max_tokens`` tokens.
+
+    JSON results keep their structure with long lists cut to their first few
+    items (and a count of the rest) and long strings shortened; anything else,
+    or JSON that is still too long, is truncated.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    key = (_text_key(text), max_tokens)
+    cached = _compacted.get(key)
+    if cached is not None:
+        return cached
+    summary = None
+    try:
+        parsed = json.loads(text)
+    except (TypeError, ValueError):
+        parsed = None
+    if isinstance(parsed, (dict, list)):
+        for items, chars in ((5, 400), (3, 200), (1, 80)):
+            candidate = json.dumps(_shrink(parsed, items, chars), default=str)
+            if count_tokens(candidate) <= max_tokens:
+                summary = candidate
+                break
+    if summary is None:
+        summary = truncate_to_tokens(text, max_tokens)
+    _compacted.put(key, summary)
+    return summary
+
+
+@dataclass
+class ContextReport:
+    """What ``ContextWindow.fit`` sent and what it had to compact."""
+
+    input_tokens: int
+    original_tokens: int
+    budget: int
+    messages: int
+    superseded: int = 0
+    summarized: int = 0
+    dropped: int = 0
+    omitted: int = 0
+    truncated: int = 0
+
+    @property
+    def over_budget(self) -> bool:
+        return self.input_tokens > self.budget
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "input_tokens": self.input_tokens,
+            "original_tokens": self.original_tokens,
+            "budget": self.budget,
+            "messages": self.messages,
+            "superseded": self.superseded,
+            "summarized": self.summarized,
+            "dropped": self.dropped,
+            "omitted": self.omitted,
+            "truncated": self.truncated,
+            "over_budget": self.over_budget,
+        }
+
+
+class ContextWindow:
+    """Fits a chat conversation into a model's input token budget."""
+
+    def __init__(
+        self,
+        model: str,
+        max_output_tokens: int = 0,
+        max_input_tokens: Optional[int] = None,
+        tool_result_max_tokens: int = TOOL_RESULT_MAX_TOKENS,
+        old_tool_result_tokens: int = OLD_TOOL_RESULT_TOKENS,
+        keep_recent_tool_results: int = KEEP_RECENT_TOOL_RESULTS,
+    ):
+        """
+        Args:
+            model: model id, used to look up the context window
+            max_output_tokens: tokens reserved for the response
+            max_input_tokens: cap on input tokens (default BRAIN_MAX_INPUT_TOKENS)
+            tool_result_max_tokens: cap on any single tool output
+            old_tool_result_tokens: size older tool outputs are summarised to
+            keep_recent_tool_results: newest tool outputs exempt from summarising
+        """
+        self.model = model
+        self.budget = input_budget_for(model, max_output_tokens, max_input_tokens)
+        self.tool_result_max_tokens = tool_result_max_tokens
+        self.old_tool_result_tokens = old_tool_result_tokens
+        self.keep_recent_tool_results = keep_recent_tool_results
+
+    def _split_tool_results(self, messages: List[Dict[str, Any]]) -> Tuple[List[int], List[int]]:
+        """Indexes of (older, most recent) tool messages."""
+        indexes = [i for i, m in enumerate(messages) if m.get("role") == "tool"]
+        split = max(0, len(indexes) - self.keep_recent_tool_results)
+        return indexes[:split], indexes[split:]
+
+    def fit(
+        self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[List[Dict[str, Any]], ContextReport]:
+        """
+        Return the messages to send (a new list) and a report.
+
+        Tool outputs are shortened in place of being removed, so every tool
+        call in the result still has its matching tool message.
+        """
+        original_tokens = count_request_tokens(messages, tools)
+        out = [dict(m) for m in messages]
+        report = ContextReport(original_tokens, original_tokens, self.budget, len(out))
+
+        last_user = max((i for i, m in enumerate(out) if m.get("role") == "user"), default=len(out))
+        pinned = {0, last_user} if out and out[0].get("role") == "system" else {last_user}
+
+        # Superseded: older reasoning notes and older results of an identical call
+        progress = [i for i, m in enumerate(out) if i not in pinned and m.get("role") == "system"
+                    and str(m.get("content") or "").startswith(REASONING_PROGRESS_PREFIX)]
+        drop = set(progress[:-1])
+        report.superseded += len(drop)
+
+        call_keys: Dict[str, str] = {}
+        for m in out:
+            for call in m.get("tool_calls") or []:
+                func = call.get("function") or {}
+                call_keys[call.get("id", "")] = f"{func.get('name')}:{func.get('arguments')}"
+        tool_indexes = [i for i, m in enumerate(out) if m.get("role") == "tool"]
+        latest_for_key: Dict[str, int] = {}
+        for i in tool_indexes:
+            key = call_keys.get(out[i].get("tool_call_id", ""))
+            if key is not None:
+                latest_for_key[key] = i
+        for i in tool_indexes:
+            key = call_keys.get(out[i].get("tool_call_id", ""))
+            if key is not None and latest_for_key[key] != i:
+                out[i]["content"] = "[superseded by a later call with the same arguments]"
+                report.superseded += 1
+
+        # Every tool output is capped, however recent
+        for i in tool_indexes:
+            content = _content_text(out[i].get("content"))
+            capped = summarize_tool_output(content, self.tool_result_max_tokens)
+            if capped != content:
+                out[i]["content"] = capped
+                report.summarized += 1
+
+        out = [m for i, m in enumerate(out) if i not in drop]
+        old_tools, recent_tools = self._split_tool_results(out)
+
+        def total() -> int:
+            return count_request_tokens(out, tools)
+
+        # 1. Summarise older tool outputs
+        if total() > self.budget:
+            for i in old_tools:
+                content = _content_text(out[i].get("content"))
+                summary = summarize_tool_output(content, self.old_tool_result_tokens)
+                if summary != content:
+                    out[i]["content"] = summary
+                    report.summarized += 1
+
+        # 2. Drop the oldest plain history messages
+        if total() > self.budget:
+            system_first = bool(out) and out[0].get("role") == "system"
+            last_user = max((i for i, m in enumerate(out) if m.get("role") == "user"), default=len(out))
+            droppable = [i for i in range(1 if system_first else 0, last_user)
+                         if out[i].get("role") in ("user", "assistant") and not out[i].get("tool_calls")]
+            excess = total() - self.budget
+            removed = set()
+            for i in droppable:
+                if excess <= 0:
+                    break
+                excess -= count_message_tokens(out[i])
+                removed.add(i)
+            if removed:
+                report.dropped += len(removed)
+                out = [m for i, m in enumerate(out) if i not in removed]
+                old_tools, recent_tools = self._split_tool_results(out)
+
+        # 3. Replace older tool outputs with a stub
+        if total() > self.budget:
+            for i in old_tools:
+                tokens = count_tokens(_content_text(out[i].get("content")))
+                out[i]["content"] = f"[tool output omitted to fit the context window: {tokens} tokens]"
+                report.omitted += 1
+
+        # 4. Drop the oldest tool exchanges whole, the call together with its results
+        if total() > self.budget and old_tools:
+            recent_ids = {out[i].get("tool_call_id") for i in recent_tools}
+            excess = total() - self.budget
+            removed = set()
+            for i, m in enumerate(out):
+                if excess <= 0:
+                    break
+                ids = {call.get("id") for call in m.get("tool_calls") or []}
+                if not ids or ids & recent_ids:
+                    continue
+                group = [i] + [j for j in old_tools if out[j].get("tool_call_id") in ids]
+                excess -= sum(count_message_tokens(out[j]) for j in group)
+                removed.update(group)
+            if removed:
+                report.dropped += len(removed)
+                out = [m for i, m in enumerate(out) if i not in removed]
+                old_tools, recent_tools = self._split_tool_results(out)
+
+        # 5. Truncate the recent tool outputs, sharing what is left between them
+        if total() > self.budget and recent_tools:
+            others = total() - sum(count_tokens(_content_text(out[i].get("content"))) for i in recent_tools)
+            share = max(50, (self.budget - others) // len(recent_tools))
+            for i in recent_tools:
+                content = _content_text(out[i].get("content"))
+                shortened = truncate_to_tokens(content, share)
+                if shortened != content:
+                    out[i]["content"] = shortened
+                    report.truncated += 1
+
+        report.input_tokens = total()
+        report.messages = len(out)
+        if report.over_budget:
+            logger.warning("Request for %s is %d tokens after compaction (budget %d)",
+                           self.model, report.input_tokens, self.budget)
+        return out, report
+
+
+__all__ = [
+    "ContextReport",
+    "ContextWindow",
+    "TIKTOKEN_AVAILABLE",
+    "context_window_for",
+    "count_message_tokens",
+    "count_request_tokens",
+    "count_tokens",
+    "input_budget_for",
+    "summarize_tool_output",
+    "truncate_to_tokens",
+]
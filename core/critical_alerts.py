@@ -7,7 +7,10 @@ Integrates Slack notifications with critical system events:
 3. Task queue backup (>10 pending high priority)
 4. Database connection failures
 
-Uses existing SLACK_WEBHOOK_URL environment variable.
+Uses existing SLACK_WEBHOOK_URL environment variable. Alerts are queued
+through core.slack_notifications, so checks in the orchestration loop never
+wait on Slack, and an alert repeated every loop iteration (e.g. a database
+outage) is coalesced into one message per window instead of one per check.
 """
 
 import json
@@ -122,7 +125,7 @@ def _send_critical_alert(
     details: Optional[Dict[str, str]] = None
 ) -> bool:
     """
-    Send a critical alert via Slack.
+    Queue a critical alert for Slack.
     
     Args:
         title: Alert title
@@ -131,7 +134,7 @@ def _send_critical_alert(
         details: Additional key-value details
         
     Returns:
-        True if sent successfully, False otherwise
+        True if queued, False otherwise
     """
     slack = _import_slack_notifications()
     
@@ -13,6 +13,8 @@ from datetime import datetime, timezone, timedelta
 
 import logging
 
+from core.task_preflight import note_round_trip
+
 # Configure module logger
 logger = logging.getLogger(__name__)
 
@@ -73,6 +75,7 @@ class Database:
         
         data = json.dumps({"query": sql}).encode('utf-8')
         req = urllib.request.Request(self.endpoint, data=data, headers=headers, method='POST')
+        note_round_trip()
         
         try:
             with urllib.request.urlopen(req, timeout=30) as response:
@@ -593,56 +596,34 @@ def get_revenue_summary(days: int = 30) -> Dict[str, Any]:
     """
     Get revenue summary for a period.
     
+    Answered from the revenue rollups (see core.financial_rollups).
+    
     Args:
         days: Number of days to summarize
     
     Returns:
         Summary dict with totals by source, type, and period
     """
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
-    
-    # Total revenue
-    total_sql = f"""
-        SELECT 
-            COALESCE(SUM(gross_amount), 0) as gross_total,
-            COALESCE(SUM(net_amount), 0) as net_total,
-            COUNT(*) as event_count
-        FROM revenue_events 
-        WHERE occurred_at >= {escape_sql_value(cutoff)}
-        AND event_type != 'refund'
-    """
-    
-    # By source
-    source_sql = f"""
-        SELECT source, SUM(gross_amount) as total 
-        FROM revenue_events 
-        WHERE occurred_at >= {escape_sql_value(cutoff)}
-        AND event_type != 'refund'
-        GROUP BY source
-        ORDER BY total DESC
-    """
-    
-    # By type
-    type_sql = f"""
-        SELECT revenue_type, SUM(gross_amount) as total 
-        FROM revenue_events 
-        WHERE occurred_at >= {escape_sql_value(cutoff)}
-        AND event_type != 'refund'
-        GROUP BY revenue_type
-    """
+    from .financial_rollups import get_financial_rollups, window_start
     
     try:
-        totals = _db.query(total_sql).get("rows", [{}])[0]
-        by_source = _db.query(source_sql).get("rows", [])
-        by_type = _db.query(type_sql).get("rows", [])
+        rows = get_financial_rollups().revenue(
+            window_start(days), group_by=("source", "revenue_type"), include_refunds=False
+        )
+        
+        by_source: Dict[str, float] = {}
+        by_type: Dict[str, float] = {}
+        for r in rows:
+            by_source[r["source"]] = by_source.get(r["source"], 0.0) + r["gross_amount"]
+            by_type[r["revenue_type"]] = by_type.get(r["revenue_type"], 0.0) + r["gross_amount"]
         
         return {
             "period_days": days,
-            "gross_total": float(totals.get("gross_total", 0)),
-            "net_total": float(totals.get("net_total", 0)),
-            "event_count": int(totals.get("event_count", 0)),
-            "by_source": {r["source"]: float(r["total"]) for r in by_source},
-            "by_type": {r["revenue_type"]: float(r["total"]) for r in by_type}
+            "gross_total": sum(r["gross_amount"] for r in rows),
+            "net_total": sum(r["net_amount"] for r in rows),
+            "event_count": sum(r["event_count"] for r in rows),
+            "by_source": dict(sorted(by_source.items(), key=lambda kv: kv[1], reverse=True)),
+            "by_type": by_type
         }
     except Exception as e:
         logger.error("Failed to get revenue summary: %s", e)
@@ -725,10 +706,17 @@ def write_memory(
         data["expires_at"] = expires_at
     
     try:
-        return _db.insert("memories", data)
+        memory_id = _db.insert("memories", data)
     except Exception as e:
         logger.error("Failed to write memory: %s", e)
         return None
+    if memory_id:
+        from core.memory_index import notify_memory_written
+        notify_memory_written("memories", {
+            "id": memory_id, "key": category, "content": content,
+            "memory_type": category, "importance": importance, "expires_at": expires_at,
+        })
+    return memory_id
 
 
 def read_memories(
@@ -1055,6 +1043,8 @@ def get_cost_summary(
     """
     Get cost summary for a time period.
     
+    Answered from the cost rollups (see core.financial_rollups).
+    
     Args:
         days: Number of days to analyze
         cost_type: Filter by cost type
@@ -1063,45 +1053,28 @@ def get_cost_summary(
     Returns:
         Summary dict with totals, breakdown by type and category
     """
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
-    
-    conditions = [f"occurred_at >= {escape_sql_value(cutoff)}"]
-    if cost_type:
-        conditions.append(f"cost_type = {escape_sql_value(cost_type)}")
-    if category:
-        conditions.append(f"category = {escape_sql_value(category)}")
-    
-    where = f"WHERE {' AND '.join(conditions)}"
-    
-    # Total costs
-    total_sql = f"SELECT COUNT(*) as count, SUM(amount_cents) as total FROM cost_events {where}"
-    
-    # By type
-    type_sql = f"""
-        SELECT cost_type, SUM(amount_cents) as total
-        FROM cost_events {where}
-        GROUP BY cost_type ORDER BY total DESC
-    """
-    
-    # By category
-    cat_sql = f"""
-        SELECT category, SUM(amount_cents) as total
-        FROM cost_events {where}
-        GROUP BY category ORDER BY total DESC
-    """
+    from .financial_rollups import get_financial_rollups, window_start
     
     try:
-        total = _db.query(total_sql).get("rows", [{}])[0]
-        by_type = _db.query(type_sql).get("rows", [])
-        by_cat = _db.query(cat_sql).get("rows", [])
+        rows = get_financial_rollups().costs(
+            window_start(days), group_by=("cost_type", "category"),
+            cost_type=cost_type, category=category
+        )
+        
+        by_type: Dict[str, int] = {}
+        by_cat: Dict[str, int] = {}
+        for r in rows:
+            by_type[r["cost_type"]] = by_type.get(r["cost_type"], 0) + r["amount_cents"]
+            by_cat[r["category"]] = by_cat.get(r["category"], 0) + r["amount_cents"]
+        total = sum(r["amount_cents"] for r in rows)
         
         return {
             "period_days": days,
-            "total_cents": int(total.get("total") or 0),
-            "total_dollars": round(int(total.get("total") or 0) / 100, 2),
-            "event_count": int(total.get("count") or 0),
-            "by_type": {r["cost_type"]: int(r["total"]) for r in by_type},
-            "by_category": {r["category"]: int(r["total"]) for r in by_cat}
+            "total_cents": total,
+            "total_dollars": round(total / 100, 2),
+            "event_count": sum(r["event_count"] for r in rows),
+            "by_type": dict(sorted(by_type.items(), key=lambda kv: kv[1], reverse=True)),
+            "by_category": dict(sorted(by_cat.items(), key=lambda kv: kv[1], reverse=True))
         }
     except Exception as e:
         logger.error("Failed to get cost summary: %s", e)
@@ -1184,42 +1157,38 @@ def check_budget_status() -> List[Dict]:
     """
     Check all active budgets and return status with alerts.
     
+    Month and day spend come from one cost rollup query for all budgets.
+    
     Returns:
         List of budget statuses with usage and alert status
     """
+    from .financial_rollups import get_financial_rollups, parse_period
+    
     # Get all active budgets
     budgets_sql = "SELECT * FROM cost_budgets WHERE is_active = TRUE"
     budgets = _db.query(budgets_sql).get("rows", [])
     
     # Get current month's start
     now = datetime.now(timezone.utc)
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0).isoformat()
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    # Month-to-date spend per (cost_type, category, day)
+    spend = get_financial_rollups().costs(month_start, group_by=("cost_type", "category", "day")) if budgets else []
+    
+    def _spent(budget: Dict, since: datetime) -> int:
+        return sum(
+            r["amount_cents"] for r in spend
+            if (not budget.get("cost_type") or r["cost_type"] == budget["cost_type"])
+            and (not budget.get("category") or r["category"] == budget["category"])
+            and parse_period(r["period"]) >= since
+        )
     
     results = []
     
     for budget in budgets:
-        # Build query for this budget's costs
-        conditions = [f"occurred_at >= {escape_sql_value(month_start)}"]
-        if budget.get("cost_type"):
-            conditions.append(f"cost_type = {escape_sql_value(budget['cost_type'])}")
-        if budget.get("category"):
-            conditions.append(f"category = {escape_sql_value(budget['category'])}")
-        
-        where = f"WHERE {' AND '.join(conditions)}"
-        
-        # Get monthly total
-        month_sql = f"SELECT COALESCE(SUM(amount_cents), 0) as total FROM cost_events {where}"
-        month_total = int(_db.query(month_sql).get("rows", [{}])[0].get("total") or 0)
-        
-        # Get daily total if daily limit exists
-        daily_total = 0
-        if budget.get("daily_limit_cents"):
-            daily_conditions = conditions.copy()
-            daily_conditions[0] = f"occurred_at >= {escape_sql_value(today_start)}"
-            daily_where = f"WHERE {' AND '.join(daily_conditions)}"
-            daily_sql = f"SELECT COALESCE(SUM(amount_cents), 0) as total FROM cost_events {daily_where}"
-            daily_total = int(_db.query(daily_sql).get("rows", [{}])[0].get("total") or 0)
+        month_total = _spent(budget, month_start)
+        daily_total = _spent(budget, today_start) if budget.get("daily_limit_cents") else 0
         
         monthly_limit = budget["monthly_limit_cents"]
         usage_percent = round((month_total / monthly_limit) * 100, 1) if monthly_limit > 0 else 0
@@ -1251,36 +1220,26 @@ def get_profit_loss(days: int = 30) -> Dict[str, Any]:
     """
     Get profit/loss summary.
     
+    Answered from the revenue and cost rollups (see core.financial_rollups).
+    
     Args:
         days: Number of days to analyze
     
     Returns:
         Dict with revenue, costs, and profit
     """
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
-    
-    # Get revenue
-    rev_sql = f"""
-        SELECT COALESCE(SUM(gross_amount), 0) as gross, 
-               COALESCE(SUM(COALESCE(net_amount, gross_amount)), 0) as net
-        FROM revenue_events 
-        WHERE occurred_at >= {escape_sql_value(cutoff)}
-    """
+    from .financial_rollups import get_financial_rollups, window_start
     
-    # Get costs
-    cost_sql = f"""
-        SELECT COALESCE(SUM(amount_cents), 0) as total
-        FROM cost_events 
-        WHERE occurred_at >= {escape_sql_value(cutoff)}
-    """
+    since = window_start(days)
     
     try:
-        rev = _db.query(rev_sql).get("rows", [{}])[0]
-        cost = _db.query(cost_sql).get("rows", [{}])[0]
+        rollups = get_financial_rollups()
+        rev = rollups.revenue_total(since)
+        cost = rollups.cost_total(since)
         
-        gross_revenue = float(rev.get("gross") or 0)
-        net_revenue = float(rev.get("net") or 0)
-        total_cost_cents = int(cost.get("total") or 0)
+        gross_revenue = rev["gross_amount"]
+        net_revenue = rev["net_amount"]
+        total_cost_cents = cost["amount_cents"]
         total_cost_dollars = total_cost_cents / 100
         
         return {
@@ -1308,34 +1267,21 @@ def get_experiment_roi(experiment_id: str) -> Dict[str, Any]:
     """
     Get ROI for a specific experiment.
     
+    Answered from the rollups, which attribute events to experiments the
+    same way this function used to (attribution / metadata / experiment_id).
+    
     Args:
         experiment_id: UUID of the experiment
     
     Returns:
         Dict with experiment revenue, costs, and ROI
     """
-    # Revenue attributed to experiment
-    rev_sql = f"""
-        SELECT COALESCE(SUM(gross_amount), 0) as gross
-        FROM revenue_events 
-        WHERE attribution->>'experiment' = {escape_sql_value(experiment_id)}
-           OR metadata->>'experiment_id' = '{experiment_id}'
-    """
-    
-    # Costs attributed to experiment  
-    cost_sql = f"""
-        SELECT COALESCE(SUM(amount_cents), 0) as total
-        FROM cost_events 
-        WHERE experiment_id = {escape_sql_value(experiment_id)}
-           OR attribution->>'experiment' = '{experiment_id}'
-    """
+    from .financial_rollups import get_financial_rollups
     
     try:
-        rev = _db.query(rev_sql).get("rows", [{}])[0]
-        cost = _db.query(cost_sql).get("rows", [{}])[0]
-        
-        revenue = float(rev.get("gross") or 0)
-        cost_cents = int(cost.get("total") or 0)
+        rollups = get_financial_rollups()
+        revenue = rollups.revenue_total(experiment_id=experiment_id)["gross_amount"]
+        cost_cents = rollups.cost_total(experiment_id=experiment_id)["amount_cents"]
         cost_dollars = cost_cents / 100
         
         roi = ((revenue - cost_dollars) / cost_dollars * 100) if cost_dollars > 0 else 0
@@ -1845,17 +1791,20 @@ def update_ab_test_metrics(experiment_id: str) -> Dict[str, Any]:
     model_a_metric = model_a_accuracy.get("accuracy", 0)
     model_b_metric = model_b_accuracy.get("accuracy", 0)
     
-    # Calculate statistical significance (simple z-test approximation)
+    # Two-proportion z-test and Beta-Binomial posterior on the accuracy counts
+    from .experiment_stats import prob_b_beats_a, two_proportion_ztest
+
     n_a = exp["model_a_samples"] or 1
     n_b = exp["model_b_samples"] or 1
-    p_a = model_a_metric / 100
-    p_b = model_b_metric / 100
-    
-    pooled_se = ((p_a * (1 - p_a) / n_a) + (p_b * (1 - p_b) / n_b)) ** 0.5
-    z_score = (p_b - p_a) / pooled_se if pooled_se > 0 else 0
-    
-    # Approximate confidence level from z-score
-    confidence = min(0.99, abs(z_score) / 3)  # Simplified
+    # Resolved predictions are the trials; fall back to assignment counts
+    trials_a = model_a_accuracy.get("resolved_predictions") or n_a
+    trials_b = model_b_accuracy.get("resolved_predictions") or n_b
+    correct_a = model_a_accuracy.get("correct_count", round(trials_a * model_a_metric / 100))
+    correct_b = model_b_accuracy.get("correct_count", round(trials_b * model_b_metric / 100))
+
+    (z_score,), (p_value,) = two_proportion_ztest([correct_a], [trials_a], [correct_b], [trials_b])
+    (prob_b_better,) = prob_b_beats_a([correct_a], [trials_a], [correct_b], [trials_b])
+    confidence = 1 - p_value
     
     update_sql = f"""
         UPDATE model_experiments 
@@ -1877,6 +1826,9 @@ def update_ab_test_metrics(experiment_id: str) -> Dict[str, Any]:
         "model_a_metric": model_a_metric,
         "model_b_metric": model_b_metric,
         "confidence_level": round(confidence, 3),
+        "z_score": round(z_score, 4),
+        "p_value": round(p_value, 6),
+        "prob_b_beats_a": round(prob_b_better, 4),
         "winner": "B" if model_b_metric > model_a_metric else "A" if model_a_metric > model_b_metric else "TIE"
     }
 
@@ -2176,6 +2128,9 @@ def record_learning(
     
     try:
         learning_id = _db.insert("learnings", data)
+        if learning_id:
+            from .learnings_cache import notify_learning_written
+            notify_learning_written({"id": learning_id, **data})
         
         log_execution(
             worker_id=worker_id,
@@ -2219,6 +2174,18 @@ def search_learnings(
     Returns:
         List of learning records
     """
+    from .learnings_cache import get_learnings_cache
+    cache = get_learnings_cache(_db.query if _db is not None else None)
+    if cache.ensure_loaded():
+        return cache.search(
+            category=category,
+            worker_id=worker_id,
+            search_text=search_text,
+            min_confidence=min_confidence,
+            validated_only=validated_only,
+            limit=limit,
+        )
+    
     conditions = []
     
     if category:
@@ -2298,6 +2265,8 @@ def apply_learning(learning_id: str) -> bool:
     
     try:
         _db.query(sql)
+        from .learnings_cache import notify_learning_applied
+        notify_learning_applied(learning_id)
         return True
     except Exception as e:
         log_execution(
@@ -10,9 +10,15 @@ This module is part of the verification chain system (VERCHAIN-07).
 Usage:
     verifier = DeployVerifier()
     
-    # Wait for deployment after merge
+    # Track a deployment after merge without blocking (core.deploy_watch)
+    future = verifier.watch_deploy(service_id, commit_sha, timeout=300, callback=on_done)
+    
+    # Or block until it resolves
     result = verifier.wait_for_deploy(service_id, commit_sha, timeout=300)
     
+    # Batched status of several services in one request
+    results = verifier.check_railway_statuses([service_a, service_b])
+    
     # Check specific platform status
     result = verifier.check_railway_status(service_id)
     result = verifier.check_vercel_status(project_id)
@@ -29,8 +35,9 @@ import json
 import time
 import urllib.request
 import urllib.error
+from concurrent.futures import Future
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable
 from enum import Enum
 from datetime import datetime, timezone
 
@@ -155,6 +162,44 @@ class DeployVerifier:
         self.railway_api_url = "https://backboard.railway.com/graphql/v2"
         self.vercel_api_url = "https://api.vercel.com"
     
+    def watch_deploy(
+        self,
+        service_id: str,
+        commit_sha: Optional[str] = None,
+        timeout: int = 300,
+        poll_interval: int = 10,
+        platform: str = "railway",
+        callback: Optional[Callable[[DeployResult], None]] = None,
+    ) -> "Future[DeployResult]":
+        """
+        Track a deployment without blocking the caller.
+        
+        The deployment is tracked by the shared DeployWatcher, which polls all
+        pending deployments with one batched query per platform.
+        
+        Args:
+            service_id: The service/project ID to check
+            commit_sha: Optional commit SHA to verify was deployed
+            timeout: Seconds until the watch resolves with a timeout (default 300)
+            poll_interval: Maximum seconds between status checks (default 10)
+            platform: Platform to check ("railway" or "vercel")
+            callback: Optional function called with the final DeployResult
+            
+        Returns:
+            Future resolving to the final DeployResult
+        """
+        from .deploy_watch import get_deploy_watcher
+        
+        return get_deploy_watcher().watch(
+            service_id,
+            platform=platform,
+            commit_sha=commit_sha,
+            timeout=timeout,
+            callback=callback,
+            verifier=self,
+            max_interval=poll_interval,
+        )
+    
     def wait_for_deploy(
         self,
         service_id: str,
@@ -164,61 +209,28 @@ class DeployVerifier:
         platform: str = "railway"
     ) -> DeployResult:
         """
-        Wait for a deployment to complete, polling until success or timeout.
+        Wait for a deployment to complete (success, failure or timeout).
+        
+        Blocks the calling thread for up to ``timeout`` seconds; workers
+        should use watch_deploy() and act on the future or callback instead.
         
         Args:
             service_id: The service/project ID to check
             commit_sha: Optional commit SHA to verify was deployed
             timeout: Maximum seconds to wait (default 300 = 5 minutes)
-            poll_interval: Seconds between status checks (default 10)
+            poll_interval: Maximum seconds between status checks (default 10)
             platform: Platform to check ("railway" or "vercel")
             
         Returns:
             DeployResult with final deployment status
         """
-        start_time = time.time()
-        last_result = None
-        
-        while (time.time() - start_time) < timeout:
-            if platform.lower() == "vercel":
-                result = self.check_vercel_status(service_id)
-            else:
-                result = self.check_railway_status(service_id)
-            
-            last_result = result
-            
-            # Check if we're looking for a specific commit
-            if commit_sha and result.commit_sha:
-                if result.commit_sha != commit_sha and result.commit_sha[:7] != commit_sha[:7]:
-                    # Not the right commit yet, keep waiting
-                    time.sleep(poll_interval)
-                    continue
-            
-            # Check deployment status
-            if result.is_success:
-                return result
-            elif result.is_failed:
-                return result
-            elif result.is_pending:
-                # Still in progress, wait and retry
-                time.sleep(poll_interval)
-                continue
-            else:
-                # Unknown status, wait and retry
-                time.sleep(poll_interval)
-                continue
-        
-        # Timeout reached
-        if last_result:
-            last_result.error = f"Timeout after {timeout}s waiting for deployment"
-            return last_result
-        
-        return DeployResult(
-            status=DeployStatus.UNKNOWN,
-            service_id=service_id,
-            error=f"Timeout after {timeout}s waiting for deployment",
-            platform=platform
-        )
+        return self.watch_deploy(
+            service_id,
+            commit_sha=commit_sha,
+            timeout=timeout,
+            poll_interval=poll_interval,
+            platform=platform,
+        ).result()
     
     def check_railway_status(self, service_id: str) -> DeployResult:
         """
@@ -293,31 +305,7 @@ class DeployVerifier:
                     platform="railway"
                 )
             
-            deployment = edges[0].get("node", {})
-            status_str = deployment.get("status", "UNKNOWN")
-            meta = deployment.get("meta") or {}
-            
-            # Extract commit SHA from meta if available
-            commit_sha = None
-            if isinstance(meta, dict):
-                commit_sha = meta.get("commitSha") or meta.get("commit_sha")
-            elif isinstance(meta, str):
-                try:
-                    meta_dict = json.loads(meta)
-                    commit_sha = meta_dict.get("commitSha") or meta_dict.get("commit_sha")
-                except:
-                    pass
-            
-            return DeployResult(
-                status=DeployStatus.from_railway(status_str),
-                service_id=service_id,
-                deployment_id=deployment.get("id"),
-                url=deployment.get("staticUrl"),
-                commit_sha=commit_sha,
-                deployed_at=deployment.get("createdAt"),
-                platform="railway",
-                raw_data=deployment
-            )
+            return self._railway_result(service_id, edges[0].get("node", {}))
             
         except urllib.error.HTTPError as e:
             return DeployResult(
@@ -383,24 +371,7 @@ class DeployVerifier:
                     platform="vercel"
                 )
             
-            deployment = deployments[0]
-            state = deployment.get("state", "")
-            ready_state = deployment.get("readyState", "")
-            
-            # Extract commit info
-            meta = deployment.get("meta", {}) or {}
-            commit_sha = meta.get("githubCommitSha") or meta.get("gitlabCommitSha") or meta.get("bitbucketCommitSha")
-            
-            return DeployResult(
-                status=DeployStatus.from_vercel(state, ready_state),
-                service_id=project_id,
-                deployment_id=deployment.get("uid"),
-                url=deployment.get("url"),
-                commit_sha=commit_sha,
-                deployed_at=deployment.get("createdAt"),
-                platform="vercel",
-                raw_data=deployment
-            )
+            return self._vercel_result(project_id, deployments[0])
             
         except urllib.error.HTTPError as e:
             return DeployResult(
@@ -424,6 +395,171 @@ class DeployVerifier:
                 platform="vercel"
             )
     
+    def _railway_result(self, service_id: str, deployment: Dict[str, Any]) -> DeployResult:
+        """Build a DeployResult from a Railway deployment node."""
+        status_str = deployment.get("status", "UNKNOWN")
+        meta = deployment.get("meta") or {}
+        
+        # Extract commit SHA from meta if available
+        commit_sha = None
+        if isinstance(meta, dict):
+            commit_sha = meta.get("commitSha") or meta.get("commit_sha")
+        elif isinstance(meta, str):
+            try:
+                meta_dict = json.loads(meta)
+                commit_sha = meta_dict.get("commitSha") or meta_dict.get("commit_sha")
+            except:
+                pass
+        
+        return DeployResult(
+            status=DeployStatus.from_railway(status_str),
+            service_id=service_id,
+            deployment_id=deployment.get("id"),
+            url=deployment.get("staticUrl"),
+            commit_sha=commit_sha,
+            deployed_at=deployment.get("createdAt"),
+            platform="railway",
+            raw_data=deployment
+        )
+    
+    def _vercel_result(self, project_id: str, deployment: Dict[str, Any]) -> DeployResult:
+        """Build a DeployResult from a Vercel deployment object."""
+        state = deployment.get("state", "")
+        ready_state = deployment.get("readyState", "")
+        
+        # Extract commit info
+        meta = deployment.get("meta", {}) or {}
+        commit_sha = meta.get("githubCommitSha") or meta.get("gitlabCommitSha") or meta.get("bitbucketCommitSha")
+        
+        return DeployResult(
+            status=DeployStatus.from_vercel(state, ready_state),
+            service_id=project_id,
+            deployment_id=deployment.get("uid"),
+            url=deployment.get("url"),
+            commit_sha=commit_sha,
+            deployed_at=deployment.get("createdAt"),
+            platform="vercel",
+            raw_data=deployment
+        )
+    
+    def check_railway_statuses(self, service_ids: List[str]) -> Dict[str, DeployResult]:
+        """
+        Check the latest deployment of several Railway services in one request.
+        
+        Uses one aliased GraphQL query (one ``deployments`` field per service).
+        
+        Args:
+            service_ids: Railway service IDs
+            
+        Returns:
+            Dict mapping service ID to DeployResult
+        """
+        service_ids = list(dict.fromkeys(service_ids))
+        if len(service_ids) <= 1:
+            return {sid: self.check_railway_status(sid) for sid in service_ids}
+        
+        def _error(message: str) -> Dict[str, DeployResult]:
+            return {
+                sid: DeployResult(status=DeployStatus.UNKNOWN, service_id=sid, error=message, platform="railway")
+                for sid in service_ids
+            }
+        
+        if not self.railway_token:
+            return _error("No Railway API token configured")
+        
+        params = ", ".join(f"$s{i}: String!" for i in range(len(service_ids)))
+        fields = "\n".join(
+            f"s{i}: deployments(first: 1, input: {{serviceId: $s{i}}}) "
+            "{ edges { node { id status createdAt staticUrl meta } } }"
+            for i in range(len(service_ids))
+        )
+        query = f"query GetDeployments({params}) {{\n{fields}\n}}"
+        
+        try:
+            data = json.dumps({
+                "query": query,
+                "variables": {f"s{i}": sid for i, sid in enumerate(service_ids)}
+            }).encode("utf-8")
+            
+            req = urllib.request.Request(self.railway_api_url, data=data, method="POST")
+            req.add_header("Authorization", f"Bearer {self.railway_token}")
+            req.add_header("Content-Type", "application/json")
+            req.add_header("User-Agent", "Juggernaut-DeployVerifier/1.0")
+            
+            with urllib.request.urlopen(req, timeout=30) as response:
+                result = json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            return _error(f"HTTP error {e.code}: {e.reason}")
+        except urllib.error.URLError as e:
+            return _error(f"Connection error: {str(e.reason)}")
+        except Exception as e:
+            return _error(f"Error checking Railway: {str(e)}")
+        
+        data = result.get("data") or {}
+        if "errors" in result and not data:
+            return _error(str(result["errors"]))
+        
+        results = {}
+        for i, sid in enumerate(service_ids):
+            edges = (data.get(f"s{i}") or {}).get("edges", [])
+            if edges:
+                results[sid] = self._railway_result(sid, edges[0].get("node", {}))
+            else:
+                results[sid] = DeployResult(
+                    status=DeployStatus.UNKNOWN,
+                    service_id=sid,
+                    error="No deployments found",
+                    platform="railway"
+                )
+        return results
+    
+    def check_vercel_statuses(self, project_ids: List[str], team_id: Optional[str] = None) -> Dict[str, DeployResult]:
+        """
+        Check the latest deployment of several Vercel projects in one request.
+        
+        Uses the ``projectIds`` filter of the deployments list; projects missing
+        from the response are checked individually.
+        
+        Args:
+            project_ids: Vercel project IDs
+            team_id: Optional Vercel team ID
+            
+        Returns:
+            Dict mapping project ID to DeployResult
+        """
+        project_ids = list(dict.fromkeys(project_ids))
+        if len(project_ids) <= 1 or not self.vercel_token:
+            return {pid: self.check_vercel_status(pid, team_id) for pid in project_ids}
+        
+        results: Dict[str, DeployResult] = {}
+        try:
+            url = (
+                f"{self.vercel_api_url}/v6/deployments?projectIds={','.join(project_ids)}"
+                f"&limit={min(100, 10 * len(project_ids))}"
+            )
+            if team_id:
+                url += f"&teamId={team_id}"
+            
+            req = urllib.request.Request(url)
+            req.add_header("Authorization", f"Bearer {self.vercel_token}")
+            req.add_header("User-Agent", "Juggernaut-DeployVerifier/1.0")
+            
+            with urllib.request.urlopen(req, timeout=30) as response:
+                result = json.loads(response.read().decode("utf-8"))
+            
+            # Newest first: keep the first deployment seen per project
+            for deployment in result.get("deployments", []):
+                pid = deployment.get("projectId")
+                if pid in project_ids and pid not in results:
+                    results[pid] = self._vercel_result(pid, deployment)
+        except Exception:
+            pass
+        
+        for pid in project_ids:
+            if pid not in results:
+                results[pid] = self.check_vercel_status(pid, team_id)
+        return results
+    
     def run_health_check(
         self,
         url: str,
@@ -0,0 +1,358 @@
+"""
+Deploy Watch Service
+====================
+
+Tracks any number of in-flight deployments on one background thread instead of
+each caller sleep-polling Railway or Vercel on its own.
+
+- Every interval, pending watches are grouped by platform (and API token) and
+  checked with one batched status query per group
+  (DeployVerifier.check_railway_statuses / check_vercel_statuses).
+- Each watch resolves a concurrent.futures.Future (and optional callbacks)
+  when its deployment succeeds, fails, or its deadline passes.
+- The poll interval backs off while nothing changes and drops back to the
+  minimum when a watch is added or a deployment changes state.
+- A watch whose verifier has no API token for the platform resolves at once
+  with an error instead of polling until its deadline.
+- Final (success / failure) results stay available to recent_result() for
+  RECENT_RESULT_TTL_SECONDS, matched on the commit; timeouts are not kept.
+
+Usage:
+    from core.deploy_watch import get_deploy_watcher
+
+    future = get_deploy_watcher().watch(service_id, platform="railway",
+                                        commit_sha=sha, timeout=300,
+                                        callback=lambda result: ...)
+    # ... do other work ...
+    result = future.result()  # DeployResult
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .deploy_verifier import DeployResult, DeployStatus, DeployVerifier
+
+logger = logging.getLogger(__name__)
+
+# Poll interval bounds (seconds) and growth factor while nothing changes
+MIN_POLL_INTERVAL = 5.0
+MAX_POLL_INTERVAL = 30.0
+BACKOFF_FACTOR = 1.5
+
+# How long a resolved result is kept for recent_result() lookups
+RECENT_RESULT_TTL_SECONDS = 120.0
+
+
+@dataclass
+class DeployWatch:
+    """One tracked deployment."""
+    platform: str
+    service_id: str
+    commit_sha: Optional[str]
+    deadline: float
+    verifier: DeployVerifier
+    max_interval: float
+    timeout: float = 300
+    future: Future = field(default_factory=Future)
+    last_result: Optional[DeployResult] = None
+
+    @property
+    def key(self) -> Tuple[str, str, Optional[str]]:
+        return (self.platform, self.service_id, self.commit_sha)
+
+
+def _same_commit(a: str, b: str) -> bool:
+    """Full SHAs or their 7-character short forms match."""
+    return a == b or a[:7] == b[:7]
+
+
+def _is_final(result: DeployResult, commit_sha: Optional[str]) -> bool:
+    """Same completion rule DeployVerifier.wait_for_deploy always used."""
+    if commit_sha and result.commit_sha:
+        if not _same_commit(result.commit_sha, commit_sha):
+            # Not the right commit yet
+            return False
+    return result.is_success or result.is_failed
+
+
+class DeployWatcher:
+    """
+    Shared, non-blocking deployment watcher.
+
+    Callers get a Future from watch() and are free while the deploy is in
+    flight; the watcher thread does all polling.
+    """
+
+    def __init__(
+        self,
+        verifier: Optional[DeployVerifier] = None,
+        min_interval: float = MIN_POLL_INTERVAL,
+        max_interval: float = MAX_POLL_INTERVAL,
+        backoff: float = BACKOFF_FACTOR,
+        start_thread: bool = True,
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            verifier: Default DeployVerifier used for watches that don't pass one
+            min_interval: Shortest seconds between polls
+            max_interval: Longest seconds between polls
+            backoff: Interval growth factor while no deployment changes state
+            start_thread: Start the background thread on the first watch
+                (tests drive poll_once() directly instead)
+        """
+        self.verifier = verifier or DeployVerifier()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.start_thread = start_thread
+        self.interval = min_interval
+        self._watches: Dict[Tuple[str, str, Optional[str]], DeployWatch] = {}
+        # watch key -> (resolved at, final result)
+        self._recent: Dict[Tuple[str, str, Optional[str]], Tuple[float, DeployResult]] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def watch(
+        self,
+        service_id: str,
+        platform: str = "railway",
+        commit_sha: Optional[str] = None,
+        timeout: float = 300,
+        callback: Optional[Callable[[DeployResult], None]] = None,
+        verifier: Optional[DeployVerifier] = None,
+        max_interval: Optional[float] = None,
+    ) -> "Future[DeployResult]":
+        """
+        Start tracking a deployment.
+
+        Watching the same (platform, service, commit) again shares the existing
+        watch; its deadline is extended to the later of the two.
+
+        Args:
+            service_id: Railway service ID or Vercel project ID
+            platform: "railway" or "vercel"
+            commit_sha: Optional commit SHA that must be the one deployed
+            timeout: Seconds until the watch resolves with a timeout error
+            callback: Optional function called with the final DeployResult
+            verifier: DeployVerifier (tokens) to query with
+            max_interval: Optional cap on seconds between polls for this watch
+
+        Returns:
+            Future resolving to the final DeployResult
+        """
+        platform = (platform or "railway").lower()
+        verifier = verifier or self.verifier
+        token = verifier.vercel_token if platform == "vercel" else verifier.railway_token
+        if not token:
+            # Every poll would fail the same way; don't wait out the deadline
+            future: "Future[DeployResult]" = Future()
+            if callback is not None:
+                future.add_done_callback(lambda f: callback(f.result()))
+            future.set_result(DeployResult(
+                status=DeployStatus.UNKNOWN,
+                service_id=service_id,
+                error=f"No {'Vercel' if platform == 'vercel' else 'Railway'} API token configured",
+                platform=platform,
+            ))
+            return future
+
+        watch = DeployWatch(
+            platform=platform,
+            service_id=service_id,
+            commit_sha=commit_sha,
+            deadline=time.monotonic() + timeout,
+            verifier=verifier,
+            max_interval=max_interval or self.max_interval,
+            timeout=timeout,
+        )
+        with self._cond:
+            existing = self._watches.get(watch.key)
+            if existing is not None:
+                if watch.deadline > existing.deadline:
+                    existing.deadline, existing.timeout = watch.deadline, watch.timeout
+                existing.max_interval = min(existing.max_interval, watch.max_interval)
+                watch = existing
+            else:
+                self._watches[watch.key] = watch
+            self.interval = self.min_interval
+            if self.start_thread and (self._thread is None or not self._thread.is_alive()):
+                self._stopped = False
+                self._thread = threading.Thread(target=self._loop, name="deploy-watch", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        if callback is not None:
+            watch.future.add_done_callback(lambda f: callback(f.result()))
+        return watch.future
+
+    def pending(self) -> int:
+        """Number of deployments still being watched."""
+        with self._cond:
+            return len(self._watches)
+
+    def status(self, platform: str, service_id: str) -> Optional[DeployResult]:
+        """Last observed status of an in-flight deployment, if any."""
+        with self._cond:
+            for watch in self._watches.values():
+                if watch.platform == platform and watch.service_id == service_id and watch.last_result:
+                    return watch.last_result
+        return None
+
+    def recent_result(
+        self, platform: str, service_id: str, commit_sha: Optional[str] = None
+    ) -> Optional[DeployResult]:
+        """
+        Final result of a recently resolved watch on this service.
+
+        With ``commit_sha``, only a result for that commit counts: one whose
+        deployed commit matches, or (if the platform reported none) one whose
+        watch was for that commit. Timed-out watches are never returned.
+        """
+        now = time.monotonic()
+        latest: Optional[Tuple[float, DeployResult]] = None
+        with self._cond:
+            for (p, sid, watched_sha), (at, result) in self._recent.items():
+                if p != platform or sid != service_id or now - at >= RECENT_RESULT_TTL_SECONDS:
+                    continue
+                if commit_sha:
+                    deployed_sha = result.commit_sha or watched_sha
+                    if not deployed_sha or not _same_commit(deployed_sha, commit_sha):
+                        continue
+                if latest is None or at > latest[0]:
+                    latest = (at, result)
+        return latest[1] if latest else None
+
+    def poll_once(self) -> bool:
+        """
+        Run one batched status round over all pending watches.
+
+        Returns:
+            True if any deployment resolved or changed state
+        """
+        with self._cond:
+            watches = list(self._watches.values())
+        if not watches:
+            return False
+
+        groups: Dict[Tuple[str, str], List[DeployWatch]] = {}
+        for watch in watches:
+            token = watch.verifier.vercel_token if watch.platform == "vercel" else watch.verifier.railway_token
+            groups.setdefault((watch.platform, token), []).append(watch)
+
+        changed = False
+        resolved: List[Tuple[DeployWatch, DeployResult]] = []
+        for (platform, _), group in groups.items():
+            verifier = group[0].verifier
+            service_ids = [w.service_id for w in group]
+            try:
+                if platform == "vercel":
+                    results = verifier.check_vercel_statuses(service_ids)
+                else:
+                    results = verifier.check_railway_statuses(service_ids)
+            except Exception as e:
+                logger.warning("Deploy status poll failed for %s: %s", platform, e)
+                results = {}
+
+            for watch in group:
+                result = results.get(watch.service_id)
+                if result is None:
+                    continue
+                previous = watch.last_result
+                if previous is None or (previous.status, previous.deployment_id) != (result.status, result.deployment_id):
+                    changed = True
+                watch.last_result = result
+                if _is_final(result, watch.commit_sha):
+                    resolved.append((watch, result))
+
+        now = time.monotonic()
+        final_keys = {w.key for w, _ in resolved}
+        for watch in watches:
+            if watch.key not in final_keys and now >= watch.deadline:
+                resolved.append((watch, self._timeout_result(watch)))
+
+        if resolved:
+            changed = True
+            with self._cond:
+                for key in [k for k, (at, _) in self._recent.items() if now - at >= RECENT_RESULT_TTL_SECONDS]:
+                    del self._recent[key]
+                for watch, result in resolved:
+                    self._watches.pop(watch.key, None)
+                    if watch.key in final_keys:
+                        self._recent[watch.key] = (now, result)
+            for watch, result in resolved:
+                if not watch.future.done():
+                    watch.future.set_result(result)
+        return changed
+
+    def _timeout_result(self, watch: DeployWatch) -> DeployResult:
+        message = f"Timeout after {watch.timeout:g}s waiting for deployment"
+        if watch.last_result is not None:
+            watch.last_result.error = message
+            return watch.last_result
+        return DeployResult(
+            status=DeployStatus.UNKNOWN,
+            service_id=watch.service_id,
+            error=message,
+            platform=watch.platform
+        )
+
+    def stop(self) -> None:
+        """Stop the background thread (pending futures stay unresolved)."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._watches and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+
+            try:
+                changed = self.poll_once()
+            except Exception as e:
+                logger.warning("Deploy watch poll failed: %s", e)
+                changed = False
+
+            with self._cond:
+                if not self._watches:
+                    continue
+                cap = min([self.max_interval] + [w.max_interval for w in self._watches.values()])
+                if changed:
+                    self.interval = self.min_interval
+                else:
+                    self.interval = self.interval * self.backoff
+                self.interval = max(min(self.interval, cap), min(self.min_interval, cap))
+                next_deadline = min(w.deadline for w in self._watches.values())
+                wait = min(self.interval, max(0.0, next_deadline - time.monotonic()))
+                # watch() resets the interval and notifies, so new deploys are checked promptly
+                self._cond.wait(timeout=wait)
+
+
+_watcher: Optional[DeployWatcher] = None
+_watcher_lock = threading.Lock()
+
+
+def get_deploy_watcher() -> DeployWatcher:
+    """Process-wide DeployWatcher singleton."""
+    global _watcher
+    if _watcher is None:
+        with _watcher_lock:
+            if _watcher is None:
+                _watcher = DeployWatcher()
+    return _watcher
+
+
+__all__ = [
+    "DeployWatch",
+    "DeployWatcher",
+    "get_deploy_watcher",
+]
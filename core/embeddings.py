@@ -0,0 +1,326 @@
+"""
+Local Embeddings - Offline hashed n-gram embeddings and an in-process vector index
+
+No network, no model download. Text is turned into a sparse vector of hashed
+features (word unigrams, word bigrams and character trigrams) using the
+feature-hashing trick, weighted with sublinear term frequency and L2
+normalised. Queries are additionally weighted by inverse document frequency
+taken from the index, so rare terms dominate similarity just like TF-IDF.
+
+Document vectors never depend on corpus statistics, which keeps them stable:
+a vector computed today can be stored in pgvector and still compare correctly
+with one computed next month, and the index can be updated incrementally
+without re-embedding anything.
+
+Usage:
+    from core.embeddings import LocalEmbedder, VectorIndex
+
+    index = VectorIndex()
+    index.add("m1", "Checkout flow fails on Safari", {"source": "memories"})
+    index.add_batch([("m2", "Stripe webhook timeout", {}), ...])
+    hits = index.search("checkout problems", k=5)
+
+The dense ``embed()`` output (EMBEDDING_DIM floats) is what MemoryService
+stores in ``agent_memories.embedding``. NumPy is used for batch output when it
+is installed; every other path is pure Python.
+"""
+
+import heapq
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Must match agent_memories.embedding vector(1536)
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "1536"))
+
+# Relative feature weights
+WORD_WEIGHT = 1.0
+BIGRAM_WEIGHT = 0.7
+CHAR_NGRAM_WEIGHT = 0.35
+CHAR_NGRAM_SIZE = 3
+
+# Approximate search only walks the postings of this many highest-weight query features
+DEFAULT_MAX_QUERY_FEATURES = 12
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were "
+    "will with what when where which who why how do does did can could should would".split()
+)
+
+SparseVector = Dict[int, float]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed."""
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in _STOPWORDS]
+
+
+def _bucket(feature: str, dim: int) -> Tuple[int, float]:
+    """Stable hash of a feature to (bucket, sign). crc32 is not salted per process."""
+    h = zlib.crc32(feature.encode("utf-8"))
+    return h % dim, (1.0 if (h >> 31) & 1 == 0 else -1.0)
+
+
+class LocalEmbedder:
+    """Deterministic offline text embedder (hashed n-gram TF).
+
+    Attributes:
+        dim: Number of hash buckets / dense vector dimension.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        if dim <= 0:
+            raise ValueError("dim must be positive")
+        self.dim = dim
+
+    def _raw_features(self, text: str) -> Dict[str, float]:
+        tokens = tokenize(text)
+        feats: Dict[str, float] = {}
+        for tok in tokens:
+            feats["w:" + tok] = feats.get("w:" + tok, 0.0) + WORD_WEIGHT
+            padded = f"<{tok}>"
+            if len(padded) > CHAR_NGRAM_SIZE:
+                for i in range(len(padded) - CHAR_NGRAM_SIZE + 1):
+                    key = "c:" + padded[i:i + CHAR_NGRAM_SIZE]
+                    feats[key] = feats.get(key, 0.0) + CHAR_NGRAM_WEIGHT
+        for a, b in zip(tokens, tokens[1:]):
+            key = f"b:{a}_{b}"
+            feats[key] = feats.get(key, 0.0) + BIGRAM_WEIGHT
+        return feats
+
+    def sparse(self, text: str) -> SparseVector:
+        """Sparse L2-normalised vector {bucket: weight} for ``text``."""
+        vec: SparseVector = {}
+        for feat, count in self._raw_features(text).items():
+            bucket, sign = _bucket(feat, self.dim)
+            # Sublinear tf: repeated features help, but with diminishing returns
+            tf = 1.0 + math.log(count) if count > 1.0 else count
+            vec[bucket] = vec.get(bucket, 0.0) + sign * tf
+        return _normalize(vec)
+
+    def sparse_batch(self, texts: Sequence[str]) -> List[SparseVector]:
+        return [self.sparse(t) for t in texts]
+
+    def embed(self, text: str) -> List[float]:
+        """Dense embedding (length ``dim``) suitable for pgvector storage."""
+        dense = [0.0] * self.dim
+        for bucket, weight in self.sparse(text).items():
+            dense[bucket] = weight
+        return dense
+
+    def embed_batch(self, texts: Sequence[str]) -> Any:
+        """Dense embeddings for many texts (ndarray when NumPy is installed)."""
+        sparse = self.sparse_batch(texts)
+        if NUMPY_AVAILABLE:
+            out = np.zeros((len(sparse), self.dim), dtype=np.float32)
+            for row, vec in enumerate(sparse):
+                if vec:
+                    out[row, list(vec.keys())] = list(vec.values())
+            return out
+        result = []
+        for vec in sparse:
+            dense = [0.0] * self.dim
+            for bucket, weight in vec.items():
+                dense[bucket] = weight
+            result.append(dense)
+        return result
+
+
+def _normalize(vec: SparseVector) -> SparseVector:
+    norm = math.sqrt(sum(w * w for w in vec.values()))
+    if norm == 0.0:
+        return {}
+    return {k: w / norm for k, w in vec.items() if w != 0.0}
+
+
+def cosine(a: SparseVector, b: SparseVector) -> float:
+    """Cosine similarity of two normalised sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(k, 0.0) for k, w in a.items())
+
+
+class VectorIndex:
+    """Thread-safe in-process vector index over sparse hashed embeddings.
+
+    Exact search accumulates dot products through an inverted index, so cost
+    is proportional to the postings touched by the query rather than to the
+    corpus size. ``approximate=True`` only walks the postings of the
+    highest-weight query features, trading a little recall for bounded latency on large
+    corpora.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[LocalEmbedder] = None,
+        approximate: bool = False,
+        max_query_features: int = DEFAULT_MAX_QUERY_FEATURES,
+    ):
+        self.embedder = embedder or LocalEmbedder()
+        self.approximate = approximate
+        self.max_query_features = max_query_features
+        self._lock = threading.RLock()
+        self._vectors: Dict[str, SparseVector] = {}
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._postings: Dict[int, Dict[str, float]] = {}
+        self._df: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._vectors
+
+    def get_metadata(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            meta = self._metadata.get(doc_id)
+            return dict(meta) if meta is not None else None
+
+    def add(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Add or replace a document."""
+        self.add_vectors([(doc_id, self.embedder.sparse(text), metadata)])
+
+    def add_batch(self, items: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]]) -> int:
+        """Embed and add many documents; returns the number added."""
+        items = list(items)
+        vectors = self.embedder.sparse_batch([text for _, text, _ in items])
+        return self.add_vectors(
+            (doc_id, vec, meta) for (doc_id, _, meta), vec in zip(items, vectors)
+        )
+
+    def add_vectors(self, items: Iterable[Tuple[str, SparseVector, Optional[Dict[str, Any]]]]) -> int:
+        """Add precomputed sparse vectors (used by batch paths and rebuilds)."""
+        count = 0
+        with self._lock:
+            for doc_id, vec, meta in items:
+                doc_id = str(doc_id)
+                if doc_id in self._vectors:
+                    self._remove_locked(doc_id)
+                self._vectors[doc_id] = vec
+                self._metadata[doc_id] = dict(meta or {})
+                for bucket, weight in vec.items():
+                    self._postings.setdefault(bucket, {})[doc_id] = weight
+                    self._df[bucket] = self._df.get(bucket, 0) + 1
+                count += 1
+        return count
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            if str(doc_id) not in self._vectors:
+                return False
+            self._remove_locked(str(doc_id))
+            return True
+
+    def _remove_locked(self, doc_id: str) -> None:
+        vec = self._vectors.pop(doc_id, {})
+        self._metadata.pop(doc_id, None)
+        for bucket in vec:
+            postings = self._postings.get(bucket)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[bucket]
+            remaining = self._df.get(bucket, 1) - 1
+            if remaining > 0:
+                self._df[bucket] = remaining
+            else:
+                self._df.pop(bucket, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._vectors.clear()
+            self._metadata.clear()
+            self._postings.clear()
+            self._df.clear()
+
+    def _query_vector(self, query: str) -> SparseVector:
+        """Query vector re-weighted by smoothed IDF from the indexed corpus."""
+        n_docs = len(self._vectors)
+        weighted = {}
+        for bucket, weight in self.embedder.sparse(query).items():
+            df = self._df.get(bucket, 0)
+            if df == 0:
+                continue
+            weighted[bucket] = weight * (math.log((n_docs + 1) / (df + 1)) + 1.0)
+        return _normalize(weighted)
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        min_score: float = 0.0,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Top-k most similar documents.
+
+        Args:
+            query: Free-text query.
+            k: Number of results.
+            min_score: Drop results scoring below this cosine similarity.
+            where: Optional metadata predicate (e.g. filter by source/worker).
+
+        Returns:
+            List of {"id", "score", **metadata}, best first.
+        """
+        if k <= 0:
+            return []
+        with self._lock:
+            qvec = self._query_vector(query)
+            if not qvec:
+                return []
+            features = list(qvec.items())
+            if self.approximate and len(features) > self.max_query_features:
+                # Highest IDF-weighted features carry most of the signal and
+                # have the shortest postings; skip the rest
+                features.sort(key=lambda item: abs(item[1]), reverse=True)
+                features = features[: self.max_query_features]
+
+            scores: Dict[str, float] = {}
+            for bucket, qweight in features:
+                for doc_id, dweight in self._postings.get(bucket, {}).items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + qweight * dweight
+
+            if where is not None:
+                candidates = (
+                    (score, doc_id) for doc_id, score in scores.items()
+                    if score >= min_score and where(self._metadata.get(doc_id, {}))
+                )
+            else:
+                candidates = ((score, doc_id) for doc_id, score in scores.items() if score >= min_score)
+            top = heapq.nlargest(k, candidates)
+            return [{"id": doc_id, "score": round(score, 6), **self._metadata.get(doc_id, {})} for score, doc_id in top]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": len(self._vectors),
+                "features": len(self._postings),
+                "dim": self.embedder.dim,
+                "approximate": self.approximate,
+                "numpy": NUMPY_AVAILABLE,
+            }
+
+
+__all__ = [
+    "EMBEDDING_DIM",
+    "NUMPY_AVAILABLE",
+    "LocalEmbedder",
+    "VectorIndex",
+    "cosine",
+    "tokenize",
+]
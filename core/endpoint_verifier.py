@@ -32,8 +32,10 @@ import json
 import time
 import urllib.request
 import urllib.error
+import ssl
 import subprocess
 import base64
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from urllib.parse import urlparse
 from dataclasses import dataclass, field
 from typing import Callable, Dict, Any, Optional, List, Union
@@ -41,6 +43,13 @@ from enum import Enum
 from datetime import datetime, timezone
 
 
+# Shared deadline for a composite verification (override with "timeout")
+COMPOSITE_TIMEOUT_SECONDS = 120
+
+# Upper bound on sub-checks of one composite running at the same time
+MAX_COMPOSITE_WORKERS = 8
+
+
 class EndpointType(Enum):
     """Types of endpoint verification checks."""
     HTTP = "http"
@@ -106,6 +115,10 @@ class EndpointVerifier:
         self.github_api_url = "https://api.github.com"
         self.railway_api_url = "https://backboard.railway.com/graphql/v2"
         
+        # One TLS context shared by every request this verifier makes
+        # (composite sub-checks included), instead of one per urlopen call
+        self._ssl_context = ssl.create_default_context()
+        
         # Map endpoint types to handler methods
         self.handlers: Dict[EndpointType, Callable[[Dict[str, Any]], EndpointResult]] = {
             EndpointType.HTTP: self._verify_http,
@@ -117,6 +130,10 @@ class EndpointVerifier:
             EndpointType.COMPOSITE: self._verify_composite,
         }
     
+    def _urlopen(self, req: urllib.request.Request, timeout: float):
+        """urlopen with the verifier's shared TLS context."""
+        return urllib.request.urlopen(req, timeout=timeout, context=self._ssl_context)
+    
     def verify_endpoint(self, task: Dict[str, Any]) -> EndpointResult:
         """
         Verify a task's endpoint definition.
@@ -248,7 +265,7 @@ class EndpointVerifier:
                 for key, value in headers.items():
                     req.add_header(key, value)
                 
-                with urllib.request.urlopen(req, timeout=timeout) as response:
+                with self._urlopen(req, timeout=timeout) as response:
                     status_code = response.status
                     body = response.read().decode("utf-8", errors="ignore")
                     
@@ -485,7 +502,7 @@ class EndpointVerifier:
         req.add_header("Content-Type", "application/json")
         req.add_header("Neon-Connection-String", conn_str)
         
-        with urllib.request.urlopen(req, timeout=30) as response:
+        with self._urlopen(req, timeout=30) as response:
             result = json.loads(response.read().decode("utf-8"))
         
         # Extract first value from result
@@ -629,7 +646,7 @@ class EndpointVerifier:
             req.add_header("Accept", "application/vnd.github.v3+json")
             req.add_header("User-Agent", "Juggernaut-EndpointVerifier/1.0")
             
-            with urllib.request.urlopen(req, timeout=self.default_timeout) as response:
+            with self._urlopen(req, timeout=self.default_timeout) as response:
                 result = json.loads(response.read().decode("utf-8"))
                 
                 details["sha"] = result.get("sha")
@@ -758,7 +775,7 @@ class EndpointVerifier:
             req.add_header("Content-Type", "application/json")
             req.add_header("User-Agent", "Juggernaut-EndpointVerifier/1.0")
             
-            with urllib.request.urlopen(req, timeout=self.default_timeout) as response:
+            with self._urlopen(req, timeout=self.default_timeout) as response:
                 result = json.loads(response.read().decode("utf-8"))
             
             if "errors" in result:
@@ -828,7 +845,7 @@ class EndpointVerifier:
             req.add_header("Authorization", f"Bearer {vercel_token}")
             req.add_header("User-Agent", "Juggernaut-EndpointVerifier/1.0")
             
-            with urllib.request.urlopen(req, timeout=self.default_timeout) as response:
+            with self._urlopen(req, timeout=self.default_timeout) as response:
                 result = json.loads(response.read().decode("utf-8"))
             
             deployments = result.get("deployments", [])
@@ -993,7 +1010,7 @@ class EndpointVerifier:
             req = urllib.request.Request(url, method="HEAD")
             req.add_header("User-Agent", "Juggernaut-EndpointVerifier/1.0")
             
-            with urllib.request.urlopen(req, timeout=timeout) as response:
+            with self._urlopen(req, timeout=timeout) as response:
                 status_code = response.status
                 details["status_code"] = status_code
                 
@@ -1019,7 +1036,7 @@ class EndpointVerifier:
                 try:
                     req = urllib.request.Request(url, method="GET")
                     req.add_header("User-Agent", "Juggernaut-EndpointVerifier/1.0")
-                    with urllib.request.urlopen(req, timeout=timeout) as response:
+                    with self._urlopen(req, timeout=timeout) as response:
                         details["status_code"] = response.status
                         return EndpointResult(
                             passed=True,
@@ -1043,10 +1060,45 @@ class EndpointVerifier:
                 error=f"URL not accessible: {str(e)}"
             )
     
+    def _run_check(self, check_def: Dict[str, Any]) -> EndpointResult:
+        """Run one composite sub-check and time it."""
+        check_type = str(check_def.get("type", "unknown")).lower()
+        start_time = time.time()
+        try:
+            endpoint_type = EndpointType(check_type)
+            handler = self.handlers.get(endpoint_type)
+            
+            if handler and handler != self._verify_composite:
+                result = handler(check_def)
+            else:
+                result = EndpointResult(
+                    passed=False,
+                    endpoint_type=check_type,
+                    error=f"Unknown or recursive check type: {check_type}"
+                )
+        except ValueError:
+            result = EndpointResult(
+                passed=False,
+                endpoint_type=check_type,
+                error=f"Unknown check type: {check_type}"
+            )
+        except Exception as e:
+            result = EndpointResult(
+                passed=False,
+                endpoint_type=check_type,
+                error=f"Check error: {str(e)}"
+            )
+        result.duration_ms = int((time.time() - start_time) * 1000)
+        return result
+    
     def _verify_composite(self, definition: Dict[str, Any]) -> EndpointResult:
         """
         Verify multiple checks together.
         
+        Sub-checks run concurrently under one shared deadline. Evaluation stops
+        as soon as the outcome is decided (first pass for "any", first failure
+        for "all"); checks still outstanding are cancelled and reported as such.
+        
         Definition format:
         {
             "type": "composite",
@@ -1054,11 +1106,13 @@ class EndpointVerifier:
                 {"type": "http", "url": "...", ...},
                 {"type": "file_exists", "repo": "...", ...}
             ],
-            "require": "all" | "any"
+            "require": "all" | "any",
+            "timeout": 120
         }
         """
         checks = definition.get("checks", [])
         require = definition.get("require", "all").lower()
+        deadline_seconds = float(definition.get("timeout", COMPOSITE_TIMEOUT_SECONDS))
         
         if not checks:
             return EndpointResult(
@@ -1067,38 +1121,67 @@ class EndpointVerifier:
                 error="No checks specified in composite verification"
             )
         
+        if require not in ("all", "any"):
+            return EndpointResult(
+                passed=False,
+                endpoint_type="composite",
+                details={"checks_count": len(checks), "require": require},
+                error=f"Unknown require mode: {require}"
+            )
+        
+        outcomes: Dict[int, Optional[EndpointResult]] = {}
+        decided = False
+        timed_out = False
+        executor = ThreadPoolExecutor(
+            max_workers=min(len(checks), MAX_COMPOSITE_WORKERS),
+            thread_name_prefix="endpoint-check"
+        )
+        try:
+            futures = {executor.submit(self._run_check, check_def): i for i, check_def in enumerate(checks)}
+            deadline = time.time() + deadline_seconds
+            pending = set(futures)
+            while pending and not decided:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    outcomes[futures[future]] = result
+                    if (require == "any") == result.passed:
+                        decided = True
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
         results = []
         passed_count = 0
         failed_count = 0
-        
+        cancelled_count = 0
         for i, check_def in enumerate(checks):
-            raw_type = check_def.get("type", "unknown")
-            check_type = str(raw_type).lower()
-            
-            try:
-                endpoint_type = EndpointType(check_type)
-                handler = self.handlers.get(endpoint_type)
-                
-                if handler and handler != self._verify_composite:
-                    result = handler(check_def)
-                else:
-                    result = EndpointResult(
-                        passed=False,
-                        endpoint_type=check_type,
-                        error=f"Unknown or recursive check type: {check_type}"
-                    )
-            except ValueError:
-                result = EndpointResult(
-                    passed=False,
-                    endpoint_type=check_type,
-                    error=f"Unknown check type: {check_type}"
-                )
+            check_type = str(check_def.get("type", "unknown")).lower()
+            result = outcomes.get(i)
+            if result is None:
+                cancelled_count += 1
+                results.append({
+                    "index": i,
+                    "type": check_type,
+                    "passed": False,
+                    "cancelled": True,
+                    "error": (
+                        f"Timed out after {deadline_seconds:g}s" if timed_out
+                        else "Cancelled: composite outcome already decided"
+                    ),
+                    "duration_ms": None
+                })
+                continue
             
             results.append({
                 "index": i,
                 "type": check_type,
                 "passed": result.passed,
-                "error": result.error
+                "error": result.error,
+                "duration_ms": result.duration_ms
             })
             
             if result.passed:
@@ -1110,23 +1193,28 @@ class EndpointVerifier:
             "checks_count": len(checks),
             "passed_count": passed_count,
             "failed_count": failed_count,
+            "cancelled_count": cancelled_count,
             "require": require,
+            "short_circuited": decided and cancelled_count > 0,
             "results": results
         }
         
         if require == "all":
-            passed = failed_count == 0
-            error = None if passed else f"{failed_count} of {len(checks)} checks failed"
-        elif require == "any":
-            passed = passed_count > 0
-            error = None if passed else "All checks failed"
+            passed = failed_count == 0 and cancelled_count == 0
+            if passed:
+                error = None
+            elif timed_out and failed_count == 0:
+                error = f"{cancelled_count} of {len(checks)} checks did not finish within {deadline_seconds:g}s"
+            else:
+                error = f"{failed_count} of {len(checks)} checks failed"
         else:
-            return EndpointResult(
-                passed=False,
-                endpoint_type="composite",
-                details=details,
-                error=f"Unknown require mode: {require}"
-            )
+            passed = passed_count > 0
+            if passed:
+                error = None
+            elif timed_out:
+                error = f"No check passed within {deadline_seconds:g}s"
+            else:
+                error = "All checks failed"
         
         return EndpointResult(
             passed=passed,
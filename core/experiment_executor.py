@@ -5,6 +5,11 @@ When an experiment is in 'running' status, this module:
 2. Checks what tasks already exist for it
 3. Creates the next phase of tasks if previous phase is complete
 4. Updates experiment progress
+
+progress_experiments() handles the whole portfolio in bulk: one joined read
+of every running experiment's task state, a pure planning step per
+experiment (plan_experiment_transition), and one batched write each for new
+tasks and retried tasks (apply_transitions).
 """
 
 import json
@@ -13,6 +18,8 @@ from datetime import datetime, timezone
 from typing import Any, Callable, Dict, List, Optional
 from uuid import uuid4
 
+from core.database import escape_sql_value
+
 logger = logging.getLogger(__name__)
 
 
@@ -323,6 +330,65 @@ def classify_experiment(experiment: Dict[str, Any]) -> Optional[str]:
     return "revenue"
 
 
+TASK_STATUSES = ("pending", "in_progress", "completed", "failed")
+
+# Failed experiment tasks are reset to pending at most this many times
+MAX_TASK_RETRIES = 3
+
+TASK_INSERT_COLUMNS = (
+    "id, title, description, task_type, status, priority, "
+    "payload, tags, created_at, updated_at"
+)
+
+# One round trip for the whole portfolio: every running experiment joined to
+# its auto-generated tasks (one row per task, task_* NULL when it has none),
+# with the reset count of each failed task.
+PROGRESSION_STATE_SQL = """
+    WITH running AS (
+        SELECT id, name, description, status, experiment_type, hypothesis,
+               current_iteration, budget_spent, budget_limit, created_at, updated_at
+        FROM experiments
+        WHERE status = 'running'
+        ORDER BY created_at ASC
+        {limit}
+    )
+    SELECT r.*,
+           t.id AS task_id,
+           t.title AS task_title,
+           t.status AS task_status,
+           t.task_type AS task_type,
+           t.priority AS task_priority,
+           t.payload::text AS task_payload_text,
+           t.created_at AS task_created_at,
+           CASE WHEN t.status = 'failed' THEN (
+               SELECT COUNT(*)
+               FROM execution_logs l
+               WHERE l.action = 'experiment.task_reset'
+                 AND l.output_data::text LIKE '%' || t.id::text || '%'
+           ) ELSE 0 END AS task_retry_count
+    FROM running r
+    LEFT JOIN governance_tasks t
+      ON (t.payload->>'experiment_id' = r.id::text
+          OR t.tags::text LIKE '%' || LEFT(r.id::text, 8) || '%')
+     AND t.payload::text LIKE '%"auto_generated": true%'
+    ORDER BY r.created_at ASC, r.id, t.created_at ASC
+"""
+
+
+def _group_tasks(tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Bucket an experiment's tasks by status (unknown statuses count as pending)."""
+    by_status: Dict[str, List[Dict[str, Any]]] = {status: [] for status in TASK_STATUSES}
+    for t in tasks:
+        status = t.get("status", "pending")
+        by_status[status if status in by_status else "pending"].append(t)
+
+    return {
+        "total": len(tasks),
+        "by_status": by_status,
+        "all_tasks": tasks
+    }
+
+
 def get_existing_tasks(
     experiment_id: str,
     execute_sql: Callable[[str], Dict[str, Any]]
@@ -331,7 +397,7 @@ def get_existing_tasks(
 
     # Search for tasks linked to this experiment
     exp_id_short = experiment_id[:8] if experiment_id else ""
-    
+
     result = execute_sql(f"""
         SELECT id, title, status, task_type, priority,
                payload::text as payload_text,
@@ -344,47 +410,38 @@ def get_existing_tasks(
         ORDER BY created_at ASC
     """)
 
-    tasks = result.get("rows", []) or []
+    return _group_tasks(result.get("rows", []) or [])
 
-    by_status: Dict[str, List[Dict[str, Any]]] = {
-        "pending": [], 
-        "in_progress": [], 
-        "completed": [], 
-        "failed": []
-    }
-    
-    for t in tasks:
-        status = t.get("status", "pending")
-        if status in by_status:
-            by_status[status].append(t)
-        else:
-            by_status["pending"].append(t)
 
+def get_retry_counts(
+    task_ids: List[str],
+    execute_sql: Callable[[str], Dict[str, Any]]
+) -> Dict[str, int]:
+    """Number of times each task has been reset by the executor (one query)."""
+    if not task_ids:
+        return {}
+    id_list = ", ".join(escape_sql_value(str(task_id)) for task_id in task_ids)
+    result = execute_sql(f"""
+        SELECT ids.id AS task_id, COUNT(l.id) AS retry_count
+        FROM unnest(ARRAY[{id_list}]::text[]) AS ids(id)
+        LEFT JOIN execution_logs l
+          ON l.action = 'experiment.task_reset'
+         AND l.output_data::text LIKE '%' || ids.id || '%'
+        GROUP BY ids.id
+    """)
     return {
-        "total": len(tasks),
-        "by_status": by_status,
-        "all_tasks": tasks
+        str(row.get("task_id")): int(row.get("retry_count") or 0)
+        for row in result.get("rows", []) or []
     }
 
 
-def create_task_for_experiment(
-    experiment: Dict[str, Any],
-    template: Dict[str, Any],
-    execute_sql: Callable[[str], Dict[str, Any]],
-    log_action: Callable[..., Any]
-) -> Optional[str]:
-    """Create a single task from a template for an experiment."""
-
-    task_id = str(uuid4())
+def _build_task_row(experiment: Dict[str, Any], template: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for a new governance_tasks row created from a template."""
     now = datetime.now(timezone.utc).isoformat()
     exp_id = experiment.get("id", "")
-    exp_name = (experiment.get("name") or "Unknown").replace("'", "''")
-
-    title = (template.get("title") or "Experiment Task").replace("'", "''")
     task_type = template.get("task_type", "research")
-    description = (template.get("description") or "").replace("'", "''")
-    priority = _normalize_task_priority(template.get("priority"))
     phase = template.get("phase", 1)
+    title = template.get("title") or "Experiment Task"
 
     # Build payload with experiment reference
     payload = {
@@ -394,37 +451,51 @@ def create_task_for_experiment(
         "auto_generated": True,
         "template_title": template.get("title", "")
     }
-    
+
     # Add query field for research tasks
     if task_type == "research":
         payload["query"] = title  # Use task title as research query
-    
+
     # Build tags for easy lookup
     exp_id_short = exp_id[:8] if exp_id else "unknown"
     tags = ["experiment", f"exp-{exp_id_short}", f"phase-{phase}", "auto-generated"]
 
+    return {
+        "id": str(uuid4()),
+        "title": title,
+        "description": template.get("description") or "",
+        "task_type": task_type,
+        "status": "pending",
+        "priority": _normalize_task_priority(template.get("priority")),
+        "payload": json.dumps(payload),
+        "tags": json.dumps(tags),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def create_task_for_experiment(
+    experiment: Dict[str, Any],
+    template: Dict[str, Any],
+    execute_sql: Callable[[str], Dict[str, Any]],
+    log_action: Callable[..., Any]
+) -> Optional[str]:
+    """Create a single task from a template for an experiment."""
+
+    row = _build_task_row(experiment, template)
+    task_id = row["id"]
+    exp_id = experiment.get("id", "")
+    phase = template.get("phase", 1)
+
     try:
         # Use parameterized query via fetch_all to avoid SQL injection
         from core.database import fetch_all
-        
-        fetch_all("""
-            INSERT INTO governance_tasks (
-                id, title, description, task_type, status, priority,
-                payload, tags, created_at, updated_at
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+
+        fetch_all(f"""
+            INSERT INTO governance_tasks ({TASK_INSERT_COLUMNS})
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             RETURNING id
-        """, (
-            task_id,
-            title,
-            description,
-            task_type,
-            'pending',
-            priority,
-            json.dumps(payload),
-            json.dumps(tags),
-            now,
-            now
-        ))
+        """, tuple(row.values()))
 
         log_action(
             "experiment.task_created",
@@ -435,7 +506,7 @@ def create_task_for_experiment(
                 "experiment_id": exp_id,
                 "experiment_name": experiment.get("name"),
                 "phase": phase,
-                "task_type": task_type
+                "task_type": row["task_type"]
             }
         )
 
@@ -468,63 +539,46 @@ def get_phase_from_task(task: Dict[str, Any]) -> int:
         return 0
 
 
-def progress_single_experiment(
+def plan_experiment_transition(
     experiment: Dict[str, Any],
-    execute_sql: Callable[[str], Dict[str, Any]],
-    log_action: Callable[..., Any]
+    existing: Dict[str, Any],
+    retry_counts: Optional[Dict[str, int]] = None
 ) -> Dict[str, Any]:
-    """Progress a single experiment by creating needed tasks."""
+    """Decide the next step for one experiment from its task state.
 
+    Pure function (no I/O): ``existing`` is the get_existing_tasks() shape and
+    ``retry_counts`` maps failed task IDs to their previous reset count.
+
+    Returns the progress result for the experiment plus two work lists for
+    apply_transitions(): "create" (templates to instantiate) and
+    "reset_task_ids" (failed tasks to put back to pending).
+    """
     exp_id = experiment.get("id", "")
     exp_name = experiment.get("name", "Unknown")
+    plan: Dict[str, Any] = {
+        "experiment_id": exp_id,
+        "experiment_name": exp_name,
+        "create": [],
+        "reset_task_ids": [],
+    }
 
     # Classify the experiment type
     exp_type = classify_experiment(experiment)
     if not exp_type:
-        log_action(
-            "experiment.unknown_type",
-            f"Cannot progress experiment - unknown type: {exp_name[:50]}",
-            level="warn",
-            output_data={"experiment_id": exp_id, "name": exp_name}
-        )
-        return {
-            "experiment_id": exp_id,
-            "experiment_name": exp_name,
-            "status": "skipped",
-            "reason": "Unknown experiment type - no templates available"
-        }
+        plan.update(status="skipped", reason="Unknown experiment type - no templates available")
+        return plan
 
     # Get templates for this experiment type
     templates = EXPERIMENT_TEMPLATES.get(exp_type, [])
     if not templates:
-        return {
-            "experiment_id": exp_id,
-            "experiment_name": exp_name,
-            "status": "skipped",
-            "reason": f"No templates defined for experiment type: {exp_type}"
-        }
-
-    # Check what tasks already exist
-    existing = get_existing_tasks(exp_id, execute_sql)
+        plan.update(status="skipped", reason=f"No templates defined for experiment type: {exp_type}")
+        return plan
 
     # If no tasks exist yet, create Phase 1 tasks
     if existing["total"] == 0:
-        phase_1_templates = [t for t in templates if t.get("phase", 1) == 1]
-        created_ids = []
-        
-        for tmpl in phase_1_templates:
-            task_id = create_task_for_experiment(experiment, tmpl, execute_sql, log_action)
-            if task_id:
-                created_ids.append(task_id)
-
-        return {
-            "experiment_id": exp_id,
-            "experiment_name": exp_name,
-            "status": "phase_started",
-            "phase": 1,
-            "tasks_created": len(created_ids),
-            "task_ids": created_ids
-        }
+        plan.update(status="phase_started", phase=1)
+        plan["create"] = [t for t in templates if t.get("phase", 1) == 1]
+        return plan
 
     # Check status of existing tasks
     pending = existing["by_status"].get("pending", [])
@@ -534,84 +588,39 @@ def progress_single_experiment(
 
     # If there are still pending or in-progress tasks, wait for them
     if pending or in_progress:
-        return {
-            "experiment_id": exp_id,
-            "experiment_name": exp_name,
-            "status": "waiting_for_tasks",
-            "pending_count": len(pending),
-            "in_progress_count": len(in_progress),
-            "completed_count": len(completed)
-        }
+        plan.update(
+            status="waiting_for_tasks",
+            pending_count=len(pending),
+            in_progress_count=len(in_progress),
+            completed_count=len(completed)
+        )
+        return plan
 
     # If all tasks failed, reset them to pending for retry (max 3 attempts per task)
     if failed and not completed:
-        from core.database import fetch_all
-        
-        # Check how many times each failed task has been retried
-        tasks_to_reset = []
-        for task in failed:
-            task_id = task.get("id")
-            # Count previous resets by checking execution logs
-            retry_count_sql = f"""
-                SELECT COUNT(*) as retry_count
-                FROM execution_logs
-                WHERE action = 'experiment.task_reset'
-                AND output_data::text LIKE '%{task_id}%'
-            """
-            result = execute_sql(retry_count_sql)
-            retry_count = (result.get("rows", [{}])[0] or {}).get("retry_count", 0)
-            # Ensure retry_count is int (DB may return string)
-            retry_count = int(retry_count) if retry_count else 0
-            
-            if retry_count < 3:
-                tasks_to_reset.append(task_id)
-        
-        if tasks_to_reset:
-            # Reset failed tasks to pending
-            task_ids_str = "', '".join(tasks_to_reset)
-            reset_sql = f"""
-                UPDATE governance_tasks
-                SET status = 'pending',
-                    error_message = 'Auto-reset by experiment executor - retry attempt',
-                    updated_at = NOW()
-                WHERE id IN ('{task_ids_str}')
-            """
-            execute_sql(reset_sql)
-            
-            log_action(
-                "experiment.task_reset",
-                f"Reset {len(tasks_to_reset)} failed tasks to pending for retry",
-                level="info",
-                output_data={
-                    "experiment_id": exp_id,
-                    "task_ids": tasks_to_reset,
-                    "failed_count": len(failed)
-                }
+        retry_counts = retry_counts or {}
+        plan["reset_task_ids"] = [
+            task.get("id") for task in failed
+            if int(retry_counts.get(str(task.get("id")), 0) or 0) < MAX_TASK_RETRIES
+        ]
+        if plan["reset_task_ids"]:
+            plan.update(
+                status="tasks_reset",
+                reason="Failed tasks reset to pending for retry",
+                reset_count=len(plan["reset_task_ids"]),
+                failed_count=len(failed)
             )
-            
-            return {
-                "experiment_id": exp_id,
-                "experiment_name": exp_name,
-                "status": "tasks_reset",
-                "reason": "Failed tasks reset to pending for retry",
-                "reset_count": len(tasks_to_reset)
-            }
         else:
             # All tasks have been retried 3 times, give up
-            return {
-                "experiment_id": exp_id,
-                "experiment_name": exp_name,
-                "status": "blocked",
-                "reason": "All tasks failed after 3 retry attempts",
-                "failed_count": len(failed)
-            }
+            plan.update(
+                status="blocked",
+                reason="All tasks failed after 3 retry attempts",
+                failed_count=len(failed)
+            )
+        return plan
 
     # Find the maximum phase that's been completed
-    max_completed_phase = 0
-    for task in completed:
-        phase = get_phase_from_task(task)
-        if phase > max_completed_phase:
-            max_completed_phase = phase
+    max_completed_phase = max([get_phase_from_task(task) for task in completed] + [0])
 
     # Determine next phase
     next_phase = max_completed_phase + 1
@@ -619,68 +628,245 @@ def progress_single_experiment(
 
     # If no more phases, experiment is complete
     if not next_phase_templates:
-        log_action(
-            "experiment.all_phases_complete",
-            f"All phases complete for experiment: {exp_name[:50]}",
-            level="info",
-            output_data={
-                "experiment_id": exp_id,
-                "phases_completed": max_completed_phase,
-                "total_tasks_completed": len(completed)
-            }
+        plan.update(
+            status="all_phases_complete",
+            phases_completed=max_completed_phase,
+            total_tasks=len(completed)
         )
-        return {
-            "experiment_id": exp_id,
-            "experiment_name": exp_name,
-            "status": "all_phases_complete",
-            "phases_completed": max_completed_phase,
-            "total_tasks": len(completed)
-        }
+        return plan
 
-    # Create tasks for the next phase
-    created_ids = []
-    for tmpl in next_phase_templates:
-        task_id = create_task_for_experiment(experiment, tmpl, execute_sql, log_action)
-        if task_id:
-            created_ids.append(task_id)
+    plan.update(status="phase_started", phase=next_phase, previous_phase_completed=max_completed_phase)
+    plan["create"] = next_phase_templates
+    return plan
 
-    return {
-        "experiment_id": exp_id,
-        "experiment_name": exp_name,
-        "status": "phase_started",
-        "phase": next_phase,
-        "tasks_created": len(created_ids),
-        "task_ids": created_ids,
-        "previous_phase_completed": max_completed_phase
-    }
+
+def _sql_literal(value: Any) -> str:
+    """SQL literal; strings use E'' so escaped backslashes (e.g. in JSON) read back unchanged."""
+    literal = escape_sql_value(value)
+    return f"E{literal}" if literal.startswith("'") else literal
+
+
+def _task_insert_sql(rows: List[Dict[str, Any]]) -> str:
+    """One multi-row INSERT for governance_tasks rows from _build_task_row."""
+    values = ",\n".join(
+        "(" + ", ".join(_sql_literal(v) for v in row.values()) + ")"
+        for row in rows
+    )
+    return f"INSERT INTO governance_tasks ({TASK_INSERT_COLUMNS}) VALUES {values}"
+
+
+def apply_transitions(
+    experiments: List[Dict[str, Any]],
+    plans: List[Dict[str, Any]],
+    execute_sql: Callable[[str], Dict[str, Any]],
+    log_action: Callable[..., Any]
+) -> List[Dict[str, Any]]:
+    """Apply planned transitions with one INSERT for all new tasks and one
+    UPDATE for all task resets, then log per experiment.
+
+    Returns one progress result per plan (the plan without its work lists,
+    plus tasks_created / task_ids for started phases).
+    """
+    new_rows: List[Dict[str, Any]] = []
+    rows_by_plan: List[List[Dict[str, Any]]] = []
+    for experiment, plan in zip(experiments, plans):
+        rows = [_build_task_row(experiment, tmpl) for tmpl in plan["create"]]
+        rows_by_plan.append(rows)
+        new_rows.extend(rows)
+
+    created_ids: set = set()
+    if new_rows:
+        try:
+            execute_sql(_task_insert_sql(new_rows))
+            created_ids = {row["id"] for row in new_rows}
+        except Exception as e:
+            # One bad row must not cost every experiment its tasks this cycle
+            logger.warning(f"Batched experiment task insert failed, retrying row by row: {e}")
+            failed: Dict[str, str] = {}
+            for experiment, rows in zip(experiments, rows_by_plan):
+                for row in rows:
+                    try:
+                        execute_sql(_task_insert_sql([row]))
+                        created_ids.add(row["id"])
+                    except Exception as row_err:
+                        failed[str(experiment.get("id", ""))] = str(row_err)
+            if failed:
+                error = next(iter(failed.values()))
+                logger.error(f"Failed to create tasks for {len(failed)} experiment(s): {error}")
+                try:
+                    log_action(
+                        "experiment.task_creation_failed",
+                        f"Failed to create tasks for {len(failed)} experiment(s): {error[:100]}",
+                        level="error",
+                        output_data={
+                            "experiment_ids": list(failed),
+                            "error": error
+                        }
+                    )
+                except Exception as log_err:
+                    logger.error(f"Failed to log task creation error: {log_err}")
+
+    reset_ids = [task_id for plan in plans for task_id in plan["reset_task_ids"]]
+    reset = True
+    if reset_ids:
+        id_list = ", ".join(escape_sql_value(str(task_id)) for task_id in reset_ids)
+        try:
+            execute_sql(f"""
+                UPDATE governance_tasks
+                SET status = 'pending',
+                    error_message = 'Auto-reset by experiment executor - retry attempt',
+                    updated_at = NOW()
+                WHERE id IN ({id_list})
+            """)
+        except Exception as e:
+            reset = False
+            logger.error(f"Failed to reset experiment tasks: {e}")
+
+    results = []
+    for experiment, plan, rows in zip(experiments, plans, rows_by_plan):
+        result = {k: v for k, v in plan.items() if k not in ("create", "reset_task_ids")}
+        exp_id, exp_name = plan["experiment_id"], plan["experiment_name"] or "Unknown"
+        status = plan["status"]
+
+        if status == "phase_started":
+            task_ids = [row["id"] for row in rows if row["id"] in created_ids]
+            result.update(tasks_created=len(task_ids), task_ids=task_ids)
+            if task_ids:
+                log_action(
+                    "experiment.task_created",
+                    f"Created {len(task_ids)} Phase {plan['phase']} task(s) for experiment: {exp_name[:50]}",
+                    level="info",
+                    output_data={
+                        "task_ids": task_ids,
+                        "experiment_id": exp_id,
+                        "experiment_name": experiment.get("name"),
+                        "phase": plan["phase"],
+                        "task_types": [row["task_type"] for row in rows]
+                    }
+                )
+        elif status == "tasks_reset":
+            if not reset:
+                result.update(status="error", error="Failed to reset failed tasks")
+            else:
+                log_action(
+                    "experiment.task_reset",
+                    f"Reset {len(plan['reset_task_ids'])} failed tasks to pending for retry",
+                    level="info",
+                    output_data={
+                        "experiment_id": exp_id,
+                        "task_ids": plan["reset_task_ids"],
+                        "failed_count": plan.get("failed_count", 0)
+                    }
+                )
+        elif status == "all_phases_complete":
+            log_action(
+                "experiment.all_phases_complete",
+                f"All phases complete for experiment: {exp_name[:50]}",
+                level="info",
+                output_data={
+                    "experiment_id": exp_id,
+                    "phases_completed": plan["phases_completed"],
+                    "total_tasks_completed": plan["total_tasks"]
+                }
+            )
+        elif status == "skipped" and plan.get("reason", "").startswith("Unknown experiment type"):
+            log_action(
+                "experiment.unknown_type",
+                f"Cannot progress experiment - unknown type: {exp_name[:50]}",
+                level="warn",
+                output_data={"experiment_id": exp_id, "name": exp_name}
+            )
+        results.append(result)
+
+    return results
+
+
+def progress_single_experiment(
+    experiment: Dict[str, Any],
+    execute_sql: Callable[[str], Dict[str, Any]],
+    log_action: Callable[..., Any]
+) -> Dict[str, Any]:
+    """Progress a single experiment by creating needed tasks."""
+
+    existing = get_existing_tasks(experiment.get("id", ""), execute_sql)
+
+    retry_counts: Dict[str, int] = {}
+    failed = existing["by_status"].get("failed", [])
+    if failed and not existing["by_status"].get("completed"):
+        retry_counts = get_retry_counts([t.get("id") for t in failed], execute_sql)
+
+    plan = plan_experiment_transition(experiment, existing, retry_counts)
+    return apply_transitions([experiment], [plan], execute_sql, log_action)[0]
+
+
+def fetch_progression_state(
+    execute_sql: Callable[[str], Dict[str, Any]],
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Load every running experiment with its task state in one query.
+
+    Returns (oldest first) dicts of ``experiment``, ``existing`` (the
+    get_existing_tasks() shape) and ``retry_counts``.
+    """
+    limit_sql = f"LIMIT {int(limit)}" if limit else ""
+    rows = execute_sql(PROGRESSION_STATE_SQL.format(limit=limit_sql)).get("rows", []) or []
+
+    states: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        exp_id = str(row.get("id"))
+        state = states.get(exp_id)
+        if state is None:
+            experiment = {k: v for k, v in row.items() if not k.startswith("task_")}
+            state = states[exp_id] = {"experiment": experiment, "tasks": [], "retry_counts": {}}
+        if row.get("task_id") is None:
+            continue
+        task_id = str(row["task_id"])
+        state["tasks"].append({
+            "id": task_id,
+            "title": row.get("task_title"),
+            "status": row.get("task_status"),
+            "task_type": row.get("task_type"),
+            "priority": row.get("task_priority"),
+            "payload_text": row.get("task_payload_text"),
+            "created_at": row.get("task_created_at"),
+        })
+        state["retry_counts"][task_id] = int(row.get("task_retry_count") or 0)
+
+    return [
+        {
+            "experiment": state["experiment"],
+            "existing": _group_tasks(state["tasks"]),
+            "retry_counts": state["retry_counts"],
+        }
+        for state in states.values()
+    ]
 
 
 def progress_experiments(
     execute_sql: Callable[[str], Dict[str, Any]],
     log_action: Callable[..., Any],
+    limit: Optional[int] = None,
 ) -> Dict[str, Any]:
     """Main entry point - progress all running experiments.
-    
+
     This function is called periodically by the engine to:
     1. Find all experiments in 'running' status
     2. Create tasks for experiments that need them
     3. Advance to next phase when current phase tasks complete
+
+    The whole portfolio is handled in three round trips regardless of its
+    size: one joined read of experiment and task state, one INSERT for all
+    new tasks and one UPDATE for all retried tasks. ``limit`` optionally
+    caps how many experiments (oldest first) are considered.
     """
 
     try:
-        res = execute_sql("""
-            SELECT id, name, description, status, experiment_type, hypothesis, current_iteration, budget_spent, budget_limit, created_at, updated_at
-            FROM experiments
-            WHERE status = 'running'
-            ORDER BY created_at ASC
-            LIMIT 10
-        """)
-        experiments = res.get("rows", []) or []
+        states = fetch_progression_state(execute_sql, limit=limit)
     except Exception as e:
         logger.error(f"Failed to fetch running experiments: {e}")
         return {"success": False, "error": str(e)}
 
-    if not experiments:
+    if not states:
         log_action(
             "experiment.none_running",
             "No running experiments to progress",
@@ -694,15 +880,14 @@ def progress_experiments(
             "tasks_created": 0
         }
 
-    # Progress each experiment
+    experiments = []
+    plans = []
     results = []
-    total_tasks_created = 0
-    
-    for exp in experiments:
+    for state in states:
+        exp = state["experiment"]
         try:
-            result = progress_single_experiment(exp, execute_sql, log_action)
-            results.append(result)
-            total_tasks_created += result.get("tasks_created", 0)
+            plans.append(plan_experiment_transition(exp, state["existing"], state["retry_counts"]))
+            experiments.append(exp)
         except Exception as e:
             logger.error(f"Error progressing experiment {exp.get('id')}: {e}")
             results.append({
@@ -712,19 +897,22 @@ def progress_experiments(
                 "error": str(e)
             })
 
+    results = apply_transitions(experiments, plans, execute_sql, log_action) + results
+    total_tasks_created = sum(r.get("tasks_created", 0) for r in results)
+
     # Count how many experiments we actually progressed
     progressed_count = len([r for r in results if r.get("tasks_created", 0) > 0])
 
     log_action(
         "experiment.progress_cycle_complete",
-        f"Checked {len(experiments)} experiments, created {total_tasks_created} tasks",
+        f"Checked {len(states)} experiments, created {total_tasks_created} tasks",
         level="info",
         output_data={
-            "experiments_checked": len(experiments),
+            "experiments_checked": len(states),
             "experiments_progressed": progressed_count,
             "total_tasks_created": total_tasks_created,
             "results_summary": [
-                {"id": r.get("experiment_id", "")[:8], "status": r.get("status"), "tasks": r.get("tasks_created", 0)}
+                {"id": str(r.get("experiment_id") or "")[:8], "status": r.get("status"), "tasks": r.get("tasks_created", 0)}
                 for r in results
             ]
         }
@@ -732,7 +920,7 @@ def progress_experiments(
 
     return {
         "success": True,
-        "running_experiments": len(experiments),
+        "running_experiments": len(states),
         "experiments_progressed": progressed_count,
         "total_tasks_created": total_tasks_created,
         "details": results
@@ -4,12 +4,17 @@ from datetime import datetime, timedelta, timezone
 import json
 from typing import Any, Callable, Dict, Optional, Set
 
+from core.schema_registry import get_schema_registry
+
 
 def _escape_sql_string(value: Any) -> str:
     return str(value or "").replace("'", "''")
 
 
 def _get_table_columns(execute_sql: Callable[[str], Dict[str, Any]], table_name: str) -> Set[str]:
+    cols = get_schema_registry().columns(table_name)
+    if cols is not None:
+        return cols
     try:
         res = execute_sql(
             f"""
@@ -0,0 +1,505 @@
+"""
+Experiment Statistics Engine
+============================
+
+Significance testing for A/B experiment variants across the whole running
+portfolio at once.
+
+- Per-variant sufficient statistics (samples, conversions, revenue) and the
+  latest value of every experiment metric are kept in memory. They are
+  loaded once and then advanced incrementally: from the write paths in
+  core.experiments (notify_* hooks) and by high-water-mark queries that only
+  read rows changed since the last sync. Nothing rescans experiment_results.
+- analyze() concatenates every (control, treatment) pair of every experiment
+  and evaluates them in one vectorised pass (NumPy when installed, a plain
+  Python loop otherwise):
+    * two-proportion z-test (pooled) with two-sided p-value
+    * Beta-Binomial posterior (uniform prior) mean, credible interval and
+      P(treatment beats control)
+    * O'Brien-Fleming sequential boundary for the current information
+      fraction, so checking every cycle does not inflate false positives
+
+Usage:
+    from core.experiment_stats import get_experiment_stats_engine
+
+    engine = get_experiment_stats_engine()
+    engine.ensure_fresh()
+    for experiment_id, analysis in engine.analyze().items():
+        if analysis["winner"]:
+            ...
+"""
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from statistics import NormalDist
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Two-sided significance level
+DEFAULT_ALPHA = 0.05
+
+# Samples per variant an experiment is planned for, unless the variant
+# config sets "planned_sample_size"; drives the sequential boundary
+DEFAULT_PLANNED_SAMPLES = 1000
+
+# Smallest information fraction used for the sequential boundary
+MIN_INFORMATION_FRACTION = 0.01
+
+# Seconds before ensure_fresh() runs another incremental sync
+SYNC_MAX_AGE_SECONDS = 30.0
+
+VARIANTS_SQL = """
+    SELECT id, experiment_id, name, is_control, config,
+           sample_size, conversions, revenue_generated,
+           created_at::text AS created_at,
+           COALESCE(updated_at, created_at)::text AS changed_at
+    FROM experiment_variants
+    {where}
+    ORDER BY changed_at
+"""
+
+LATEST_RESULTS_SQL = """
+    SELECT DISTINCT ON (experiment_id, metric_name)
+           experiment_id, metric_name, metric_value, timestamp::text AS ts
+    FROM experiment_results
+    {where}
+    ORDER BY experiment_id, metric_name, timestamp DESC
+"""
+
+
+@dataclass
+class VariantStats:
+    """Sufficient statistics of one experiment variant."""
+    variant_id: str
+    experiment_id: str
+    name: str = ""
+    is_control: bool = False
+    samples: int = 0
+    conversions: int = 0
+    revenue: float = 0.0
+    planned_samples: int = DEFAULT_PLANNED_SAMPLES
+    created_at: str = ""
+
+    @property
+    def conversion_rate(self) -> float:
+        return self.conversions / self.samples if self.samples else 0.0
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "VariantStats":
+        config = row.get("config") or {}
+        planned = config.get("planned_sample_size") if isinstance(config, dict) else None
+        return cls(
+            variant_id=str(row.get("id")),
+            experiment_id=str(row.get("experiment_id")),
+            name=row.get("name") or "",
+            is_control=row.get("is_control") in (True, "true", "t", 1),
+            samples=int(row.get("sample_size") or 0),
+            conversions=int(row.get("conversions") or 0),
+            revenue=float(row.get("revenue_generated") or 0),
+            planned_samples=int(planned or DEFAULT_PLANNED_SAMPLES),
+            created_at=str(row.get("created_at") or ""),
+        )
+
+
+# ------------------------------------------------------------------ #
+# Vectorised tests (sequences in, lists out)
+# ------------------------------------------------------------------ #
+
+_STD_NORMAL = NormalDist()
+
+
+def _z_quantile(alpha: float) -> float:
+    """Two-sided critical value z_{1-alpha/2}."""
+    return _STD_NORMAL.inv_cdf(1 - alpha / 2)
+
+
+def _np_norm_cdf(x):
+    # Abramowitz & Stegun 7.1.26 erf approximation (|error| < 1.5e-7)
+    z = np.abs(x) / math.sqrt(2)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def two_proportion_ztest(
+    conv_a: Sequence[float],
+    n_a: Sequence[float],
+    conv_b: Sequence[float],
+    n_b: Sequence[float],
+) -> Tuple[List[float], List[float]]:
+    """Pooled two-proportion z-test of B against A.
+
+    Returns (z_scores, two_sided_p_values); pairs without data get z=0, p=1.
+    """
+    if NUMPY_AVAILABLE:
+        ca, na, cb, nb = (np.asarray(v, dtype=float) for v in (conv_a, n_a, conv_b, n_b))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pa = np.where(na > 0, ca / na, 0.0)
+            pb = np.where(nb > 0, cb / nb, 0.0)
+            pooled = np.where(na + nb > 0, (ca + cb) / (na + nb), 0.0)
+            se = np.sqrt(pooled * (1 - pooled) * (np.where(na > 0, 1 / na, 0.0) + np.where(nb > 0, 1 / nb, 0.0)))
+            z = np.where((se > 0) & (na > 0) & (nb > 0), (pb - pa) / se, 0.0)
+        p = 2 * (1 - _np_norm_cdf(np.abs(z)))
+        return z.tolist(), np.clip(p, 0.0, 1.0).tolist()
+
+    zs, ps = [], []
+    for ca, na, cb, nb in zip(conv_a, n_a, conv_b, n_b):
+        z = 0.0
+        if na > 0 and nb > 0:
+            pooled = (ca + cb) / (na + nb)
+            se = math.sqrt(pooled * (1 - pooled) * (1 / na + 1 / nb))
+            if se > 0:
+                z = (cb / nb - ca / na) / se
+        zs.append(z)
+        ps.append(min(1.0, max(0.0, 2 * (1 - _STD_NORMAL.cdf(abs(z))))))
+    return zs, ps
+
+
+def beta_posterior(
+    conversions: Sequence[float],
+    samples: Sequence[float],
+    prior_alpha: float = 1.0,
+    prior_beta: float = 1.0,
+    credible: float = 0.95,
+) -> Tuple[List[float], List[float], List[float]]:
+    """Beta-Binomial posterior of the conversion rate.
+
+    Returns (means, lower_bounds, upper_bounds) of the central credible
+    interval (normal approximation of the Beta posterior).
+    """
+    z = _z_quantile(1 - credible)
+    if NUMPY_AVAILABLE:
+        a = np.asarray(conversions, dtype=float) + prior_alpha
+        b = np.asarray(samples, dtype=float) - np.asarray(conversions, dtype=float) + prior_beta
+        mean = a / (a + b)
+        sd = np.sqrt(a * b / ((a + b) ** 2 * (a + b + 1)))
+        return mean.tolist(), np.clip(mean - z * sd, 0, 1).tolist(), np.clip(mean + z * sd, 0, 1).tolist()
+
+    means, lows, highs = [], [], []
+    for c, n in zip(conversions, samples):
+        a, b = c + prior_alpha, n - c + prior_beta
+        mean = a / (a + b)
+        sd = math.sqrt(a * b / ((a + b) ** 2 * (a + b + 1)))
+        means.append(mean)
+        lows.append(min(1.0, max(0.0, mean - z * sd)))
+        highs.append(min(1.0, max(0.0, mean + z * sd)))
+    return means, lows, highs
+
+
+def prob_b_beats_a(
+    conv_a: Sequence[float],
+    n_a: Sequence[float],
+    conv_b: Sequence[float],
+    n_b: Sequence[float],
+    prior_alpha: float = 1.0,
+    prior_beta: float = 1.0,
+) -> List[float]:
+    """Posterior probability that B's conversion rate exceeds A's."""
+    if NUMPY_AVAILABLE:
+        aa = np.asarray(conv_a, dtype=float) + prior_alpha
+        ba = np.asarray(n_a, dtype=float) - np.asarray(conv_a, dtype=float) + prior_beta
+        ab = np.asarray(conv_b, dtype=float) + prior_alpha
+        bb = np.asarray(n_b, dtype=float) - np.asarray(conv_b, dtype=float) + prior_beta
+        mean_a, mean_b = aa / (aa + ba), ab / (ab + bb)
+        var = aa * ba / ((aa + ba) ** 2 * (aa + ba + 1)) + ab * bb / ((ab + bb) ** 2 * (ab + bb + 1))
+        return _np_norm_cdf((mean_b - mean_a) / np.sqrt(var)).tolist()
+
+    probs = []
+    for ca, na, cb, nb in zip(conv_a, n_a, conv_b, n_b):
+        aa, ba, ab, bb = ca + prior_alpha, na - ca + prior_beta, cb + prior_alpha, nb - cb + prior_beta
+        var = aa * ba / ((aa + ba) ** 2 * (aa + ba + 1)) + ab * bb / ((ab + bb) ** 2 * (ab + bb + 1))
+        probs.append(_STD_NORMAL.cdf((ab / (ab + bb) - aa / (aa + ba)) / math.sqrt(var)))
+    return probs
+
+
+def obrien_fleming_boundary(information_fraction: Sequence[float], alpha: float = DEFAULT_ALPHA) -> List[float]:
+    """O'Brien-Fleming z boundary at each information fraction (0-1]."""
+    z = _z_quantile(alpha)
+    if NUMPY_AVAILABLE:
+        t = np.clip(np.asarray(information_fraction, dtype=float), MIN_INFORMATION_FRACTION, 1.0)
+        return (z / np.sqrt(t)).tolist()
+    return [z / math.sqrt(min(1.0, max(MIN_INFORMATION_FRACTION, t))) for t in information_fraction]
+
+
+# ------------------------------------------------------------------ #
+# Portfolio analysis
+# ------------------------------------------------------------------ #
+
+def _control_first(variants: Iterable[VariantStats]) -> List[VariantStats]:
+    return sorted(variants, key=lambda v: (not v.is_control, v.created_at))
+
+
+def analyze_portfolio(
+    experiments: Dict[str, Iterable[VariantStats]],
+    alpha: float = DEFAULT_ALPHA,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare every treatment against its experiment's control in one pass.
+
+    The control is the variant flagged is_control (else the oldest one).
+    A treatment is the winner when its z-score crosses the O'Brien-Fleming
+    boundary in its favour; the best such treatment (by conversion rate)
+    is reported. ``decision`` is "stop_winner", "stop_control" (every
+    treatment crossed the boundary against it) or "continue".
+    """
+    pairs: List[Tuple[str, VariantStats, VariantStats]] = []
+    ordered: Dict[str, List[VariantStats]] = {}
+    for experiment_id, variants in experiments.items():
+        variants = _control_first(variants)
+        ordered[experiment_id] = variants
+        for treatment in variants[1:]:
+            pairs.append((experiment_id, variants[0], treatment))
+
+    columns = ([p[1].conversions for p in pairs], [p[1].samples for p in pairs],
+               [p[2].conversions for p in pairs], [p[2].samples for p in pairs])
+    z_scores, p_values = two_proportion_ztest(*columns)
+    beats = prob_b_beats_a(*columns)
+    means, lows, highs = beta_posterior(columns[2], columns[3])
+    info = [
+        min(c.samples, t.samples) / max(1, min(c.planned_samples, t.planned_samples))
+        for _, c, t in pairs
+    ]
+    boundaries = obrien_fleming_boundary(info, alpha)
+
+    treatments: Dict[str, List[Dict[str, Any]]] = {experiment_id: [] for experiment_id in ordered}
+    for i, (experiment_id, control, treatment) in enumerate(pairs):
+        control_rate = control.conversion_rate
+        rate = treatment.conversion_rate
+        treatments[experiment_id].append({
+            "variant": treatment.name,
+            "variant_id": treatment.variant_id,
+            "sample_size": treatment.samples,
+            "conversions": treatment.conversions,
+            "conversion_rate": rate * 100,
+            "revenue": treatment.revenue,
+            "lift_vs_control": ((rate - control_rate) / control_rate * 100) if control_rate > 0 else 0,
+            "z_score": round(z_scores[i], 4),
+            "p_value": round(p_values[i], 6),
+            "significant": p_values[i] < alpha,
+            "prob_beats_control": round(beats[i], 4),
+            "posterior_mean": round(means[i], 6),
+            "credible_interval": [round(lows[i], 6), round(highs[i], 6)],
+            "information_fraction": round(min(1.0, info[i]), 4),
+            "sequential_boundary": round(boundaries[i], 4),
+            "crossed_boundary": abs(z_scores[i]) >= boundaries[i],
+        })
+
+    analyses: Dict[str, Dict[str, Any]] = {}
+    for experiment_id, variants in ordered.items():
+        rows = treatments[experiment_id]
+        winners = [t for t in rows if t["crossed_boundary"] and t["z_score"] > 0]
+        winner = max(winners, key=lambda t: t["conversion_rate"]) if winners else None
+        control_wins = bool(rows) and all(t["crossed_boundary"] and t["z_score"] < 0 for t in rows)
+        control = variants[0] if variants else None
+        analyses[experiment_id] = {
+            "experiment_id": experiment_id,
+            "control": {
+                "name": control.name,
+                "variant_id": control.variant_id,
+                "sample_size": control.samples,
+                "conversions": control.conversions,
+                "conversion_rate": control.conversion_rate * 100,
+                "revenue": control.revenue,
+            } if control else None,
+            "treatments": rows,
+            "winner": winner["variant"] if winner else None,
+            "decision": "stop_winner" if winner else "stop_control" if control_wins else "continue",
+        }
+    return analyses
+
+
+def analyze_variants(variants: Iterable[VariantStats], alpha: float = DEFAULT_ALPHA) -> Dict[str, Any]:
+    """analyze_portfolio() for a single experiment's variants."""
+    return analyze_portfolio({"_": list(variants)}, alpha=alpha)["_"]
+
+
+# ------------------------------------------------------------------ #
+# Incrementally maintained state
+# ------------------------------------------------------------------ #
+
+class ExperimentStatsEngine:
+    """In-memory variant statistics and latest metric values for all experiments."""
+
+    def __init__(self, query_fn: Optional[Callable[[str], Dict[str, Any]]] = None):
+        if query_fn is None:
+            from .database import query_db as query_fn
+        self._query = query_fn
+        self._lock = threading.RLock()
+        self._variants: Dict[str, Dict[str, VariantStats]] = {}
+        self._variant_owner: Dict[str, str] = {}
+        self._metrics: Dict[str, Dict[str, Tuple[str, float]]] = {}
+        self._variant_hw: Optional[str] = None
+        self._result_hw: Optional[str] = None
+        self._loaded = False
+        self._last_sync = float("-inf")
+        self.syncs = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def sync(self) -> None:
+        """Read only variants and results changed since the last sync."""
+        from .database import escape_sql_value
+
+        with self._lock:
+            variant_hw, result_hw = self._variant_hw, self._result_hw
+        # >= re-reads rows at the boundary timestamp; applying them is idempotent
+        variant_where = f"WHERE COALESCE(updated_at, created_at) >= {escape_sql_value(variant_hw)}::timestamptz" if variant_hw else ""
+        result_where = f"WHERE timestamp >= {escape_sql_value(result_hw)}::timestamptz" if result_hw else ""
+        variant_rows = self._query(VARIANTS_SQL.format(where=variant_where)).get("rows", []) or []
+        result_rows = self._query(LATEST_RESULTS_SQL.format(where=result_where)).get("rows", []) or []
+
+        with self._lock:
+            for row in variant_rows:
+                self._add_variant(VariantStats.from_row(row))
+                changed_at = row.get("changed_at")
+                if changed_at and (self._variant_hw is None or changed_at > self._variant_hw):
+                    self._variant_hw = changed_at
+            for row in result_rows:
+                self._set_metric(str(row.get("experiment_id")), row.get("metric_name"),
+                                 row.get("metric_value"), row.get("ts") or "")
+                ts = row.get("ts")
+                if ts and (self._result_hw is None or ts > self._result_hw):
+                    self._result_hw = ts
+            self._loaded = True
+            self._last_sync = time.monotonic()
+            self.syncs += 1
+
+    def ensure_fresh(self, max_age: float = SYNC_MAX_AGE_SECONDS) -> bool:
+        """Sync if the last sync is older than ``max_age``; True if state is usable."""
+        if time.monotonic() - self._last_sync < max_age:
+            return self._loaded
+        try:
+            self.sync()
+        except Exception as e:
+            logger.warning("Experiment stats sync failed: %s", e)
+            # Don't retry on every call while the database is unavailable
+            self._last_sync = time.monotonic()
+        return self._loaded
+
+    def _add_variant(self, stats: VariantStats) -> None:
+        self._variants.setdefault(stats.experiment_id, {})[stats.variant_id] = stats
+        self._variant_owner[stats.variant_id] = stats.experiment_id
+
+    def _set_metric(self, experiment_id: str, metric_name: Any, value: Any, ts: str) -> None:
+        if metric_name is None or value is None:
+            return
+        metrics = self._metrics.setdefault(experiment_id, {})
+        current = metrics.get(metric_name)
+        if current is None or ts >= current[0]:
+            metrics[metric_name] = (ts, float(value))
+
+    # Write-path hooks (core.experiments) -------------------------------- #
+
+    def notify_variant(self, row: Dict[str, Any]) -> None:
+        """A variant was created or its totals changed (row has id and totals)."""
+        if not self._loaded or not row.get("id"):
+            return
+        with self._lock:
+            variant_id = str(row["id"])
+            experiment_id = str(row.get("experiment_id") or self._variant_owner.get(variant_id, ""))
+            existing = self._variants.get(experiment_id, {}).get(variant_id)
+            if existing is None:
+                if experiment_id:
+                    self._add_variant(VariantStats.from_row({**row, "experiment_id": experiment_id}))
+                return
+            existing.samples = int(row.get("sample_size", existing.samples) or 0)
+            existing.conversions = int(row.get("conversions", existing.conversions) or 0)
+            existing.revenue = float(row.get("revenue_generated", existing.revenue) or 0)
+
+    def notify_result(self, experiment_id: str, metric_name: str, value: float, ts: Optional[str] = None) -> None:
+        """A metric value was recorded for an experiment."""
+        if not self._loaded:
+            return
+        # Same text shape as the DB's timestamptz::text, so values compare in time order
+        ts = ts or datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f+00")
+        with self._lock:
+            self._set_metric(str(experiment_id), metric_name, value, ts)
+
+    # Lookups ----------------------------------------------------------- #
+
+    def variants(self, experiment_id: str) -> Optional[List[VariantStats]]:
+        if not self._loaded:
+            return None
+        with self._lock:
+            return _control_first(self._variants.get(str(experiment_id), {}).values())
+
+    def latest_metrics(self, experiment_id: str) -> Optional[Dict[str, float]]:
+        """Latest value of every metric recorded for the experiment, or None if not loaded."""
+        if not self._loaded:
+            return None
+        with self._lock:
+            return {name: value for name, (_, value) in self._metrics.get(str(experiment_id), {}).items()}
+
+    def analyze(
+        self,
+        experiment_ids: Optional[Iterable[str]] = None,
+        alpha: float = DEFAULT_ALPHA,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Significance analysis of every experiment with 2+ variants (or the given ones)."""
+        with self._lock:
+            ids = [str(e) for e in experiment_ids] if experiment_ids is not None else list(self._variants)
+            groups = {
+                e: [replace(v) for v in self._variants.get(e, {}).values()]
+                for e in ids
+                if len(self._variants.get(e, {})) >= 2
+            }
+        return analyze_portfolio(groups, alpha=alpha)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "experiments": len(self._variants),
+                "variants": sum(len(v) for v in self._variants.values()),
+                "experiments_with_metrics": len(self._metrics),
+                "loaded": self._loaded,
+                "syncs": self.syncs,
+                "numpy": NUMPY_AVAILABLE,
+            }
+
+
+_engine: Optional[ExperimentStatsEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_experiment_stats_engine(
+    query_fn: Optional[Callable[[str], Dict[str, Any]]] = None,
+) -> ExperimentStatsEngine:
+    """Process-wide ExperimentStatsEngine singleton.
+
+    ``query_fn`` is only used when the singleton is first created.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = ExperimentStatsEngine(query_fn)
+    return _engine
+
+
+__all__ = [
+    "NUMPY_AVAILABLE",
+    "VariantStats",
+    "two_proportion_ztest",
+    "beta_posterior",
+    "prob_b_beats_a",
+    "obrien_fleming_boundary",
+    "analyze_portfolio",
+    "analyze_variants",
+    "ExperimentStatsEngine",
+    "get_experiment_stats_engine",
+]
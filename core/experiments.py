@@ -19,9 +19,9 @@ import uuid
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
-import httpx
-
 from core.database import query_db as _db_query, escape_sql_value as _escape_sql_value
+from core.experiment_stats import VariantStats, analyze_variants, get_experiment_stats_engine
+from core.schema_registry import get_schema_registry
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -29,12 +29,32 @@ logger = logging.getLogger(__name__)
 
 _SCHEMA_ENSURED = False
 
+# Bump when the statements in ensure_experiment_schema change
+EXPERIMENT_SCHEMA_VERSION = 1
+
+EXPERIMENT_SCHEMA_COLUMNS = {
+    "experiments": [
+        "lifecycle_state", "conclusion_outcome", "hypothesis_defined_at", "activated_at",
+        "measuring_started_at", "concluded_at", "success_criteria_text", "metrics_to_track",
+        "expected_outcome", "actual_outcome", "approval_required", "approval_budget_limit",
+        "risk_assessment", "approved_by", "approved_at",
+    ],
+    "experiment_task_links": ["id", "experiment_id", "task_id", "link_type"],
+    "experiment_metric_points": ["id", "experiment_id", "metric_name", "metric_value"],
+    "experiment_changes": ["id", "experiment_id", "change_type", "rollback_task_id"],
+}
+
 
 def ensure_experiment_schema() -> None:
     global _SCHEMA_ENSURED
     if _SCHEMA_ENSURED:
         return
 
+    registry = get_schema_registry()
+    if registry.is_ensured("experiments", EXPERIMENT_SCHEMA_VERSION, columns=EXPERIMENT_SCHEMA_COLUMNS):
+        _SCHEMA_ENSURED = True
+        return
+
     statements: List[str] = [
         "ALTER TABLE experiments ADD COLUMN IF NOT EXISTS lifecycle_state TEXT;",
         "ALTER TABLE experiments ADD COLUMN IF NOT EXISTS conclusion_outcome TEXT;",
@@ -100,6 +120,7 @@ def ensure_experiment_schema() -> None:
     for stmt in create_tables:
         _execute_sql(stmt, return_results=False)
 
+    registry.mark_ensured("experiments", EXPERIMENT_SCHEMA_VERSION)
     _SCHEMA_ENSURED = True
 
 
@@ -964,6 +985,10 @@ def create_variant(
     """
     
     result = _execute_sql(query)
+    get_experiment_stats_engine().notify_variant({
+        "id": variant_id, "experiment_id": experiment_id, "name": name,
+        "is_control": is_control, "config": config or {},
+    })
     
     return {
         "success": True,
@@ -1002,6 +1027,7 @@ def update_variant_metrics(
     
     result = _execute_sql(query)
     if result.get("rows"):
+        get_experiment_stats_engine().notify_variant({"id": variant_id, **result["rows"][0]})
         return {"success": True, "metrics": result["rows"][0]}
     return {"success": False, "error": "Variant not found"}
 
@@ -1147,6 +1173,7 @@ def record_result(
     """
     
     _execute_sql(query)
+    get_experiment_stats_engine().notify_result(experiment_id, metric_name, metric_value)
     
     return {
         "success": True,
@@ -1196,7 +1223,27 @@ def get_result_summary(
     }
 
 
-def evaluate_success_criteria(experiment_id: str) -> Dict[str, Any]:
+def _latest_metrics(experiment_id: str) -> Dict[str, float]:
+    """Latest value of each metric, from the stats engine once it is loaded."""
+    engine = get_experiment_stats_engine()
+    if engine.loaded and engine.ensure_fresh():
+        return engine.latest_metrics(experiment_id) or {}
+
+    query = f"""
+    SELECT DISTINCT ON (metric_name)
+        metric_name, metric_value
+    FROM experiment_results
+    WHERE experiment_id = '{experiment_id}'
+    ORDER BY metric_name, timestamp DESC
+    """
+    result = _execute_sql(query)
+    return {row["metric_name"]: float(row["metric_value"]) for row in result.get("rows", [])}
+
+
+def evaluate_success_criteria(
+    experiment_id: str,
+    experiment: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
     Evaluate if an experiment has met its success criteria.
     
@@ -1204,29 +1251,20 @@ def evaluate_success_criteria(experiment_id: str) -> Dict[str, Any]:
     
     Args:
         experiment_id: Experiment to evaluate
+        experiment: Experiment row, if the caller already has it
     
     Returns:
         Dict with success status and details
     """
-    experiment = get_experiment(experiment_id)
+    experiment = experiment or get_experiment(experiment_id)
     if not experiment:
         return {"success": False, "error": "Experiment not found"}
     
     success_criteria = experiment.get("success_criteria", {})
     failure_criteria = experiment.get("failure_criteria", {})
     
-    # Get latest metric values
-    query = f"""
-    SELECT DISTINCT ON (metric_name)
-        metric_name, metric_value
-    FROM experiment_results
-    WHERE experiment_id = '{experiment_id}'
-    ORDER BY metric_name, timestamp DESC
-    """
-    result = _execute_sql(query)
-    
-    # Build metric lookup
-    metrics = {row["metric_name"]: float(row["metric_value"]) for row in result.get("rows", [])}
+    # Latest metric values
+    metrics = _latest_metrics(experiment_id)
     
     # Evaluate success criteria
     success_results = {}
@@ -1310,6 +1348,11 @@ def compare_variants(experiment_id: str) -> Dict[str, Any]:
     """
     Compare A/B test variants for an experiment.
     
+    Each treatment is tested against the control (two-proportion z-test,
+    Beta-Binomial posterior and an O'Brien-Fleming sequential boundary, see
+    core.experiment_stats). A winner is only declared once a treatment
+    crosses the boundary in its favour.
+    
     Args:
         experiment_id: Experiment with variants to compare
     
@@ -1317,8 +1360,8 @@ def compare_variants(experiment_id: str) -> Dict[str, Any]:
         Dict with variant comparison data
     """
     query = f"""
-    SELECT id, name, is_control, traffic_percentage,
-           sample_size, conversions, revenue_generated,
+    SELECT id, experiment_id, name, is_control, traffic_percentage, config,
+           sample_size, conversions, revenue_generated, created_at,
            CASE WHEN sample_size > 0 
                 THEN (conversions::float / sample_size * 100)
                 ELSE 0 END as conversion_rate
@@ -1337,39 +1380,18 @@ def compare_variants(experiment_id: str) -> Dict[str, Any]:
             "variants": variants
         }
     
-    # Find control
-    control = next((v for v in variants if v.get("is_control")), variants[0])
-    control_rate = float(control.get("conversion_rate", 0))
-    
-    # Calculate lift vs control
-    comparisons = []
-    for v in variants:
-        if v["id"] == control["id"]:
-            continue
-        
-        v_rate = float(v.get("conversion_rate", 0))
-        lift = ((v_rate - control_rate) / control_rate * 100) if control_rate > 0 else 0
-        
-        comparisons.append({
-            "variant": v["name"],
-            "sample_size": v["sample_size"],
-            "conversions": v["conversions"],
-            "conversion_rate": v_rate,
-            "revenue": float(v["revenue_generated"]),
-            "lift_vs_control": lift
-        })
+    # Control is the flagged variant, else the first one
+    stats = [VariantStats.from_row(v) for v in variants]
+    control = next((s for s in stats if s.is_control), stats[0])
+    control.is_control = True
+    analysis = analyze_variants([control] + [s for s in stats if s is not control])
     
     return {
         "success": True,
-        "control": {
-            "name": control["name"],
-            "sample_size": control["sample_size"],
-            "conversions": control["conversions"],
-            "conversion_rate": control_rate,
-            "revenue": float(control["revenue_generated"])
-        },
-        "treatments": comparisons,
-        "winner": max(comparisons, key=lambda x: x["conversion_rate"])["variant"] if comparisons else None
+        "control": analysis["control"],
+        "treatments": analysis["treatments"],
+        "winner": analysis["winner"],
+        "decision": analysis["decision"]
     }
 
 
@@ -1559,7 +1581,10 @@ def execute_rollback(
     }
 
 
-def check_auto_rollback_triggers(experiment_id: str) -> Dict[str, Any]:
+def check_auto_rollback_triggers(
+    experiment_id: str,
+    experiment: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
     Check if automatic rollback should be triggered.
     
@@ -1570,11 +1595,12 @@ def check_auto_rollback_triggers(experiment_id: str) -> Dict[str, Any]:
     
     Args:
         experiment_id: Experiment to check
+        experiment: Experiment row, if the caller already has it
     
     Returns:
         Dict with trigger status
     """
-    experiment = get_experiment(experiment_id)
+    experiment = experiment or get_experiment(experiment_id)
     if not experiment:
         return {"success": False, "error": "Experiment not found"}
     
@@ -1595,7 +1621,7 @@ def check_auto_rollback_triggers(experiment_id: str) -> Dict[str, Any]:
             triggers.append("scheduled_end_passed")
     
     # Check failure criteria
-    evaluation = evaluate_success_criteria(experiment_id)
+    evaluation = evaluate_success_criteria(experiment_id, experiment=experiment)
     if evaluation.get("failure_criteria_triggered"):
         triggers.append("failure_criteria_met")
     
@@ -1671,8 +1697,13 @@ def process_auto_rollback_for_running_experiments(
     """
     logger.info("Starting auto-rollback check for running experiments")
     
-    # Get all running experiments
-    running_experiments = list_experiments(status="running")
+    # Get all running experiments (full rows, so criteria need no re-fetch)
+    running_experiments = _execute_sql(
+        "SELECT * FROM experiments WHERE status = 'running' ORDER BY created_at"
+    ).get("rows", [])
+    
+    # One incremental sync serves the latest metrics of the whole portfolio
+    get_experiment_stats_engine().ensure_fresh(max_age=0)
     
     results = {
         "success": True,
@@ -1687,7 +1718,7 @@ def process_auto_rollback_for_running_experiments(
             continue
         
         # Check if rollback should be triggered
-        trigger_check = check_auto_rollback_triggers(experiment_id)
+        trigger_check = check_auto_rollback_triggers(experiment_id, experiment=experiment)
         
         if trigger_check.get("should_rollback"):
             triggers = trigger_check.get("triggers", [])
@@ -0,0 +1,249 @@
+"""
+Financial Rollups
+
+Read side of the revenue/cost rollups maintained by migration 019: hourly and
+daily aggregates of revenue_events and cost_events per source, category and
+experiment. Triggers keep them current on every write; this module answers
+summary, P&L, ROI and chart queries from them, so the cost of a query depends
+on the window length, not on how many events have been recorded.
+
+A window starting at ``since`` is served from whole days after ``since``
+plus the hourly buckets of its first, partial day, so windows have hour
+granularity (``since`` is floored to the hour). Day buckets are UTC days of
+``occurred_at``.
+
+Usage:
+    from core.financial_rollups import get_financial_rollups, window_start
+
+    rollups = get_financial_rollups()
+    rollups.revenue(since=window_start(30), group_by=("source",), include_refunds=False)
+    rollups.costs(since=window_start(7), group_by=("category",))
+    rollups.backfill()  # rebuild from revenue_events / cost_events (idempotent)
+"""
+
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Grouping keys per rollup table; "day"/"week"/"month" group by time period
+REVENUE_DIMENSIONS = ("source", "revenue_type", "experiment_id", "is_refund")
+COST_DIMENSIONS = ("cost_type", "category", "experiment_id")
+PERIODS = ("day", "week", "month")
+
+
+def _quote(value: Any) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def window_start(days: int, now: Optional[datetime] = None) -> datetime:
+    """Start of a window covering the last ``days`` days."""
+    return (now or datetime.now(timezone.utc)) - timedelta(days=days)
+
+
+def parse_period(value: Any) -> datetime:
+    """A bucket/period value (timestamptz text from the HTTP API) as an aware UTC datetime."""
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def window_clause(since: Optional[datetime]) -> str:
+    """
+    WHERE clause selecting the rollup rows that cover [since, now].
+
+    Whole UTC days after ``since`` come from day buckets, the rest of its own
+    day from hour buckets; with no ``since`` every day bucket is used.
+    """
+    if since is None:
+        return "grain = 'day'"
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    since = since.astimezone(timezone.utc)
+    hour = since.replace(minute=0, second=0, microsecond=0)
+    day = hour.replace(hour=0)
+    if hour == day:
+        return f"grain = 'day' AND bucket >= {_quote(day.isoformat())}"
+    next_day = day + timedelta(days=1)
+    return (
+        f"((grain = 'day' AND bucket >= {_quote(next_day.isoformat())})"
+        f" OR (grain = 'hour' AND bucket >= {_quote(hour.isoformat())}"
+        f" AND bucket < {_quote(next_day.isoformat())}))"
+    )
+
+
+def _select_list(group_by: Sequence[str], dimensions: Sequence[str]) -> List[str]:
+    columns = []
+    for key in group_by:
+        if key in PERIODS:
+            columns.append(f"date_trunc('{key}', bucket, 'UTC') AS period")
+        elif key in dimensions:
+            columns.append(key)
+        else:
+            raise ValueError(f"Cannot group rollups by {key!r}")
+    return columns
+
+
+class FinancialRollups:
+    """Queries over revenue_rollups and cost_rollups."""
+
+    def __init__(self, query_fn: Optional[Callable[..., Dict[str, Any]]] = None):
+        if query_fn is None:
+            from .database import query_db as query_fn
+        self._query = query_fn
+
+    def _rows(self, sql: str) -> List[Dict[str, Any]]:
+        return self._query(sql).get("rows", []) or []
+
+    def _aggregate(
+        self,
+        table: str,
+        measures: str,
+        dimensions: Sequence[str],
+        since: Optional[datetime],
+        group_by: Sequence[str],
+        filters: Dict[str, Any],
+        extra: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        columns = _select_list(group_by, dimensions)
+        conditions = [window_clause(since)]
+        for column, value in filters.items():
+            if value is not None:
+                conditions.append(f"{column} = {_quote(value)}")
+        if extra:
+            conditions.append(extra)
+        sql = f"SELECT {', '.join(columns + [measures])} FROM {table} WHERE {' AND '.join(conditions)}"
+        if columns:
+            sql += f" GROUP BY {', '.join(str(i) for i in range(1, len(columns) + 1))}"
+            if any(key in PERIODS for key in group_by):
+                sql += " ORDER BY period DESC"
+        return self._rows(sql)
+
+    def revenue(
+        self,
+        since: Optional[datetime] = None,
+        group_by: Sequence[str] = (),
+        experiment_id: Optional[str] = None,
+        source: Optional[str] = None,
+        include_refunds: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Revenue totals since ``since`` (all time when None).
+
+        Returns one row per group (a single row when ``group_by`` is empty)
+        with event_count, gross_amount, net_amount, first_at and last_at.
+        """
+        rows = self._aggregate(
+            "revenue_rollups",
+            "COALESCE(SUM(event_count), 0) AS event_count, "
+            "COALESCE(SUM(gross_amount), 0) AS gross_amount, "
+            "COALESCE(SUM(net_amount), 0) AS net_amount, "
+            "MIN(first_at) AS first_at, MAX(last_at) AS last_at",
+            REVENUE_DIMENSIONS, since, group_by,
+            {"experiment_id": experiment_id, "source": source},
+            None if include_refunds else "NOT is_refund",
+        )
+        for row in rows:
+            row["event_count"] = int(row.get("event_count") or 0)
+            row["gross_amount"] = float(row.get("gross_amount") or 0)
+            row["net_amount"] = float(row.get("net_amount") or 0)
+        return rows
+
+    def costs(
+        self,
+        since: Optional[datetime] = None,
+        group_by: Sequence[str] = (),
+        experiment_id: Optional[str] = None,
+        cost_type: Optional[str] = None,
+        category: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Cost totals since ``since`` (all time when None).
+
+        Returns one row per group (a single row when ``group_by`` is empty)
+        with event_count, amount_cents, first_at and last_at.
+        """
+        rows = self._aggregate(
+            "cost_rollups",
+            "COALESCE(SUM(event_count), 0) AS event_count, "
+            "COALESCE(SUM(amount_cents), 0) AS amount_cents, "
+            "MIN(first_at) AS first_at, MAX(last_at) AS last_at",
+            COST_DIMENSIONS, since, group_by,
+            {"experiment_id": experiment_id, "cost_type": cost_type, "category": category},
+        )
+        for row in rows:
+            row["event_count"] = int(row.get("event_count") or 0)
+            row["amount_cents"] = int(float(row.get("amount_cents") or 0))
+        return rows
+
+    def revenue_total(self, since: Optional[datetime] = None, **filters) -> Dict[str, Any]:
+        """Single revenue totals row."""
+        rows = self.revenue(since, **filters)
+        return rows[0] if rows else {"event_count": 0, "gross_amount": 0.0, "net_amount": 0.0,
+                                     "first_at": None, "last_at": None}
+
+    def cost_total(self, since: Optional[datetime] = None, **filters) -> Dict[str, Any]:
+        """Single cost totals row."""
+        rows = self.costs(since, **filters)
+        return rows[0] if rows else {"event_count": 0, "amount_cents": 0, "first_at": None, "last_at": None}
+
+    def calendar_totals(self, now: Optional[datetime] = None) -> Dict[str, float]:
+        """
+        Gross revenue all-time / month / quarter / year to date and costs
+        all-time / month to date, in dollars.
+        """
+        now = (now or datetime.now(timezone.utc)).astimezone(timezone.utc)
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        quarter_start = month_start.replace(month=((now.month - 1) // 3) * 3 + 1)
+        year_start = month_start.replace(month=1)
+
+        months = [(parse_period(row["period"]), row["gross_amount"])
+                  for row in self.revenue(year_start, group_by=("month",))]
+        return {
+            "total": self.revenue_total()["gross_amount"],
+            "mtd": sum(amount for start, amount in months if start >= month_start),
+            "qtd": sum(amount for start, amount in months if start >= quarter_start),
+            "ytd": sum(amount for _, amount in months),
+            "costs": self.cost_total()["amount_cents"] / 100.0,
+            "mtd_costs": self.cost_total(month_start)["amount_cents"] / 100.0,
+        }
+
+    def backfill(self, since: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Rebuild rollups from the event tables from the UTC day containing
+        ``since`` (all history when None). Safe to re-run.
+        """
+        arg = _quote(since.isoformat()) + "::timestamptz" if since else "NULL"
+        rows = self._rows(f"SELECT * FROM backfill_financial_rollups({arg})")
+        written = {row["rollup"]: int(row["rows_written"]) for row in rows}
+        logger.info("Financial rollups backfilled since %s: %s", since or "the beginning", written)
+        return written
+
+
+_financial_rollups: Optional[FinancialRollups] = None
+_financial_rollups_lock = threading.Lock()
+
+
+def get_financial_rollups(query_fn: Optional[Callable[..., Dict[str, Any]]] = None) -> FinancialRollups:
+    """Get or create the process-wide rollup reader."""
+    global _financial_rollups
+    if _financial_rollups is None:
+        with _financial_rollups_lock:
+            if _financial_rollups is None:
+                _financial_rollups = FinancialRollups(query_fn)
+    return _financial_rollups
+
+
+__all__ = [
+    "FinancialRollups",
+    "get_financial_rollups",
+    "parse_period",
+    "window_clause",
+    "window_start",
+    "COST_DIMENSIONS",
+    "REVENUE_DIMENSIONS",
+]
@@ -36,6 +36,9 @@ from datetime import datetime, timezone
 import time
 
 from core.database import query_db
+from core.deploy_verifier import DeployVerifier
+from core.deploy_watch import get_deploy_watcher
+from core.pr_snapshot import get_pr_snapshot_service
 
 
 class GateType(Enum):
@@ -114,6 +117,7 @@ class GateChecker:
         self.github_token = os.getenv("GITHUB_TOKEN", "")
         self.github_repo = (os.getenv("GITHUB_REPO") or "").strip()
         self.railway_token = os.getenv("RAILWAY_TOKEN", "")
+        self.pr_snapshots = get_pr_snapshot_service()
         
         # Map gate types to their checker functions
         self.checkers = {
@@ -755,28 +759,46 @@ class GateChecker:
                 evidence={"service_id": None}
             )
         
-        # Check Railway deployment status
-        deployment = self._get_railway_deployment(service_id)
-        
-        if not deployment:
-            return GateResult(
-                passed=False,
-                gate_type="deployed",
-                reason="Could not fetch Railway deployment status",
-                evidence={"service_id": service_id}
+        # Only a deployment of this task's merge commit satisfies the gate
+        commit_sha = gate.config.get("commit_sha") or self._get_task_merge_commit(task_id)
+        
+        # Deployment status comes from the shared deploy watcher: the first
+        # check starts a watch, later checks read it without calling Railway
+        watcher = get_deploy_watcher()
+        deployment = watcher.recent_result("railway", service_id, commit_sha=commit_sha)
+        if deployment is None:
+            future = watcher.watch(
+                service_id,
+                platform="railway",
+                commit_sha=commit_sha,
+                timeout=gate.config.get("timeout", 600),
+                verifier=DeployVerifier(railway_token=self.railway_token),
             )
+            if not future.done():
+                in_flight = watcher.status("railway", service_id)
+                status = in_flight.status.value if in_flight else "pending"
+                return GateResult(
+                    passed=False,
+                    gate_type="deployed",
+                    reason=f"Deployment status: {status}",
+                    evidence={
+                        "service_id": service_id,
+                        "status": status
+                    },
+                    retry_after=max(1, int(watcher.interval))
+                )
+            deployment = future.result()
         
-        status = deployment.get("status", "unknown")
-        
-        if status.lower() in ["success", "deployed", "running"]:
+        if deployment.is_success:
             return GateResult(
                 passed=True,
                 gate_type="deployed",
                 evidence={
                     "service_id": service_id,
-                    "deployment_id": deployment.get("id"),
-                    "status": status,
-                    "deployed_at": deployment.get("createdAt")
+                    "deployment_id": deployment.deployment_id,
+                    "commit_sha": deployment.commit_sha or commit_sha,
+                    "status": deployment.status.value,
+                    "deployed_at": deployment.deployed_at
                 },
                 reason="Deployment successful"
             )
@@ -784,10 +806,10 @@ class GateChecker:
         return GateResult(
             passed=False,
             gate_type="deployed",
-            reason=f"Deployment status: {status}",
+            reason=f"Deployment status: {deployment.status.value}" + (f" ({deployment.error})" if deployment.error else ""),
             evidence={
                 "service_id": service_id,
-                "status": status
+                "status": deployment.status.value
             },
             retry_after=60  # Retry in 60 seconds
         )
@@ -1015,87 +1037,41 @@ class GateChecker:
         
         return None
     
+    def _get_task_merge_commit(self, task_id: str) -> Optional[str]:
+        """Merge commit SHA of the task's PR, if it has been merged."""
+        try:
+            pr_number = self._get_task_pr_number(task_id)
+            pr_data = self._get_github_pr(pr_number) if pr_number else None
+        except Exception as e:
+            print(f"[GATE_CHECKER] Could not resolve merge commit for task {task_id}: {e}")
+            return None
+        if pr_data and pr_data.get("merged"):
+            return pr_data.get("merge_commit_sha")
+        return None
+    
     def _get_github_pr(self, pr_number: int) -> Optional[Dict[str, Any]]:
-        """Fetch PR data from GitHub API."""
+        """Fetch PR data from the shared PR snapshot (REST-shaped)."""
         if not self.github_token:
             return None
         
-        url = f"https://api.github.com/repos/{self.github_repo}/pulls/{pr_number}"
-        
         try:
-            req = urllib.request.Request(url)
-            req.add_header("Authorization", f"token {self.github_token}")
-            req.add_header("Accept", "application/vnd.github.v3+json")
-            req.add_header("User-Agent", "Juggernaut-GateChecker")
-            
-            with urllib.request.urlopen(req, timeout=30) as response:
-                return json.loads(response.read().decode("utf-8"))
+            snapshot = self.pr_snapshots.get(self.github_repo, pr_number)
         except Exception as e:
             print(f"[GATE_CHECKER] GitHub API error: {e}")
             return None
+        return snapshot.pr if snapshot else None
     
     def _get_pr_reviews(self, pr_number: int) -> List[Dict[str, Any]]:
-        """Fetch PR reviews from GitHub API."""
+        """Fetch PR reviews from the shared PR snapshot."""
         if not self.github_token:
             return []
         
-        url = f"https://api.github.com/repos/{self.github_repo}/pulls/{pr_number}/reviews"
-        
         try:
-            req = urllib.request.Request(url)
-            req.add_header("Authorization", f"token {self.github_token}")
-            req.add_header("Accept", "application/vnd.github.v3+json")
-            req.add_header("User-Agent", "Juggernaut-GateChecker")
-            
-            with urllib.request.urlopen(req, timeout=30) as response:
-                return json.loads(response.read().decode("utf-8"))
+            snapshot = self.pr_snapshots.get(self.github_repo, pr_number)
         except Exception as e:
             print(f"[GATE_CHECKER] GitHub reviews API error: {e}")
             return []
-    
-    def _get_railway_deployment(self, service_id: str) -> Optional[Dict[str, Any]]:
-        """Fetch latest deployment from Railway API."""
-        if not self.railway_token:
-            # Return mock success for testing if no token
-            return {"status": "unknown", "id": None}
-        
-        # Railway GraphQL API
-        url = "https://backboard.railway.app/graphql/v2"
-        
-        query_gql = """
-        query GetDeployments($serviceId: String!) {
-            deployments(first: 1, input: {serviceId: $serviceId}) {
-                edges {
-                    node {
-                        id
-                        status
-                        createdAt
-                    }
-                }
-            }
-        }
-        """
-        
-        try:
-            data = json.dumps({
-                "query": query_gql,
-                "variables": {"serviceId": service_id}
-            }).encode("utf-8")
-            
-            req = urllib.request.Request(url, data=data, method="POST")
-            req.add_header("Authorization", f"Bearer {self.railway_token}")
-            req.add_header("Content-Type", "application/json")
-            
-            with urllib.request.urlopen(req, timeout=30) as response:
-                result = json.loads(response.read().decode("utf-8"))
-                edges = result.get("data", {}).get("deployments", {}).get("edges", [])
-                
-                if edges:
-                    return edges[0].get("node")
-                return None
-        except Exception as e:
-            print(f"[GATE_CHECKER] Railway API error: {e}")
-            return None
+        return snapshot.reviews if snapshot else []
 
 
 # =========================================================================
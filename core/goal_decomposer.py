@@ -8,17 +8,63 @@ Scans active goals, uses LLM to break them into concrete executable subtasks,
 and populates the governance_tasks queue with work linked back to parent goals.
 """
 
+import hashlib
 import json
 import logging
 import os
-import urllib.request
-import urllib.error
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from uuid import uuid4
 
+from .circuit_breaker import CircuitOpenError, get_circuit_breaker
+from .llm_cache import CachePolicy
+from .llm_transport import get_llm_transport
+
 logger = logging.getLogger(__name__)
 
+# Concurrent OpenRouter requests per decomposition cycle
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("GOAL_DECOMPOSER_CONCURRENCY", "3"))
+
+# Parsed task breakdowns kept per (goal_id, goal_version)
+PROMPT_CACHE_SIZE = 256
+
+_prompt_cache: "OrderedDict[Tuple[str, str], List[Dict[str, Any]]]" = OrderedDict()
+_prompt_cache_lock = threading.Lock()
+
+# Task statuses that don't count as "already planned" when deduplicating
+_DEAD_TASK_STATUSES = {"failed", "cancelled"}
+
+
+def goal_version(goal: Dict[str, Any]) -> str:
+    """Hash of the goal fields that go into the decomposition prompt."""
+    fields = [goal.get("title"), goal.get("description"), goal.get("success_criteria"), goal.get("deadline")]
+    return hashlib.sha256(json.dumps(fields, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def normalize_task_title(title: str) -> str:
+    """Case/punctuation-insensitive title used to deduplicate subtasks."""
+    return " ".join(re.findall(r"[a-z0-9]+", str(title or "").lower()))
+
+
+def _cached_breakdown(key: Tuple[str, str]) -> Optional[List[Dict[str, Any]]]:
+    with _prompt_cache_lock:
+        tasks = _prompt_cache.get(key)
+        if tasks is not None:
+            _prompt_cache.move_to_end(key)
+        return tasks
+
+
+def _cache_breakdown(key: Tuple[str, str], tasks: List[Dict[str, Any]]) -> None:
+    with _prompt_cache_lock:
+        _prompt_cache[key] = tasks
+        _prompt_cache.move_to_end(key)
+        while len(_prompt_cache) > PROMPT_CACHE_SIZE:
+            _prompt_cache.popitem(last=False)
+
 
 class GoalDecomposer:
     """Decomposes high-level goals into executable subtasks."""
@@ -31,10 +77,18 @@ class GoalDecomposer:
         self.min_tasks_per_goal = 3
         self.max_tasks_per_goal = 7
         self.max_goals_per_cycle = 3
+        self.max_concurrent_llm_calls = MAX_CONCURRENT_LLM_CALLS
         
     def decompose_goals(self) -> Dict[str, Any]:
         """Main entry point - find goals and decompose them into tasks.
         
+        Runs as a pipeline: one query for candidate goals, one for their
+        existing tasks, concurrent LLM calls (bounded, through the OpenRouter
+        circuit breaker), then per goal an in-memory dedup against existing
+        tasks and one multi-row INSERT. Goals whose current version was
+        already decomposed are skipped, and parsed breakdowns are cached per
+        goal version so retries don't repeat the LLM call.
+        
         Returns:
             Dict with decomposition results.
         """
@@ -51,12 +105,31 @@ class GoalDecomposer:
                     "message": "No goals need decomposition"
                 }
             
+            existing = self._load_existing_tasks([str(g["id"]) for g in goals_needing_work])
+            
+            goals: List[Dict[str, Any]] = []
+            goals_unchanged = 0
+            for goal in goals_needing_work:
+                version = goal_version(goal)
+                if version in existing.get(str(goal["id"]), {}).get("versions", ()):
+                    goals_unchanged += 1
+                    continue
+                goals.append({**goal, "_version": version})
+            goals = goals[:self.max_goals_per_cycle]
+            
             total_tasks_created = 0
             goals_processed = 0
+            goals_deferred = 0
             
-            for goal in goals_needing_work[:self.max_goals_per_cycle]:
+            for goal, tasks, error in self._plan_goals(goals):
                 try:
-                    tasks_created = self._decompose_single_goal(goal)
+                    if isinstance(error, CircuitOpenError):
+                        # Leave the goal for a later cycle rather than creating fallback work
+                        goals_deferred += 1
+                        continue
+                    tasks_created = self._insert_goal_tasks(
+                        goal, tasks, existing.get(str(goal["id"]), {}).get("titles", set()), error
+                    )
                     total_tasks_created += tasks_created
                     goals_processed += 1
                     
@@ -66,7 +139,8 @@ class GoalDecomposer:
                         level="info",
                         output_data={
                             "goal_id": goal["id"],
-                            "tasks_created": tasks_created
+                            "tasks_created": tasks_created,
+                            "goal_version": goal["_version"]
                         }
                     )
                     
@@ -83,6 +157,8 @@ class GoalDecomposer:
                 "success": True,
                 "goals_processed": goals_processed,
                 "tasks_created": total_tasks_created,
+                "goals_unchanged": goals_unchanged,
+                "goals_deferred": goals_deferred,
                 "message": f"Decomposed {goals_processed} goals into {total_tasks_created} tasks"
             }
             
@@ -136,77 +212,143 @@ class GoalDecomposer:
         
         return needs_work
     
-    def _decompose_single_goal(self, goal: Dict[str, Any]) -> int:
-        """Decompose a single goal into executable subtasks using LLM.
+    def _load_existing_tasks(self, goal_ids: List[str]) -> Dict[str, Dict[str, Set[str]]]:
+        """Titles and decomposed goal versions of the goals' existing tasks (one query).
         
         Args:
-            goal: Goal record from database
+            goal_ids: Goals to load tasks for
             
         Returns:
-            Number of tasks created
+            Dict of goal_id -> {"titles": normalized titles, "versions": goal versions}
         """
-        goal_id = goal["id"]
-        title = goal["title"]
-        description = goal.get("description", "")
-        success_criteria = goal.get("success_criteria", {})
-        deadline = goal.get("deadline")
-        max_cost_cents = goal.get("max_cost_cents", 50000)
+        if not goal_ids:
+            return {}
+        id_list = ", ".join("'" + gid.replace("'", "''") + "'" for gid in goal_ids)
+        result = self.execute_sql(f"""
+            SELECT goal_id, title, status, payload->>'goal_version' AS goal_version
+            FROM governance_tasks
+            WHERE goal_id IN ({id_list})
+        """)
+        existing: Dict[str, Dict[str, Set[str]]] = {}
+        for row in result.get("rows", []) or []:
+            entry = existing.setdefault(str(row.get("goal_id")), {"titles": set(), "versions": set()})
+            if str(row.get("status") or "").lower() not in _DEAD_TASK_STATUSES:
+                entry["titles"].add(normalize_task_title(row.get("title")))
+            if row.get("goal_version"):
+                entry["versions"].add(str(row["goal_version"]))
+        return existing
+    
+    def _plan_goals(self, goals: List[Dict[str, Any]]):
+        """Yield (goal, tasks, error) as each goal's breakdown becomes available.
+        
+        Cached breakdowns are yielded first; the rest are requested from the
+        LLM concurrently (at most max_concurrent_llm_calls at a time). ``tasks``
+        is None when the call failed; ``error`` holds the exception.
+        """
+        pending = []
+        for goal in goals:
+            tasks = _cached_breakdown((str(goal["id"]), goal["_version"]))
+            if tasks is not None:
+                yield goal, tasks, None
+            else:
+                pending.append(goal)
+        if not pending:
+            return
         
-        # Build decomposition prompt
+        workers = max(1, min(self.max_concurrent_llm_calls, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="goal-decomposer") as pool:
+            futures = {pool.submit(self._request_breakdown, goal): goal for goal in pending}
+            for future in as_completed(futures):
+                goal = futures[future]
+                try:
+                    yield goal, future.result(), None
+                except Exception as e:
+                    yield goal, None, e
+    
+    def _request_breakdown(self, goal: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Ask the LLM for one goal's breakdown (runs in a worker thread)."""
         prompt = self._build_decomposition_prompt(
-            title=title,
-            description=description,
-            success_criteria=success_criteria,
-            deadline=deadline
+            title=goal["title"],
+            description=goal.get("description", ""),
+            success_criteria=goal.get("success_criteria", {}),
+            deadline=goal.get("deadline")
         )
         
-        # Call OpenRouter directly (strategy model for planning)
-        try:
+        # Call OpenRouter (strategy model for planning) under its circuit breaker
+        circuit = get_circuit_breaker("openrouter")
+        if circuit is None:
             content = self._call_openrouter(prompt)
+        else:
+            content = circuit.call_sync(self._call_openrouter, prompt)
+        
+        # Parse task breakdown from response
+        tasks = self._parse_task_breakdown(content)
+        if tasks:
+            _cache_breakdown((str(goal["id"]), goal["_version"]), tasks)
+        return tasks
+    
+    def _insert_goal_tasks(
+        self,
+        goal: Dict[str, Any],
+        tasks: Optional[List[Dict[str, Any]]],
+        existing_titles: Set[str],
+        error: Optional[Exception] = None
+    ) -> int:
+        """Dedup one goal's breakdown and insert it (or a fallback task).
+        
+        Args:
+            goal: Goal record (with ``_version``)
+            tasks: Parsed breakdown, or None if the LLM call failed
+            existing_titles: Normalized titles of the goal's live tasks
+            error: Exception from the LLM call, if any
             
-            # Parse task breakdown from response
-            tasks = self._parse_task_breakdown(content)
-            
-            if not tasks:
-                logger.warning(f"LLM returned no valid tasks for goal {goal_id}")
-                # Create a fallback research task
-                tasks = [{
-                    "title": f"Research how to achieve: {title[:80]}",
-                    "task_type": "research",
-                    "description": f"Research strategies and approaches to achieve the goal: {title}",
-                    "priority": "high"
-                }]
-            
-            # Insert tasks into database
-            tasks_created = 0
-            for task_def in tasks[:self.max_tasks_per_goal]:
-                task_id = self._create_task(
-                    goal_id=goal_id,
-                    task_def=task_def,
-                    max_cost_cents=max_cost_cents
-                )
-                if task_id:
-                    tasks_created += 1
-            
-            return tasks_created
-            
-        except Exception as e:
-            logger.error(f"LLM decomposition failed for goal {goal_id}: {e}")
-            # Create fallback task on error
-            fallback_id = self._create_task(
-                goal_id=goal_id,
-                task_def={
-                    "title": f"Plan approach for: {title[:80]}",
-                    "task_type": "strategy",
-                    "description": f"Create a detailed plan to achieve: {title}\n\n{description}",
-                    "priority": "high"
-                },
-                max_cost_cents=max_cost_cents
-            )
-            return 1 if fallback_id else 0
+        Returns:
+            Number of tasks created
+        """
+        goal_id = goal["id"]
+        title = goal["title"]
+        max_cost_cents = goal.get("max_cost_cents", 50000)
+        version: Optional[str] = goal["_version"]
+        
+        if error is not None:
+            logger.error(f"LLM decomposition failed for goal {goal_id}: {error}")
+            # Create fallback task on error; no version, so the goal is retried later
+            tasks = [{
+                "title": f"Plan approach for: {title[:80]}",
+                "task_type": "strategy",
+                "description": f"Create a detailed plan to achieve: {title}\n\n{goal.get('description', '')}",
+                "priority": "high"
+            }]
+            version = None
+        elif not tasks:
+            logger.warning(f"LLM returned no valid tasks for goal {goal_id}")
+            # Create a fallback research task
+            tasks = [{
+                "title": f"Research how to achieve: {title[:80]}",
+                "task_type": "research",
+                "description": f"Research strategies and approaches to achieve the goal: {title}",
+                "priority": "high"
+            }]
+            version = None
+        
+        seen = set(existing_titles)
+        new_tasks = []
+        for task_def in tasks:
+            key = normalize_task_title(task_def["title"])
+            if key in seen:
+                continue
+            seen.add(key)
+            new_tasks.append(task_def)
+            if len(new_tasks) >= self.max_tasks_per_goal:
+                break
+        
+        return len(self._create_tasks(str(goal_id), new_tasks, max_cost_cents, version))
     
     def _call_openrouter(self, prompt: str) -> str:
-        """Call OpenRouter API directly using strategy model.
+        """Call OpenRouter through the shared LLM transport using strategy model.
+        
+        ``_request_breakdown`` already runs this under the openrouter circuit
+        breaker, so the transport is told not to apply it a second time.
         
         Args:
             prompt: The prompt to send to the LLM
@@ -221,10 +363,7 @@ class GoalDecomposer:
         # Use strategy model for planning (cost-effective)
         model = os.getenv("LLM_MODEL_STRATEGY", "moonshotai/kimi-k2.5")
         
-        url = "https://openrouter.ai/api/v1/chat/completions"
         headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
             "HTTP-Referer": "https://github.com/SpartanPlumbingJosh/juggernaut-autonomy",
             "X-Title": "JUGGERNAUT Goal Decomposer"
         }
@@ -236,23 +375,17 @@ class GoalDecomposer:
             "max_tokens": 4096
         }
         
+        # Unchanged goals rebuild the same prompt; reuse a breakdown that parsed
+        cache = CachePolicy(
+            "goal_decomposition",
+            ttl_seconds=7 * 24 * 3600,
+            accept=lambda content: bool(self._parse_task_breakdown(content)),
+        )
         try:
-            req = urllib.request.Request(
-                url,
-                data=json.dumps(payload).encode("utf-8"),
-                headers=headers,
-                method="POST"
+            result = get_llm_transport().complete(
+                payload, api_key=api_key, headers=headers, timeout=60, circuit=False, cache=cache
             )
-            
-            with urllib.request.urlopen(req, timeout=60) as response:
-                result = json.loads(response.read().decode("utf-8"))
-                content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-                return content
-                
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode("utf-8") if e.fp else ""
-            logger.error(f"OpenRouter API error: {e.code} - {error_body}")
-            raise
+            return result.content
         except Exception as e:
             logger.error(f"OpenRouter call failed: {e}")
             raise
@@ -373,70 +506,71 @@ Generate the task breakdown now:"""
             logger.error(f"Unexpected error parsing task breakdown: {e}")
             return []
 
-    def _create_task(
+    def _create_tasks(
         self,
         goal_id: str,
-        task_def: Dict[str, Any],
-        max_cost_cents: int
-    ) -> Optional[str]:
-        """Create a single task in the database.
+        task_defs: List[Dict[str, Any]],
+        max_cost_cents: int,
+        version: Optional[str] = None
+    ) -> List[str]:
+        """Create a goal's tasks with one multi-row INSERT.
         
         Args:
             goal_id: Parent goal ID
-            task_def: Task definition dict
-            max_cost_cents: Max cost for this task
+            task_defs: Task definition dicts
+            max_cost_cents: Max cost for these tasks
+            version: Goal version recorded in each task's payload
             
         Returns:
-            Task ID if created, None on failure
+            IDs of the created tasks (empty on failure)
         """
-        task_id = str(uuid4())
+        if not task_defs:
+            return []
         now = datetime.now(timezone.utc).isoformat()
         
-        title = task_def["title"]
-        task_type = task_def["task_type"]
-        description = task_def["description"]
-        priority = task_def["priority"]
-        payload = task_def.get("payload", {})
+        def quote(value: str) -> str:
+            return "'" + str(value).replace("'", "''") + "'"
         
-        # Add goal linkage to payload
-        payload["goal_id"] = goal_id
-        payload["auto_generated"] = True
-        payload["generated_by"] = "goal_decomposer"
-        
-        # Tags for filtering and tracking
-        tags = ["auto-generated", "goal-task", f"goal:{goal_id[:8]}", task_type]
+        task_ids = []
+        values = []
+        for task_def in task_defs:
+            task_id = str(uuid4())
+            task_type = task_def["task_type"]
+            payload = dict(task_def.get("payload") or {})
+            
+            # Add goal linkage to payload
+            payload["goal_id"] = goal_id
+            payload["auto_generated"] = True
+            payload["generated_by"] = "goal_decomposer"
+            if version:
+                payload["goal_version"] = version
+            
+            # Tags for filtering and tracking
+            tags = ["auto-generated", "goal-task", f"goal:{goal_id[:8]}", task_type]
+            
+            task_ids.append(task_id)
+            values.append(
+                f"({quote(task_id)}, {quote(goal_id)}, {quote(task_def['title'])}, "
+                f"{quote(task_def['description'])}, {quote(task_type)}, 'pending', "
+                f"{quote(task_def['priority'])}, {quote(json.dumps(payload))}, {quote(json.dumps(tags))}, "
+                f"'{now}', '{now}', 'goal_decomposer')"
+            )
         
         try:
-            # Use passed execute_sql function from main.py
-            insert_sql = f"""
+            self.execute_sql(f"""
                 INSERT INTO governance_tasks (
                     id, goal_id, title, description, task_type, 
                     status, priority, payload, tags, 
                     created_at, updated_at, created_by
-                ) VALUES (
-                    '{task_id}',
-                    '{goal_id.replace("'", "''")}',
-                    '{title.replace("'", "''")}',
-                    '{description.replace("'", "''")}',
-                    '{task_type}',
-                    'pending',
-                    '{priority}',
-                    '{json.dumps(payload).replace("'", "''")}',
-                    '{json.dumps(tags).replace("'", "''")}',
-                    '{now}',
-                    '{now}',
-                    'goal_decomposer'
-                )
+                ) VALUES {", ".join(values)}
                 RETURNING id
-            """
-            self.execute_sql(insert_sql)
-            
-            logger.info(f"Created task {task_id} for goal {goal_id}: {title}")
-            return task_id
+            """)
+            logger.info(f"Created {len(task_ids)} tasks for goal {goal_id}")
+            return task_ids
             
         except Exception as e:
-            logger.error(f"Failed to create task: {e}")
-            return None
+            logger.error(f"Failed to create tasks: {e}")
+            return []
 
 
 def decompose_goals_cycle(
@@ -69,7 +69,8 @@ AVAILABLE_HANDLERS: List[str] = list(_HANDLER_REGISTRY.keys())
 def get_handler(
     task_type: str,
     execute_sql: Callable[[str], Dict[str, Any]],
-    log_action: Callable[..., Optional[str]]
+    log_action: Callable[..., Optional[str]],
+    context: Optional[Any] = None
 ) -> Optional[BaseHandler]:
     """Get an initialized handler for the specified task type.
     
@@ -77,6 +78,7 @@ def get_handler(
         task_type: The type of task to get a handler for.
         execute_sql: Function to execute SQL queries.
         log_action: Function to log actions.
+        context: Optional preflight TaskContext attached to the handler.
     
     Returns:
         Initialized handler instance, or None if no handler exists for the type.
@@ -93,7 +95,9 @@ def get_handler(
         return None
     
     try:
-        return handler_class(execute_sql, log_action)
+        handler = handler_class(execute_sql, log_action)
+        handler.context = context
+        return handler
     except Exception as init_error:
         logger.error(
             "Failed to initialize handler for %s: %s",
@@ -146,7 +150,8 @@ def register_handler(task_type: str, handler_class: Type[BaseHandler]) -> None:
 def dispatch_task(
     task: Dict[str, Any],
     execute_sql: Callable[[str], Dict[str, Any]],
-    log_action: Callable[..., Optional[str]]
+    log_action: Callable[..., Optional[str]],
+    context: Optional[Any] = None
 ) -> Optional[HandlerResult]:
     """Dispatch a task to its appropriate handler.
     
@@ -156,6 +161,8 @@ def dispatch_task(
         task: Task dictionary containing at least 'task_type' field.
         execute_sql: Function to execute SQL queries.
         log_action: Function to log actions.
+        context: Optional preflight TaskContext (core.task_preflight),
+            attached to the handler as ``handler.context``.
     
     Returns:
         HandlerResult from the handler, or None if no handler exists.
@@ -171,7 +178,7 @@ def dispatch_task(
         logger.warning("Task missing 'task_type' field")
         return None
     
-    handler = get_handler(task_type, execute_sql, log_action)
+    handler = get_handler(task_type, execute_sql, log_action, context=context)
     
     if handler is None:
         return None
@@ -62,6 +62,7 @@ class BaseHandler(ABC):
         task_type: The task type string this handler processes.
         execute_sql: Function to execute SQL queries.
         log_action: Function to log actions.
+        context: Optional immutable preflight context for the current task.
     """
 
     task_type: str = "unknown"
@@ -80,6 +81,8 @@ class BaseHandler(ABC):
         self.execute_sql = execute_sql
         self.log_action = log_action
         self._execution_logs: list = []
+        # Preflight TaskContext (core.task_preflight), set by get_handler/dispatch_task
+        self.context: Optional[Any] = None
 
     def _log(
         self,
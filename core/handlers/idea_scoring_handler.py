@@ -3,6 +3,7 @@ import logging
 from typing import Any, Dict, List, Optional
 
 from core.idea_scorer import IdeaScorer
+from core.schema_registry import get_schema_registry
 
 from .base import BaseHandler, HandlerResult
 
@@ -30,22 +31,23 @@ class IdeaScoringHandler(BaseHandler):
             task_id=task_id,
         )
 
-        try:
-            schema_res = self.execute_sql(
-                """
-                SELECT column_name
-                FROM information_schema.columns
-                WHERE table_name = 'revenue_ideas'
-                  AND column_name IN ('score', 'score_breakdown')
-                """
-            )
-            schema_rows = schema_res.get("rows", []) or []
-            cols = {str(r.get("column_name") or "") for r in schema_rows}
-            has_score_col = "score" in cols
-            has_breakdown_col = "score_breakdown" in cols
-        except Exception:
-            has_score_col = False
-            has_breakdown_col = False
+        cols = get_schema_registry().columns("revenue_ideas")
+        if cols is None:
+            try:
+                schema_res = self.execute_sql(
+                    """
+                    SELECT column_name
+                    FROM information_schema.columns
+                    WHERE table_name = 'revenue_ideas'
+                      AND column_name IN ('score', 'score_breakdown')
+                    """
+                )
+                schema_rows = schema_res.get("rows", []) or []
+                cols = {str(r.get("column_name") or "") for r in schema_rows}
+            except Exception:
+                cols = set()
+        has_score_col = "score" in cols
+        has_breakdown_col = "score_breakdown" in cols
 
         try:
             res = self.execute_sql(
@@ -18,6 +18,8 @@ from uuid import uuid4
 
 from .base import BaseHandler, HandlerResult
 from core.ai_executor import AIExecutor
+from core.llm_cache import CachePolicy
+from core.schema_registry import get_schema_registry
 
 # Configure module logger
 logger = logging.getLogger(__name__)
@@ -402,10 +404,18 @@ class ResearchHandler(BaseHandler):
             f"Extracted candidates: {json.dumps(candidates)[:4000]}\n"
         )
 
+        # Exact matches only: prompts for different queries can differ in little
+        # more than the query itself (e.g. with a placeholder source), and a
+        # near match would hand one query another's findings. Findings go
+        # stale, so entries live for hours rather than days.
         resp = executor.chat([
             {"role": "system", "content": "Return ONLY JSON. No markdown. No code fences."},
             {"role": "user", "content": prompt},
-        ])
+        ], cache=CachePolicy(
+            "research_synthesis",
+            ttl_seconds=6 * 3600,
+            accept=lambda content: isinstance(self._extract_json_object(content), dict),
+        ))
         parsed = self._extract_json_object(getattr(resp, "content", "") or "")
         if not isinstance(parsed, dict):
             return None
@@ -535,17 +545,28 @@ class ResearchHandler(BaseHandler):
         if not url:
             return None
 
-        # Navigate to URL
-        nav = self._puppeteer_action("navigate", {"url": url})
-        if not nav or not nav.get("success"):
+        # One-shot scrape on any free pooled page (images/fonts blocked)
+        page = self._puppeteer_action("scrape", {"url": url})
+        if page and page.get("success"):
+            return page.get("html", "")
+        if not page or "Unknown action" not in str(page.get("error", "")):
             return None
 
-        # Get page content (no selector = full HTML)
-        page = self._puppeteer_action("get_text", {})
-        if not page or not page.get("success"):
-            return None
+        # Older service without "scrape": navigate + get_text on a private session
+        session = {"session_id": f"research-{uuid4()}"}
+        try:
+            nav = self._puppeteer_action("navigate", {"url": url, **session})
+            if not nav or not nav.get("success"):
+                return None
 
-        return page.get("html", "")
+            # Get page content (no selector = full HTML)
+            page = self._puppeteer_action("get_text", session)
+            if not page or not page.get("success"):
+                return None
+
+            return page.get("html", "")
+        finally:
+            self._puppeteer_action("close", session)
 
 
     def _extract_domain_candidates_from_sources(
@@ -713,6 +734,9 @@ class ResearchHandler(BaseHandler):
             global _RESEARCH_FINDINGS_TABLE_EXISTS
             global _RESEARCH_FINDINGS_TABLE_MISSING_LOGGED
 
+            if _RESEARCH_FINDINGS_TABLE_EXISTS is None:
+                _RESEARCH_FINDINGS_TABLE_EXISTS = get_schema_registry().has_table(RESEARCH_FINDINGS_TABLE)
+
             if _RESEARCH_FINDINGS_TABLE_EXISTS is None:
                 check_sql = f"""
                     SELECT EXISTS (
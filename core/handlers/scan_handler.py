@@ -10,6 +10,8 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
+from core.schema_registry import get_schema_registry
+
 from .base import BaseHandler, HandlerResult
 
 # Configure module logger
@@ -290,15 +292,18 @@ class ScanHandler(BaseHandler):
                 value = opp.get("estimated_value", 0)
                 metadata = json.dumps(opp.get("metadata", {})).replace("'", "''")
                 
-                # Check if opportunities table exists
-                check_sql = f"""
-                    SELECT EXISTS (
-                        SELECT FROM information_schema.tables 
-                        WHERE table_name = '{OPPORTUNITIES_TABLE}'
-                    )
-                """
-                result = self.execute_sql(check_sql)
-                if not result.get("rows", [{}])[0].get("exists", False):
+                # Check if opportunities table exists (from the schema registry when loaded)
+                table_exists = get_schema_registry().has_table(OPPORTUNITIES_TABLE)
+                if table_exists is None:
+                    check_sql = f"""
+                        SELECT EXISTS (
+                            SELECT FROM information_schema.tables 
+                            WHERE table_name = '{OPPORTUNITIES_TABLE}'
+                        )
+                    """
+                    result = self.execute_sql(check_sql)
+                    table_exists = result.get("rows", [{}])[0].get("exists", False)
+                if not table_exists:
                     self._log(
                         "handler.scan.table_missing",
                         f"Table {OPPORTUNITIES_TABLE} does not exist",
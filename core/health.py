@@ -25,12 +25,27 @@ Usage:
     @app.get("/health")
     async def health():
         return await health_check.check()
+
+Background probing:
+    HealthMonitor runs each registered check on its own interval in a daemon
+    thread and caches the result with a timestamp, so health endpoints read
+    the cache instead of touching dependencies on every request:
+
+    monitor = HealthMonitor("main-service")
+    monitor.register("database", check_database_connection, critical=True)
+    monitor.start()
+
+    monitor.liveness()     # process only, never touches a dependency
+    monitor.readiness()    # critical checks healthy and fresh, from cache
+    monitor.snapshot()     # all cached results
+    monitor.run_now()      # deep check: probe everything now, with timeouts
 """
 
 import asyncio
 import json
 import logging
 import os
+import threading
 import time
 from datetime import datetime, timedelta
 from functools import wraps
@@ -40,6 +55,14 @@ from .database import query_db
 
 logger = logging.getLogger(__name__)
 
+# Background probe schedule (seconds)
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "15"))
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "5"))
+# A cached result older than this many intervals is reported as stale
+HEALTH_STALE_INTERVALS = 3
+# Deep checks reuse results younger than this instead of probing again
+HEALTH_DEEP_MIN_AGE = float(os.getenv("HEALTH_DEEP_MIN_AGE", "5"))
+
 class HealthCheckError(Exception):
     """Exception raised for errors in health checks."""
     pass
@@ -118,20 +141,26 @@ class HealthCheck:
         
         return result
     
-    async def _run_check(self, name: str, check_func: Callable) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    async def _run_check(self, name: str, check_func: Callable,
+                         timeout: float = 5.0) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
         """
         Run a single health check with timeout.
         
         Args:
             name: Name of the check
-            check_func: Check function
+            check_func: Check function (async, or sync to run in a thread)
+            timeout: Seconds before the check is reported as timed out
             
         Returns:
             Tuple of (status, message, details)
         """
         try:
             # Run check with timeout
-            result = await asyncio.wait_for(check_func(), timeout=5.0)
+            if asyncio.iscoroutinefunction(check_func):
+                pending = check_func()
+            else:
+                pending = asyncio.to_thread(check_func)
+            result = await asyncio.wait_for(pending, timeout=timeout)
             
             if isinstance(result, tuple):
                 if len(result) == 2:
@@ -149,7 +178,7 @@ class HealthCheck:
             
             return status, message, details
         except asyncio.TimeoutError:
-            return False, "Check timed out after 5 seconds", None
+            return False, f"Check timed out after {timeout:g} seconds", None
         except Exception as e:
             logger.exception("Health check '%s' failed with exception", name)
             return False, f"Check failed with exception: {e}", {"exception": str(e)}
@@ -165,20 +194,245 @@ class HealthCheck:
         self.checks[name] = check_func
         logger.debug(f"Registered health check '{name}' for service '{self.service_name}'")
 
-def register_health_check(health_check: HealthCheck, name: Optional[str] = None):
+
+class HealthMonitor(HealthCheck):
+    """
+    Health check manager whose checks run in the background.
+
+    Each check runs on its own interval, with a timeout, on an event loop in
+    a daemon thread. Results are cached with the time they were taken, and
+    the read methods only look at the cache, so a slow or unreachable
+    dependency never slows down a health request.
+    """
+
+    def __init__(self, service_name: str, interval: Optional[float] = None,
+                 timeout: Optional[float] = None):
+        """
+        Initialize a health monitor.
+
+        Args:
+            service_name: Name of the service
+            interval: Default seconds between runs of each check
+            timeout: Default seconds before a check is reported as timed out
+        """
+        super().__init__(service_name)
+        self.interval = interval if interval is not None else HEALTH_PROBE_INTERVAL
+        self.timeout = timeout if timeout is not None else HEALTH_PROBE_TIMEOUT
+        self.probes: Dict[str, Dict[str, Any]] = {}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.first_run = threading.Event()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, check_func: Callable, interval: Optional[float] = None,
+                 timeout: Optional[float] = None, critical: bool = False) -> None:
+        """
+        Register a health check function.
+
+        Args:
+            name: Name of the check
+            check_func: Function that returns (status, message, [details]);
+                sync functions run in a worker thread
+            interval: Seconds between runs (defaults to the monitor's)
+            timeout: Seconds before the check times out (defaults to the monitor's)
+            critical: A failing critical check makes the service unhealthy
+                and not ready; other failures only degrade it
+        """
+        super().register(name, check_func)
+        self.probes[name] = {
+            "interval": interval or self.interval,
+            "timeout": timeout or self.timeout,
+            "critical": critical,
+        }
+
+    # ---- background loop ----
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start probing in the background. Safe to call more than once."""
+        with self._lock:
+            if self.running:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._run_loop, name=f"health-{self.service_name}", daemon=True)
+            self._thread.start()
+        logger.info("Health monitor started for %s (%d checks)", self.service_name, len(self.checks))
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the background loop."""
+        loop, thread = self._loop, self._thread
+        if loop is None or thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        self._thread = None
+
+    def _run_loop(self) -> None:
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self.probe_all())
+        except Exception:
+            logger.exception("Initial health probe round failed for %s", self.service_name)
+        self.first_run.set()
+        for name in list(self.checks):
+            loop.create_task(self._probe_forever(name))
+        try:
+            loop.run_forever()
+        finally:
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+
+    async def _probe_forever(self, name: str) -> None:
+        interval = self.probes[name]["interval"]
+        while True:
+            await asyncio.sleep(interval)
+            await self.probe(name)
+
+    async def probe(self, name: str) -> Dict[str, Any]:
+        """Run one check now and cache its result."""
+        config = self.probes.get(name) or {"timeout": self.timeout, "critical": False}
+        start_time = time.time()
+        status, message, details = await self._run_check(
+            name, self.checks[name], timeout=config["timeout"])
+        entry = {
+            "status": "healthy" if status else "unhealthy",
+            "message": message,
+            "checked_at": time.time(),
+            "duration_ms": int((time.time() - start_time) * 1000),
+            "critical": config["critical"],
+        }
+        if details:
+            entry["details"] = details
+        with self._lock:
+            self.results[name] = entry
+        return entry
+
+    async def probe_all(self, max_age: float = 0.0) -> None:
+        """
+        Run every check now, concurrently.
+
+        Args:
+            max_age: Skip checks whose cached result is younger than this
+        """
+        now = time.time()
+        with self._lock:
+            fresh = {name for name, entry in self.results.items()
+                     if now - entry["checked_at"] < max_age}
+        names = [name for name in self.checks if name not in fresh]
+        if names:
+            await asyncio.gather(*(self.probe(name) for name in names))
+
+    def run_now(self, max_age: float = HEALTH_DEEP_MIN_AGE) -> Dict[str, Any]:
+        """
+        Deep check: probe everything now (with timeouts) and return a snapshot.
+
+        Runs on the background loop when it is up, so callers in any thread
+        share it; results younger than max_age are reused so a burst of deep
+        requests does not multiply load on dependencies.
+        """
+        if self.running:
+            future = asyncio.run_coroutine_threadsafe(self.probe_all(max_age), self._loop)
+            budget = max((p["timeout"] for p in self.probes.values()), default=self.timeout)
+            try:
+                future.result(budget + 1.0)
+            except Exception as e:
+                logger.warning("Deep health check for %s did not finish: %s", self.service_name, e)
+        else:
+            asyncio.run(self.probe_all(max_age))
+        return self.snapshot()
+
+    async def check(self, fresh: bool = False) -> Dict[str, Any]:
+        """
+        Health check result, from the cache when the monitor is running.
+
+        Args:
+            fresh: Probe everything now instead of reading the cache
+        """
+        if fresh or not self.running:
+            await self.probe_all(HEALTH_DEEP_MIN_AGE if fresh else 0.0)
+        result = self.snapshot()
+        self.last_check_time = datetime.now()
+        self.last_check_result = result
+        return result
+
+    # ---- cached reads ----
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All cached check results with the overall status. Never blocks on a probe."""
+        now = time.time()
+        with self._lock:
+            results = {name: dict(entry) for name, entry in self.results.items()}
+
+        overall_status = "healthy"
+        checks = {}
+        for name in self.checks:
+            config = self.probes.get(name, {"interval": self.interval, "critical": False})
+            entry = results.get(name)
+            if entry is None:
+                entry = {"status": "pending", "message": "Not checked yet", "critical": config["critical"]}
+            else:
+                age = now - entry["checked_at"]
+                entry["age_seconds"] = round(age, 3)
+                entry["checked_at"] = datetime.fromtimestamp(entry["checked_at"]).isoformat()
+                if age > config["interval"] * HEALTH_STALE_INTERVALS:
+                    entry["status"] = "stale"
+            checks[name] = entry
+            if entry["status"] != "healthy":
+                if config["critical"]:
+                    overall_status = "unhealthy"
+                elif overall_status == "healthy":
+                    overall_status = "degraded"
+
+        return {
+            "status": overall_status,
+            "service": self.service_name,
+            "timestamp": datetime.now().isoformat(),
+            "uptime_seconds": (datetime.now() - self.startup_time).total_seconds(),
+            "checks": checks,
+        }
+
+    def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        """Ready when every critical check is healthy and fresh, from the cache."""
+        snapshot = self.snapshot()
+        ready = all(entry["status"] == "healthy"
+                    for entry in snapshot["checks"].values() if entry["critical"])
+        snapshot["ready"] = ready
+        return ready, snapshot
+
+    def liveness(self) -> Dict[str, Any]:
+        """Process-only liveness; never looks at a dependency."""
+        return {
+            "status": "alive",
+            "service": self.service_name,
+            "timestamp": datetime.now().isoformat(),
+            "uptime_seconds": (datetime.now() - self.startup_time).total_seconds(),
+            "monitor_running": self.running,
+        }
+
+def register_health_check(health_check: HealthCheck, name: Optional[str] = None, **options):
     """
     Decorator to register a health check function.
     
     Args:
         health_check: HealthCheck instance
         name: Optional name for the check (defaults to function name)
+        **options: Probe options for a HealthMonitor (interval, timeout, critical)
         
     Returns:
         Decorator function
     """
     def decorator(func):
         check_name = name or func.__name__
-        health_check.register(check_name, func)
+        health_check.register(check_name, func, **options)
         return func
     return decorator
 
@@ -193,7 +447,7 @@ async def check_database_connection() -> Tuple[bool, str, Optional[Dict[str, Any
     """
     try:
         start_time = time.time()
-        result = await query_db("SELECT 1 as db_check")
+        result = await asyncio.to_thread(query_db, "SELECT 1 as db_check")
         
         if not result or "rows" not in result or not result["rows"]:
             return False, "Database query failed", None
@@ -236,7 +490,8 @@ async def check_worker_registry() -> Tuple[bool, str, Optional[Dict[str, Any]]]:
         Tuple of (status, message, details)
     """
     try:
-        result = await query_db(
+        result = await asyncio.to_thread(
+            query_db,
             """
             SELECT 
                 COUNT(*) as total_workers,
@@ -4,13 +4,12 @@ import json
 import logging
 import os
 import re
-import urllib.error
-import urllib.request
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 from core.ai_executor import AIExecutor
+from core.llm_transport import PERPLEXITY_CHAT_ENDPOINT, get_llm_transport
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +25,7 @@ class RevenueIdea:
 class IdeaGenerator:
     """Generates revenue opportunities based on available capabilities."""
 
-    PERPLEXITY_API_ENDPOINT = "https://api.perplexity.ai/chat/completions"
+    PERPLEXITY_API_ENDPOINT = PERPLEXITY_CHAT_ENDPOINT
 
     def __init__(
         self,
@@ -93,24 +92,11 @@ class IdeaGenerator:
             "messages": [{"role": "user", "content": query}],
         }
 
-        req = urllib.request.Request(
-            self.PERPLEXITY_API_ENDPOINT,
-            data=json.dumps(payload).encode("utf-8"),
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.perplexity_api_key}",
-            },
-            method="POST",
-        )
-
         try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                raw = json.loads(resp.read().decode("utf-8"))
+            raw = get_llm_transport().complete(
+                payload, provider="perplexity", api_key=self.perplexity_api_key
+            ).raw
             logger.info(f"Perplexity search successful for: {query[:50]}...")
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode("utf-8") if e.fp else "no body"
-            logger.error(f"Perplexity HTTP error {e.code}: {error_body[:200]}")
-            return None
         except Exception as e:
             logger.error(f"Perplexity search failed: {type(e).__name__}: {e}")
             return None
@@ -1,6 +1,13 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Sequence
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+    NUMPY_AVAILABLE = False
 
 
 SCORING_FACTORS = {
@@ -33,6 +40,26 @@ def _score_high_better(value: float, good: float, bad: float) -> float:
     return _clamp(100.0 * ((value - bad) / (good - bad)))
 
 
+# breakdown key -> (SCORING_FACTORS key, good, bad); lower-is-better when good < bad
+_BREAKDOWN_RANGES = {
+    "capital_required": ("capital_required", 0.0, 200.0),
+    "time_to_first_dollar": ("time_to_first_dollar_days", 3.0, 60.0),
+    "effort_hours": ("effort_hours", 2.0, 80.0),
+    "scalability": ("scalability", 10.0, 1.0),
+    "risk_level": ("risk_level", 1.0, 10.0),
+    "capability_fit": ("capability_fit", 10.0, 1.0),
+}
+
+
+def _score_column(values: Sequence[float], good: float, bad: float) -> List[float]:
+    """_score_low_better / _score_high_better for a whole column at once."""
+    # Both are the same line through (good, 100) and (bad, 0), clamped to 0-100
+    if NUMPY_AVAILABLE:
+        column = np.asarray(values, dtype=float)
+        return np.clip(100.0 * (1.0 - ((column - good) / (bad - good))), 0.0, 100.0).tolist()
+    return [_clamp(100.0 * (1.0 - ((v - good) / (bad - good)))) for v in values]
+
+
 def _coerce_1_to_10(value: Any, default: float) -> float:
     if value is None:
         return float(default)
@@ -70,33 +97,33 @@ class IdeaScorer:
     """Score ideas on capital/time/effort/scalability/risk/capability fit."""
 
     def score_idea(self, idea: Dict[str, Any]) -> Dict[str, Any]:
-        estimates = idea.get("estimates") or {}
-
-        capital = float(estimates.get("capital_required", 50) or 50)
-        ttf = float(estimates.get("time_to_first_dollar_days", 30) or 30)
-        effort = float(estimates.get("effort_hours", 20) or 20)
-        scalability = _coerce_1_to_10(estimates.get("scalability", 5) or 5, default=5)
-        risk = _coerce_1_to_10(estimates.get("risk_level", 5) or 5, default=5)
-        fit = _coerce_1_to_10(estimates.get("capability_fit", 5) or 5, default=5)
-
-        breakdown: Dict[str, float] = {
-            "capital_required": _score_low_better(capital, good=0, bad=200),
-            "time_to_first_dollar": _score_low_better(ttf, good=3, bad=60),
-            "effort_hours": _score_low_better(effort, good=2, bad=80),
-            "scalability": _score_high_better(scalability, good=10, bad=1),
-            "risk_level": _score_low_better(risk, good=1, bad=10),
-            "capability_fit": _score_high_better(fit, good=10, bad=1),
+        return self.score_ideas([idea])[0]
+
+    def score_ideas(self, ideas: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score many ideas at once; each factor is computed over the whole column."""
+        raw: Dict[str, List[float]] = {key: [] for key in _BREAKDOWN_RANGES}
+        for idea in ideas:
+            estimates = idea.get("estimates") or {}
+            raw["capital_required"].append(float(estimates.get("capital_required", 50) or 50))
+            raw["time_to_first_dollar"].append(float(estimates.get("time_to_first_dollar_days", 30) or 30))
+            raw["effort_hours"].append(float(estimates.get("effort_hours", 20) or 20))
+            raw["scalability"].append(_coerce_1_to_10(estimates.get("scalability", 5) or 5, default=5))
+            raw["risk_level"].append(_coerce_1_to_10(estimates.get("risk_level", 5) or 5, default=5))
+            raw["capability_fit"].append(_coerce_1_to_10(estimates.get("capability_fit", 5) or 5, default=5))
+
+        columns = {
+            key: _score_column(raw[key], good, bad)
+            for key, (_, good, bad) in _BREAKDOWN_RANGES.items()
         }
 
-        score = 0.0
-        score += breakdown["capital_required"] * SCORING_FACTORS["capital_required"]["weight"]
-        score += breakdown["time_to_first_dollar"] * SCORING_FACTORS["time_to_first_dollar_days"]["weight"]
-        score += breakdown["effort_hours"] * SCORING_FACTORS["effort_hours"]["weight"]
-        score += breakdown["scalability"] * SCORING_FACTORS["scalability"]["weight"]
-        score += breakdown["risk_level"] * SCORING_FACTORS["risk_level"]["weight"]
-        score += breakdown["capability_fit"] * SCORING_FACTORS["capability_fit"]["weight"]
-
-        return {
-            "score": round(_clamp(score), 2),
-            "breakdown": {k: round(v, 2) for k, v in breakdown.items()},
-        }
+        results: List[Dict[str, Any]] = []
+        for i in range(len(ideas)):
+            breakdown = {key: columns[key][i] for key in _BREAKDOWN_RANGES}
+            score = 0.0
+            for key, (factor, _, _) in _BREAKDOWN_RANGES.items():
+                score += breakdown[key] * SCORING_FACTORS[factor]["weight"]
+            results.append({
+                "score": round(_clamp(score), 2),
+                "breakdown": {k: round(v, 2) for k, v in breakdown.items()},
+            })
+        return results
@@ -19,10 +19,8 @@ from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
-# Third-party imports
-import httpx
-
 from core.database import query_db as _db_query, escape_sql_value as _format_value
+from core.schema_registry import get_schema_registry
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -140,13 +138,35 @@ def _execute_sql(query: str) -> Dict[str, Any]:
 # =============================================================================
 
 
+# Bump when the DDL in create_impact_simulations_table changes
+IMPACT_SCHEMA_VERSION = 1
+
+IMPACT_SCHEMA_COLUMNS = {
+    "impact_simulations": [
+        "id", "action_type", "action_id", "experiment_id", "task_id", "predicted_impact",
+        "risk_score", "severity", "decision", "warnings", "predicted_cost_cents",
+        "predicted_duration_minutes", "confidence", "reasoning", "actual_outcome",
+        "actual_cost_cents", "actual_duration_minutes", "outcome_recorded_at",
+        "accuracy_score", "simulated_by", "created_at",
+    ],
+}
+IMPACT_SCHEMA_INDEXES = ("idx_impact_sim_action_type", "idx_impact_sim_decision", "idx_impact_sim_created")
+
+
 def create_impact_simulations_table() -> bool:
     """
     Create the impact_simulations table if it doesn't exist.
 
+    Skipped (once per process) when the schema registry already shows it.
+
     Returns:
         True if table created or already exists, False on error
     """
+    registry = get_schema_registry()
+    if registry.is_ensured("impact_simulations", IMPACT_SCHEMA_VERSION,
+                           columns=IMPACT_SCHEMA_COLUMNS, indexes=IMPACT_SCHEMA_INDEXES):
+        return True
+
     query = """
     CREATE TABLE IF NOT EXISTS impact_simulations (
         id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -181,6 +201,7 @@ def create_impact_simulations_table() -> bool:
     """
     try:
         _execute_sql(query)
+        registry.mark_ensured("impact_simulations", IMPACT_SCHEMA_VERSION)
         logger.info("impact_simulations table created or verified")
         return True
     except Exception as e:
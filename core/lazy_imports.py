@@ -0,0 +1,101 @@
+"""
+Deferred imports for optional subsystems.
+
+Entry points (main.py, dashboard_api_main.py) used to import every optional
+subsystem at module level inside ``try/except ImportError`` blocks, so each
+cold start, watchdog probe and short-lived script paid for all of them
+(api.brain_api alone pulls in core.unified_brain and requests, and
+core.auto_scaling pulls in httpx). OptionalImport keeps the same
+"available / import error / stub fallback" shape but imports on first use.
+
+Usage:
+    _brain_api = OptionalImport("api.brain_api")
+
+    def handle_brain_request(*args, **kwargs):
+        if not _brain_api.available:
+            return {"status": 503, ...}
+        return _brain_api.handle_brain_request(*args, **kwargs)
+
+    # Optionally warm it up off the startup path:
+    preload_in_background([_brain_api])
+"""
+
+import importlib
+import logging
+import threading
+from types import ModuleType
+from typing import Any, Iterable, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+class OptionalImport:
+    """A module imported on first use; an import failure is recorded, not raised."""
+
+    def __init__(self, module: str, errors: Tuple[Type[BaseException], ...] = (ImportError,)):
+        self.module_name = module
+        self._errors = errors
+        self._module: Optional[ModuleType] = None
+        self._error: Optional[str] = None
+        self._attempted = False
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        """Import the module once; True if it is available."""
+        if not self._attempted:
+            with self._lock:
+                if not self._attempted:
+                    try:
+                        self._module = importlib.import_module(self.module_name)
+                    except self._errors as e:
+                        self._error = str(e)
+                        logger.info("Optional module %s unavailable: %s", self.module_name, e)
+                    self._attempted = True
+        return self._module is not None
+
+    @property
+    def available(self) -> bool:
+        return self.load()
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the import has been attempted (without triggering it)."""
+        return self._attempted
+
+    @property
+    def error(self) -> Optional[str]:
+        """Import error message, if the import was attempted and failed."""
+        return self._error
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if not self.load():
+            raise ImportError(f"{self.module_name} is not available: {self._error}")
+        return getattr(self._module, name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else ("failed" if self._attempted else "deferred")
+        return f"<OptionalImport {self.module_name} ({state})>"
+
+
+def preload_in_background(imports: Iterable[OptionalImport], name: str = "optional-import-preload") -> threading.Thread:
+    """Import the given modules on a daemon thread, off the startup path."""
+    pending = list(imports)
+
+    def _run() -> None:
+        for optional in pending:
+            try:
+                optional.load()
+            except Exception as e:
+                logger.warning("Preloading %s failed: %s", optional.module_name, e)
+
+    thread = threading.Thread(target=_run, name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+__all__ = [
+    "OptionalImport",
+    "preload_in_background",
+]
@@ -53,6 +53,17 @@ def get_applicable_learnings(
     Returns:
         List of learning dictionaries ready for application
     """
+    from core.learnings_cache import get_learnings_cache
+
+    cache = get_learnings_cache(execute_sql_func)
+    if cache.ensure_loaded():
+        rows = cache.applicable(APPLICABLE_CATEGORIES, CONFIDENCE_THRESHOLD_FOR_APPLICATION, limit)
+        logger.info(
+            "Retrieved applicable learnings",
+            extra={"count": len(rows), "source": "cache"},
+        )
+        return rows
+
     sql = f"""
         SELECT 
             id,
@@ -525,6 +536,9 @@ def increment_applied_count(
         result = execute_sql_func(sql)
         rows = result.get("rows", [])
         if rows:
+            from core.learnings_cache import notify_learning_applied
+
+            notify_learning_applied(learning_id, effectiveness_score)
             new_count = rows[0].get("applied_count", 0)
             logger.info(
                 "Incremented learning applied_count",
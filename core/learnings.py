@@ -18,6 +18,8 @@ from typing import Any, Dict, List, Optional
 
 # M-06: Centralized DB access via core.database
 from core.database import query_db as _execute_sql, escape_sql_value as _escape_value
+from core.learnings_cache import get_learnings_cache, notify_learning_applied, notify_learning_written
+from core.memory_index import notify_memory_written
 
 
 def extract_learning_from_task(
@@ -177,6 +179,17 @@ def store_learning(
         if rows:
             learning_id = rows[0].get("id")
             print(f"[LEARNING] Stored learning {learning_id}: {summary[:50]}...")
+            notify_memory_written("learnings", {
+                "id": learning_id, "worker_id": worker_id, "category": category,
+                "summary": summary, "confidence": confidence,
+                "task_type": (details or {}).get("task_type"),
+            })
+            notify_learning_written({
+                "id": learning_id, "worker_id": worker_id, "task_id": task_id, "goal_id": goal_id,
+                "category": category, "summary": summary, "details": details or {},
+                "confidence": confidence, "applied_count": 0, "is_validated": False,
+                "created_at": now, "updated_at": now,
+            })
             return learning_id
         return None
     except Exception as e:
@@ -247,6 +260,13 @@ def get_relevant_learnings_for_task(
     Returns:
         List of relevant learning records
     """
+    cache = get_learnings_cache(_execute_sql)
+    if cache.ensure_loaded():
+        return [
+            {k: r.get(k) for k in ("id", "category", "summary", "details", "confidence")}
+            for r in cache.relevant_for_task(task_type, limit=limit)
+        ]
+    
     sql = f"""
         SELECT id, category, summary, details, confidence
         FROM learnings
@@ -290,7 +310,10 @@ def increment_learning_applied(learning_id: str) -> bool:
     
     try:
         result = _execute_sql(sql)
-        return result.get("rowCount", 0) > 0
+        updated = result.get("rowCount", 0) > 0
+        if updated:
+            notify_learning_applied(learning_id)
+        return updated
     except Exception as e:
         print(f"[ERROR] Failed to increment learning applied count: {e}")
         return False
@@ -0,0 +1,349 @@
+"""
+Learnings Cache - In-process index of the learnings table
+
+Task startup (get_relevant_learnings_for_task), the learning application cycle
+(get_applicable_learnings) and search_learnings used to query ``learnings``
+with a ``details->>'task_type'`` JSON-path filter or ``summary ILIKE`` on
+every call. This module keeps the table in memory, indexed by task type and
+category, so those lookups are ranked in-process without a round-trip.
+
+- Loaded in bulk on first use (paged).
+- Updated in place by store_learning / record_learning (notify_learning_written)
+  and by applied-count increments (notify_learning_applied).
+- Reconciled periodically by a high-water mark on (COALESCE(updated_at, created_at), id),
+  which also picks up writers that don't notify (validation, other modules).
+- Pruned less often against the table's id set, since a deleted row never
+  shows up past the high-water mark.
+
+Callers fall back to their SQL query whenever the cache cannot be loaded.
+
+Usage:
+    from core.learnings_cache import get_learnings_cache
+
+    cache = get_learnings_cache()
+    if cache.ensure_loaded():
+        rows = cache.relevant_for_task("code", limit=5)
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .database import escape_sql_value
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per page during bulk load / reconcile
+LOAD_BATCH_SIZE = 5000
+
+# Minimum seconds between high-water-mark reconciles
+RECONCILE_INTERVAL_SECONDS = 60.0
+
+# Minimum seconds between id-set prunes that drop deleted learnings
+PRUNE_INTERVAL_SECONDS = 600.0
+
+COLUMNS = (
+    "id, worker_id, task_id, goal_id, category, summary, details, confidence, "
+    "applied_count, effectiveness_score, is_validated, created_at, updated_at, "
+    "COALESCE(updated_at, created_at) AS _changed_at"
+)
+
+# Same ordering get_relevant_learnings_for_task uses in SQL
+_CATEGORY_RANK = {"failure": 1, "success": 2}
+
+
+def _task_type(row: Dict[str, Any]) -> Optional[str]:
+    details = row.get("details")
+    if isinstance(details, str):
+        try:
+            details = json.loads(details)
+        except ValueError:
+            details = None
+    if isinstance(details, dict):
+        return details.get("task_type")
+    return row.get("task_type")
+
+
+def _confidence(row: Dict[str, Any]) -> float:
+    try:
+        return float(row.get("confidence") or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _is_true(value: Any) -> bool:
+    return value is True or str(value).lower() in ("true", "t", "1")
+
+
+class LearningsCache:
+    """Thread-safe in-memory copy of ``learnings`` indexed by task type and category."""
+
+    def __init__(self, query_fn: Optional[Callable[[str], Dict[str, Any]]] = None):
+        if query_fn is None:
+            from .database import query_db as query_fn
+        self._query = query_fn
+        self._lock = threading.RLock()
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._by_task_type: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._by_category: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # (changed_at, id) of the last row reconciled
+        self._hwm: Optional[Tuple[str, str]] = None
+        self._loaded = False
+        self._last_reconcile = float("-inf")
+        self._last_prune = float("-inf")
+        self._sync_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ------------------------------------------------------------------ #
+    # Maintenance
+    # ------------------------------------------------------------------ #
+
+    def _unindex(self, row: Dict[str, Any]) -> None:
+        row_id = str(row["id"])
+        for index, key in ((self._by_task_type, _task_type(row)), (self._by_category, row.get("category"))):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(row_id, None)
+                if not bucket:
+                    del index[key]
+
+    def upsert(self, row: Dict[str, Any]) -> None:
+        """Add or replace one learning row."""
+        if row.get("id") is None:
+            return
+        row_id = str(row["id"])
+        with self._lock:
+            old = self._rows.get(row_id)
+            if old is not None:
+                self._unindex(old)
+                row = {**old, **row}
+            row.pop("_changed_at", None)
+            self._rows[row_id] = row
+            self._by_task_type.setdefault(_task_type(row), {})[row_id] = row
+            self._by_category.setdefault(row.get("category"), {})[row_id] = row
+
+    def remove(self, learning_id: str) -> None:
+        with self._lock:
+            row = self._rows.pop(str(learning_id), None)
+            if row is not None:
+                self._unindex(row)
+
+    def mark_applied(self, learning_id: str, effectiveness_score: Optional[float] = None) -> None:
+        """Mirror an applied_count increment (and optional effectiveness update)."""
+        with self._lock:
+            row = self._rows.get(str(learning_id))
+            if row is None:
+                return
+            row["applied_count"] = int(row.get("applied_count") or 0) + 1
+            if effectiveness_score is not None:
+                row["effectiveness_score"] = effectiveness_score
+
+    def reconcile(self) -> int:
+        """
+        Load rows changed since the high-water mark; returns rows applied.
+
+        Pages on (changed_at, id) so rows sharing the boundary timestamp of a
+        full batch are read by the next page instead of skipped.
+        """
+        total = 0
+        while True:
+            hwm_clause = ""
+            if self._hwm:
+                changed_at, last_id = self._hwm
+                hwm_clause = (
+                    f"WHERE (COALESCE(updated_at, created_at), id::text) > "
+                    f"({escape_sql_value(changed_at)}::timestamptz, {escape_sql_value(last_id)})"
+                )
+            sql = f"""
+                SELECT {COLUMNS}
+                FROM learnings
+                {hwm_clause}
+                ORDER BY COALESCE(updated_at, created_at) ASC, id::text ASC
+                LIMIT {LOAD_BATCH_SIZE}
+            """
+            rows = self._query(sql).get("rows", []) or []
+            for row in rows:
+                changed_at = row.get("_changed_at")
+                self.upsert(row)
+                if changed_at:
+                    self._hwm = (str(changed_at), str(row.get("id")))
+            total += len(rows)
+            if len(rows) < LOAD_BATCH_SIZE:
+                break
+        self._loaded = True
+        self._last_reconcile = time.monotonic()
+        return total
+
+    def prune(self) -> int:
+        """
+        Drop cached learnings whose id is no longer in the table; returns rows removed.
+
+        Only ids cached before the id query ran are candidates, so a row
+        written concurrently is never dropped for missing from the result.
+        """
+        self._last_prune = time.monotonic()
+        with self._lock:
+            cached = set(self._rows)
+        rows = self._query("SELECT id::text AS id FROM learnings").get("rows", []) or []
+        live = {str(r.get("id")) for r in rows}
+        gone = cached - live
+        for learning_id in gone:
+            self.remove(learning_id)
+        if gone:
+            logger.info("Dropped %d deleted learnings from the cache", len(gone))
+        return len(gone)
+
+    def ensure_loaded(self, force: bool = False) -> bool:
+        """Bulk-load on first use, then reconcile at most every RECONCILE_INTERVAL_SECONDS.
+
+        Returns:
+            True when the cache can serve reads.
+        """
+        due = force or time.monotonic() - self._last_reconcile >= RECONCILE_INTERVAL_SECONDS
+        if not due:
+            return self._loaded
+        # Another thread is syncing: serve what we have if anything is loaded
+        if not self._sync_lock.acquire(blocking=not self._loaded):
+            return self._loaded
+        try:
+            was_loaded = self._loaded
+            self.reconcile()
+            if not was_loaded:
+                self._last_prune = time.monotonic()  # a bulk load holds no deleted rows
+            elif time.monotonic() - self._last_prune >= PRUNE_INTERVAL_SECONDS:
+                self.prune()
+        except Exception as e:
+            logger.warning("Learnings cache reconcile failed: %s", e)
+            # Stale data is fine for hints; a cache that never loaded is not
+            # usable, and callers use SQL until the next attempt
+            self._last_reconcile = time.monotonic()
+        finally:
+            self._sync_lock.release()
+        return self._loaded
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+            self._by_task_type.clear()
+            self._by_category.clear()
+            self._hwm = None
+            self._loaded = False
+            self._last_reconcile = float("-inf")
+            self._last_prune = float("-inf")
+
+    # ------------------------------------------------------------------ #
+    # Reads
+    # ------------------------------------------------------------------ #
+
+    def _snapshot(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(r) for r in rows]
+
+    def relevant_for_task(self, task_type: str, limit: int = 5, min_confidence: float = 0.6) -> List[Dict[str, Any]]:
+        """Same result as get_relevant_learnings_for_task's query: failures, then successes, by confidence."""
+        with self._lock:
+            candidates = [r for r in self._by_task_type.get(task_type, {}).values() if _confidence(r) >= min_confidence]
+        candidates.sort(key=lambda r: str(r.get("created_at") or ""), reverse=True)
+        candidates.sort(key=lambda r: (_CATEGORY_RANK.get(r.get("category"), 3), -_confidence(r)))
+        return self._snapshot(candidates[:limit])
+
+    def applicable(
+        self,
+        categories: Iterable[str],
+        confidence_threshold: float,
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """Same result as get_applicable_learnings' query."""
+        with self._lock:
+            candidates = [
+                r
+                for category in set(categories)
+                for r in self._by_category.get(category, {}).values()
+                if _is_true(r.get("is_validated")) or _confidence(r) >= confidence_threshold
+            ]
+        candidates.sort(key=lambda r: str(r.get("created_at") or ""), reverse=True)
+        candidates.sort(key=lambda r: (
+            not _is_true(r.get("is_validated")),
+            -_confidence(r),
+            int(r.get("applied_count") or 0),
+        ))
+        return self._snapshot(candidates[:limit])
+
+    def search(
+        self,
+        category: Optional[str] = None,
+        worker_id: Optional[str] = None,
+        search_text: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        validated_only: bool = False,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Same filters as database.search_learnings (newest first)."""
+        needle = search_text.lower() if search_text else None
+        with self._lock:
+            pool = self._by_category.get(category, {}).values() if category else self._rows.values()
+            matches = [
+                r for r in pool
+                if (worker_id is None or r.get("worker_id") == worker_id)
+                and (min_confidence is None or _confidence(r) >= min_confidence)
+                and (not validated_only or _is_true(r.get("is_validated")))
+                and (needle is None or needle in str(r.get("summary") or "").lower())
+            ]
+        matches.sort(key=lambda r: str(r.get("created_at") or ""), reverse=True)
+        return self._snapshot(matches[:limit])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "learnings": len(self._rows),
+                "task_types": len(self._by_task_type),
+                "categories": len(self._by_category),
+                "high_water_mark": self._hwm,
+                "loaded": self._loaded,
+            }
+
+
+_cache: Optional[LearningsCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_learnings_cache(query_fn: Optional[Callable[[str], Dict[str, Any]]] = None) -> LearningsCache:
+    """Process-wide LearningsCache singleton.
+
+    ``query_fn`` is only used when the singleton is first created.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LearningsCache(query_fn)
+    return _cache
+
+
+def notify_learning_written(row: Dict[str, Any]) -> None:
+    """Push a freshly written learning into the cache (no-op before first load)."""
+    if _cache is None or not _cache._loaded:
+        return
+    try:
+        _cache.upsert(row)
+    except Exception as e:
+        logger.debug("Failed to cache learning: %s", e)
+
+
+def notify_learning_applied(learning_id: str, effectiveness_score: Optional[float] = None) -> None:
+    """Mirror an applied_count increment into the cache."""
+    if _cache is None or not _cache._loaded:
+        return
+    _cache.mark_applied(learning_id, effectiveness_score)
+
+
+__all__ = [
+    "LearningsCache",
+    "get_learnings_cache",
+    "notify_learning_written",
+    "notify_learning_applied",
+]
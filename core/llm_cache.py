@@ -0,0 +1,439 @@
+"""
+LLM Response Cache
+
+Opt-in cache of chat-completions results for call sites whose prompt fully
+determines the answer we want (code review of an unchanged diff, the
+decomposition of an unchanged goal, a session title, a research synthesis).
+Callers opt in per call by passing a ``CachePolicy`` to
+``LLMTransport.complete``; nothing is cached by default.
+
+- Exact tier: sha256 of the normalised (provider, model, messages, tools,
+  temperature). Message text is whitespace-collapsed; max_tokens and other
+  sampling limits are not part of the key.
+- Similarity tier (optional, per policy): within the same scope - provider,
+  model, tools, temperature and system prompt - the non-system messages are
+  compared with the offline ``core.embeddings.LocalEmbedder``; the closest
+  entry at or above ``policy.similarity`` is served.
+- Entries live in a SQLite file (LLM_CACHE_PATH, on the Railway volume when
+  mounted) so they survive restarts and are shared by processes on the same
+  host. Each entry has a TTL; the file is bounded by LLM_CACHE_MAX_MB with
+  least-recently-used eviction.
+- Lookups, hits, cost saved (the original call's cost) and latency saved are
+  counted per caller in stats().
+
+Usage:
+    from core.llm_cache import CachePolicy
+
+    result = get_llm_transport().complete(payload, cache=CachePolicy("code_review"))
+    if result.cached:
+        ...
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .embeddings import LocalEmbedder, SparseVector, cosine
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = (os.getenv("LLM_CACHE_ENABLED", "1") or "").strip().lower() in ("1", "true", "yes", "y", "on")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH") or os.path.join(
+    os.getenv("RAILWAY_VOLUME_MOUNT_PATH") or tempfile.gettempdir(), "juggernaut_llm_cache.sqlite3"
+)
+
+# Default entry lifetime when a policy doesn't set one
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+# Upper bound on stored response bytes; least recently used entries go first
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "256"))
+
+# Stores between eviction passes
+EVICT_EVERY = 50
+
+# Most recent entries per scope kept in memory for the similarity tier
+SIMILARITY_MAX_CANDIDATES = int(os.getenv("LLM_CACHE_SIMILARITY_CANDIDATES", "2000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    caller TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    response TEXT NOT NULL,
+    cost_cents REAL NOT NULL DEFAULT 0,
+    latency_ms REAL NOT NULL DEFAULT 0,
+    size INTEGER NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_scope ON llm_cache(scope, used_at);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_used ON llm_cache(used_at);
+"""
+
+
+@dataclass
+class CachePolicy:
+    """
+    How one call site uses the response cache.
+
+    Attributes:
+        caller: name the hit-rate and cost-saved metrics are reported under
+        ttl_seconds: how long a stored response stays valid
+        similarity: serve the closest cached prompt in the same scope when its
+            cosine similarity is at least this (None: exact matches only)
+        accept: store a response only if this returns True for its content, so
+            an answer the caller can't parse isn't served again until the TTL
+    """
+
+    caller: str
+    ttl_seconds: float = LLM_CACHE_TTL_SECONDS
+    similarity: Optional[float] = None
+    accept: Optional[Callable[[str], bool]] = None
+
+    def accepts(self, content: str) -> bool:
+        if self.accept is None:
+            return True
+        try:
+            return bool(self.accept(content))
+        except Exception:
+            return False
+
+
+def _collapse(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return _collapse(content)
+    if isinstance(content, list):
+        return [
+            {**part, "text": _collapse(part["text"])}
+            if isinstance(part, dict) and isinstance(part.get("text"), str) else part
+            for part in content
+        ]
+    return content
+
+
+def _normalize_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    normalized = {"role": message.get("role", ""), "content": _normalize_content(message.get("content"))}
+    for field in ("name", "tool_call_id", "tool_calls"):
+        if message.get(field):
+            normalized[field] = message[field]
+    return normalized
+
+
+def _digest(value: Any) -> str:
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def fingerprint(provider: str, payload: Dict[str, Any]) -> Tuple[str, str, str]:
+    """
+    Cache identity of a chat-completions request.
+
+    Returns:
+        (key, scope, prompt): the exact-match key, the hash of everything but
+        the non-system messages, and those messages rendered as text for the
+        similarity tier
+    """
+    temperature = payload.get("temperature")
+    messages = [_normalize_message(m) for m in payload.get("messages") or []]
+    base = {
+        "provider": provider,
+        "model": payload.get("model", ""),
+        "tools": payload.get("tools") or [],
+        "temperature": None if temperature is None else round(float(temperature), 3),
+    }
+    key = _digest({**base, "messages": messages})
+    scope = _digest({**base, "system": [m for m in messages if m["role"] == "system"]})
+    prompt = "\n".join(
+        f"{m['role']}: {m['content'] if isinstance(m['content'], str) else json.dumps(m['content'], default=str)}"
+        for m in messages if m["role"] != "system"
+    )
+    return key, scope, prompt
+
+
+class LLMCache:
+    """Size-bounded, TTL'd SQLite store of LLM responses with an optional similarity tier."""
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024),
+        embedder: Optional[LocalEmbedder] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            path: SQLite file (":memory:" for a private, process-local cache)
+            max_bytes: bound on the summed size of stored prompts and responses
+            embedder: embedder for the similarity tier (default LocalEmbedder)
+            clock: wall clock; entries outlive the process, so not monotonic
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._embedder = embedder
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stores_since_evict = 0
+        # scope -> key -> (vector, expires_at), most recently stored last
+        self._vectors: Dict[str, "OrderedDict[str, Tuple[SparseVector, float]]"] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            conn, self._conn = self._conn, None
+            self._vectors.clear()
+        if conn is not None:
+            conn.close()
+
+    def _caller_stats(self, caller: str) -> Dict[str, float]:
+        return self._stats.setdefault(caller, {
+            "lookups": 0, "hits": 0, "similar_hits": 0, "misses": 0, "stores": 0, "errors": 0,
+            "cost_saved_cents": 0.0, "latency_saved_ms": 0.0,
+        })
+
+    def _embed(self, prompt: str) -> SparseVector:
+        if self._embedder is None:
+            self._embedder = LocalEmbedder()
+        return self._embedder.sparse(prompt)
+
+    # ------------------------------------------------------------------ #
+    # Lookup / store
+    # ------------------------------------------------------------------ #
+
+    def get(self, provider: str, payload: Dict[str, Any], policy: CachePolicy) -> Optional[Dict[str, Any]]:
+        """
+        Cached response for ``payload``, or None on a miss.
+
+        Returns:
+            {"response": <what put() stored>, "similarity": 1.0 for exact hits,
+            else the cosine score of the matched prompt}
+        """
+        key, scope, prompt = fingerprint(provider, payload)
+        now = self._clock()
+        with self._lock:
+            stats = self._caller_stats(policy.caller)
+            stats["lookups"] += 1
+            try:
+                conn = self._connect()
+                similarity, similar = 1.0, False
+                row = conn.execute(
+                    "SELECT key, response, cost_cents, latency_ms FROM llm_cache WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+                if row is None and policy.similarity is not None:
+                    key, similarity = self._nearest(conn, scope, prompt, policy.similarity, now)
+                    similar = key is not None
+                    if similar:
+                        row = conn.execute(
+                            "SELECT key, response, cost_cents, latency_ms FROM llm_cache "
+                            "WHERE key = ? AND expires_at > ?",
+                            (key, now),
+                        ).fetchone()
+                if row is None:
+                    stats["misses"] += 1
+                    return None
+                conn.execute("UPDATE llm_cache SET hits = hits + 1, used_at = ? WHERE key = ?", (now, row[0]))
+                conn.commit()
+                response = json.loads(row[1])
+            except (sqlite3.Error, OSError, ValueError) as e:
+                stats["errors"] += 1
+                logger.warning("LLM cache lookup failed for %s: %s", policy.caller, e)
+                return None
+
+            stats["hits"] += 1
+            stats["similar_hits"] += int(similar)
+            stats["cost_saved_cents"] += row[2]
+            stats["latency_saved_ms"] += row[3]
+        return {"response": response, "similarity": similarity}
+
+    def _nearest(self, conn: sqlite3.Connection, scope: str, prompt: str, threshold: float,
+                 now: float) -> Tuple[Optional[str], float]:
+        """Closest live entry in ``scope`` at or above ``threshold`` (lock held)."""
+        vectors = self._vectors.get(scope)
+        if vectors is None:
+            # First similarity lookup for this scope in this process: load it
+            vectors = self._vectors[scope] = OrderedDict()
+            rows = conn.execute(
+                "SELECT key, prompt, expires_at FROM llm_cache WHERE scope = ? AND expires_at > ? "
+                "ORDER BY used_at DESC LIMIT ?",
+                (scope, now, SIMILARITY_MAX_CANDIDATES),
+            ).fetchall()
+            for key, text, expires_at in reversed(rows):
+                vectors[key] = (self._embed(text), expires_at)
+
+        query = self._embed(prompt)
+        best_key, best_score = None, threshold
+        for key, (vector, expires_at) in list(vectors.items()):
+            if expires_at <= now:
+                del vectors[key]
+                continue
+            score = cosine(query, vector)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key, round(best_score, 4)
+
+    def put(
+        self,
+        provider: str,
+        payload: Dict[str, Any],
+        policy: CachePolicy,
+        response: Dict[str, Any],
+        cost_cents: float = 0.0,
+        latency_ms: float = 0.0,
+    ) -> bool:
+        """
+        Store ``response`` (any JSON-serialisable dict) for ``payload``.
+
+        ``cost_cents`` and ``latency_ms`` are what the original call cost;
+        every later hit counts them as saved.
+        """
+        key, scope, prompt = fingerprint(provider, payload)
+        now = self._clock()
+        expires_at = now + policy.ttl_seconds
+        encoded = json.dumps(response, default=str)
+        with self._lock:
+            stats = self._caller_stats(policy.caller)
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache "
+                    "(key, scope, caller, prompt, response, cost_cents, latency_ms, size, hits, "
+                    " created_at, expires_at, used_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?)",
+                    (key, scope, policy.caller, prompt, encoded, cost_cents, latency_ms,
+                     len(prompt) + len(encoded), now, expires_at, now),
+                )
+                conn.commit()
+                self._stores_since_evict += 1
+                if self._stores_since_evict >= EVICT_EVERY:
+                    self._evict(conn, now)
+            except (sqlite3.Error, OSError) as e:
+                stats["errors"] += 1
+                logger.warning("LLM cache store failed for %s: %s", policy.caller, e)
+                return False
+
+            stats["stores"] += 1
+            vectors = self._vectors.get(scope)
+            if vectors is not None:
+                vectors.pop(key, None)
+                vectors[key] = (self._embed(prompt), expires_at)
+                while len(vectors) > SIMILARITY_MAX_CANDIDATES:
+                    vectors.popitem(last=False)
+        return True
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        """Drop expired entries, then least recently used ones above max_bytes (lock held)."""
+        self._stores_since_evict = 0
+        removed = conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            stale: List[str] = []
+            for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY used_at"):
+                stale.append(key)
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany("DELETE FROM llm_cache WHERE key = ?", [(key,) for key in stale])
+            removed += len(stale)
+            for vectors in self._vectors.values():
+                for key in stale:
+                    vectors.pop(key, None)
+        conn.commit()
+        if removed:
+            logger.debug("LLM cache evicted %d entries", removed)
+        return removed
+
+    def evict(self) -> int:
+        """Run an eviction pass now; returns the number of entries removed."""
+        with self._lock:
+            try:
+                return self._evict(self._connect(), self._clock())
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("LLM cache eviction failed: %s", e)
+                return 0
+
+    def clear(self, caller: Optional[str] = None) -> None:
+        """Delete every entry (or one caller's) and reset the in-memory index."""
+        with self._lock:
+            conn = self._connect()
+            if caller is None:
+                conn.execute("DELETE FROM llm_cache")
+            else:
+                conn.execute("DELETE FROM llm_cache WHERE caller = ?", (caller,))
+            conn.commit()
+            self._vectors.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-caller hit rate, cost and latency saved, plus store size."""
+        with self._lock:
+            callers = {}
+            for caller, counters in self._stats.items():
+                callers[caller] = {
+                    **counters,
+                    "hit_rate": round(counters["hits"] / counters["lookups"], 4) if counters["lookups"] else 0.0,
+                    "cost_saved_cents": round(counters["cost_saved_cents"], 4),
+                    "latency_saved_ms": round(counters["latency_saved_ms"], 1),
+                }
+            try:
+                entries, size = self._connect().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+            except (sqlite3.Error, OSError):
+                entries, size = None, None
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "callers": callers,
+        }
+
+
+_llm_cache: Optional[LLMCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Get or create the process-wide LLM response cache."""
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMCache()
+                atexit.register(_llm_cache.close)
+    return _llm_cache
+
+
+__all__ = [
+    "CachePolicy",
+    "LLMCache",
+    "LLM_CACHE_ENABLED",
+    "fingerprint",
+    "get_llm_cache",
+]
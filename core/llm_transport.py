@@ -0,0 +1,799 @@
+"""
+LLM Transport
+
+One client for every chat-completions call the engine makes: OpenRouter (or
+whatever OpenAI-compatible gateway LLM_API_BASE points at) and Perplexity.
+BrainService, CodeGenerator, AIExecutor, GoalDecomposer and IdeaGenerator
+all go through it instead of opening their own urllib/requests connections.
+
+- A single pooled ``httpx.Client`` keeps TLS connections alive between calls.
+  HTTP/2 is used when the optional ``h2`` package is installed.
+- Each provider has one circuit breaker (the ``core.circuit_breaker`` registry
+  entry of the same name) and one token-bucket rate limit shared by every
+  caller in the process. LLM_DISABLED / LLM_EMERGENCY_STOP stop all calls.
+- Requests stream by default (``LLM_STREAM=0`` turns it off); time to first
+  token and total latency are sampled per provider.
+- Token usage comes from the provider's ``usage`` block (estimated when it is
+  missing). Cost is the provider-reported ``usage.cost`` when present,
+  otherwise TOKEN_COSTS. Both are totalled per provider and model.
+- Deterministic call sites can pass ``cache=CachePolicy(...)`` to serve
+  repeated prompts from ``core.llm_cache`` without calling the provider.
+
+Usage:
+    from core.llm_transport import get_llm_transport
+
+    result = get_llm_transport().complete({"model": model, "messages": messages})
+    print(result.content, result.tool_calls, result.usage.cost_cents, result.ttft_ms)
+
+    stream = get_llm_transport().stream(payload)
+    for text in stream:
+        ...
+    tool_calls = stream.result.tool_calls
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from .circuit_breaker import CircuitBreaker, get_circuit_breaker, register_circuit_breaker
+from .llm_cache import LLM_CACHE_ENABLED, CachePolicy, LLMCache, get_llm_cache
+from .notification_queue import TokenBucket
+from .retry import APIConnectionError, RateLimitError
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_OPENROUTER_DEFAULT = "https://openrouter.ai/api/v1/chat/completions"
+LLM_API_BASE = (os.getenv("LLM_API_BASE") or os.getenv("OPENROUTER_ENDPOINT") or _OPENROUTER_DEFAULT).strip().rstrip("/")
+LLM_CHAT_ENDPOINT = f"{LLM_API_BASE}/chat/completions" if not LLM_API_BASE.endswith("/chat/completions") else LLM_API_BASE
+PERPLEXITY_CHAT_ENDPOINT = "https://api.perplexity.ai/chat/completions"
+
+# Stream responses unless a caller asks otherwise
+LLM_STREAM_DEFAULT = (os.getenv("LLM_STREAM", "1") or "").strip().lower() in ("1", "true", "yes", "y", "on")
+
+# Connection pool shared by all providers
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20"))
+LLM_POOL_KEEPALIVE_SECONDS = float(os.getenv("LLM_POOL_KEEPALIVE_SECONDS", "120"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "10"))
+
+# How long a call waits for a rate-limit token before it is refused
+LLM_RATE_LIMIT_WAIT_SECONDS = float(os.getenv("LLM_RATE_LIMIT_WAIT_SECONDS", "10"))
+
+# Latency samples kept per provider for the p50/p95 in stats()
+LLM_LATENCY_SAMPLES = 500
+
+# Approximate token costs per 1M tokens in USD (OpenRouter pricing)
+TOKEN_COSTS = {
+    "openrouter/auto": {"input": 5.0, "output": 15.0},
+    "openai/gpt-4o": {"input": 2.5, "output": 10.0},
+    "openai/gpt-4o-mini": {"input": 0.15, "output": 0.6},
+    "deepseek/deepseek-chat": {"input": 0.30, "output": 1.20},
+    "google/gemini-2.0-flash-exp:free": {"input": 0.0, "output": 0.0},
+    "kimi/k2": {"input": 0.0, "output": 0.0},
+    "qwen/qwen3.5-flash-02-23": {"input": 0.10, "output": 0.40},
+}
+
+
+def _truthy_env(name: str, default: str = "0") -> bool:
+    return (os.getenv(name, default) or "").strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+def calculate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """
+    Calculate cost in cents for API usage.
+
+    Args:
+        model: Model identifier.
+        input_tokens: Number of input tokens.
+        output_tokens: Number of output tokens.
+
+    Returns:
+        Cost in cents.
+    """
+    costs = TOKEN_COSTS.get(model, {"input": 3.0, "output": 15.0})
+    input_cost = (input_tokens / 1_000_000) * costs["input"]
+    output_cost = (output_tokens / 1_000_000) * costs["output"]
+    return round((input_cost + output_cost) * 100, 4)
+
+
+def _default_rate_per_minute() -> int:
+    safe_mode = _truthy_env("LLM_SAFE_MODE", "0")
+    try:
+        return int(os.getenv("LLM_MAX_REQUESTS_PER_MINUTE", "10" if safe_mode else "60"))
+    except (TypeError, ValueError):
+        return 60
+
+
+def _percentiles(samples: Deque[float]) -> Optional[Dict[str, float]]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        "p50": round(ordered[int(last * 0.5)], 1),
+        "p95": round(ordered[int(last * 0.95)], 1),
+        "samples": len(ordered),
+    }
+
+
+class LLMTransportError(Exception):
+    """An LLM request failed; ``status`` is the HTTP status when there was one."""
+
+    def __init__(self, message: str, status: Optional[int] = None, body: str = ""):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+
+class LLMResponseError(LLMTransportError):
+    """The provider answered with an error status or an unusable body."""
+
+
+class LLMRateLimitError(LLMTransportError, RateLimitError):
+    """HTTP 429 from the provider, or the local per-provider limit refused the call."""
+
+
+class LLMConnectionError(LLMTransportError, APIConnectionError):
+    """The provider could not be reached or the request timed out."""
+
+
+class LLMDisabledError(LLMTransportError):
+    """LLM calls are switched off via LLM_DISABLED / LLM_EMERGENCY_STOP."""
+
+
+@dataclass
+class LLMUsage:
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_cents: float = 0.0
+    estimated: bool = False
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+        }
+
+
+@dataclass
+class LLMResult:
+    """A finished completion, the same shape whether it was streamed or not."""
+
+    provider: str
+    model: str
+    content: str
+    tool_calls: List[Dict[str, Any]]
+    finish_reason: str
+    usage: LLMUsage
+    raw: Dict[str, Any]
+    streamed: bool
+    latency_ms: float
+    ttft_ms: Optional[float] = None
+    first_token_at: Optional[datetime] = None
+    cached: bool = False
+
+    @property
+    def message(self) -> Dict[str, Any]:
+        """The assistant message, ready to append to a conversation."""
+        message: Dict[str, Any] = {"role": "assistant", "content": self.content}
+        if self.tool_calls:
+            message["tool_calls"] = self.tool_calls
+        return message
+
+
+class Provider:
+    """An OpenAI-compatible chat-completions endpoint with its own limits."""
+
+    def __init__(
+        self,
+        name: str,
+        endpoint: str,
+        api_key: str,
+        rate_per_minute: float,
+        burst: Optional[int],
+        timeout: float,
+        stream_usage: bool,
+        now: float,
+    ):
+        self.name = name
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.rate_per_minute = rate_per_minute
+        self.timeout = timeout
+        self.stream_usage = stream_usage
+        # rate_per_minute <= 0 means unlimited; burst defaults to a minute's worth
+        self.bucket = (
+            TokenBucket(rate_per_minute, burst or int(rate_per_minute), now)
+            if rate_per_minute > 0 else None
+        )
+
+
+class _StreamAssembler:
+    """Rebuilds a chat completion from SSE ``chat.completion.chunk`` events."""
+
+    def __init__(self):
+        self.id = ""
+        self.model = ""
+        self.parts: List[str] = []
+        self.tool_calls: Dict[int, Dict[str, Any]] = {}
+        self.finish_reason = ""
+        self.usage: Dict[str, Any] = {}
+        self.extra: Dict[str, Any] = {}
+        self.saw_choices = False
+
+    def feed(self, chunk: Dict[str, Any]) -> Tuple[str, bool]:
+        """Apply one chunk; returns (content delta, whether it carried output)."""
+        if chunk.get("error"):
+            error = chunk["error"]
+            message = error.get("message") if isinstance(error, dict) else str(error)
+            raise LLMResponseError(f"Stream error: {message}", body=json.dumps(error, default=str))
+
+        self.id = chunk.get("id") or self.id
+        self.model = chunk.get("model") or self.model
+        if chunk.get("usage"):
+            self.usage = chunk["usage"]
+        for key, value in chunk.items():
+            if key not in ("id", "object", "created", "model", "choices", "usage"):
+                self.extra[key] = value
+
+        choices = chunk.get("choices") or []
+        if not choices:
+            return "", False
+        self.saw_choices = True
+        choice = choices[0] or {}
+        if choice.get("finish_reason"):
+            self.finish_reason = choice["finish_reason"]
+        delta = choice.get("delta") or {}
+
+        # Tool calls arrive in fragments, assembled by index
+        for tc in delta.get("tool_calls") or []:
+            idx = tc.get("index", 0)
+            call = self.tool_calls.setdefault(idx, {
+                "id": tc.get("id", ""),
+                "type": "function",
+                "function": {"name": "", "arguments": ""},
+            })
+            if tc.get("id"):
+                call["id"] = tc["id"]
+            func = tc.get("function") or {}
+            if func.get("name"):
+                call["function"]["name"] = func["name"]
+            if func.get("arguments"):
+                call["function"]["arguments"] += func["arguments"]
+
+        content = delta.get("content") or ""
+        if content:
+            self.parts.append(content)
+        return content, bool(content or delta.get("tool_calls"))
+
+    def response(self, requested_model: str) -> Dict[str, Any]:
+        """The equivalent non-streamed response body."""
+        message: Dict[str, Any] = {"role": "assistant", "content": "".join(self.parts)}
+        if self.tool_calls:
+            message["tool_calls"] = [self.tool_calls[idx] for idx in sorted(self.tool_calls)]
+        raw = {
+            **self.extra,
+            "id": self.id,
+            "object": "chat.completion",
+            "model": self.model or requested_model,
+            "choices": [{"index": 0, "message": message, "finish_reason": self.finish_reason or None}],
+        }
+        if self.usage:
+            raw["usage"] = self.usage
+        return raw
+
+
+class LLMStream:
+    """
+    Iterate to receive content deltas as they arrive; ``result`` is set once
+    the stream is exhausted. Closing early releases the connection.
+    """
+
+    def __init__(self, transport: "LLMTransport", provider: Provider, payload: Dict[str, Any],
+                 response: httpx.Response, started: float):
+        self._transport = transport
+        self._provider = provider
+        self._payload = payload
+        self._response = response
+        self._started = started
+        self._iterated = False
+        self.result: Optional[LLMResult] = None
+
+    def __iter__(self) -> Iterator[str]:
+        if self._iterated:
+            raise RuntimeError("LLMStream can only be iterated once")
+        self._iterated = True
+        transport = self._transport
+        assembler = _StreamAssembler()
+        first_token: Optional[float] = None
+        first_token_at: Optional[datetime] = None
+        try:
+            for line in self._response.iter_lines():
+                # SSE comments (": OPENROUTER PROCESSING") and blank keep-alives
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    # Keep reading to the end of the body so the connection returns to the pool
+                    continue
+                try:
+                    chunk = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+                text, produced = assembler.feed(chunk)
+                if produced and first_token is None:
+                    first_token = transport._clock()
+                    first_token_at = datetime.now(timezone.utc)
+                if text:
+                    yield text
+        except httpx.TransportError as e:
+            transport._record_error(self._provider)
+            raise LLMConnectionError(f"{self._provider.name} stream interrupted: {e}") from e
+        except LLMTransportError:
+            transport._record_error(self._provider)
+            raise
+        finally:
+            self._response.close()
+
+        if not assembler.saw_choices:
+            transport._record_error(self._provider)
+            raise LLMResponseError("No choices in API response")
+
+        raw = assembler.response(self._payload.get("model", ""))
+        ttft_ms = (first_token - self._started) * 1000 if first_token is not None else None
+        self.result = transport._finish(self._provider, self._payload, raw, True, self._started,
+                                        ttft_ms, first_token_at)
+
+    def close(self) -> None:
+        self._response.close()
+
+
+class LLMTransport:
+    """Pooled, rate-limited, circuit-protected chat-completions client."""
+
+    def __init__(
+        self,
+        client: Optional[httpx.Client] = None,
+        rate_limit_wait: float = LLM_RATE_LIMIT_WAIT_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        cache: Optional[LLMCache] = None,
+    ):
+        """
+        Args:
+            client: HTTP client to use (defaults to a pooled client built on first use)
+            rate_limit_wait: seconds a call may wait for its provider's rate limit
+            cache: response cache for calls that pass a CachePolicy (default get_llm_cache())
+        """
+        self._client = client
+        self._cache = cache
+        self.rate_limit_wait = rate_limit_wait
+        self._clock = clock
+        self._sleep = sleep
+
+        self._lock = threading.Lock()
+        self._providers: Dict[str, Provider] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._by_model: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._ttft: Dict[str, Deque[float]] = {}
+        self._latency: Dict[str, Deque[float]] = {}
+
+    # ------------------------------------------------------------------ #
+    # Configuration
+    # ------------------------------------------------------------------ #
+
+    def register_provider(
+        self,
+        name: str,
+        endpoint: str,
+        api_key: str = "",
+        rate_per_minute: float = 60,
+        burst: Optional[int] = None,
+        timeout: float = 60.0,
+        stream_usage: bool = True,
+        replace: bool = False,
+    ) -> Provider:
+        """
+        Register a chat-completions endpoint (a no-op if ``name`` exists, unless ``replace``).
+
+        ``stream_usage`` asks for a final usage chunk on streamed requests
+        (``stream_options.include_usage``); turn it off for providers that
+        reject the option. The circuit breaker is the registry entry ``name``.
+        """
+        with self._lock:
+            provider = self._providers.get(name)
+            if provider is None or replace:
+                provider = Provider(name, endpoint, api_key, rate_per_minute, burst, timeout,
+                                    stream_usage, self._clock())
+                self._providers[name] = provider
+                self._stats.setdefault(name, {key: 0 for key in (
+                    "requests", "streamed", "errors", "rate_limited", "cache_hits",
+                    "prompt_tokens", "completion_tokens",
+                )} | {"cost_cents": 0.0})
+                self._ttft.setdefault(name, deque(maxlen=LLM_LATENCY_SAMPLES))
+                self._latency.setdefault(name, deque(maxlen=LLM_LATENCY_SAMPLES))
+            return provider
+
+    def _provider(self, name: str) -> Provider:
+        provider = self._providers.get(name)
+        if provider is None:
+            raise LLMTransportError(f"Unknown LLM provider: {name}")
+        return provider
+
+    def _get_client(self) -> httpx.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        http2=HTTP2_AVAILABLE,
+                        limits=httpx.Limits(
+                            max_connections=LLM_POOL_MAX_CONNECTIONS,
+                            max_keepalive_connections=LLM_POOL_MAX_CONNECTIONS,
+                            keepalive_expiry=LLM_POOL_KEEPALIVE_SECONDS,
+                        ),
+                    )
+        return self._client
+
+    def close(self) -> None:
+        """Close pooled connections; the next call opens a new pool."""
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+    # ------------------------------------------------------------------ #
+    # Calls
+    # ------------------------------------------------------------------ #
+
+    def complete(
+        self,
+        payload: Dict[str, Any],
+        provider: str = "openrouter",
+        api_key: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        stream: Optional[bool] = None,
+        circuit: bool = True,
+        cache: Optional[CachePolicy] = None,
+    ) -> LLMResult:
+        """
+        Send one chat-completions request and return the finished result.
+
+        Args:
+            payload: request body (model, messages, tools, ...); ``stream`` is set here
+            provider: registered provider name
+            api_key: overrides the provider's key
+            headers: extra headers (HTTP-Referer, X-Title, ...)
+            timeout: read timeout in seconds (default: the provider's)
+            stream: stream the response (default LLM_STREAM)
+            circuit: run under the provider's circuit breaker; pass False when
+                the caller already holds the same breaker
+            cache: serve repeated prompts from the response cache (deterministic
+                call sites only); hits come back with ``cached=True`` and zero usage
+
+        Raises:
+            LLMTransportError (or a subclass), or CircuitOpenError
+        """
+        prov = self._provider(provider)
+        response_cache = self._response_cache() if cache is not None else None
+        if response_cache is not None:
+            self._check_enabled()
+            hit = self._cached(prov, payload, cache, response_cache)
+            if hit is not None:
+                return hit
+        self._admit(prov)
+        stream = LLM_STREAM_DEFAULT if stream is None else stream
+
+        def call() -> LLMResult:
+            if not stream:
+                return self._post(prov, payload, api_key, headers, timeout)
+            llm_stream = self._open_stream(prov, payload, api_key, headers, timeout)
+            for _ in llm_stream:
+                pass
+            return llm_stream.result
+
+        breaker = self._breaker(prov) if circuit else None
+        result = breaker.call_sync(call) if breaker is not None else call()
+        if response_cache is not None and (result.content or result.tool_calls) and cache.accepts(result.content):
+            response_cache.put(prov.name, payload, cache, {
+                "model": result.model,
+                "content": result.content,
+                "tool_calls": result.tool_calls,
+                "finish_reason": result.finish_reason,
+                "raw": result.raw,
+            }, cost_cents=result.usage.cost_cents, latency_ms=result.latency_ms)
+        return result
+
+    def stream(
+        self,
+        payload: Dict[str, Any],
+        provider: str = "openrouter",
+        api_key: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        circuit: bool = True,
+    ) -> LLMStream:
+        """
+        Start a streamed request and return it once the response headers are in.
+
+        The circuit breaker covers opening the stream; failures while reading
+        it raise from the iterator and are counted in stats().
+        """
+        prov = self._provider(provider)
+        self._admit(prov)
+        breaker = self._breaker(prov) if circuit else None
+        if breaker is None:
+            return self._open_stream(prov, payload, api_key, headers, timeout)
+        return breaker.call_sync(self._open_stream, prov, payload, api_key, headers, timeout)
+
+    def _breaker(self, prov: Provider) -> Optional[CircuitBreaker]:
+        return get_circuit_breaker(prov.name) or register_circuit_breaker(prov.name)
+
+    def _response_cache(self) -> Optional[LLMCache]:
+        if self._cache is None and LLM_CACHE_ENABLED:
+            self._cache = get_llm_cache()
+        return self._cache
+
+    def _cached(self, prov: Provider, payload: Dict[str, Any], policy: CachePolicy,
+                response_cache: LLMCache) -> Optional[LLMResult]:
+        started = self._clock()
+        hit = response_cache.get(prov.name, payload, policy)
+        if hit is None:
+            return None
+        response = hit["response"]
+        with self._lock:
+            self._stats[prov.name]["cache_hits"] += 1
+        logger.debug("%s cache hit for %s (similarity %.3f)", prov.name, policy.caller, hit["similarity"])
+        return LLMResult(
+            provider=prov.name,
+            model=response.get("model") or payload.get("model", ""),
+            content=response.get("content") or "",
+            tool_calls=response.get("tool_calls") or [],
+            finish_reason=response.get("finish_reason") or "",
+            usage=LLMUsage(),
+            raw=response.get("raw") or {},
+            streamed=False,
+            latency_ms=(self._clock() - started) * 1000,
+            cached=True,
+        )
+
+    def _check_enabled(self) -> None:
+        if _truthy_env("LLM_DISABLED", "0") or _truthy_env("LLM_EMERGENCY_STOP", "0"):
+            raise LLMDisabledError("LLM execution disabled via LLM_DISABLED/LLM_EMERGENCY_STOP")
+
+    def _admit(self, prov: Provider) -> None:
+        """Apply the kill switch and wait (bounded) for the provider's rate limit."""
+        self._check_enabled()
+        if prov.bucket is None:
+            return
+
+        deadline = self._clock() + self.rate_limit_wait
+        while True:
+            with self._lock:
+                now = self._clock()
+                if prov.bucket.take(now):
+                    return
+                wait = prov.bucket.wait(now)
+                if now + wait > deadline:
+                    self._stats[prov.name]["rate_limited"] += 1
+                    raise LLMRateLimitError(
+                        f"{prov.name} rate limit exceeded ({prov.rate_per_minute:g}/min) — refusing to call provider"
+                    )
+            self._sleep(wait)
+
+    def _request(self, prov: Provider, payload: Dict[str, Any], api_key: Optional[str],
+                 headers: Optional[Dict[str, str]], timeout: Optional[float]) -> httpx.Request:
+        request_headers = {"Content-Type": "application/json"}
+        key = api_key if api_key is not None else prov.api_key
+        if key:
+            request_headers["Authorization"] = f"Bearer {key}"
+        request_headers.update(headers or {})
+        read_timeout = timeout if timeout is not None else prov.timeout
+        return self._get_client().build_request(
+            "POST", prov.endpoint, json=payload, headers=request_headers,
+            timeout=httpx.Timeout(read_timeout, connect=min(LLM_CONNECT_TIMEOUT_SECONDS, read_timeout)),
+        )
+
+    def _send(self, prov: Provider, request: httpx.Request, stream: bool) -> httpx.Response:
+        try:
+            response = self._get_client().send(request, stream=stream)
+        except httpx.TransportError as e:
+            self._record_error(prov)
+            logger.error("%s connection error: %s", prov.name, e)
+            raise LLMConnectionError(f"{prov.name} connection error: {e}") from e
+
+        if response.status_code >= 400:
+            body = response.read().decode("utf-8", errors="replace")
+            response.close()
+            self._record_error(prov)
+            logger.error("%s API error: HTTP %s - %s", prov.name, response.status_code, body[:500])
+            if response.status_code == 429:
+                raise LLMRateLimitError(f"Rate limited: {body}", status=429, body=body)
+            raise LLMResponseError(f"{prov.name} HTTP {response.status_code}: {body}",
+                                   status=response.status_code, body=body)
+        return response
+
+    def _post(self, prov: Provider, payload: Dict[str, Any], api_key: Optional[str],
+              headers: Optional[Dict[str, str]], timeout: Optional[float]) -> LLMResult:
+        started = self._clock()
+        body = {key: value for key, value in payload.items() if key not in ("stream", "stream_options")}
+        response = self._send(prov, self._request(prov, body, api_key, headers, timeout), stream=False)
+        try:
+            raw = response.json()
+        except ValueError as e:
+            self._record_error(prov)
+            raise LLMResponseError(f"Invalid API response: {e}", status=response.status_code) from e
+        if not raw.get("choices"):
+            self._record_error(prov)
+            raise LLMResponseError("No choices in API response", status=response.status_code,
+                                   body=json.dumps(raw, default=str)[:2000])
+        return self._finish(prov, payload, raw, False, started, None, None)
+
+    def _open_stream(self, prov: Provider, payload: Dict[str, Any], api_key: Optional[str],
+                     headers: Optional[Dict[str, str]], timeout: Optional[float]) -> LLMStream:
+        started = self._clock()
+        body = dict(payload, stream=True)
+        if prov.stream_usage:
+            body["stream_options"] = {"include_usage": True}
+        response = self._send(prov, self._request(prov, body, api_key, headers, timeout), stream=True)
+        return LLMStream(self, prov, payload, response, started)
+
+    # ------------------------------------------------------------------ #
+    # Accounting
+    # ------------------------------------------------------------------ #
+
+    def _usage(self, payload: Dict[str, Any], raw: Dict[str, Any], message: Dict[str, Any]) -> LLMUsage:
+        model = raw.get("model") or payload.get("model", "")
+        price_model = model if model in TOKEN_COSTS else payload.get("model", "")
+        usage = raw.get("usage") or {}
+        if usage:
+            prompt = int(usage.get("prompt_tokens") or 0)
+            completion = int(usage.get("completion_tokens") or 0)
+            estimated = False
+        else:
+            # Same len // 4 estimate BrainService uses when the provider reports nothing
+            prompt = len(json.dumps(payload.get("messages") or [], default=str)) // 4
+            completion = (len(message.get("content") or "")
+                          + len(json.dumps(message.get("tool_calls") or [], default=str))) // 4
+            estimated = True
+        if usage.get("cost") is not None:
+            cost_cents = round(float(usage["cost"]) * 100, 4)
+        else:
+            cost_cents = calculate_cost(price_model, prompt, completion)
+        return LLMUsage(prompt, completion, cost_cents, estimated)
+
+    def _finish(self, prov: Provider, payload: Dict[str, Any], raw: Dict[str, Any], streamed: bool,
+                started: float, ttft_ms: Optional[float], first_token_at: Optional[datetime]) -> LLMResult:
+        choice = (raw.get("choices") or [{}])[0] or {}
+        message = choice.get("message") or {}
+        usage = self._usage(payload, raw, message)
+        model = raw.get("model") or payload.get("model", "")
+        latency_ms = (self._clock() - started) * 1000
+
+        with self._lock:
+            stats = self._stats[prov.name]
+            stats["requests"] += 1
+            stats["streamed"] += int(streamed)
+            stats["prompt_tokens"] += usage.prompt_tokens
+            stats["completion_tokens"] += usage.completion_tokens
+            stats["cost_cents"] += usage.cost_cents
+            per_model = self._by_model.setdefault((prov.name, model), {
+                "requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_cents": 0.0,
+            })
+            per_model["requests"] += 1
+            per_model["prompt_tokens"] += usage.prompt_tokens
+            per_model["completion_tokens"] += usage.completion_tokens
+            per_model["cost_cents"] += usage.cost_cents
+            self._latency[prov.name].append(latency_ms)
+            if ttft_ms is not None:
+                self._ttft[prov.name].append(ttft_ms)
+
+        logger.debug("%s %s: %d+%d tokens, %.4f cents, ttft=%s ms, total=%.0f ms", prov.name, model,
+                     usage.prompt_tokens, usage.completion_tokens, usage.cost_cents,
+                     f"{ttft_ms:.0f}" if ttft_ms is not None else "-", latency_ms)
+        return LLMResult(
+            provider=prov.name,
+            model=model,
+            content=message.get("content") or "",
+            tool_calls=message.get("tool_calls") or [],
+            finish_reason=choice.get("finish_reason") or "",
+            usage=usage,
+            raw=raw,
+            streamed=streamed,
+            latency_ms=latency_ms,
+            ttft_ms=ttft_ms,
+            first_token_at=first_token_at,
+        )
+
+    def _record_error(self, prov: Provider) -> None:
+        with self._lock:
+            self._stats[prov.name]["errors"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-provider request, token and cost totals with latency percentiles."""
+        with self._lock:
+            providers = {}
+            for name, counters in self._stats.items():
+                providers[name] = {
+                    **counters,
+                    "cost_cents": round(counters["cost_cents"], 4),
+                    "ttft_ms": _percentiles(self._ttft[name]),
+                    "latency_ms": _percentiles(self._latency[name]),
+                    "models": {
+                        model: {**totals, "cost_cents": round(totals["cost_cents"], 4)}
+                        for (provider, model), totals in self._by_model.items() if provider == name
+                    },
+                }
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "providers": providers,
+            "cache": self._cache.stats() if self._cache is not None else None,
+        }
+
+
+_llm_transport: Optional[LLMTransport] = None
+_llm_transport_lock = threading.Lock()
+
+
+def get_llm_transport() -> LLMTransport:
+    """Get or create the process-wide LLM transport with the default providers."""
+    global _llm_transport
+    if _llm_transport is None:
+        with _llm_transport_lock:
+            if _llm_transport is None:
+                transport = LLMTransport()
+                transport.register_provider(
+                    "openrouter",
+                    LLM_CHAT_ENDPOINT,
+                    api_key=(os.getenv("LLM_API_KEY") or os.getenv("OPENROUTER_API_KEY") or "").strip(),
+                    rate_per_minute=_default_rate_per_minute(),
+                )
+                transport.register_provider(
+                    "perplexity",
+                    PERPLEXITY_CHAT_ENDPOINT,
+                    api_key=(os.getenv("PERPLEXITY_API_KEY") or "").strip(),
+                    rate_per_minute=int(os.getenv("PERPLEXITY_MAX_REQUESTS_PER_MINUTE", "50")),
+                    timeout=30.0,
+                    stream_usage=False,
+                )
+                atexit.register(transport.close)
+                _llm_transport = transport
+    return _llm_transport
+
+
+__all__ = [
+    "CachePolicy",
+    "LLMConnectionError",
+    "LLMDisabledError",
+    "LLMRateLimitError",
+    "LLMResponseError",
+    "LLMResult",
+    "LLMStream",
+    "LLMTransport",
+    "LLMTransportError",
+    "LLMUsage",
+    "TOKEN_COSTS",
+    "calculate_cost",
+    "get_llm_transport",
+    "HTTP2_AVAILABLE",
+    "LLM_CHAT_ENDPOINT",
+]
@@ -14,6 +14,7 @@ from datetime import datetime, timezone, timedelta
 from core.railway_client import get_railway_client
 from core.error_fingerprinter import get_fingerprinter
 from core.database import fetch_all, execute_sql
+from core.alert_windows import get_alert_windows
 
 logger = logging.getLogger(__name__)
 
@@ -132,7 +133,7 @@ class LogCrawler:
         try:
             # Check if fingerprint exists
             check_query = """
-                SELECT id, occurrence_count
+                SELECT id, occurrence_count, first_seen, task_created, status
                 FROM error_fingerprints
                 WHERE fingerprint = %s
             """
@@ -157,6 +158,14 @@ class LogCrawler:
                     datetime.now(timezone.utc).isoformat(),
                     fingerprint
                 ))
+                # Keep the alert windows' view of task_created/status current for
+                # fingerprints that recur (possibly ones not seen since startup)
+                get_alert_windows().track_fingerprint(
+                    fingerprint_id,
+                    first_seen=existing[0].get('first_seen'),
+                    task_created=existing[0].get('task_created'),
+                    status=existing[0].get('status') or 'active',
+                )
                 
                 return fingerprint_id
             else:
@@ -188,13 +197,17 @@ class LogCrawler:
                 )
                 
                 result = fetch_all(insert_query, params)
-                return str(result[0]['id']) if result else None
+                if not result:
+                    return None
+                fingerprint_id = str(result[0]['id'])
+                get_alert_windows().track_fingerprint(fingerprint_id, first_seen=params[3])
+                return fingerprint_id
         except Exception as e:
             logger.exception(f"Error managing fingerprint: {e}")
             return None
     
-    def record_occurrence(self, fingerprint_id: str, log_id: str, occurred_at: str):
-        """Record an error occurrence."""
+    def record_occurrence(self, fingerprint_id: str, log_id: str, occurred_at: str, level: Optional[str] = None):
+        """Record an error occurrence (and feed it to the alert windows)."""
         try:
             query = """
                 INSERT INTO error_occurrences (
@@ -204,6 +217,7 @@ class LogCrawler:
                 ) VALUES (%s, %s, %s)
             """
             execute_sql(query, (fingerprint_id, log_id, occurred_at))
+            get_alert_windows().record(fingerprint_id, occurred_at, level)
         except Exception as e:
             logger.exception(f"Error recording occurrence: {e}")
     
@@ -259,7 +273,8 @@ class LogCrawler:
         self.record_occurrence(
             fingerprint_id,
             log_id,
-            fingerprinted.get('timestamp', datetime.now(timezone.utc).isoformat())
+            fingerprinted.get('timestamp', datetime.now(timezone.utc).isoformat()),
+            level
         )
         
         return True
@@ -31,6 +31,7 @@ Usage:
     )
 """
 
+import asyncio
 import json
 import logging
 import uuid
@@ -38,6 +39,9 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Union
 
 from .database import query_db
+from .embeddings import EMBEDDING_DIM, LocalEmbedder
+from .memory_consolidation import ConsolidationScheduler, MemoryConsolidator
+from .memory_index import notify_memory_deleted, notify_memory_written
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +49,10 @@ class MemoryError(Exception):
     """Exception raised for errors in the memory module."""
     pass
 
+async def _query(sql: str, params: Optional[List] = None) -> Dict[str, Any]:
+    """Run query_db (synchronous) on a worker thread so the event loop keeps running."""
+    return await asyncio.to_thread(query_db, sql, params)
+
 class MemoryService:
     """Service for managing agent memories with pgvector."""
     
@@ -56,6 +64,20 @@ class MemoryService:
             embedding_client: Client for generating embeddings
         """
         self.embedding_client = embedding_client
+        self._consolidator = MemoryConsolidator()
+        self._scheduler: Optional[ConsolidationScheduler] = None
+        self._pending_duplicates: Dict[str, List[str]] = {}
+    
+    def schedule_consolidation(self, worker_id: str) -> None:
+        """
+        Queue a background consolidation run for a worker (non-blocking).
+        
+        Args:
+            worker_id: Worker whose episodic memories should be consolidated
+        """
+        if self._scheduler is None:
+            self._scheduler = ConsolidationScheduler(self.consolidate_memories)
+        self._scheduler.request(worker_id)
     
     async def store_memory(
         self,
@@ -108,7 +130,7 @@ class MemoryService:
             related_memories_param = self._parse_uuid_list(related_memories)
             
             # Insert memory
-            result = await query_db(
+            result = await _query(
                 """
                 INSERT INTO agent_memories (
                     worker_id, content, summary, embedding, memory_type,
@@ -132,6 +154,13 @@ class MemoryService:
             
             memory_id = str(result["rows"][0]["id"])
             logger.info(f"Memory stored: {memory_id} for worker {worker_id}")
+            notify_memory_written("agent_memories", {
+                "id": memory_id, "worker_id": worker_id, "content": content,
+                "summary": summary, "memory_type": memory_type,
+                "importance_score": importance, "tags": tags, "expires_at": expires_at,
+            })
+            if memory_type == "episodic":
+                self.schedule_consolidation(worker_id)
             
             return memory_id
         except Exception as e:
@@ -171,7 +200,7 @@ class MemoryService:
             
             if memory_types:
                 # Use the search_memories function with memory types filter
-                result = await query_db(
+                result = await _query(
                     """
                     SELECT * FROM search_memories($1, $2, $3, $4, $5)
                     """,
@@ -179,7 +208,7 @@ class MemoryService:
                 )
             else:
                 # Use the search_memories function without memory types filter
-                result = await query_db(
+                result = await _query(
                     """
                     SELECT * FROM search_memories($1, $2, NULL, $3, $4)
                     """,
@@ -217,7 +246,7 @@ class MemoryService:
         try:
             memory_id_param = self._parse_uuid(memory_id)
             
-            result = await query_db(
+            result = await _query(
                 """
                 SELECT * FROM agent_memories WHERE id = $1
                 """,
@@ -315,7 +344,7 @@ class MemoryService:
             
             # Execute update
             if update_fields:
-                result = await query_db(
+                result = await _query(
                     f"""
                     UPDATE agent_memories
                     SET {", ".join(update_fields)}
@@ -351,7 +380,7 @@ class MemoryService:
         try:
             memory_id_param = self._parse_uuid(memory_id)
             
-            result = await query_db(
+            result = await _query(
                 """
                 DELETE FROM agent_memories
                 WHERE id = $1
@@ -363,6 +392,7 @@ class MemoryService:
             if not result or "rows" not in result or not result["rows"]:
                 return False
             
+            notify_memory_deleted("agent_memories", memory_id)
             return True
         except Exception as e:
             logger.error(f"Failed to delete memory {memory_id}: {e}")
@@ -385,6 +415,12 @@ class MemoryService:
             # Find clusters of similar episodic memories
             clusters = await self._cluster_similar_memories(worker_id)
             
+            # Drop near-identical memories so recall has less to scan
+            duplicate_ids = self._pending_duplicates.pop(worker_id, [])
+            if duplicate_ids:
+                removed = await asyncio.to_thread(self._consolidator.delete_duplicates, duplicate_ids)
+                logger.info(f"Removed {removed} duplicate memories for worker {worker_id}")
+            
             consolidated_ids = []
             for cluster in clusters:
                 if len(cluster) >= 3:  # Need multiple memories to consolidate
@@ -484,7 +520,7 @@ class MemoryService:
         try:
             entity_id_param = self._parse_uuid(entity_id)
             
-            result = await query_db(
+            result = await _query(
                 """
                 SELECT * FROM knowledge_entities WHERE id = $1
                 """,
@@ -497,7 +533,7 @@ class MemoryService:
             entity = result["rows"][0]
             
             # Get claims for this entity
-            claims_result = await query_db(
+            claims_result = await _query(
                 """
                 SELECT * FROM knowledge_claims WHERE entity_id = $1
                 """,
@@ -507,7 +543,7 @@ class MemoryService:
             entity["claims"] = claims_result.get("rows", []) if claims_result else []
             
             # Get relations for this entity
-            relations_result = await query_db(
+            relations_result = await _query(
                 """
                 SELECT kr.*, ke.name as related_entity_name, ke.entity_type as related_entity_type
                 FROM knowledge_relations kr
@@ -552,7 +588,7 @@ class MemoryService:
             
             if entity_types:
                 # Use the search_knowledge function with entity types filter
-                result = await query_db(
+                result = await _query(
                     """
                     SELECT * FROM search_knowledge($1, $2, $3, $4)
                     """,
@@ -560,7 +596,7 @@ class MemoryService:
                 )
             else:
                 # Use the search_knowledge function without entity types filter
-                result = await query_db(
+                result = await _query(
                     """
                     SELECT * FROM search_knowledge($1, NULL, $2, $3)
                     """,
@@ -588,7 +624,7 @@ class MemoryService:
         try:
             memory_ids_param = [self._parse_uuid(mid) for mid in memory_ids]
             
-            await query_db(
+            await _query(
                 """
                 UPDATE agent_memories
                 SET access_count = access_count + 1,
@@ -618,48 +654,23 @@ class MemoryService:
         """
         Cluster similar episodic memories.
         
+        Streams every episodic memory stored since the previous run through the
+        worker's similarity clusterer (see core.memory_consolidation) and returns
+        clusters that became large enough to consolidate. Near-duplicates found
+        along the way are queued for deletion by consolidate_memories.
+        
         Args:
             worker_id: Worker ID to cluster memories for
             
         Returns:
             List of memory clusters
         """
-        # This is a simplified implementation
-        # In a real implementation, this would use a clustering algorithm
         try:
-            # Get recent episodic memories
-            result = await query_db(
-                """
-                SELECT * FROM agent_memories
-                WHERE worker_id = $1 AND memory_type = 'episodic'
-                ORDER BY created_at DESC
-                LIMIT 100
-                """,
-                [worker_id]
-            )
-            
-            if not result or "rows" not in result or not result["rows"]:
-                return []
-            
-            # For simplicity, just group by tags
-            memories = result["rows"]
-            clusters = {}
-            
-            for memory in memories:
-                tags = memory.get("tags") or []
-                if not tags:
-                    continue
-                
-                # Use the first tag as the cluster key
-                key = tags[0] if tags else "uncategorized"
-                
-                if key not in clusters:
-                    clusters[key] = []
-                
-                clusters[key].append(memory)
-            
-            # Convert to list of clusters
-            return list(clusters.values())
+            _, duplicates = await asyncio.to_thread(self._consolidator.update, worker_id)
+            if duplicates:
+                self._pending_duplicates.setdefault(worker_id, []).extend(d for d, _ in duplicates)
+            clusters = self._consolidator.take_new_clusters(worker_id, min_size=3)
+            return [cluster.rows() for cluster in clusters]
         except Exception as e:
             logger.warning(f"Failed to cluster memories: {e}")
             return []
@@ -719,7 +730,7 @@ class MemoryService:
             name = knowledge["content"].split(":")[1].strip()[:50] if ":" in knowledge["content"] else knowledge["content"][:50]
             
             # Insert knowledge entity
-            result = await query_db(
+            result = await _query(
                 """
                 INSERT INTO knowledge_entities (
                     entity_type, name, description, embedding,
@@ -738,7 +749,7 @@ class MemoryService:
             entity_id = str(result["rows"][0]["id"])
             
             # Add a claim
-            await query_db(
+            await _query(
                 """
                 INSERT INTO knowledge_claims (
                     entity_id, claim_type, claim_text,
@@ -795,8 +806,16 @@ class MemoryService:
         return result if result else None
 
 class EmbeddingClient:
-    """Client for generating embeddings."""
-    
+    """Client for generating embeddings.
+
+    Uses the offline hashed n-gram embedder from core.embeddings, so no
+    network call or API key is needed and identical text always maps to the
+    same vector.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self._embedder = LocalEmbedder(dim=dim)
+
     async def embed(self, text: str) -> List[float]:
         """
         Generate an embedding for text.
@@ -807,8 +826,17 @@ class EmbeddingClient:
         Returns:
             Embedding vector
         """
-        # This is a placeholder implementation
-        # In a real implementation, this would call an embedding API
-        # For now, return a random vector of the correct dimension
-        import random
-        return [random.random() for _ in range(1536)]
+        return self._embedder.embed(text)
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for many texts at once.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List of embedding vectors, in input order
+        """
+        batch = self._embedder.embed_batch(texts)
+        return batch.tolist() if hasattr(batch, "tolist") else batch
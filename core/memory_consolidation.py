@@ -0,0 +1,388 @@
+"""
+Memory Consolidation - Streaming similarity clustering and near-duplicate removal
+
+MemoryService.consolidate_memories turns clusters of similar episodic memories
+into semantic memories. This module does the clustering:
+
+- Every episodic memory of a worker is streamed in pages (keyset pagination),
+  embedded with core.embeddings.LocalEmbedder and assigned to the most similar
+  cluster centroid, or starts a new cluster.
+- Centroid lookup goes through an inverted index over (pruned) centroid
+  features, so each memory only touches clusters that share features with it.
+- Per-worker clustering state is kept between runs together with a
+  high-water mark, so later runs only process memories stored since.
+- A cluster is handed out for consolidation whenever it has gained at least
+  ``min_size`` members that are not yet consolidated, so a growing cluster is
+  consolidated again. Members already listed in the ``related_memories`` of a
+  semantic memory are skipped, which keeps a restart (empty in-process state)
+  from consolidating the whole history a second time.
+- Memories whose text is identical (up to case and whitespace) to a recent
+  member of their cluster are reported as duplicates and deleted in one
+  statement. Texts that differ in even one token are kept.
+
+Memory footprint is bounded: each cluster keeps a pruned centroid, at most
+MAX_EXEMPLARS rows, MAX_PENDING_MEMBERS unconsolidated member ids and
+MAX_DEDUP_DIGESTS recent text digests, and the number of clusters is capped
+(the oldest singletons are evicted first).
+
+ConsolidationScheduler runs consolidation on a background thread so
+store_memory only enqueues a request and never waits on clustering.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from .database import escape_sql_value
+from .embeddings import LocalEmbedder, SparseVector
+
+logger = logging.getLogger(__name__)
+
+# Cosine similarity needed to join an existing cluster
+CLUSTER_THRESHOLD = 0.45
+
+# Caps that bound per-worker memory use
+MAX_CLUSTERS = 500
+MAX_CENTROID_FEATURES = 128
+MAX_EXEMPLARS = 3
+MAX_PENDING_MEMBERS = 200
+MAX_DEDUP_DIGESTS = 32
+
+# Rows fetched per page while streaming a worker's memories
+PAGE_SIZE = 500
+
+# Minimum seconds between background consolidations of the same worker
+MIN_CONSOLIDATION_INTERVAL_SECONDS = 300.0
+
+
+@dataclass
+class MemoryCluster:
+    """Running state of one cluster (bounded size)."""
+
+    cluster_id: int
+    sum_vector: Dict[int, float] = field(default_factory=dict)
+    count: int = 0
+    # Members not yet consolidated (the oldest drop off past the cap)
+    member_ids: Deque[str] = field(default_factory=lambda: deque(maxlen=MAX_PENDING_MEMBERS))
+    exemplars: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=MAX_EXEMPLARS))
+    importance_sum: float = 0.0
+    confidence_sum: float = 0.0
+    tags: Counter = field(default_factory=Counter)
+    recent: Deque[Tuple[str, str]] = field(default_factory=lambda: deque(maxlen=MAX_DEDUP_DIGESTS))
+    centroid: SparseVector = field(default_factory=dict)
+
+    def discard(self, member_ids: Set[str]) -> None:
+        """Forget pending members that are already consolidated."""
+        self.member_ids = deque((m for m in self.member_ids if m not in member_ids), maxlen=MAX_PENDING_MEMBERS)
+        self.exemplars = deque((r for r in self.exemplars if r["id"] not in member_ids), maxlen=MAX_EXEMPLARS)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Pending members in the row-list shape MemoryService._extract_knowledge expects."""
+        rows = [dict(r) for r in self.exemplars]
+        known = {r.get("id") for r in rows}
+        rows.extend({"id": mid} for mid in self.member_ids if mid not in known)
+        # Averages over the whole cluster, not just the exemplars
+        avg_importance = self.importance_sum / self.count if self.count else 0.5
+        avg_confidence = self.confidence_sum / self.count if self.count else 1.0
+        for row in rows:
+            row.setdefault("content", "")
+            row["importance_score"] = avg_importance
+            row["confidence_score"] = avg_confidence
+            row.setdefault("tags", [t for t, _ in self.tags.most_common(5)])
+        return rows
+
+
+class StreamingClusterer:
+    """Online (leader-style) clustering of sparse embeddings."""
+
+    def __init__(
+        self,
+        threshold: float = CLUSTER_THRESHOLD,
+        max_clusters: int = MAX_CLUSTERS,
+        embedder: Optional[LocalEmbedder] = None,
+    ):
+        self.threshold = threshold
+        self.max_clusters = max_clusters
+        self.embedder = embedder or LocalEmbedder()
+        self.clusters: Dict[int, MemoryCluster] = {}
+        self._postings: Dict[int, Dict[int, float]] = {}
+        self._next_id = 0
+        self.seen = 0
+
+    def _best_cluster(self, vec: SparseVector) -> Tuple[Optional[int], float]:
+        scores: Dict[int, float] = {}
+        for bucket, weight in vec.items():
+            for cid, cweight in self._postings.get(bucket, {}).items():
+                scores[cid] = scores.get(cid, 0.0) + weight * cweight
+        if not scores:
+            return None, 0.0
+        cid = max(scores, key=scores.__getitem__)
+        return cid, scores[cid]
+
+    def _reindex(self, cluster: MemoryCluster) -> None:
+        for bucket in cluster.centroid:
+            postings = self._postings.get(bucket)
+            if postings is not None:
+                postings.pop(cluster.cluster_id, None)
+                if not postings:
+                    del self._postings[bucket]
+        top = sorted(cluster.sum_vector.items(), key=lambda kv: abs(kv[1]), reverse=True)[:MAX_CENTROID_FEATURES]
+        cluster.sum_vector = dict(top)
+        norm = sum(w * w for _, w in top) ** 0.5 or 1.0
+        cluster.centroid = {b: w / norm for b, w in top}
+        for bucket, weight in cluster.centroid.items():
+            self._postings.setdefault(bucket, {})[cluster.cluster_id] = weight
+
+    def _evict(self) -> None:
+        """Drop the oldest singleton (or smallest) cluster to respect max_clusters."""
+        victim = min(self.clusters.values(), key=lambda c: (c.count, c.cluster_id))
+        victim.centroid, centroid = {}, victim.centroid
+        for bucket in centroid:
+            postings = self._postings.get(bucket)
+            if postings is not None:
+                postings.pop(victim.cluster_id, None)
+                if not postings:
+                    del self._postings[bucket]
+        del self.clusters[victim.cluster_id]
+
+    @staticmethod
+    def _digest(text: str) -> str:
+        return hashlib.sha1(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+    def add(self, row: Dict[str, Any]) -> Optional[str]:
+        """Add one memory row; returns the id it duplicates, if any."""
+        row_id = str(row.get("id"))
+        content = str(row.get("content") or "")
+        vec = self.embedder.sparse(content)
+        self.seen += 1
+        if not vec:
+            return None
+
+        digest = self._digest(content)
+        cid, score = self._best_cluster(vec)
+        if cid is not None and score >= self.threshold:
+            cluster = self.clusters[cid]
+            for other_id, other_digest in cluster.recent:
+                if other_digest == digest:
+                    return other_id
+        else:
+            if len(self.clusters) >= self.max_clusters:
+                self._evict()
+            cluster = MemoryCluster(cluster_id=self._next_id)
+            self._next_id += 1
+            self.clusters[cluster.cluster_id] = cluster
+
+        cluster.count += 1
+        cluster.member_ids.append(row_id)
+        cluster.recent.append((row_id, digest))
+        cluster.importance_sum += float(row.get("importance_score") or 0.5)
+        cluster.confidence_sum += float(row.get("confidence_score") or 1.0)
+        cluster.tags.update(row.get("tags") or [])
+        cluster.exemplars.append({
+            "id": row_id,
+            "content": row.get("content"),
+            "tags": list(row.get("tags") or []),
+        })
+        for bucket, weight in vec.items():
+            cluster.sum_vector[bucket] = cluster.sum_vector.get(bucket, 0.0) + weight
+        self._reindex(cluster)
+        return None
+
+    def groups(self, min_size: int = 1) -> List[MemoryCluster]:
+        return [c for c in self.clusters.values() if c.count >= min_size]
+
+
+@dataclass
+class _WorkerState:
+    clusterer: StreamingClusterer
+    hwm: Optional[Tuple[str, str]] = None  # (created_at, id) of the last processed row
+
+
+class MemoryConsolidator:
+    """Streams a worker's episodic memories through a StreamingClusterer."""
+
+    def __init__(self, query_fn: Optional[Callable[[str], Dict[str, Any]]] = None, page_size: int = PAGE_SIZE):
+        if query_fn is None:
+            from .database import query_db as query_fn
+        self._query = query_fn
+        self.page_size = page_size
+        self._states: Dict[str, _WorkerState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, worker_id: str) -> _WorkerState:
+        with self._lock:
+            if worker_id not in self._states:
+                self._states[worker_id] = _WorkerState(clusterer=StreamingClusterer())
+            return self._states[worker_id]
+
+    def update(self, worker_id: str) -> Tuple[StreamingClusterer, List[Tuple[str, str]]]:
+        """Feed memories stored since the last run into the worker's clusterer.
+
+        Returns:
+            (clusterer, duplicates) where duplicates is a list of
+            (duplicate_id, kept_id) pairs found in this run.
+        """
+        state = self._state(worker_id)
+        duplicates: List[Tuple[str, str]] = []
+        while True:
+            after = ""
+            if state.hwm:
+                created, last_id = state.hwm
+                after = (
+                    f"AND (created_at, id::text) > ({escape_sql_value(created)}::timestamptz, "
+                    f"{escape_sql_value(last_id)})"
+                )
+            sql = f"""
+                SELECT id, content, importance_score, confidence_score, tags, created_at
+                FROM agent_memories
+                WHERE worker_id = {escape_sql_value(worker_id)}
+                  AND memory_type = 'episodic'
+                  {after}
+                ORDER BY created_at ASC, id::text ASC
+                LIMIT {self.page_size}
+            """
+            rows = self._query(sql).get("rows", []) or []
+            for row in rows:
+                dup_of = state.clusterer.add(row)
+                if dup_of is not None:
+                    duplicates.append((str(row.get("id")), dup_of))
+            if rows:
+                state.hwm = (str(rows[-1].get("created_at")), str(rows[-1].get("id")))
+            if len(rows) < self.page_size:
+                break
+        return state.clusterer, duplicates
+
+    def take_new_clusters(self, worker_id: str, min_size: int = 3) -> List[MemoryCluster]:
+        """Clusters with at least ``min_size`` members that are not consolidated yet.
+
+        Members already referenced by one of the worker's semantic memories
+        (consolidated before a restart) are dropped first. Returned clusters
+        have their pending members handed over, so they are only returned
+        again once they have grown by another ``min_size`` members.
+        """
+        state = self._state(worker_id)
+        candidates = [c for c in state.clusterer.clusters.values() if len(c.member_ids) >= min_size]
+        if not candidates:
+            return []
+        done = self._consolidated_ids(worker_id, [m for c in candidates for m in c.member_ids])
+        fresh = []
+        for cluster in candidates:
+            if done:
+                cluster.discard(done)
+            if len(cluster.member_ids) < min_size:
+                continue
+            taken = MemoryCluster(
+                cluster_id=cluster.cluster_id,
+                count=cluster.count,
+                member_ids=cluster.member_ids,
+                exemplars=cluster.exemplars,
+                importance_sum=cluster.importance_sum,
+                confidence_sum=cluster.confidence_sum,
+                tags=Counter(cluster.tags),
+            )
+            cluster.member_ids = deque(maxlen=MAX_PENDING_MEMBERS)
+            cluster.exemplars = deque(maxlen=MAX_EXEMPLARS)
+            fresh.append(taken)
+        return fresh
+
+    def _consolidated_ids(self, worker_id: str, member_ids: List[str]) -> Set[str]:
+        """Which of ``member_ids`` already appear in a semantic memory's related_memories."""
+        if not member_ids:
+            return set()
+        id_list = ", ".join(escape_sql_value(i) for i in member_ids)
+        result = self._query(f"""
+            SELECT DISTINCT related.id::text AS id
+            FROM agent_memories, unnest(related_memories) AS related(id)
+            WHERE worker_id = {escape_sql_value(worker_id)}
+              AND memory_type = 'semantic'
+              AND related.id::text IN ({id_list})
+        """)
+        return {str(r.get("id")) for r in result.get("rows", []) or []}
+
+    def delete_duplicates(self, duplicate_ids: List[str]) -> int:
+        """Delete near-duplicate memories with one statement."""
+        if not duplicate_ids:
+            return 0
+        id_list = ", ".join(escape_sql_value(i) for i in duplicate_ids)
+        result = self._query(f"DELETE FROM agent_memories WHERE id::text IN ({id_list})")
+        try:
+            from .memory_index import get_memory_index
+            index = get_memory_index()
+            for dup_id in duplicate_ids:
+                index.remove_row("agent_memories", dup_id)
+        except Exception as e:
+            logger.debug("Failed to drop duplicates from memory index: %s", e)
+        return int(result.get("rowCount", 0) or 0)
+
+
+class ConsolidationScheduler:
+    """Background thread that consolidates workers' memories off the write path.
+
+    request() is cheap and non-blocking; the thread coalesces repeated requests
+    for the same worker and rate-limits each worker to one run per interval.
+    """
+
+    def __init__(
+        self,
+        run_fn: Callable[[str], Any],
+        min_interval_seconds: float = MIN_CONSOLIDATION_INTERVAL_SECONDS,
+    ):
+        self._run_fn = run_fn
+        self.min_interval = min_interval_seconds
+        self._pending: Dict[str, float] = {}
+        self._last_run: Dict[str, float] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def request(self, worker_id: str) -> None:
+        with self._cond:
+            if worker_id not in self._pending:
+                now = time.monotonic()
+                last = self._last_run.get(worker_id)
+                self._pending[worker_id] = now if last is None else max(last + self.min_interval, now)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._loop, name="memory-consolidation", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    now = time.monotonic()
+                    due = [w for w, t in self._pending.items() if t <= now]
+                    if due:
+                        break
+                    wait = min(self._pending.values()) - now if self._pending else None
+                    self._cond.wait(timeout=wait)
+                if self._stopped:
+                    return
+                worker_id = due[0]
+                del self._pending[worker_id]
+                self._last_run[worker_id] = time.monotonic()
+            try:
+                result = self._run_fn(worker_id)
+                if asyncio.iscoroutine(result):
+                    asyncio.run(result)
+            except Exception as e:
+                logger.warning("Background consolidation failed for %s: %s", worker_id, e)
+
+
+__all__ = [
+    "MemoryCluster",
+    "StreamingClusterer",
+    "MemoryConsolidator",
+    "ConsolidationScheduler",
+]
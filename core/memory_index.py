@@ -0,0 +1,275 @@
+"""
+Memory Recall Index - In-process semantic index over memories, agent_memories and learnings
+
+Keeps a core.embeddings.VectorIndex in sync with the three tables the system
+recalls from:
+
+- memories        (BrainService recall)
+- agent_memories  (MemoryService episodic/semantic memory)
+- learnings       (task learnings)
+
+Rows are loaded in batches on first use, then refreshed incrementally by a
+per-table high-water mark on (COALESCE(updated_at, created_at), id), so edited
+rows are re-indexed too. recall() never syncs inline: it starts a background
+refresh when one is due and searches what is already loaded. Writers can also
+push rows in directly (notify_memory_written) so a just-stored memory is
+recallable immediately, and deleters drop them (notify_memory_deleted).
+
+Usage:
+    from core.memory_index import get_memory_index
+
+    index = get_memory_index()
+    hits = index.recall("checkout problems", k=10, sources=["memories"])
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .database import escape_sql_value
+from .embeddings import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+# Rows loaded per round-trip while syncing
+SYNC_BATCH_SIZE = 2000
+
+# Minimum seconds between incremental refreshes triggered by recall()
+REFRESH_INTERVAL_SECONDS = 60.0
+
+# Per-source query definitions. ``text`` is what gets embedded; the remaining
+# columns are kept as metadata and returned with recall hits.
+SOURCES: Dict[str, Dict[str, Any]] = {
+    "memories": {
+        "select": "id, key, content, memory_type, importance, created_at, expires_at",
+        "text": lambda r: " ".join(str(r.get(c) or "") for c in ("key", "content")),
+        "where": "(expires_at IS NULL OR expires_at > NOW())",
+    },
+    "agent_memories": {
+        "select": "id, worker_id, content, summary, memory_type, importance_score, tags, created_at, expires_at",
+        "text": lambda r: str(r.get("content") or ""),
+        "where": "(expires_at IS NULL OR expires_at > NOW())",
+    },
+    "learnings": {
+        "select": "id, worker_id, category, summary, confidence, details->>'task_type' AS task_type, created_at",
+        "text": lambda r: str(r.get("summary") or ""),
+        "where": "TRUE",
+    },
+}
+
+
+def _is_expired(meta: Dict[str, Any]) -> bool:
+    expires_at = meta.get("expires_at")
+    if not expires_at:
+        return False
+    try:
+        expires = datetime.fromisoformat(str(expires_at).replace("Z", "+00:00"))
+    except ValueError:
+        return False
+    if expires.tzinfo is None:
+        expires = expires.replace(tzinfo=timezone.utc)
+    return expires <= datetime.now(timezone.utc)
+
+
+class MemoryRecallIndex:
+    """VectorIndex kept in sync with the memory tables by high-water mark."""
+
+    def __init__(
+        self,
+        query_fn: Optional[Callable[[str], Dict[str, Any]]] = None,
+        sources: Optional[Iterable[str]] = None,
+        approximate: bool = False,
+    ):
+        if query_fn is None:
+            from .database import query_db as query_fn
+        self._query = query_fn
+        self.sources = list(sources or SOURCES.keys())
+        self.index = VectorIndex(approximate=approximate)
+        # source -> (changed_at, id) of the last row loaded
+        self._hwm: Dict[str, Optional[Tuple[str, str]]] = {s: None for s in self.sources}
+        self._loaded: Dict[str, bool] = {s: False for s in self.sources}
+        self._last_refresh = 0.0
+        self._sync_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def doc_id(source: str, row_id: Any) -> str:
+        return f"{source}:{row_id}"
+
+    def index_row(self, source: str, row: Dict[str, Any]) -> None:
+        """Add/replace one row (called by writers right after INSERT)."""
+        spec = SOURCES.get(source)
+        if spec is None or row.get("id") is None:
+            return
+        meta = {k: v for k, v in row.items() if k != "id"}
+        meta["source"] = source
+        meta["row_id"] = str(row["id"])
+        self.index.add(self.doc_id(source, row["id"]), spec["text"](row), meta)
+
+    def remove_row(self, source: str, row_id: Any) -> None:
+        self.index.remove(self.doc_id(source, row_id))
+
+    def sync(self, source: str) -> int:
+        """
+        Load rows past the high-water mark for one source.
+
+        Pages on (COALESCE(updated_at, created_at), id): updated rows come
+        back past the mark and replace their old entry, and rows sharing the
+        boundary timestamp of a full batch are picked up by the next page
+        instead of skipped.
+        """
+        spec = SOURCES[source]
+        total = 0
+        while True:
+            hwm = self._hwm.get(source)
+            hwm_clause = ""
+            if hwm:
+                changed_at, last_id = hwm
+                hwm_clause = (
+                    f"AND (COALESCE(updated_at, created_at), id::text) > "
+                    f"({escape_sql_value(changed_at)}::timestamptz, {escape_sql_value(last_id)})"
+                )
+            sql = f"""
+                SELECT {spec['select']}, COALESCE(updated_at, created_at) AS _changed_at
+                FROM {source}
+                WHERE {spec['where']} {hwm_clause}
+                ORDER BY COALESCE(updated_at, created_at) ASC, id::text ASC
+                LIMIT {SYNC_BATCH_SIZE}
+            """
+            rows = self._query(sql).get("rows", []) or []
+            items = []
+            for row in rows:
+                if row.get("id") is None:
+                    continue
+                meta = {k: v for k, v in row.items() if k not in ("id", "_changed_at")}
+                meta["source"] = source
+                meta["row_id"] = str(row["id"])
+                items.append((self.doc_id(source, row["id"]), spec["text"](row), meta))
+            total += self.index.add_batch(items)
+            if rows and rows[-1].get("_changed_at") is not None:
+                self._hwm[source] = (str(rows[-1]["_changed_at"]), str(rows[-1].get("id")))
+            if len(rows) < SYNC_BATCH_SIZE:
+                break
+        self._loaded[source] = True
+        return total
+
+    def refresh(self, force: bool = False) -> int:
+        """Incrementally sync all sources (rate-limited unless ``force``)."""
+        now = time.monotonic()
+        if not force and all(self._loaded.values()) and now - self._last_refresh < REFRESH_INTERVAL_SECONDS:
+            return 0
+        if not self._sync_lock.acquire(blocking=False):
+            return 0  # another thread is syncing; serve from what we have
+        try:
+            added = 0
+            for source in self.sources:
+                try:
+                    added += self.sync(source)
+                except Exception as e:
+                    logger.warning("Memory index sync failed for %s: %s", source, e)
+            self._last_refresh = time.monotonic()
+            return added
+        finally:
+            self._sync_lock.release()
+
+    def _refresh_due(self) -> bool:
+        if not all(self._loaded.values()):
+            return True
+        return time.monotonic() - self._last_refresh >= REFRESH_INTERVAL_SECONDS
+
+    def request_refresh(self) -> bool:
+        """
+        Start a background refresh if one is due and none is running.
+
+        Returns:
+            True if a refresh thread was started
+        """
+        if not self._refresh_due():
+            return False
+        with self._refresh_lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return False
+            self._refresh_thread = threading.Thread(
+                target=self.refresh, kwargs={"force": True}, name="memory-index-refresh", daemon=True
+            )
+            self._refresh_thread.start()
+        return True
+
+    def is_ready(self, sources: Optional[Iterable[str]] = None) -> bool:
+        return all(self._loaded.get(s, False) for s in (sources or self.sources))
+
+    def recall(
+        self,
+        query: str,
+        k: int = 10,
+        sources: Optional[Iterable[str]] = None,
+        min_score: float = 0.05,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Top-k rows across the requested sources, best first.
+
+        Searches what is already loaded; a due sync runs in the background, so
+        callers should check is_ready() before trusting an empty result.
+        """
+        self.request_refresh()
+        wanted = set(sources or self.sources)
+
+        def _predicate(meta: Dict[str, Any]) -> bool:
+            if meta.get("source") not in wanted or _is_expired(meta):
+                return False
+            return where(meta) if where is not None else True
+
+        hits = self.index.search(query, k=k, min_score=min_score, where=_predicate)
+        for hit in hits:
+            hit["id"] = hit.pop("row_id", hit["id"])
+        return hits
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.index.stats(), "high_water_marks": dict(self._hwm), "loaded": dict(self._loaded)}
+
+
+_index: Optional[MemoryRecallIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_memory_index() -> MemoryRecallIndex:
+    """Process-wide MemoryRecallIndex singleton."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = MemoryRecallIndex()
+    return _index
+
+
+def notify_memory_written(source: str, row: Dict[str, Any]) -> None:
+    """Push a freshly written row into the live index (no-op before first load)."""
+    if _index is None or not _index._loaded.get(source):
+        return
+    try:
+        _index.index_row(source, row)
+    except Exception as e:
+        logger.debug("Failed to index %s row: %s", source, e)
+
+
+def notify_memory_deleted(source: str, row_id: Any) -> None:
+    """Drop a deleted row from the live index so it is no longer recalled."""
+    if _index is None:
+        return
+    try:
+        _index.remove_row(source, row_id)
+    except Exception as e:
+        logger.debug("Failed to drop %s row from index: %s", source, e)
+
+
+__all__ = [
+    "SOURCES",
+    "MemoryRecallIndex",
+    "get_memory_index",
+    "notify_memory_deleted",
+    "notify_memory_written",
+]
@@ -0,0 +1,647 @@
+"""
+Notification Queue
+
+Asynchronous outbound delivery for Slack and email notifications. Callers
+enqueue and return immediately; a background dispatcher thread delivers, so
+an alert raised inside the autonomy loop never waits on a webhook.
+
+- Channels ("slack", "warroom", "email", ...) are registered with a send
+  function and a token-bucket rate limit (``rate_per_minute`` / ``burst``).
+  Each channel has at most one delivery in flight, so ordering is kept and a
+  slow SMTP server does not hold up Slack.
+- Identical notifications (same channel and dedup key) are coalesced. While
+  one is waiting, repeats only bump its count. For ``coalesce_seconds`` after
+  it was delivered, repeats are counted and sent as a single follow-up when
+  the window closes, so an alert storm costs one message per window.
+- Failed deliveries are written to notification_outbox (migration 020) and
+  retried with exponential backoff by any process that has the channel
+  registered. Items still queued at shutdown are persisted the same way. If
+  the database is unreachable, retries are kept in memory.
+- Low-priority notifications on a channel with a digest renderer are held
+  and sent as one digest per recipient every ``digest_seconds``.
+
+Usage:
+    from core.notification_queue import get_notification_queue
+
+    queue = get_notification_queue()
+    queue.register_channel("slack", deliver, rate_per_minute=60, burst=10)
+    queue.enqueue("slack", {"text": "Worker down"}, priority="critical", key="worker-down:w1")
+"""
+
+import atexit
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"critical": 0, "high": 1, "normal": 2, "low": 3}
+
+# Seconds after a delivery during which identical notifications are folded
+NOTIFY_COALESCE_SECONDS = float(os.getenv("NOTIFY_COALESCE_SECONDS", "300"))
+
+# Seconds low-priority notifications are held before their digest is sent
+NOTIFY_DIGEST_SECONDS = float(os.getenv("NOTIFY_DIGEST_SECONDS", "900"))
+
+# Delivery attempts before a notification is marked dead
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "6"))
+
+# Pending notifications kept in memory; beyond this only critical ones are accepted
+NOTIFY_QUEUE_MAX = int(os.getenv("NOTIFY_QUEUE_MAX", "5000"))
+
+NOTIFY_RETRY_BASE_SECONDS = 30
+NOTIFY_OUTBOX_POLL_SECONDS = 30
+NOTIFY_CLAIM_TIMEOUT_MINUTES = 10
+NOTIFY_IDLE_WAIT_SECONDS = 5.0
+DIGEST_MAX_LINES = 25
+
+
+def _quote(value: Any) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def payload_key(payload: Dict[str, Any]) -> str:
+    """Dedup key for a payload with no explicit key: a hash of its content."""
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+
+def annotate_repeats(payload: Dict[str, Any], count: int) -> Dict[str, Any]:
+    """Note on a Slack payload's text how many notifications it stands for."""
+    payload = dict(payload)
+    payload["text"] = f"{payload.get('text') or ''} (x{count})".strip()
+    return payload
+
+
+def _summary_line(payload: Dict[str, Any]) -> str:
+    text = payload.get("text") or payload.get("subject")
+    if not text:
+        for attachment in payload.get("attachments") or []:
+            text = attachment.get("title") or attachment.get("fallback")
+            if text:
+                break
+    return str(text or "(no text)").splitlines()[0][:200]
+
+
+def render_slack_digest(payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One Slack message listing a batch of held low-priority payloads."""
+    lines = [f"• {_summary_line(p)}" for p in payloads[:DIGEST_MAX_LINES]]
+    if len(payloads) > DIGEST_MAX_LINES:
+        lines.append(f"…and {len(payloads) - DIGEST_MAX_LINES} more")
+    digest = {"text": f"*Digest: {len(payloads)} notifications*\n" + "\n".join(lines)}
+    if payloads[0].get("channel"):
+        digest["channel"] = payloads[0]["channel"]
+    return digest
+
+
+class TokenBucket:
+    """Token-bucket rate limit: ``burst`` sends at once, refilled at ``rate_per_minute``."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate_per_minute: float, burst: int, now: float):
+        self.rate = rate_per_minute / 60.0
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def take(self, now: float) -> bool:
+        self._refill(now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def wait(self, now: float) -> float:
+        """Seconds until a token is available."""
+        self._refill(now)
+        if self.tokens >= 1.0 or self.rate <= 0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class Channel:
+    """A delivery target: send function, rate limit and optional digest renderer."""
+
+    def __init__(
+        self,
+        name: str,
+        send: Callable[[Dict[str, Any]], bool],
+        rate_per_minute: float,
+        burst: int,
+        render_digest: Optional[Callable[[List[Dict[str, Any]]], Dict[str, Any]]],
+        annotate: Callable[[Dict[str, Any], int], Dict[str, Any]],
+        now: float,
+    ):
+        self.name = name
+        self.send = send
+        self.bucket = TokenBucket(rate_per_minute, burst, now)
+        self.render_digest = render_digest
+        self.annotate = annotate
+        self.in_flight = 0
+
+
+class _Outbound:
+    __slots__ = ("channel", "key", "rank", "payload", "count", "attempts", "outbox_id", "ready_at")
+
+    def __init__(self, channel: str, key: str, rank: int, payload: Dict[str, Any], count: int = 1,
+                 attempts: int = 0, outbox_id: Optional[str] = None, ready_at: float = 0.0):
+        self.channel = channel
+        self.key = key
+        self.rank = rank
+        self.payload = payload
+        self.count = count
+        self.attempts = attempts
+        self.outbox_id = outbox_id
+        self.ready_at = ready_at
+
+    @property
+    def priority(self) -> str:
+        return next((name for name, rank in PRIORITIES.items() if rank == self.rank), "normal")
+
+
+class NotificationQueue:
+    """Rate-limited, coalescing outbound notification queue with a persistent retry outbox."""
+
+    def __init__(
+        self,
+        query_fn: Optional[Callable[..., Dict[str, Any]]] = None,
+        coalesce_seconds: float = NOTIFY_COALESCE_SECONDS,
+        digest_seconds: float = NOTIFY_DIGEST_SECONDS,
+        max_attempts: int = NOTIFY_MAX_ATTEMPTS,
+        max_pending: int = NOTIFY_QUEUE_MAX,
+        workers: int = 2,
+        autostart: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            query_fn: SQL function for the outbox (defaults to core.database.query_db)
+            workers: delivery threads; 0 delivers inline on the dispatcher (tests)
+            autostart: start the dispatcher thread on the first enqueue
+        """
+        self._query_fn = query_fn
+        self.coalesce_seconds = coalesce_seconds
+        self.digest_seconds = digest_seconds
+        self.max_attempts = max_attempts
+        self.max_pending = max_pending
+        self.autostart = autostart
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._channels: Dict[str, Channel] = {}
+        self._heap: List[Tuple[int, int, _Outbound]] = []
+        self._seq = itertools.count()
+        self._pending: Dict[Tuple[str, str], _Outbound] = {}
+        self._delivered_at: Dict[Tuple[str, str], float] = {}
+        self._repeats: Dict[Tuple[str, str], _Outbound] = {}
+        self._delayed: List[_Outbound] = []
+        self._digests: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._digest_due: Dict[str, float] = {}
+        self._next_outbox_poll = 0.0
+        self._stats = {key: 0 for key in (
+            "queued", "delivered", "coalesced", "suppressed", "digested",
+            "retried", "dead", "dropped",
+        )}
+
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="notify") if workers else None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._drain_seconds = 0.0
+
+    # ------------------------------------------------------------------ #
+    # Registration and enqueue (caller side, never blocks on I/O)
+    # ------------------------------------------------------------------ #
+
+    def register_channel(
+        self,
+        name: str,
+        send: Callable[[Dict[str, Any]], bool],
+        rate_per_minute: float = 60,
+        burst: int = 10,
+        render_digest: Optional[Callable[[List[Dict[str, Any]]], Dict[str, Any]]] = None,
+        annotate: Callable[[Dict[str, Any], int], Dict[str, Any]] = annotate_repeats,
+        replace: bool = False,
+    ) -> Channel:
+        """
+        Register a delivery channel (a no-op if ``name`` exists, unless ``replace``).
+
+        ``send(payload)`` returns True on success; False or an exception
+        schedules a retry. ``render_digest(payloads)`` builds one payload from
+        held low-priority ones; without it the channel sends them one by one.
+        """
+        with self._lock:
+            channel = self._channels.get(name)
+            if channel is None or replace:
+                channel = Channel(name, send, rate_per_minute, burst, render_digest, annotate, self._clock())
+                self._channels[name] = channel
+            return channel
+
+    def enqueue(
+        self,
+        channel: str,
+        payload: Dict[str, Any],
+        priority: str = "normal",
+        key: Optional[str] = None,
+        digest: Optional[bool] = None,
+    ) -> bool:
+        """
+        Queue a notification for delivery.
+
+        Args:
+            channel: registered channel name
+            payload: JSON-serializable payload handed to the channel's send function
+            priority: critical, high, normal or low
+            key: dedup key; identical keys are coalesced (defaults to a hash of the payload)
+            digest: hold for the channel's digest (default: low priority on a digest channel)
+
+        Returns:
+            True if accepted (queued, coalesced or held), False if rejected
+        """
+        rank = PRIORITIES.get(priority, PRIORITIES["normal"])
+        ident = (channel, key or payload_key(payload))
+        with self._lock:
+            target = self._channels.get(channel)
+            if target is None:
+                logger.warning("Notification for unregistered channel %s dropped", channel)
+                return False
+            now = self._clock()
+            if digest is None:
+                digest = rank == PRIORITIES["low"]
+            if digest and target.render_digest is not None:
+                route = str(payload.get("channel") or payload.get("to") or "")
+                self._digests.setdefault((channel, route), []).append(payload)
+                self._digest_due.setdefault(channel, now + self.digest_seconds)
+                self._stats["digested"] += 1
+                self._wake.set()
+                accepted = True
+            else:
+                accepted = self._queue(ident, rank, priority, payload, now)
+
+        # Held digests need the dispatcher too, to be flushed when they fall due
+        if accepted and self.autostart and not self.running:
+            self.start()
+        return accepted
+
+    def _queue(self, ident: Tuple[str, str], rank: int, priority: str, payload: Dict[str, Any], now: float) -> bool:
+        """Coalesce, suppress or queue one notification (caller holds the lock)."""
+        channel = ident[0]
+        item = self._pending.get(ident)
+        if item is not None:
+            item.count += 1
+            item.payload = payload
+            self._stats["coalesced"] += 1
+            return True
+
+        delivered = self._delivered_at.get(ident)
+        if delivered is not None and now - delivered < self.coalesce_seconds:
+            repeat = self._repeats.get(ident)
+            if repeat is None:
+                self._repeats[ident] = _Outbound(channel, ident[1], rank, payload,
+                                                 ready_at=delivered + self.coalesce_seconds)
+            else:
+                repeat.count += 1
+                repeat.payload = payload
+                repeat.rank = min(repeat.rank, rank)
+            self._stats["suppressed"] += 1
+            return True
+
+        if len(self._pending) >= self.max_pending and rank > PRIORITIES["critical"]:
+            self._stats["dropped"] += 1
+            logger.warning("Notification queue full (%d pending); dropped %s notification on %s",
+                           len(self._pending), priority, channel)
+            return False
+
+        item = _Outbound(channel, ident[1], rank, payload)
+        self._pending[ident] = item
+        self._push(item)
+        self._stats["queued"] += 1
+        self._wake.set()
+        return True
+
+    def _push(self, item: _Outbound) -> None:
+        heapq.heappush(self._heap, (item.rank, next(self._seq), item))
+
+    # ------------------------------------------------------------------ #
+    # Dispatcher
+    # ------------------------------------------------------------------ #
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the background dispatcher thread."""
+        with self._lock:
+            if self.running:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="notification-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the dispatcher: flush digests, deliver what the rate limits allow
+        within ``timeout``, and persist the rest to the outbox.
+        """
+        if not self.running:
+            self._persist_leftovers()
+            return
+        self._drain_seconds = max(0.0, timeout - 1.0)
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        deadline = None
+        while True:
+            self._wake.clear()
+            try:
+                wait = self.dispatch_once()
+            except Exception as e:
+                logger.error("Notification dispatcher error: %s", e)
+                wait = NOTIFY_IDLE_WAIT_SECONDS
+            if self._stopping.is_set():
+                if deadline is None:
+                    deadline = self._clock() + self._drain_seconds
+                if self.idle() or self._clock() >= deadline:
+                    break
+                wait = min(wait, 0.05)
+            self._wake.wait(max(wait, 0.01))
+        self._persist_leftovers()
+
+    def idle(self) -> bool:
+        """True when nothing is queued or in flight (held digests and repeats aside)."""
+        with self._lock:
+            return not self._heap and not any(c.in_flight for c in self._channels.values())
+
+    def dispatch_once(self, now: Optional[float] = None) -> float:
+        """
+        One scheduling pass: claim due outbox retries, release due digests
+        and repeat summaries, and start every delivery the per-channel rate
+        limits allow. Returns seconds until there may be more to do.
+        """
+        now = self._clock() if now is None else now
+        self._poll_outbox(now)
+        ready: List[_Outbound] = []
+        with self._lock:
+            self._flush_digests(now, force=self._stopping.is_set())
+            self._release(now)
+
+            wake = NOTIFY_IDLE_WAIT_SECONDS
+            blocked = []
+            while self._heap:
+                entry = heapq.heappop(self._heap)
+                item = entry[2]
+                channel = self._channels.get(item.channel)
+                if channel is None or channel.in_flight:
+                    blocked.append(entry)
+                    continue
+                if not channel.bucket.take(now):
+                    wake = min(wake, channel.bucket.wait(now))
+                    blocked.append(entry)
+                    continue
+                channel.in_flight += 1
+                ident = (item.channel, item.key)
+                if self._pending.get(ident) is item:
+                    del self._pending[ident]
+                # Counted as delivered from now on, so repeats during the send are folded
+                self._delivered_at[ident] = now
+                ready.append(item)
+            for entry in blocked:
+                heapq.heappush(self._heap, entry)
+
+            for due in itertools.chain(self._digest_due.values(),
+                                       (r.ready_at for r in self._repeats.values()),
+                                       (d.ready_at for d in self._delayed)):
+                wake = min(wake, max(0.0, due - now))
+
+        for item in ready:
+            if self._executor is None:
+                self._deliver(item)
+            else:
+                self._executor.submit(self._deliver, item)
+        return wake
+
+    def _flush_digests(self, now: float, force: bool = False) -> None:
+        for name, due in list(self._digest_due.items()):
+            if now < due and not force:
+                continue
+            del self._digest_due[name]
+            channel = self._channels[name]
+            for ident in [i for i in self._digests if i[0] == name]:
+                payloads = self._digests.pop(ident)
+                try:
+                    digest = channel.render_digest(payloads)
+                except Exception as e:
+                    logger.error("Digest rendering failed on %s; sending %d items singly: %s",
+                                 name, len(payloads), e)
+                    for payload in payloads:
+                        self._push(_Outbound(name, payload_key(payload), PRIORITIES["low"], payload))
+                    continue
+                self._push(_Outbound(name, f"digest:{payload_key(digest)}", PRIORITIES["normal"], digest))
+
+    def _release(self, now: float) -> None:
+        for ident, repeat in list(self._repeats.items()):
+            if repeat.ready_at <= now and ident not in self._pending:
+                del self._repeats[ident]
+                self._pending[ident] = repeat
+                self._push(repeat)
+        for item in [d for d in self._delayed if d.ready_at <= now]:
+            self._delayed.remove(item)
+            self._push(item)
+        # Forget delivery times whose coalescing window has closed
+        cutoff = now - self.coalesce_seconds
+        for ident in [i for i, at in self._delivered_at.items() if at < cutoff and i not in self._repeats]:
+            del self._delivered_at[ident]
+
+    def _deliver(self, item: _Outbound) -> None:
+        channel = self._channels[item.channel]
+        payload = channel.annotate(item.payload, item.count) if item.count > 1 else item.payload
+        error = None
+        try:
+            if not channel.send(payload):
+                error = "delivery failed"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        with self._lock:
+            channel.in_flight -= 1
+            if error is None:
+                self._stats["delivered"] += 1
+        self._wake.set()
+
+        if error is None:
+            if item.outbox_id:
+                self._query_outbox(f"UPDATE notification_outbox SET status = 'delivered', delivered_at = NOW(), "
+                                   f"attempts = {item.attempts + 1} WHERE id = {_quote(item.outbox_id)}")
+            return
+        item.attempts += 1
+        self._retry(item, error)
+
+    def _retry(self, item: _Outbound, error: str) -> None:
+        if item.attempts >= self.max_attempts:
+            logger.error("Notification on %s dead after %d attempts: %s", item.channel, item.attempts, error)
+            with self._lock:
+                self._stats["dead"] += 1
+            if item.outbox_id:
+                self._query_outbox(f"UPDATE notification_outbox SET status = 'dead', attempts = {item.attempts}, "
+                                   f"last_error = {_quote(error[:1000])} WHERE id = {_quote(item.outbox_id)}")
+            return
+
+        delay = NOTIFY_RETRY_BASE_SECONDS * 2 ** (item.attempts - 1)
+        with self._lock:
+            self._stats["retried"] += 1
+        if self._persist([item], delay, error):
+            return
+        logger.warning("Notification outbox unavailable; retrying %s delivery in memory in %ds",
+                       item.channel, delay)
+        item.ready_at = self._clock() + delay
+        with self._lock:
+            self._delayed.append(item)
+
+    # ------------------------------------------------------------------ #
+    # Outbox (notification_outbox)
+    # ------------------------------------------------------------------ #
+
+    @property
+    def _query(self) -> Callable[..., Dict[str, Any]]:
+        if self._query_fn is None:
+            from .database import query_db
+            self._query_fn = query_db
+        return self._query_fn
+
+    def _query_outbox(self, sql: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self._query(sql)
+        except Exception as e:
+            logger.warning("Notification outbox query failed: %s", e)
+            return None
+
+    def _persist(self, items: List[_Outbound], delay: float, error: Optional[str]) -> bool:
+        """Write items to the outbox as due in ``delay`` seconds. False if the database failed."""
+        error_sql = _quote(error[:1000]) if error else "NULL"
+        next_attempt = f"NOW() + INTERVAL '{int(delay)} seconds'"
+        ok = True
+        fresh = []
+        for item in items:
+            if item.outbox_id:
+                ok = self._query_outbox(
+                    f"UPDATE notification_outbox SET status = 'pending', attempts = {item.attempts}, "
+                    f"coalesced_count = {item.count}, last_error = {error_sql}, next_attempt_at = {next_attempt} "
+                    f"WHERE id = {_quote(item.outbox_id)}"
+                ) is not None and ok
+            else:
+                fresh.append(item)
+        if fresh:
+            values = ", ".join(
+                f"({_quote(i.channel)}, {_quote(i.key)}, {_quote(i.priority)}, "
+                f"{_quote(json.dumps(i.payload, default=str))}::jsonb, {i.count}, {i.attempts}, "
+                f"{error_sql}, {next_attempt})"
+                for i in fresh
+            )
+            ok = self._query_outbox(
+                "INSERT INTO notification_outbox (channel, dedup_key, priority, payload, coalesced_count, "
+                f"attempts, last_error, next_attempt_at) VALUES {values}"
+            ) is not None and ok
+        return ok
+
+    def _poll_outbox(self, now: float) -> None:
+        """Claim due retries (and stale claims of dead processes) for registered channels."""
+        if now < self._next_outbox_poll:
+            return
+        self._next_outbox_poll = now + NOTIFY_OUTBOX_POLL_SECONDS
+        with self._lock:
+            names = sorted(self._channels)
+        if not names:
+            return
+        result = self._query_outbox(f"""
+            UPDATE notification_outbox SET status = 'delivering', claimed_at = NOW()
+            WHERE id IN (
+                SELECT id FROM notification_outbox
+                WHERE channel IN ({', '.join(_quote(n) for n in names)})
+                  AND ((status = 'pending' AND next_attempt_at <= NOW())
+                       OR (status = 'delivering'
+                           AND claimed_at < NOW() - INTERVAL '{NOTIFY_CLAIM_TIMEOUT_MINUTES} minutes'))
+                ORDER BY next_attempt_at
+                LIMIT 100
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, channel, dedup_key, priority, payload, coalesced_count, attempts
+        """)
+        rows = (result or {}).get("rows") or []
+        with self._lock:
+            for row in rows:
+                payload = row.get("payload")
+                if isinstance(payload, str):
+                    payload = json.loads(payload)
+                self._push(_Outbound(
+                    row["channel"], row.get("dedup_key") or payload_key(payload),
+                    PRIORITIES.get(row.get("priority"), PRIORITIES["normal"]), payload,
+                    count=int(row.get("coalesced_count") or 1), attempts=int(row.get("attempts") or 0),
+                    outbox_id=str(row["id"]),
+                ))
+
+
+    def _persist_leftovers(self) -> None:
+        with self._lock:
+            self._flush_digests(self._clock(), force=True)
+            leftovers = [entry[2] for entry in self._heap]
+            leftovers += self._delayed + list(self._repeats.values())
+            self._heap.clear()
+            self._delayed.clear()
+            self._repeats.clear()
+            self._pending.clear()
+        if leftovers and not self._persist(leftovers, 0, None):
+            logger.error("%d queued notifications lost at shutdown", len(leftovers))
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus current queue depths."""
+        with self._lock:
+            return dict(
+                self._stats,
+                pending=len(self._heap),
+                delayed=len(self._delayed),
+                held_repeats=len(self._repeats),
+                held_digest=sum(len(p) for p in self._digests.values()),
+                running=self.running,
+            )
+
+
+# Singleton instance
+_notification_queue: Optional[NotificationQueue] = None
+_notification_queue_lock = threading.Lock()
+
+
+def get_notification_queue(query_fn: Optional[Callable[..., Dict[str, Any]]] = None) -> NotificationQueue:
+    """Get or create the process-wide notification queue."""
+    global _notification_queue
+    if _notification_queue is None:
+        with _notification_queue_lock:
+            if _notification_queue is None:
+                _notification_queue = NotificationQueue(query_fn)
+                atexit.register(_notification_queue.stop, 3.0)
+    return _notification_queue
+
+
+__all__ = [
+    "NotificationQueue",
+    "TokenBucket",
+    "annotate_repeats",
+    "get_notification_queue",
+    "payload_key",
+    "render_slack_digest",
+    "PRIORITIES",
+]
@@ -9,16 +9,24 @@ Events:
 - Task failures/errors
 - Daily summaries
 - Critical alerts
+
+Messages go through the outbound notification queue
+(core.notification_queue), so the notify_* methods never block on Slack.
+Task completions are low priority and arrive as a periodic digest; repeated
+failures and alerts are coalesced.
 """
 
 import os
 import json
+import hashlib
 import urllib.request
 import urllib.error
 from urllib.parse import urlparse
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 
+from core.notification_queue import get_notification_queue, render_slack_digest
+
 
 # Slack webhook URL for #war-room
 SLACK_WEBHOOK_URL = os.getenv("SLACK_WARROOM_WEBHOOK")
@@ -26,6 +34,13 @@ SLACK_WEBHOOK_URL = os.getenv("SLACK_WARROOM_WEBHOOK")
 # Optional: Disable notifications (for testing)
 NOTIFICATIONS_ENABLED = os.getenv("NOTIFICATIONS_ENABLED", "true").lower() == "true"
 
+# Notification queue channel and webhook rate limit (Slack allows ~1 msg/s)
+QUEUE_CHANNEL = "warroom"
+RATE_PER_MINUTE = 60
+BURST = 10
+
+SEVERITY_PRIORITY = {"info": "normal", "warning": "high", "critical": "critical"}
+
 
 def _is_valid_webhook_url(url: str) -> bool:
     """
@@ -66,15 +81,29 @@ class SlackNotifier:
         if notifications_enabled and self.webhook_url and not valid_webhook:
             print("[SLACK] Invalid webhook URL; notifications disabled.")
     
-    def _post_to_slack(self, payload: Dict[str, Any]) -> bool:
+    @property
+    def queue_channel(self) -> str:
+        """Queue channel for this webhook (custom webhooks get their own rate limit)."""
+        if self.webhook_url == os.getenv("SLACK_WARROOM_WEBHOOK"):
+            return QUEUE_CHANNEL
+        return f"{QUEUE_CHANNEL}:{hashlib.sha256(self.webhook_url.encode()).hexdigest()[:12]}"
+    
+    def _post_to_slack(
+        self,
+        payload: Dict[str, Any],
+        priority: str = "normal",
+        dedup_key: Optional[str] = None
+    ) -> bool:
         """
-        Post a message to Slack via webhook.
+        Queue a message for the Slack webhook.
         
         Args:
             payload: Slack message payload (blocks, text, attachments)
+            priority: critical, high, normal or low (low is sent in a digest)
+            dedup_key: Messages with the same key are coalesced
         
         Returns:
-            True if posted successfully, False otherwise
+            True if queued, False otherwise
         """
         if not self.enabled:
             print("[SLACK] Notifications disabled - message suppressed")
@@ -85,6 +114,26 @@ class SlackNotifier:
             print("[SLACK] Invalid webhook URL - request blocked")
             return False
         
+        queue = get_notification_queue()
+        channel = self.queue_channel
+        queue.register_channel(channel, self._send_now, rate_per_minute=RATE_PER_MINUTE, burst=BURST,
+                               render_digest=render_slack_digest)
+        return queue.enqueue(channel, payload, priority=priority, key=dedup_key)
+    
+    def _send_now(self, payload: Dict[str, Any]) -> bool:
+        """
+        Post a message to Slack via webhook (the queue's send function).
+        
+        Args:
+            payload: Slack message payload (blocks, text, attachments)
+        
+        Returns:
+            True if posted successfully, False otherwise
+        """
+        if not _is_valid_webhook_url(self.webhook_url):
+            print("[SLACK] Invalid webhook URL - request blocked")
+            return False
+        
         try:
             data = json.dumps(payload).encode('utf-8')
             req = urllib.request.Request(
@@ -126,7 +175,7 @@ class SlackNotifier:
             details: Optional additional details
             
         Returns:
-            True if notification was sent successfully
+            True if the notification was queued
         """
         blocks = [
             {
@@ -173,7 +222,7 @@ class SlackNotifier:
         return self._post_to_slack({
             "text": f"✅ Task Completed: {task_title}",
             "blocks": blocks
-        })
+        }, priority="low")
     
     def notify_task_failed(
         self,
@@ -194,7 +243,7 @@ class SlackNotifier:
             retry_count: Optional number of retries attempted
             
         Returns:
-            True if notification was sent successfully
+            True if the notification was queued
         """
         blocks = [
             {
@@ -239,7 +288,7 @@ class SlackNotifier:
         return self._post_to_slack({
             "text": f"❌ Task Failed: {task_title} - {error_message[:100]}",
             "blocks": blocks
-        })
+        }, priority="high", dedup_key=f"task_failed:{task_id}")
     
     def notify_daily_summary(
         self,
@@ -258,7 +307,7 @@ class SlackNotifier:
             top_errors: Optional list of top error messages
             
         Returns:
-            True if notification was sent successfully
+            True if the notification was queued
         """
         now = datetime.now(timezone.utc)
         date_str = now.strftime("%Y-%m-%d")
@@ -315,7 +364,7 @@ class SlackNotifier:
             severity: Alert severity - "info", "warning", or "critical"
             
         Returns:
-            True if notification was sent successfully
+            True if the notification was queued
         """
         emoji = {
             "info": "ℹ️",
@@ -351,7 +400,7 @@ class SlackNotifier:
         return self._post_to_slack({
             "text": f"{alert_type}: {message[:100]}",
             "blocks": blocks
-        })
+        }, priority=SEVERITY_PRIORITY.get(severity, "high"), dedup_key=f"alert:{alert_type}:{message}")
     
     def notify_engine_started(self, worker_id: str) -> bool:
         """
@@ -361,7 +410,7 @@ class SlackNotifier:
             worker_id: ID of the engine/worker that started
             
         Returns:
-            True if notification was sent successfully
+            True if the notification was queued
         """
         return self.notify_alert(
             "Engine Started",
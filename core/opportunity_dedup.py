@@ -0,0 +1,261 @@
+"""
+Opportunity Dedup Index - In-memory duplicate detection for scan ingestion
+
+check_duplicate() runs up to three queries per candidate (external_id,
+metadata fingerprint, pg_trgm similarity() scan per customer). Scanners
+ingest in bursts, so this index is loaded once per scan with every
+opportunity from the dedup window and answers all three checks in memory:
+
+- external_id and fingerprint are dict lookups.
+- Fuzzy description matches use a MinHash/LSH sketch of the description's
+  trigram set, scoped by (opportunity_type, category, customer). LSH
+  candidates are confirmed with the exact trigram similarity, computed the
+  way pg_trgm does it, against the same 0.6 threshold as the SQL path.
+
+Results have the same shape as core.proactive.check_duplicate().
+
+Usage:
+    from core.opportunity_dedup import load_dedup_index
+
+    index = load_dedup_index(time_window_days=30)
+    dup = index.check(opportunity_type, category, description, external_id, customer_name)
+    if not dup["is_duplicate"]:
+        index.add({"id": new_id, ..., "fingerprint": dup["fingerprint"]})
+"""
+
+import hashlib
+import re
+import struct
+import threading
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Same threshold as check_duplicate's "similarity(description, $4) > 0.6"
+SIMILARITY_THRESHOLD = 0.6
+
+# MinHash signature length and LSH banding (NUM_PERM = LSH_BANDS * rows per band).
+# Two rows per band puts the LSH threshold near 0.25, so pairs at 0.6 are
+# found with probability > 0.999; false candidates are removed by the exact check.
+NUM_PERM = 32
+LSH_BANDS = 16
+
+# Trigrams whose hashes MinHasher keeps
+GRAM_CACHE_SIZE = 200_000
+
+# Matches check_duplicate, which compares description[:500]
+MAX_DESCRIPTION_CHARS = 500
+
+_HASHES_PER_DIGEST = 16
+_WORD_RE = re.compile(r"[^\W_]+")
+
+LOAD_SQL = """
+    SELECT id, opportunity_type, category, description, status, customer_name,
+           external_id, created_at, metadata->>'fingerprint' AS fingerprint
+    FROM opportunities
+    WHERE created_at > NOW() - INTERVAL '{days} days'
+"""
+
+Scope = Tuple[str, str, str]
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """pg_trgm trigram set: lowercased words padded with two leading and one trailing space."""
+    grams = set()
+    for word in _WORD_RE.findall((text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def trigram_similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """pg_trgm similarity(): shared trigrams over distinct trigrams of both."""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class MinHasher:
+    """MinHash signatures over trigram sets, with LSH band keys.
+
+    Each trigram gets ``num_perm`` independent 32-bit hashes from keyed
+    blake2b digests (16 per digest); trigram hashes are cached because the
+    same trigrams recur across descriptions.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = LSH_BANDS, seed: int = 1):
+        if num_perm % bands or num_perm % _HASHES_PER_DIGEST:
+            raise ValueError("num_perm must be a multiple of bands and of 16")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._keys = [
+            seed.to_bytes(4, "little") + block.to_bytes(4, "little")
+            for block in range(num_perm // _HASHES_PER_DIGEST)
+        ]
+        self._unpack = struct.Struct(f"<{_HASHES_PER_DIGEST}I").unpack
+        self._cache: Dict[str, Tuple[int, ...]] = {}
+
+    def _hashes(self, gram: str) -> Tuple[int, ...]:
+        cached = self._cache.get(gram)
+        if cached is None:
+            data = gram.encode("utf-8")
+            cached = tuple(
+                value
+                for key in self._keys
+                for value in self._unpack(hashlib.blake2b(data, digest_size=64, key=key).digest())
+            )
+            if len(self._cache) < GRAM_CACHE_SIZE:
+                self._cache[gram] = cached
+        return cached
+
+    def signature(self, grams: Iterable[str]) -> Tuple[int, ...]:
+        hashes = [self._hashes(g) for g in grams]
+        if not hashes:
+            return ()
+        if NUMPY_AVAILABLE:
+            return tuple(np.array(hashes, dtype=np.uint32).min(axis=0).tolist())
+        return tuple(map(min, zip(*hashes)))
+
+    def band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        if not signature:
+            return []
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+
+def _scope(opportunity_type: Any, category: Any, customer_name: Any) -> Optional[Scope]:
+    # The SQL path matches LOWER(customer_name) = LOWER($3); no customer, no fuzzy match
+    if not customer_name:
+        return None
+    return (str(opportunity_type or ""), str(category or ""), str(customer_name).lower())
+
+
+class OpportunityDedupIndex:
+    """In-memory external_id / fingerprint / fuzzy-description index."""
+
+    def __init__(self, hasher: Optional[MinHasher] = None):
+        self._hasher = hasher or MinHasher()
+        self._lock = threading.RLock()
+        self._by_external_id: Dict[str, Dict[str, Any]] = {}
+        self._by_fingerprint: Dict[str, Dict[str, Any]] = {}
+        self._grams: Dict[str, FrozenSet[str]] = {}
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._buckets: Dict[Tuple[Scope, int, Tuple[int, ...]], List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Index one opportunity row (id, type, category, description, customer, external_id, fingerprint)."""
+        opp_id = str(row.get("id"))
+        with self._lock:
+            self._rows[opp_id] = row
+            if row.get("external_id"):
+                self._by_external_id.setdefault(str(row["external_id"]), row)
+            if row.get("fingerprint"):
+                self._by_fingerprint.setdefault(str(row["fingerprint"]), row)
+            scope = _scope(row.get("opportunity_type"), row.get("category"), row.get("customer_name"))
+            if scope is None:
+                return
+            grams = trigrams(row.get("description") or "")
+            self._grams[opp_id] = grams
+            for band, key in self._hasher.band_keys(self._hasher.signature(grams)):
+                self._buckets.setdefault((scope, band, key), []).append(opp_id)
+
+    def add_many(self, rows: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            for row in rows:
+                self.add(row)
+
+    def check(
+        self,
+        opportunity_type: str,
+        category: str,
+        description: str,
+        external_id: Optional[str] = None,
+        customer_name: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Same checks, order and result shape as check_duplicate(), without queries."""
+        if fingerprint is None:
+            from .proactive import compute_opportunity_fingerprint
+            fingerprint = compute_opportunity_fingerprint(
+                opportunity_type, category, description, external_id, customer_name
+            )
+
+        with self._lock:
+            if external_id and str(external_id) in self._by_external_id:
+                return {
+                    "is_duplicate": True,
+                    "match_type": "external_id",
+                    "matching_opportunity": self._by_external_id[str(external_id)],
+                }
+
+            if fingerprint in self._by_fingerprint:
+                return {
+                    "is_duplicate": True,
+                    "match_type": "fingerprint",
+                    "matching_opportunity": self._by_fingerprint[fingerprint],
+                }
+
+            match = self._fuzzy_match(opportunity_type, category, description, customer_name)
+            if match is not None:
+                opp_id, similarity = match
+                return {
+                    "is_duplicate": True,
+                    "match_type": "fuzzy_customer_description",
+                    "similarity": similarity,
+                    "matching_opportunity": self._rows[opp_id],
+                }
+
+        return {"is_duplicate": False, "fingerprint": fingerprint}
+
+    def _fuzzy_match(
+        self,
+        opportunity_type: str,
+        category: str,
+        description: str,
+        customer_name: Optional[str],
+    ) -> Optional[Tuple[str, float]]:
+        scope = _scope(opportunity_type, category, customer_name)
+        if scope is None:
+            return None
+        grams = trigrams((description or "")[:MAX_DESCRIPTION_CHARS])
+        candidates = set()
+        for band, key in self._hasher.band_keys(self._hasher.signature(grams)):
+            candidates.update(self._buckets.get((scope, band, key), ()))
+
+        best: Optional[Tuple[str, float]] = None
+        for opp_id in candidates:
+            similarity = trigram_similarity(grams, self._grams[opp_id])
+            if similarity > SIMILARITY_THRESHOLD and (best is None or similarity > best[1]):
+                best = (opp_id, similarity)
+        return best
+
+
+def load_dedup_index(
+    time_window_days: int = 30,
+    query_fn: Optional[Callable[[str], Dict[str, Any]]] = None,
+) -> OpportunityDedupIndex:
+    """Build an index of every opportunity created in the dedup window (one query)."""
+    if query_fn is None:
+        from .database import query_db as query_fn
+    index = OpportunityDedupIndex()
+    rows = query_fn(LOAD_SQL.format(days=int(time_window_days))).get("rows", []) or []
+    index.add_many(rows)
+    return index
+
+
+__all__ = [
+    "MinHasher",
+    "OpportunityDedupIndex",
+    "load_dedup_index",
+    "trigram_similarity",
+    "trigrams",
+]
@@ -0,0 +1,226 @@
+"""
+Opportunity Rank Index - In-process ranking of scored opportunities
+
+get_top_opportunities() used to run ``ORDER BY confidence_score DESC,
+estimated_value DESC`` over the opportunities table on every call. This
+index keeps every opportunity sorted by that key, partitioned by status, so
+a top-N read walks the head of one sorted list and stops.
+
+- Loaded with one query on first use, then advanced incrementally with a
+  high-water mark on COALESCE(updated_at, created_at).
+- bulk_score_opportunities / score_opportunity / identify_opportunity
+  update it directly (upsert / update_score), so scores written in this
+  process are visible immediately.
+- Lookups return None when the index cannot be loaded; callers keep their
+  SQL path as a fallback.
+
+Usage:
+    from core.opportunity_rank_index import get_opportunity_rank_index
+
+    index = get_opportunity_rank_index()
+    if index.ensure_fresh():
+        rows = index.top(limit=10, min_score=0.5, status="new")
+"""
+
+import bisect
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds before ensure_fresh() runs another incremental sync
+SYNC_MAX_AGE_SECONDS = 30.0
+
+# Columns returned by get_top_opportunities()
+RANK_COLUMNS = (
+    "id", "opportunity_type", "category", "description",
+    "estimated_value", "confidence_score", "status", "stage",
+    "customer_name", "created_at",
+)
+
+SYNC_SQL = """
+    SELECT {columns}, COALESCE(updated_at, created_at)::text AS changed_at
+    FROM opportunities
+    {where}
+    ORDER BY changed_at
+"""
+
+RankKey = Tuple[float, float, str]
+
+
+def _float(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _rank_key(row: Dict[str, Any]) -> RankKey:
+    # Ascending order of this key == confidence_score DESC, estimated_value DESC
+    return (-_float(row.get("confidence_score")), -_float(row.get("estimated_value")), str(row.get("id")))
+
+
+class OpportunityRankIndex:
+    """Thread-safe per-status sorted index of opportunities."""
+
+    def __init__(self, query_fn: Optional[Callable[[str], Dict[str, Any]]] = None):
+        if query_fn is None:
+            from .database import query_db as query_fn
+        self._query = query_fn
+        self._lock = threading.RLock()
+        self._keys: Dict[str, List[RankKey]] = {}
+        self._rows: Dict[str, List[Dict[str, Any]]] = {}
+        self._entries: Dict[str, Tuple[str, RankKey]] = {}
+        self._high_water: Optional[str] = None
+        self._loaded = False
+        self._last_sync = float("-inf")
+        self.syncs = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------ #
+    # Maintenance
+    # ------------------------------------------------------------------ #
+
+    def upsert(self, row: Dict[str, Any]) -> None:
+        """Insert or re-rank one opportunity (row needs at least id and status)."""
+        opp_id = str(row.get("id"))
+        entry = {column: row.get(column) for column in RANK_COLUMNS}
+        with self._lock:
+            self._remove_locked(opp_id)
+            status = str(entry.get("status") or "")
+            key = _rank_key(entry)
+            keys = self._keys.setdefault(status, [])
+            pos = bisect.bisect_left(keys, key)
+            keys.insert(pos, key)
+            self._rows.setdefault(status, []).insert(pos, entry)
+            self._entries[opp_id] = (status, key)
+
+    def upsert_many(self, rows: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            for row in rows:
+                self.upsert(row)
+
+    def update_score(self, opportunity_id: str, score: float) -> None:
+        """Re-rank a known opportunity after its confidence_score changed."""
+        with self._lock:
+            current = self.get(opportunity_id)
+            if current is not None:
+                self.upsert({**current, "confidence_score": score})
+
+    def get(self, opportunity_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            found = self._entries.get(str(opportunity_id))
+            if found is None:
+                return None
+            status, key = found
+            return dict(self._rows[status][bisect.bisect_left(self._keys[status], key)])
+
+    def remove(self, opportunity_id: str) -> None:
+        with self._lock:
+            self._remove_locked(str(opportunity_id))
+
+    def _remove_locked(self, opp_id: str) -> None:
+        found = self._entries.pop(opp_id, None)
+        if found is None:
+            return
+        status, key = found
+        pos = bisect.bisect_left(self._keys[status], key)
+        del self._keys[status][pos]
+        del self._rows[status][pos]
+
+    # ------------------------------------------------------------------ #
+    # Loading
+    # ------------------------------------------------------------------ #
+
+    def sync(self) -> None:
+        """Load everything on first call, afterwards only rows changed since the last sync."""
+        from .database import escape_sql_value
+
+        with self._lock:
+            high_water = self._high_water
+        # >= re-reads rows at the boundary timestamp; upsert is idempotent
+        where = f"WHERE COALESCE(updated_at, created_at) >= {escape_sql_value(high_water)}::timestamptz" if high_water else ""
+        rows = self._query(SYNC_SQL.format(columns=", ".join(RANK_COLUMNS), where=where)).get("rows", []) or []
+        with self._lock:
+            for row in rows:
+                self.upsert(row)
+                changed_at = row.get("changed_at")
+                if changed_at and (self._high_water is None or changed_at > self._high_water):
+                    self._high_water = changed_at
+            self._loaded = True
+            self._last_sync = time.monotonic()
+            self.syncs += 1
+
+    def ensure_fresh(self, max_age: float = SYNC_MAX_AGE_SECONDS) -> bool:
+        """Sync if the last sync is older than ``max_age``; True if lookups can be served."""
+        if time.monotonic() - self._last_sync < max_age:
+            return self._loaded
+        try:
+            self.sync()
+        except Exception as e:
+            logger.warning("Opportunity rank index sync failed: %s", e)
+            # Don't retry on every call while the database is unavailable
+            self._last_sync = time.monotonic()
+        return self._loaded
+
+    # ------------------------------------------------------------------ #
+    # Lookups
+    # ------------------------------------------------------------------ #
+
+    def top(
+        self,
+        limit: int = 10,
+        min_score: float = 0.0,
+        status: str = "new",
+        opportunity_type: Optional[str] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Highest-ranked opportunities with the given status, or None if not loaded."""
+        if not self._loaded:
+            return None
+        results: List[Dict[str, Any]] = []
+        with self._lock:
+            for row in self._rows.get(status, ()):
+                if len(results) >= limit or _float(row.get("confidence_score")) < min_score:
+                    break
+                if opportunity_type and row.get("opportunity_type") != opportunity_type:
+                    continue
+                results.append(dict(row))
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "opportunities": len(self._entries),
+                "by_status": {status: len(keys) for status, keys in self._keys.items()},
+                "loaded": self._loaded,
+                "syncs": self.syncs,
+            }
+
+
+_index: Optional[OpportunityRankIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_opportunity_rank_index(
+    query_fn: Optional[Callable[[str], Dict[str, Any]]] = None,
+) -> OpportunityRankIndex:
+    """Process-wide OpportunityRankIndex singleton.
+
+    ``query_fn`` is only used when the singleton is first created.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = OpportunityRankIndex(query_fn)
+    return _index
+
+
+__all__ = [
+    "OpportunityRankIndex",
+    "get_opportunity_rank_index",
+]
@@ -134,22 +134,20 @@ def score_pending_ideas(
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-    scorer = IdeaScorer()
-    scored = 0
-
-    for r in rows:
-        idea_id = str(r.get("id") or "")
-        if not idea_id:
-            continue
-
-        idea = {
+    candidates = [r for r in rows if str(r.get("id") or "")]
+    scores = IdeaScorer().score_ideas([
+        {
             "title": r.get("title"),
             "description": r.get("description"),
             "hypothesis": r.get("hypothesis"),
             "estimates": r.get("estimates") or {},
         }
+        for r in candidates
+    ])
+    scored = 0
 
-        s = scorer.score_idea(idea)
+    for r, s in zip(candidates, scores):
+        idea_id = str(r.get("id"))
         score = float(s.get("score") or 0.0)
         breakdown_json = json.dumps(s.get("breakdown") or {}).replace("'", "''")
 
@@ -291,7 +289,7 @@ def review_experiments_stub(
             """
             SELECT e.id, e.name, e.status, e.budget_spent, e.budget_limit, e.start_date, e.created_at,
                    COALESCE(
-                       (SELECT SUM(net_amount) FROM revenue_events WHERE attribution->>'experiment_id' = e.id::text),
+                       (SELECT SUM(net_amount) FROM revenue_rollups WHERE grain = 'day' AND experiment_id = e.id::text),
                        0
                    ) as revenue_generated,
                    COALESCE(e.budget_spent, 0) as actual_cost, e.experiment_type, e.metadata, e.hypothesis
@@ -0,0 +1,359 @@
+"""
+PR Snapshot Service
+===================
+
+One shared, short-lived view of GitHub pull request state for every consumer
+that polls PRs (PRTracker.sync_all_tracked_prs, the auto-merge monitor in
+main.autonomy_loop, the PR merge monitor and GateChecker).
+
+Previously each consumer made its own REST calls per PR (PR, reviews and
+check-runs), so a cycle cost O(PRs x consumers) requests. Here:
+
+- prefetch() loads state, reviews, mergeability and check-runs for all the
+  PRs of a repo with one aliased GraphQL query (per MAX_PRS_PER_QUERY PRs).
+- Snapshots are cached for SNAPSHOT_TTL_SECONDS, so the other consumers in
+  the same cycle are served from memory.
+- If GraphQL fails, PRs are fetched over REST with If-None-Match; a 304 reuses
+  the cached body and does not count against the rate limit.
+
+Snapshots are REST-shaped (``pr`` looks like GET /pulls/{n}, ``reviews`` like
+GET /pulls/{n}/reviews, ``check_runs`` like the check-runs list) so existing
+analysis code works unchanged.
+
+Usage:
+    from core.pr_snapshot import get_pr_snapshot_service
+
+    snapshots = get_pr_snapshot_service()
+    snapshots.prefetch([("owner/repo", 12), ("owner/repo", 15)])  # 1 request
+    snapshot = snapshots.get("owner/repo", 12)                    # cached
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API_URL = "https://api.github.com"
+
+# How long a snapshot is served without refetching (seconds)
+SNAPSHOT_TTL_SECONDS = 30.0
+
+# PRs per aliased GraphQL query (keeps the query well under GitHub's node limits)
+MAX_PRS_PER_QUERY = 50
+
+# Conditional-request cache entries kept for the REST fallback
+MAX_ETAG_ENTRIES = 1000
+
+# Check-run conclusions that don't block a merge (GitHubClient.get_pr_status rule)
+PASSING_CONCLUSIONS = (None, "success", "skipped", "neutral")
+
+PR_FIELDS = """
+fragment PRFields on PullRequest {
+  number url title state merged mergeable mergeStateStatus
+  createdAt updatedAt mergedAt headRefOid
+  mergeCommit { oid }
+  mergedBy { __typename login }
+  reviewRequests(first: 50) {
+    nodes { requestedReviewer { __typename ... on User { login } ... on Bot { login } ... on Team { slug } } }
+  }
+  reviews(last: 100) { nodes { author { __typename login } state submittedAt } }
+  commits(last: 1) {
+    nodes { commit { statusCheckRollup { contexts(first: 100) {
+      nodes { __typename ... on CheckRun { name status conclusion } }
+    } } } }
+  }
+}
+"""
+
+
+@dataclass
+class PRSnapshot:
+    """State of one PR at fetch time."""
+    repo: str
+    number: int
+    pr: Dict[str, Any]
+    reviews: List[Dict[str, Any]] = field(default_factory=list)
+    check_runs: List[Dict[str, Any]] = field(default_factory=list)
+    fetched_at: float = field(default_factory=time.monotonic)
+    source: str = "graphql"
+
+    @property
+    def checks_passed(self) -> bool:
+        return all(run.get("conclusion") in PASSING_CONCLUSIONS for run in self.check_runs)
+
+
+def _lower(value: Optional[str]) -> Optional[str]:
+    return value.lower() if isinstance(value, str) else value
+
+
+def _rest_login(actor: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Login as the REST API spells it: GraphQL omits the ``[bot]`` suffix on Bot actors."""
+    login = (actor or {}).get("login")
+    if login and actor.get("__typename") == "Bot" and not login.endswith("[bot]"):
+        return f"{login}[bot]"
+    return login
+
+
+def _from_graphql(repo: str, node: Dict[str, Any]) -> PRSnapshot:
+    """Convert a GraphQL PullRequest node into a REST-shaped snapshot."""
+    state = node.get("state") or ""
+    requested = [
+        (r or {}).get("requestedReviewer") or {}
+        for r in (node.get("reviewRequests") or {}).get("nodes") or []
+    ]
+    pr = {
+        "number": node.get("number"),
+        "html_url": node.get("url", ""),
+        "title": node.get("title", ""),
+        "state": "open" if state == "OPEN" else "closed",
+        "merged": bool(node.get("merged")),
+        "mergeable": {"MERGEABLE": True, "CONFLICTING": False}.get(node.get("mergeable")),
+        "mergeable_state": _lower(node.get("mergeStateStatus")) or "unknown",
+        "created_at": node.get("createdAt", ""),
+        "updated_at": node.get("updatedAt", ""),
+        "merged_at": node.get("mergedAt"),
+        "merge_commit_sha": (node.get("mergeCommit") or {}).get("oid"),
+        "merged_by": {"login": _rest_login(node["mergedBy"])} if node.get("mergedBy") else None,
+        "head": {"sha": node.get("headRefOid")},
+        "requested_reviewers": [{"login": _rest_login(r)} for r in requested if r.get("login")],
+        "requested_teams": [{"slug": r["slug"]} for r in requested if r.get("slug")],
+    }
+    reviews = [
+        {
+            "user": {"login": _rest_login(r.get("author")) or "unknown"},
+            "state": r.get("state", ""),
+            "submitted_at": r.get("submittedAt") or "",
+        }
+        for r in (node.get("reviews") or {}).get("nodes") or []
+        if r
+    ]
+    check_runs = []
+    for commit_node in (node.get("commits") or {}).get("nodes") or []:
+        rollup = ((commit_node or {}).get("commit") or {}).get("statusCheckRollup") or {}
+        for ctx in (rollup.get("contexts") or {}).get("nodes") or []:
+            if ctx and ctx.get("__typename") == "CheckRun":
+                check_runs.append({
+                    "name": ctx.get("name"),
+                    "status": _lower(ctx.get("status")),
+                    "conclusion": _lower(ctx.get("conclusion")),
+                })
+    return PRSnapshot(repo=repo, number=int(node["number"]), pr=pr, reviews=reviews, check_runs=check_runs)
+
+
+class PRSnapshotService:
+    """
+    Batched, cached PR state shared by all PR consumers.
+
+    Thread-safe; concurrent refreshes of the same PR may both hit GitHub but
+    always leave a consistent snapshot behind.
+    """
+
+    def __init__(self, token: Optional[str] = None, ttl: float = SNAPSHOT_TTL_SECONDS):
+        """
+        Initialize the service.
+
+        Args:
+            token: GitHub token (defaults to GITHUB_TOKEN)
+            ttl: Seconds a snapshot is served from cache
+        """
+        self.token = token if token is not None else os.getenv("GITHUB_TOKEN", "")
+        self.ttl = ttl
+        self._snapshots: Dict[Tuple[str, int], PRSnapshot] = {}
+        self._etags: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"graphql_queries": 0, "rest_requests": 0, "not_modified": 0, "cache_hits": 0}
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+
+    def get(self, repo: str, number: int) -> Optional[PRSnapshot]:
+        """Snapshot of one PR, fetched only if the cached one is stale."""
+        key = (repo, int(number))
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None and self._fresh(snapshot):
+                self.stats["cache_hits"] += 1
+                return snapshot
+        self.prefetch([key])
+        with self._lock:
+            return self._snapshots.get(key)
+
+    def prefetch(self, prs: Iterable[Tuple[str, int]]) -> int:
+        """
+        Refresh every stale PR in ``prs`` with one GraphQL query per repo.
+
+        Returns:
+            Number of PRs fetched from GitHub
+        """
+        by_repo: Dict[str, List[int]] = {}
+        with self._lock:
+            for repo, number in prs:
+                if not repo or number is None:
+                    continue
+                number = int(number)
+                snapshot = self._snapshots.get((repo, number))
+                if snapshot is not None and self._fresh(snapshot):
+                    continue
+                numbers = by_repo.setdefault(repo, [])
+                if number not in numbers:
+                    numbers.append(number)
+
+        if not by_repo or not self.token:
+            return 0
+
+        fetched = 0
+        for repo, numbers in by_repo.items():
+            for start in range(0, len(numbers), MAX_PRS_PER_QUERY):
+                chunk = numbers[start:start + MAX_PRS_PER_QUERY]
+                snapshots = self._fetch_graphql(repo, chunk)
+                if snapshots is None:
+                    snapshots = [s for s in (self._fetch_rest(repo, n) for n in chunk) if s is not None]
+                with self._lock:
+                    for snapshot in snapshots:
+                        self._snapshots[(snapshot.repo, snapshot.number)] = snapshot
+                fetched += len(snapshots)
+        return fetched
+
+    def invalidate(self, repo: str, number: int) -> None:
+        """Drop a cached snapshot (e.g. right after merging the PR)."""
+        with self._lock:
+            self._snapshots.pop((repo, int(number)), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+            self._etags.clear()
+
+    # ------------------------------------------------------------------ #
+    # Fetching
+    # ------------------------------------------------------------------ #
+
+    def _fresh(self, snapshot: PRSnapshot) -> bool:
+        return time.monotonic() - snapshot.fetched_at < self.ttl
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"token {self.token}",
+            "Accept": "application/vnd.github.v3+json",
+            "User-Agent": "Juggernaut-PRSnapshot",
+        }
+
+    def _fetch_graphql(self, repo: str, numbers: List[int]) -> Optional[List[PRSnapshot]]:
+        """One aliased query for ``numbers``; None means fall back to REST."""
+        owner, _, name = repo.partition("/")
+        if not owner or not name:
+            return None
+        aliases = "\n".join(f"    p{n}: pullRequest(number: {int(n)}) {{ ...PRFields }}" for n in numbers)
+        query = (
+            "query($owner: String!, $name: String!) {\n"
+            "  repository(owner: $owner, name: $name) {\n"
+            f"{aliases}\n"
+            "  }\n"
+            "}\n" + PR_FIELDS
+        )
+        try:
+            data = self._graphql(query, {"owner": owner, "name": name})
+        except Exception as e:
+            logger.warning("PR snapshot GraphQL query failed for %s: %s", repo, e)
+            return None
+
+        repository = (data.get("data") or {}).get("repository")
+        if repository is None:
+            logger.warning("PR snapshot GraphQL returned no repository for %s: %s", repo, data.get("errors"))
+            return None
+        # Missing PRs come back as null aliases (with an error entry); skip them
+        return [_from_graphql(repo, node) for node in repository.values() if node]
+
+    def _graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        self.stats["graphql_queries"] += 1
+        req = urllib.request.Request(
+            f"{GITHUB_API_URL}/graphql",
+            data=json.dumps({"query": query, "variables": variables}).encode("utf-8"),
+            method="POST",
+        )
+        for header, value in self._headers().items():
+            req.add_header(header, value)
+        req.add_header("Content-Type", "application/json")
+        with urllib.request.urlopen(req, timeout=30) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    def _fetch_rest(self, repo: str, number: int) -> Optional[PRSnapshot]:
+        """REST fallback: PR, reviews and check-runs, each conditional on its ETag."""
+        pr = self._rest_get(f"/repos/{repo}/pulls/{number}")
+        if not isinstance(pr, dict):
+            return None
+        reviews = self._rest_get(f"/repos/{repo}/pulls/{number}/reviews")
+        head_sha = (pr.get("head") or {}).get("sha")
+        checks = self._rest_get(f"/repos/{repo}/commits/{head_sha}/check-runs") if head_sha else None
+        return PRSnapshot(
+            repo=repo,
+            number=int(number),
+            pr=pr,
+            reviews=reviews if isinstance(reviews, list) else [],
+            check_runs=(checks or {}).get("check_runs", []) if isinstance(checks, dict) else [],
+            source="rest",
+        )
+
+    def _rest_get(self, endpoint: str) -> Optional[Any]:
+        self.stats["rest_requests"] += 1
+        req = urllib.request.Request(f"{GITHUB_API_URL}{endpoint}")
+        for header, value in self._headers().items():
+            req.add_header(header, value)
+        with self._lock:
+            cached = self._etags.get(endpoint)
+        if cached is not None:
+            req.add_header("If-None-Match", cached[0])
+
+        try:
+            with urllib.request.urlopen(req, timeout=30) as response:
+                body = json.loads(response.read().decode("utf-8"))
+                etag = response.headers.get("ETag") if response.headers else None
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached is not None:
+                self.stats["not_modified"] += 1
+                with self._lock:
+                    self._etags.move_to_end(endpoint)
+                return cached[1]
+            logger.warning("PR snapshot GitHub API error: %s for %s", e.code, endpoint)
+            return None
+        except Exception as e:
+            logger.warning("PR snapshot GitHub request error: %s", e)
+            return None
+
+        if etag:
+            with self._lock:
+                self._etags[endpoint] = (etag, body)
+                self._etags.move_to_end(endpoint)
+                while len(self._etags) > MAX_ETAG_ENTRIES:
+                    self._etags.popitem(last=False)
+        return body
+
+
+_service: Optional[PRSnapshotService] = None
+_service_lock = threading.Lock()
+
+
+def get_pr_snapshot_service() -> PRSnapshotService:
+    """Process-wide PRSnapshotService singleton."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = PRSnapshotService()
+    return _service
+
+
+__all__ = [
+    "PRSnapshot",
+    "PRSnapshotService",
+    "get_pr_snapshot_service",
+]
@@ -32,6 +32,7 @@ from datetime import datetime, timezone
 from enum import Enum
 
 from core.database import query_db
+from core.pr_snapshot import get_pr_snapshot_service
 
 
 class PRState(Enum):
@@ -103,6 +104,8 @@ class PRTracker:
         """Initialize the PR tracker with GitHub credentials."""
         self.github_token = os.getenv("GITHUB_TOKEN", "")
         self.default_repo = os.getenv("GITHUB_REPO", "")
+        # Shared with GateChecker and the merge monitors so a cycle fetches each PR once
+        self.snapshots = get_pr_snapshot_service()
     
     def track_pr(self, task_id: str, pr_url: str) -> Optional[Dict[str, Any]]:
         """
@@ -200,13 +203,16 @@ class PRTracker:
         repo = pr_info.get("repo", self.default_repo)
         pr_number = pr_info["pr_number"]
         
-        # Fetch PR data
-        pr_data = self._github_request(f"/repos/{repo}/pulls/{pr_number}")
-        if not pr_data:
+        if not self.github_token:
+            print("[PR_TRACKER] No GitHub token configured")
             return None
         
-        # Fetch reviews
-        reviews = self._github_request(f"/repos/{repo}/pulls/{pr_number}/reviews") or []
+        # PR data and reviews from the shared (batched, short-TTL) snapshot
+        snapshot = self.snapshots.get(repo, pr_number)
+        if not snapshot:
+            return None
+        pr_data = snapshot.pr
+        reviews = snapshot.reviews
         
         # Analyze review state
         review_analysis = self._analyze_reviews(reviews)
@@ -320,6 +326,7 @@ class PRTracker:
             
             with urllib.request.urlopen(req, timeout=30) as response:
                 result = json.loads(response.read().decode("utf-8"))
+                self.snapshots.invalidate(repo, pr_number)
                 
                 # Update tracking record
                 self._update_tracking_state(repo, pr_number, PRState.MERGED)
@@ -358,6 +365,9 @@ class PRTracker:
         
         changed_prs = []
         
+        # One batched query per repo; get_pr_status below reads the snapshots
+        self.snapshots.prefetch((pr.get("repo"), pr.get("pr_number")) for pr in tracked_prs)
+        
         for pr in tracked_prs:
             repo = pr.get("repo")
             pr_number = pr.get("pr_number")
@@ -414,6 +424,7 @@ class PRTracker:
                         self.execute_sql, self.log_action
                     )
                     if merge_result:
+                        self.snapshots.invalidate(repo, pr_number)
                         change_record["auto_merged"] = merge_result
                 
                 changed_prs.append(change_record)
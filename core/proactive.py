@@ -14,7 +14,16 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
-from .database import query_db, log_execution
+from .database import escape_sql_value, query_db, log_execution
+from .opportunity_dedup import OpportunityDedupIndex, load_dedup_index
+from .opportunity_rank_index import get_opportunity_rank_index
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+    NUMPY_AVAILABLE = False
 
 
 # FIX-11: Source reference helper for L2-02 References and Sourcing
@@ -311,6 +320,13 @@ def identify_opportunity(
     if not result.get("rows"):
         return {"success": False, "error": "Failed to create opportunity record"}
     
+    get_opportunity_rank_index().upsert({
+        "id": opportunity_id, "opportunity_type": opportunity_type, "category": category,
+        "description": description, "estimated_value": estimated_value,
+        "confidence_score": 0.5, "status": "new", "stage": "identified",
+        "customer_name": customer_name, "created_at": datetime.utcnow().isoformat(),
+    })
+    
     log_execution(
         worker_id=created_by,
         action="opportunity.identify",
@@ -331,6 +347,22 @@ def identify_opportunity(
 # OPPORTUNITY SCORING
 # =============================================================================
 
+# Default weights for each factor (can be overridden by model)
+OPPORTUNITY_FACTOR_WEIGHTS = {
+    "urgency": 0.15,
+    "fit": 0.20,
+    "value_potential": 0.25,
+    "ease_of_close": 0.15,
+    "customer_quality": 0.15,
+    "timing": 0.10
+}
+
+# Weight of factors not listed above
+DEFAULT_FACTOR_WEIGHT = 0.1
+
+# Rows per UPDATE / history INSERT statement in bulk_score_opportunities
+BULK_SCORE_BATCH_SIZE = 1000
+
 
 def score_opportunity(
     opportunity_id: str,
@@ -350,28 +382,7 @@ def score_opportunity(
     Returns:
         Dict with final score and breakdown
     """
-    # Default weights for each factor (can be overridden by model)
-    default_weights = {
-        "urgency": 0.15,
-        "fit": 0.20,
-        "value_potential": 0.25,
-        "ease_of_close": 0.15,
-        "customer_quality": 0.15,
-        "timing": 0.10
-    }
-    
-    # Calculate weighted score
-    total_weight = 0
-    weighted_sum = 0
-    
-    for factor, score in scoring_factors.items():
-        weight = default_weights.get(factor, 0.1)
-        weighted_sum += score * weight
-        total_weight += weight
-    
-    # Normalize to 0-1
-    final_score = weighted_sum / total_weight if total_weight > 0 else 0.5
-    final_score = round(final_score, 4)
+    final_score = compute_opportunity_scores([scoring_factors])[0]
     
     # Update opportunity with score
     result = query_db(
@@ -397,6 +408,8 @@ def score_opportunity(
     if not result.get("rows"):
         return {"success": False, "error": "Opportunity not found"}
     
+    get_opportunity_rank_index().update_score(opportunity_id, final_score)
+    
     # Record score in history (non-critical, just log if fails)
     history_result = query_db(
         """
@@ -432,39 +445,174 @@ def score_opportunity(
     }
 
 
+def compute_opportunity_scores(factor_rows: List[Dict[str, float]]) -> List[float]:
+    """
+    Weighted-mean scores for many opportunities at once, column by column.
+    
+    Each row maps factor_name -> score (0-1). Factors missing from a row
+    don't count towards its weight; a row with no factors scores 0.5.
+    
+    Args:
+        factor_rows: One factor dict per opportunity
+        
+    Returns:
+        Scores (0-1, rounded to 4 places) in input order
+    """
+    if not factor_rows:
+        return []
+    factors = sorted({name for row in factor_rows for name in row})
+    weights = [OPPORTUNITY_FACTOR_WEIGHTS.get(name, DEFAULT_FACTOR_WEIGHT) for name in factors]
+    
+    if NUMPY_AVAILABLE:
+        values = np.array(
+            [[float(row.get(name, np.nan)) for name in factors] for row in factor_rows],
+            dtype=float
+        ).reshape(len(factor_rows), len(factors))
+        present = ~np.isnan(values)
+        w = np.asarray(weights, dtype=float)
+        weighted_sum = np.where(present, values, 0.0) @ w
+        total_weight = present @ w
+        scores = np.where(total_weight > 0, weighted_sum / np.where(total_weight > 0, total_weight, 1.0), 0.5)
+        return [round(float(score), 4) for score in scores]
+    
+    # Column-wise without NumPy: accumulate one factor at a time
+    weighted_sum = [0.0] * len(factor_rows)
+    total_weight = [0.0] * len(factor_rows)
+    for name, weight in zip(factors, weights):
+        for i, row in enumerate(factor_rows):
+            value = row.get(name)
+            if value is not None:
+                weighted_sum[i] += float(value) * weight
+                total_weight[i] += weight
+    return [
+        round(ws / tw, 4) if tw > 0 else 0.5
+        for ws, tw in zip(weighted_sum, total_weight)
+    ]
+
+
+def default_scoring_factors(row: Dict[str, Any]) -> Dict[str, float]:
+    """Factors used when bulk scoring without a custom scoring function."""
+    return {
+        "value_potential": min(1.0, float(row.get("estimated_value") or 0) / 10000),
+        "urgency": 0.5,  # Default
+        "fit": 0.6,  # Default
+    }
+
+
+def _load_scoring_candidates(
+    opportunity_ids: Optional[List[str]],
+    status: str
+) -> List[Dict[str, Any]]:
+    """All candidates in one query (by ID, or every opportunity with the status)."""
+    columns = "id, opportunity_type, category, description, estimated_value, confidence_score, status, stage, customer_name, created_at, metadata"
+    if opportunity_ids is None:
+        where = f"status = {escape_sql_value(status)}"
+    else:
+        if not opportunity_ids:
+            return []
+        where = "id::text IN (" + ", ".join(escape_sql_value(str(i)) for i in opportunity_ids) + ")"
+    return query_db(f"SELECT {columns} FROM opportunities WHERE {where}").get("rows", []) or []
+
+
 def bulk_score_opportunities(
-    opportunity_ids: List[str],
-    scoring_function: callable = None
+    opportunity_ids: Optional[List[str]] = None,
+    scoring_function: callable = None,
+    status: str = "new",
+    model_id: Optional[str] = None,
+    batch_size: int = BULK_SCORE_BATCH_SIZE
 ) -> Dict[str, Any]:
     """
     Score multiple opportunities at once.
     
+    Candidates are loaded with one query, scored column-wise
+    (compute_opportunity_scores) and written back with one multi-row UPDATE
+    and one history INSERT per batch_size rows. The rank index behind
+    get_top_opportunities is updated in place.
+    
     Args:
-        opportunity_ids: List of opportunity IDs to score
-        scoring_function: Optional custom scoring function
+        opportunity_ids: Opportunity IDs to score (default: every opportunity with ``status``)
+        scoring_function: Optional function(row) -> factor dict
+            (default: default_scoring_factors)
+        status: Status to select when no IDs are given
+        model_id: Scoring model recorded with the scores
+        batch_size: Rows per write statement
         
     Returns:
         Dict with scores for each opportunity
     """
-    results = {}
-    for opp_id in opportunity_ids:
-        # Get opportunity details
-        opp = query_db(
-            "SELECT * FROM opportunities WHERE id = $1",
-            [opp_id]
+    rows = _load_scoring_candidates(opportunity_ids, status)
+    factor_fn = scoring_function or default_scoring_factors
+    factor_rows = [factor_fn(row) for row in rows]
+    scores = compute_opportunity_scores(factor_rows)
+    scored_at = datetime.utcnow().isoformat()
+    
+    results: Dict[str, float] = {}
+    errors: List[str] = []
+    for start in range(0, len(rows), max(1, batch_size)):
+        chunk = range(start, min(len(rows), start + max(1, batch_size)))
+        score_values = ",\n".join(
+            "({id}, {score}::numeric, {scoring}::jsonb)".format(
+                id=escape_sql_value(str(rows[i]["id"])),
+                score=scores[i],
+                scoring=escape_sql_value({"factors": factor_rows[i], "model_id": model_id, "scored_at": scored_at}),
+            )
+            for i in chunk
         )
-        if opp.get("rows"):
-            # Default scoring based on available data
-            row = opp["rows"][0]
-            factors = {
-                "value_potential": min(1.0, float(row.get("estimated_value", 0)) / 10000),
-                "urgency": 0.5,  # Default
-                "fit": 0.6,  # Default
-            }
-            result = score_opportunity(opp_id, factors)
-            results[opp_id] = result.get("final_score", 0)
+        try:
+            query_db(f"""
+                UPDATE opportunities AS o
+                SET confidence_score = v.score,
+                    metadata = jsonb_set(COALESCE(o.metadata, '{{}}'), '{{scoring}}', v.scoring),
+                    updated_at = NOW()
+                FROM (VALUES {score_values}) AS v(id, score, scoring)
+                WHERE o.id::text = v.id
+            """)
+        except Exception as e:
+            errors.append(str(e)[:200])
+            continue
+        
+        for i in chunk:
+            results[str(rows[i]["id"])] = scores[i]
+        
+        # Record score history (non-critical)
+        history_values = ",\n".join(
+            "({id}, {score}, {model}, {factors})".format(
+                id=escape_sql_value(str(rows[i]["id"])),
+                score=scores[i],
+                model=escape_sql_value(model_id or "default"),
+                factors=escape_sql_value(factor_rows[i]),
+            )
+            for i in chunk
+        )
+        try:
+            query_db(f"""
+                INSERT INTO opportunity_scores_history (opportunity_id, score, scoring_model, factors)
+                VALUES {history_values}
+            """)
+        except Exception as e:
+            log_execution(
+                worker_id="SCORER",
+                action="opportunity.score_history_failed",
+                message=f"Failed to record score history for {len(chunk)} opportunities",
+                level="warn",
+                output_data={"error": str(e)[:200], "count": len(chunk)}
+            )
+    
+    index = get_opportunity_rank_index()
+    index.upsert_many([
+        {**row, "confidence_score": results[str(row["id"])]}
+        for row in rows if str(row["id"]) in results
+    ])
     
-    return {"success": True, "scores": results, "count": len(results)}
+    log_execution(
+        worker_id="SCORER",
+        action="opportunity.bulk_score",
+        message=f"Bulk scored {len(results)} of {len(rows)} opportunities",
+        level="warn" if errors else "info",
+        output_data={"scored": len(results), "candidates": len(rows), "model_id": model_id, "errors": errors[:5]}
+    )
+    
+    return {"success": not errors, "scores": results, "count": len(results), "errors": errors}
 
 
 def get_top_opportunities(
@@ -476,6 +624,9 @@ def get_top_opportunities(
     """
     Get highest-scored opportunities.
     
+    Served from the in-process rank index (core.opportunity_rank_index);
+    falls back to an ORDER BY query when the index can't be loaded.
+    
     Args:
         limit: Maximum results
         min_score: Minimum confidence score
@@ -485,6 +636,12 @@ def get_top_opportunities(
     Returns:
         List of top opportunities sorted by score
     """
+    index = get_opportunity_rank_index()
+    if index.ensure_fresh():
+        rows = index.top(limit=limit, min_score=min_score, status=status, opportunity_type=opportunity_type)
+        if rows is not None:
+            return rows
+    
     conditions = ["confidence_score >= $1", "status = $2"]
     params = [min_score, status]
     param_idx = 3
@@ -552,7 +709,8 @@ def check_duplicate(
     description: str,
     external_id: Optional[str] = None,
     customer_name: Optional[str] = None,
-    time_window_days: int = 30
+    time_window_days: int = 30,
+    dedup_index: Optional[OpportunityDedupIndex] = None
 ) -> Dict[str, Any]:
     """
     Check if an opportunity is a duplicate of an existing one.
@@ -564,10 +722,14 @@ def check_duplicate(
         external_id: External reference (strongest match signal)
         customer_name: Customer name
         time_window_days: Only check recent opportunities
+        dedup_index: Answer from a loaded OpportunityDedupIndex instead of querying
         
     Returns:
         Dict with is_duplicate flag and matching opportunity if found
     """
+    if dedup_index is not None:
+        return dedup_index.check(opportunity_type, category, description, external_id, customer_name)
+    
     # First check by external_id (exact match)
     if external_id:
         result = query_db(
@@ -697,6 +859,115 @@ def identify_opportunity_with_dedup(
     return result
 
 
+def identify_opportunities_with_dedup(
+    opportunities: List[Dict[str, Any]],
+    created_by: str = "SCANNER",
+    source_description: Optional[str] = None,
+    time_window_days: int = 30,
+    dedup_index: Optional[OpportunityDedupIndex] = None
+) -> Dict[str, Any]:
+    """
+    Ingest a batch of scanned opportunities with duplicate detection.
+    
+    The dedup index is loaded once for the batch (one query), every candidate
+    is checked in memory (also against earlier candidates in the same batch),
+    and the non-duplicates are created with one multi-row INSERT.
+    
+    Args:
+        opportunities: Dicts with identify_opportunity's arguments
+            (opportunity_type, category, description, external_id, ...)
+        created_by: Who/what identified these opportunities
+        source_description: Default source reference for items without one
+        time_window_days: Dedup window
+        dedup_index: Already-loaded index to reuse (default: load one)
+        
+    Returns:
+        Dict with created opportunity IDs and duplicate counts
+    """
+    if dedup_index is None:
+        dedup_index = load_dedup_index(time_window_days)
+    
+    new_rows: List[Dict[str, Any]] = []
+    duplicates: List[Dict[str, Any]] = []
+    for opp in opportunities:
+        dup_check = dedup_index.check(
+            opp["opportunity_type"], opp["category"], opp["description"],
+            opp.get("external_id"), opp.get("customer_name")
+        )
+        if dup_check["is_duplicate"]:
+            duplicates.append({
+                "description": opp["description"][:100],
+                "matching_opportunity_id": dup_check["matching_opportunity"]["id"],
+                "match_type": dup_check["match_type"]
+            })
+            continue
+        
+        row = {
+            "id": str(uuid4()),
+            "source_id": opp.get("source_id"),
+            "external_id": opp.get("external_id"),
+            "opportunity_type": opp["opportunity_type"],
+            "category": opp["category"],
+            "estimated_value": opp.get("estimated_value", 0),
+            "customer_name": opp.get("customer_name"),
+            "customer_contact": opp.get("customer_contact") or {},
+            "description": opp["description"],
+            "metadata": {**(opp.get("metadata") or {}), "fingerprint": dup_check["fingerprint"]},
+            "source_description": opp.get("source_description") or source_description,
+            "fingerprint": dup_check["fingerprint"],
+        }
+        new_rows.append(row)
+        # Later candidates in this batch dedup against this one
+        dedup_index.add(row)
+    
+    if new_rows:
+        values = ",\n".join(
+            "({id}, {source_id}, {external_id}, {opportunity_type}, {category}, {estimated_value}, "
+            "0.5, 'new', 'identified', {customer_name}, {customer_contact}, {description}, "
+            "{metadata}, {created_by}, {source_description})".format(
+                created_by=escape_sql_value(created_by),
+                **{k: escape_sql_value(v) for k, v in row.items() if k != "fingerprint"}
+            )
+            for row in new_rows
+        )
+        result = query_db(f"""
+            INSERT INTO opportunities (
+                id, source_id, external_id, opportunity_type, category,
+                estimated_value, confidence_score, status, stage,
+                customer_name, customer_contact, description, metadata, created_by,
+                source_description
+            ) VALUES {values}
+            RETURNING id
+        """)
+        if len(result.get("rows") or []) != len(new_rows):
+            return {"success": False, "error": "Failed to create opportunity records"}
+        
+        get_opportunity_rank_index().upsert_many([
+            {**row, "confidence_score": 0.5, "status": "new", "stage": "identified",
+             "created_at": datetime.utcnow().isoformat()}
+            for row in new_rows
+        ])
+    
+    log_execution(
+        worker_id=created_by,
+        action="opportunity.identify_batch",
+        message=f"Identified {len(new_rows)} opportunities ({len(duplicates)} duplicates skipped)",
+        output_data={
+            "created": len(new_rows),
+            "duplicates": len(duplicates),
+            "match_types": sorted({d["match_type"] for d in duplicates})
+        }
+    )
+    
+    return {
+        "success": True,
+        "opportunity_ids": [row["id"] for row in new_rows],
+        "opportunities_found": len(new_rows),
+        "duplicates_skipped": len(duplicates),
+        "duplicates": duplicates
+    }
+
+
 # =============================================================================
 # SCAN SCHEDULING
 # =============================================================================
@@ -817,12 +1088,21 @@ def scan_servicetitan_opportunities(
     )
     
     # Placeholder for actual ServiceTitan API integration
-    # Each target would query the API and create opportunities
+    # Each target would query the API and collect opportunities
+    
+    opportunity_ids = []
+    if opportunities:
+        ingested = identify_opportunities_with_dedup(
+            opportunities,
+            source_description=build_opportunity_source("servicetitan", "servicetitan_api", scan_id)
+        )
+        opportunity_ids = ingested.get("opportunity_ids", [])
+        duplicates = ingested.get("duplicates_skipped", 0)
     
     return {
         "success": True,
         "scan_id": scan_id,
-        "opportunities_found": len(opportunities),
+        "opportunities_found": len(opportunity_ids),
         "duplicates_skipped": duplicates,
         "targets_scanned": scan_targets
     }
@@ -855,10 +1135,21 @@ def scan_angi_leads(
     # Would integrate with Angi MCP tool
     # angi:angi_get_leads with status filters
     
+    opportunity_ids = []
+    duplicates = 0
+    if opportunities:
+        ingested = identify_opportunities_with_dedup(
+            opportunities,
+            source_description=build_opportunity_source("angi", "angi_leads", scan_id)
+        )
+        opportunity_ids = ingested.get("opportunity_ids", [])
+        duplicates = ingested.get("duplicates_skipped", 0)
+    
     return {
         "success": True,
         "scan_id": scan_id,
-        "opportunities_found": len(opportunities)
+        "opportunities_found": len(opportunity_ids),
+        "duplicates_skipped": duplicates
     }
 
 
@@ -909,6 +1200,7 @@ __all__ = [
     # Opportunity Identification
     "identify_opportunity",
     "identify_opportunity_with_dedup",
+    "identify_opportunities_with_dedup",
     
     # Scoring
     "score_opportunity",
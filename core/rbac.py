@@ -542,6 +542,8 @@ def check_permission(
     action: str,
     resource: Optional[str] = None,
     context: Optional[Dict[str, Any]] = None,
+    worker_info: Optional[Dict[str, Any]] = None,
+    role_info: Optional[Dict[str, Any]] = None,
 ) -> PermissionResult:
     """
     Check if a worker has permission to perform an action.
@@ -558,14 +560,16 @@ def check_permission(
         action: Action being requested (e.g., "task.execute", "database.write")
         resource: Optional resource being accessed
         context: Optional additional context for logging
+        worker_info: Prefetched worker_registry row (skips the lookup query)
+        role_info: Prefetched roles row (skips the role lookup query)
 
     Returns:
         PermissionResult with allowed status and reason
     """
     checked_at = datetime.now(timezone.utc).isoformat()
 
-    # Get worker info
-    worker = get_worker_info(worker_id)
+    # Get worker info (prefetched by task preflight when available)
+    worker = worker_info if worker_info is not None else get_worker_info(worker_id)
     if not worker:
         reason = f"Worker '{worker_id}' not found in registry"
         log_access_attempt(
@@ -613,7 +617,10 @@ def check_permission(
     role_name = worker.get("role_name")
 
     # Get role permissions
-    role = get_role_permissions(role_name) if role_name else None
+    if role_info is not None:
+        role = role_info
+    else:
+        role = get_role_permissions(role_name) if role_name else None
 
     # Combine worker-level and role-level permissions (robust parsing)
     worker_permissions = _normalize_str_list(worker.get("permissions"))
@@ -0,0 +1,246 @@
+"""
+Schema Registry - In-process view of the database schema
+
+Runtime code used to probe ``information_schema`` on hot paths (column lists
+before an INSERT, "does this table exist" before every write) and re-ran
+``CREATE TABLE IF NOT EXISTS`` / ``ALTER TABLE ... ADD COLUMN IF NOT EXISTS``
+batches on every cycle. This module replaces both:
+
+- Every public table's columns, indexes and every enum's values are loaded
+  with one query on first use and answered from memory afterwards.
+- Ensure-schema steps are stamped with a (name, version) pair and run at most
+  once per process. A step whose expected tables, columns and indexes already
+  exist is marked done without issuing any DDL at all. Bump the version when
+  a step's DDL changes.
+- After DDL runs (mark_ensured) the snapshot is marked stale and reloaded
+  with one query on the next lookup.
+
+Lookups return None when the schema cannot be loaded, so callers keep their
+previous SQL path as a fallback.
+
+Usage:
+    from core.schema_registry import get_schema_registry
+
+    registry = get_schema_registry()
+    if registry.has_column("revenue_ideas", "score"):
+        ...
+
+    expected = {"resource_locks": ["id", "status"]}
+    if not registry.is_ensured("conflict_tables", 1, columns=expected):
+        run_ddl()
+        registry.mark_ensured("conflict_tables", 1, columns=expected)
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between attempts after a failed load
+RETRY_INTERVAL_SECONDS = 60.0
+
+SCHEMA_SQL = """
+    SELECT 'column' AS kind, table_name AS owner, column_name AS name, ordinal_position::float AS pos
+    FROM information_schema.columns
+    WHERE table_schema = 'public'
+    UNION ALL
+    SELECT 'index', tablename, indexname, 0
+    FROM pg_indexes
+    WHERE schemaname = 'public'
+    UNION ALL
+    SELECT 'enum', t.typname, e.enumlabel, e.enumsortorder::float
+    FROM pg_type t
+    JOIN pg_enum e ON e.enumtypid = t.oid
+    JOIN pg_namespace n ON n.oid = t.typnamespace
+    WHERE n.nspname = 'public'
+    ORDER BY 1, 2, 4
+"""
+
+
+class SchemaRegistry:
+    """Thread-safe snapshot of tables, columns, indexes and enum values."""
+
+    def __init__(self, query_fn: Optional[Callable[[str], Dict[str, Any]]] = None):
+        if query_fn is None:
+            from .database import query_db as query_fn
+        self._query = query_fn
+        self._lock = threading.RLock()
+        self._columns: Dict[str, List[str]] = {}
+        self._indexes: Set[str] = set()
+        self._enums: Dict[str, List[str]] = {}
+        self._loaded = False
+        self._stale = True
+        self._last_attempt = float("-inf")
+        self._ensured: Dict[str, Any] = {}
+        self.loads = 0
+
+    # ------------------------------------------------------------------ #
+    # Loading
+    # ------------------------------------------------------------------ #
+
+    def load(self) -> None:
+        """Reload the whole schema with one query."""
+        rows = self._query(SCHEMA_SQL).get("rows", []) or []
+        columns: Dict[str, List[str]] = {}
+        indexes: Set[str] = set()
+        enums: Dict[str, List[str]] = {}
+        for row in rows:
+            kind, owner, name = row.get("kind"), str(row.get("owner") or ""), str(row.get("name") or "")
+            if kind == "column":
+                columns.setdefault(owner, []).append(name)
+            elif kind == "index":
+                indexes.add(name)
+            elif kind == "enum":
+                enums.setdefault(owner, []).append(name)
+        with self._lock:
+            self._columns, self._indexes, self._enums = columns, indexes, enums
+            self._loaded = True
+            self._stale = False
+            self.loads += 1
+
+    def ensure_loaded(self) -> bool:
+        """Load on first use (or after invalidate()); True when lookups can be served."""
+        with self._lock:
+            if not self._stale:
+                return self._loaded
+            if self._loaded is False and time.monotonic() - self._last_attempt < RETRY_INTERVAL_SECONDS:
+                return False
+            self._last_attempt = time.monotonic()
+            try:
+                self.load()
+            except Exception as e:
+                logger.warning("Schema registry load failed: %s", e)
+                # Keep serving the previous snapshot if there is one
+                self._stale = not self._loaded
+            return self._loaded
+
+    def invalidate(self) -> None:
+        """Mark the snapshot stale; the next lookup reloads it."""
+        with self._lock:
+            self._stale = True
+            self._last_attempt = float("-inf")
+
+    # ------------------------------------------------------------------ #
+    # Lookups
+    # ------------------------------------------------------------------ #
+
+    def columns(self, table: str) -> Optional[Set[str]]:
+        """Column names of ``table`` (empty if it doesn't exist), or None if unknown."""
+        if not self.ensure_loaded():
+            return None
+        with self._lock:
+            return set(self._columns.get(table, ()))
+
+    def has_table(self, table: str) -> Optional[bool]:
+        if not self.ensure_loaded():
+            return None
+        with self._lock:
+            return table in self._columns
+
+    def has_column(self, table: str, column: str) -> Optional[bool]:
+        if not self.ensure_loaded():
+            return None
+        with self._lock:
+            return column in self._columns.get(table, ())
+
+    def has_index(self, index: str) -> Optional[bool]:
+        if not self.ensure_loaded():
+            return None
+        with self._lock:
+            return index in self._indexes
+
+    def enum_values(self, type_name: str) -> Optional[List[str]]:
+        """Labels of an enum type in sort order (empty if no such type), or None if unknown."""
+        if not self.ensure_loaded():
+            return None
+        with self._lock:
+            return list(self._enums.get(type_name, ()))
+
+    # ------------------------------------------------------------------ #
+    # Ensure-schema stamps
+    # ------------------------------------------------------------------ #
+
+    def is_ensured(
+        self,
+        name: str,
+        version: Any,
+        columns: Optional[Dict[str, Iterable[str]]] = None,
+        indexes: Iterable[str] = (),
+    ) -> bool:
+        """
+        Whether the ensure step ``name`` can be skipped.
+
+        True once mark_ensured(name, version) has run in this process, or when
+        ``columns`` is given and every listed table, column and index already
+        exists (the step is then stamped without running).
+        """
+        with self._lock:
+            if self._ensured.get(name) == version:
+                return True
+        if columns is None or not self.ensure_loaded():
+            return False
+        with self._lock:
+            present = all(
+                table in self._columns and set(cols) <= set(self._columns[table])
+                for table, cols in columns.items()
+            ) and set(indexes) <= self._indexes
+            if present:
+                self._ensured[name] = version
+            return present
+
+    def mark_ensured(
+        self,
+        name: str,
+        version: Any,
+        columns: Optional[Dict[str, Iterable[str]]] = None,
+        indexes: Iterable[str] = (),
+    ) -> bool:
+        """
+        Stamp an ensure step as done for this process after its DDL ran.
+
+        With ``columns`` (for steps that swallow their own errors) the stamp is
+        only set once a reload confirms everything exists, so a failed step is
+        retried on the next call.
+        """
+        self.invalidate()
+        if columns is not None:
+            return self.is_ensured(name, version, columns=columns, indexes=indexes)
+        with self._lock:
+            self._ensured[name] = version
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tables": len(self._columns),
+                "indexes": len(self._indexes),
+                "enums": len(self._enums),
+                "loaded": self._loaded,
+                "loads": self.loads,
+                "ensured": dict(self._ensured),
+            }
+
+
+_registry: Optional[SchemaRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_schema_registry(query_fn: Optional[Callable[[str], Dict[str, Any]]] = None) -> SchemaRegistry:
+    """Process-wide SchemaRegistry singleton.
+
+    ``query_fn`` is only used when the singleton is first created.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = SchemaRegistry(query_fn)
+    return _registry
+
+
+__all__ = [
+    "SchemaRegistry",
+    "get_schema_registry",
+]
@@ -12,6 +12,7 @@ This is what separates L3 (retry failures) from L4 (fix root causes).
 
 import json
 import re
+import threading
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
@@ -19,6 +20,20 @@ from dataclasses import dataclass
 from .database import query_db, log_execution
 
 
+# Learnings fetched per round-trip while catching up on new failures
+DETECTION_BATCH_SIZE = 1000
+
+# Distinct pattern keys kept in the running state (least recently seen evicted first)
+MAX_TRACKED_PATTERNS = 2000
+
+# system_config key holding the persisted detection state
+PATTERN_STATE_KEY = "self_improvement.pattern_state"
+
+# Process-wide copy of the detection state; engines are created per cycle
+_pattern_state: Optional[Dict] = None
+_pattern_state_lock = threading.Lock()
+
+
 @dataclass
 class FailurePattern:
     """Represents a detected failure pattern."""
@@ -44,6 +59,7 @@ class SelfImprovementEngine:
     def __init__(self, min_occurrences: int = 3):
         self.min_occurrences = min_occurrences
         self.pattern_matchers = self._build_pattern_matchers()
+        self._combined_matcher = self._compile_matchers(self.pattern_matchers)
     
     def _build_pattern_matchers(self) -> List[Dict]:
         """
@@ -138,45 +154,61 @@ class SelfImprovementEngine:
             }
         ]
     
-    def detect_patterns(self) -> List[FailurePattern]:
+    @staticmethod
+    def _compile_matchers(matchers: List[Dict]) -> "re.Pattern":
         """
-        Detect repeating failure patterns from learnings table.
+        Compile all matchers into one regex.
         
-        Returns patterns that have occurred 3+ times and haven't been fixed.
+        Alternatives are anchored lookaheads tried in list order, so the first
+        matcher that matches anywhere in the text wins (same priority as
+        checking them one by one). The empty named group after each lookahead
+        records which matcher it was.
         """
-        sql = """
-        SELECT 
-            id,
-            category,
-            summary,
-            details,
-            applied_count,
-            created_at
-        FROM learnings
-        WHERE category = 'failure_pattern'
-        ORDER BY created_at DESC
-        LIMIT 1000
+        alternatives = [
+            f"(?=.*?(?:{matcher['regex']}))(?P<m{i}>)"
+            for i, matcher in enumerate(matchers)
+        ]
+        return re.compile("^(?:" + "|".join(alternatives) + ")", re.IGNORECASE | re.DOTALL)
+    
+    def _match_matcher(self, text: str) -> Optional[Dict]:
+        """Return the first pattern matcher that matches text, if any."""
+        match = self._combined_matcher.match(text or "")
+        if match is None or not match.lastgroup:
+            return None
+        return self.pattern_matchers[int(match.lastgroup[1:])]
+    
+    def detect_patterns(self) -> List[FailurePattern]:
         """
+        Detect repeating failure patterns from learnings table.
         
+        Only failure learnings newer than the persisted high-water mark are
+        loaded and folded into per-pattern running counts, so each cycle costs
+        proportional to the new failures rather than the whole history.
+        
+        Returns patterns that have occurred 3+ times since their last fix task
+        (or ever, if never fixed), so a failure that keeps recurring after a
+        fix is reported again.
+        """
         try:
-            result = query_db(sql)
-            learnings = result.get("rows", [])
+            state = self._load_state()
+            new_learnings = 0
+            while True:
+                learnings = self._fetch_new_failures(state["hwm"])
+                for learning in learnings:
+                    self._record_failure(state, learning)
+                new_learnings += len(learnings)
+                if len(learnings) < DETECTION_BATCH_SIZE:
+                    break
             
-            # Group by similar summaries
-            pattern_groups = self._group_similar_patterns(learnings)
+            if new_learnings:
+                self._save_state(state)
             
-            # Filter for patterns with 3+ occurrences and applied_count=0
-            actionable_patterns = []
-            for pattern_key, group in pattern_groups.items():
-                if len(group) >= self.min_occurrences:
-                    # Check if any in group have been applied
-                    total_applied = sum(entry.get("applied_count", 0) for entry in group)
-                    
-                    if total_applied == 0:  # Not yet fixed
-                        pattern = self._create_pattern_from_group(group)
-                        actionable_patterns.append(pattern)
-            
-            return actionable_patterns
+            # Filter for patterns with 3+ occurrences since they were last applied
+            return [
+                self._pattern_from_group(group)
+                for group in state["groups"].values()
+                if group["count"] - group.get("applied_at_count", 0) >= self.min_occurrences
+            ]
             
         except Exception as e:
             log_execution(
@@ -187,25 +219,61 @@ class SelfImprovementEngine:
             )
             return []
     
-    def _group_similar_patterns(self, learnings: List[Dict]) -> Dict[str, List[Dict]]:
-        """
-        Group learnings by similar failure patterns.
-        
-        Uses fuzzy matching on summaries to group related failures.
+    def _fetch_new_failures(self, hwm: Optional[Dict]) -> List[Dict]:
+        """Load the next batch of failure learnings after the high-water mark."""
+        after = ""
+        params = []
+        if hwm:
+            after = "AND (created_at, id::text) > ($1::timestamptz, $2)"
+            params = [hwm["created_at"], hwm["id"]]
+        sql = f"""
+        SELECT 
+            id,
+            category,
+            summary,
+            details,
+            applied_count,
+            created_at
+        FROM learnings
+        WHERE category = 'failure_pattern'
+          {after}
+        ORDER BY created_at ASC, id::text ASC
+        LIMIT {DETECTION_BATCH_SIZE}
         """
-        groups = {}
-        
-        for learning in learnings:
-            summary = learning.get("summary", "")
-            
-            # Extract key terms for grouping
-            key = self._extract_pattern_key(summary)
-            
-            if key not in groups:
-                groups[key] = []
-            groups[key].append(learning)
-        
-        return groups
+        result = query_db(sql, params or None)
+        return result.get("rows", [])
+    
+    def _record_failure(self, state: Dict, learning: Dict) -> None:
+        """Fold one failure learning into the running per-pattern counts."""
+        groups = state["groups"]
+        key = self._extract_pattern_key(learning.get("summary", ""))
+        created_at = learning.get("created_at") or datetime.now(timezone.utc).isoformat()
+        
+        # Re-insert so dict order stays least-recently-seen first
+        group = groups.pop(key, None) or {
+            "count": 0,
+            "applied": 0,
+            "applied_at_count": 0,
+            "category": learning.get("category", ""),
+            "first_seen": created_at,
+        }
+        group["count"] += 1
+        applied = learning.get("applied_count", 0) or 0
+        if applied:
+            # A fix was already made for this occurrence; count recurrences from here
+            group["applied"] += applied
+            group["applied_at_count"] = group["count"]
+        # Latest occurrence represents the pattern (as when scanning newest first)
+        group["pattern_id"] = learning.get("id", "")
+        group["summary"] = learning.get("summary", "")
+        group["example_context"] = learning.get("details") or {}
+        group["last_seen"] = created_at
+        groups[key] = group
+        
+        while len(groups) > MAX_TRACKED_PATTERNS:
+            del groups[next(iter(groups))]
+        
+        state["hwm"] = {"created_at": str(created_at), "id": str(learning.get("id", ""))}
     
     def _extract_pattern_key(self, summary: str) -> str:
         """
@@ -218,31 +286,81 @@ class SelfImprovementEngine:
         """
         summary_lower = summary.lower()
         
-        # Try each pattern matcher
-        for matcher in self.pattern_matchers:
-            if re.search(matcher["regex"], summary_lower, re.IGNORECASE):
-                return matcher["name"]
+        matcher = self._match_matcher(summary_lower)
+        if matcher:
+            return matcher["name"]
         
         # Fallback: use first 3 significant words
         words = re.findall(r'\b\w{4,}\b', summary_lower)
         return "_".join(words[:3]) if words else "unknown_pattern"
     
-    def _create_pattern_from_group(self, group: List[Dict]) -> FailurePattern:
-        """Create a FailurePattern from a group of similar learnings."""
-        first = group[0]
-        last = group[-1]
-        
+    def _pattern_from_group(self, group: Dict) -> FailurePattern:
+        """Create a FailurePattern from a pattern's running state."""
         return FailurePattern(
-            pattern_id=first.get("id", ""),
-            category=first.get("category", ""),
-            summary=first.get("summary", ""),
-            occurrence_count=len(group),
-            applied_count=sum(entry.get("applied_count", 0) for entry in group),
-            first_seen=datetime.fromisoformat(last.get("created_at", datetime.now(timezone.utc).isoformat())),
-            last_seen=datetime.fromisoformat(first.get("created_at", datetime.now(timezone.utc).isoformat())),
-            example_context=first.get("details", {})
+            pattern_id=group.get("pattern_id", ""),
+            category=group.get("category", ""),
+            summary=group.get("summary", ""),
+            occurrence_count=group["count"],
+            applied_count=group["applied"],
+            first_seen=datetime.fromisoformat(str(group["first_seen"])),
+            last_seen=datetime.fromisoformat(str(group["last_seen"])),
+            example_context=group.get("example_context", {})
         )
     
+    def _load_state(self) -> Dict:
+        """Return the detection state, loading it from system_config once per process."""
+        global _pattern_state
+        with _pattern_state_lock:
+            if _pattern_state is None:
+                state = None
+                try:
+                    result = query_db(
+                        "SELECT value FROM system_config WHERE key = $1",
+                        [PATTERN_STATE_KEY]
+                    )
+                    rows = result.get("rows", [])
+                    if rows:
+                        value = rows[0].get("value")
+                        state = json.loads(value) if isinstance(value, str) else value
+                except Exception as e:
+                    log_execution(
+                        worker_id="SELF_IMPROVEMENT",
+                        action="pattern_state.load_error",
+                        message=f"Failed to load pattern state, rescanning: {e}",
+                        level="warning"
+                    )
+                if not isinstance(state, dict) or "groups" not in state:
+                    state = {"hwm": None, "groups": {}}
+                for group in state["groups"].values():
+                    # State saved before applied_at_count was tracked
+                    if "applied_at_count" not in group:
+                        group["applied_at_count"] = group["count"] if group.get("applied") else 0
+                _pattern_state = state
+            return _pattern_state
+    
+    def _save_state(self, state: Dict) -> None:
+        """Persist the detection state so restarts resume from the high-water mark."""
+        sql = """
+        INSERT INTO system_config (key, value, description, updated_at)
+        VALUES ($1, $2::jsonb, $3, NOW())
+        ON CONFLICT (key) DO UPDATE SET
+            value = EXCLUDED.value,
+            updated_at = NOW()
+        """
+        try:
+            query_db(sql, [
+                PATTERN_STATE_KEY,
+                json.dumps(state, default=str),
+                "Self-improvement failure pattern counts and high-water mark"
+            ])
+        except Exception as e:
+            log_execution(
+                worker_id="SELF_IMPROVEMENT",
+                action="pattern_state.save_error",
+                message=f"Failed to save pattern state: {e}",
+                level="warning"
+            )
+    
     def generate_fix_task(self, pattern: FailurePattern) -> Optional[Dict]:
         """
         Generate a fix task for a detected pattern.
@@ -250,11 +368,7 @@ class SelfImprovementEngine:
         Returns task dict ready to insert into governance_tasks.
         """
         # Find matching pattern matcher
-        matcher = None
-        for m in self.pattern_matchers:
-            if re.search(m["regex"], pattern.summary, re.IGNORECASE):
-                matcher = m
-                break
+        matcher = self._match_matcher(pattern.summary)
         
         if not matcher:
             # Generic fix task
@@ -477,7 +591,8 @@ Recurring {matcher['category']} issue detected ({pattern.occurrence_count} occur
         """
         Mark a pattern as applied (fix task created).
         
-        Increments applied_count to prevent duplicate fix tasks.
+        Increments applied_count and records the pattern's count at this point;
+        the pattern is reported again once min_occurrences more failures arrive.
         """
         sql = """
         UPDATE learnings
@@ -487,6 +602,12 @@ Recurring {matcher['category']} issue detected ({pattern.occurrence_count} occur
         
         try:
             query_db(sql, [pattern_id])
+            state = self._load_state()
+            for group in state["groups"].values():
+                if group.get("pattern_id") == pattern_id:
+                    group["applied"] += 1
+                    group["applied_at_count"] = group["count"]
+            self._save_state(state)
             return True
         except Exception as e:
             log_execution(
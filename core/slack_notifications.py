@@ -6,6 +6,11 @@ Sends alerts and notifications to Slack channels via:
 2. Slack Web API with bot tokens (SLACK_BOT_TOKEN + WAR_ROOM_CHANNEL)
 
 Supports the L5 executive alerting capability.
+
+Alerts are delivered through the outbound notification queue
+(core.notification_queue): the send functions return as soon as the alert
+is queued, identical alerts are coalesced and rate limited, and low-priority
+alerts are grouped into a periodic digest.
 """
 
 import json
@@ -15,6 +20,8 @@ from typing import Any, Optional
 from urllib.error import HTTPError, URLError
 from urllib.request import Request, urlopen
 
+from core.notification_queue import get_notification_queue, render_slack_digest
+
 # Constants
 DEFAULT_TIMEOUT_SECONDS: int = 10
 SLACK_WEBHOOK_ENV_VAR: str = "SLACK_WEBHOOK_URL"
@@ -23,6 +30,9 @@ WAR_ROOM_CHANNEL_ENV_VAR: str = "WAR_ROOM_CHANNEL"
 DEFAULT_CHANNEL: str = "#war-room"
 MAX_MESSAGE_LENGTH: int = 4000
 SLACK_API_URL: str = "https://slack.com/api/chat.postMessage"
+QUEUE_CHANNEL: str = "slack"
+RATE_PER_MINUTE: int = 60
+BURST: int = 10
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -80,10 +90,11 @@ def send_alert(
     channel: Optional[str] = None,
     username: str = "JUGGERNAUT",
     icon_emoji: str = ":robot_face:",
-    priority: str = "normal"
+    priority: str = "normal",
+    dedup_key: Optional[str] = None
 ) -> bool:
     """
-    Send an alert message to Slack.
+    Queue an alert message for Slack.
     
     Uses webhook if SLACK_WEBHOOK_URL is set, otherwise uses
     SLACK_BOT_TOKEN with the Slack Web API.
@@ -94,11 +105,12 @@ def send_alert(
         username: Display name for the bot.
         icon_emoji: Emoji icon for the message.
         priority: Alert priority level (critical, high, normal, low).
+        dedup_key: Alerts with the same key are coalesced (default: same content).
     
     Returns:
-        True if the message was sent successfully, False otherwise.
+        True if the message was queued, False otherwise.
     """
-    webhook_url, bot_token, default_channel = _get_slack_config()
+    webhook_url, bot_token, _ = _get_slack_config()
     
     if not webhook_url and not bot_token:
         logger.warning(
@@ -120,25 +132,14 @@ def send_alert(
     # Format message with priority prefix
     formatted_message = _format_message_with_priority(message, priority)
     
-    target_channel = channel or default_channel
-    
-    if webhook_url:
-        payload: dict[str, Any] = {
-            "text": formatted_message,
-            "username": username,
-            "icon_emoji": icon_emoji,
-        }
-        if channel:
-            payload["channel"] = channel
-        return _send_webhook_request(webhook_url, payload)
-    else:
-        return _send_bot_message(
-            bot_token,  # type: ignore
-            target_channel,
-            formatted_message,
-            username,
-            icon_emoji
-        )
+    payload: dict[str, Any] = {
+        "text": formatted_message,
+        "username": username,
+        "icon_emoji": icon_emoji,
+    }
+    if channel:
+        payload["channel"] = channel
+    return _enqueue(payload, priority, dedup_key)
 
 
 def send_structured_alert(
@@ -146,10 +147,11 @@ def send_structured_alert(
     fields: dict[str, str],
     color: str = "#36a64f",
     channel: Optional[str] = None,
-    priority: str = "normal"
+    priority: str = "normal",
+    dedup_key: Optional[str] = None
 ) -> bool:
     """
-    Send a structured alert with attachments to Slack.
+    Queue a structured alert with attachments for Slack.
     
     Args:
         title: Alert title.
@@ -157,11 +159,12 @@ def send_structured_alert(
         color: Sidebar color (hex code or slack color name).
         channel: Target channel.
         priority: Alert priority level.
+        dedup_key: Alerts with the same key are coalesced (default: same content).
     
     Returns:
-        True if sent successfully, False otherwise.
+        True if queued, False otherwise.
     """
-    webhook_url, bot_token, default_channel = _get_slack_config()
+    webhook_url, bot_token, _ = _get_slack_config()
     
     if not webhook_url and not bot_token:
         logger.warning(
@@ -180,8 +183,6 @@ def send_structured_alert(
         for key, value in fields.items()
     ]
     
-    target_channel = channel or default_channel
-    
     attachments = [
         {
             "fallback": title,
@@ -191,21 +192,14 @@ def send_structured_alert(
         }
     ]
     
-    if webhook_url:
-        payload: dict[str, Any] = {
-            "attachments": attachments,
-            "username": "JUGGERNAUT",
-            "icon_emoji": ":robot_face:",
-        }
-        if channel:
-            payload["channel"] = channel
-        return _send_webhook_request(webhook_url, payload)
-    else:
-        return _send_bot_message_with_attachments(
-            bot_token,  # type: ignore
-            target_channel,
-            attachments
-        )
+    payload: dict[str, Any] = {
+        "attachments": attachments,
+        "username": "JUGGERNAUT",
+        "icon_emoji": ":robot_face:",
+    }
+    if channel:
+        payload["channel"] = channel
+    return _enqueue(payload, priority, dedup_key)
 
 
 def send_system_alert(
@@ -215,7 +209,10 @@ def send_system_alert(
     details: Optional[dict[str, Any]] = None
 ) -> bool:
     """
-    Send a system-level alert for monitoring purposes.
+    Queue a system-level alert for monitoring purposes.
+    
+    Repeats of the same alert type, component and message are coalesced
+    even when their details differ (e.g. detection timestamps).
     
     Args:
         alert_type: Type of alert (error, warning, info, success).
@@ -224,7 +221,7 @@ def send_system_alert(
         details: Additional details to include.
     
     Returns:
-        True if sent successfully, False otherwise.
+        True if queued, False otherwise.
     """
     emoji_map = {
         "error": ":red_circle:",
@@ -260,10 +257,41 @@ def send_system_alert(
         fields=fields,
         color=color,
         channel=None,  # Uses default war-room
-        priority=_alert_type_to_priority(alert_type)
+        priority=_alert_type_to_priority(alert_type),
+        dedup_key=f"system:{alert_type}:{component}:{message}"
     )
 
 
+def deliver(payload: dict[str, Any]) -> bool:
+    """
+    Post a queued payload to Slack (the queue's send function).
+    
+    Configuration is resolved at delivery time, so retries picked up from
+    the outbox use the current webhook or bot token.
+    
+    Args:
+        payload: Slack message payload.
+    
+    Returns:
+        True if Slack accepted the message, False otherwise.
+    """
+    webhook_url, bot_token, default_channel = _get_slack_config()
+    if webhook_url:
+        return _send_webhook_request(webhook_url, payload)
+    if bot_token:
+        return _send_slack_api_request(bot_token, {"channel": default_channel, **payload})
+    logger.warning("Slack configuration removed; cannot deliver queued alert")
+    return False
+
+
+def _enqueue(payload: dict[str, Any], priority: str, dedup_key: Optional[str]) -> bool:
+    """Hand a payload to the notification queue."""
+    queue = get_notification_queue()
+    queue.register_channel(QUEUE_CHANNEL, deliver, rate_per_minute=RATE_PER_MINUTE, burst=BURST,
+                           render_digest=render_slack_digest)
+    return queue.enqueue(QUEUE_CHANNEL, payload, priority=priority, key=dedup_key)
+
+
 def _format_message_with_priority(message: str, priority: str) -> str:
     """
     Format message with priority indicator.
@@ -368,62 +396,6 @@ def _send_webhook_request(webhook_url: str, payload: dict[str, Any]) -> bool:
         return False
 
 
-def _send_bot_message(
-    bot_token: str,
-    channel: str,
-    text: str,
-    username: str = "JUGGERNAUT",
-    icon_emoji: str = ":robot_face:"
-) -> bool:
-    """
-    Send message using Slack Web API with bot token.
-    
-    Args:
-        bot_token: Slack bot OAuth token.
-        channel: Channel ID or name.
-        text: Message text.
-        username: Display name.
-        icon_emoji: Emoji icon.
-    
-    Returns:
-        True if sent successfully, False otherwise.
-    """
-    payload = {
-        "channel": channel,
-        "text": text,
-        "username": username,
-        "icon_emoji": icon_emoji,
-    }
-    
-    return _send_slack_api_request(bot_token, payload)
-
-
-def _send_bot_message_with_attachments(
-    bot_token: str,
-    channel: str,
-    attachments: list[dict[str, Any]]
-) -> bool:
-    """
-    Send message with attachments using Slack Web API.
-    
-    Args:
-        bot_token: Slack bot OAuth token.
-        channel: Channel ID or name.
-        attachments: List of attachment objects.
-    
-    Returns:
-        True if sent successfully, False otherwise.
-    """
-    payload = {
-        "channel": channel,
-        "attachments": attachments,
-        "username": "JUGGERNAUT",
-        "icon_emoji": ":robot_face:",
-    }
-    
-    return _send_slack_api_request(bot_token, payload)
-
-
 def _send_slack_api_request(bot_token: str, payload: dict[str, Any]) -> bool:
     """
     Send request to Slack Web API.
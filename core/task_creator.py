@@ -12,6 +12,7 @@ from typing import Dict, Any, Optional
 from datetime import datetime, timezone
 
 from core.database import fetch_all, execute_sql
+from core.alert_windows import get_alert_windows
 
 logger = logging.getLogger(__name__)
 
@@ -160,6 +161,7 @@ class TaskCreator:
                     datetime.now(timezone.utc).isoformat(),
                     fingerprint_id
                 ))
+                get_alert_windows().mark_task_created(fingerprint_id)
                 
                 logger.info(f"Created task {task_id} for fingerprint {fingerprint_id}")
             
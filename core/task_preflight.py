@@ -0,0 +1,302 @@
+"""
+Task Preflight - Single-round-trip context prefetch for task execution
+
+Before a task runs, execute_task used to ask the database the same kind of
+question several times: approval state, RBAC worker/role rows and monthly
+budget headroom. This module
+loads all of that in ONE combined query and hands the result around as an
+immutable TaskContext.
+
+Round-trips are counted per task so tests (and logs) can assert on them:
+
+    counter = RoundTripCounter()
+    with track_round_trips(counter):
+        ctx = load_task_context(task_id, task_type, worker_id, execute_sql)
+    assert counter.count == 1
+
+Both main.execute_sql and core.database.Database.query report into the
+active counter, so anything executed inside the tracked block is counted.
+"""
+
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Budget row consulted by check_cost_limit
+BUDGET_NAME = "total_monthly"
+
+
+# ============================================================
+# ROUND-TRIP COUNTING
+# ============================================================
+
+class RoundTripCounter:
+    """Thread-safe counter of database round-trips made for one task."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._count = 0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def increment(self) -> None:
+        with self._lock:
+            self._count += 1
+
+    def __repr__(self) -> str:
+        return f"RoundTripCounter(count={self._count})"
+
+
+_active = threading.local()
+
+
+@contextmanager
+def track_round_trips(counter: RoundTripCounter) -> Iterator[RoundTripCounter]:
+    """Attribute every database round-trip on this thread to ``counter``.
+
+    Nested tracking is supported; the innermost counter wins until its block exits.
+    """
+    previous = getattr(_active, "counter", None)
+    _active.counter = counter
+    try:
+        yield counter
+    finally:
+        _active.counter = previous
+
+
+def note_round_trip() -> None:
+    """Record one database round-trip against the active counter (if any)."""
+    counter = getattr(_active, "counter", None)
+    if counter is not None:
+        counter.increment()
+
+
+# ============================================================
+# TASK CONTEXT
+# ============================================================
+
+def _freeze(value: Any) -> Any:
+    """Recursively convert dicts/lists into read-only mappings/tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Inverse of _freeze: plain dicts/lists suitable for JSON or callers that mutate."""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+def _parse_json(value: Any) -> Any:
+    """Neon may return json columns as strings depending on the driver path."""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except (json.JSONDecodeError, ValueError):
+            return None
+    return value
+
+
+@dataclass(frozen=True)
+class TaskContext:
+    """Everything execute_task needs before running a task, loaded in one query.
+
+    Attributes:
+        task_id: Task the context was loaded for.
+        task_type: Task type of the task.
+        worker_id: Worker whose permissions were loaded.
+        task: Read-only governance_tasks row (None if the row was not found).
+        approval_id: Latest approval id for the task, if any.
+        approval_decision: Latest approval decision, if any.
+        worker_info: Read-only worker_registry row (RBAC), if found.
+        role_info: Read-only roles row for the worker's role, if found.
+        budget_limit_cents: Monthly budget limit, None if no budget row exists.
+        budget_spent_cents: Spend so far this month.
+        loaded_at: ISO timestamp of the prefetch.
+        round_trips: Per-task round-trip counter (shared, mutable by design).
+    """
+
+    task_id: str
+    task_type: str
+    worker_id: str
+    task: Optional[Mapping[str, Any]] = None
+    approval_id: Optional[str] = None
+    approval_decision: Optional[str] = None
+    worker_info: Optional[Mapping[str, Any]] = None
+    role_info: Optional[Mapping[str, Any]] = None
+    budget_limit_cents: Optional[int] = None
+    budget_spent_cents: int = 0
+    loaded_at: str = ""
+    round_trips: RoundTripCounter = field(default_factory=RoundTripCounter, compare=False, repr=False)
+
+    def approval_status(self, requires_approval: bool) -> Tuple[bool, Optional[str], Optional[str]]:
+        """Answer check_approval_status() from the prefetched approval row.
+
+        Returns:
+            Tuple of (requires_approval, approval_id_or_none, decision_status)
+        """
+        if not requires_approval:
+            return False, None, "not_required"
+        if not self.approval_id:
+            return True, None, "none"
+        return True, self.approval_id, self.approval_decision
+
+    def check_budget(self, estimated_cost: float) -> Tuple[bool, str]:
+        """Answer check_cost_limit() from the prefetched budget headroom."""
+        if self.budget_limit_cents is None:
+            return True, "Within budget"
+        limit = self.budget_limit_cents
+        spent = self.budget_spent_cents
+        if spent + (estimated_cost * 100) > limit:
+            return False, f"Cost ${estimated_cost} would exceed monthly limit (${spent/100:.2f}/${limit/100:.2f})"
+        return True, "Within budget"
+
+    def worker_info_dict(self) -> Optional[Dict[str, Any]]:
+        return _thaw(self.worker_info) if self.worker_info is not None else None
+
+    def role_info_dict(self) -> Optional[Dict[str, Any]]:
+        return _thaw(self.role_info) if self.role_info is not None else None
+
+
+# ============================================================
+# PREFETCH
+# ============================================================
+
+def build_preflight_sql(
+    task_id: str,
+    task_type: str,
+    worker_id: str,
+    escape: Callable[[Any], str],
+) -> str:
+    """Build the combined preflight query (one row, one JSON column per concern)."""
+    tid = escape(str(task_id))
+    wid = escape(worker_id)
+    return f"""
+        SELECT
+          (SELECT row_to_json(t) FROM (
+              SELECT id, task_type, title, status, priority, requires_approval,
+                     assigned_worker, payload
+              FROM governance_tasks WHERE id::text = {tid}
+          ) t) AS task,
+          (SELECT row_to_json(a) FROM (
+              SELECT id, decision FROM approvals
+              WHERE task_id::text = {tid}
+              ORDER BY created_at DESC LIMIT 1
+          ) a) AS approval,
+          (SELECT row_to_json(w) FROM (
+              SELECT worker_id, role_name, capabilities, permissions,
+                     forbidden_actions, approval_required_for, allowed_task_types, status
+              FROM worker_registry WHERE worker_id = {wid}
+          ) w) AS worker,
+          (SELECT row_to_json(r) FROM (
+              SELECT role_name, permissions, forbidden_actions, allowed_task_types, max_risk_level
+              FROM roles
+              WHERE role_name = (SELECT role_name FROM worker_registry WHERE worker_id = {wid})
+          ) r) AS role,
+          (SELECT row_to_json(b) FROM (
+              SELECT cb.monthly_limit_cents AS limit_cents,
+                     COALESCE(SUM(ce.amount_cents), 0) AS spent_cents
+              FROM cost_budgets cb
+              LEFT JOIN cost_events ce
+                ON ce.occurred_at >= date_trunc('month', CURRENT_DATE)
+              WHERE cb.budget_name = {escape(BUDGET_NAME)}
+              GROUP BY cb.monthly_limit_cents
+          ) b) AS budget
+    """
+
+
+def context_from_row(
+    task_id: str,
+    task_type: str,
+    worker_id: str,
+    row: Mapping[str, Any],
+    counter: Optional[RoundTripCounter] = None,
+) -> TaskContext:
+    """Build a TaskContext from the single row returned by the preflight query."""
+    approval = _parse_json(row.get("approval")) or {}
+    budget = _parse_json(row.get("budget"))
+    limit_cents: Optional[int] = None
+    spent_cents = 0
+    if isinstance(budget, dict) and budget.get("limit_cents") is not None:
+        limit_cents = int(budget.get("limit_cents") or 0)
+        spent_cents = int(budget.get("spent_cents") or 0)
+
+    return TaskContext(
+        task_id=str(task_id),
+        task_type=task_type or "",
+        worker_id=worker_id,
+        task=_freeze(_parse_json(row.get("task"))),
+        approval_id=approval.get("id"),
+        approval_decision=approval.get("decision"),
+        worker_info=_freeze(_parse_json(row.get("worker"))),
+        role_info=_freeze(_parse_json(row.get("role"))),
+        budget_limit_cents=limit_cents,
+        budget_spent_cents=spent_cents,
+        loaded_at=datetime.now(timezone.utc).isoformat(),
+        round_trips=counter or RoundTripCounter(),
+    )
+
+
+def load_task_context(
+    task_id: str,
+    task_type: str,
+    worker_id: str,
+    execute_sql: Callable[[str], Dict[str, Any]],
+    escape: Optional[Callable[[Any], str]] = None,
+    counter: Optional[RoundTripCounter] = None,
+) -> Optional[TaskContext]:
+    """Load the full preflight context for a task in one database round-trip.
+
+    Args:
+        task_id: Task being executed.
+        task_type: Task type of the task.
+        worker_id: Worker executing the task (drives RBAC lookup).
+        execute_sql: SQL execution function.
+        escape: Value escaper; defaults to core.database.escape_sql_value.
+        counter: Optional existing counter to attach to the context.
+
+    Returns:
+        TaskContext, or None if the prefetch failed (callers fall back to
+        the individual per-concern queries).
+    """
+    if escape is None:
+        from core.database import escape_sql_value as escape
+
+    sql = build_preflight_sql(task_id, task_type, worker_id, escape)
+    try:
+        result = execute_sql(sql)
+    except Exception as e:
+        logger.warning("Task preflight failed for %s: %s", task_id, e)
+        return None
+
+    rows = (result or {}).get("rows") or []
+    if not rows:
+        logger.warning("Task preflight returned no row for %s", task_id)
+        return None
+    return context_from_row(task_id, task_type, worker_id, rows[0], counter=counter)
+
+
+__all__ = [
+    "RoundTripCounter",
+    "TaskContext",
+    "track_round_trips",
+    "note_round_trip",
+    "build_preflight_sql",
+    "context_from_row",
+    "load_task_context",
+]
@@ -28,6 +28,7 @@ import logging
 import os
 import time
 from contextlib import contextmanager
+from datetime import datetime
 from functools import wraps
 from typing import Any, Callable, Dict, Optional
 
@@ -116,8 +117,9 @@ class TracedGeneration:
         usage: Optional[Dict[str, int]] = None,
         error: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
+        completion_start_time: Optional[datetime] = None,
     ):
-        """End the generation span with results."""
+        """End the generation span with results (``completion_start_time`` is the first token)."""
         duration_ms = int((time.time() - self._start) * 1000)
 
         if self._gen is not None:
@@ -125,7 +127,7 @@ class TracedGeneration:
                 update_kwargs = {
                     "output": output[:4000] if output else "",
                     "model": model,
-                    "completion_start_time": None,
+                    "completion_start_time": completion_start_time,
                     "metadata": {
                         **(metadata or {}),
                         "duration_ms": duration_ms,
@@ -20,12 +20,23 @@ from datetime import datetime, timezone
 from typing import Any, Callable, Dict, Generator, List, Optional, Set, Tuple, Union
 from uuid import uuid4
 
-import requests
-
 from .database import query_db, escape_sql_value
+from .memory_index import get_memory_index
 from .mcp_tool_schemas import get_tool_schemas
 from .retry import exponential_backoff, RateLimitError, APIConnectionError
-from .circuit_breaker import CircuitOpenError, get_circuit_breaker
+from .circuit_breaker import CircuitOpenError
+from .context_window import ContextWindow, count_tokens
+from .llm_cache import CachePolicy
+from .llm_transport import (
+    LLM_CHAT_ENDPOINT,
+    TOKEN_COSTS,  # noqa: F401 — re-exported, the pricing table lives with the transport
+    LLMConnectionError,
+    LLMRateLimitError,
+    LLMResult,
+    LLMTransportError,
+    calculate_cost,
+    get_llm_transport,
+)
 from .self_healing import get_self_healing_manager, FailureType, RecoveryStrategy
 from .ai_executor import _validate_model  # Block Anthropic/Claude models
 
@@ -153,12 +164,16 @@ class ReasoningState:
 logger = logging.getLogger(__name__)
 
 # Configuration constants — LLM endpoint is configurable via LLM_API_BASE env var
-# Falls back to OpenRouter if not set (backward compatible)
-_OPENROUTER_DEFAULT = "https://openrouter.ai/api/v1/chat/completions"
-_LLM_BASE = (os.getenv("LLM_API_BASE") or os.getenv("OPENROUTER_ENDPOINT") or _OPENROUTER_DEFAULT).strip().rstrip("/")
-OPENROUTER_ENDPOINT = f"{_LLM_BASE}/chat/completions" if not _LLM_BASE.endswith("/chat/completions") else _LLM_BASE
+# (resolved in core.llm_transport; falls back to OpenRouter if not set)
+OPENROUTER_ENDPOINT = LLM_CHAT_ENDPOINT
+BRAIN_LLM_HEADERS = {
+    "HTTP-Referer": "https://juggernaut-autonomy.railway.app",
+    "X-Title": "Juggernaut Brain",
+}
 DEFAULT_MODEL = os.getenv("LLM_MODEL") or "openrouter/auto"
 MAX_CONVERSATION_HISTORY = 20
+# Newest history that fits in this many tokens is loaded (of the last MAX_CONVERSATION_HISTORY)
+MAX_HISTORY_TOKENS = int(os.getenv("BRAIN_HISTORY_MAX_TOKENS", "8000"))
 MAX_MEMORIES_TO_RECALL = 10
 DEFAULT_MAX_TOKENS = 4096
 DEFAULT_SESSION_TITLE = "New Chat"
@@ -188,17 +203,6 @@ MODE_MODEL_POLICIES = {
     "autonomous": "qwen/qwen3.5-flash-02-23",
 }
 
-# Approximate token costs per 1M tokens (OpenRouter pricing)
-TOKEN_COSTS = {
-    "openrouter/auto": {"input": 5.0, "output": 15.0},
-    "openai/gpt-4o": {"input": 2.5, "output": 10.0},
-    "openai/gpt-4o-mini": {"input": 0.15, "output": 0.6},
-    "deepseek/deepseek-chat": {"input": 0.30, "output": 1.20},
-    "google/gemini-2.0-flash-exp:free": {"input": 0.0, "output": 0.0},
-    "kimi/k2": {"input": 0.0, "output": 0.0},
-    "qwen/qwen3.5-flash-02-23": {"input": 0.10, "output": 0.40},
-}
-
 
 _supported_repos_raw = (os.getenv("BRAIN_SUPPORTED_REPOS") or "").strip()
 if _supported_repos_raw:
@@ -462,37 +466,18 @@ class DatabaseError(BrainError):
 
 def estimate_tokens(text: str) -> int:
     """
-    Estimate token count for text.
-
-    Uses a simple heuristic: ~4 characters per token on average.
-
-    Args:
-        text: Text to estimate tokens for.
-
-    Returns:
-        Estimated token count.
-    """
-    if not text:
-        return 0
-    return len(text) // 4
-
+    Count tokens in text.
 
-def calculate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
-    """
-    Calculate cost in cents for API usage.
+    Uses core.context_window.count_tokens (tiktoken when available, else the
+    bundled offline counter).
 
     Args:
-        model: Model identifier.
-        input_tokens: Number of input tokens.
-        output_tokens: Number of output tokens.
+        text: Text to count tokens for.
 
     Returns:
-        Cost in cents.
+        Token count.
     """
-    costs = TOKEN_COSTS.get(model, {"input": 3.0, "output": 15.0})
-    input_cost = (input_tokens / 1_000_000) * costs["input"]
-    output_cost = (output_tokens / 1_000_000) * costs["output"]
-    return round((input_cost + output_cost) * 100, 4)
+    return count_tokens(text)
 
 
 def _get_system_state() -> str:
@@ -944,14 +929,12 @@ class BrainService:
         messages.extend(history)
         messages.append({"role": "user", "content": question})
 
-        # Estimate input tokens
-        input_text = (
-            system_prompt + question + "".join(m.get("content", "") for m in history)
-        )
-        input_tokens = estimate_tokens(input_text)
+        # Fit the request into the model's input budget
+        request_messages, context_report = ContextWindow(self.model, self.max_tokens).fit(messages)
+        input_tokens = context_report.input_tokens
 
         # Call API
-        response_text = self._call_api(messages)
+        response_text = self._call_api(request_messages)
         output_tokens = estimate_tokens(response_text)
 
         # Calculate cost
@@ -1061,11 +1044,13 @@ class BrainService:
         tool_executions: List[Dict[str, Any]] = []
         total_input_tokens = 0
         total_output_tokens = 0
+        input_tokens_per_iteration: List[int] = []
         iterations = 0
         response_text = ""
         guardrails = GuardrailState()
         max_same_failure = 2
         max_no_progress_steps = 3
+        context_window = ContextWindow(self.model, self.max_tokens)
 
         # Agentic loop - continue until no more tool calls
         while iterations < MAX_TOOL_ITERATIONS:
@@ -1074,15 +1059,14 @@ class BrainService:
             if guardrails.stop_reason:
                 break
 
-            # Estimate tokens for this iteration
-            input_text = "".join(
-                str(m.get("content", "")) for m in messages if m.get("content")
-            )
-            total_input_tokens += estimate_tokens(input_text)
+            # Fit this iteration's request into the input budget
+            request_messages, context_report = context_window.fit(messages, tools)
+            total_input_tokens += context_report.input_tokens
+            input_tokens_per_iteration.append(context_report.input_tokens)
 
             # Call API with tools
             try:
-                response_text, tool_calls = self._call_api_with_tools(messages, tools)
+                response_text, tool_calls = self._call_api_with_tools(request_messages, tools)
             except APIError as e:
                 logger.error(f"API call failed on iteration {iterations}: {e}")
                 if iterations == 1:
@@ -1117,6 +1101,8 @@ class BrainService:
                     "tool_executions": tool_executions,
                     "pending_tool_calls": tool_calls,
                     "iterations": iterations,
+                    "input_tokens_per_iteration": input_tokens_per_iteration,
+                    "context_budget": context_window.budget,
                     "auto_execute": auto_execute,
                 }
 
@@ -1247,12 +1233,9 @@ class BrainService:
                         }
                     )
 
-                    synthesis_input_text = "".join(
-                        str(m.get("content", ""))
-                        for m in synthesis_messages
-                        if m.get("content")
-                    )
-                    total_input_tokens += estimate_tokens(synthesis_input_text)
+                    synthesis_messages, context_report = context_window.fit(synthesis_messages)
+                    total_input_tokens += context_report.input_tokens
+                    input_tokens_per_iteration.append(context_report.input_tokens)
 
                     response_text = self._call_api(synthesis_messages)
                     total_output_tokens += estimate_tokens(response_text)
@@ -1305,6 +1288,8 @@ class BrainService:
             "model": self.model,
             "tool_executions": tool_executions,
             "iterations": iterations,
+            "input_tokens_per_iteration": input_tokens_per_iteration,
+            "context_budget": context_window.budget,
             "stop_reason": guardrails.stop_reason,
             "guardrails": guardrails.to_dict(),
         }
@@ -1344,11 +1329,13 @@ class BrainService:
                 {"type": "token", "content": "..."}
                 {"type": "status", "status": "thinking"|"reasoning"|"tool_running"|"summarizing"|"stopped"|..., "detail": "..."}
                 {"type": "budget", "mode": "...", "steps": {"used": N, "max": N}, "policy": {...}}
+                    (per iteration also "tokens": {"input": N, "max": N} - the request's input tokens)
                 {"type": "tool_start", "tool": "...", "arguments": {...}}
                 {"type": "tool_result", "tool": "...", "result": {...}, "success": bool}
                 {"type": "guardrails", "stop_reason": "...", "state": {...}}
                 {"type": "done", "input_tokens": N, "output_tokens": N, "cost_cents": N,
-                 "tool_executions": [...], "iterations": N, "mode": "...", "budget": {...}}
+                 "tool_executions": [...], "iterations": N, "input_tokens_per_iteration": [...],
+                 "mode": "...", "budget": {...}}
                 {"type": "error", "message": "..."}
         """
         if not self.api_key:
@@ -1421,6 +1408,7 @@ class BrainService:
         tool_executions: List[Dict[str, Any]] = []
         total_input_tokens = 0
         total_output_tokens = 0
+        input_tokens_per_iteration: List[int] = []
         iterations = 0
         accumulated_response = ""
         guardrails = GuardrailState()
@@ -1511,20 +1499,24 @@ class BrainService:
         while iterations < max_iterations:
             iterations += 1
 
+            # Fit this iteration's request into the (possibly switched) model's budget
+            context_window = ContextWindow(self.model, self.max_tokens)
+            request_messages, context_report = context_window.fit(messages, tools)
+
             yield {
                 "type": "budget",
                 "mode": normalized_mode,
                 "steps": {"used": iterations - 1, "max": max_iterations},
+                "tokens": {"input": context_report.input_tokens, "max": context_report.budget},
             }
 
             if guardrails.stop_reason:
                 break
 
-            # Estimate input tokens
-            input_text = "".join(
-                str(m.get("content", "")) for m in messages if m.get("content")
-            )
-            total_input_tokens += estimate_tokens(input_text)
+            total_input_tokens += context_report.input_tokens
+            input_tokens_per_iteration.append(context_report.input_tokens)
+            if context_report.input_tokens < context_report.original_tokens:
+                logger.info("Compacted brain context on iteration %d: %s", iterations, context_report.as_dict())
 
             # Stream API call
             tool_calls_received = []
@@ -1533,7 +1525,7 @@ class BrainService:
             yield {"type": "status", "status": "reasoning"}
 
             try:
-                for content_chunk, tool_calls in self._stream_api_call(messages, tools):
+                for content_chunk, tool_calls in self._stream_api_call(request_messages, tools):
                     if content_chunk:
                         iteration_content += content_chunk
                         accumulated_response += content_chunk
@@ -1579,7 +1571,7 @@ class BrainService:
                         
                         try:
                             response_text, tool_calls = self._call_api_with_tools(
-                                messages, tools
+                                request_messages, tools
                             )
                             healing_mgr.record_recovery_success(failure_ctx)
                         except Exception as e3:
@@ -1598,7 +1590,7 @@ class BrainService:
                     # Falls through to use response_text and tool_calls from recovery attempt
                     try:
                         response_text, tool_calls = self._call_api_with_tools(
-                            messages, tools
+                            request_messages, tools
                         )
                         healing_mgr.record_recovery_success(failure_ctx)
                     except APIError as e2:
@@ -1823,6 +1815,7 @@ class BrainService:
             "cost_cents": cost_cents,
             "tool_executions": tool_executions,
             "iterations": iterations,
+            "input_tokens_per_iteration": input_tokens_per_iteration,
             "stop_reason": guardrails.stop_reason,
             "guardrails": guardrails.to_dict(),
             "mode": normalized_mode,
@@ -1906,12 +1899,13 @@ class BrainService:
             raise DatabaseError(f"Failed to clear history: {e}")
 
     @exponential_backoff(max_retries=5, base_delay=2.0, max_delay=30.0)
-    def _call_api(self, messages: List[Dict[str, str]]) -> str:
+    def _call_api(self, messages: List[Dict[str, str]], cache: Optional[CachePolicy] = None) -> str:
         """
         Call the OpenRouter API with exponential backoff retry and circuit breaker.
 
         Args:
             messages: List of message dicts with role and content.
+            cache: Serve repeated prompts from the LLM response cache.
 
         Returns:
             Response text from the model.
@@ -1922,30 +1916,16 @@ class BrainService:
             APIConnectionError: If connection fails.
             CircuitOpenError: If circuit breaker is open.
         """
-        # Get the circuit breaker for OpenRouter
-        circuit = get_circuit_breaker('openrouter')
-        if circuit is None:
-            logger.warning("OpenRouter circuit breaker not found, proceeding without circuit protection")
-            return self._call_api_internal(messages)
-
-        # Call with circuit breaker protection
         try:
-            return circuit.call_sync(self._call_api_internal, messages)
+            return self._call_api_internal(messages, cache=cache)
         except CircuitOpenError as e:
             logger.error(f"OpenRouter circuit breaker open: {e}")
             raise
-            
-    def _call_api_internal(self, messages: List[Dict[str, str]]) -> str:
+
+    def _call_api_internal(self, messages: List[Dict[str, str]], cache: Optional[CachePolicy] = None) -> str:
         """
-        Internal implementation of OpenRouter API call with retry.
+        Internal implementation of the OpenRouter API call (one attempt).
         """
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
-            "HTTP-Referer": "https://juggernaut-autonomy.railway.app",
-            "X-Title": "Juggernaut Brain",
-        }
-
         payload = {
             "model": self.model,
             "messages": messages,
@@ -1957,36 +1937,27 @@ class BrainService:
         # if provider is not None:
         #     payload["provider"] = provider
 
-        data = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(
-            OPENROUTER_ENDPOINT, data=data, headers=headers, method="POST"
-        )
+        return self._complete(payload, cache=cache).content
 
-        try:
-            with urllib.request.urlopen(req, timeout=60) as response:
-                result = json.loads(response.read().decode("utf-8"))
-
-                choices = result.get("choices", [])
-                if not choices:
-                    raise APIError("No choices in API response")
-
-                return choices[0].get("message", {}).get("content", "")
+    def _complete(self, payload: Dict[str, Any], cache: Optional[CachePolicy] = None) -> LLMResult:
+        """
+        Send one request through the shared LLM transport, which applies the
+        openrouter circuit breaker and rate limit and streams the response.
 
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode("utf-8")
-            logger.error(f"OpenRouter API error: HTTP {e.code} - {error_body}")
-            
-            # Check for rate limiting
-            if e.code == 429:
-                raise RateLimitError(f"Rate limited: {error_body}")
-                
-            raise APIError(f"API error {e.code}: {error_body}")
-        except urllib.error.URLError as e:
-            logger.error(f"OpenRouter API connection error: {e}")
-            raise APIConnectionError(f"Connection error: {e}")
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse API response: {e}")
-            raise APIError(f"Invalid API response: {e}")
+        Raises:
+            APIError: On an error response or an unusable body.
+            RateLimitError: If rate limited (retried by ``exponential_backoff``).
+            APIConnectionError: If connection fails (retried likewise).
+            CircuitOpenError: If circuit breaker is open.
+        """
+        try:
+            return get_llm_transport().complete(
+                payload, api_key=self.api_key, headers=BRAIN_LLM_HEADERS, timeout=60, cache=cache
+            )
+        except (LLMRateLimitError, LLMConnectionError):
+            raise
+        except LLMTransportError as e:
+            raise APIError(str(e)) from e
 
     @exponential_backoff(max_retries=5, base_delay=2.0, max_delay=30.0)
     def _call_api_with_tools(
@@ -2007,13 +1978,6 @@ class BrainService:
             RateLimitError: If rate limited by the API.
             APIConnectionError: If connection fails.
         """
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
-            "HTTP-Referer": "https://juggernaut-autonomy.railway.app",
-            "X-Title": "Juggernaut Brain",
-        }
-
         # Block Anthropic/Claude models
         validated_model = _validate_model(self.model)
         
@@ -2032,51 +1996,18 @@ class BrainService:
         # if provider is not None:
         #     payload["provider"] = provider
 
-        data = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(
-            OPENROUTER_ENDPOINT, data=data, headers=headers, method="POST"
-        )
-
-        try:
-            with urllib.request.urlopen(req, timeout=60) as response:
-                result = json.loads(response.read().decode("utf-8"))
-
-                choices = result.get("choices", [])
-                if not choices:
-                    raise APIError("No choices in API response")
-
-                choice = choices[0]
-                message = choice.get("message", {})
-                content = message.get("content", "")
-                tool_calls = message.get("tool_calls", [])
-
-                return content, tool_calls
-
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode("utf-8")
-            logger.error(f"OpenRouter API error: HTTP {e.code} - {error_body}")
-            
-            # Check for rate limiting
-            if e.code == 429:
-                raise RateLimitError(f"Rate limited: {error_body}")
-                
-            raise APIError(f"API error {e.code}: {error_body}")
-        except urllib.error.URLError as e:
-            logger.error(f"OpenRouter API connection error: {e}")
-            raise APIConnectionError(f"Connection error: {e}")
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse API response: {e}")
-            raise APIError(f"Invalid API response: {e}")
+        result = self._complete(payload)
+        return result.content, result.tool_calls
 
     def _stream_api_call(
         self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]] = None
     ) -> Generator[Tuple[str, List[Dict[str, Any]]], None, None]:
         """
-        Stream API call to OpenRouter with tool support using requests library.
+        Stream API call to OpenRouter with tool support via the shared LLM transport.
 
         This method enables real-time token streaming from OpenRouter. It yields
-        content chunks as they arrive, and accumulates tool_calls for when the
-        model requests function execution.
+        content chunks as they arrive; tool_calls are assembled by the transport
+        and yielded once the stream ends.
 
         Args:
             messages: List of message dicts with role and content.
@@ -2089,14 +2020,9 @@ class BrainService:
 
         Raises:
             APIError: If API call fails.
+            RateLimitError: If rate limited by the API.
+            CircuitOpenError: If circuit breaker is open.
         """
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
-            "HTTP-Referer": "https://juggernaut-autonomy.railway.app",
-            "X-Title": "Juggernaut Brain",
-        }
-
         # Block Anthropic/Claude models
         validated_model = _validate_model(self.model)
         
@@ -2104,7 +2030,6 @@ class BrainService:
             "model": validated_model,
             "messages": messages,
             "max_tokens": self.max_tokens,
-            "stream": True,  # Enable streaming
         }
 
         # OpenRouter handles routing automatically based on model name
@@ -2117,83 +2042,20 @@ class BrainService:
             payload["tool_choice"] = "auto"
 
         try:
-            response = requests.post(
-                OPENROUTER_ENDPOINT,
-                headers=headers,
-                json=payload,
-                stream=True,
-                timeout=120,
+            stream = get_llm_transport().stream(
+                payload, api_key=self.api_key, headers=BRAIN_LLM_HEADERS, timeout=120
             )
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
+            for content in stream:
+                yield (content, [])
+        except LLMRateLimitError:
+            raise
+        except LLMTransportError as e:
             logger.error(f"OpenRouter streaming request failed: {e}")
-            raise APIError(f"Streaming request failed: {e}")
-
-        # Accumulate tool calls across streaming chunks
-        # OpenRouter sends tool_calls in chunks with index-based assembly
-        accumulated_tool_calls: Dict[int, Dict[str, Any]] = {}
-
-        for line in response.iter_lines():
-            if not line:
-                continue
-
-            line_text = line.decode("utf-8")
-            if not line_text.startswith("data: "):
-                continue
-
-            data_str = line_text[6:]  # Remove "data: " prefix
-            if data_str == "[DONE]":
-                break
-
-            try:
-                chunk = json.loads(data_str)
-                choices = chunk.get("choices", [])
-                if not choices:
-                    continue
-
-                delta = choices[0].get("delta", {})
-
-                # Yield content tokens as they arrive
-                content = delta.get("content")
-                if content:
-                    yield (content, [])
-
-                # Accumulate tool calls (they come in chunks)
-                if delta.get("tool_calls"):
-                    for tc in delta["tool_calls"]:
-                        idx = tc.get("index", 0)
-                        if idx not in accumulated_tool_calls:
-                            accumulated_tool_calls[idx] = {
-                                "id": tc.get("id", ""),
-                                "type": "function",
-                                "function": {"name": "", "arguments": ""},
-                            }
-
-                        # Update ID if present
-                        if tc.get("id"):
-                            accumulated_tool_calls[idx]["id"] = tc["id"]
-
-                        # Accumulate function data
-                        func = tc.get("function", {})
-                        if func.get("name"):
-                            accumulated_tool_calls[idx]["function"]["name"] = func[
-                                "name"
-                            ]
-                        if func.get("arguments"):
-                            accumulated_tool_calls[idx]["function"]["arguments"] += (
-                                func["arguments"]
-                            )
-
-            except json.JSONDecodeError:
-                continue
+            raise APIError(f"Streaming request failed: {e}") from e
 
         # After streaming complete, yield any accumulated tool calls
-        if accumulated_tool_calls:
-            tool_calls_list = [
-                accumulated_tool_calls[idx]
-                for idx in sorted(accumulated_tool_calls.keys())
-            ]
-            yield ("", tool_calls_list)
+        if stream.result.tool_calls:
+            yield ("", stream.result.tool_calls)
 
     def _execute_tool(
         self, tool_name: str, arguments: Dict[str, Any]
@@ -2548,6 +2410,9 @@ class BrainService:
         """
         Load conversation history from chat_messages table for API context.
 
+        Of the last MAX_CONVERSATION_HISTORY messages, only the newest ones
+        that fit in MAX_HISTORY_TOKENS are returned.
+
         Args:
             session_id: Session to load history for.
 
@@ -2565,10 +2430,16 @@ class BrainService:
                 """
             )
             rows = result.get("rows", [])
-            # Reverse for chronological order and format for API
-            return [
-                {"role": r["role"], "content": r["content"]} for r in reversed(rows)
-            ]
+            history: List[Dict[str, str]] = []
+            used = 0
+            for r in rows:  # newest first
+                used += count_tokens(r.get("content") or "")
+                if history and used > MAX_HISTORY_TOKENS:
+                    break
+                history.append({"role": r["role"], "content": r["content"]})
+            # Reverse for chronological order
+            history.reverse()
+            return history
         except Exception as e:
             logger.warning(f"Failed to load history from chat_messages: {e}")
             return []
@@ -2654,7 +2525,11 @@ class BrainService:
             )
 
             messages = [{"role": "user", "content": title_prompt}]
-            generated_title = self._call_api(messages)
+            # Openers repeat across sessions ("hi", "status?"), so near-identical
+            # first exchanges can share a title
+            generated_title = self._call_api(
+                messages, cache=CachePolicy("session_title", ttl_seconds=7 * 24 * 3600, similarity=0.95)
+            )
 
             # Clean up the title
             generated_title = generated_title.strip().strip("\"'")[:50]
@@ -2713,7 +2588,58 @@ class BrainService:
         """
         Recall relevant memories based on query.
 
-        Uses keyword matching on memory content.
+        Uses the in-process semantic index (core.memory_index) and falls back
+        to keyword matching if the index has not loaded the memories table.
+
+        Args:
+            query: Query to find relevant memories for.
+
+        Returns:
+            List of relevant memory records.
+        """
+        try:
+            index = get_memory_index()
+            hits = index.recall(query, k=MAX_MEMORIES_TO_RECALL, sources=["memories"])
+            if index.is_ready(["memories"]):
+                memories = [
+                    {
+                        "id": h["id"],
+                        "key": h.get("key"),
+                        "content": h.get("content"),
+                        "memory_type": h.get("memory_type"),
+                        "importance": h.get("importance"),
+                        "created_at": h.get("created_at"),
+                        "similarity": h.get("score"),
+                    }
+                    for h in hits
+                ]
+                self._touch_memories(memories)
+                return memories
+        except Exception as e:
+            logger.warning(f"Semantic memory recall failed, using keyword match: {e}")
+
+        return self._recall_memories_like(query)
+
+    def _touch_memories(self, memories: List[Dict[str, Any]]) -> None:
+        """Bump accessed_at/access_count for recalled memories (one UPDATE)."""
+        if not memories:
+            return
+        try:
+            memory_ids = ", ".join(escape_sql_value(m["id"]) for m in memories)
+            query_db(
+                f"""
+                UPDATE memories
+                SET accessed_at = NOW(),
+                    access_count = COALESCE(access_count, 0) + 1
+                WHERE id IN ({memory_ids})
+                """
+            )
+        except Exception as e:
+            logger.warning(f"Failed to update memory access counts: {e}")
+
+    def _recall_memories_like(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Recall memories by keyword matching (LOWER(content) LIKE, full scan).
 
         Args:
             query: Query to find relevant memories for.
@@ -2756,19 +2682,7 @@ class BrainService:
             )
 
             memories = result.get("rows", [])
-
-            # Update access counts
-            if memories:
-                memory_ids = ", ".join(escape_sql_value(m["id"]) for m in memories)
-                query_db(
-                    f"""
-                    UPDATE memories
-                    SET accessed_at = NOW(),
-                        access_count = COALESCE(access_count, 0) + 1
-                    WHERE id IN ({memory_ids})
-                    """
-                )
-
+            self._touch_memories(memories)
             return memories
 
         except Exception as e:
@@ -3518,12 +3432,15 @@ class CodeGenerator:
         if not self.api_key:
             logger.warning("No LLM_API_KEY / OPENROUTER_API_KEY found - code generation will fail")
 
-    def _make_request(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+    def _make_request(
+        self, messages: List[Dict[str, str]], cache: Optional[CachePolicy] = None
+    ) -> Dict[str, Any]:
         """
         Make a request to OpenRouter API.
 
         Args:
             messages: List of message dicts with role and content.
+            cache: Serve repeated prompts from the LLM response cache.
 
         Returns:
             API response as dict.
@@ -3534,13 +3451,6 @@ class CodeGenerator:
         if not self.api_key:
             raise CodeGenerationError("OpenRouter API key not configured")
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
-            "HTTP-Referer": "https://juggernaut-autonomy.railway.app",
-            "X-Title": "JUGGERNAUT Code Generator",
-        }
-
         payload = {
             "model": self.model,
             "messages": messages,
@@ -3575,23 +3485,18 @@ class CodeGenerator:
             }
 
         try:
-            req = urllib.request.Request(
-                OPENROUTER_ENDPOINT,
-                data=json.dumps(payload).encode("utf-8"),
-                headers=headers,
-                method="POST",
-            )
-
-            with urllib.request.urlopen(req, timeout=120) as response:
-                return json.loads(response.read().decode("utf-8"))
-
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode("utf-8") if e.fp else str(e)
-            raise CodeGenerationError(f"OpenRouter API error {e.code}: {error_body}")
-        except urllib.error.URLError as e:
-            raise CodeGenerationError(f"Connection error: {e}")
-        except json.JSONDecodeError as e:
-            raise CodeGenerationError(f"Invalid JSON response: {e}")
+            return get_llm_transport().complete(
+                payload,
+                api_key=self.api_key,
+                headers={
+                    "HTTP-Referer": "https://juggernaut-autonomy.railway.app",
+                    "X-Title": "JUGGERNAUT Code Generator",
+                },
+                timeout=120,
+                cache=cache,
+            ).raw
+        except (LLMTransportError, CircuitOpenError) as e:
+            raise CodeGenerationError(f"OpenRouter API error: {e}") from e
 
     def generate_module(
         self,
@@ -3808,6 +3713,17 @@ Return ONLY the test code, no markdown formatting."""
             tokens_used=tokens,
         )
 
+    @staticmethod
+    def _strip_code_fences(content: str) -> str:
+        """Remove a markdown code fence wrapped around a JSON reply."""
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.startswith("```"):
+            content = content[3:]
+        if content.endswith("```"):
+            content = content[:-3]
+        return content.strip()
+
     def review_code(self, code: str) -> Dict[str, Any]:
         """
         Review code and suggest improvements.
@@ -3840,17 +3756,15 @@ Return ONLY valid JSON, no markdown."""
             {"role": "user", "content": user_prompt},
         ]
 
-        response = self._make_request(messages)
-        content = response.get("choices", [{}])[0].get("message", {}).get("content", "")
-
-        # Clean up JSON
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
+        # Exact matches only: a one-line change must get a fresh review
+        response = self._make_request(messages, cache=CachePolicy(
+            "code_review",
+            ttl_seconds=7 * 24 * 3600,
+            accept=lambda text: isinstance(json.loads(self._strip_code_fences(text)), dict),
+        ))
+        content = self._strip_code_fences(
+            response.get("choices", [{}])[0].get("message", {}).get("content", "")
+        )
 
         try:
             return json.loads(content)
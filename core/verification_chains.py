@@ -2,9 +2,9 @@ import re
 import json
 import os
 import socket
-import time
 import urllib.request
 import urllib.error
+from concurrent.futures import Future
 from datetime import datetime, timezone
 from typing import Any, Callable, Dict, Optional, Tuple
 
@@ -370,7 +370,70 @@ def execute_api_call_with_verification(
         )
 
 
-def execute_deploy_with_verification(
+DeployOutcome = Tuple[Dict[str, Any], Dict[str, Any]]
+
+
+def _resolved_outcome(
+    outcome: DeployOutcome, callback: Optional[Callable[[DeployOutcome], None]]
+) -> "Future[DeployOutcome]":
+    future: "Future[DeployOutcome]" = Future()
+    if callback is not None:
+        future.add_done_callback(lambda f: callback(f.result()))
+    future.set_result(outcome)
+    return future
+
+
+def _railway_deploy_error(service_id: str, service_name: Optional[str], verified_at: str, error: str) -> DeployOutcome:
+    return (
+        {"status": "error", "error": error},
+        {
+            "type": "railway_deploy",
+            "verified": False,
+            "service_id": service_id,
+            "service_name": service_name,
+            "deployment_id": None,
+            "status": "ERROR",
+            "verified_at": verified_at,
+            "error": error,
+        },
+    )
+
+
+def _railway_deploy_outcome(deploy: Any, service_id: str, service_name: Optional[str], verified_at: str) -> DeployOutcome:
+    last_deployment_id: Optional[str] = deploy.deployment_id
+    last_status: Optional[str] = (deploy.raw_data or {}).get("status")
+    last_error: Optional[str] = deploy.error
+
+    if last_status != "SUCCESS" and last_status != "FAILED":
+        last_status = last_status or "TIMEOUT"
+        last_error = last_error or "timeout"
+
+    verified = bool(last_status == "SUCCESS")
+    verification: Dict[str, Any] = {
+        "type": "railway_deploy",
+        "verified": verified,
+        "service_id": service_id,
+        "service_name": service_name,
+        "deployment_id": last_deployment_id,
+        "status": last_status,
+        "verified_at": verified_at,
+    }
+    if not verified:
+        verification["error"] = last_error or "Deployment did not succeed"
+
+    result: Dict[str, Any] = {
+        "service_id": service_id,
+        "service_name": service_name,
+        "deployment_id": last_deployment_id,
+        "status": last_status,
+    }
+    if last_error:
+        result["error"] = last_error
+
+    return result, verification
+
+
+def start_deploy_with_verification(
     *,
     service_id: str,
     service_name: Optional[str] = None,
@@ -378,22 +441,20 @@ def execute_deploy_with_verification(
     railway_token: Optional[str] = None,
     poll_interval_seconds: int = 10,
     timeout_seconds: int = 300,
-) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    callback: Optional[Callable[[DeployOutcome], None]] = None,
+) -> "Future[DeployOutcome]":
+    """
+    Trigger a Railway redeploy and return without waiting for it.
+
+    The deploy is tracked by the shared DeployWatcher; the returned future
+    (and ``callback``, on the watcher thread) gets the same (result,
+    verification) pair execute_deploy_with_verification returns.
+    """
     verified_at = _iso_now()
     token = railway_token or os.environ.get("RAILWAY_TOKEN")
     if not token:
-        return (
-            {"status": "error", "error": "Missing RAILWAY_TOKEN"},
-            {
-                "type": "railway_deploy",
-                "verified": False,
-                "service_id": service_id,
-                "service_name": service_name,
-                "deployment_id": None,
-                "status": "ERROR",
-                "verified_at": verified_at,
-                "error": "Missing RAILWAY_TOKEN",
-            },
+        return _resolved_outcome(
+            _railway_deploy_error(service_id, service_name, verified_at, "Missing RAILWAY_TOKEN"), callback
         )
 
     api_url = "https://backboard.railway.com/graphql/v2"
@@ -418,102 +479,48 @@ mutation Redeploy($serviceId: String!, $environmentId: String!) {
             "variables": {"serviceId": service_id, "environmentId": environment_id},
         })
     except Exception as e:
-        return (
-            {"status": "error", "error": str(e)},
-            {
-                "type": "railway_deploy",
-                "verified": False,
-                "service_id": service_id,
-                "service_name": service_name,
-                "deployment_id": None,
-                "status": "ERROR",
-                "verified_at": verified_at,
-                "error": str(e),
-            },
-        )
+        return _resolved_outcome(_railway_deploy_error(service_id, service_name, verified_at, str(e)), callback)
 
     if isinstance(m_resp, dict) and m_resp.get("errors"):
-        return (
-            {"status": "error", "error": str(m_resp.get("errors"))},
-            {
-                "type": "railway_deploy",
-                "verified": False,
-                "service_id": service_id,
-                "service_name": service_name,
-                "deployment_id": None,
-                "status": "ERROR",
-                "verified_at": verified_at,
-                "error": str(m_resp.get("errors")),
-            },
+        return _resolved_outcome(
+            _railway_deploy_error(service_id, service_name, verified_at, str(m_resp.get("errors"))), callback
         )
 
-    query = """
-query LatestDeployment($serviceId: String!) {
-  deployments(first: 1, input: {serviceId: $serviceId}) {
-    edges {
-      node {
-        id
-        status
-      }
-    }
-  }
-}
-"""
-
-    start = time.time()
-    last_status: Optional[str] = None
-    last_deployment_id: Optional[str] = None
-    last_error: Optional[str] = None
-
-    while (time.time() - start) < timeout_seconds:
-        try:
-            q_resp = _graphql({"query": query, "variables": {"serviceId": service_id}})
-            if q_resp.get("errors"):
-                last_error = str(q_resp.get("errors"))
-                time.sleep(poll_interval_seconds)
-                continue
-
-            edges = (
-                q_resp.get("data", {})
-                .get("deployments", {})
-                .get("edges", [])
-            )
-            node = (edges[0] or {}).get("node", {}) if edges else {}
-            last_deployment_id = node.get("id")
-            last_status = node.get("status")
-
-            if last_status in ("SUCCESS", "FAILED"):
-                break
-
-        except Exception as e:
-            last_error = str(e)
-
-        time.sleep(poll_interval_seconds)
-
-    if last_status != "SUCCESS" and last_status != "FAILED":
-        last_status = last_status or "TIMEOUT"
-        last_error = last_error or "timeout"
-
-    verified = bool(last_status == "SUCCESS")
-    verification: Dict[str, Any] = {
-        "type": "railway_deploy",
-        "verified": verified,
-        "service_id": service_id,
-        "service_name": service_name,
-        "deployment_id": last_deployment_id,
-        "status": last_status,
-        "verified_at": verified_at,
-    }
-    if not verified:
-        verification["error"] = last_error or "Deployment did not succeed"
+    from core.deploy_verifier import DeployVerifier
+    from core.deploy_watch import get_deploy_watcher
+
+    # The shared watcher polls every in-flight deploy in one batched query
+    outcome: "Future[DeployOutcome]" = Future()
+    if callback is not None:
+        outcome.add_done_callback(lambda f: callback(f.result()))
+    get_deploy_watcher().watch(
+        service_id,
+        platform="railway",
+        timeout=timeout_seconds,
+        verifier=DeployVerifier(railway_token=token),
+        max_interval=poll_interval_seconds,
+        callback=lambda deploy: outcome.set_result(
+            _railway_deploy_outcome(deploy, service_id, service_name, verified_at)
+        ),
+    )
+    return outcome
 
-    result: Dict[str, Any] = {
-        "service_id": service_id,
-        "service_name": service_name,
-        "deployment_id": last_deployment_id,
-        "status": last_status,
-    }
-    if last_error:
-        result["error"] = last_error
 
-    return result, verification
+def execute_deploy_with_verification(
+    *,
+    service_id: str,
+    service_name: Optional[str] = None,
+    environment_id: str = "8bfa6a1a-92f4-4a42-bf51-194b1c844a76",
+    railway_token: Optional[str] = None,
+    poll_interval_seconds: int = 10,
+    timeout_seconds: int = 300,
+) -> DeployOutcome:
+    """Blocking form of start_deploy_with_verification (waits up to ``timeout_seconds``)."""
+    return start_deploy_with_verification(
+        service_id=service_id,
+        service_name=service_name,
+        environment_id=environment_id,
+        railway_token=railway_token,
+        poll_interval_seconds=poll_interval_seconds,
+        timeout_seconds=timeout_seconds,
+    ).result()
@@ -25,6 +25,7 @@ from api.dashboard import (
 
 from core.ai_executor import AIExecutor
 from core.ai_executor import select_model_for_task
+from core.lazy_imports import OptionalImport, preload_in_background
 
 # Internal (service-to-service) dashboard endpoints
 from api.internal_dashboard import router as internal_dashboard_router
@@ -42,16 +43,32 @@ from api.approvals_api import router as approvals_api_router
 from api.chat_sessions import handle_chat_request as handle_chat_sessions
 
 # Brain API (Neural Chat consultation)
-try:
-    from api.brain_api import handle_brain_request as handle_brain_request, handle_consult_stream, BRAIN_AVAILABLE
-    BRAIN_API_AVAILABLE = BRAIN_AVAILABLE
-except ImportError as e:
-    logger.warning("Brain API not available: %s", e)
-    BRAIN_API_AVAILABLE = False
-    def handle_brain_request(*args, **kwargs):
+# Deferred: imported by the startup preload thread or on the first brain request.
+_brain_api = OptionalImport("api.brain_api")
+
+
+def _brain_api_available() -> bool:
+    return _brain_api.available and bool(getattr(_brain_api, "BRAIN_AVAILABLE", False))
+
+
+def handle_brain_request(*args, **kwargs):
+    if not _brain_api.available:
         return {"status": 503, "body": {"success": False, "error": "brain api not available"}}
-    def handle_consult_stream(*args, **kwargs):
+    return _brain_api.handle_brain_request(*args, **kwargs)
+
+
+def handle_consult_stream(*args, **kwargs):
+    if not _brain_api.available:
         yield 'data: {"type": "error", "message": "brain api not available"}\n\n'
+        return
+    yield from _brain_api.handle_consult_stream(*args, **kwargs)
+
+
+def __getattr__(name: str):
+    # BRAIN_API_AVAILABLE used to be a module global
+    if name == "BRAIN_API_AVAILABLE":
+        return _brain_api_available()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Self-Heal API (Milestone 2)
 try:
@@ -149,6 +166,13 @@ app = FastAPI(
     version=API_VERSION
 )
 
+
+@app.on_event("startup")
+async def _preload_optional_apis():
+    # Warm deferred imports without holding up startup
+    preload_in_background([_brain_api], name="dashboard-api-preload")
+
+
 # Internal routes (authenticated via INTERNAL_API_SECRET)
 app.include_router(internal_dashboard_router)
 
@@ -309,7 +333,7 @@ async def chat_sessions_route(request: Request, path: str = ""):
 @app.post("/api/brain/consult/stream")
 @app.post("/api/brain/unified/consult/stream")
 async def brain_consult_stream_route(request: Request):
-    if not BRAIN_API_AVAILABLE:
+    if not _brain_api_available():
         raise HTTPException(status_code=503, detail="Brain API not available")
 
     headers = dict(request.headers)
@@ -333,7 +357,7 @@ async def brain_consult_stream_route(request: Request):
 
 @app.api_route("/api/brain/{endpoint:path}", methods=["GET", "POST", "DELETE", "OPTIONS"])
 async def brain_route(request: Request, endpoint: str):
-    if not BRAIN_API_AVAILABLE:
+    if not _brain_api_available():
         raise HTTPException(status_code=503, detail="Brain API not available")
 
     method = request.method
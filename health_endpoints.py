@@ -4,6 +4,14 @@ Health check endpoints for JUGGERNAUT services.
 This module provides HTTP endpoints for health checks that can be used by
 Railway's health check system. Each service should import and use the
 appropriate health check endpoint.
+
+Checks run in the background on each monitor's schedule; the endpoints
+serve the cached results:
+
+- /health: cached status of every check
+- /health/live: process liveness, no dependency is touched
+- /health/ready: 503 until every critical check is healthy and fresh
+- /health/deep: probes every check now, with timeouts
 """
 
 import json
@@ -14,24 +22,24 @@ from typing import Dict, Any
 from fastapi import FastAPI, Response
 from fastapi.responses import JSONResponse
 
-from core.health import HealthCheck, register_health_check
+from core.health import HealthCheck, HealthMonitor, register_health_check
 from core.health import check_database_connection, check_worker_registry
 from core.health import check_memory_usage, check_disk_usage
 
 logger = logging.getLogger(__name__)
 
 # Create health check managers for each service
-main_health = HealthCheck("juggernaut-main")
-watchdog_health = HealthCheck("juggernaut-watchdog")
-mcp_health = HealthCheck("juggernaut-mcp")
-puppeteer_health = HealthCheck("juggernaut-puppeteer")
+main_health = HealthMonitor("juggernaut-main")
+watchdog_health = HealthMonitor("juggernaut-watchdog")
+mcp_health = HealthMonitor("juggernaut-mcp")
+puppeteer_health = HealthMonitor("juggernaut-puppeteer")
 
 # Register common health checks for main service
-@register_health_check(main_health)
+@register_health_check(main_health, critical=True)
 async def check_db():
     return await check_database_connection()
 
-@register_health_check(main_health)
+@register_health_check(main_health, interval=60)
 async def check_workers():
     return await check_worker_registry()
 
@@ -39,12 +47,12 @@ async def check_workers():
 async def check_memory():
     return await check_memory_usage()
 
-@register_health_check(main_health)
+@register_health_check(main_health, interval=300)
 async def check_disk():
     return await check_disk_usage()
 
 # Register health checks for watchdog service
-@register_health_check(watchdog_health)
+@register_health_check(watchdog_health, critical=True)
 async def watchdog_db():
     return await check_database_connection()
 
@@ -53,7 +61,7 @@ async def watchdog_memory():
     return await check_memory_usage()
 
 # Register health checks for MCP service
-@register_health_check(mcp_health)
+@register_health_check(mcp_health, critical=True)
 async def mcp_db():
     return await check_database_connection()
 
@@ -66,18 +74,22 @@ async def mcp_memory():
 async def puppeteer_memory():
     return await check_memory_usage()
 
-@register_health_check(puppeteer_health)
+@register_health_check(puppeteer_health, interval=300)
 async def puppeteer_disk():
     return await check_disk_usage()
 
 def setup_health_endpoint(app: FastAPI, health_check: HealthCheck):
     """
-    Set up health check endpoint for a FastAPI app.
+    Set up health check endpoints for a FastAPI app.
     
     Args:
         app: FastAPI application
-        health_check: HealthCheck instance to use
+        health_check: HealthCheck instance to use; a HealthMonitor is
+            started here and its endpoints serve cached results
     """
+    if isinstance(health_check, HealthMonitor):
+        health_check.start()
+
     @app.get("/health")
     async def health_endpoint():
         """Health check endpoint for Railway."""
@@ -89,6 +101,25 @@ def setup_health_endpoint(app: FastAPI, health_check: HealthCheck):
             status_code=status_code
         )
     
+    if isinstance(health_check, HealthMonitor):
+        @app.get("/health/live")
+        async def liveness_endpoint():
+            """Liveness probe: the process is up and serving."""
+            return JSONResponse(content=health_check.liveness())
+
+        @app.get("/health/ready")
+        async def readiness_endpoint():
+            """Readiness probe: critical checks healthy, from the cache."""
+            ready, result = health_check.readiness()
+            return JSONResponse(content=result, status_code=200 if ready else 503)
+
+        @app.get("/health/deep")
+        async def deep_health_endpoint():
+            """Deep check: probe every dependency now."""
+            result = await health_check.check(fresh=True)
+            status_code = 200 if result["status"] == "healthy" else 503
+            return JSONResponse(content=result, status_code=status_code)
+
     logger.info(f"Health check endpoint set up for {health_check.service_name}")
 
 # Simple health check for non-FastAPI services
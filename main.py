@@ -42,6 +42,16 @@ from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from uuid import uuid4
 
 from core.database import NEON_ENDPOINT
+from core.health import HealthMonitor, check_memory_usage, check_worker_registry
+from core.lazy_imports import OptionalImport, preload_in_background
+from core.schema_registry import get_schema_registry
+from core.task_preflight import (
+    RoundTripCounter,
+    TaskContext,
+    load_task_context,
+    note_round_trip,
+    track_round_trips,
+)
 
 # Slack notifications for #war-room
 from core.notifications import (
@@ -137,7 +147,7 @@ except ImportError as e:
         """Stub PermissionDenied exception."""
         pass
     
-    def check_permission(worker_id, action, resource=None, context=None):
+    def check_permission(worker_id, action, resource=None, context=None, **kwargs):
         """Stub check_permission when RBAC unavailable - falls back to simple check."""
         return PermissionResult(allowed=True, reason="RBAC unavailable, allowing by default")
     
@@ -254,18 +264,26 @@ except ImportError as e:
 
 
 # BRAIN-03: Brain API for AI consultation
-BRAIN_API_AVAILABLE = False
-_brain_api_import_error = None
+# Deferred: api.brain_api pulls in core.unified_brain and requests, so it is
+# imported on the first brain request (or by the startup preload thread).
+_brain_api = OptionalImport("api.brain_api")
 
-try:
-    from api.brain_api import handle_brain_request, handle_consult_stream, BRAIN_AVAILABLE
-    BRAIN_API_AVAILABLE = BRAIN_AVAILABLE
-except ImportError as e:
-    _brain_api_import_error = str(e)
-    def handle_brain_request(*args, **kwargs):
+
+def _brain_api_available() -> bool:
+    return _brain_api.available and bool(getattr(_brain_api, "BRAIN_AVAILABLE", False))
+
+
+def handle_brain_request(*args, **kwargs):
+    if not _brain_api.available:
         return {"status": 503, "body": {"success": False, "error": "brain api not available"}}
-    def handle_consult_stream(*args, **kwargs):
+    return _brain_api.handle_brain_request(*args, **kwargs)
+
+
+def handle_consult_stream(*args, **kwargs):
+    if not _brain_api.available:
         yield 'data: {"type": "error", "message": "brain api not available"}\n\n'
+        return
+    yield from _brain_api.handle_consult_stream(*args, **kwargs)
 
 # Chat Sessions API for spartan-hq frontend
 CHAT_API_AVAILABLE = False
@@ -411,7 +429,7 @@ try:
     from core.verification_chains import (
         execute_db_write_with_verification,
         execute_api_call_with_verification,
-        execute_deploy_with_verification,
+        start_deploy_with_verification,
     )
     DB_VERIFICATION_AVAILABLE = True
     API_VERIFICATION_AVAILABLE = True
@@ -435,12 +453,8 @@ except ImportError as e:
             "error": "API verification unavailable",
         }
 
-    def execute_deploy_with_verification(*args, **kwargs):
-        return {"status": "error", "error": "Deploy verification unavailable"}, {
-            "type": "railway_deploy",
-            "verified": False,
-            "error": "Deploy verification unavailable",
-        }
+    def start_deploy_with_verification(*args, **kwargs):
+        raise RuntimeError("Deploy verification unavailable")
 # Phase 5.3: Scheduler - Scheduled Task Run Logging (FIX-03)
 SCHEDULER_AVAILABLE = False
 _scheduler_import_error = None
@@ -500,20 +514,35 @@ except ImportError as e:
 
 
 # SCALE-03: Auto-Scaling Integration
-AUTO_SCALING_AVAILABLE = False
-_auto_scaling_import_error = None
+# Deferred: core.auto_scaling pulls in httpx and is only needed when
+# ENABLE_AUTO_SCALING is set.
+_auto_scaling = OptionalImport("core.auto_scaling")
+
+
+def create_auto_scaler(*args, **kwargs):
+    if not _auto_scaling.available:
+        return None
+    return _auto_scaling.create_auto_scaler(*args, **kwargs)
+
+
+# The availability flags and classes above used to be module globals; keep
+# them resolvable as main.<name> without importing the subsystems at load time.
+_DEFERRED_GLOBALS = {
+    "BRAIN_API_AVAILABLE": lambda: _brain_api_available(),
+    "_brain_api_import_error": lambda: _brain_api.load() and None or _brain_api.error,
+    "CODE_TASK_AVAILABLE": lambda: _unified_brain.available,
+    "_code_task_import_error": lambda: _unified_brain.load() and None or _unified_brain.error,
+    "AUTO_SCALING_AVAILABLE": lambda: _auto_scaling.available,
+    "_auto_scaling_import_error": lambda: _auto_scaling.load() and None or _auto_scaling.error,
+    "AutoScaler": lambda: _auto_scaling.AutoScaler,
+    "ScalingConfig": lambda: _auto_scaling.ScalingConfig,
+}
 
-try:
-    from core.auto_scaling import AutoScaler, ScalingConfig, create_auto_scaler
-    AUTO_SCALING_AVAILABLE = True
-except ImportError as e:
-    _auto_scaling_import_error = str(e)
-    # Stub class for graceful degradation
-    class AutoScaler:
-        def execute_scaling(self): return {"action": "no_action", "reason": "auto_scaling not available"}
-    class ScalingConfig:
-        pass
-    def create_auto_scaler(*args, **kwargs): return None
+
+def __getattr__(name: str):
+    if name in _DEFERRED_GLOBALS:
+        return _DEFERRED_GLOBALS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Phase 7: Stale Task Cleanup (CRITICAL-03c)
@@ -532,14 +561,13 @@ except ImportError as e:
 
 
 # Code Task Executor - Autonomous code generation (PR #185)
-CODE_TASK_AVAILABLE = False
-_code_task_import_error = None
+# Deferred: core.unified_brain is imported with the brain API preload or on
+# the first code task.
+_unified_brain = OptionalImport("core.unified_brain")
 
-try:
-    from core.unified_brain import execute_code_task
-    CODE_TASK_AVAILABLE = True
-except ImportError as e:
-    _code_task_import_error = str(e)
+
+def execute_code_task(*args, **kwargs):
+    return _unified_brain.execute_code_task(*args, **kwargs)
 
 
 # ============================================================
@@ -831,6 +859,7 @@ def execute_sql(sql: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
     
     data = json.dumps({"query": sql}).encode('utf-8')
     req = urllib.request.Request(NEON_ENDPOINT, data=data, headers=headers, method='POST')
+    note_round_trip()
     
     try:
         with urllib.request.urlopen(req, timeout=30) as response:
@@ -1162,7 +1191,39 @@ def get_forbidden_actions() -> List[str]:
         return []
 
 
+# Bump when the DDL in _ensure_proactive_min_schema changes
+PROACTIVE_MIN_SCHEMA_VERSION = 1
+
+PROACTIVE_MIN_SCHEMA_COLUMNS = {
+    "governance_tasks": ["task_type", "title", "description", "priority", "status",
+                         "payload", "created_by", "created_at"],
+    "scheduled_tasks": ["name", "task_type", "cron_expression", "config", "enabled",
+                        "last_run_at", "next_run_at", "interval_seconds"],
+    "pr_tracking": ["id", "task_id", "repo", "pr_number", "pr_url", "current_state", "review_status",
+                    "mergeable", "coderabbit_comments", "merged_at", "created_at", "updated_at"],
+}
+PROACTIVE_MIN_SCHEMA_INDEXES = ("pr_tracking_repo_pr_number_uq", "pr_tracking_task_id_idx")
+
+# Bump when the statements in _ensure_revenue_discovery_schema change
+REVENUE_DISCOVERY_SCHEMA_VERSION = 1
+
+REVENUE_DISCOVERY_SCHEMA_COLUMNS = {
+    "revenue_ideas": ["id", "title", "description", "hypothesis", "score", "score_breakdown", "status",
+                      "estimates", "research_sources", "timeliness", "evidence_type", "evidence_details",
+                      "reported_revenue", "reported_timeline", "capabilities_required", "tags",
+                      "constraints", "decision", "rejection_reason"],
+    "experiments": ["idea_id"],
+}
+
+
 def _ensure_proactive_min_schema(execute_sql, log_action) -> None:
+    # Called from several per-task and per-cycle paths; the DDL runs at most
+    # once per process and not at all when the registry shows the schema.
+    registry = get_schema_registry()
+    if registry.is_ensured("main.proactive_min", PROACTIVE_MIN_SCHEMA_VERSION,
+                           columns=PROACTIVE_MIN_SCHEMA_COLUMNS, indexes=PROACTIVE_MIN_SCHEMA_INDEXES):
+        return
+
     try:
         execute_sql(
             """
@@ -1261,6 +1322,10 @@ def _ensure_proactive_min_schema(execute_sql, log_action) -> None:
     except Exception:
         pass
 
+    # Statements above swallow errors: only stamp once the schema is confirmed
+    registry.mark_ensured("main.proactive_min", PROACTIVE_MIN_SCHEMA_VERSION,
+                          columns=PROACTIVE_MIN_SCHEMA_COLUMNS, indexes=PROACTIVE_MIN_SCHEMA_INDEXES)
+
 
 def _ensure_pr_monitor_scheduled_task() -> None:
     name = "pr_merge_monitor"
@@ -1295,6 +1360,12 @@ def _ensure_pr_monitor_scheduled_task() -> None:
 
 
 def _ensure_revenue_discovery_schema() -> None:
+    # Runs every cycle from the loop; includes a start_date backfill, so it is
+    # run once per process rather than skipped from the registry at startup.
+    registry = get_schema_registry()
+    if registry.is_ensured("main.revenue_discovery", REVENUE_DISCOVERY_SCHEMA_VERSION):
+        return
+
     try:
         execute_sql(
             """
@@ -1372,6 +1443,9 @@ def _ensure_revenue_discovery_schema() -> None:
     except Exception:
         pass
 
+    registry.mark_ensured("main.revenue_discovery", REVENUE_DISCOVERY_SCHEMA_VERSION,
+                          columns=REVENUE_DISCOVERY_SCHEMA_COLUMNS)
+
 
 def _ensure_revenue_discovery_scheduled_tasks() -> None:
     tasks = [
@@ -1703,7 +1777,7 @@ def _maybe_generate_diverse_proactive_tasks(force: bool = False) -> Dict[str, An
 
 
 
-def is_action_allowed(action: str) -> Tuple[bool, str]:
+def is_action_allowed(action: str, context: Optional[TaskContext] = None) -> Tuple[bool, str]:
     """
     Check if an action is allowed for this worker.
     
@@ -1713,6 +1787,8 @@ def is_action_allowed(action: str) -> Tuple[bool, str]:
     
     Args:
         action: The action to check (e.g., "task.database", "tool.slack")
+        context: Optional task preflight context; its prefetched worker/role
+            rows are used instead of re-querying the registry.
     
     Returns:
         Tuple of (allowed: bool, reason: str)
@@ -1723,7 +1799,9 @@ def is_action_allowed(action: str) -> Tuple[bool, str]:
             worker_id=WORKER_ID,
             action=action,
             resource=None,
-            context={"source": "is_action_allowed", "check_type": "permission"}
+            context={"source": "is_action_allowed", "check_type": "permission"},
+            worker_info=context.worker_info_dict() if context is not None else None,
+            role_info=context.role_info_dict() if context is not None else None,
         )
         return result.allowed, result.reason
     
@@ -1749,13 +1827,16 @@ def is_action_allowed(action: str) -> Tuple[bool, str]:
     return True, "Action allowed"
 
 
-def get_worker_capabilities(worker_id: str) -> List[str]:
-    """Get worker capabilities from RBAC worker registry if available."""
+def get_worker_capabilities(worker_id: str, context: Optional[TaskContext] = None) -> List[str]:
+    """Get worker capabilities from RBAC worker registry (or preflight context) if available."""
     if not RBAC_AVAILABLE:
         return []
 
     try:
-        worker = get_worker_info(worker_id)
+        if context is not None and context.worker_id == worker_id and context.worker_info is not None:
+            worker = context.worker_info_dict()
+        else:
+            worker = get_worker_info(worker_id)
         if not worker:
             return []
         caps = worker.get("capabilities") or []
@@ -1766,8 +1847,10 @@ def get_worker_capabilities(worker_id: str) -> List[str]:
         return []
 
 
-def check_cost_limit(estimated_cost: float) -> Tuple[bool, str]:
-    """Check if action would exceed cost limits."""
+def check_cost_limit(estimated_cost: float, context: Optional[TaskContext] = None) -> Tuple[bool, str]:
+    """Check if action would exceed cost limits (from preflight context when given)."""
+    if context is not None:
+        return context.check_budget(estimated_cost)
     sql = """
         SELECT 
             cb.monthly_limit_cents as limit_cents,
@@ -2586,12 +2669,13 @@ def release_allocation(task_id: str) -> bool:
 # Split into read-only check and creation functions
 # ============================================================
 
-def check_approval_status(task: Task) -> Tuple[bool, Optional[str], Optional[str]]:
+def check_approval_status(task: Task, context: Optional[TaskContext] = None) -> Tuple[bool, Optional[str], Optional[str]]:
     """
     Check approval status for a task (read-only, no side effects).
     
     Args:
         task: Task object to check approval for
+        context: Optional task preflight context holding the latest approval row
     
     Returns:
         Tuple of (requires_approval, approval_id_or_none, decision_status)
@@ -2600,6 +2684,8 @@ def check_approval_status(task: Task) -> Tuple[bool, Optional[str], Optional[str
     """
     if not task.requires_approval:
         return False, None, "not_required"
+    if context is not None:
+        return context.approval_status(True)
     
     sql = f"""
         SELECT id, decision, decided_by, decided_at
@@ -3239,8 +3325,177 @@ def delegate_to_worker(task: Task) -> Tuple[bool, Optional[str], Dict[str, Any]]
     return False, None, result
 
 
-def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = False) -> Tuple[bool, Dict]:
-    """Execute a single task with full Level 3 compliance and L2 risk assessment."""
+def _record_task_outcome(task: Task, task_succeeded: bool, result: Dict, duration_ms: int) -> None:
+    """Mark a finished task completed or failed, capture its learning and notify Slack."""
+    if task_succeeded:
+        update_task_status(task.id, "completed", result)
+        log_action("task.completed", f"Task completed: {task.title}", task_id=task.id,
+                   output_data=result, duration_ms=duration_ms)
+        # MED-02: Capture learning from successful task
+        if LEARNING_CAPTURE_AVAILABLE:
+            try:
+                capture_task_learning(
+                    execute_sql_func=execute_sql,
+                    escape_value_func=escape_value,
+                    log_action_func=log_action,
+                    task_id=task.id,
+                    task_type=task.task_type,
+                    task_title=task.title,
+                    task_description=task.description,
+                    success=True,
+                    result=result,
+                    duration_ms=duration_ms,
+                    worker_id=WORKER_ID,
+                )
+            except Exception as learn_err:
+                log_action("learning.capture_error", f"Failed to capture learning: {learn_err}",
+                           task_id=task.id, level="warning")
+        # Notify Slack (best-effort, don't affect task status)
+        try:
+            notify_task_completed(
+                task_id=task.id,
+                task_title=task.title,
+                worker_id=WORKER_ID,
+                duration_secs=duration_ms // 1000,
+                details=result.get("summary") if isinstance(result, dict) else None
+            )
+        except Exception as notify_err:
+            log_action("notification.failed", f"Failed to send completion notification: {notify_err}",
+                       task_id=task.id, level="warning")
+    else:
+        update_task_status(task.id, "failed", result)
+        log_action("task.failed", f"Task failed: {task.title}", task_id=task.id,
+                   level="error", error_data=result, duration_ms=duration_ms)
+        # MED-02: Capture learning from failed task
+        if LEARNING_CAPTURE_AVAILABLE:
+            try:
+                capture_task_learning(
+                    execute_sql_func=execute_sql,
+                    escape_value_func=escape_value,
+                    log_action_func=log_action,
+                    task_id=task.id,
+                    task_type=task.task_type,
+                    task_title=task.title,
+                    task_description=task.description,
+                    success=False,
+                    result=result,
+                    duration_ms=duration_ms,
+                    worker_id=WORKER_ID,
+                )
+            except Exception as learn_err:
+                log_action("learning.capture_error", f"Failed to capture learning: {learn_err}",
+                           task_id=task.id, level="warning")
+        # Notify Slack (best-effort, don't affect task status)
+        try:
+            notify_task_failed(
+                task_id=task.id,
+                task_title=task.title,
+                error_message=result.get("error", "Unknown error") if isinstance(result, dict) else str(result),
+                worker_id=WORKER_ID
+            )
+        except Exception as notify_err:
+            log_action("notification.failed", f"Failed to send failure notification: {notify_err}",
+                       task_id=task.id, level="warning")
+
+
+def _finish_deploy_task(
+    task: Task,
+    outcome: Tuple[Dict[str, Any], Dict[str, Any]],
+    experiment_id: Optional[str],
+    environment_id: str,
+    start_time: float,
+) -> None:
+    """Complete or fail a deploy task once its watched deployment resolves."""
+    try:
+        deploy_result, verification = outcome
+        result = {**(deploy_result or {}), "verification": verification}
+
+        if EXPERIMENTS_AVAILABLE and experiment_id:
+            try:
+                record_experiment_change(
+                    experiment_id=str(experiment_id),
+                    change_type="deploy",
+                    description=f"Railway deploy via task {task.id}",
+                    change_data={
+                        "task_id": str(task.id),
+                        "service_id": verification.get("service_id"),
+                        "service_name": verification.get("service_name"),
+                        "environment_id": environment_id,
+                        "verified": bool(verification.get("verified")),
+                    },
+                    created_by=WORKER_ID,
+                )
+            except Exception:
+                pass
+        if not verification.get("verified"):
+            log_action(
+                "task.deploy_verification_failed",
+                "Deploy verification failed",
+                level="error",
+                task_id=task.id,
+                error_data={"verification": verification},
+            )
+        else:
+            log_action(
+                "task.deploy_verified",
+                "Deploy verified",
+                level="info",
+                task_id=task.id,
+                output_data={"verification": verification},
+            )
+        duration_ms = int((time.time() - start_time) * 1000)
+        _record_task_outcome(task, bool(verification.get("verified")), result, duration_ms)
+    except Exception as finish_error:
+        log_action(
+            "task.deploy_failed",
+            f"Failed to finish deploy task: {finish_error}",
+            level="error",
+            task_id=task.id,
+            error_data={"error": str(finish_error)},
+        )
+
+
+def preflight_task(task: Task, counter: Optional[RoundTripCounter] = None) -> Optional[TaskContext]:
+    """Prefetch approval, RBAC and budget state for a task in one query.
+
+    Returns None if the prefetch fails; callers then fall back to the
+    individual per-concern checks.
+    """
+    counter = counter or RoundTripCounter()
+    with track_round_trips(counter):
+        return load_task_context(
+            task.id, task.task_type, WORKER_ID, execute_sql, escape=escape_value, counter=counter
+        )
+
+
+def execute_task(
+    task: Task,
+    dry_run: bool = False,
+    approval_bypassed: bool = False,
+    context: Optional[TaskContext] = None,
+) -> Tuple[bool, Dict]:
+    """Execute a single task with full Level 3 compliance and L2 risk assessment.
+
+    Args:
+        task: Task to execute.
+        dry_run: Simulate without executing.
+        approval_bypassed: Task was already approved (skip risk approval).
+        context: Preflight context; loaded here (one query) when not supplied.
+    """
+    counter = context.round_trips if context is not None else RoundTripCounter()
+    with track_round_trips(counter):
+        if context is None:
+            context = preflight_task(task, counter)
+        try:
+            return _execute_task_with_context(task, dry_run, approval_bypassed, context)
+        finally:
+            logger.debug("Task %s used %d DB round-trips", task.id, counter.count)
+
+
+def _execute_task_with_context(
+    task: Task, dry_run: bool, approval_bypassed: bool, context: Optional[TaskContext]
+) -> Tuple[bool, Dict]:
+    """Body of execute_task; ``context`` answers the preflight checks when present."""
     start_time = time.time()
     original_task_type = task.task_type
     if task.task_type in ("code_fix", "code_change", "code_implementation"):
@@ -3265,7 +3520,7 @@ def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = Fa
                  confidence=confidence)
     
     # Check permission using RBAC-integrated is_action_allowed
-    allowed, reason = is_action_allowed(f"task.{task.task_type}")
+    allowed, reason = is_action_allowed(f"task.{task.task_type}", context)
     if not allowed:
         log_action("task.blocked", f"Task blocked: {reason}", level="warn", task_id=task.id)
         return False, {"blocked": True, "reason": reason}
@@ -3274,7 +3529,7 @@ def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = Fa
     estimated_cost = 0.05  # Default estimate per task (~$0.05 API cost)
     if isinstance(task.payload, dict):
         estimated_cost = task.payload.get("estimated_cost", estimated_cost)
-    cost_ok, cost_msg = check_cost_limit(estimated_cost)
+    cost_ok, cost_msg = check_cost_limit(estimated_cost, context)
     if not cost_ok:
         log_action("task.budget_exceeded", f"Task blocked by budget: {cost_msg}",
                   level="warn", task_id=task.id)
@@ -3282,7 +3537,7 @@ def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = Fa
     
     # Check approval status FIRST before triggering new approval requests
     # This prevents infinite loop where risk assessment re-triggers on every pickup
-    requires_approval, approval_id, status = check_approval_status(task)
+    requires_approval, approval_id, status = check_approval_status(task, context)
     
     # L2: High-risk tasks require approval even if not explicitly marked
     # BUT: If already approved, don't re-trigger approval
@@ -3407,9 +3662,9 @@ def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = Fa
                         "payload": task.payload or {},
                     }
 
-                    handler = get_handler("workflow", execute_sql, log_action)
+                    handler = get_handler("workflow", execute_sql, log_action, context=context)
                     if handler is None:
-                        handler = get_handler("ai", execute_sql, log_action)
+                        handler = get_handler("ai", execute_sql, log_action, context=context)
                     if handler is not None:
                         handler_result = handler.execute(task_dict)
                 except Exception as handler_err:
@@ -3538,7 +3793,7 @@ def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = Fa
                 read_only_statements = {"SELECT", "WITH", "SHOW", "EXPLAIN", "DESCRIBE"}
 
                 required_scope = "database.read" if first_token in read_only_statements else "database.write"
-                allowed_scope, reason_scope = is_action_allowed(required_scope)
+                allowed_scope, reason_scope = is_action_allowed(required_scope, context)
                 if not allowed_scope:
                     result = {"blocked": True, "reason": reason_scope, "required_scope": required_scope}
                     task_succeeded = False
@@ -3682,7 +3937,7 @@ def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = Fa
                         )
 
         elif task.task_type == "api_call":
-            allowed_scope, reason_scope = is_action_allowed("api.execute")
+            allowed_scope, reason_scope = is_action_allowed("api.execute", context)
             if not allowed_scope:
                 result = {"blocked": True, "reason": reason_scope, "required_scope": "api.execute"}
                 task_succeeded = False
@@ -3767,7 +4022,7 @@ def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = Fa
                         )
 
         elif task.task_type in ("deploy", "deployment"):
-            allowed_scope, reason_scope = is_action_allowed("railway.deploy")
+            allowed_scope, reason_scope = is_action_allowed("railway.deploy", context)
             if not allowed_scope:
                 result = {"blocked": True, "reason": reason_scope, "required_scope": "railway.deploy"}
                 task_succeeded = False
@@ -3804,51 +4059,31 @@ def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = Fa
                             required_scope="railway.deploy",
                         )
 
-                        deploy_result, verification = execute_deploy_with_verification(
+                        # The deploy is tracked by the shared watcher; the task is
+                        # finished from its callback so this worker is free meanwhile
+                        start_deploy_with_verification(
                             service_id=service_id,
                             service_name=service_name,
                             environment_id=environment_id,
                             railway_token=railway_token,
                             timeout_seconds=timeout_seconds,
                             poll_interval_seconds=10,
+                            callback=lambda outcome: _finish_deploy_task(
+                                task, outcome, experiment_id, environment_id, start_time
+                            ),
                         )
-
-                        result = {**(deploy_result or {}), "verification": verification}
-
-                        if EXPERIMENTS_AVAILABLE and experiment_id:
-                            try:
-                                record_experiment_change(
-                                    experiment_id=str(experiment_id),
-                                    change_type="deploy",
-                                    description=f"Railway deploy via task {task.id}",
-                                    change_data={
-                                        "task_id": str(task.id),
-                                        "service_id": service_id,
-                                        "service_name": service_name,
-                                        "environment_id": environment_id,
-                                        "verified": bool(verification.get("verified")),
-                                    },
-                                    created_by=WORKER_ID,
-                                )
-                            except Exception:
-                                pass
-                        if not verification.get("verified"):
-                            task_succeeded = False
-                            log_action(
-                                "task.deploy_verification_failed",
-                                "Deploy verification failed",
-                                level="error",
-                                task_id=task.id,
-                                error_data={"verification": verification},
-                            )
-                        else:
-                            log_action(
-                                "task.deploy_verified",
-                                "Deploy verified",
-                                level="info",
-                                task_id=task.id,
-                                output_data={"verification": verification},
-                            )
+                        log_action(
+                            "task.deploy_started",
+                            "Deploy triggered; verification continues in the background",
+                            level="info",
+                            task_id=task.id,
+                            output_data={"service_id": service_id, "timeout_seconds": timeout_seconds},
+                        )
+                        return True, {
+                            "deploy_pending": True,
+                            "service_id": service_id,
+                            "service_name": service_name,
+                        }
                     except Exception as deploy_error:
                         result = {"error": str(deploy_error)}
                         task_succeeded = False
@@ -4203,7 +4438,7 @@ def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = Fa
             _code_executor_handled = False
 
             # PRIMARY: Try Aider/legacy code executor first (creates real GitHub PRs)
-            if not _aider_disabled and CODE_TASK_AVAILABLE:
+            if not _aider_disabled and _unified_brain.available:
                 try:
                     _ensure_proactive_min_schema(execute_sql, log_action)
                 except Exception:
@@ -4338,7 +4573,7 @@ def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = Fa
                             "priority": task.priority,
                             "payload": task.payload or {},
                         }
-                        _ai_handler = _get_handler("code", execute_sql, log_action)
+                        _ai_handler = _get_handler("code", execute_sql, log_action, context=context)
                         if _ai_handler is not None:
                             log_action(
                                 "task.aihandler_fallback",
@@ -4568,7 +4803,7 @@ def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = Fa
                     log_action("code_task.exception", f"Code task exception: {str(code_err)}",
                               level="error", task_id=task.id, error_data=result)
             elif not _ai_handled:
-                result = {"error": "Code task executor not available", "import_error": _code_task_import_error}
+                result = {"error": "Code task executor not available", "import_error": _unified_brain.error}
                 task_succeeded = False
                 log_action("code_task.unavailable", "Code task executor not available",
                           level="warn", task_id=task.id, error_data=result)
@@ -4577,7 +4812,7 @@ def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = Fa
                     hold_data = {
                         "waiting_approval": True,
                         "reason": "code_executor_unavailable",
-                        "import_error": _code_task_import_error,
+                        "import_error": _unified_brain.error,
                     }
                     update_task_status(task.id, "waiting_approval", hold_data)
                     return False, {"waiting_approval": True, **hold_data}
@@ -4606,7 +4841,7 @@ def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = Fa
                     task_id=task.id,
                 )
 
-                handler = get_handler(task.task_type, execute_sql, log_action)
+                handler = get_handler(task.task_type, execute_sql, log_action, context=context)
                 log_action(
                     "task.handler_lookup_result",
                     f"Primary handler for '{task.task_type}': {handler.__class__.__name__ if handler else 'None'}",
@@ -4614,7 +4849,7 @@ def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = Fa
                     task_id=task.id,
                 )
                 if handler is None:
-                    handler = get_handler("ai", execute_sql, log_action)
+                    handler = get_handler("ai", execute_sql, log_action, context=context)
                     log_action(
                         "task.handler_lookup_result",
                         f"Fallback handler for 'ai': {handler.__class__.__name__ if handler else 'None'}",
@@ -4682,75 +4917,8 @@ def execute_task(task: Task, dry_run: bool = False, approval_bypassed: bool = Fa
                 },
             )
             return True, result
-        elif task_succeeded:
-            update_task_status(task.id, "completed", result)
-            log_action("task.completed", f"Task completed: {task.title}", task_id=task.id,
-                       output_data=result, duration_ms=duration_ms)
-            # MED-02: Capture learning from successful task
-            if LEARNING_CAPTURE_AVAILABLE:
-                try:
-                    capture_task_learning(
-                        execute_sql_func=execute_sql,
-                        escape_value_func=escape_value,
-                        log_action_func=log_action,
-                        task_id=task.id,
-                        task_type=task.task_type,
-                        task_title=task.title,
-                        task_description=task.description,
-                        success=True,
-                        result=result,
-                        duration_ms=duration_ms,
-                        worker_id=WORKER_ID,
-                    )
-                except Exception as learn_err:
-                    log_action("learning.capture_error", f"Failed to capture learning: {learn_err}",
-                               task_id=task.id, level="warning")
-            # Notify Slack (best-effort, don't affect task status)
-            try:
-                notify_task_completed(
-                    task_id=task.id,
-                    task_title=task.title,
-                    worker_id=WORKER_ID,
-                    duration_secs=duration_ms // 1000,
-                    details=result.get("summary") if isinstance(result, dict) else None
-                )
-            except Exception as notify_err:
-                log_action("notification.failed", f"Failed to send completion notification: {notify_err}",
-                           task_id=task.id, level="warning")
         else:
-            update_task_status(task.id, "failed", result)
-            log_action("task.failed", f"Task failed: {task.title}", task_id=task.id,
-                       level="error", error_data=result, duration_ms=duration_ms)
-            # MED-02: Capture learning from failed task
-            if LEARNING_CAPTURE_AVAILABLE:
-                try:
-                    capture_task_learning(
-                        execute_sql_func=execute_sql,
-                        escape_value_func=escape_value,
-                        log_action_func=log_action,
-                        task_id=task.id,
-                        task_type=task.task_type,
-                        task_title=task.title,
-                        task_description=task.description,
-                        success=False,
-                        result=result,
-                        duration_ms=duration_ms,
-                        worker_id=WORKER_ID,
-                    )
-                except Exception as learn_err:
-                    log_action("learning.capture_error", f"Failed to capture learning: {learn_err}",
-                               task_id=task.id, level="warning")
-            # Notify Slack (best-effort, don't affect task status)
-            try:
-                notify_task_failed(
-                    task_id=task.id,
-                    task_title=task.title,
-                    error_message=result.get("error", "Unknown error") if isinstance(result, dict) else str(result),
-                    worker_id=WORKER_ID
-                )
-            except Exception as notify_err:
-                log_action("notification.failed", f"Failed to send failure notification: {notify_err}",
-                           task_id=task.id, level="warning")
+            _record_task_outcome(task, task_succeeded, result, duration_ms)
         
         return task_succeeded, result
         
@@ -4841,22 +5009,22 @@ def autonomy_loop():
         log_action("stale_cleanup.unavailable", f"Stale cleanup disabled: {_stale_cleanup_import_error}", level="warn")
     
     # Log auto-scaling framework status (SCALE-03)
-    if AUTO_SCALING_AVAILABLE and ENABLE_AUTO_SCALING:
+    if not ENABLE_AUTO_SCALING:
+        log_info("Auto-scaling disabled", {"status": "disabled", "enable_with": "ENABLE_AUTO_SCALING=true"})
+    elif _auto_scaling.available:
         log_info("Auto-scaling enabled", {"status": "enabled", "interval_seconds": AUTO_SCALING_INTERVAL_SECONDS})
-    elif AUTO_SCALING_AVAILABLE and not ENABLE_AUTO_SCALING:
-        log_info("Auto-scaling available but disabled", {"status": "disabled", "enable_with": "ENABLE_AUTO_SCALING=true"})
-    elif _auto_scaling_import_error:
-        log_action("auto_scaling.unavailable", f"Auto-scaling disabled: {_auto_scaling_import_error}", level="warn")
+    else:
+        log_action("auto_scaling.unavailable", f"Auto-scaling disabled: {_auto_scaling.error}", level="warn")
     
     # Initialize auto-scaler if enabled (SCALE-03)
     auto_scaler = None
     last_auto_scale_time = time.time()
-    if AUTO_SCALING_AVAILABLE and ENABLE_AUTO_SCALING:
+    if ENABLE_AUTO_SCALING and _auto_scaling.available:
         try:
             auto_scaler = create_auto_scaler(
                 db_endpoint=NEON_ENDPOINT,
                 connection_string=DATABASE_URL,
-                config=ScalingConfig(enabled=True)
+                config=_auto_scaling.ScalingConfig(enabled=True)
             )
             log_info("Auto-scaler initialized", {"db_endpoint": NEON_ENDPOINT})
         except Exception as as_init_err:
@@ -4929,12 +5097,10 @@ def autonomy_loop():
 
                     try:
                         from core.pr_tracker import PRTracker
-                        from src.github_automation import GitHubClient
                     except Exception:
                         PRTracker = None  # type: ignore
-                        GitHubClient = None  # type: ignore
 
-                    if PRTracker is not None and GitHubClient is not None:
+                    if PRTracker is not None:
                         # Pull oldest pending PRs first to avoid starvation.
                         allow_repos = sorted([r for r in PR_AUTO_MERGE_REPO_ALLOWLIST if r])
                         repo_filter = ", ".join([escape_value(r) for r in allow_repos])
@@ -4949,6 +5115,9 @@ def autonomy_loop():
                         pr_rows = execute_sql(pr_sql).get("rows", []) or []
                         if pr_rows:
                             tracker = PRTracker()
+                            # One batched GraphQL query per repo (state, reviews, checks);
+                            # shared with sync_all_tracked_prs and the gate checker
+                            tracker.snapshots.prefetch((pr.get("repo"), pr.get("pr_number")) for pr in pr_rows)
                             for pr in pr_rows:
                                 task_id = str(pr.get("task_id") or "")
                                 repo = str(pr.get("repo") or "")
@@ -4966,10 +5135,9 @@ def autonomy_loop():
                                 if status.mergeable is not True:
                                     continue
 
-                                # Confirm checks passed via GitHubClient (check-runs)
-                                gh = GitHubClient(repo=repo)
-                                gh_status = gh.get_pr_status(int(pr_number))
-                                if not gh_status.checks_passed:
+                                # Confirm checks passed (check-runs from the same snapshot)
+                                snapshot = tracker.snapshots.get(repo, int(pr_number))
+                                if not snapshot or not snapshot.checks_passed:
                                     continue
 
                                 try:
@@ -5463,11 +5631,11 @@ def autonomy_loop():
                                    level="warn", task_id=task.id)
                         continue  # Skip forbidden tasks without claiming
 
-                    if task.task_type == "code" and not CODE_TASK_AVAILABLE:
+                    if task.task_type == "code" and not _unified_brain.available:
                         hold_data = {
                             "waiting_approval": True,
                             "reason": "code_executor_unavailable",
-                            "import_error": _code_task_import_error,
+                            "import_error": _unified_brain.error,
                         }
                         try:
                             if SINGLE_WORKER_MODE:
@@ -5560,7 +5728,8 @@ def autonomy_loop():
                                 output_data=delegate_result
                             )
                     
-                    # Execute task locally (either no ORCHESTRATOR or delegation failed)
+                    # Execute task locally (either no ORCHESTRATOR or delegation failed);
+                    # execute_task runs the one-query preflight for the claimed task only
                     success, result = execute_task(task)
                     
                     if result.get("waiting_approval"):
@@ -5860,6 +6029,20 @@ def autonomy_loop():
 START_TIME = datetime.now(timezone.utc)
 
 
+def _check_database() -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """Database probe for the health monitor (runs in a worker thread)."""
+    start = time.time()
+    execute_sql("SELECT 1")
+    return True, "Database connection healthy", {"response_time_ms": int((time.time() - start) * 1000)}
+
+
+# Probed in the background; health requests only read the cached results
+HEALTH_MONITOR = HealthMonitor("juggernaut-main")
+HEALTH_MONITOR.register("database", _check_database, critical=True)
+HEALTH_MONITOR.register("workers", check_worker_registry, interval=60)
+HEALTH_MONITOR.register("memory", check_memory_usage, interval=60)
+
+
 class HealthHandler(BaseHTTPRequestHandler):
     """HTTP handler for health checks and dashboard API."""
     
@@ -5870,73 +6053,37 @@ class HealthHandler(BaseHTTPRequestHandler):
             return
         logger.info("%s - - [%s] %s" % (self.address_string(), self.log_date_time_string(), format % args))
     
-    def _handle_health_check(self):
-        """Handle health check requests."""
+    def _send_health(self, status_code: int, body: Dict[str, Any]):
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Cache-Control", "no-store")
+        self.send_cors_headers()
+        self.end_headers()
+        self.wfile.write(json.dumps(body).encode())
+
+    def _handle_health_check(self, deep: bool = False):
+        """Handle detailed health check requests from the health monitor."""
         try:
-            # Import health check module
-            from core.health import check_database_connection, check_worker_registry, check_memory_usage
-            
-            # Run health checks
-            db_status, db_message, db_details = check_database_connection()
-            workers_status, workers_message, workers_details = check_worker_registry()
-            memory_status, memory_message, memory_details = check_memory_usage()
-            
-            # Determine overall status
-            overall_status = "healthy"
-            if not db_status:
-                overall_status = "unhealthy"
-            elif not workers_status:
-                overall_status = "degraded"
-            
-            # Build response
-            uptime_seconds = (datetime.now(timezone.utc) - START_TIME).total_seconds()
-            response = {
-                "status": overall_status,
-                "service": "juggernaut-main",
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "uptime_seconds": uptime_seconds,
-                "checks": {
-                    "database": {
-                        "status": "healthy" if db_status else "unhealthy",
-                        "message": db_message,
-                        "details": db_details
-                    },
-                    "workers": {
-                        "status": "healthy" if workers_status else "unhealthy",
-                        "message": workers_message,
-                        "details": workers_details
-                    },
-                    "memory": {
-                        "status": "healthy" if memory_status else "unhealthy",
-                        "message": memory_message,
-                        "details": memory_details
-                    }
-                },
-                "modules": {
-                    "brain": BRAIN_API_AVAILABLE,
-                    "experiments": EXPERIMENTS_AVAILABLE,
-                    "orchestration": ORCHESTRATION_AVAILABLE,
-                    "proactive": PROACTIVE_AVAILABLE,
-                    "error_recovery": ERROR_RECOVERY_AVAILABLE,
-                    "rbac": RBAC_AVAILABLE
-                }
+            if deep:
+                # Probe every dependency now, with per-check timeouts
+                result = HEALTH_MONITOR.run_now()
+            else:
+                result = HEALTH_MONITOR.snapshot()
+            result["modules"] = {
+                "brain": _brain_api_available(),
+                "experiments": EXPERIMENTS_AVAILABLE,
+                "orchestration": ORCHESTRATION_AVAILABLE,
+                "proactive": PROACTIVE_AVAILABLE,
+                "error_recovery": ERROR_RECOVERY_AVAILABLE,
+                "rbac": RBAC_AVAILABLE
             }
-            
-            # Send response
-            self.send_response(200 if overall_status == "healthy" else 503)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
+            self._send_health(200 if result["status"] == "healthy" else 503, result)
         except Exception as e:
             logger.error(f"Health check failed: {e}")
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            self._send_health(500, {
                 "status": "error",
                 "message": f"Health check failed: {str(e)}"
-            }).encode('utf-8'))
-        pass  # Suppress default logging
+            })
     
     def send_cors_headers(self):
         """Add CORS headers to allow dashboard access."""
@@ -5964,15 +6111,11 @@ class HealthHandler(BaseHTTPRequestHandler):
                     key, value = param.split('=', 1)
                     params[key] = urllib.parse.unquote(value)
         
-        # Health endpoint
+        # Health endpoints: all served from the health monitor's cache
         if path == "/health":
             uptime = (datetime.now(timezone.utc) - START_TIME).total_seconds()
-            
-            db_ok = True
-            try:
-                execute_sql("SELECT 1")
-            except Exception:
-                db_ok = False
+            database = HEALTH_MONITOR.snapshot()["checks"]["database"]
+            db_ok = database["status"] == "healthy"
             
             status = "healthy" if db_ok else "degraded"
             response = {
@@ -5982,16 +6125,22 @@ class HealthHandler(BaseHTTPRequestHandler):
                 "worker_id": WORKER_ID,
                 "uptime_seconds": int(uptime),
                 "database": "connected" if db_ok else "error",
+                "database_checked_at": database.get("checked_at"),
                 "loop_interval": LOOP_INTERVAL,
                 "dry_run": DRY_RUN,
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }
-            
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.send_cors_headers()
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode())
+            self._send_health(200, response)
+        
+        elif path == "/health/live":
+            self._send_health(200, HEALTH_MONITOR.liveness())
+        
+        elif path == "/health/ready":
+            ready, result = HEALTH_MONITOR.readiness()
+            self._send_health(200 if ready else 503, result)
+        
+        elif path == "/health/deep":
+            self._handle_health_check(deep=True)
         
         # Root endpoint
         elif path == "/":
@@ -6005,7 +6154,7 @@ class HealthHandler(BaseHTTPRequestHandler):
                 "version": DEPLOY_VERSION,
                 "commit": DEPLOY_COMMIT,
                 "endpoints": [
-                    "/", "/health",
+                    "/", "/health", "/health/live", "/health/ready", "/health/deep",
                     "/api/dashboard/stats",
                     "/api/dashboard/opportunities",
                     "/api/executive",
@@ -6462,6 +6611,7 @@ class HealthHandler(BaseHTTPRequestHandler):
 
 def run_health_server():
     """Run the health check HTTP server."""
+    HEALTH_MONITOR.start()
     server = ThreadingHTTPServer(("0.0.0.0", PORT), HealthHandler)
     print(f"Health server running on port {PORT}")
     server.serve_forever()
@@ -6502,9 +6652,9 @@ if __name__ == "__main__":
     print(f"RBAC: {'available' if RBAC_AVAILABLE else 'NOT AVAILABLE'}")  # GAP-03
     if _rbac_import_error:
         print(f"  RBAC import error: {_rbac_import_error}")
-    print(f"Brain API: {'available' if BRAIN_API_AVAILABLE else 'NOT AVAILABLE'}")
-    if _brain_api_import_error:
-        print(f"  Brain import error: {_brain_api_import_error}")
+    # Brain API imports off the startup path; failures are logged by the preload
+    print("Brain API: loading in background")
+    preload_in_background([_unified_brain, _brain_api])
     
     def _env_present(key: str) -> bool:
         return bool((os.getenv(key) or "").strip())
@@ -34,6 +34,7 @@ from urllib.parse import urlencode, quote
 
 import aiohttp
 import uvicorn
+from upstreams import UpstreamRegistry
 
 from mcp.server import Server
 from mcp.server.sse import SseServerTransport
@@ -120,10 +121,13 @@ SUPABASE_SERVICE_KEY = os.environ.get('SUPABASE_SERVICE_KEY', '')
 CF_ACCESS_CLIENT_ID = os.environ.get('CF_ACCESS_CLIENT_ID', '')
 CF_ACCESS_CLIENT_SECRET = os.environ.get('CF_ACCESS_CLIENT_SECRET', '')
 
-# Token caches
-_st_token = {"token": None, "expires": 0}
-_msgraph_token = {"token": None, "expires": 0}
-_google_token = {"token": None, "expires": 0}
+# Upstream connection limits (per-upstream overrides: MCP_<NAME>_CONCURRENCY, MCP_<NAME>_RATE,
+# MCP_<NAME>_TIMEOUT). The default total timeout is aiohttp's own, which long OpenRouter,
+# image generation and puppeteer calls rely on.
+MCP_UPSTREAM_CONCURRENCY = int(os.environ.get('MCP_UPSTREAM_CONCURRENCY', 10))
+MCP_UPSTREAM_TIMEOUT = float(os.environ.get('MCP_UPSTREAM_TIMEOUT', 300))
+MCP_CONNECTOR_LIMIT = int(os.environ.get('MCP_CONNECTOR_LIMIT', 100))
+TOKEN_REFRESH_MARGIN = float(os.environ.get('MCP_TOKEN_REFRESH_MARGIN', 300))
 
 # Webhook storage
 webhook_events = []
@@ -131,6 +135,55 @@ webhook_events = []
 # Create MCP Server
 mcp = Server("juggernaut-mcp")
 
+
+def _new_client_session(timeout: float = MCP_UPSTREAM_TIMEOUT) -> aiohttp.ClientSession:
+    """One long-lived session per upstream (keep-alive, cached DNS).
+
+    Cookies are not kept: the session is shared by every caller of the
+    upstream, so one response's cookies must not ride along on later calls.
+    """
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=MCP_CONNECTOR_LIMIT, ttl_dns_cache=300),
+        cookie_jar=aiohttp.DummyCookieJar(),
+        timeout=aiohttp.ClientTimeout(total=timeout),
+    )
+
+
+def _configure_upstream(name: str, concurrency: int = None, rate: float = None, timeout: float = None) -> None:
+    env = name.upper()
+    timeout = float(os.environ.get(f'MCP_{env}_TIMEOUT', timeout or MCP_UPSTREAM_TIMEOUT))
+    upstreams.configure(
+        name,
+        max_concurrency=int(os.environ.get(f'MCP_{env}_CONCURRENCY', concurrency or MCP_UPSTREAM_CONCURRENCY)),
+        rate_per_sec=float(os.environ.get(f'MCP_{env}_RATE', rate or 0)) or None,
+        session_factory=lambda: _new_client_session(timeout),
+    )
+
+
+# Shared upstream sessions, opened/closed in the ASGI lifespan
+upstreams = UpstreamRegistry(_new_client_session, default_concurrency=MCP_UPSTREAM_CONCURRENCY)
+# name, concurrency, rate per second, total timeout (None: MCP_UPSTREAM_TIMEOUT)
+for _name, _concurrency, _rate, _timeout in (
+    ("database", 20, None, None),
+    ("github", 8, 10, None),
+    ("railway", 4, 5, None),
+    ("vercel", 4, 5, None),
+    ("servicetitan", 5, 10, None),
+    ("msgraph", 5, 10, None),
+    ("oauth", 2, None, 30),
+    ("perplexity", 4, 2, None),
+    ("openrouter", 8, None, None),
+    ("pinecone", 8, None, None),
+    ("meta", 2, 1, None),
+    ("twitter", 2, 1, None),
+    ("google_maps", 8, 25, 30),
+    ("google", 4, 5, None),
+    ("slack", 4, 1, 30),
+    ("puppeteer", 4, None, None),
+    ("fetch", None, None, None),
+):
+    _configure_upstream(_name, _concurrency, _rate, _timeout)
+
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
@@ -147,7 +200,7 @@ async def execute_sql(query: str, params: list[Any] | None = None) -> dict[str,
     if CF_ACCESS_CLIENT_ID:
         headers["CF-Access-Client-Id"] = CF_ACCESS_CLIENT_ID
         headers["CF-Access-Client-Secret"] = CF_ACCESS_CLIENT_SECRET
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["database"] as session:
         async with session.post(SUPABASE_RPC_URL, headers=headers, json={"query": query}) as resp:
             data = await resp.json()
             if isinstance(data, list):
@@ -164,7 +217,7 @@ async def github_api(method: str, endpoint: str, data: dict = None) -> dict[str,
         return {"error": "GitHub not configured"}
     url = f"https://api.github.com/repos/{GITHUB_REPO}/{endpoint}"
     headers = {"Accept": "application/vnd.github.v3+json", "Authorization": f"Bearer {GITHUB_TOKEN}"}
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["github"] as session:
         if method == "GET":
             async with session.get(url, headers=headers) as resp:
                 return await resp.json()
@@ -187,7 +240,7 @@ async def railway_graphql(query: str, variables: dict = None) -> dict[str, Any]:
     payload = {"query": query}
     if variables:
         payload["variables"] = variables
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["railway"] as session:
         async with session.post("https://backboard.railway.com/graphql/v2", headers=headers, json=payload) as resp:
             return await resp.json()
 
@@ -198,7 +251,7 @@ async def vercel_api(method: str, endpoint: str, data: dict = None) -> dict[str,
         return {"error": "Vercel not configured"}
     url = f"https://api.vercel.com{endpoint}"
     headers = {"Authorization": f"Bearer {VERCEL_TOKEN}"}
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["vercel"] as session:
         if method == "GET":
             async with session.get(url, headers=headers) as resp:
                 return await resp.json()
@@ -207,18 +260,21 @@ async def vercel_api(method: str, endpoint: str, data: dict = None) -> dict[str,
                 return await resp.json()
 
 
-async def get_servicetitan_token() -> str:
-    """Get ServiceTitan OAuth token."""
-    if _st_token["token"] and time.time() < _st_token["expires"]:
-        return _st_token["token"]
+async def _fetch_servicetitan_token() -> tuple[str, float]:
     if not ST_CLIENT_ID or not ST_CLIENT_SECRET:
-        return ""
-    async with aiohttp.ClientSession() as session:
+        return "", 0
+    async with upstreams["oauth"] as session:
         async with session.post("https://auth.servicetitan.io/connect/token", data={"grant_type": "client_credentials", "client_id": ST_CLIENT_ID, "client_secret": ST_CLIENT_SECRET}) as resp:
             data = await resp.json()
-            _st_token["token"] = data.get("access_token", "")
-            _st_token["expires"] = time.time() + data.get("expires_in", 3600) - 60
-            return _st_token["token"]
+            return data.get("access_token", ""), data.get("expires_in", 3600)
+
+
+_st_token = upstreams.token_cache("servicetitan", _fetch_servicetitan_token, TOKEN_REFRESH_MARGIN)
+
+
+async def get_servicetitan_token() -> str:
+    """Get ServiceTitan OAuth token (cached, refreshed before expiry)."""
+    return await _st_token.get()
 
 
 async def servicetitan_api(method: str, endpoint: str, data: dict = None) -> dict[str, Any]:
@@ -230,7 +286,7 @@ async def servicetitan_api(method: str, endpoint: str, data: dict = None) -> dic
         return {"error": "Could not get ServiceTitan token"}
     url = f"https://api.servicetitan.io/{endpoint}"
     headers = {"Authorization": f"Bearer {token}", "ST-App-Key": ST_APP_KEY, "Content-Type": "application/json"}
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["servicetitan"] as session:
         if method == "GET":
             async with session.get(url, headers=headers) as resp:
                 return await resp.json()
@@ -239,21 +295,24 @@ async def servicetitan_api(method: str, endpoint: str, data: dict = None) -> dic
                 return await resp.json()
 
 
-async def get_msgraph_token() -> str:
-    """Get MS Graph OAuth token."""
-    if _msgraph_token["token"] and time.time() < _msgraph_token["expires"]:
-        return _msgraph_token["token"]
+async def _fetch_msgraph_token() -> tuple[str, float]:
     if not MSGRAPH_CLIENT_ID or not MSGRAPH_CLIENT_SECRET or not MSGRAPH_TENANT_ID:
-        return ""
-    async with aiohttp.ClientSession() as session:
+        return "", 0
+    async with upstreams["oauth"] as session:
         async with session.post(
             f"https://login.microsoftonline.com/{MSGRAPH_TENANT_ID}/oauth2/v2.0/token",
             data={"grant_type": "client_credentials", "client_id": MSGRAPH_CLIENT_ID, "client_secret": MSGRAPH_CLIENT_SECRET, "scope": "https://graph.microsoft.com/.default"}
         ) as resp:
             data = await resp.json()
-            _msgraph_token["token"] = data.get("access_token", "")
-            _msgraph_token["expires"] = time.time() + data.get("expires_in", 3600) - 60
-            return _msgraph_token["token"]
+            return data.get("access_token", ""), data.get("expires_in", 3600)
+
+
+_msgraph_token = upstreams.token_cache("msgraph", _fetch_msgraph_token, TOKEN_REFRESH_MARGIN)
+
+
+async def get_msgraph_token() -> str:
+    """Get MS Graph OAuth token (cached, refreshed before expiry)."""
+    return await _msgraph_token.get()
 
 
 async def msgraph_api(method: str, endpoint: str, data: dict = None, user: str = None) -> dict[str, Any]:
@@ -264,7 +323,7 @@ async def msgraph_api(method: str, endpoint: str, data: dict = None, user: str =
     user_email = user or MSGRAPH_USER_EMAIL
     url = f"https://graph.microsoft.com/v1.0/users/{user_email}/{endpoint}"
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["msgraph"] as session:
         if method == "GET":
             async with session.get(url, headers=headers) as resp:
                 return await resp.json()
@@ -279,7 +338,7 @@ async def perplexity_search(query: str, model: str = "sonar") -> dict[str, Any]:
     """Search with Perplexity AI."""
     if not PERPLEXITY_API_KEY:
         return {"error": "Perplexity not configured"}
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["perplexity"] as session:
         async with session.post(
             "https://api.perplexity.ai/chat/completions",
             headers={"Authorization": f"Bearer {PERPLEXITY_API_KEY}", "Content-Type": "application/json"},
@@ -296,7 +355,7 @@ async def generate_image(prompt: str, model: str = "openai/dall-e-3", size: str
     """Generate image via OpenRouter."""
     if not OPENROUTER_API_KEY:
         return {"error": "OpenRouter not configured"}
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["openrouter"] as session:
         async with session.post(
             LLM_IMAGE_ENDPOINT,
             headers={"Authorization": f"Bearer {OPENROUTER_API_KEY}", "Content-Type": "application/json"},
@@ -309,7 +368,7 @@ async def pinecone_upsert(vectors: list, namespace: str = "") -> dict[str, Any]:
     """Upsert vectors to Pinecone."""
     if not PINECONE_API_KEY or not PINECONE_HOST:
         return {"error": "Pinecone not configured"}
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["pinecone"] as session:
         async with session.post(
             f"https://{PINECONE_HOST}/vectors/upsert",
             headers={"Api-Key": PINECONE_API_KEY, "Content-Type": "application/json"},
@@ -322,7 +381,7 @@ async def pinecone_query(vector: list, top_k: int = 10, namespace: str = "", inc
     """Query Pinecone for similar vectors."""
     if not PINECONE_API_KEY or not PINECONE_HOST:
         return {"error": "Pinecone not configured"}
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["pinecone"] as session:
         async with session.post(
             f"https://{PINECONE_HOST}/query",
             headers={"Api-Key": PINECONE_API_KEY, "Content-Type": "application/json"},
@@ -335,7 +394,7 @@ async def meta_post(message: str, link: str = None, image_url: str = None) -> di
     """Post to Facebook/Instagram via Meta Graph API."""
     if not META_ACCESS_TOKEN or not META_PAGE_ID:
         return {"error": "Meta not configured"}
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["meta"] as session:
         data = {"message": message, "access_token": META_ACCESS_TOKEN}
         if link:
             data["link"] = link
@@ -376,7 +435,7 @@ async def twitter_post(text: str) -> dict[str, Any]:
     oauth_params["oauth_signature"] = signature
     auth_header = "OAuth " + ", ".join(f'{k}="{urllib.parse.quote(str(v), safe="")}"' for k, v in oauth_params.items())
     
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["twitter"] as session:
         async with session.post(url, headers={"Authorization": auth_header, "Content-Type": "application/json"}, json={"text": text}) as resp:
             return await resp.json()
 
@@ -385,7 +444,7 @@ async def google_maps_geocode(address: str) -> dict[str, Any]:
     """Geocode an address using Google Maps."""
     if not GOOGLE_MAPS_API_KEY:
         return {"error": "Google Maps not configured"}
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["google_maps"] as session:
         async with session.get(
             "https://maps.googleapis.com/maps/api/geocode/json",
             params={"address": address, "key": GOOGLE_MAPS_API_KEY}
@@ -397,7 +456,7 @@ async def google_maps_directions(origin: str, destination: str, mode: str = "dri
     """Get directions using Google Maps."""
     if not GOOGLE_MAPS_API_KEY:
         return {"error": "Google Maps not configured"}
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["google_maps"] as session:
         async with session.get(
             "https://maps.googleapis.com/maps/api/directions/json",
             params={"origin": origin, "destination": destination, "mode": mode, "key": GOOGLE_MAPS_API_KEY}
@@ -409,7 +468,7 @@ async def google_maps_distance(origins: str, destinations: str) -> dict[str, Any
     """Get distance matrix using Google Maps."""
     if not GOOGLE_MAPS_API_KEY:
         return {"error": "Google Maps not configured"}
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["google_maps"] as session:
         async with session.get(
             "https://maps.googleapis.com/maps/api/distancematrix/json",
             params={"origins": origins, "destinations": destinations, "key": GOOGLE_MAPS_API_KEY}
@@ -417,14 +476,9 @@ async def google_maps_distance(origins: str, destinations: str) -> dict[str, Any
             return await resp.json()
 
 
-async def get_google_token() -> str:
-    """Get Google OAuth token from service account."""
-    if _google_token["token"] and time.time() < _google_token["expires"]:
-        return _google_token["token"]
-    if GOOGLE_SHEETS_TOKEN:
-        return GOOGLE_SHEETS_TOKEN
+async def _fetch_google_token() -> tuple[str, float]:
     if not GOOGLE_SERVICE_ACCOUNT:
-        return ""
+        return "", 0
     # JWT-based auth for service account
     try:
         import jwt
@@ -438,15 +492,23 @@ async def get_google_token() -> str:
             "exp": now + 3600
         }
         signed_jwt = jwt.encode(payload, sa["private_key"], algorithm="RS256")
-        async with aiohttp.ClientSession() as session:
+        async with upstreams["oauth"] as session:
             async with session.post("https://oauth2.googleapis.com/token", data={"grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer", "assertion": signed_jwt}) as resp:
                 data = await resp.json()
-                _google_token["token"] = data.get("access_token", "")
-                _google_token["expires"] = time.time() + 3500
-                return _google_token["token"]
+                return data.get("access_token", ""), data.get("expires_in", 3600)
     except Exception as e:
         logger.error(f"Google auth error: {e}")
-        return ""
+        return "", 0
+
+
+_google_token = upstreams.token_cache("google", _fetch_google_token, TOKEN_REFRESH_MARGIN)
+
+
+async def get_google_token() -> str:
+    """Get Google OAuth token from service account (cached, refreshed before expiry)."""
+    if GOOGLE_SHEETS_TOKEN:
+        return GOOGLE_SHEETS_TOKEN
+    return await _google_token.get()
 
 
 async def sheets_read(spreadsheet_id: str, range_name: str) -> dict[str, Any]:
@@ -454,7 +516,7 @@ async def sheets_read(spreadsheet_id: str, range_name: str) -> dict[str, Any]:
     token = await get_google_token()
     if not token:
         return {"error": "Google Sheets not configured"}
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["google"] as session:
         async with session.get(
             f"https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet_id}/values/{range_name}",
             headers={"Authorization": f"Bearer {token}"}
@@ -467,7 +529,7 @@ async def sheets_write(spreadsheet_id: str, range_name: str, values: list) -> di
     token = await get_google_token()
     if not token:
         return {"error": "Google Sheets not configured"}
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["google"] as session:
         async with session.put(
             f"https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet_id}/values/{range_name}",
             headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
@@ -482,7 +544,7 @@ async def sheets_append(spreadsheet_id: str, range_name: str, values: list) -> d
     token = await get_google_token()
     if not token:
         return {"error": "Google Sheets not configured"}
-    async with aiohttp.ClientSession() as session:
+    async with upstreams["google"] as session:
         async with session.post(
             f"https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet_id}/values/{range_name}:append",
             headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
@@ -786,7 +848,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             headers = {}
             if puppeteer_token:
                 headers["Authorization"] = f"Bearer {puppeteer_token}"
-            async with aiohttp.ClientSession() as session:
+            async with upstreams["puppeteer"] as session:
                 async with session.post(
                     f"{PUPPETEER_URL}/action",
                     json={"action": action, **arguments},
@@ -932,7 +994,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                 return [TextContent(type="text", text=json.dumps({"error": "LLM disabled"}))]
             if not OPENROUTER_API_KEY:
                 return [TextContent(type="text", text=json.dumps({"error": "OpenRouter not configured"}))]
-            async with aiohttp.ClientSession() as session:
+            async with upstreams["openrouter"] as session:
                 default_model = (os.environ.get("LLM_MODEL") or os.environ.get("OPENROUTER_MODEL") or "openrouter/auto")
                 payload = {
                     "model": arguments.get("model") or default_model,
@@ -952,7 +1014,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                 return [TextContent(type="text", text=json.dumps({"error": "LLM disabled"}))]
             if not OPENROUTER_API_KEY:
                 return [TextContent(type="text", text=json.dumps({"error": "OpenRouter not configured"}))]
-            async with aiohttp.ClientSession() as session:
+            async with upstreams["openrouter"] as session:
                 default_model = (os.environ.get("LLM_MODEL") or os.environ.get("OPENROUTER_MODEL") or "openrouter/auto")
                 payload = {
                     "model": arguments.get("model") or default_model,
@@ -984,7 +1046,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         elif name == "vector_delete":
             if not PINECONE_API_KEY or not PINECONE_HOST:
                 return [TextContent(type="text", text=json.dumps({"error": "Pinecone not configured"}))]
-            async with aiohttp.ClientSession() as session:
+            async with upstreams["pinecone"] as session:
                 async with session.post(f"https://{PINECONE_HOST}/vectors/delete", headers={"Api-Key": PINECONE_API_KEY, "Content-Type": "application/json"}, json={"ids": arguments.get("ids"), "namespace": arguments.get("namespace", "")}) as resp:
                     result = await resp.json()
             return [TextContent(type="text", text=json.dumps(result, default=str))]
@@ -1006,7 +1068,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             headers = {}
             if puppeteer_token:
                 headers["Authorization"] = f"Bearer {puppeteer_token}"
-            async with aiohttp.ClientSession() as session:
+            async with upstreams["puppeteer"] as session:
                 async with session.post(f"{PUPPETEER_URL}/action", json={"action": "html_to_pdf", "html": arguments.get("html"), "filename": arguments.get("filename", "document.pdf")}, headers=headers) as resp:
                     result = await resp.json()
             return [TextContent(type="text", text=json.dumps(result, default=str))]
@@ -1018,7 +1080,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             headers = {}
             if puppeteer_token:
                 headers["Authorization"] = f"Bearer {puppeteer_token}"
-            async with aiohttp.ClientSession() as session:
+            async with upstreams["puppeteer"] as session:
                 async with session.post(f"{PUPPETEER_URL}/action", json={"action": "pdf", "url": arguments.get("url"), "filename": arguments.get("filename", "document.pdf")}, headers=headers) as resp:
                     result = await resp.json()
             return [TextContent(type="text", text=json.dumps(result, default=str))]
@@ -1066,7 +1128,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             if not SLACK_BOT_TOKEN or not WAR_ROOM_CHANNEL:
                 return [TextContent(type="text", text=json.dumps({"error": "Slack not configured"}))]
             bot_names = {"otto": "Otto", "devin": "Devin", "juggernaut": "JUGGERNAUT"}
-            async with aiohttp.ClientSession() as session:
+            async with upstreams["slack"] as session:
                 async with session.post("https://slack.com/api/chat.postMessage", headers={"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}, json={"channel": WAR_ROOM_CHANNEL, "text": arguments.get("message"), "username": bot_names.get(arguments.get("bot", "").lower(), "JUGGERNAUT")}) as resp:
                     result = await resp.json()
             return [TextContent(type="text", text=json.dumps(result, default=str))]
@@ -1074,7 +1136,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         elif name == "war_room_history":
             if not SLACK_BOT_TOKEN or not WAR_ROOM_CHANNEL:
                 return [TextContent(type="text", text=json.dumps({"error": "Slack not configured"}))]
-            async with aiohttp.ClientSession() as session:
+            async with upstreams["slack"] as session:
                 async with session.get("https://slack.com/api/conversations.history", headers={"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}, params={"channel": WAR_ROOM_CHANNEL, "limit": arguments.get("limit", 20)}) as resp:
                     result = await resp.json()
             return [TextContent(type="text", text=json.dumps(result, default=str))]
@@ -1096,7 +1158,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         elif name == "fetch_url":
             url, method = arguments.get("url"), arguments.get("method", "GET").upper()
             headers, body = arguments.get("headers", {}), arguments.get("body")
-            async with aiohttp.ClientSession() as session:
+            async with upstreams["fetch"] as session:
                 kwargs = {"headers": headers}
                 if body:
                     try:
@@ -1173,7 +1235,22 @@ async def send_response(send, status: int, body: bytes, content_type: bytes = b"
     await send({"type": "http.response.start", "status": status, "headers": headers})
     await send({"type": "http.response.body", "body": body})
 
+async def lifespan(receive, send):
+    """Open shared upstream sessions on startup, close them on shutdown."""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await upstreams.startup()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await upstreams.shutdown()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
 async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
     if scope["type"] != "http":
         return
     path, method = scope["path"], scope["method"]
@@ -1196,6 +1273,14 @@ async def app(scope, receive, send):
         await send_response(send, 200, json.dumps({"status": "healthy", "tools": tool_count, "version": "10.0", "configured": config}).encode())
         return
     
+    # Upstream session, rate limit, token cache and request metrics
+    if path == "/mcp/status" and method == "GET":
+        if not check_auth(scope):
+            await send_response(send, 401, b'{"error":"Unauthorized"}')
+            return
+        await send_response(send, 200, json.dumps(upstreams.status(), default=str).encode())
+        return
+    
     if path.startswith("/webhook") and method == "POST":
         await handle_webhook(scope, receive, send)
         return
@@ -0,0 +1,287 @@
+"""
+Shared upstream clients for the MCP server
+
+Every helper in server.py used to open a new aiohttp.ClientSession per call
+(new connection pool, DNS lookup and TLS handshake each time). This module
+keeps one long-lived session per upstream plus the controls around it:
+
+- Upstream: session (created in the ASGI lifespan, or lazily on first use),
+  a concurrency semaphore, an optional token-bucket rate limiter and
+  request metrics (count, errors, status codes, latency).
+- TokenCache: OAuth access tokens refreshed ``refresh_margin`` seconds
+  before expiry, single-flight so concurrent callers share one refresh; a
+  still-valid token is kept if a refresh fails.
+- UpstreamRegistry: named upstreams, startup/shutdown and the status
+  payload served on /mcp/status.
+
+aiohttp is not imported here; server.py passes the session factory.
+
+Usage:
+    upstreams = UpstreamRegistry(session_factory)
+    upstreams.configure("github", max_concurrency=8, rate_per_sec=10)
+
+    async with upstreams["github"] as http:
+        async with http.get(url, headers=headers) as resp:
+            data = await resp.json()
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency samples kept per upstream for percentiles
+LATENCY_SAMPLES = 500
+
+
+class RateLimiter:
+    """Async token bucket: ``rate_per_sec`` sustained, up to ``burst`` at once."""
+
+    def __init__(self, rate_per_sec: float, burst: Optional[int] = None):
+        self.rate = float(rate_per_sec)
+        self.capacity = float(burst or max(1, int(rate_per_sec)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waited_seconds = 0.0
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+                self.waited_seconds += wait
+                await asyncio.sleep(wait)
+
+
+class UpstreamMetrics:
+    """Request counters and latency samples for one upstream."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.statuses: Counter = Counter()
+        self.last_error: Optional[str] = None
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, latency: float, status: Optional[int] = None, error: Optional[BaseException] = None) -> None:
+        self.requests += 1
+        self._latencies.append(latency)
+        if status is not None:
+            self.statuses[str(status)] += 1
+        if error is not None or (status is not None and status >= 500):
+            self.errors += 1
+            self.last_error = f"{type(error).__name__}: {error}"[:200] if error else f"HTTP {status}"
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self._latencies)
+
+        def pct(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000, 1)
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "statuses": dict(self.statuses),
+            "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0)},
+            "last_error": self.last_error,
+        }
+
+
+class Upstream:
+    """One upstream service: shared session, concurrency limit, rate limit, metrics."""
+
+    def __init__(
+        self,
+        name: str,
+        session_factory: Callable[[], Any],
+        max_concurrency: int = 10,
+        rate_per_sec: Optional[float] = None,
+        burst: Optional[int] = None,
+    ):
+        self.name = name
+        self._session_factory = session_factory
+        self._session = None
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.limiter = RateLimiter(rate_per_sec, burst) if rate_per_sec else None
+        self.metrics = UpstreamMetrics()
+
+    @property
+    def session(self):
+        """The shared session (created on first use if startup didn't run)."""
+        if self._session is None or getattr(self._session, "closed", False):
+            self._session = self._session_factory()
+        return self._session
+
+    @contextlib.asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs):
+        """``async with upstream.request(...) as resp`` on the shared session."""
+        async with self._semaphore:
+            if self.limiter is not None:
+                await self.limiter.acquire()
+            self.metrics.in_flight += 1
+            started = time.monotonic()
+            status = None
+            try:
+                async with self.session.request(method, url, **kwargs) as resp:
+                    status = resp.status
+                    yield resp
+            except Exception as e:
+                self.metrics.record(time.monotonic() - started, status, e)
+                raise
+            else:
+                self.metrics.record(time.monotonic() - started, status)
+            finally:
+                self.metrics.in_flight -= 1
+
+    # Session-like interface, so call sites read
+    # ``async with upstream as http: async with http.get(url) as resp``
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    async def __aenter__(self) -> "Upstream":
+        return self
+
+    async def __aexit__(self, *exc_info) -> bool:
+        return False
+
+    async def close(self) -> None:
+        if self._session is not None and not getattr(self._session, "closed", False):
+            await self._session.close()
+        self._session = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "session_open": self._session is not None and not getattr(self._session, "closed", False),
+            "max_concurrency": self.max_concurrency,
+            "rate_per_sec": self.limiter.rate if self.limiter else None,
+            "rate_limited_seconds": round(self.limiter.waited_seconds, 3) if self.limiter else 0.0,
+            **self.metrics.snapshot(),
+        }
+
+
+class TokenCache:
+    """OAuth token cache that refreshes ahead of expiry.
+
+    ``fetch`` returns ``(token, expires_in_seconds)``; an empty token means
+    "not configured / failed" and is never cached.
+    """
+
+    def __init__(self, name: str, fetch: Callable[[], Awaitable[Tuple[str, float]]], refresh_margin: float = 300.0):
+        self.name = name
+        self._fetch = fetch
+        self.refresh_margin = refresh_margin
+        self._token = ""
+        self._expires = 0.0
+        self._lock = asyncio.Lock()
+        self.refreshes = 0
+        self.failures = 0
+
+    def _fresh(self, now: float) -> bool:
+        return bool(self._token) and now < self._expires - self.refresh_margin
+
+    async def get(self) -> str:
+        if self._fresh(time.time()):
+            return self._token
+        async with self._lock:
+            now = time.time()
+            # Another caller may have refreshed while we waited
+            if self._fresh(now):
+                return self._token
+            try:
+                token, expires_in = await self._fetch()
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"{self.name} token refresh failed: {e}")
+                token, expires_in = "", 0
+            if token:
+                self._token, self._expires = token, now + float(expires_in or 3600)
+                self.refreshes += 1
+            elif self._token and now < self._expires:
+                # Refresh failed but the old token hasn't expired yet
+                return self._token
+            else:
+                self._token, self._expires = "", 0.0
+            return self._token
+
+    def invalidate(self) -> None:
+        self._token, self._expires = "", 0.0
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "cached": bool(self._token),
+            "expires_in": max(0, int(self._expires - time.time())) if self._token else None,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+        }
+
+
+class UpstreamRegistry:
+    """Named upstreams and token caches, started and stopped with the ASGI app."""
+
+    def __init__(self, session_factory: Callable[[], Any], default_concurrency: int = 10):
+        self._session_factory = session_factory
+        self.default_concurrency = default_concurrency
+        self._upstreams: Dict[str, Upstream] = {}
+        self.token_caches: Dict[str, TokenCache] = {}
+        self.started_at: Optional[float] = None
+
+    def configure(self, name: str, max_concurrency: Optional[int] = None,
+                  rate_per_sec: Optional[float] = None, burst: Optional[int] = None,
+                  session_factory: Optional[Callable[[], Any]] = None) -> Upstream:
+        """Add or replace an upstream; ``session_factory`` overrides the registry's (e.g. its own timeout)."""
+        upstream = Upstream(name, session_factory or self._session_factory,
+                            max_concurrency or self.default_concurrency, rate_per_sec, burst)
+        self._upstreams[name] = upstream
+        return upstream
+
+    def token_cache(self, name: str, fetch: Callable[[], Awaitable[Tuple[str, float]]],
+                    refresh_margin: float = 300.0) -> TokenCache:
+        cache = TokenCache(name, fetch, refresh_margin)
+        self.token_caches[name] = cache
+        return cache
+
+    def __getitem__(self, name: str) -> Upstream:
+        if name not in self._upstreams:
+            self.configure(name)
+        return self._upstreams[name]
+
+    async def startup(self) -> None:
+        for upstream in self._upstreams.values():
+            upstream.session
+        self.started_at = time.time()
+
+    async def shutdown(self) -> None:
+        for upstream in self._upstreams.values():
+            with contextlib.suppress(Exception):
+                await upstream.close()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "uptime_seconds": int(time.time() - self.started_at) if self.started_at else None,
+            "upstreams": {name: u.status() for name, u in sorted(self._upstreams.items())},
+            "tokens": {name: c.status() for name, c in sorted(self.token_caches.items())},
+        }
@@ -0,0 +1,107 @@
+-- Migration 018: Segmented audit hash chain
+-- audit_log rows are now written in batches by core.audit_chain, which
+-- computes the hash chain client-side and stores one signed checkpoint per
+-- segment, so verification only re-checks segments written since the last
+-- verified checkpoint.
+
+-- Signed checkpoint per written segment
+CREATE TABLE IF NOT EXISTS audit_segments (
+    id BIGINT PRIMARY KEY,              -- consecutive; a conflict means another writer won the race
+    first_seq BIGINT NOT NULL,
+    last_seq BIGINT NOT NULL,
+    row_count INTEGER NOT NULL,
+    start_hash VARCHAR(64) NOT NULL,    -- end_hash of the previous segment (or last legacy row)
+    end_hash VARCHAR(64) NOT NULL,
+    signature VARCHAR(64) NOT NULL,     -- HMAC-SHA256 under AUDIT_SIGNING_KEY
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    verified_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_audit_segments_verified ON audit_segments(id) WHERE verified_at IS NOT NULL;
+
+-- Position of each row in the client-side chain (NULL for legacy rows)
+ALTER TABLE audit_log ADD COLUMN IF NOT EXISTS segment_id BIGINT;
+ALTER TABLE audit_log ADD COLUMN IF NOT EXISTS chain_seq BIGINT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_audit_chain_seq ON audit_log(chain_seq) WHERE chain_seq IS NOT NULL;
+
+-- Keep hashes supplied by the segment writer; only legacy inserts are chained here
+CREATE OR REPLACE FUNCTION compute_audit_hash()
+RETURNS TRIGGER AS $$
+DECLARE
+    prev_record RECORD;
+    hash_input TEXT;
+BEGIN
+    IF NEW.current_hash IS NOT NULL THEN
+        RETURN NEW;
+    END IF;
+
+    -- Get the previous record's hash
+    SELECT current_hash INTO prev_record
+    FROM audit_log
+    ORDER BY created_at DESC
+    LIMIT 1;
+
+    NEW.prev_hash := COALESCE(prev_record.current_hash, 'GENESIS');
+
+    -- Compute current hash
+    hash_input := NEW.prev_hash || NEW.event_type || NEW.actor_id ||
+                  NEW.action || COALESCE(NEW.resource_id, '') ||
+                  NEW.created_at::TEXT;
+    NEW.current_hash := encode(sha256(hash_input::bytea), 'hex');
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Legacy verification covers only rows written by the trigger
+CREATE OR REPLACE FUNCTION verify_audit_log_integrity()
+RETURNS TABLE (
+    id UUID,
+    created_at TIMESTAMPTZ,
+    hash_valid BOOLEAN,
+    error_message TEXT
+) AS $$
+DECLARE
+    prev_hash TEXT := 'GENESIS';
+    curr_record RECORD;
+    computed_hash TEXT;
+    hash_input TEXT;
+BEGIN
+    FOR curr_record IN
+        SELECT * FROM audit_log WHERE audit_log.chain_seq IS NULL ORDER BY audit_log.created_at ASC
+    LOOP
+        -- Verify previous hash matches
+        IF curr_record.prev_hash != prev_hash THEN
+            id := curr_record.id;
+            created_at := curr_record.created_at;
+            hash_valid := FALSE;
+            error_message := 'Previous hash mismatch';
+            RETURN NEXT;
+        END IF;
+
+        -- Compute and verify current hash
+        hash_input := curr_record.prev_hash || curr_record.event_type || curr_record.actor_id ||
+                      curr_record.action || COALESCE(curr_record.resource_id, '') ||
+                      curr_record.created_at::TEXT;
+        computed_hash := encode(sha256(hash_input::bytea), 'hex');
+
+        IF curr_record.current_hash != computed_hash THEN
+            id := curr_record.id;
+            created_at := curr_record.created_at;
+            hash_valid := FALSE;
+            error_message := 'Current hash mismatch';
+            RETURN NEXT;
+        END IF;
+
+        -- Update previous hash for next iteration
+        prev_hash := curr_record.current_hash;
+    END LOOP;
+
+    -- Return success if we made it through all records
+    id := NULL;
+    created_at := NOW();
+    hash_valid := TRUE;
+    error_message := 'Audit log integrity verified';
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
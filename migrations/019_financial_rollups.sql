@@ -0,0 +1,217 @@
+-- Migration 019: Incrementally maintained financial rollups
+-- Hourly and daily aggregates of revenue_events and cost_events per source,
+-- category and experiment. Triggers keep them current on every write (from
+-- record_revenue / record_cost or anywhere else), and the financial read
+-- APIs (core.financial_rollups) answer from them, so their cost depends on
+-- the window length rather than on how many events have been recorded.
+-- backfill_financial_rollups() rebuilds them from the event tables and is
+-- safe to re-run.
+--
+-- Buckets are UTC hours/days of occurred_at; events without occurred_at
+-- are not rolled up. Experiment attribution follows get_experiment_roi():
+-- cost_events.experiment_id or attribution->>'experiment', and for revenue
+-- attribution->>'experiment_id' / 'experiment' or metadata->>'experiment_id'.
+
+CREATE TABLE IF NOT EXISTS revenue_rollups (
+    grain VARCHAR(4) NOT NULL,                  -- 'hour' or 'day'
+    bucket TIMESTAMPTZ NOT NULL,                -- UTC start of the hour/day
+    source VARCHAR(100) NOT NULL DEFAULT '',
+    revenue_type VARCHAR(50) NOT NULL DEFAULT '',
+    experiment_id VARCHAR(100) NOT NULL DEFAULT '',
+    is_refund BOOLEAN NOT NULL DEFAULT FALSE,
+    event_count BIGINT NOT NULL DEFAULT 0,
+    gross_amount NUMERIC NOT NULL DEFAULT 0,
+    net_amount NUMERIC NOT NULL DEFAULT 0,
+    first_at TIMESTAMPTZ,                       -- widened only; exact after a backfill
+    last_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (grain, bucket, source, revenue_type, experiment_id, is_refund)
+);
+
+CREATE TABLE IF NOT EXISTS cost_rollups (
+    grain VARCHAR(4) NOT NULL,
+    bucket TIMESTAMPTZ NOT NULL,
+    cost_type VARCHAR(50) NOT NULL DEFAULT '',
+    category VARCHAR(100) NOT NULL DEFAULT '',
+    experiment_id VARCHAR(100) NOT NULL DEFAULT '',
+    event_count BIGINT NOT NULL DEFAULT 0,
+    amount_cents BIGINT NOT NULL DEFAULT 0,
+    first_at TIMESTAMPTZ,
+    last_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (grain, bucket, cost_type, category, experiment_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_revenue_rollups_experiment ON revenue_rollups(experiment_id, grain) WHERE experiment_id <> '';
+CREATE INDEX IF NOT EXISTS idx_cost_rollups_experiment ON cost_rollups(experiment_id, grain) WHERE experiment_id <> '';
+
+-- Add (sign = 1) or remove (sign = -1) one event from its hour and day buckets
+CREATE OR REPLACE FUNCTION apply_revenue_rollup(ev revenue_events, sign INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    g TEXT;
+BEGIN
+    IF ev.occurred_at IS NULL THEN
+        RETURN;
+    END IF;
+    FOREACH g IN ARRAY ARRAY['hour', 'day'] LOOP
+        INSERT INTO revenue_rollups AS r (
+            grain, bucket, source, revenue_type, experiment_id, is_refund,
+            event_count, gross_amount, net_amount, first_at, last_at
+        ) VALUES (
+            g, date_trunc(g, ev.occurred_at, 'UTC'),
+            COALESCE(ev.source, ''), COALESCE(ev.revenue_type, ''),
+            COALESCE(ev.attribution->>'experiment_id', ev.attribution->>'experiment',
+                     ev.metadata->>'experiment_id', ''),
+            COALESCE(ev.event_type = 'refund', FALSE),
+            sign, sign * COALESCE(ev.gross_amount, 0),
+            sign * COALESCE(ev.net_amount, ev.gross_amount, 0),
+            ev.occurred_at, ev.occurred_at
+        )
+        ON CONFLICT (grain, bucket, source, revenue_type, experiment_id, is_refund) DO UPDATE SET
+            event_count = r.event_count + EXCLUDED.event_count,
+            gross_amount = r.gross_amount + EXCLUDED.gross_amount,
+            net_amount = r.net_amount + EXCLUDED.net_amount,
+            first_at = LEAST(r.first_at, EXCLUDED.first_at),
+            last_at = GREATEST(r.last_at, EXCLUDED.last_at),
+            updated_at = NOW();
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_cost_rollup(ev cost_events, sign INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    g TEXT;
+BEGIN
+    IF ev.occurred_at IS NULL THEN
+        RETURN;
+    END IF;
+    FOREACH g IN ARRAY ARRAY['hour', 'day'] LOOP
+        INSERT INTO cost_rollups AS r (
+            grain, bucket, cost_type, category, experiment_id,
+            event_count, amount_cents, first_at, last_at
+        ) VALUES (
+            g, date_trunc(g, ev.occurred_at, 'UTC'),
+            COALESCE(ev.cost_type, ''), COALESCE(ev.category, ''),
+            COALESCE(ev.experiment_id::TEXT, ev.attribution->>'experiment', ''),
+            sign, sign * COALESCE(ev.amount_cents, 0),
+            ev.occurred_at, ev.occurred_at
+        )
+        ON CONFLICT (grain, bucket, cost_type, category, experiment_id) DO UPDATE SET
+            event_count = r.event_count + EXCLUDED.event_count,
+            amount_cents = r.amount_cents + EXCLUDED.amount_cents,
+            first_at = LEAST(r.first_at, EXCLUDED.first_at),
+            last_at = GREATEST(r.last_at, EXCLUDED.last_at),
+            updated_at = NOW();
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- A rollup failure must never block the financial write itself;
+-- backfill_financial_rollups() repairs any drift
+CREATE OR REPLACE FUNCTION maintain_revenue_rollups()
+RETURNS TRIGGER AS $$
+BEGIN
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM apply_revenue_rollup(OLD, -1);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM apply_revenue_rollup(NEW, 1);
+        END IF;
+    EXCEPTION WHEN OTHERS THEN
+        RAISE WARNING 'revenue rollup update failed: %', SQLERRM;
+    END;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION maintain_cost_rollups()
+RETURNS TRIGGER AS $$
+BEGIN
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM apply_cost_rollup(OLD, -1);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM apply_cost_rollup(NEW, 1);
+        END IF;
+    EXCEPTION WHEN OTHERS THEN
+        RAISE WARNING 'cost rollup update failed: %', SQLERRM;
+    END;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS revenue_rollups_trigger ON revenue_events;
+CREATE TRIGGER revenue_rollups_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON revenue_events
+    FOR EACH ROW EXECUTE FUNCTION maintain_revenue_rollups();
+
+DROP TRIGGER IF EXISTS cost_rollups_trigger ON cost_events;
+CREATE TRIGGER cost_rollups_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON cost_events
+    FOR EACH ROW EXECUTE FUNCTION maintain_cost_rollups();
+
+-- Rebuild rollups from the event tables, from the UTC day containing
+-- `since` (all history when NULL). Idempotent: the affected buckets are
+-- deleted and recomputed in one transaction, with writers held off so the
+-- triggers cannot count an event twice.
+CREATE OR REPLACE FUNCTION backfill_financial_rollups(since TIMESTAMPTZ DEFAULT NULL)
+RETURNS TABLE (rollup TEXT, rows_written BIGINT) AS $$
+DECLARE
+    start_day TIMESTAMPTZ := date_trunc('day', since, 'UTC');
+    n BIGINT;
+BEGIN
+    LOCK TABLE revenue_events, cost_events IN SHARE MODE;
+
+    DELETE FROM revenue_rollups WHERE start_day IS NULL OR bucket >= start_day;
+    INSERT INTO revenue_rollups (
+        grain, bucket, source, revenue_type, experiment_id, is_refund,
+        event_count, gross_amount, net_amount, first_at, last_at
+    )
+    SELECT
+        g.grain, date_trunc(g.grain, e.occurred_at, 'UTC'),
+        COALESCE(e.source, ''), COALESCE(e.revenue_type, ''),
+        COALESCE(e.attribution->>'experiment_id', e.attribution->>'experiment',
+                 e.metadata->>'experiment_id', ''),
+        COALESCE(e.event_type = 'refund', FALSE),
+        COUNT(*), COALESCE(SUM(e.gross_amount), 0),
+        COALESCE(SUM(COALESCE(e.net_amount, e.gross_amount)), 0),
+        MIN(e.occurred_at), MAX(e.occurred_at)
+    FROM revenue_events e
+    CROSS JOIN (VALUES ('hour'), ('day')) AS g(grain)
+    WHERE e.occurred_at IS NOT NULL
+      AND (start_day IS NULL OR e.occurred_at >= start_day)
+    GROUP BY 1, 2, 3, 4, 5, 6;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    rollup := 'revenue';
+    rows_written := n;
+    RETURN NEXT;
+
+    DELETE FROM cost_rollups WHERE start_day IS NULL OR bucket >= start_day;
+    INSERT INTO cost_rollups (
+        grain, bucket, cost_type, category, experiment_id,
+        event_count, amount_cents, first_at, last_at
+    )
+    SELECT
+        g.grain, date_trunc(g.grain, e.occurred_at, 'UTC'),
+        COALESCE(e.cost_type, ''), COALESCE(e.category, ''),
+        COALESCE(e.experiment_id::TEXT, e.attribution->>'experiment', ''),
+        COUNT(*), COALESCE(SUM(e.amount_cents), 0),
+        MIN(e.occurred_at), MAX(e.occurred_at)
+    FROM cost_events e
+    CROSS JOIN (VALUES ('hour'), ('day')) AS g(grain)
+    WHERE e.occurred_at IS NOT NULL
+      AND (start_day IS NULL OR e.occurred_at >= start_day)
+    GROUP BY 1, 2, 3, 4, 5;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    rollup := 'cost';
+    rows_written := n;
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Initial load
+SELECT * FROM backfill_financial_rollups();
@@ -0,0 +1,26 @@
+-- Migration 020: Outbound notification retry queue
+-- Slack and email notifications are delivered asynchronously by
+-- core.notification_queue. Deliveries that fail, and anything still queued
+-- when a process shuts down, are written here and retried with exponential
+-- backoff by whichever process has the channel registered.
+
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    channel VARCHAR(100) NOT NULL,               -- registered channel name (slack, warroom, email, ...)
+    dedup_key VARCHAR(100),
+    priority VARCHAR(10) NOT NULL DEFAULT 'normal',
+    payload JSONB NOT NULL,
+    coalesced_count INTEGER NOT NULL DEFAULT 1,  -- identical notifications folded into this one
+    attempts INTEGER NOT NULL DEFAULT 0,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending', -- pending, delivering, delivered, dead
+    last_error TEXT,
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    claimed_at TIMESTAMPTZ,
+    delivered_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_due
+    ON notification_outbox(next_attempt_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_claimed
+    ON notification_outbox(claimed_at) WHERE status = 'delivering';
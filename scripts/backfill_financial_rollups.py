@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Backfill financial rollups
+
+Rebuilds revenue_rollups / cost_rollups (migration 019) from revenue_events
+and cost_events. Idempotent: the affected days are deleted and recomputed in
+one transaction, so it can be re-run after a failed trigger, a bulk import or
+a manual correction.
+
+Usage:
+    python scripts/backfill_financial_rollups.py [--days 7]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.financial_rollups import get_financial_rollups, window_start  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--days", type=int, default=None,
+                        help="only rebuild the last N days (default: all history)")
+    args = parser.parse_args()
+
+    since = window_start(args.days) if args.days is not None else None
+    written = get_financial_rollups().backfill(since)
+    for rollup, rows in sorted(written.items()):
+        print(f"{rollup:<10}{rows:>10} rows")
+
+
+if __name__ == "__main__":
+    main()
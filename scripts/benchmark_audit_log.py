@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Audit Log Benchmark
+
+Measures the segmented audit chain (core.audit_chain) against the old
+per-row path:
+
+- write, per-row: one INSERT round trip per event (the old audit_log()).
+- write, segments: AuditSegmentWriter, one statement per --segment-size
+  events, hashes computed client-side.
+- verify, full: every segment and row re-checked (what every
+  verify_audit_log_integrity() call used to cost).
+- verify, incremental: only the segments appended since the previous
+  verification.
+
+No database is needed. Writes and reads go to an in-process store that
+sleeps --rtt-ms per round trip, so the numbers show round-trip savings plus
+the client-side hashing cost.
+
+Usage:
+    python scripts/benchmark_audit_log.py [--events 5000] [--segment-size 100] [--append 500] [--rtt-ms 1.0]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.audit_chain import AuditChainVerifier, AuditSegmentWriter  # noqa: E402
+
+
+class FakeStore:
+    def __init__(self, rtt_s: float):
+        self.rtt_s = rtt_s
+        self.round_trips = 0
+        self.rows = {}
+        self.segments = {}
+
+    def trip(self):
+        self.round_trips += 1
+        time.sleep(self.rtt_s)
+
+
+class BenchWriter(AuditSegmentWriter):
+    def __init__(self, store, segment_size):
+        super().__init__(query_fn=lambda *a: {"rows": []}, segment_size=segment_size, flush_interval=0)
+        self.store = store
+
+    def _load_head(self):
+        self.store.trip()
+        if not self.store.segments:
+            return 0, 0, "GENESIS"
+        last = self.store.segments[max(self.store.segments)]
+        return last["id"], last["last_seq"], last["end_hash"]
+
+    def _write_segment(self, segment, rows):
+        self.store.trip()
+        self.store.segments[segment["id"]] = dict(segment, verified_at=None)
+        for row in rows:
+            self.store.rows[row["chain_seq"]] = row
+
+
+class BenchVerifier(AuditChainVerifier):
+    def __init__(self, store):
+        super().__init__(query_fn=lambda *a: {"rows": []})
+        self.store = store
+
+    def _fetch_segments(self, full):
+        self.store.trip()
+        segments = [self.store.segments[i] for i in sorted(self.store.segments)]
+        verified = [s["id"] for s in segments if s["verified_at"]]
+        if not full and verified:
+            segments = [s for s in segments if s["id"] >= max(verified)]
+        return [dict(s) for s in segments]
+
+    def _fetch_rows(self, first_seq):
+        self.store.trip()
+        return [self.store.rows[s] for s in sorted(self.store.rows) if s >= first_seq]
+
+    def _mark_verified(self, segment_ids):
+        self.store.trip()
+        for segment_id in segment_ids:
+            self.store.segments[segment_id]["verified_at"] = "now"
+
+
+def make_event(i: int) -> dict:
+    return {
+        "id": str(uuid4()), "event_type": "tool.execution", "actor_type": "worker",
+        "actor_id": f"worker-{i % 8}", "action": "sql_query", "resource_type": "database",
+        "resource_id": f"table_{i % 50}", "action_details": {"rows": i, "query": "SELECT 1"},
+        "success": True, "duration_ms": i % 200, "cost_usd": 0.001,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def report(label: str, n: int, elapsed: float, trips: int) -> None:
+    print(f"{label:<24}{n:>8}{elapsed:>10.3f}{n / elapsed if elapsed else 0:>12.0f}{trips:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--segment-size", type=int, default=100)
+    parser.add_argument("--append", type=int, default=500, help="events added before the incremental verify")
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    args = parser.parse_args()
+    rtt = args.rtt_ms / 1000
+    events = [make_event(i) for i in range(args.events)]
+
+    print(f"{'':<24}{'rows':>8}{'seconds':>10}{'rows/s':>12}{'trips':>8}")
+
+    per_row = FakeStore(rtt)
+    t0 = time.perf_counter()
+    for _ in events:
+        per_row.trip()
+    report("write per-row", len(events), time.perf_counter() - t0, per_row.round_trips)
+
+    store = FakeStore(rtt)
+    writer = BenchWriter(store, args.segment_size)
+    t0 = time.perf_counter()
+    for event in events:
+        writer.submit(event)
+    writer.flush()
+    report("write segments", len(events), time.perf_counter() - t0, store.round_trips)
+
+    verifier = BenchVerifier(store)
+    for label, full in (("verify full", True), ("verify full (again)", True)):
+        store.round_trips = 0
+        t0 = time.perf_counter()
+        result = verifier.verify(full=full)
+        report(label, result["total_entries"], time.perf_counter() - t0, store.round_trips)
+        assert result["valid"], result["invalid_entries"][:3]
+
+    for event in (make_event(i) for i in range(args.append)):
+        writer.submit(event)
+    writer.flush()
+    store.round_trips = 0
+    t0 = time.perf_counter()
+    result = verifier.verify()
+    report("verify incremental", result["total_entries"], time.perf_counter() - t0, store.round_trips)
+    assert result["valid"], result["invalid_entries"][:3]
+    print(f"\nincremental verify checked {result['segments_checked']} of {len(store.segments)} segments")
+
+
+if __name__ == "__main__":
+    main()
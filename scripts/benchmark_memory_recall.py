@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Memory Recall Benchmark
+
+Compares the in-process semantic index (core.memory_index / core.embeddings)
+with the legacy keyword path used by BrainService._recall_memories_like:
+up to five "LOWER(content) LIKE '%word%'" terms OR-ed together, ordered by
+importance. The LIKE path is replayed in Python over the same synthetic
+corpus so both sides see identical data and no database is needed.
+
+Reports, per corpus size:
+- build time for the index (batch embedding)
+- median / p95 recall latency for both paths
+- hit rate@k: share of queries whose top-k contains a memory on the query's topic
+
+Usage:
+    python scripts/benchmark_memory_recall.py [--sizes 1000,10000] [--queries 200] [--k 10]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.embeddings import VectorIndex  # noqa: E402
+
+TOPICS = {
+    "checkout": ["checkout", "cart", "payment", "stripe", "purchase", "order"],
+    "deploy": ["deploy", "railway", "build", "release", "rollback", "container"],
+    "database": ["database", "postgres", "query", "index", "migration", "schema"],
+    "leads": ["lead", "angi", "customer", "quote", "servicetitan", "estimate"],
+    "slack": ["slack", "alert", "notification", "channel", "webhook", "message"],
+    "github": ["github", "pull", "review", "merge", "branch", "coderabbit"],
+}
+FILLER = ["system", "worker", "task", "today", "again", "noticed", "issue", "after", "update", "value"]
+
+# Paraphrased queries: they share few literal words with the memories
+QUERY_TEMPLATES = {
+    "checkout": ["problems paying for orders", "cart purchases failing", "stripe payments broken"],
+    "deploy": ["releases failing on railway", "container build rollback", "deployment broke"],
+    "database": ["slow postgres queries", "schema migrations", "missing index on table"],
+    "leads": ["new customers asking for quotes", "angi lead estimates", "servicetitan customer"],
+    "slack": ["alerts not reaching channel", "webhook notifications", "slack messages"],
+    "github": ["pull requests waiting on review", "merge branch conflicts", "coderabbit comments"],
+}
+
+
+def make_corpus(n: int, rng: random.Random):
+    corpus = []
+    topics = list(TOPICS)
+    for i in range(n):
+        topic = rng.choice(topics)
+        words = rng.sample(TOPICS[topic], 3) + rng.sample(FILLER, 4)
+        rng.shuffle(words)
+        corpus.append({
+            "id": f"m{i}",
+            "topic": topic,
+            "content": " ".join(words),
+            "importance": round(rng.random(), 3),
+        })
+    return corpus
+
+
+def like_recall(corpus, query: str, k: int):
+    """Replay of the LOWER(content) LIKE path (full scan, importance order)."""
+    words = [w.lower().strip(".,!?;:\"'") for w in query.split() if len(w) > 3][:5]
+    if not words:
+        return []
+    matches = [m for m in corpus if any(w in m["content"].lower() for w in words)]
+    matches.sort(key=lambda m: m["importance"], reverse=True)
+    return matches[:k]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run(size: int, n_queries: int, k: int, seed: int) -> None:
+    rng = random.Random(seed)
+    corpus = make_corpus(size, rng)
+    by_id = {m["id"]: m for m in corpus}
+
+    index = VectorIndex()
+    t0 = time.perf_counter()
+    index.add_batch((m["id"], m["content"], {"topic": m["topic"]}) for m in corpus)
+    build_ms = (time.perf_counter() - t0) * 1000
+    approx = VectorIndex(approximate=True)
+    approx.add_vectors((doc_id, vec, index.get_metadata(doc_id)) for doc_id, vec in index._vectors.items())
+
+    queries = []
+    for _ in range(n_queries):
+        topic = rng.choice(list(QUERY_TEMPLATES))
+        queries.append((topic, rng.choice(QUERY_TEMPLATES[topic])))
+
+    results = {}
+    for name, fn in (
+        ("like", lambda q: [m["id"] for m in like_recall(corpus, q, k)]),
+        ("index", lambda q: [h["id"] for h in index.search(q, k=k)]),
+        ("approx", lambda q: [h["id"] for h in approx.search(q, k=k)]),
+    ):
+        latencies, hits, precision = [], 0, []
+        for topic, query in queries:
+            t0 = time.perf_counter()
+            ids = fn(query)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            on_topic = [i for i in ids if by_id[i]["topic"] == topic]
+            hits += 1 if on_topic else 0
+            precision.append(len(on_topic) / k)
+        results[name] = (statistics.median(latencies), percentile(latencies, 0.95),
+                         hits / len(queries), statistics.mean(precision))
+
+    print(f"\n== corpus={size:,} queries={n_queries} k={k} (index build {build_ms:.0f} ms) ==")
+    print(f"{'path':<8}{'p50 ms':>10}{'p95 ms':>10}{'hit@k':>10}{'prec@k':>10}")
+    for name, (p50, p95, hit, prec) in results.items():
+        print(f"{name:<8}{p50:>10.3f}{p95:>10.3f}{hit:>10.2f}{prec:>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    for size in (int(s) for s in args.sizes.split(",") if s):
+        run(size, args.queries, args.k, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Opportunity Ingest Benchmark
+
+Compares scan ingestion before and after the in-memory dedup index:
+
+- per-item: identify_opportunity_with_dedup() for every candidate, i.e.
+  check_duplicate()'s external_id / fingerprint / similarity() queries and
+  one INSERT per new opportunity.
+- batch: identify_opportunities_with_dedup(), i.e. one load query, all
+  checks in memory (core.opportunity_dedup), one multi-row INSERT.
+
+No database is needed. Both paths run against the same in-process fake that
+answers each statement from a Python list of existing opportunities and
+sleeps --rtt-ms per round trip, so the numbers show the round-trip saving
+plus the CPU cost of the in-memory checks. Duplicate counts are printed for
+both paths as a correctness check.
+
+Usage:
+    python scripts/benchmark_opportunity_ingest.py [--existing 5000] [--batch 1000] [--rtt-ms 1.0]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import proactive  # noqa: E402
+from core.opportunity_dedup import trigram_similarity, trigrams  # noqa: E402
+
+CUSTOMERS = [f"Customer {i}" for i in range(400)]
+CATEGORIES = ["stale_estimates", "membership_renewals", "unbilled_work", "abandoned_calls", "recall_candidates"]
+WORDS = ["furnace", "tune-up", "water", "heater", "estimate", "follow", "up", "membership", "renewal",
+         "ac", "repair", "invoice", "drain", "leak", "inspection", "quote", "call", "back", "filter", "duct"]
+
+
+def make_opportunity(rng: random.Random, i: int) -> dict:
+    return {
+        "opportunity_type": "lead",
+        "category": rng.choice(CATEGORIES),
+        "description": " ".join(rng.sample(WORDS, 6)) + f" job {rng.randrange(100000)}",
+        "external_id": f"st-{i}",
+        "customer_name": rng.choice(CUSTOMERS),
+        "estimated_value": rng.randrange(100, 5000),
+    }
+
+
+class FakeDB:
+    """Answers the statements used by both ingest paths from a Python list."""
+
+    def __init__(self, rows, rtt_s: float):
+        self.rows = list(rows)
+        self.rtt_s = rtt_s
+        self.round_trips = 0
+
+    def __call__(self, sql, params=None):
+        self.round_trips += 1
+        time.sleep(self.rtt_s)
+        text = " ".join(sql.split())
+        if text.startswith("INSERT INTO opportunities"):
+            count = max(1, text.count("'identified'"))
+            return {"rows": [{"id": i} for i in range(count)]}
+        if "WHERE external_id = $1" in text:
+            return {"rows": [r for r in self.rows if r["external_id"] == params[0]][:1]}
+        if "metadata->>'fingerprint' = $1" in text:
+            return {"rows": [r for r in self.rows if r["fingerprint"] == params[0]][:1]}
+        if "similarity(description, $4)" in text:
+            op_type, category, customer, description = params
+            grams = trigrams(description)
+            hits = [
+                r for r in self.rows
+                if r["opportunity_type"] == op_type and r["category"] == category
+                and r["customer_name"].lower() == customer.lower()
+                and trigram_similarity(grams, trigrams(r["description"])) > 0.6
+            ]
+            return {"rows": hits[:1]}
+        if text.startswith("SELECT id, opportunity_type, category, description, status"):
+            return {"rows": self.rows}
+        return {"rows": []}
+
+
+def build_existing(n: int, rng: random.Random):
+    rows = []
+    for i in range(n):
+        opp = make_opportunity(rng, i)
+        opp["id"] = f"o{i}"
+        opp["status"] = "new"
+        opp["fingerprint"] = proactive.compute_opportunity_fingerprint(
+            opp["opportunity_type"], opp["category"], opp["description"], opp["external_id"], opp["customer_name"]
+        )
+        rows.append(opp)
+    return rows
+
+
+def build_batch(existing, size: int, rng: random.Random):
+    batch = []
+    for i in range(size):
+        roll = rng.random()
+        if roll < 0.2:  # re-scanned external ID
+            batch.append({k: v for k, v in rng.choice(existing).items() if k not in ("id", "status", "fingerprint")})
+        elif roll < 0.3:  # same job, slightly reworded, no external ID
+            src = rng.choice(existing)
+            batch.append({**make_opportunity(rng, 0), "external_id": None, "category": src["category"],
+                          "customer_name": src["customer_name"], "description": src["description"] + " asap"})
+        else:
+            batch.append(make_opportunity(rng, len(existing) + i))
+    return batch
+
+
+def run(existing_n: int, batch_n: int, rtt_ms: float, seed: int) -> None:
+    rng = random.Random(seed)
+    existing = build_existing(existing_n, rng)
+    batch = build_batch(existing, batch_n, rng)
+
+    results = {}
+    for name in ("per-item", "batch"):
+        db = FakeDB(existing, rtt_ms / 1000)
+        with patch.object(proactive, "query_db", db), \
+                patch.object(proactive, "log_execution", lambda **kw: db("log")), \
+                patch("core.database.query_db", db):
+            t0 = time.perf_counter()
+            if name == "per-item":
+                dups = 0
+                for opp in batch:
+                    opp = dict(opp)
+                    result = proactive.identify_opportunity_with_dedup(
+                        opp.pop("opportunity_type"), opp.pop("category"), opp.pop("description"), **opp
+                    )
+                    dups += 1 if result.get("is_duplicate") else 0
+            else:
+                dups = proactive.identify_opportunities_with_dedup(batch)["duplicates_skipped"]
+            elapsed = time.perf_counter() - t0
+        results[name] = (elapsed, db.round_trips, dups)
+
+    print(f"\n== existing={existing_n:,} batch={batch_n:,} rtt={rtt_ms} ms ==")
+    print(f"{'path':<10}{'seconds':>10}{'items/s':>12}{'round trips':>14}{'duplicates':>12}")
+    for name, (elapsed, trips, dups) in results.items():
+        print(f"{name:<10}{elapsed:>10.3f}{batch_n / elapsed:>12,.0f}{trips:>14,}{dups:>12,}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--existing", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.existing, args.batch, args.rtt_ms, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Puppeteer Pool Benchmark
+
+Measures scrape throughput of the browser service (services/puppeteer) for
+different page-pool sizes, against static test pages served from a local
+HTTP server. Each test page references images and a web font that the
+server delivers with an artificial delay, so resource blocking shows up in
+the numbers.
+
+Compared per pool size:
+- legacy: navigate + get_text on the shared default session (the old
+  single-page behaviour every request queues behind)
+- scrape: one-shot scrape on any free page, images/fonts allowed
+- scrape+block: one-shot scrape with images/fonts/media aborted
+
+Requires Playwright with Chromium installed (see services/puppeteer/Dockerfile).
+Calls handle_action() in-process; no uvicorn needed.
+
+Usage:
+    python scripts/benchmark_puppeteer_pool.py [--sizes 1,4,8] [--requests 40] [--asset-delay-ms 100]
+"""
+
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "services", "puppeteer"))
+
+PAGE_TEMPLATE = """<!doctype html>
+<html><head><title>Test page {n}</title>
+<style>@font-face {{ font-family: t; src: url(/font.woff2?{n}); }} body {{ font-family: t; }}</style>
+</head><body>
+<h1>Page {n}</h1>
+{images}
+<p>{text}</p>
+</body></html>"""
+
+
+def make_handler(asset_delay: float):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/page/"):
+                n = self.path.rsplit("/", 1)[-1]
+                images = "".join(f'<img src="/img/{n}-{i}.png">' for i in range(5))
+                body = PAGE_TEMPLATE.format(n=n, images=images, text="lorem ipsum " * 200).encode()
+                content_type = "text/html"
+            else:
+                time.sleep(asset_delay)
+                body = b"\x00" * 2048
+                content_type = "image/png" if self.path.startswith("/img/") else "font/woff2"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+async def run_mode(server, base_url: str, mode: str, n_requests: int) -> float:
+    async def one(i: int):
+        url = f"{base_url}/page/{i}"
+        if mode == "legacy":
+            await server.handle_action("navigate", {"url": url})
+            result = await server.handle_action("get_text", {})
+        else:
+            result = await server.handle_action("scrape", {"url": url, "block_resources": mode == "scrape+block"})
+        if not result.get("success"):
+            raise RuntimeError(result.get("error"))
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_requests)))
+    return time.perf_counter() - t0
+
+
+async def run(sizes, n_requests: int, base_url: str) -> None:
+    print(f"{'pool':>6}{'mode':>14}{'seconds':>10}{'pages/s':>10}")
+    for size in sizes:
+        os.environ["PUPPETEER_POOL_SIZE"] = str(size)
+        server = importlib.reload(importlib.import_module("server"))
+        for mode in ("legacy", "scrape", "scrape+block"):
+            await server.handle_action("scrape", {"url": f"{base_url}/page/warmup"})
+            elapsed = await run_mode(server, base_url, mode, n_requests)
+            print(f"{size:>6}{mode:>14}{elapsed:>10.2f}{n_requests / elapsed:>10.1f}")
+        await server.get_pool().close()
+        if server.browser is not None:
+            await server.browser.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", default="1,4,8")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--asset-delay-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.asset_delay_ms / 1000))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    try:
+        asyncio.run(run([int(s) for s in args.sizes.split(",") if s], args.requests, base_url))
+    finally:
+        httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
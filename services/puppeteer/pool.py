@@ -0,0 +1,261 @@
+"""
+Browser page pool for the Puppeteer/Playwright service
+
+Replaces the single global page with a bounded pool of isolated browser
+contexts, each with one page:
+
+- At most ``size`` pages exist; requests wait in FIFO order for a free one
+  and give up after ``queue_timeout`` seconds (PoolTimeout).
+- Session leases: requests carrying the same session_id reuse one page, so
+  navigate -> click -> get_text sequences stay together. Requests within a
+  session run one at a time. Idle sessions are released after
+  ``session_ttl`` seconds.
+- Pages are recycled (context closed, fresh one created) after
+  ``max_uses`` leases.
+- Resource blocking: while a lease has ``block_resources`` set, image, font
+  and media requests are aborted (used for scrape-only requests).
+
+Playwright is only touched through ``new_context`` (an async callable
+returning a browser context), which keeps this module importable without it.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Resource types aborted for scrape-only requests
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+
+class PoolTimeout(Exception):
+    """Raised when no page became free within the queue timeout."""
+
+
+class PooledPage:
+    """One isolated browser context and its page."""
+
+    def __init__(self, context: Any, page: Any):
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.block_resources = False
+        self.session_id: Optional[str] = None
+        self.last_used = time.monotonic()
+
+    async def route(self, route: Any) -> None:
+        if self.block_resources and route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def reset(self) -> None:
+        """Drop per-session state before the page goes back to the pool."""
+        with contextlib.suppress(Exception):
+            await self.context.clear_cookies()
+        with contextlib.suppress(Exception):
+            await self.page.goto("about:blank")
+
+    async def close(self) -> None:
+        with contextlib.suppress(Exception):
+            await self.context.close()
+
+
+class _Session:
+    def __init__(self, pooled: PooledPage):
+        self.pooled = pooled
+        self.lock = asyncio.Lock()
+        self.closed = False
+
+
+class BrowserPool:
+    """Bounded pool of browser pages with session-scoped leases."""
+
+    def __init__(
+        self,
+        new_context: Callable[[], Awaitable[Any]],
+        size: int = 4,
+        queue_timeout: float = 30.0,
+        max_uses: int = 50,
+        session_ttl: float = 300.0,
+    ):
+        self._new_context = new_context
+        self.size = max(1, size)
+        self.queue_timeout = queue_timeout
+        self.max_uses = max(1, max_uses)
+        self.session_ttl = session_ttl
+
+        self._free: List[PooledPage] = []
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._sessions: Dict[str, _Session] = {}
+        self._created = 0  # pages currently alive (free, leased or held by a session)
+        self.recycled = 0
+        self.timeouts = 0
+
+    # ------------------------------------------------------------------ #
+    # Slots
+    # ------------------------------------------------------------------ #
+
+    async def _take(self, timeout: float) -> PooledPage:
+        """Get a free page, creating one while under ``size``; waits FIFO otherwise."""
+        await self._expire_sessions()
+        if self._free:
+            return self._free.pop()
+        if self._created < self.size:
+            self._created += 1
+            try:
+                return await self._create()
+            except Exception:
+                self._created -= 1
+                raise
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            pooled = await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise PoolTimeout(f"No browser page free within {timeout:g}s")
+        finally:
+            with contextlib.suppress(ValueError):
+                self._waiters.remove(waiter)
+        if pooled is None:
+            # Slot handed over without a page (recycled): create a new one
+            try:
+                return await self._create()
+            except Exception:
+                await self._give_back(None)
+                raise
+        return pooled
+
+    async def _give_back(self, pooled: Optional[PooledPage]) -> None:
+        """Return a page (or, if None, its empty slot) to the pool."""
+        if pooled is not None and pooled.uses >= self.max_uses:
+            await pooled.close()
+            self.recycled += 1
+            pooled = None
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(pooled)
+                return
+        if pooled is None:
+            self._created -= 1
+        else:
+            self._free.append(pooled)
+
+    async def _create(self) -> PooledPage:
+        context = await self._new_context()
+        pooled = PooledPage(context, await context.new_page())
+        await context.route("**/*", pooled.route)
+        return pooled
+
+    # ------------------------------------------------------------------ #
+    # Leases
+    # ------------------------------------------------------------------ #
+
+    @contextlib.asynccontextmanager
+    async def lease(
+        self,
+        session_id: Optional[str] = None,
+        block_resources: bool = False,
+        timeout: Optional[float] = None,
+    ):
+        """Lease a page for one request (``async with pool.lease(...) as page``)."""
+        timeout = self.queue_timeout if timeout is None else timeout
+        if session_id is None:
+            pooled = await self._take(timeout)
+            try:
+                pooled.uses += 1
+                pooled.block_resources = block_resources
+                yield pooled.page
+            finally:
+                pooled.block_resources = False
+                await pooled.reset()
+                await self._give_back(pooled)
+            return
+
+        while True:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = await self._open_session(session_id, timeout)
+            try:
+                await asyncio.wait_for(session.lock.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise PoolTimeout(f"Session {session_id} busy for {timeout:g}s")
+            if not session.closed:
+                break
+            # Session ended while we waited for it: start a new one
+            session.lock.release()
+        try:
+            pooled = session.pooled
+            if pooled.page.is_closed():
+                # Page died mid-session: replace it in place
+                await pooled.close()
+                pooled = await self._create()
+                pooled.session_id = session_id
+                session.pooled = pooled
+            pooled.uses += 1
+            pooled.block_resources = block_resources
+            yield pooled.page
+        finally:
+            session.pooled.block_resources = False
+            session.pooled.last_used = time.monotonic()
+            session.lock.release()
+
+    async def _open_session(self, session_id: str, timeout: float) -> _Session:
+        pooled = await self._take(timeout)
+        # Another request may have opened the same session while we waited
+        if session_id in self._sessions:
+            await self._give_back(pooled)
+            return self._sessions[session_id]
+        pooled.session_id = session_id
+        pooled.last_used = time.monotonic()
+        session = self._sessions[session_id] = _Session(pooled)
+        return session
+
+    async def end_session(self, session_id: str) -> bool:
+        """Release a session's page back to the pool."""
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        async with session.lock:
+            session.closed = True
+            pooled = session.pooled
+            pooled.session_id = None
+            await pooled.reset()
+            await self._give_back(pooled)
+        return True
+
+    async def _expire_sessions(self) -> None:
+        if self.session_ttl <= 0:
+            return
+        cutoff = time.monotonic() - self.session_ttl
+        for session_id, session in list(self._sessions.items()):
+            if session.pooled.last_used < cutoff and not session.lock.locked():
+                logger.info(f"Releasing idle browser session {session_id}")
+                await self.end_session(session_id)
+
+    async def close(self) -> None:
+        for session_id in list(self._sessions):
+            await self.end_session(session_id)
+        for pooled in self._free:
+            await pooled.close()
+        self._free.clear()
+        self._created = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "pages": self._created,
+            "free": len(self._free),
+            "sessions": len(self._sessions),
+            "waiting": len(self._waiters),
+            "recycled": self.recycled,
+            "timeouts": self.timeouts,
+        }
@@ -14,6 +14,8 @@ from typing import Optional
 from playwright.async_api import async_playwright, Browser, Page
 import uvicorn
 
+from pool import BrowserPool, PoolTimeout
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -27,123 +29,171 @@ AUTH_TOKEN = os.environ.get('PUPPETEER_AUTH_TOKEN', '') or os.environ.get('AUTH_
 logger.info(f"Puppeteer service configured with PORT={PORT}")
 logger.info(f"Authentication {'enabled' if AUTH_TOKEN else 'disabled'}")
 
+# Page pool configuration
+POOL_SIZE = int(os.environ.get('PUPPETEER_POOL_SIZE', 4))
+QUEUE_TIMEOUT_SECONDS = float(os.environ.get('PUPPETEER_QUEUE_TIMEOUT', 30))
+PAGE_MAX_USES = int(os.environ.get('PUPPETEER_PAGE_MAX_USES', 50))
+SESSION_TTL_SECONDS = float(os.environ.get('PUPPETEER_SESSION_TTL', 300))
+
+# Requests without a session_id share this session, which keeps the old
+# single-page behaviour (navigate, then get_text) for existing clients
+DEFAULT_SESSION = "default"
+
+ACTIONS = ["navigate", "scrape", "screenshot", "click", "type", "get_text", "eval", "wait",
+           "scroll", "select", "pdf", "cookies", "close"]
+
 # Global browser instance
 browser: Optional[Browser] = None
-page: Optional[Page] = None
+pool: Optional[BrowserPool] = None
+_browser_lock = asyncio.Lock()
 
 
 async def get_browser() -> Browser:
     """Get or create browser instance."""
     global browser
-    if browser is None:
-        playwright = await async_playwright().start()
-        browser = await playwright.chromium.launch(
-            headless=True,
-            args=['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
-        )
+    async with _browser_lock:
+        if browser is None:
+            playwright = await async_playwright().start()
+            browser = await playwright.chromium.launch(
+                headless=True,
+                args=['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
+            )
     return browser
 
 
-async def get_page() -> Page:
-    """Get or create page instance."""
-    global page
-    if page is None or page.is_closed():
-        b = await get_browser()
-        context = await b.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+async def new_context():
+    """Create an isolated browser context."""
+    b = await get_browser()
+    return await b.new_context(
+        viewport={'width': 1920, 'height': 1080},
+        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    )
+
+
+def get_pool() -> BrowserPool:
+    """Get or create the page pool."""
+    global pool
+    if pool is None:
+        pool = BrowserPool(
+            new_context,
+            size=POOL_SIZE,
+            queue_timeout=QUEUE_TIMEOUT_SECONDS,
+            max_uses=PAGE_MAX_USES,
+            session_ttl=SESSION_TTL_SECONDS,
         )
-        page = await context.new_page()
-    return page
+    return pool
 
 
 async def handle_action(action: str, params: dict) -> dict:
-    """Handle browser action."""
+    """Handle browser action.
+    
+    ``session_id`` keeps a sequence of actions on one page; ``scrape``
+    (navigate + HTML in one request) leases any free page with images,
+    fonts and media blocked.
+    """
+    session_id = params.get("session_id") or DEFAULT_SESSION
     try:
-        p = await get_page()
-        
-        if action == "navigate":
-            url = params.get("url")
-            await p.goto(url, wait_until="domcontentloaded", timeout=30000)
-            return {"success": True, "url": p.url, "title": await p.title()}
-        
-        elif action == "screenshot":
-            full_page = params.get("full_page", False)
-            screenshot = await p.screenshot(full_page=full_page)
-            return {"success": True, "screenshot": base64.b64encode(screenshot).decode()}
-        
-        elif action == "click":
-            selector = params.get("selector")
-            await p.click(selector, timeout=10000)
-            return {"success": True, "clicked": selector}
-        
-        elif action == "type":
-            selector = params.get("selector")
-            text = params.get("text")
-            await p.fill(selector, text)
-            return {"success": True, "typed": text, "into": selector}
-        
-        elif action == "get_text":
-            selector = params.get("selector")
-            if selector:
-                element = await p.query_selector(selector)
-                if element:
-                    text = await element.text_content()
-                    return {"success": True, "text": text}
-                return {"success": False, "error": "Element not found"}
-            else:
-                text = await p.content()
-                return {"success": True, "html": text[:50000]}  # Limit size
-        
-        elif action == "eval":
-            script = params.get("script")
-            result = await p.evaluate(script)
-            return {"success": True, "result": result}
-        
-        elif action == "wait":
-            selector = params.get("selector")
-            timeout = params.get("timeout", 10000)
-            await p.wait_for_selector(selector, timeout=timeout)
-            return {"success": True, "found": selector}
-        
-        elif action == "scroll":
-            direction = params.get("direction", "down")
-            amount = params.get("amount", 500)
-            if direction == "down":
-                await p.evaluate(f"window.scrollBy(0, {amount})")
-            elif direction == "up":
-                await p.evaluate(f"window.scrollBy(0, -{amount})")
-            return {"success": True, "scrolled": direction}
-        
-        elif action == "select":
-            selector = params.get("selector")
-            value = params.get("value")
-            await p.select_option(selector, value)
-            return {"success": True, "selected": value}
-        
-        elif action == "pdf":
-            pdf = await p.pdf()
-            return {"success": True, "pdf": base64.b64encode(pdf).decode()}
-        
-        elif action == "cookies":
-            cookies = await p.context.cookies()
-            return {"success": True, "cookies": cookies}
+        if action == "close":
+            closed = await get_pool().end_session(session_id)
+            return {"success": True, "closed": closed}
         
-        elif action == "close":
-            global page
-            if page:
-                await page.close()
-                page = None
-            return {"success": True, "closed": True}
+        if action == "scrape":
+            block = params.get("block_resources", True)
+            async with get_pool().lease(None, block_resources=block, timeout=params.get("queue_timeout")) as p:
+                await p.goto(params.get("url"), wait_until="domcontentloaded", timeout=30000)
+                html = await p.content()
+                return {"success": True, "url": p.url, "title": await p.title(), "html": html[:50000]}
         
-        else:
+        if action not in ACTIONS:
             return {"success": False, "error": f"Unknown action: {action}"}
+        
+        async with get_pool().lease(
+            session_id,
+            block_resources=bool(params.get("block_resources", False)),
+            timeout=params.get("queue_timeout")
+        ) as p:
+            return await _run_page_action(p, action, params)
     
+    except PoolTimeout as e:
+        logger.warning(f"{action}: {e}")
+        return {"success": False, "error": str(e), "queue_timeout": True}
     except Exception as e:
         logger.exception(f"Error in {action}")
         return {"success": False, "error": str(e)}
 
 
+async def _run_page_action(p: Page, action: str, params: dict) -> dict:
+    """Run one action on a leased page."""
+    if action == "navigate":
+        url = params.get("url")
+        await p.goto(url, wait_until="domcontentloaded", timeout=30000)
+        return {"success": True, "url": p.url, "title": await p.title()}
+    
+    elif action == "screenshot":
+        full_page = params.get("full_page", False)
+        screenshot = await p.screenshot(full_page=full_page)
+        return {"success": True, "screenshot": base64.b64encode(screenshot).decode()}
+    
+    elif action == "click":
+        selector = params.get("selector")
+        await p.click(selector, timeout=10000)
+        return {"success": True, "clicked": selector}
+    
+    elif action == "type":
+        selector = params.get("selector")
+        text = params.get("text")
+        await p.fill(selector, text)
+        return {"success": True, "typed": text, "into": selector}
+    
+    elif action == "get_text":
+        selector = params.get("selector")
+        if selector:
+            element = await p.query_selector(selector)
+            if element:
+                text = await element.text_content()
+                return {"success": True, "text": text}
+            return {"success": False, "error": "Element not found"}
+        else:
+            text = await p.content()
+            return {"success": True, "html": text[:50000]}  # Limit size
+    
+    elif action == "eval":
+        script = params.get("script")
+        result = await p.evaluate(script)
+        return {"success": True, "result": result}
+    
+    elif action == "wait":
+        selector = params.get("selector")
+        timeout = params.get("timeout", 10000)
+        await p.wait_for_selector(selector, timeout=timeout)
+        return {"success": True, "found": selector}
+    
+    elif action == "scroll":
+        direction = params.get("direction", "down")
+        amount = params.get("amount", 500)
+        if direction == "down":
+            await p.evaluate(f"window.scrollBy(0, {amount})")
+        elif direction == "up":
+            await p.evaluate(f"window.scrollBy(0, -{amount})")
+        return {"success": True, "scrolled": direction}
+    
+    elif action == "select":
+        selector = params.get("selector")
+        value = params.get("value")
+        await p.select_option(selector, value)
+        return {"success": True, "selected": value}
+    
+    elif action == "pdf":
+        pdf = await p.pdf()
+        return {"success": True, "pdf": base64.b64encode(pdf).decode()}
+    
+    elif action == "cookies":
+        cookies = await p.context.cookies()
+        return {"success": True, "cookies": cookies}
+    
+    return {"success": False, "error": f"Unknown action: {action}"}
+
+
 async def send_response(send, status: int, body: bytes, content_type: bytes = b"application/json"):
     """Send HTTP response."""
     headers = [
@@ -190,7 +240,11 @@ async def app(scope, receive, send):
     
     # Health check
     if path == "/health":
-        await send_response(send, 200, json.dumps({"status": "healthy", "version": "1.0"}).encode())
+        await send_response(send, 200, json.dumps({
+            "status": "healthy",
+            "version": "1.1",
+            "pool": get_pool().stats()
+        }).encode())
         return
     
     # Action endpoint
@@ -211,7 +265,8 @@ async def app(scope, receive, send):
             action = data.get("action", "")
             params = {k: v for k, v in data.items() if k != "action"}
             result = await handle_action(action, params)
-            await send_response(send, 200, json.dumps(result).encode())
+            status = 503 if result.get("queue_timeout") else 200
+            await send_response(send, status, json.dumps(result).encode())
         except Exception as e:
             await send_response(send, 500, json.dumps({"error": str(e)}).encode())
         return
@@ -220,8 +275,9 @@ async def app(scope, receive, send):
     if path == "/":
         await send_response(send, 200, json.dumps({
             "name": "juggernaut-puppeteer",
-            "version": "1.0",
-            "actions": ["navigate", "screenshot", "click", "type", "get_text", "eval", "wait", "scroll", "select", "pdf", "cookies", "close"]
+            "version": "1.1",
+            "actions": ACTIONS,
+            "pool": get_pool().stats()
         }).encode())
         return
     
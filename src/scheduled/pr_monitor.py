@@ -43,11 +43,6 @@ def monitor_pending_prs(
     except Exception as e:
         return {"success": False, "error": f"PRTracker unavailable: {e}"}
 
-    try:
-        from src.github_automation import GitHubClient
-    except Exception:
-        GitHubClient = None  # type: ignore
-
     sql = f"""
         SELECT
             t.id as task_id,
@@ -74,6 +69,8 @@ def monitor_pending_prs(
         return {"success": False, "error": str(e)}
 
     tracker = PRTracker()
+    # One batched query per repo; get_pr_status below reads the shared snapshots
+    tracker.snapshots.prefetch((r.get("repo"), r.get("pr_number")) for r in rows)
 
     processed = 0
     merged = 0
@@ -203,14 +200,12 @@ def monitor_pending_prs(
                 and (repo in set(repo_allowlist))
                 and bool(status.coderabbit_approved)
                 and status.mergeable is True
-                and GitHubClient is not None
                 and pr_number is not None
             ):
                 try:
                     auto_merge_attempted += 1
-                    gh = GitHubClient(repo=repo)
-                    gh_status = gh.get_pr_status(int(pr_number))
-                    if getattr(gh_status, "checks_passed", False):
+                    snapshot = tracker.snapshots.get(repo, int(pr_number))
+                    if snapshot is not None and snapshot.checks_passed:
                         tracker.merge_pr(pr_url, merge_method="squash")
                 except Exception:
                     pass
@@ -0,0 +1,179 @@
+"""
+Tests for Alert Windows
+=======================
+
+Unit tests for the streaming rule evaluation in core/alert_windows.py and
+the batched rule state in core/alert_rules.py
+"""
+
+import unittest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import MagicMock, patch
+
+from core.alert_rules import AlertRulesEngine
+from core.alert_windows import AlertWindows, MinuteRing
+from core.log_crawler import LogCrawler
+
+NOW = datetime(2026, 3, 1, 12, 30, 15, tzinfo=timezone.utc)
+
+
+def _ago(minutes):
+    return (NOW - timedelta(minutes=minutes)).isoformat()
+
+
+def _rule(rule_id, rule_type, condition=None, last_triggered=None):
+    return {"id": rule_id, "name": rule_id, "rule_type": rule_type, "condition": condition or {},
+            "cooldown_minutes": 30, "last_triggered": last_triggered}
+
+
+class TestMinuteRing(unittest.TestCase):
+    """Test the per-minute ring buffer."""
+
+    def test_window_totals_and_wraparound(self):
+        ring = MinuteRing(10)
+        ring.add(100, 2)
+        ring.add(105)
+        ring.add(109, 3)
+        self.assertEqual(ring.total(109, 5), 4)
+        self.assertEqual(ring.total(109, 10), 6)
+
+        # Minute 110 reuses minute 100's slot
+        ring.add(110)
+        self.assertEqual(ring.total(110, 10), 5)
+        ring.add(100)  # too old now
+        self.assertEqual(ring.total(110, 10), 5)
+
+
+class TestAlertWindows(unittest.TestCase):
+    """Test one-pass rule evaluation over streamed occurrences."""
+
+    def setUp(self):
+        self.windows = AlertWindows(horizon_minutes=60)
+        self.windows.track_fingerprint("old", first_seen=_ago(120))
+        self.windows.track_fingerprint("new", first_seen=_ago(2))
+
+    def test_spike_and_sustained_rules(self):
+        for _ in range(12):
+            self.windows.record("old", _ago(1))
+        self.windows.record("new", _ago(1))
+        self.windows.record("old", _ago(30))  # outside both windows
+
+        triggered = self.windows.evaluate([
+            _rule("spike", "spike", {"rate_per_minute": 2, "window_minutes": 5}),
+            _rule("sustained", "sustained", '{"duration_minutes": 5, "min_occurrences": 13}'),
+        ], NOW)
+        self.assertEqual(triggered, {"spike": ["old"]})
+
+        self.windows.record("old", _ago(3))
+        triggered = self.windows.evaluate([
+            _rule("sustained", "sustained", '{"duration_minutes": 5, "min_occurrences": 13}'),
+        ], NOW)
+        self.assertEqual(triggered, {"sustained": ["old"]})
+
+    def test_new_and_critical_rules(self):
+        self.windows.record("new", _ago(1))
+        self.windows.record("old", _ago(2), level="CRITICAL")
+        triggered = self.windows.evaluate([
+            _rule("r-new", "new_fingerprint"), _rule("r-crit", "critical"),
+        ], NOW)
+        self.assertEqual(triggered, {"r-new": ["new"], "r-crit": ["old"]})
+
+    def test_handled_fingerprints_are_skipped(self):
+        self.windows.record("old", _ago(1), level="CRITICAL")
+        self.windows.record("new", _ago(1), level="CRITICAL")
+        self.windows.mark_task_created("old")
+        self.windows.set_status("new", "resolved")
+        self.assertEqual(self.windows.evaluate([_rule("r", "critical")], NOW), {})
+
+    def test_idle_fingerprints_are_dropped(self):
+        self.windows.record("old", _ago(90))
+        self.windows.evaluate([_rule("r", "spike")], NOW)
+        self.assertEqual(self.windows.stats()["fingerprints"], 1)
+
+    def test_load_bootstraps_from_recent_history(self):
+        fetch = MagicMock(side_effect=[
+            [{"fingerprint_id": "a", "minute": _ago(1), "n": 9}],
+            [{"fingerprint_id": "a", "minute": _ago(1), "n": 1}],
+            [{"id": "a", "first_seen": _ago(300), "task_created": False, "status": "active"}],
+        ])
+        windows = AlertWindows()
+        self.assertTrue(windows.ensure_fresh(fetch))
+        self.assertEqual(fetch.call_count, 3)
+        triggered = windows.evaluate([
+            _rule("s", "sustained", {"min_occurrences": 9}), _rule("c", "critical"),
+        ], NOW)
+        self.assertEqual(triggered, {"s": ["a"], "c": ["a"]})
+
+        # Already loaded: no further queries until the state refresh is due
+        windows.ensure_fresh(fetch)
+        self.assertEqual(fetch.call_count, 3)
+
+
+class TestLogCrawlerFingerprintState(unittest.TestCase):
+    """Test that recurring fingerprints carry their stored state into the windows."""
+
+    @patch("core.log_crawler.execute_sql")
+    @patch("core.log_crawler.fetch_all")
+    def test_recurring_handled_fingerprint_does_not_alert(self, fetch_all, execute_sql):
+        windows = AlertWindows(horizon_minutes=60)
+        fetch_all.return_value = [{"id": "fp-old", "occurrence_count": 40, "first_seen": _ago(600),
+                                   "task_created": True, "status": "active"}]
+        crawler = LogCrawler.__new__(LogCrawler)
+        with patch("core.log_crawler.get_alert_windows", return_value=windows):
+            for _ in range(12):
+                self.assertEqual(crawler.get_or_create_fingerprint("fp", "msg", "Error", None, "log1"), "fp-old")
+                windows.record("fp-old", _ago(1), level="CRITICAL")
+        self.assertEqual(windows.evaluate([
+            _rule("r1", "spike", {"rate_per_minute": 2, "window_minutes": 5}), _rule("r2", "critical"),
+        ], NOW), {})
+
+
+class TestAlertRulesEngine(unittest.TestCase):
+    """Test cooldowns and batched rule state writes."""
+
+    def setUp(self):
+        self.windows = AlertWindows()
+        self.windows.loaded = True
+        self.windows._state_loaded_at = float("inf")
+        self.engine = AlertRulesEngine(self.windows)
+        self.rules = [_rule("r1", "new_fingerprint"), _rule("r2", "critical"),
+                      _rule("r3", "new_fingerprint", last_triggered=datetime.now(timezone.utc).isoformat())]
+        self.windows.track_fingerprint("fp", first_seen=datetime.now(timezone.utc))
+        self.windows.record("fp", datetime.now(timezone.utc), level="CRITICAL")
+
+    @patch("core.alert_rules.execute_sql")
+    def test_triggers_written_in_one_update(self, execute_sql):
+        with patch.object(self.engine, "get_active_rules", return_value=self.rules):
+            triggered = self.engine.evaluate_all_rules()
+            self.assertEqual(triggered, {"r1": ["fp"], "r2": ["fp"]})
+            execute_sql.assert_called_once()
+            sql, params = execute_sql.call_args[0]
+            self.assertIn("FROM (VALUES", sql)
+            self.assertEqual(params[0::3], ("r1", "r2"))
+
+            # Both now in cooldown from the in-memory trigger time
+            self.assertEqual(self.engine.evaluate_all_rules(), {})
+        execute_sql.assert_called_once()
+
+    @patch("core.alert_rules.execute_sql", side_effect=RuntimeError("db down"))
+    def test_failed_flush_is_retried(self, execute_sql):
+        self.engine.record_trigger("r1")
+        self.assertEqual(self.engine.flush_rule_state(), 0)
+        self.assertIn("r1", self.engine._pending_triggers)
+
+        execute_sql.side_effect = None
+        self.assertEqual(self.engine.flush_rule_state(), 1)
+        self.assertEqual(self.engine._pending_triggers, {})
+
+    @patch("core.alert_rules.execute_sql")
+    def test_falls_back_to_sql_checks_when_windows_unavailable(self, execute_sql):
+        self.windows.loaded = False
+        with patch.object(self.windows, "load", side_effect=RuntimeError("db down")), \
+                patch.object(self.engine, "get_active_rules", return_value=self.rules[:1]), \
+                patch.object(self.engine, "evaluate_rule", return_value=["x"]) as evaluate_rule:
+            self.assertEqual(self.engine.evaluate_all_rules(), {"r1": ["x"]})
+        evaluate_rule.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
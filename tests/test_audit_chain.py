@@ -0,0 +1,341 @@
+"""
+Tests for the Segmented Audit Chain
+===================================
+
+Unit tests for core/audit_chain.py: batched segment writes, incremental
+verification and tamper detection, against an in-memory store
+"""
+
+import asyncio
+import json
+import os
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from core.audit_chain import (
+    AuditChainVerifier,
+    AuditSegmentWriter,
+    build_segment,
+    compute_row_hash,
+    sign_segment,
+)
+
+
+class MemoryStore:
+    """audit_log / audit_segments tables, stored the way Postgres returns them."""
+
+    def __init__(self):
+        self.rows = {}
+        self.segments = {}
+
+    def write(self, segment, rows):
+        if segment["id"] in self.segments:
+            raise Exception('duplicate key value violates unique constraint "audit_segments_pkey"')
+        self.segments[segment["id"]] = dict(segment, verified_at=None)
+        for row in rows:
+            stored = dict(row)
+            # Round-trip representations: timestamptz text, NUMERIC(10,4), jsonb
+            stored["created_at"] = datetime.fromisoformat(row["created_at"]).strftime("%Y-%m-%d %H:%M:%S.%f+00")
+            if row.get("cost_usd") is not None:
+                stored["cost_usd"] = f"{row['cost_usd']:.4f}"
+            for column in ("action_details", "prev_state", "new_state"):
+                if row.get(column) is not None:
+                    stored[column] = json.loads(json.dumps(row[column]))
+            self.rows[row["chain_seq"]] = stored
+
+
+class MemoryWriter(AuditSegmentWriter):
+    def __init__(self, store, **kwargs):
+        super().__init__(query_fn=MagicMock(), flush_interval=0, **kwargs)
+        self.store = store
+
+    def _load_head(self):
+        if not self.store.segments:
+            return 0, 0, "GENESIS"
+        last = self.store.segments[max(self.store.segments)]
+        return last["id"], last["last_seq"], last["end_hash"]
+
+    def _write_segment(self, segment, rows):
+        self.store.write(segment, rows)
+
+
+class MemoryVerifier(AuditChainVerifier):
+    def __init__(self, store):
+        super().__init__(query_fn=MagicMock())
+        self.store = store
+        self.rows_read = 0
+
+    def _fetch_segments(self, full):
+        segments = [self.store.segments[i] for i in sorted(self.store.segments)]
+        verified = [s["id"] for s in segments if s["verified_at"]]
+        if not full and verified:
+            segments = [s for s in segments if s["id"] >= max(verified)]
+        return [dict(s) for s in segments]
+
+    def _fetch_rows(self, first_seq):
+        rows = [dict(self.store.rows[s]) for s in sorted(self.store.rows) if s >= first_seq]
+        self.rows_read += len(rows)
+        return rows
+
+    def _mark_verified(self, segment_ids):
+        for segment_id in segment_ids:
+            self.store.segments[segment_id]["verified_at"] = "now"
+
+
+def _event(i):
+    return {
+        "id": str(uuid4()), "event_type": "tool.execution", "actor_type": "worker",
+        "actor_id": "EXECUTOR", "action": "sql_query", "resource_type": "database",
+        "resource_id": f"table_{i}", "action_details": {"rows": i, "query": "SELECT '\\\\x'"},
+        "success": True, "duration_ms": i, "cost_usd": 0.001,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _use_signing_key(test):
+    patcher = patch.dict(os.environ, {"AUDIT_SIGNING_KEY": "test-key"})
+    patcher.start()
+    test.addCleanup(patcher.stop)
+
+
+class TestAuditSegmentWriter(unittest.TestCase):
+    """Test segment batching and chaining."""
+
+    def setUp(self):
+        _use_signing_key(self)
+        self.store = MemoryStore()
+        self.writer = MemoryWriter(self.store, segment_size=4)
+
+    def test_events_written_in_chained_segments(self):
+        for i in range(10):
+            self.writer.submit(_event(i))
+        self.assertEqual(len(self.store.segments), 2)
+        self.assertEqual(self.writer.pending(), 2)
+        self.assertEqual(self.writer.flush(), 2)
+
+        segments = [self.store.segments[i] for i in (1, 2, 3)]
+        self.assertEqual([s["row_count"] for s in segments], [4, 4, 2])
+        self.assertEqual(segments[1]["start_hash"], segments[0]["end_hash"])
+        self.assertEqual(sorted(self.store.rows), list(range(1, 11)))
+
+    def test_conflicting_segment_is_rebuilt_on_new_head(self):
+        other = MemoryWriter(self.store, segment_size=4)
+        self.writer.submit(_event(0), flush_when_full=False)
+        self.writer._head = (0, 0, "GENESIS")  # stale head
+        other.submit(_event(1))
+        other.flush()
+
+        self.writer.flush()
+        self.assertEqual(self.writer.conflicts, 1)
+        self.assertEqual(self.store.segments[2]["start_hash"], self.store.segments[1]["end_hash"])
+        self.assertTrue(MemoryVerifier(self.store).verify()["valid"])
+
+    def test_failed_write_keeps_events_queued(self):
+        self.writer._write_segment = MagicMock(side_effect=RuntimeError("db down"))
+        self.writer.submit(_event(0), flush_when_full=False)
+        with self.assertRaises(RuntimeError):
+            self.writer.flush()
+        self.assertEqual(self.writer.pending(), 1)
+
+    def test_invalid_uuid_or_ip_rejected_on_submit(self):
+        for bad in ({"request_id": "req-42"}, {"session_id": "abc"}, {"ip_address": "not-an-ip"}):
+            with self.assertRaises(ValueError):
+                self.writer.submit(dict(_event(0), **bad))
+        self.writer.submit(dict(_event(0), request_id=str(uuid4()), ip_address="10.0.0.1"))
+        self.assertEqual(self.writer.pending(), 1)
+
+    def test_event_rejected_by_database_is_dead_lettered(self):
+        write = self.writer._write_segment
+
+        def reject_poison(segment, rows):
+            if any(r.get("user_agent") == "poison" for r in rows):
+                raise RuntimeError('invalid input syntax for type inet: "poison"')
+            write(segment, rows)
+
+        self.writer._write_segment = reject_poison
+        events = [_event(i) for i in range(6)]
+        events[1]["user_agent"] = "poison"
+        for event in events:
+            self.writer.submit(event, flush_when_full=False)
+        with patch("core.audit_chain.dead_letter_logger") as dead_letter_logger:
+            self.assertEqual(self.writer.flush(), 5)
+
+        self.assertEqual(self.writer.pending(), 0)
+        self.assertEqual(self.writer.stats()["dead_lettered"], 1)
+        self.assertEqual(self.writer.dead_letters[0]["event"]["id"], events[1]["id"])
+        dead_letter_logger.error.assert_called_once()
+        self.assertEqual(len(self.store.rows), 5)
+        self.assertTrue(MemoryVerifier(self.store).verify()["valid"])
+
+    def test_tracked_event_resolves_when_written(self):
+        futures = [self.writer.submit_and_track(_event(i)) for i in range(2)]
+        self.assertFalse(any(f.done() for f in futures))
+        self.writer.flush()
+        self.assertEqual([f.result(0) for f in futures], [None, None])
+
+    def test_tracked_event_fails_and_leaves_queue_when_write_fails(self):
+        self.writer.submit(_event(0), flush_when_full=False)
+        tracked = self.writer.submit_and_track(_event(1))
+        self.writer._write_segment = MagicMock(side_effect=RuntimeError("db down"))
+        with self.assertRaises(RuntimeError):
+            self.writer.flush()
+        self.assertIsInstance(tracked.exception(0), RuntimeError)
+        # The untracked event stays queued for the background retry
+        self.assertEqual(self.writer.pending(), 1)
+
+    def test_tracked_event_rejected_by_database_fails(self):
+        write = self.writer._write_segment
+
+        def reject_poison(segment, rows):
+            if any(r.get("user_agent") == "poison" for r in rows):
+                raise RuntimeError('invalid input syntax for type inet: "poison"')
+            write(segment, rows)
+
+        self.writer._write_segment = reject_poison
+        good = self.writer.submit_and_track(_event(0))
+        bad = self.writer.submit_and_track(dict(_event(1), user_agent="poison"))
+        with patch("core.audit_chain.dead_letter_logger"):
+            self.writer.flush()
+        self.assertIsNone(good.result(0))
+        self.assertIsInstance(bad.exception(0), ValueError)
+
+    def test_segment_written_with_one_statement(self):
+        query = MagicMock(return_value={"rows": []})
+        writer = AuditSegmentWriter(query_fn=query, segment_size=3, flush_interval=0)
+        for i in range(3):
+            writer.submit(_event(i))
+        # head lookups (segments, legacy tail) + one write
+        self.assertEqual(query.call_count, 3)
+        sql = query.call_args_list[-1][0][0]
+        self.assertIn("INSERT INTO audit_segments", sql)
+        self.assertEqual(sql.count("INSERT INTO audit_log"), 1)
+        self.assertEqual(sql.count("::jsonb"), 3)
+        self.assertIn("E'", sql)
+
+
+class TestAuditLog(unittest.IsolatedAsyncioTestCase):
+    """Test that audit_log returns only after its event is written."""
+
+    def setUp(self):
+        _use_signing_key(self)
+        self.store = MemoryStore()
+        self.writer = MemoryWriter(self.store, segment_size=100)
+        patcher = patch("core.audit.get_audit_writer", return_value=self.writer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_returns_after_event_is_persisted(self):
+        from core.audit import audit_log
+
+        log_id = await audit_log("tool.execution", "worker", "EXECUTOR", "sql_query")
+        self.assertEqual([r["id"] for r in self.store.rows.values()], [log_id])
+        self.assertEqual(self.writer.pending(), 0)
+
+    async def test_partial_segment_is_awaited_through_background_flush(self):
+        from core.audit import audit_log
+
+        self.writer.flush_interval = 0.05
+        self.addCleanup(self.writer.stop)
+        log_id = await asyncio.wait_for(audit_log("tool.execution", "worker", "EXECUTOR", "sql_query"), 2)
+        self.assertEqual([r["id"] for r in self.store.rows.values()], [log_id])
+
+    async def test_write_failure_raises_audit_error(self):
+        from core.audit import AuditError, audit_log
+
+        self.writer._write_segment = MagicMock(side_effect=RuntimeError("db down"))
+        with patch("core.audit.logger"), self.assertRaises(AuditError):
+            await audit_log("tool.execution", "worker", "EXECUTOR", "sql_query")
+        self.assertEqual(self.writer.pending(), 0)
+
+
+class TestAuditChainVerifier(unittest.TestCase):
+    """Test incremental verification and tamper detection."""
+
+    def setUp(self):
+        _use_signing_key(self)
+        self.store = MemoryStore()
+        self.writer = MemoryWriter(self.store, segment_size=5)
+        self._write(15)
+        self.verifier = MemoryVerifier(self.store)
+
+    def _write(self, n):
+        for i in range(n):
+            self.writer.submit(_event(i), flush_when_full=False)
+        self.writer.flush()
+
+    def test_round_tripped_rows_verify(self):
+        report = self.verifier.verify()
+        self.assertTrue(report["valid"], report["invalid_entries"])
+        self.assertEqual(report["segments_checked"], 3)
+        self.assertEqual(report["total_entries"], 15)
+
+    def test_only_new_segments_rechecked(self):
+        self.verifier.verify()
+        self._write(5)
+        self.verifier.rows_read = 0
+        report = self.verifier.verify()
+        self.assertTrue(report["valid"])
+        self.assertEqual(report["segments_checked"], 1)
+        self.assertEqual(self.verifier.rows_read, 5)
+
+    def test_single_row_modification_detected(self):
+        self.store.rows[7]["actor_id"] = "ATTACKER"
+        report = self.verifier.verify()
+        self.assertFalse(report["valid"])
+        self.assertEqual(report["invalid_entries"][0]["chain_seq"], 7)
+        self.assertEqual(report["invalid_entries"][0]["error_message"], "Current hash mismatch")
+
+    def test_json_detail_modification_detected(self):
+        self.store.rows[3]["action_details"]["rows"] = 999
+        self.assertFalse(self.verifier.verify()["valid"])
+
+    def test_rehashed_segment_detected_by_checkpoint(self):
+        # Rewrite segment 2 with a self-consistent chain
+        seg = self.store.segments[2]
+        events = [dict(self.store.rows[s], actor_id="ATTACKER") for s in range(6, 11)]
+        _, forged = build_segment(2, 6, seg["start_hash"], events)
+        for row in forged:
+            self.store.rows[row["chain_seq"]].update(
+                actor_id="ATTACKER", prev_hash=row["prev_hash"], current_hash=row["current_hash"])
+
+        messages = {e["error_message"] for e in self.verifier.verify()["invalid_entries"]}
+        self.assertIn("Segment end hash does not match checkpoint", messages)
+
+    def test_forged_checkpoint_detected(self):
+        seg = self.store.segments[3]
+        seg["end_hash"] = "0" * 64
+        seg["signature"] = sign_segment(seg, b"wrong-key")
+        messages = {e["error_message"] for e in self.verifier.verify()["invalid_entries"]}
+        self.assertIn("Checkpoint signature mismatch", messages)
+
+    def test_deleted_segment_detected(self):
+        del self.store.segments[2]
+        for seq in range(6, 11):
+            del self.store.rows[seq]
+        messages = {e["error_message"] for e in self.verifier.verify()["invalid_entries"]}
+        self.assertIn("Missing segment before this checkpoint", messages)
+
+    def test_tamper_in_verified_segment_needs_full_check(self):
+        self.verifier.verify()
+        self.store.rows[2]["resource_id"] = "other"
+        self.assertTrue(self.verifier.verify()["valid"])
+        report = self.verifier.verify(full=True)
+        self.assertFalse(report["valid"])
+        self.assertEqual(report["invalid_entries"][0]["chain_seq"], 2)
+
+    def test_failed_segment_not_marked_verified(self):
+        self.store.rows[12]["action"] = "drop_table"
+        self.verifier.verify()
+        self.assertEqual([s["verified_at"] for s in self.store.segments.values()], ["now", "now", None])
+
+    def test_row_hash_uses_canonical_values(self):
+        row = _event(1)
+        stored = dict(row, created_at=datetime.fromisoformat(row["created_at"]).strftime("%Y-%m-%d %H:%M:%S.%f+00"),
+                      cost_usd="0.0010", action_details=json.dumps(row["action_details"]), success="t")
+        self.assertEqual(compute_row_hash("h", 1, row), compute_row_hash("h", 1, stored))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+"""
+Tests for the Context Window
+============================
+
+Unit tests for core/context_window.py and BrainService's use of it
+"""
+
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core.context_window import (
+    ContextWindow,
+    context_window_for,
+    count_message_tokens,
+    count_request_tokens,
+    count_tokens,
+    input_budget_for,
+    summarize_tool_output,
+    truncate_to_tokens,
+)
+
+
+def _rows(n, start=0):
+    return json.dumps({"rows": [{"id": i, "status": "completed", "title": f"Task number {i} for the pipeline"}
+                                for i in range(start, start + n)]})
+
+
+def _tool_turn(call_id, rows, name="sql_query", args=None):
+    call = {"id": call_id, "type": "function",
+            "function": {"name": name, "arguments": json.dumps(args or {"sql": f"SELECT {call_id}"})}}
+    return [
+        {"role": "assistant", "content": "", "tool_calls": [call]},
+        {"role": "tool", "tool_call_id": call_id, "content": _rows(rows)},
+    ]
+
+
+class TestTokenCounting(unittest.TestCase):
+    """Test the offline counter and request accounting."""
+
+    def test_counts_words_punctuation_and_digits(self):
+        self.assertEqual(count_tokens(""), 0)
+        self.assertEqual(count_tokens("hello world"), 2)
+        self.assertEqual(count_tokens("The quick brown fox jumps over the lazy dog."), 10)
+        # JSON is punctuation-heavy, far more tokens than len // 4 suggests
+        self.assertGreater(count_tokens('{"id": 1, "name": "test"}'), len('{"id": 1, "name": "test"}') // 4)
+        self.assertEqual(count_tokens("1234567"), 3)
+
+    def test_caches_hold_digests_not_text(self):
+        from core import context_window
+
+        counts, compacted = context_window._LRU(64), context_window._LRU(64)
+        text = "word " * 2000
+        with patch.object(context_window, "_counts", counts), patch.object(context_window, "_compacted", compacted):
+            summarize_tool_output(text, 100)
+            self.assertGreater(count_tokens(text), 1000)
+        # Only the full text is counted and cached; truncation probes are not
+        self.assertEqual(len(counts._data), 1)
+        self.assertTrue(all(isinstance(k, bytes) and len(k) == 16 for k in counts._data))
+        self.assertTrue(all(isinstance(k[0], bytes) for k in compacted._data))
+
+    def test_request_includes_overhead_tool_calls_and_tools(self):
+        message = {"role": "user", "content": "hello world"}
+        self.assertEqual(count_message_tokens(message), 6)
+        turn = _tool_turn("c1", 1)
+        self.assertGreater(count_message_tokens(turn[0]), 4)
+        tools = [{"type": "function", "function": {"name": "sql_query", "parameters": {}}}]
+        self.assertGreater(count_request_tokens([message], tools), count_request_tokens([message]))
+
+    def test_model_budgets(self):
+        self.assertEqual(context_window_for("deepseek/deepseek-chat"), 64_000)
+        self.assertEqual(context_window_for("openai/gpt-4o-mini"), 128_000)
+        self.assertEqual(context_window_for("unknown/model"), 32_768)
+        self.assertEqual(input_budget_for("deepseek/deepseek-chat", 4096, max_input_tokens=100_000), 64_000 - 4096 - 1024)
+        self.assertEqual(input_budget_for("google/gemini-2.0-flash-exp:free", 4096, max_input_tokens=20_000), 20_000)
+
+
+class TestCompaction(unittest.TestCase):
+    """Test summarising, superseding, dropping and truncating."""
+
+    def test_summarize_keeps_json_structure(self):
+        summary = summarize_tool_output(_rows(200), 300)
+        self.assertLessEqual(count_tokens(summary), 300)
+        parsed = json.loads(summary)
+        self.assertIn("more items", parsed["rows"][-1])
+
+        text = truncate_to_tokens("word " * 1000, 100)
+        self.assertLessEqual(count_tokens(text), 100)
+        self.assertIn("truncated", text)
+
+    def test_fit_leaves_small_requests_alone(self):
+        messages = [{"role": "system", "content": "sys"}, {"role": "user", "content": "hi"}]
+        out, report = ContextWindow("deepseek/deepseek-chat", 4096).fit(messages)
+        self.assertEqual(out, messages)
+        self.assertIsNot(out, messages)
+        self.assertEqual(report.input_tokens, report.original_tokens)
+        self.assertFalse(report.over_budget)
+
+    def test_superseded_results_and_reasoning_notes(self):
+        messages = [{"role": "system", "content": "sys"}, {"role": "user", "content": "q"}]
+        same = {"sql": "SELECT 1"}
+        messages += _tool_turn("a", 3, args=same)
+        messages.append({"role": "system", "content": "## Reasoning Progress\nstep 1"})
+        messages += _tool_turn("b", 3, args=same)
+        messages.append({"role": "system", "content": "## Reasoning Progress\nstep 2"})
+        out, report = ContextWindow("deepseek/deepseek-chat", 4096).fit(messages)
+
+        self.assertEqual(report.superseded, 2)
+        self.assertIn("superseded", out[3]["content"])
+        self.assertEqual([m["content"] for m in out if m["role"] == "system"][1:], ["## Reasoning Progress\nstep 2"])
+        self.assertEqual(messages[3]["content"], _rows(3))  # caller's list untouched
+
+    def test_request_size_is_bounded_regardless_of_iterations(self):
+        window = ContextWindow("deepseek/deepseek-chat", 4096, max_input_tokens=3000)
+        system = {"role": "system", "content": "You are the brain. " * 50}
+        history = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"earlier message {i} " * 40}
+                   for i in range(20)]
+        messages = [system, *history, {"role": "user", "content": "what failed?"}]
+        for i in range(60):
+            messages += _tool_turn(f"call{i}", 60)
+            out, report = window.fit(messages)
+            self.assertLessEqual(report.input_tokens, 3000)
+            self.assertEqual(out[0], system)
+            self.assertIn({"role": "user", "content": "what failed?"}, out)
+            # Every tool call still has its tool message
+            call_ids = {c["id"] for m in out for c in m.get("tool_calls") or []}
+            self.assertEqual(call_ids, {m["tool_call_id"] for m in out if m["role"] == "tool"})
+        self.assertGreater(report.dropped, 0)
+        self.assertGreater(report.omitted, 0)
+        self.assertGreater(report.original_tokens, 3 * report.input_tokens)
+
+    def test_single_huge_tool_output_is_capped(self):
+        messages = [{"role": "user", "content": "q"}, *_tool_turn("c", 5000)]
+        out, report = ContextWindow("deepseek/deepseek-chat", 4096, tool_result_max_tokens=500).fit(messages)
+        self.assertLessEqual(count_tokens(out[-1]["content"]), 500)
+        self.assertEqual(report.summarized, 1)
+
+
+class TestBrainContext(unittest.TestCase):
+    """Test that BrainService sends fitted requests and reports tokens per iteration."""
+
+    def _brain(self):
+        from core.unified_brain import BrainService
+
+        brain = BrainService.__new__(BrainService)
+        brain.api_key, brain.model, brain.max_tokens = "sk", "deepseek/deepseek-chat", 4096
+        brain._ensure_session = MagicMock(return_value=("s1", False))
+        brain._load_history = MagicMock(return_value=[])
+        brain._store_message = MagicMock()
+        brain._create_fallback_task = MagicMock(return_value={})
+        return brain
+
+    def test_tool_loop_reports_input_tokens_per_iteration(self):
+        brain = self._brain()
+        calls = [("", [_tool_turn(f"c{i}", 400)[0]["tool_calls"][0]]) for i in range(3)] + [("done", [])]
+        brain._call_api_with_tools = MagicMock(side_effect=calls)
+        brain._execute_tool = MagicMock(side_effect=[json.loads(_rows(400)) | {"n": i} for i in range(3)])
+
+        with patch("core.unified_brain.get_tool_schemas", return_value=[]), \
+                patch("core.context_window.BRAIN_MAX_INPUT_TOKENS", 4000):
+            result = brain.consult_with_tools("q", system_prompt="sys", include_memories=False,
+                                              enable_tools=False, auto_execute=True)
+
+        per_iteration = result["input_tokens_per_iteration"]
+        self.assertEqual(len(per_iteration), 4)
+        self.assertEqual(result["input_tokens"], sum(per_iteration))
+        self.assertTrue(all(tokens <= 4000 for tokens in per_iteration))
+        sent = brain._call_api_with_tools.call_args_list[-1][0][0]
+        self.assertLessEqual(count_request_tokens(sent), 4000)
+
+    @patch("core.unified_brain.query_db")
+    def test_history_is_limited_by_tokens(self, query_db):
+        from core.unified_brain import BrainService
+
+        rows = [{"role": "assistant", "content": f"answer {i} " + "detail " * 3000} for i in range(5)]
+        query_db.return_value = {"rows": rows}
+        brain = BrainService.__new__(BrainService)
+        with patch("core.unified_brain.MAX_HISTORY_TOKENS", 7000):
+            history = brain._load_history("s1")
+        self.assertEqual([m["content"].split()[1] for m in history], ["1", "0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+"""
+Tests for Deploy Watch Service
+==============================
+
+Unit tests for core/deploy_watch.py and the batched status checks in
+core/deploy_verifier.py
+"""
+
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core.deploy_verifier import DeployResult, DeployStatus, DeployVerifier
+from core.deploy_watch import DeployWatcher
+
+
+def _result(service_id, status, commit_sha=None, deployment_id="d1"):
+    return DeployResult(status=status, service_id=service_id, deployment_id=deployment_id,
+                        commit_sha=commit_sha, platform="railway")
+
+
+class TestDeployWatcher(unittest.TestCase):
+    """Test batching, resolution and deadlines (polls driven manually)."""
+
+    def setUp(self):
+        self.verifier = DeployVerifier(railway_token="rw", vercel_token="vc")
+        self.watcher = DeployWatcher(verifier=self.verifier, start_thread=False)
+
+    def test_one_batched_query_for_all_pending_deploys(self):
+        self.verifier.check_railway_statuses = MagicMock(return_value={
+            "svc-a": _result("svc-a", DeployStatus.BUILDING),
+            "svc-b": _result("svc-b", DeployStatus.SUCCESS),
+        })
+        fut_a = self.watcher.watch("svc-a")
+        fut_b = self.watcher.watch("svc-b")
+        self.assertTrue(self.watcher.poll_once())
+        self.verifier.check_railway_statuses.assert_called_once_with(["svc-a", "svc-b"])
+        self.assertTrue(fut_b.done())
+        self.assertFalse(fut_a.done())
+        self.assertEqual(self.watcher.status("railway", "svc-a").status, DeployStatus.BUILDING)
+        self.assertEqual(self.watcher.recent_result("railway", "svc-b").status, DeployStatus.SUCCESS)
+
+    def test_same_deploy_shares_one_watch_and_runs_callbacks(self):
+        seen = []
+        self.verifier.check_railway_statuses = MagicMock(return_value={
+            "svc-a": _result("svc-a", DeployStatus.FAILED),
+        })
+        first = self.watcher.watch("svc-a", callback=seen.append)
+        second = self.watcher.watch("svc-a")
+        self.assertIs(first, second)
+        self.assertEqual(self.watcher.pending(), 1)
+        self.watcher.poll_once()
+        self.assertEqual([r.status for r in seen], [DeployStatus.FAILED])
+        self.assertEqual(self.watcher.pending(), 0)
+
+    def test_waits_for_requested_commit(self):
+        self.verifier.check_railway_statuses = MagicMock(return_value={
+            "svc-a": _result("svc-a", DeployStatus.SUCCESS, commit_sha="0ld0000"),
+        })
+        future = self.watcher.watch("svc-a", commit_sha="abc1234def")
+        self.watcher.poll_once()
+        self.assertFalse(future.done())
+        self.verifier.check_railway_statuses.return_value = {
+            "svc-a": _result("svc-a", DeployStatus.SUCCESS, commit_sha="abc1234", deployment_id="d2"),
+        }
+        self.watcher.poll_once()
+        self.assertEqual(future.result().deployment_id, "d2")
+
+    def test_deadline_resolves_with_timeout(self):
+        self.verifier.check_railway_statuses = MagicMock(return_value={
+            "svc-a": _result("svc-a", DeployStatus.DEPLOYING),
+        })
+        future = self.watcher.watch("svc-a", timeout=0)
+        self.watcher.poll_once()
+        self.assertEqual(future.result().status, DeployStatus.DEPLOYING)
+        self.assertIn("Timeout", future.result().error)
+
+    def test_recent_result_matches_commit_and_skips_timeouts(self):
+        self.verifier.check_railway_statuses = MagicMock(return_value={
+            "svc-a": _result("svc-a", DeployStatus.SUCCESS, commit_sha="abc1234"),
+            "svc-b": _result("svc-b", DeployStatus.DEPLOYING),
+        })
+        self.watcher.watch("svc-a", commit_sha="abc1234")
+        self.watcher.watch("svc-b", timeout=0)
+        self.watcher.poll_once()
+
+        self.assertIsNotNone(self.watcher.recent_result("railway", "svc-a", commit_sha="abc1234def"))
+        self.assertIsNone(self.watcher.recent_result("railway", "svc-a", commit_sha="fff9999"))
+        self.assertIsNone(self.watcher.recent_result("railway", "svc-b"))
+
+    def test_missing_token_fails_fast(self):
+        watcher = DeployWatcher(verifier=DeployVerifier(railway_token=""), start_thread=False)
+        future = watcher.watch("svc-a", timeout=600)
+        self.assertTrue(future.done())
+        self.assertEqual(future.result().error, "No Railway API token configured")
+        self.assertEqual(watcher.pending(), 0)
+
+    def test_platforms_are_polled_separately(self):
+        self.verifier.check_railway_statuses = MagicMock(return_value={})
+        self.verifier.check_vercel_statuses = MagicMock(return_value={})
+        self.watcher.watch("svc-a")
+        self.watcher.watch("prj-b", platform="vercel")
+        self.assertFalse(self.watcher.poll_once())
+        self.verifier.check_railway_statuses.assert_called_once_with(["svc-a"])
+        self.verifier.check_vercel_statuses.assert_called_once_with(["prj-b"])
+
+    def test_background_thread_resolves_wait_for_deploy(self):
+        watcher = DeployWatcher(verifier=self.verifier, min_interval=0.01)
+        self.addCleanup(watcher.stop)
+        self.verifier.check_railway_statuses = MagicMock(return_value={
+            "svc-a": _result("svc-a", DeployStatus.SUCCESS),
+        })
+        with patch("core.deploy_watch.get_deploy_watcher", return_value=watcher):
+            result = self.verifier.wait_for_deploy("svc-a", timeout=5)
+        self.assertTrue(result.is_success)
+
+    def test_watch_deploy_returns_future_and_calls_back(self):
+        self.verifier.check_railway_statuses = MagicMock(return_value={
+            "svc-a": _result("svc-a", DeployStatus.SUCCESS),
+        })
+        seen = []
+        with patch("core.deploy_watch.get_deploy_watcher", return_value=self.watcher):
+            future = self.verifier.watch_deploy("svc-a", callback=seen.append)
+        self.assertFalse(future.done())
+        self.watcher.poll_once()
+        self.assertTrue(future.result().is_success)
+        self.assertEqual(seen, [future.result()])
+
+
+class TestDeployVerificationChain(unittest.TestCase):
+    """Test that the deploy verification chain doesn't block on the deploy."""
+
+    @patch("urllib.request.urlopen")
+    def test_start_returns_before_deploy_resolves(self, mock_urlopen):
+        from core.verification_chains import start_deploy_with_verification
+
+        response = MagicMock()
+        response.read.return_value = json.dumps({"data": {"serviceInstanceRedeploy": True}}).encode()
+        mock_urlopen.return_value.__enter__.return_value = response
+        watcher = DeployWatcher(start_thread=False)
+        outcomes = []
+        with patch("core.deploy_watch.get_deploy_watcher", return_value=watcher):
+            future = start_deploy_with_verification(service_id="svc-a", railway_token="rw",
+                                                    callback=outcomes.append)
+        self.assertFalse(future.done())
+        self.assertEqual(watcher.pending(), 1)
+
+        watch = next(iter(watcher._watches.values()))
+        watch.verifier.check_railway_statuses = MagicMock(return_value={
+            "svc-a": DeployResult(status=DeployStatus.SUCCESS, service_id="svc-a", deployment_id="d9",
+                                  platform="railway", raw_data={"status": "SUCCESS"}),
+        })
+        watcher.poll_once()
+        result, verification = future.result()
+        self.assertTrue(verification["verified"])
+        self.assertEqual(result["deployment_id"], "d9")
+        self.assertEqual(outcomes, [future.result()])
+
+    def test_missing_token_resolves_immediately(self):
+        from core.verification_chains import start_deploy_with_verification
+
+        with patch.dict("os.environ", {}, clear=True):
+            future = start_deploy_with_verification(service_id="svc-a")
+        self.assertTrue(future.done())
+        self.assertEqual(future.result()[1]["error"], "Missing RAILWAY_TOKEN")
+
+
+class TestBatchedStatusChecks(unittest.TestCase):
+    """Test the one-request status queries."""
+
+    @patch("urllib.request.urlopen")
+    def test_railway_statuses_use_aliased_query(self, mock_urlopen):
+        response = MagicMock()
+        response.read.return_value = json.dumps({"data": {
+            "s0": {"edges": [{"node": {"id": "d1", "status": "SUCCESS"}}]},
+            "s1": {"edges": []},
+        }}).encode()
+        mock_urlopen.return_value.__enter__.return_value = response
+
+        results = DeployVerifier(railway_token="rw").check_railway_statuses(["svc-a", "svc-b"])
+
+        self.assertEqual(mock_urlopen.call_count, 1)
+        body = json.loads(mock_urlopen.call_args[0][0].data)
+        self.assertEqual(body["variables"], {"s0": "svc-a", "s1": "svc-b"})
+        self.assertTrue(results["svc-a"].is_success)
+        self.assertEqual(results["svc-b"].error, "No deployments found")
+
+
+if __name__ == "__main__":
+    unittest.main()
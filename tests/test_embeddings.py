@@ -0,0 +1,194 @@
+"""
+Tests for Local Embeddings and Memory Recall Index
+==================================================
+
+Unit tests for core/embeddings.py and core/memory_index.py
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from core.embeddings import EMBEDDING_DIM, LocalEmbedder, VectorIndex, cosine
+from core.memory import EmbeddingClient
+from core.memory_index import MemoryRecallIndex
+
+
+class TestLocalEmbedder(unittest.TestCase):
+    """Test the offline hashed n-gram embedder."""
+
+    def setUp(self):
+        self.embedder = LocalEmbedder()
+
+    def test_deterministic(self):
+        self.assertEqual(self.embedder.embed("Stripe webhook timeout"), self.embedder.embed("Stripe webhook timeout"))
+
+    def test_dense_dimension(self):
+        self.assertEqual(len(self.embedder.embed("anything at all")), EMBEDDING_DIM)
+
+    def test_similar_text_scores_higher(self):
+        a = self.embedder.sparse("checkout payment failed for customer order")
+        b = self.embedder.sparse("customer could not pay at checkout")
+        c = self.embedder.sparse("railway deploy rollback succeeded")
+        self.assertGreater(cosine(a, b), cosine(a, c))
+
+    def test_empty_text(self):
+        self.assertEqual(self.embedder.sparse(""), {})
+        self.assertEqual(sum(self.embedder.embed("")), 0.0)
+
+    def test_embedding_client_is_local(self):
+        client = EmbeddingClient()
+        vec = asyncio.run(client.embed("hello world"))
+        batch = asyncio.run(client.embed_batch(["hello world", "other"]))
+        self.assertEqual(vec, batch[0])
+        self.assertEqual(len(batch), 2)
+
+
+class TestVectorIndex(unittest.TestCase):
+    """Test incremental add/remove and top-k search."""
+
+    def setUp(self):
+        self.index = VectorIndex()
+        self.index.add_batch([
+            ("1", "checkout page crashes when paying with stripe", {"source": "memories"}),
+            ("2", "railway deployment failed during build", {"source": "memories"}),
+            ("3", "stripe payment webhook returned 500", {"source": "learnings"}),
+        ])
+
+    def test_search_ranks_relevant_first(self):
+        hits = self.index.search("stripe checkout payments", k=2)
+        self.assertEqual({h["id"] for h in hits}, {"1", "3"})
+
+    def test_where_filter(self):
+        hits = self.index.search("stripe", k=5, where=lambda m: m.get("source") == "learnings")
+        self.assertEqual([h["id"] for h in hits], ["3"])
+
+    def test_replace_and_remove(self):
+        self.index.add("2", "stripe refunds are slow", {"source": "memories"})
+        self.assertEqual(len(self.index), 3)
+        self.assertIn("2", [h["id"] for h in self.index.search("refunds", k=3)])
+        self.assertTrue(self.index.remove("2"))
+        self.assertFalse(self.index.remove("2"))
+        self.assertNotIn("2", [h["id"] for h in self.index.search("refunds", k=3)])
+
+    def test_unknown_terms_return_nothing(self):
+        self.assertEqual(self.index.search("zzzz qqqq", k=3), [])
+
+    def test_approximate_matches_exact_top_hit(self):
+        approx = VectorIndex(approximate=True, max_query_features=4)
+        approx.add_vectors((i, v, self.index.get_metadata(i)) for i, v in self.index._vectors.items())
+        self.assertEqual(approx.search("railway build", k=1)[0]["id"], "2")
+
+
+class TestMemoryRecallIndex(unittest.TestCase):
+    """Test table sync by high-water mark."""
+
+    def _query_fn(self, batches):
+        def _query(sql):
+            for table, rows in batches.items():
+                if f"FROM {table}" in sql:
+                    return {"rows": rows.pop(0) if rows else []}
+            return {"rows": []}
+        return MagicMock(side_effect=_query)
+
+    def test_incremental_sync(self):
+        query = self._query_fn({
+            "memories": [[{"id": "m1", "key": "deploy", "content": "railway deploys need health checks",
+                           "created_at": "2026-01-01T00:00:00+00:00", "_changed_at": "2026-01-01T00:00:00+00:00"}],
+                         [{"id": "m2", "key": "billing", "content": "stripe invoices are sent monthly",
+                           "created_at": "2026-01-02T00:00:00+00:00", "_changed_at": "2026-01-02T00:00:00+00:00"}]],
+        })
+        index = MemoryRecallIndex(query_fn=query, sources=["memories"])
+        self.assertEqual(index.refresh(force=True), 1)
+        self.assertTrue(index.is_ready())
+        self.assertEqual(index.refresh(force=True), 1)
+        last_sql = query.call_args_list[-1][0][0]
+        self.assertIn("(COALESCE(updated_at, created_at), id::text) > "
+                      "('2026-01-01T00:00:00+00:00'::timestamptz, 'm1')", last_sql)
+        self.assertNotIn("_changed_at", index.recall("railway deploys", k=1)[0])
+        hits = index.recall("stripe invoices", k=1)
+        self.assertEqual(hits[0]["id"], "m2")
+        self.assertEqual(hits[0]["source"], "memories")
+
+    def test_rows_sharing_boundary_timestamp_are_not_skipped(self):
+        same = "2026-01-01T00:00:00+00:00"
+        query = self._query_fn({
+            "memories": [[{"id": "a", "key": "k", "content": "first", "_changed_at": same},
+                          {"id": "b", "key": "k", "content": "second", "_changed_at": same}],
+                         [{"id": "c", "key": "k", "content": "third", "_changed_at": same}]],
+        })
+        index = MemoryRecallIndex(query_fn=query, sources=["memories"])
+        with patch("core.memory_index.SYNC_BATCH_SIZE", 2):
+            self.assertEqual(index.refresh(force=True), 3)
+        page_sql = query.call_args_list[1][0][0]
+        self.assertIn(f"(COALESCE(updated_at, created_at), id::text) > ('{same}'::timestamptz, 'b')", page_sql)
+        self.assertIn("ORDER BY COALESCE(updated_at, created_at) ASC, id::text ASC", page_sql)
+
+    def test_updated_row_replaces_its_entry(self):
+        query = self._query_fn({
+            "memories": [[{"id": "m1", "key": "deploy", "content": "railway deploys need health checks",
+                           "importance": 0.2, "_changed_at": "2026-01-01T00:00:00+00:00"}],
+                         [{"id": "m1", "key": "deploy", "content": "vercel previews need env vars",
+                           "importance": 0.9, "_changed_at": "2026-01-03T00:00:00+00:00"}]],
+        })
+        index = MemoryRecallIndex(query_fn=query, sources=["memories"])
+        index.refresh(force=True)
+        index.refresh(force=True)
+        self.assertEqual(index.recall("railway health checks"), [])
+        hit = index.recall("vercel previews", k=1)[0]
+        self.assertEqual((hit["id"], hit["importance"]), ("m1", 0.9))
+
+    def test_recall_does_not_sync_inline(self):
+        release = threading.Event()
+
+        def slow_query(sql):
+            release.wait(2)
+            return {"rows": [{"id": "m1", "key": "deploy", "content": "railway deploys need health checks",
+                              "_changed_at": "2026-01-01T00:00:00+00:00"}]}
+
+        index = MemoryRecallIndex(query_fn=MagicMock(side_effect=slow_query), sources=["memories"])
+        started = time.monotonic()
+        self.assertEqual(index.recall("railway deploys"), [])
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertFalse(index.is_ready())
+        self.assertFalse(index.request_refresh())  # already running
+
+        release.set()
+        index._refresh_thread.join(2)
+        self.assertTrue(index.is_ready())
+        self.assertEqual(index.recall("railway deploys", k=1)[0]["id"], "m1")
+
+    def test_expired_rows_are_skipped(self):
+        query = self._query_fn({"memories": [[
+            {"id": "old", "key": "k", "content": "temporary deploy freeze",
+             "created_at": "2026-01-01T00:00:00", "expires_at": "2000-01-01T00:00:00"},
+        ]]})
+        index = MemoryRecallIndex(query_fn=query, sources=["memories"])
+        index.refresh(force=True)
+        self.assertEqual(index.recall("deploy freeze"), [])
+
+    def test_index_row_is_immediately_recallable(self):
+        index = MemoryRecallIndex(query_fn=self._query_fn({}), sources=["learnings"])
+        index.refresh(force=True)
+        index.index_row("learnings", {"id": "l1", "summary": "aider times out on large repos"})
+        self.assertEqual(index.recall("aider timeout", k=1)[0]["id"], "l1")
+
+    def test_deleted_memory_is_no_longer_recalled(self):
+        from core import memory_index
+        from core.memory import MemoryService
+
+        index = MemoryRecallIndex(query_fn=self._query_fn({}), sources=["agent_memories"])
+        index.refresh(force=True)
+        index.index_row("agent_memories", {"id": "a1", "content": "stripe webhook retries"})
+        service = MemoryService.__new__(MemoryService)
+        service._parse_uuid = lambda value: value
+        with patch.object(memory_index, "_index", index), \
+                patch("core.memory._query", AsyncMock(return_value={"rows": [{"id": "a1"}]})):
+            self.assertTrue(asyncio.run(service.delete_memory("a1")))
+        self.assertEqual(index.recall("stripe webhook"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
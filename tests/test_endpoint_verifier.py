@@ -5,6 +5,7 @@ Tests for Endpoint Verifier Module (VERCHAIN-08)
 import unittest
 from unittest.mock import patch, MagicMock
 import json
+import time
 
 from core.endpoint_verifier import (
     EndpointVerifier,
@@ -350,6 +351,72 @@ class TestCompositeVerification(unittest.TestCase):
         result = self.verifier._verify_composite(definition)
         self.assertFalse(result.passed)
         self.assertIn("All checks failed", result.error)
+    
+    def _fake_checks(self, delays):
+        """Route http checks to a fake handler: url -> (delay, passed)."""
+        def _check(definition):
+            delay, passed = delays[definition["url"]]
+            time.sleep(delay)
+            return EndpointResult(passed=passed, endpoint_type="http")
+        self.verifier.handlers[EndpointType.HTTP] = _check
+    
+    def test_composite_runs_checks_concurrently(self):
+        """Test wall time is the slowest check, not the sum."""
+        self._fake_checks({"a": (0.2, True), "b": (0.2, True), "c": (0.2, True)})
+        definition = {
+            "type": "composite",
+            "checks": [{"type": "http", "url": u} for u in ("a", "b", "c")],
+            "require": "all"
+        }
+        start = time.time()
+        result = self.verifier._verify_composite(definition)
+        self.assertLess(time.time() - start, 0.5)
+        self.assertTrue(result.passed)
+        self.assertTrue(all(r["duration_ms"] >= 150 for r in result.details["results"]))
+    
+    def test_composite_any_short_circuits_on_first_pass(self):
+        """Test 'any' returns on the first passing check."""
+        self._fake_checks({"fast": (0.0, True), "slow": (2.0, False)})
+        definition = {
+            "type": "composite",
+            "checks": [{"type": "http", "url": "slow"}, {"type": "http", "url": "fast"}],
+            "require": "any"
+        }
+        start = time.time()
+        result = self.verifier._verify_composite(definition)
+        self.assertLess(time.time() - start, 1.0)
+        self.assertTrue(result.passed)
+        self.assertTrue(result.details["results"][0]["cancelled"])
+        self.assertTrue(result.details["short_circuited"])
+    
+    def test_composite_all_short_circuits_on_first_failure(self):
+        """Test 'all' fails as soon as one check fails."""
+        self._fake_checks({"bad": (0.0, False), "slow": (2.0, True)})
+        definition = {
+            "type": "composite",
+            "checks": [{"type": "http", "url": "slow"}, {"type": "http", "url": "bad"}],
+            "require": "all"
+        }
+        start = time.time()
+        result = self.verifier._verify_composite(definition)
+        self.assertLess(time.time() - start, 1.0)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.details["failed_count"], 1)
+        self.assertEqual(result.details["cancelled_count"], 1)
+    
+    def test_composite_shared_deadline(self):
+        """Test checks still running at the deadline count as not passed."""
+        self._fake_checks({"a": (0.0, True), "slow": (2.0, True)})
+        definition = {
+            "type": "composite",
+            "checks": [{"type": "http", "url": "a"}, {"type": "http", "url": "slow"}],
+            "require": "all",
+            "timeout": 0.2
+        }
+        result = self.verifier._verify_composite(definition)
+        self.assertFalse(result.passed)
+        self.assertIn("did not finish", result.error)
+        self.assertIn("Timed out", result.details["results"][1]["error"])
 
 
 class TestExpectedChecking(unittest.TestCase):
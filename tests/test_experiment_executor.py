@@ -1,11 +1,21 @@
 """
 Tests for the experiment_executor module.
 
-Tests the experiment classification and task priority normalization functions.
+Tests the experiment classification and task priority normalization functions,
+and the bulk progression engine.
 """
 
+import json
 import unittest
-from core.experiment_executor import _normalize_task_priority, classify_experiment
+from unittest.mock import MagicMock
+
+from core.experiment_executor import (
+    _group_tasks,
+    _normalize_task_priority,
+    classify_experiment,
+    plan_experiment_transition,
+    progress_experiments,
+)
 
 
 class TestExperimentExecutor(unittest.TestCase):
@@ -81,5 +91,118 @@ class TestExperimentExecutor(unittest.TestCase):
         )
 
 
+def _task(task_id, status, phase):
+    return {"id": task_id, "status": status, "payload_text": json.dumps({"phase": phase})}
+
+
+def _state_row(exp_id, name, task_id=None, status=None, phase=None, retries=0):
+    return {"id": exp_id, "name": name, "status": "running", "experiment_type": None,
+           "task_id": task_id, "task_status": status, "task_retry_count": retries,
+           "task_payload_text": json.dumps({"phase": phase}) if phase else None}
+
+
+class TestPlanExperimentTransition(unittest.TestCase):
+    """Test the pure transition planner."""
+
+    def test_new_experiment_starts_phase_one(self):
+        plan = plan_experiment_transition({"id": "e1", "name": "Domain Flip"}, _group_tasks([]))
+        self.assertEqual(plan["status"], "phase_started")
+        self.assertEqual([t["phase"] for t in plan["create"]], [1])
+
+    def test_waits_while_tasks_are_open(self):
+        existing = _group_tasks([_task("t1", "completed", 1), _task("t2", "in_progress", 2)])
+        plan = plan_experiment_transition({"id": "e1", "name": "Domain Flip"}, existing)
+        self.assertEqual(plan["status"], "waiting_for_tasks")
+        self.assertEqual(plan["create"], [])
+
+    def test_advances_to_next_phase(self):
+        existing = _group_tasks([_task("t1", "completed", 1)])
+        plan = plan_experiment_transition({"id": "e1", "name": "Domain Flip"}, existing)
+        self.assertEqual((plan["status"], plan["phase"]), ("phase_started", 2))
+        self.assertEqual(plan["create"][0]["title"], "Evaluate domain value")
+
+    def test_resets_failed_tasks_until_retry_limit(self):
+        existing = _group_tasks([_task("t1", "failed", 1), _task("t2", "failed", 1)])
+        plan = plan_experiment_transition({"id": "e1"}, existing, {"t1": 3, "t2": 1})
+        self.assertEqual((plan["status"], plan["reset_task_ids"]), ("tasks_reset", ["t2"]))
+        plan = plan_experiment_transition({"id": "e1"}, existing, {"t1": 3, "t2": 3})
+        self.assertEqual(plan["status"], "blocked")
+
+    def test_completes_after_last_phase(self):
+        existing = _group_tasks([_task(f"t{p}", "completed", p) for p in (1, 2, 3)])
+        plan = plan_experiment_transition({"id": "e1", "name": "Domain Flip"}, existing)
+        self.assertEqual(plan["status"], "all_phases_complete")
+
+
+class TestBulkProgression(unittest.TestCase):
+    """Test that the portfolio is progressed with batched reads and writes."""
+
+    def test_whole_portfolio_in_three_statements(self):
+        rows = [_state_row("exp-new-0000", "Domain Flip A")]
+        rows += [_state_row("exp-next-000", "Domain Flip B", "t1", "completed", 1)]
+        rows += [_state_row("exp-fail-000", "Domain Flip C", "t2", "failed", 1, retries=1)]
+        rows += [_state_row(f"exp-wait-{i:03d}", f"Domain Flip W{i}", f"w{i}", "pending", 1) for i in range(50)]
+        execute_sql = MagicMock(side_effect=lambda sql: {"rows": rows} if "WITH running" in sql else {"rows": []})
+        log_action = MagicMock()
+
+        result = progress_experiments(execute_sql, log_action)
+
+        self.assertEqual(execute_sql.call_count, 3)
+        read_sql, insert_sql, reset_sql = [c[0][0] for c in execute_sql.call_args_list]
+        self.assertNotIn("LIMIT", read_sql)
+        self.assertIn("INSERT INTO governance_tasks", insert_sql)
+        self.assertIn("Evaluate domain value", insert_sql)
+        self.assertIn("'t2'", reset_sql)
+        self.assertEqual(result["running_experiments"], 53)
+        self.assertEqual(result["total_tasks_created"], 2)
+        self.assertEqual(result["experiments_progressed"], 2)
+        statuses = {d["experiment_id"]: d["status"] for d in result["details"]}
+        self.assertEqual(statuses["exp-fail-000"], "tasks_reset")
+        self.assertEqual(statuses["exp-wait-000"], "waiting_for_tasks")
+
+    def test_failed_insert_reports_no_tasks_created(self):
+        rows = [_state_row("exp-new-0000", "Domain Flip A")]
+
+        def execute_sql(sql):
+            if sql.startswith("INSERT"):
+                raise RuntimeError("db down")
+            return {"rows": rows}
+
+        result = progress_experiments(execute_sql, MagicMock())
+        self.assertEqual(result["total_tasks_created"], 0)
+        self.assertEqual(result["details"][0]["task_ids"], [])
+
+    def test_quotes_and_non_ascii_names_round_trip(self):
+        rows = [_state_row("exp-new-0000", 'Caf\u00e9 "Flip" \\ test')]
+        execute_sql = MagicMock(side_effect=lambda sql: {"rows": rows} if "WITH running" in sql else {"rows": []})
+        progress_experiments(execute_sql, MagicMock())
+        insert_sql = execute_sql.call_args_list[1][0][0]
+        # E'' literals: unescaping the SQL string gives back valid JSON with the original name
+        payload_literal = insert_sql.split("E'{")[1].split("}'")[0]
+        payload = json.loads("{" + payload_literal.replace("''", "'").replace("\\\\", "\\") + "}")
+        self.assertEqual(payload["experiment_name"], 'Caf\u00e9 "Flip" \\ test')
+
+    def test_failed_batch_falls_back_to_row_inserts(self):
+        rows = [_state_row("exp-new-0000", "Domain Flip A"), _state_row("exp-bad-0000", "Domain Flip B")]
+        inserts = []
+
+        def execute_sql(sql):
+            if sql.startswith("INSERT"):
+                inserts.append(sql)
+                if "exp-bad" in sql:
+                    raise RuntimeError("invalid input syntax")
+                return {"rowCount": 1}
+            return {"rows": rows}
+
+        log_action = MagicMock()
+        result = progress_experiments(execute_sql, log_action)
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(result["total_tasks_created"], 1)
+        created = {d["experiment_id"]: d["tasks_created"] for d in result["details"]}
+        self.assertEqual(created, {"exp-new-0000": 1, "exp-bad-0000": 0})
+        failures = [c for c in log_action.call_args_list if c[0][0] == "experiment.task_creation_failed"]
+        self.assertEqual(failures[0][1]["output_data"]["experiment_ids"], ["exp-bad-0000"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,141 @@
+"""
+Tests for Experiment Statistics Engine
+======================================
+
+Unit tests for core/experiment_stats.py and its use in
+core.experiments.compare_variants
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core.experiment_stats import (
+    ExperimentStatsEngine,
+    VariantStats,
+    analyze_portfolio,
+    beta_posterior,
+    obrien_fleming_boundary,
+    prob_b_beats_a,
+    two_proportion_ztest,
+)
+
+
+def _variant(variant_id, experiment_id, samples, conversions, is_control=False):
+    return VariantStats(variant_id=variant_id, experiment_id=experiment_id, name=variant_id,
+                        is_control=is_control, samples=samples, conversions=conversions)
+
+
+class TestVectorisedTests(unittest.TestCase):
+    """Test the statistical primitives against known values."""
+
+    def test_two_proportion_ztest(self):
+        z, p = two_proportion_ztest([100, 0], [1000, 0], [130, 5], [1000, 10])
+        self.assertAlmostEqual(z[0], 2.1027, places=3)
+        self.assertAlmostEqual(p[0], 0.0355, places=3)
+        # No control data: no evidence either way
+        self.assertEqual((z[1], p[1]), (0.0, 1.0))
+
+    def test_beta_posterior_and_probability(self):
+        means, lows, highs = beta_posterior([100], [1000])
+        self.assertAlmostEqual(means[0], 101 / 1002, places=6)
+        self.assertLess(lows[0], means[0])
+        self.assertGreater(highs[0], means[0])
+        probs = prob_b_beats_a([100, 100], [1000, 1000], [130, 100], [1000, 1000])
+        self.assertGreater(probs[0], 0.95)
+        self.assertAlmostEqual(probs[1], 0.5, places=6)
+
+    def test_obrien_fleming_boundary_shrinks_to_fixed_horizon(self):
+        early, final = obrien_fleming_boundary([0.25, 1.0])
+        self.assertAlmostEqual(final, 1.96, places=2)
+        self.assertAlmostEqual(early, 3.92, places=2)
+
+
+class TestPortfolioAnalysis(unittest.TestCase):
+    """Test winners and decisions across many experiments in one pass."""
+
+    def test_winner_requires_crossing_sequential_boundary(self):
+        experiments = {
+            # Significant at a fixed horizon, but too early for the sequential boundary
+            "early": [_variant("c1", "early", 250, 25, True), _variant("t1", "early", 250, 43)],
+            "final": [_variant("c2", "final", 1000, 100, True), _variant("t2", "final", 1000, 130)],
+            "loser": [_variant("c3", "loser", 1000, 130, True), _variant("t3", "loser", 1000, 90)],
+        }
+        results = analyze_portfolio(experiments)
+        self.assertTrue(results["early"]["treatments"][0]["significant"])
+        self.assertIsNone(results["early"]["winner"])
+        self.assertEqual(results["early"]["decision"], "continue")
+        self.assertEqual(results["final"]["winner"], "t2")
+        self.assertEqual(results["final"]["decision"], "stop_winner")
+        self.assertEqual(results["loser"]["decision"], "stop_control")
+
+    def test_control_is_flagged_variant(self):
+        result = analyze_portfolio({"e": [_variant("t", "e", 100, 20), _variant("c", "e", 100, 10, True)]})["e"]
+        self.assertEqual(result["control"]["name"], "c")
+        self.assertEqual(result["treatments"][0]["lift_vs_control"], 100.0)
+
+
+class TestExperimentStatsEngine(unittest.TestCase):
+    """Test incremental sync and write-path hooks."""
+
+    def setUp(self):
+        self.query = MagicMock(side_effect=self._query)
+        self.variant_rows = [
+            {"id": "c", "experiment_id": "e1", "name": "Control", "is_control": True,
+             "sample_size": 100, "conversions": 10, "revenue_generated": 0, "changed_at": "2026-01-01 00:00:00+00"},
+            {"id": "t", "experiment_id": "e1", "name": "Treatment", "is_control": False,
+             "sample_size": 100, "conversions": 12, "revenue_generated": 0, "changed_at": "2026-01-01 00:00:01+00"},
+        ]
+        self.result_rows = [
+            {"experiment_id": "e1", "metric_name": "revenue", "metric_value": 50, "ts": "2026-01-01 00:00:02+00"},
+        ]
+        self.engine = ExperimentStatsEngine(query_fn=self.query)
+
+    def _query(self, sql):
+        return {"rows": self.variant_rows if "experiment_variants" in sql else self.result_rows}
+
+    def test_sync_is_incremental(self):
+        self.assertIsNone(self.engine.latest_metrics("e1"))
+        self.engine.sync()
+        self.assertEqual(self.engine.latest_metrics("e1"), {"revenue": 50.0})
+        self.variant_rows, self.result_rows = [], []
+        self.engine.sync()
+        second_variant_sql, second_result_sql = [c[0][0] for c in self.query.call_args_list[2:]]
+        self.assertIn(">= '2026-01-01 00:00:01+00'", second_variant_sql)
+        self.assertIn(">= '2026-01-01 00:00:02+00'", second_result_sql)
+        # Nothing changed, nothing lost
+        self.assertEqual(len(self.engine.variants("e1")), 2)
+
+    def test_hooks_update_state_without_queries(self):
+        self.engine.sync()
+        calls = self.query.call_count
+        self.engine.notify_variant({"id": "t", "sample_size": 1000, "conversions": 200})
+        self.engine.notify_result("e1", "revenue", 75.0)
+        self.assertEqual(self.query.call_count, calls)
+        self.assertEqual(self.engine.latest_metrics("e1"), {"revenue": 75.0})
+        treatment = self.engine.analyze()["e1"]["treatments"][0]
+        self.assertEqual(treatment["sample_size"], 1000)
+
+    def test_ensure_fresh_swallows_sync_errors(self):
+        self.query.side_effect = RuntimeError("Database not configured")
+        self.assertFalse(self.engine.ensure_fresh())
+
+
+class TestCompareVariants(unittest.TestCase):
+    """Test that compare_variants only declares significant winners."""
+
+    @patch("core.experiments._execute_sql")
+    def test_small_difference_has_no_winner(self, mock_sql):
+        from core.experiments import compare_variants
+
+        mock_sql.return_value = {"rows": [
+            {"id": "c", "name": "Control", "is_control": True, "sample_size": 100, "conversions": 10, "revenue_generated": 0},
+            {"id": "t", "name": "Treatment", "is_control": False, "sample_size": 100, "conversions": 12, "revenue_generated": 0},
+        ]}
+        result = compare_variants("e1")
+        self.assertIsNone(result["winner"])
+        self.assertEqual(result["treatments"][0]["conversion_rate"], 12.0)
+        self.assertIn("p_value", result["treatments"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
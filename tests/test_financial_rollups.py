@@ -0,0 +1,164 @@
+"""
+Tests for Financial Rollups
+===========================
+
+Unit tests for core/financial_rollups.py and the core.database financial
+read functions that answer from it
+"""
+
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from core import database
+from core.financial_rollups import FinancialRollups, parse_period, window_clause
+
+NOW = datetime(2026, 5, 20, 14, 35, tzinfo=timezone.utc)
+
+
+class TestWindowClause(unittest.TestCase):
+    """Test which rollup rows cover a window."""
+
+    def test_all_time_uses_day_buckets(self):
+        self.assertEqual(window_clause(None), "grain = 'day'")
+
+    def test_day_aligned_window_uses_day_buckets_only(self):
+        clause = window_clause(datetime(2026, 5, 1, tzinfo=timezone.utc))
+        self.assertEqual(clause, "grain = 'day' AND bucket >= '2026-05-01T00:00:00+00:00'")
+
+    def test_partial_first_day_uses_hour_buckets(self):
+        clause = window_clause(datetime(2026, 4, 20, 14, 35, tzinfo=timezone.utc))
+        self.assertIn("grain = 'day' AND bucket >= '2026-04-21T00:00:00+00:00'", clause)
+        self.assertIn("grain = 'hour' AND bucket >= '2026-04-20T14:00:00+00:00'", clause)
+        self.assertIn("bucket < '2026-04-21T00:00:00+00:00'", clause)
+
+    def test_parse_period_accepts_http_api_text(self):
+        self.assertEqual(parse_period("2026-05-01 00:00:00+00"), datetime(2026, 5, 1, tzinfo=timezone.utc))
+
+
+class TestFinancialRollups(unittest.TestCase):
+    """Test rollup queries and result shaping."""
+
+    def setUp(self):
+        self.query = MagicMock(return_value={"rows": []})
+        self.rollups = FinancialRollups(query_fn=self.query)
+
+    def test_grouped_revenue_query(self):
+        self.query.return_value = {"rows": [
+            {"source": "stripe", "event_count": "3", "gross_amount": "30.50", "net_amount": "29.00"}]}
+        rows = self.rollups.revenue(datetime(2026, 5, 1, tzinfo=timezone.utc), group_by=("source",),
+                                    experiment_id="exp-'1", include_refunds=False)
+        self.assertEqual(rows, [{"source": "stripe", "event_count": 3, "gross_amount": 30.5, "net_amount": 29.0}])
+
+        sql = self.query.call_args[0][0]
+        self.assertIn("FROM revenue_rollups", sql)
+        self.assertIn("experiment_id = 'exp-''1'", sql)
+        self.assertIn("NOT is_refund", sql)
+        self.assertTrue(sql.endswith("GROUP BY 1"))
+        self.assertNotIn("revenue_events", sql)
+
+    def test_period_grouping_is_ordered(self):
+        self.rollups.costs(group_by=("month", "category"))
+        sql = self.query.call_args[0][0]
+        self.assertIn("date_trunc('month', bucket, 'UTC') AS period, category", sql)
+        self.assertTrue(sql.endswith("GROUP BY 1, 2 ORDER BY period DESC"))
+
+    def test_unknown_dimension_rejected(self):
+        with self.assertRaises(ValueError):
+            self.rollups.costs(group_by=("source",))
+
+    def test_empty_totals(self):
+        self.assertEqual(self.rollups.cost_total()["amount_cents"], 0)
+        self.assertEqual(self.rollups.revenue_total()["gross_amount"], 0.0)
+
+    def test_calendar_totals(self):
+        def fake(sql):
+            if "cost_rollups" in sql:
+                cents = 500 if "2026-05-01" in sql else 2000
+                return {"rows": [{"event_count": 1, "amount_cents": cents}]}
+            if "AS period" in sql:
+                return {"rows": [
+                    {"period": "2026-05-01 00:00:00+00", "event_count": 1, "gross_amount": 10, "net_amount": 10},
+                    {"period": "2026-04-01 00:00:00+00", "event_count": 1, "gross_amount": 20, "net_amount": 20},
+                    {"period": "2026-02-01 00:00:00+00", "event_count": 1, "gross_amount": 40, "net_amount": 40},
+                ]}
+            return {"rows": [{"event_count": 9, "gross_amount": 170, "net_amount": 160}]}
+
+        self.query.side_effect = fake
+        self.assertEqual(self.rollups.calendar_totals(NOW), {
+            "total": 170.0, "mtd": 10.0, "qtd": 30.0, "ytd": 70.0, "costs": 20.0, "mtd_costs": 5.0,
+        })
+
+    def test_backfill(self):
+        self.query.return_value = {"rows": [{"rollup": "revenue", "rows_written": "12"},
+                                            {"rollup": "cost", "rows_written": "4"}]}
+        self.assertEqual(self.rollups.backfill(NOW), {"revenue": 12, "cost": 4})
+        self.assertIn("backfill_financial_rollups('2026-05-20T14:35:00+00:00'::timestamptz)",
+                      self.query.call_args[0][0])
+
+
+class TestDatabaseReaders(unittest.TestCase):
+    """Test the core.database financial readers on top of the rollups."""
+
+    def setUp(self):
+        self.rollups = MagicMock()
+        patcher = patch("core.financial_rollups.get_financial_rollups", return_value=self.rollups)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_revenue_summary(self):
+        self.rollups.revenue.return_value = [
+            {"source": "stripe", "revenue_type": "one_time", "event_count": 2, "gross_amount": 20.0, "net_amount": 18.0},
+            {"source": "gumroad", "revenue_type": "one_time", "event_count": 1, "gross_amount": 50.0, "net_amount": 45.0},
+            {"source": "stripe", "revenue_type": "recurring", "event_count": 1, "gross_amount": 40.0, "net_amount": 39.0},
+        ]
+        summary = database.get_revenue_summary(30)
+        self.assertEqual(summary["gross_total"], 110.0)
+        self.assertEqual(summary["net_total"], 102.0)
+        self.assertEqual(summary["event_count"], 4)
+        self.assertEqual(list(summary["by_source"].items()), [("stripe", 60.0), ("gumroad", 50.0)])
+        self.assertEqual(summary["by_type"], {"one_time": 70.0, "recurring": 40.0})
+        self.assertFalse(self.rollups.revenue.call_args.kwargs["include_refunds"])
+
+    def test_profit_loss(self):
+        self.rollups.revenue_total.return_value = {"event_count": 3, "gross_amount": 100.0, "net_amount": 90.0}
+        self.rollups.cost_total.return_value = {"event_count": 5, "amount_cents": 4500}
+        pnl = database.get_profit_loss(7)
+        self.assertEqual(pnl["profit"], {"gross_profit": 55.0, "net_profit": 45.0})
+        self.assertEqual(pnl["margin_percent"], 50.0)
+
+    def test_experiment_roi(self):
+        self.rollups.revenue_total.return_value = {"gross_amount": 30.0}
+        self.rollups.cost_total.return_value = {"amount_cents": 1000}
+        roi = database.get_experiment_roi("exp-1")
+        self.assertEqual(roi["roi_percent"], 200.0)
+        self.rollups.cost_total.assert_called_once_with(experiment_id="exp-1")
+
+    def test_budget_status_uses_one_rollup_query(self):
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        month_start = today.replace(day=1)
+        self.rollups.costs.return_value = [
+            {"cost_type": "api", "category": "openai", "period": today.isoformat(), "amount_cents": 300},
+            {"cost_type": "api", "category": "openai", "period": month_start.isoformat(), "amount_cents": 700},
+            {"cost_type": "infrastructure", "category": "railway", "period": today.isoformat(), "amount_cents": 5000},
+        ]
+        budgets = [
+            {"budget_name": "openai", "cost_type": "api", "category": "openai", "monthly_limit_cents": 1000,
+             "daily_limit_cents": 200, "alert_threshold_percent": 80},
+            {"budget_name": "all", "monthly_limit_cents": 10000, "alert_threshold_percent": 80},
+        ]
+        with patch.object(database, "_db") as db:
+            db.query.return_value = {"rows": budgets}
+            statuses = database.check_budget_status()
+
+        self.rollups.costs.assert_called_once()
+        openai, total = statuses
+        self.assertEqual(openai["monthly_spent_cents"], 1000)
+        # On the 1st both openai rows are today's
+        self.assertEqual(openai["daily_spent_cents"], 1000 if month_start == today else 300)
+        self.assertTrue(openai["daily_over"])
+        self.assertEqual(total["monthly_spent_cents"], 6000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -307,6 +307,56 @@ class TestGateCheckerPRMerged:
         assert "not merged" in result.reason
 
 
+class TestGateCheckerDeployed:
+    """Tests for deployed gate checking."""
+    
+    def _watcher(self, deployed_sha):
+        from core.deploy_verifier import DeployResult, DeployStatus, DeployVerifier
+        from core.deploy_watch import DeployWatcher
+        
+        verifier = DeployVerifier(railway_token="rw")
+        verifier.check_railway_statuses = MagicMock(return_value={"svc": DeployResult(
+            status=DeployStatus.SUCCESS, service_id="svc", deployment_id="d1",
+            commit_sha=deployed_sha, platform="railway")})
+        return DeployWatcher(verifier=verifier, start_thread=False)
+    
+    @patch('core.gate_checker.GateChecker._get_task_merge_commit', return_value="abc1234ffff")
+    def test_recent_deploy_of_another_commit_does_not_pass(self, _merge_commit):
+        """A deploy resolved for a different commit must not satisfy the gate."""
+        watcher = self._watcher("0ld0000")
+        watcher.watch("svc")
+        watcher.poll_once()
+        
+        checker = GateChecker()
+        checker.railway_token = "rw"
+        gate = GateDefinition.from_dict({"config": {"service_id": "svc"}})
+        with patch('core.gate_checker.get_deploy_watcher', return_value=watcher), \
+                patch('core.gate_checker.DeployVerifier', return_value=watcher.verifier):
+            result = checker._check_deployed("task-123", gate)
+            assert result.passed is False
+            
+            watcher.verifier.check_railway_statuses.return_value["svc"].commit_sha = "abc1234"
+            watcher.poll_once()
+            result = checker._check_deployed("task-123", gate)
+        
+        assert result.passed is True
+        assert result.evidence["commit_sha"] == "abc1234"
+    
+    @patch('core.gate_checker.GateChecker._get_task_merge_commit', return_value=None)
+    def test_no_railway_token_fails_immediately(self, _merge_commit):
+        """Without a token the gate fails at once rather than waiting out a watch."""
+        from core.deploy_watch import DeployWatcher
+        
+        checker = GateChecker()
+        checker.railway_token = ""
+        gate = GateDefinition.from_dict({"config": {"service_id": "svc"}})
+        with patch('core.gate_checker.get_deploy_watcher', return_value=DeployWatcher(start_thread=False)):
+            result = checker._check_deployed("task-123", gate)
+        
+        assert result.passed is False
+        assert "No Railway API token configured" in result.reason
+
+
 class TestGateCheckerHealthCheck:
     """Tests for health_check gate checking."""
     
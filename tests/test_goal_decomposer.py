@@ -0,0 +1,140 @@
+"""
+Tests for Goal Decomposer
+=========================
+
+Unit tests for the decomposition pipeline in core/goal_decomposer.py:
+concurrent LLM calls, circuit breaker, per-version caching, in-memory
+subtask dedup and batched inserts
+"""
+
+import json
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core import goal_decomposer
+from core.circuit_breaker import CircuitBreaker
+from core.goal_decomposer import GoalDecomposer, goal_version, normalize_task_title
+
+
+def _goal(goal_id, title="Grow revenue"):
+    return {"id": goal_id, "title": title, "description": "d", "success_criteria": {},
+            "deadline": None, "progress": 0, "max_cost_cents": 100, "active_task_count": "0"}
+
+
+def _breakdown(*titles):
+    return json.dumps({"tasks": [
+        {"title": t, "task_type": "research", "description": t, "priority": "high"} for t in titles
+    ]})
+
+
+class TestGoalDecomposerPipeline(unittest.TestCase):
+    """Test one decomposition cycle end to end with mocked SQL and LLM."""
+
+    def setUp(self):
+        goal_decomposer._prompt_cache.clear()
+        self.goals = [_goal("g1", "Goal one"), _goal("g2", "Goal two")]
+        self.existing = []
+        self.inserts = []
+        self.execute_sql = MagicMock(side_effect=self._execute_sql)
+        self.decomposer = GoalDecomposer(self.execute_sql, MagicMock())
+        self.breaker = CircuitBreaker("openrouter-test")
+        patcher = patch("core.goal_decomposer.get_circuit_breaker", return_value=self.breaker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _execute_sql(self, sql):
+        if "FROM goals g" in sql:
+            return {"rows": self.goals}
+        if "FROM governance_tasks" in sql:
+            return {"rows": self.existing}
+        if "INSERT INTO governance_tasks" in sql:
+            self.inserts.append(sql)
+        return {"rows": []}
+
+    def test_llm_calls_run_concurrently(self):
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def call(prompt):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return _breakdown("Research market", "Draft plan")
+
+        with patch.object(self.decomposer, "_call_openrouter", side_effect=call):
+            result = self.decomposer.decompose_goals()
+
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(result["tasks_created"], 4)
+        # One multi-row INSERT per goal
+        self.assertEqual(len(self.inserts), 2)
+        self.assertIn(goal_version(self.goals[0]), self.inserts[0] + self.inserts[1])
+
+    def test_subtasks_deduplicated_against_existing_tasks(self):
+        self.goals = [self.goals[0]]
+        self.existing = [
+            {"goal_id": "g1", "title": "research market!", "status": "completed", "goal_version": None},
+            {"goal_id": "g1", "title": "Draft plan", "status": "failed", "goal_version": None},
+        ]
+        with patch.object(self.decomposer, "_call_openrouter",
+                          return_value=_breakdown("Research market", "Draft plan", "Draft Plan")):
+            result = self.decomposer.decompose_goals()
+        self.assertEqual(result["tasks_created"], 1)
+        self.assertIn("'Draft plan'", self.inserts[0])
+        self.assertNotIn("Draft Plan", self.inserts[0])
+        self.assertNotIn("Research market", self.inserts[0])
+
+    def test_unchanged_goal_is_not_redecomposed(self):
+        self.existing = [{"goal_id": "g1", "title": "x", "status": "completed",
+                          "goal_version": goal_version(self.goals[0])}]
+        llm = MagicMock(return_value=_breakdown("Only for g2"))
+        with patch.object(self.decomposer, "_call_openrouter", llm):
+            result = self.decomposer.decompose_goals()
+        llm.assert_called_once()
+        self.assertEqual(result["goals_unchanged"], 1)
+        self.assertEqual(result["goals_processed"], 1)
+
+    def test_cached_breakdown_skips_llm(self):
+        self.goals = [self.goals[0]]
+        with patch.object(self.decomposer, "_call_openrouter", return_value=_breakdown("A task")) as llm:
+            self.decomposer.decompose_goals()
+            self.decomposer.decompose_goals()
+        llm.assert_called_once()
+        self.assertEqual(len(self.inserts), 2)
+
+    def test_open_circuit_defers_goals(self):
+        self.breaker.force_open()
+        with patch.object(self.decomposer, "_call_openrouter") as llm:
+            result = self.decomposer.decompose_goals()
+        llm.assert_not_called()
+        self.assertEqual(result["goals_deferred"], 2)
+        self.assertEqual(self.inserts, [])
+
+    def test_llm_failure_creates_unversioned_fallback(self):
+        self.goals = [self.goals[0]]
+        with patch.object(self.decomposer, "_call_openrouter", side_effect=ValueError("no key")):
+            result = self.decomposer.decompose_goals()
+        self.assertEqual(result["tasks_created"], 1)
+        self.assertIn("Plan approach for: Goal one", self.inserts[0])
+        self.assertNotIn("goal_version", self.inserts[0])
+
+
+class TestHelpers(unittest.TestCase):
+    """Test version hashing and title normalization."""
+
+    def test_goal_version_tracks_prompt_fields(self):
+        goal = _goal("g1")
+        self.assertEqual(goal_version(goal), goal_version({**goal, "progress": 50}))
+        self.assertNotEqual(goal_version(goal), goal_version({**goal, "description": "changed"}))
+
+    def test_normalize_task_title(self):
+        self.assertEqual(normalize_task_title("  Research: the Market! "), "research the market")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Tests for the Health Monitor
+============================
+
+Unit tests for the background-probed, cached health checks in core/health.py
+"""
+
+import asyncio
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core.health import HealthMonitor
+
+
+def _make_monitor(db_result=(True, "ok"), workers_result=(True, "ok")):
+    monitor = HealthMonitor("test-service", interval=60, timeout=0.5)
+    db = MagicMock(return_value=db_result)
+    workers = MagicMock(return_value=workers_result)
+    monitor.register("database", db, critical=True)
+    monitor.register("workers", workers)
+    return monitor, db, workers
+
+
+class TestHealthMonitorCache(unittest.TestCase):
+    """Test cached reads and status aggregation."""
+
+    def test_reads_do_not_run_checks(self):
+        monitor, db, _ = _make_monitor()
+        snapshot = monitor.snapshot()
+        self.assertEqual(snapshot["checks"]["database"]["status"], "pending")
+        self.assertEqual(snapshot["status"], "unhealthy")
+        ready, _ = monitor.readiness()
+        self.assertFalse(ready)
+        self.assertEqual(monitor.liveness()["status"], "alive")
+        db.assert_not_called()
+
+    def test_run_now_populates_cache(self):
+        monitor, db, workers = _make_monitor()
+        snapshot = monitor.run_now()
+        self.assertEqual(snapshot["status"], "healthy")
+        self.assertIn("checked_at", snapshot["checks"]["database"])
+        self.assertTrue(monitor.readiness()[0])
+
+        # Reads after a run hit the cache only
+        for _ in range(100):
+            monitor.snapshot()
+        self.assertEqual(db.call_count, 1)
+        self.assertEqual(workers.call_count, 1)
+
+    def test_deep_check_reuses_recent_results(self):
+        monitor, db, _ = _make_monitor()
+        monitor.run_now()
+        monitor.run_now()
+        self.assertEqual(db.call_count, 1)
+        monitor.run_now(max_age=0)
+        self.assertEqual(db.call_count, 2)
+
+    def test_non_critical_failure_degrades(self):
+        monitor, _, _ = _make_monitor(workers_result=(False, "no heartbeats"))
+        snapshot = monitor.run_now()
+        self.assertEqual(snapshot["status"], "degraded")
+        self.assertTrue(monitor.readiness()[0])
+
+    def test_critical_failure_is_unhealthy_and_not_ready(self):
+        monitor, _, _ = _make_monitor(db_result=(False, "down"))
+        self.assertEqual(monitor.run_now()["status"], "unhealthy")
+        self.assertFalse(monitor.readiness()[0])
+
+    def test_stale_result_is_not_ready(self):
+        monitor, _, _ = _make_monitor()
+        monitor.run_now()
+        monitor.results["database"]["checked_at"] -= 60 * 3 + 1
+        ready, snapshot = monitor.readiness()
+        self.assertFalse(ready)
+        self.assertEqual(snapshot["checks"]["database"]["status"], "stale")
+
+    def test_slow_check_times_out(self):
+        monitor = HealthMonitor("test-service", timeout=0.05)
+
+        async def slow():
+            await asyncio.sleep(1)
+            return True, "ok"
+
+        monitor.register("slow", slow, critical=True)
+        started = time.monotonic()
+        snapshot = monitor.run_now()
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(snapshot["checks"]["slow"]["status"], "unhealthy")
+        self.assertIn("timed out", snapshot["checks"]["slow"]["message"])
+
+    def test_exception_in_check_is_cached_as_failure(self):
+        monitor = HealthMonitor("test-service")
+        monitor.register("database", MagicMock(side_effect=RuntimeError("boom")), critical=True)
+        with patch("core.health.logger"):
+            snapshot = monitor.run_now()
+        self.assertEqual(snapshot["checks"]["database"]["status"], "unhealthy")
+        self.assertEqual(snapshot["checks"]["database"]["details"], {"exception": "boom"})
+
+
+class TestHealthMonitorBackground(unittest.TestCase):
+    """Test the background probe loop."""
+
+    def test_checks_run_on_their_own_schedule(self):
+        monitor = HealthMonitor("test-service", interval=0.05, timeout=0.5)
+        fast = MagicMock(return_value=(True, "ok"))
+        slow = MagicMock(return_value=(True, "ok"))
+        monitor.register("fast", fast, critical=True)
+        monitor.register("slow", slow, interval=60)
+        monitor.start()
+        try:
+            self.assertTrue(monitor.first_run.wait(2))
+            self.assertTrue(monitor.readiness()[0])
+            time.sleep(0.3)
+            self.assertGreaterEqual(fast.call_count, 3)
+            self.assertEqual(slow.call_count, 1)
+
+            # Deep checks run on the background loop while it is up
+            self.assertEqual(monitor.run_now(max_age=0)["status"], "healthy")
+            self.assertEqual(slow.call_count, 2)
+        finally:
+            monitor.stop()
+        self.assertFalse(monitor.running)
+
+    def test_check_reads_cache_when_running(self):
+        monitor, db, _ = _make_monitor()
+        monitor.start()
+        try:
+            monitor.first_run.wait(2)
+            result = asyncio.run(monitor.check())
+            self.assertEqual(result["status"], "healthy")
+            self.assertEqual(db.call_count, 1)
+        finally:
+            monitor.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
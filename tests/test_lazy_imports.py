@@ -0,0 +1,59 @@
+"""
+Tests for lazy subsystem loading
+================================
+
+Unit tests for core/lazy_imports.py and the lazy attribute loading in
+core/__init__.py
+"""
+
+import subprocess
+import sys
+import unittest
+
+from core.lazy_imports import OptionalImport
+
+
+class TestOptionalImport(unittest.TestCase):
+    """Test deferred import, availability and error capture."""
+
+    def test_import_is_deferred_until_first_use(self):
+        optional = OptionalImport("json")
+        self.assertFalse(optional.loaded)
+        self.assertTrue(optional.available)
+        self.assertTrue(optional.loaded)
+        self.assertEqual(optional.dumps({"a": 1}), '{"a": 1}')
+
+    def test_missing_module_records_error(self):
+        optional = OptionalImport("core.does_not_exist_xyz")
+        self.assertFalse(optional.available)
+        self.assertIn("does_not_exist_xyz", optional.error)
+        with self.assertRaises(ImportError):
+            optional.anything
+
+
+class TestLazyCorePackage(unittest.TestCase):
+    """Test that importing core no longer imports its subsystems."""
+
+    def test_import_core_loads_no_subsystems(self):
+        code = (
+            "import sys, core\n"
+            "loaded = sorted(m for m in sys.modules if m.startswith('core.'))\n"
+            "print(','.join(loaded))\n"
+        )
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "")
+
+    def test_public_names_resolve_on_access(self):
+        import core
+        from core.experiments import create_experiment
+        from core.scheduler import resolve_conflict
+
+        self.assertIs(core.create_experiment, create_experiment)
+        self.assertIs(core.resolve_schedule_conflict, resolve_conflict)
+        self.assertIn("create_experiment", dir(core))
+        with self.assertRaises(AttributeError):
+            core.not_a_real_name
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Tests for Learnings Cache
+=========================
+
+Unit tests for core/learnings_cache.py and the lookups that use it.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import core.learnings_cache as learnings_cache
+from core.learnings_cache import LearningsCache
+
+
+ROWS = [
+    {"id": "l1", "worker_id": "EXECUTOR", "category": "success", "summary": "Run tests before pushing",
+     "details": {"task_type": "code"}, "confidence": 0.9, "applied_count": 3, "is_validated": False,
+     "created_at": "2026-01-01T00:00:00", "_changed_at": "2026-01-01T00:00:00"},
+    {"id": "l2", "worker_id": "EXECUTOR", "category": "failure", "summary": "Aider times out on large repos",
+     "details": {"task_type": "code"}, "confidence": 0.7, "applied_count": 0, "is_validated": False,
+     "created_at": "2026-01-02T00:00:00", "_changed_at": "2026-01-02T00:00:00"},
+    {"id": "l3", "worker_id": "ANALYST", "category": "success_pattern", "summary": "Batch Slack alerts",
+     "details": '{"task_type": "research"}', "confidence": 0.5, "applied_count": 1, "is_validated": True,
+     "created_at": "2026-01-03T00:00:00", "_changed_at": "2026-01-03T00:00:00"},
+    {"id": "l4", "worker_id": "ANALYST", "category": "process", "summary": "Low confidence note",
+     "details": {"task_type": "code"}, "confidence": 0.4, "applied_count": 0, "is_validated": False,
+     "created_at": "2026-01-04T00:00:00", "_changed_at": "2026-01-04T00:00:00"},
+]
+
+
+def _loaded_cache():
+    query = MagicMock(side_effect=[{"rows": [dict(r) for r in ROWS]}, {"rows": []}])
+    cache = LearningsCache(query_fn=query)
+    cache.ensure_loaded()
+    return cache, query
+
+
+class TestLearningsCache(unittest.TestCase):
+    """Test ranked reads, writes and reconciliation."""
+
+    def test_relevant_for_task_ranks_failures_first(self):
+        cache, _ = _loaded_cache()
+        self.assertEqual([r["id"] for r in cache.relevant_for_task("code")], ["l2", "l1"])
+        self.assertEqual(cache.relevant_for_task("research"), [])
+
+    def test_applicable_prefers_validated(self):
+        cache, _ = _loaded_cache()
+        rows = cache.applicable(["success_pattern", "process"], confidence_threshold=0.7, limit=10)
+        self.assertEqual([r["id"] for r in rows], ["l3"])
+
+    def test_search_filters(self):
+        cache, _ = _loaded_cache()
+        self.assertEqual([r["id"] for r in cache.search(worker_id="EXECUTOR")], ["l2", "l1"])
+        self.assertEqual([r["id"] for r in cache.search(search_text="AIDER")], ["l2"])
+        self.assertEqual([r["id"] for r in cache.search(validated_only=True)], ["l3"])
+
+    def test_reads_do_not_query_until_reconcile_due(self):
+        cache, query = _loaded_cache()
+        self.assertTrue(cache.ensure_loaded())
+        cache.relevant_for_task("code")
+        self.assertEqual(query.call_count, 1)
+
+    def test_reconcile_uses_high_water_mark_and_replaces_rows(self):
+        cache, query = _loaded_cache()
+        query.side_effect = [{"rows": [{"id": "l1", "category": "failure", "confidence": 0.95,
+                                        "_changed_at": "2026-01-05T00:00:00"}]}]
+        cache.ensure_loaded(force=True)
+        self.assertIn("> ('2026-01-04T00:00:00'::timestamptz, 'l4')", query.call_args[0][0])
+        self.assertEqual([r["id"] for r in cache.relevant_for_task("code")], ["l1", "l2"])
+
+    def test_rows_sharing_boundary_timestamp_are_not_skipped(self):
+        same = "2026-01-05T00:00:00"
+        cache, query = _loaded_cache()
+        query.side_effect = [
+            {"rows": [{"id": "l5", "task_type": "code", "_changed_at": same},
+                      {"id": "l6", "task_type": "code", "_changed_at": same}]},
+            {"rows": [{"id": "l7", "task_type": "code", "_changed_at": same}]},
+        ]
+        with patch.object(learnings_cache, "LOAD_BATCH_SIZE", 2):
+            self.assertEqual(cache.reconcile(), 3)
+        page_sql = query.call_args[0][0]
+        self.assertIn(f"> ('{same}'::timestamptz, 'l6')", page_sql)
+        self.assertIn("ORDER BY COALESCE(updated_at, created_at) ASC, id::text ASC", page_sql)
+        self.assertEqual(len(cache), 7)
+
+    def test_mark_applied(self):
+        cache, _ = _loaded_cache()
+        cache.mark_applied("l2", effectiveness_score=0.8)
+        row = cache.search(search_text="aider")[0]
+        self.assertEqual((row["applied_count"], row["effectiveness_score"]), (1, 0.8))
+
+    def test_deleted_learnings_are_pruned(self):
+        cache, query = _loaded_cache()
+        query.side_effect = [{"rows": []}, {"rows": [{"id": "l1"}, {"id": "l3"}, {"id": "l4"}]}]
+        with patch.object(learnings_cache, "PRUNE_INTERVAL_SECONDS", 0.0):
+            cache.ensure_loaded(force=True)
+        self.assertIn("SELECT id::text AS id FROM learnings", query.call_args[0][0])
+        self.assertEqual([r["id"] for r in cache.relevant_for_task("code")], ["l1"])
+        self.assertEqual(len(cache), 3)
+
+    def test_failed_load_is_not_retried_immediately(self):
+        query = MagicMock(side_effect=RuntimeError("no db"))
+        cache = LearningsCache(query_fn=query)
+        self.assertFalse(cache.ensure_loaded())
+        self.assertFalse(cache.ensure_loaded())
+        self.assertEqual(query.call_count, 1)
+
+
+class TestLearningsCacheCallers(unittest.TestCase):
+    """Test that lookups are served from the cache and writes update it."""
+
+    def setUp(self):
+        self.cache, _ = _loaded_cache()
+        patcher = patch.object(learnings_cache, "_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_relevant_learnings_for_task(self):
+        from core.learnings import get_relevant_learnings_for_task
+        with patch("core.learnings._execute_sql") as sql:
+            rows = get_relevant_learnings_for_task("code", limit=1)
+        sql.assert_not_called()
+        self.assertEqual(rows, [{"id": "l2", "category": "failure", "summary": "Aider times out on large repos",
+                                 "details": {"task_type": "code"}, "confidence": 0.7}])
+
+    def test_get_applicable_learnings(self):
+        from core.learning_application import get_applicable_learnings
+        sql = MagicMock()
+        self.assertEqual([r["id"] for r in get_applicable_learnings(sql)], ["l3"])
+        sql.assert_not_called()
+
+    def test_store_learning_updates_cache(self):
+        from core.learnings import store_learning
+        with patch("core.learnings._execute_sql", return_value={"rows": [{"id": "l9"}]}):
+            store_learning("EXECUTOR", "failure", "Railway build cache is flaky",
+                           details={"task_type": "deploy"}, confidence=0.8)
+        self.assertEqual([r["id"] for r in self.cache.relevant_for_task("deploy")], ["l9"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+Tests for the LLM Response Cache
+================================
+
+Unit tests for core/llm_cache.py and the transport's ``cache=`` option
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core.llm_cache import CachePolicy, LLMCache, fingerprint
+from core.llm_transport import LLMDisabledError, LLMTransport
+
+from tests.test_llm_transport import TransportTestCase
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _payload(text, model="deepseek/deepseek-chat", system=None, **extra):
+    messages = [{"role": "system", "content": system}] if system else []
+    messages.append({"role": "user", "content": text})
+    return {"model": model, "messages": messages, **extra}
+
+
+TITLE_PROMPT = (
+    "Generate a very short title for this conversation. User: what is the status of the "
+    "revenue pipeline for plumbing leads this week"
+)
+
+
+class TestFingerprint(unittest.TestCase):
+    """Test what the cache key does and doesn't depend on."""
+
+    def test_whitespace_and_max_tokens_do_not_change_the_key(self):
+        a = fingerprint("openrouter", _payload("review  this\n code", max_tokens=100))
+        b = fingerprint("openrouter", _payload("review this code ", max_tokens=4096))
+        self.assertEqual(a, b)
+
+    def test_model_temperature_tools_and_system_prompt_do(self):
+        key, scope, _ = fingerprint("openrouter", _payload("hi"))
+        for other in (_payload("hi", model="openai/gpt-4o"), _payload("hi", temperature=0.2),
+                      _payload("hi", tools=[{"type": "function"}]), _payload("hi", system="Be terse")):
+            other_key, other_scope, _ = fingerprint("openrouter", other)
+            self.assertNotEqual(key, other_key)
+            self.assertNotEqual(scope, other_scope)
+        self.assertNotEqual(key, fingerprint("perplexity", _payload("hi"))[0])
+
+
+class TestLLMCache(unittest.TestCase):
+    """Test the exact and similarity tiers, TTL, size bound and metrics."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = LLMCache(path=":memory:", clock=self.clock)
+        self.addCleanup(self.cache.close)
+
+    def test_exact_hit_and_metrics(self):
+        policy = CachePolicy("code_review")
+        self.assertIsNone(self.cache.get("openrouter", _payload("review"), policy))
+        self.cache.put("openrouter", _payload("review"), policy, {"content": "ok"}, cost_cents=0.5, latency_ms=900)
+
+        hit = self.cache.get("openrouter", _payload("review"), policy)
+        self.assertEqual(hit, {"response": {"content": "ok"}, "similarity": 1.0})
+        self.cache.get("openrouter", _payload("review"), policy)
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["entries"], 1)
+        caller = stats["callers"]["code_review"]
+        self.assertEqual((caller["lookups"], caller["hits"], caller["misses"]), (3, 2, 1))
+        self.assertAlmostEqual(caller["hit_rate"], 0.6667)
+        self.assertAlmostEqual(caller["cost_saved_cents"], 1.0)
+        self.assertAlmostEqual(caller["latency_saved_ms"], 1800)
+
+    def test_entries_expire(self):
+        policy = CachePolicy("titles", ttl_seconds=60)
+        self.cache.put("openrouter", _payload("hi"), policy, {"content": "Greeting"})
+        self.clock.now += 61
+        self.assertIsNone(self.cache.get("openrouter", _payload("hi"), policy))
+        self.assertEqual(self.cache.evict(), 1)
+
+    def test_size_bound_evicts_least_recently_used(self):
+        self.cache.max_bytes = 600
+        policy = CachePolicy("review")
+        for i in range(4):
+            self.clock.now += 1
+            self.cache.put("openrouter", _payload(f"diff {i}"), policy, {"content": "x" * 150})
+        self.clock.now += 1
+        self.assertIsNotNone(self.cache.get("openrouter", _payload("diff 0"), policy))
+
+        self.cache.evict()
+        self.assertLessEqual(self.cache.stats()["bytes"], 600)
+        self.assertIsNotNone(self.cache.get("openrouter", _payload("diff 0"), policy))
+        self.assertIsNone(self.cache.get("openrouter", _payload("diff 1"), policy))
+
+    def test_similarity_tier_stays_within_scope(self):
+        exact = CachePolicy("titles")
+        similar = CachePolicy("titles", similarity=0.9)
+        self.cache.put("openrouter", _payload(TITLE_PROMPT), exact, {"content": "Revenue Pipeline Status"})
+
+        near = _payload(TITLE_PROMPT + " please")
+        self.assertIsNone(self.cache.get("openrouter", near, exact))
+        hit = self.cache.get("openrouter", near, similar)
+        self.assertEqual(hit["response"]["content"], "Revenue Pipeline Status")
+        self.assertLess(hit["similarity"], 1.0)
+        self.assertGreaterEqual(hit["similarity"], 0.9)
+
+        self.assertIsNone(self.cache.get("openrouter", _payload("write a haiku about databases"), similar))
+        self.assertIsNone(self.cache.get("openrouter", _payload(TITLE_PROMPT + " please", system="x"), similar))
+        self.assertEqual(self.cache.stats()["callers"]["titles"]["similar_hits"], 1)
+
+    def test_persists_across_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "llm.sqlite3")
+            first = LLMCache(path=path)
+            first.put("openrouter", _payload("goal"), CachePolicy("goals"), {"content": "{}"})
+            first.close()
+            second = LLMCache(path=path)
+            self.assertIsNotNone(second.get("openrouter", _payload("goal"), CachePolicy("goals")))
+            second.close()
+
+    def test_storage_errors_are_misses(self):
+        self.cache._conn = MagicMock()
+        self.cache._conn.execute.side_effect = sqlite3.OperationalError("disk I/O error")
+        with patch("core.llm_cache.logger"):
+            self.assertIsNone(self.cache.get("openrouter", _payload("hi"), CachePolicy("x")))
+            self.assertFalse(self.cache.put("openrouter", _payload("hi"), CachePolicy("x"), {"content": "y"}))
+        self.assertEqual(self.cache.stats()["callers"]["x"]["errors"], 2)
+
+
+class TestTransportCache(TransportTestCase):
+    """Test that cached calls skip the provider and report savings."""
+
+    def setUp(self):
+        super().setUp()
+        self.cache = LLMCache(path=":memory:")
+        self.addCleanup(self.cache.close)
+        self.transport = LLMTransport(rate_limit_wait=0, cache=self.cache)
+        self.addCleanup(self.transport.close)
+        self.transport.register_provider(self.provider, self.fake.endpoint, api_key="sk-test")
+
+    def test_second_call_is_served_from_cache(self):
+        policy = CachePolicy("code_review")
+        first = self.complete(stream=False, cache=policy)
+        second = self.complete(stream=False, cache=policy)
+
+        self.assertFalse(first.cached)
+        self.assertTrue(second.cached)
+        self.assertEqual(second.content, "Hello")
+        self.assertEqual(second.raw, first.raw)
+        self.assertEqual(second.usage.cost_cents, 0.0)
+        self.assertEqual(len(self.fake.requests), 1)
+
+        stats = self.transport.stats()
+        self.assertEqual(stats["providers"][self.provider]["requests"], 1)
+        self.assertEqual(stats["providers"][self.provider]["cache_hits"], 1)
+        self.assertAlmostEqual(stats["cache"]["callers"]["code_review"]["cost_saved_cents"], 0.09)
+
+    def test_rejected_responses_are_not_stored(self):
+        policy = CachePolicy("goal_decomposition", accept=lambda content: json.loads(content))
+        self.complete(cache=policy)
+        self.complete(cache=policy)
+        self.assertEqual(len(self.fake.requests), 2)
+
+    def test_uncached_calls_bypass_the_cache(self):
+        self.complete()
+        self.complete(cache=CachePolicy("titles"))
+        self.assertEqual(len(self.fake.requests), 2)
+
+    @patch.dict(os.environ, {"LLM_EMERGENCY_STOP": "1"})
+    def test_kill_switch_applies_to_cache_hits(self):
+        self.cache.put(self.provider, _payload("hi"), CachePolicy("titles"), {"content": "Hi"})
+        with self.assertRaises(LLMDisabledError):
+            self.complete(cache=CachePolicy("titles"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,252 @@
+"""
+Tests for the LLM Transport
+===========================
+
+Runs core/llm_transport.py and its callers against a local fake OpenRouter
+server (http.server on a loopback port) speaking JSON and SSE
+"""
+
+import itertools
+import json
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from core.circuit_breaker import CircuitOpenError, register_circuit_breaker
+from core.llm_transport import (
+    LLMDisabledError,
+    LLMRateLimitError,
+    LLMResponseError,
+    LLMTransport,
+)
+
+_names = itertools.count()
+
+
+def _chunk(delta=None, finish_reason=None, usage=None, model="deepseek/deepseek-chat"):
+    chunk = {"id": "gen-1", "object": "chat.completion.chunk", "model": model, "choices": []}
+    if delta is not None or finish_reason:
+        chunk["choices"] = [{"index": 0, "delta": delta or {}, "finish_reason": finish_reason}]
+    if usage:
+        chunk["usage"] = usage
+    return chunk
+
+
+class FakeOpenRouter:
+    """Loopback chat-completions server; ``replies`` is consumed one per request."""
+
+    def __init__(self):
+        self.requests = []
+        self.replies = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                fake.requests.append({"body": body, "headers": dict(self.headers),
+                                      "client_port": self.client_address[1]})
+                status, reply = fake.replies.pop(0) if fake.replies else (200, fake.default_reply(body))
+                if isinstance(reply, list):
+                    data = "".join(c + "\n\n" if isinstance(c, str) else f"data: {json.dumps(c)}\n\n"
+                                   for c in reply) + "data: [DONE]\n\n"
+                    content_type = "text/event-stream"
+                else:
+                    data = json.dumps(reply)
+                    content_type = "application/json"
+                encoded = data.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.endpoint = f"http://127.0.0.1:{self.server.server_port}/api/v1/chat/completions"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def default_reply(self, body):
+        if body.get("stream"):
+            return [
+                ": OPENROUTER PROCESSING",
+                _chunk({"role": "assistant", "content": "Hel"}),
+                _chunk({"content": "lo"}),
+                _chunk(finish_reason="stop"),
+                _chunk(usage={"prompt_tokens": 12, "completion_tokens": 2, "total_tokens": 14, "cost": 0.0003}),
+            ]
+        return {
+            "id": "gen-1", "model": "deepseek/deepseek-chat",
+            "choices": [{"message": {"role": "assistant", "content": "Hello"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1000, "completion_tokens": 500, "total_tokens": 1500},
+        }
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TransportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeOpenRouter()
+        self.addCleanup(self.fake.close)
+        self.transport = LLMTransport(rate_limit_wait=0)
+        self.addCleanup(self.transport.close)
+        self.provider = f"fake-openrouter-{next(_names)}"
+        self.transport.register_provider(self.provider, self.fake.endpoint, api_key="sk-test")
+
+    def complete(self, **kwargs):
+        payload = {"model": "deepseek/deepseek-chat", "messages": [{"role": "user", "content": "hi"}]}
+        return self.transport.complete(payload, provider=self.provider, **kwargs)
+
+
+class TestLLMTransport(TransportTestCase):
+    """Test requests, streaming assembly, accounting and protection."""
+
+    def test_non_streamed_completion_and_cost(self):
+        result = self.complete(stream=False, headers={"X-Title": "Test"})
+        self.assertEqual(result.content, "Hello")
+        self.assertFalse(result.streamed)
+        self.assertEqual(result.usage.total_tokens, 1500)
+        # 1000 * $0.30/M + 500 * $1.20/M = $0.0009
+        self.assertAlmostEqual(result.usage.cost_cents, 0.09)
+
+        request = self.fake.requests[0]
+        self.assertNotIn("stream", request["body"])
+        self.assertEqual(request["headers"]["Authorization"], "Bearer sk-test")
+        self.assertEqual(request["headers"]["X-Title"], "Test")
+
+    def test_streams_by_default_with_usage_and_first_token_latency(self):
+        result = self.complete()
+        self.assertTrue(result.streamed)
+        self.assertEqual(result.content, "Hello")
+        self.assertEqual(result.finish_reason, "stop")
+        self.assertEqual(result.usage.prompt_tokens, 12)
+        self.assertAlmostEqual(result.usage.cost_cents, 0.03)
+        self.assertIsNotNone(result.ttft_ms)
+        self.assertLessEqual(result.ttft_ms, result.latency_ms)
+        self.assertEqual(result.raw["choices"][0]["message"]["content"], "Hello")
+
+        body = self.fake.requests[0]["body"]
+        self.assertTrue(body["stream"])
+        self.assertEqual(body["stream_options"], {"include_usage": True})
+
+    def test_stream_iterates_deltas_and_assembles_tool_calls(self):
+        self.fake.replies.append((200, [
+            _chunk({"content": "Checking"}),
+            _chunk({"tool_calls": [{"index": 0, "id": "call_1", "function": {"name": "sql_query", "arguments": '{"sql":'}}]}),
+            _chunk({"tool_calls": [{"index": 0, "function": {"arguments": ' "SELECT 1"}'}}]}),
+            _chunk(finish_reason="tool_calls"),
+        ]))
+        stream = self.transport.stream({"model": "deepseek/deepseek-chat", "messages": []}, provider=self.provider)
+        self.assertEqual(list(stream), ["Checking"])
+
+        result = stream.result
+        self.assertEqual(result.tool_calls, [{"id": "call_1", "type": "function", "function": {
+            "name": "sql_query", "arguments": '{"sql": "SELECT 1"}'}}])
+        self.assertEqual(result.message["tool_calls"], result.tool_calls)
+        self.assertTrue(result.usage.estimated)
+
+    def test_connections_are_reused(self):
+        for _ in range(3):
+            self.complete()
+        self.assertEqual(len({r["client_port"] for r in self.fake.requests}), 1)
+
+    def test_error_statuses(self):
+        self.fake.replies.append((429, {"error": {"message": "slow down"}}))
+        with patch("core.llm_transport.logger"), self.assertRaises(LLMRateLimitError) as ctx:
+            self.complete()
+        self.assertEqual(ctx.exception.status, 429)
+
+        self.fake.replies.append((500, {"error": {"message": "upstream"}}))
+        with patch("core.llm_transport.logger"), self.assertRaises(LLMResponseError) as ctx:
+            self.complete(stream=False)
+        self.assertIn("upstream", ctx.exception.body)
+        self.assertEqual(self.transport.stats()["providers"][self.provider]["errors"], 2)
+
+    def test_circuit_breaker_opens_per_provider(self):
+        register_circuit_breaker(self.provider, failure_threshold=2)
+        self.fake.replies.extend([(503, {}), (503, {})])
+        with patch("core.llm_transport.logger"), patch("core.circuit_breaker.logger"):
+            for _ in range(2):
+                with self.assertRaises(LLMResponseError):
+                    self.complete()
+            with self.assertRaises(CircuitOpenError):
+                self.complete()
+        self.assertEqual(len(self.fake.requests), 2)
+
+    def test_local_rate_limit_refuses_without_calling_provider(self):
+        self.transport.register_provider("limited", self.fake.endpoint, rate_per_minute=60, burst=1)
+        payload = {"model": "m", "messages": []}
+        self.transport.complete(payload, provider="limited")
+        with self.assertRaises(LLMRateLimitError):
+            self.transport.complete(payload, provider="limited")
+        self.assertEqual(len(self.fake.requests), 1)
+        self.assertEqual(self.transport.stats()["providers"]["limited"]["rate_limited"], 1)
+
+    @patch.dict(os.environ, {"LLM_EMERGENCY_STOP": "1"})
+    def test_kill_switch(self):
+        with self.assertRaises(LLMDisabledError):
+            self.complete()
+        self.assertEqual(self.fake.requests, [])
+
+    def test_stats_totals_per_model(self):
+        self.complete()
+        self.complete(stream=False)
+        stats = self.transport.stats()["providers"][self.provider]
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["streamed"], 1)
+        self.assertEqual(stats["ttft_ms"]["samples"], 1)
+        self.assertEqual(stats["models"]["deepseek/deepseek-chat"]["completion_tokens"], 502)
+
+
+class TestCallers(TransportTestCase):
+    """Test that the brain and the executor go through the shared transport."""
+
+    def setUp(self):
+        super().setUp()
+        self.transport.register_provider("openrouter", self.fake.endpoint)
+
+    def test_ai_executor_chat(self):
+        from core.ai_executor import AIExecutor
+
+        with patch("core.ai_executor.get_llm_transport", return_value=self.transport):
+            response = AIExecutor(api_key="sk-exec", model="deepseek/deepseek-chat").chat(
+                [{"role": "user", "content": "hi"}])
+        self.assertEqual(response.content, "Hello")
+        self.assertEqual(response.raw["usage"]["completion_tokens"], 2)
+        self.assertEqual(self.fake.requests[0]["headers"]["Authorization"], "Bearer sk-exec")
+
+    def test_ai_executor_wraps_errors(self):
+        from core.ai_executor import AIExecutor
+
+        self.fake.replies.append((400, {"error": {"message": "bad model"}}))
+        with patch("core.ai_executor.get_llm_transport", return_value=self.transport), \
+                patch("core.llm_transport.logger"), self.assertRaises(RuntimeError) as ctx:
+            AIExecutor(api_key="sk-exec").chat([{"role": "user", "content": "hi"}])
+        self.assertIn("bad model", str(ctx.exception))
+
+    def test_brain_stream_yields_tokens_then_tool_calls(self):
+        from core.unified_brain import BrainService
+
+        self.fake.replies.append((200, [
+            _chunk({"content": "On it"}),
+            _chunk({"tool_calls": [{"index": 0, "id": "c1", "function": {"name": "t", "arguments": "{}"}}]}),
+        ]))
+        brain = BrainService.__new__(BrainService)
+        brain.api_key, brain.model, brain.max_tokens = "sk-brain", "deepseek/deepseek-chat", 100
+        with patch("core.unified_brain.get_llm_transport", return_value=self.transport):
+            events = list(brain._stream_api_call([{"role": "user", "content": "hi"}], tools=[{"type": "function"}]))
+        self.assertEqual(events[0], ("On it", []))
+        self.assertEqual(events[1][1][0]["function"]["name"], "t")
+        self.assertEqual(self.fake.requests[0]["body"]["tool_choice"], "auto")
+
+
+if __name__ == "__main__":
+    unittest.main()
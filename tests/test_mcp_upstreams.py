@@ -0,0 +1,234 @@
+"""
+Tests for MCP Server Upstreams
+==============================
+
+Unit tests for mcp/upstreams.py (shared sessions, token caches, rate and
+concurrency limits, metrics) using a fake session; aiohttp is not needed
+"""
+
+import asyncio
+import importlib.util
+import os
+import time
+import unittest
+
+# Load by path: the local mcp/ directory shadows the mcp SDK package name
+_spec = importlib.util.spec_from_file_location(
+    "mcp_upstreams", os.path.join(os.path.dirname(os.path.dirname(__file__)), "mcp", "upstreams.py")
+)
+upstreams = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(upstreams)
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    def __init__(self, status=200, delay=0.0):
+        self.status = status
+        self.delay = delay
+        self.closed = False
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        session = self
+
+        class _Request:
+            async def __aenter__(self):
+                session.active += 1
+                session.peak = max(session.peak, session.active)
+                await asyncio.sleep(session.delay)
+                return FakeResponse(session.status)
+
+            async def __aexit__(self, *exc_info):
+                session.active -= 1
+                return False
+
+        return _Request()
+
+    async def close(self):
+        self.closed = True
+
+
+class TestUpstream(unittest.IsolatedAsyncioTestCase):
+    """Test session reuse, concurrency limits and metrics."""
+
+    async def test_requests_share_one_session(self):
+        sessions = []
+
+        def factory():
+            sessions.append(FakeSession())
+            return sessions[-1]
+
+        upstream = upstreams.Upstream("github", factory)
+        async with upstream as http:
+            async with http.get("https://a/1") as resp:
+                self.assertEqual(resp.status, 200)
+            async with http.post("https://a/2", json={"x": 1}):
+                pass
+        self.assertEqual(len(sessions), 1)
+        self.assertEqual([c[0] for c in sessions[0].calls], ["GET", "POST"])
+
+        await upstream.close()
+        self.assertTrue(sessions[0].closed)
+        self.assertFalse(upstream.status()["session_open"])
+
+    async def test_concurrency_is_bounded(self):
+        session = FakeSession(delay=0.01)
+        upstream = upstreams.Upstream("pinecone", lambda: session, max_concurrency=2)
+
+        async def call():
+            async with upstream.get("https://p/query"):
+                pass
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        self.assertEqual(session.peak, 2)
+        self.assertEqual(upstream.status()["requests"], 6)
+
+    async def test_metrics_count_statuses_and_errors(self):
+        session = FakeSession(status=503)
+        upstream = upstreams.Upstream("railway", lambda: session)
+        async with upstream.post("https://r/graphql"):
+            pass
+        with self.assertRaises(ValueError):
+            async with upstream.post("https://r/graphql"):
+                raise ValueError("bad payload")
+
+        status = upstream.status()
+        self.assertEqual(status["requests"], 2)
+        self.assertEqual(status["errors"], 2)
+        self.assertEqual(status["statuses"], {"503": 2})
+        self.assertIn("ValueError", status["last_error"])
+        self.assertEqual(status["in_flight"], 0)
+        self.assertIsNotNone(status["latency_ms"]["p95"])
+
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+    """Test the token bucket."""
+
+    async def test_burst_then_throttle(self):
+        limiter = upstreams.RateLimiter(rate_per_sec=50, burst=2)
+        started = time.monotonic()
+        for _ in range(4):
+            await limiter.acquire()
+        # Two from the burst, two more at 50/s
+        self.assertGreaterEqual(time.monotonic() - started, 0.03)
+        self.assertGreater(limiter.waited_seconds, 0)
+
+
+class TestTokenCache(unittest.IsolatedAsyncioTestCase):
+    """Test refresh-before-expiry and single-flight token fetches."""
+
+    async def test_cached_until_refresh_margin(self):
+        fetches = []
+
+        async def fetch():
+            fetches.append(1)
+            return f"token-{len(fetches)}", 3600
+
+        cache = upstreams.TokenCache("servicetitan", fetch, refresh_margin=300)
+        self.assertEqual(await cache.get(), "token-1")
+        self.assertEqual(await cache.get(), "token-1")
+        self.assertEqual(len(fetches), 1)
+
+        # Inside the refresh margin: refreshed before it actually expires
+        cache._expires = time.time() + 200
+        self.assertEqual(await cache.get(), "token-2")
+        self.assertEqual(cache.status()["refreshes"], 2)
+
+    async def test_concurrent_callers_share_one_fetch(self):
+        fetches = []
+
+        async def fetch():
+            fetches.append(1)
+            await asyncio.sleep(0.01)
+            return "shared", 3600
+
+        cache = upstreams.TokenCache("msgraph", fetch)
+        tokens = await asyncio.gather(*(cache.get() for _ in range(5)))
+        self.assertEqual(set(tokens), {"shared"})
+        self.assertEqual(len(fetches), 1)
+
+    async def test_failed_refresh_keeps_unexpired_token(self):
+        results = [("first", 3600), RuntimeError("auth down")]
+
+        async def fetch():
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        cache = upstreams.TokenCache("google", fetch, refresh_margin=300)
+        await cache.get()
+        cache._expires = time.time() + 100
+        self.assertEqual(await cache.get(), "first")
+        self.assertEqual(cache.failures, 1)
+
+    async def test_unconfigured_token_not_cached(self):
+        async def fetch():
+            return "", 0
+
+        cache = upstreams.TokenCache("servicetitan", fetch)
+        self.assertEqual(await cache.get(), "")
+        self.assertFalse(cache.status()["cached"])
+
+
+class TestUpstreamRegistry(unittest.IsolatedAsyncioTestCase):
+    """Test lifespan startup/shutdown and the status payload."""
+
+    async def test_lifecycle_and_status(self):
+        sessions = []
+
+        def factory():
+            sessions.append(FakeSession())
+            return sessions[-1]
+
+        registry = upstreams.UpstreamRegistry(factory, default_concurrency=3)
+        registry.configure("github", max_concurrency=8, rate_per_sec=10)
+        registry.configure("slack")
+
+        async def fetch():
+            return "t", 3600
+
+        registry.token_cache("msgraph", fetch)
+        await registry.startup()
+        self.assertEqual(len(sessions), 2)
+
+        status = registry.status()
+        self.assertEqual(status["upstreams"]["github"]["max_concurrency"], 8)
+        self.assertEqual(status["upstreams"]["github"]["rate_per_sec"], 10)
+        self.assertEqual(status["upstreams"]["slack"]["max_concurrency"], 3)
+        self.assertIn("msgraph", status["tokens"])
+        self.assertIsNotNone(status["uptime_seconds"])
+
+        # Unknown names get a default upstream on first use
+        self.assertEqual(registry["fetch"].max_concurrency, 3)
+
+        await registry.shutdown()
+        self.assertTrue(all(s.closed for s in sessions))
+
+    async def test_configure_with_own_session_factory(self):
+        default, own = FakeSession(), FakeSession()
+        registry = upstreams.UpstreamRegistry(lambda: default)
+        registry.configure("openrouter", session_factory=lambda: own)
+        async with registry["openrouter"] as http:
+            async with http.post("https://example.test/chat"):
+                pass
+        self.assertEqual(len(own.calls), 1)
+        self.assertEqual(default.calls, [])
+        self.assertIs(registry["fetch"].session, default)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+"""
+Tests for Memory Consolidation
+==============================
+
+Unit tests for core/memory_consolidation.py and
+MemoryService._cluster_similar_memories.
+"""
+
+import asyncio
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core.memory import EmbeddingClient, MemoryService
+from core.memory_consolidation import (
+    MAX_PENDING_MEMBERS,
+    ConsolidationScheduler,
+    MemoryConsolidator,
+    StreamingClusterer,
+)
+
+
+def _row(i, content, **extra):
+    return {"id": f"m{i}", "content": content, "importance_score": 0.5, "confidence_score": 0.9,
+            "tags": [], "created_at": f"2026-01-01T00:00:{i:02d}", **extra}
+
+
+ROWS = [
+    _row(1, "stripe checkout payment failed for customer order"),
+    _row(2, "customer checkout payment failed with stripe error"),
+    _row(3, "stripe payment failed during checkout for an order"),
+    _row(4, "railway deploy failed while building the container"),
+    _row(5, "railway container build failed on deploy"),
+    _row(6, "stripe checkout payment failed for customer order"),
+]
+
+
+class TestStreamingClusterer(unittest.TestCase):
+    """Test online clustering and duplicate detection."""
+
+    def test_groups_by_similarity(self):
+        clusterer = StreamingClusterer()
+        for row in ROWS[:5]:
+            clusterer.add(row)
+        groups = sorted((sorted(c.member_ids) for c in clusterer.groups()), key=len)
+        self.assertEqual(groups, [["m4", "m5"], ["m1", "m2", "m3"]])
+
+    def test_exact_duplicate_is_reported(self):
+        clusterer = StreamingClusterer()
+        for row in ROWS[:5]:
+            self.assertIsNone(clusterer.add(row))
+        self.assertEqual(clusterer.add(ROWS[5]), "m1")
+        self.assertEqual(clusterer.add(_row(7, "  Stripe checkout PAYMENT failed for customer order")), "m1")
+
+    def test_one_token_difference_is_not_a_duplicate(self):
+        clusterer = StreamingClusterer()
+        words = " ".join(f"word{i}" for i in range(60))
+        clusterer.add(_row(1, f"deploy of service {words} finished on monday"))
+        self.assertIsNone(clusterer.add(_row(2, f"deploy of service {words} finished on tuesday")))
+
+    def test_pending_members_are_bounded(self):
+        clusterer = StreamingClusterer()
+        for i in range(MAX_PENDING_MEMBERS + 50):
+            clusterer.add(_row(i % 60, f"stripe checkout payment failed for order {i}"))
+        self.assertLessEqual(max(len(c.member_ids) for c in clusterer.clusters.values()), MAX_PENDING_MEMBERS)
+
+    def test_cluster_count_is_bounded(self):
+        clusterer = StreamingClusterer(max_clusters=3)
+        for i, word in enumerate(["alpha", "bravo", "charlie", "delta", "echo"]):
+            clusterer.add(_row(i, f"{word} {word}zz"))
+        self.assertEqual(len(clusterer.clusters), 3)
+
+
+class TestMemoryConsolidator(unittest.TestCase):
+    """Test paging, high-water mark and duplicate deletion."""
+
+    def test_pages_and_resumes_from_high_water_mark(self):
+        pages = [ROWS[:2], ROWS[2:4], ROWS[4:5], [], []]
+        query = MagicMock(side_effect=lambda sql: {"rows": pages.pop(0)} if "unnest" not in sql else {"rows": []})
+        consolidator = MemoryConsolidator(query_fn=query, page_size=2)
+        clusterer, duplicates = consolidator.update("w1")
+        self.assertEqual(clusterer.seen, 5)
+        self.assertEqual(duplicates, [])
+        self.assertEqual(query.call_count, 3)
+
+        consolidator.update("w1")
+        self.assertIn("2026-01-01T00:00:05", query.call_args_list[-1][0][0])
+        self.assertEqual([len(c.member_ids) for c in consolidator.take_new_clusters("w1")], [3])
+        self.assertEqual(consolidator.take_new_clusters("w1"), [])
+
+    def test_growing_cluster_is_consolidated_again(self):
+        grown = [_row(10 + i, f"stripe checkout payment failed for customer order {w}")
+                 for i, w in enumerate(["today", "again", "twice"])]
+        pages = [ROWS[:3], grown]
+        query = MagicMock(side_effect=lambda sql: {"rows": pages.pop(0)} if "unnest" not in sql else {"rows": []})
+        consolidator = MemoryConsolidator(query_fn=query, page_size=10)
+        consolidator.update("w1")
+        self.assertEqual([sorted(c.member_ids) for c in consolidator.take_new_clusters("w1")], [["m1", "m2", "m3"]])
+
+        consolidator.update("w1")
+        self.assertEqual([sorted(c.member_ids) for c in consolidator.take_new_clusters("w1")],
+                         [["m10", "m11", "m12"]])
+
+    def test_restart_skips_already_consolidated_members(self):
+        def query(sql):
+            if "unnest" in sql:
+                return {"rows": [{"id": "m1"}, {"id": "m2"}, {"id": "m3"}]}
+            return {"rows": ROWS[:3]}
+
+        consolidator = MemoryConsolidator(query_fn=query, page_size=10)
+        consolidator.update("w1")
+        self.assertEqual(consolidator.take_new_clusters("w1"), [])
+
+    def test_delete_duplicates_single_statement(self):
+        query = MagicMock(return_value={"rowCount": 2})
+        consolidator = MemoryConsolidator(query_fn=query)
+        self.assertEqual(consolidator.delete_duplicates(["a", "b"]), 2)
+        query.assert_called_once()
+        self.assertIn("IN ('a', 'b')", query.call_args[0][0])
+
+
+class TestMemoryServiceClustering(unittest.TestCase):
+    """Test MemoryService integration."""
+
+    def test_cluster_similar_memories(self):
+        service = MemoryService(EmbeddingClient())
+        service._consolidator = MemoryConsolidator(query_fn=MagicMock(side_effect=[{"rows": ROWS}, {"rows": []}]))
+        clusters = asyncio.run(service._cluster_similar_memories("w1"))
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(len(clusters[0]), 3)
+        self.assertIn("checkout", clusters[0][0]["content"])
+        self.assertEqual(service._pending_duplicates["w1"], ["m6"])
+
+    @patch("core.memory.query_db")
+    def test_store_memory_schedules_consolidation(self, query_db):
+        query_db.return_value = {"rows": [{"id": "11111111-1111-1111-1111-111111111111"}]}
+        service = MemoryService(EmbeddingClient())
+        service._scheduler = MagicMock()
+        with patch("core.memory.notify_memory_written"):
+            memory_id = asyncio.run(service.store_memory("w1", "checkout failed", tags=["stripe"]))
+            asyncio.run(service.store_memory("w1", "a fact", memory_type="semantic"))
+        self.assertEqual(memory_id, "11111111-1111-1111-1111-111111111111")
+        self.assertIn("INSERT INTO agent_memories", query_db.call_args_list[0][0][0])
+        service._scheduler.request.assert_called_once_with("w1")
+
+
+class TestConsolidationScheduler(unittest.TestCase):
+    """Test background execution and coalescing."""
+
+    def test_runs_in_background_once_per_interval(self):
+        done = threading.Event()
+        calls = []
+
+        async def _run(worker_id):
+            calls.append((worker_id, threading.current_thread().name))
+            done.set()
+
+        scheduler = ConsolidationScheduler(_run, min_interval_seconds=60)
+        scheduler.request("w1")
+        self.assertTrue(done.wait(2))
+        scheduler.request("w1")
+        scheduler.stop()
+        self.assertEqual(calls, [("w1", "memory-consolidation")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -199,14 +199,10 @@ class TestFallbackTaskCreation:
 class TestConsultWithTools:
     """Test the main consult_with_tools method."""
 
-    def test_consult_returns_required_fields(self, brain_service, mock_openrouter_response):
+    def test_consult_returns_required_fields(self, brain_service):
         """consult_with_tools should return all required response fields."""
-        with patch("urllib.request.urlopen") as mock_urlopen:
-            mock_response = MagicMock()
-            mock_response.read.return_value = mock_openrouter_response("Hello!")
-            mock_response.__enter__ = MagicMock(return_value=mock_response)
-            mock_response.__exit__ = MagicMock(return_value=False)
-            mock_urlopen.return_value = mock_response
+        with patch("core.unified_brain.get_llm_transport") as mock_transport:
+            mock_transport.return_value.complete.return_value = MagicMock(content="Hello!", tool_calls=[])
 
             with patch.object(brain_service, "_ensure_session") as mock_session:
                 mock_session.return_value = ("test-session-id", True)
@@ -225,14 +221,10 @@ class TestConsultWithTools:
             assert "tool_executions" in result
             assert "iterations" in result
 
-    def test_consult_without_tools_returns_empty_executions(self, brain_service, mock_openrouter_response):
+    def test_consult_without_tools_returns_empty_executions(self, brain_service):
         """consult_with_tools with enable_tools=False should return empty tool_executions."""
-        with patch("urllib.request.urlopen") as mock_urlopen:
-            mock_response = MagicMock()
-            mock_response.read.return_value = mock_openrouter_response("Hello!")
-            mock_response.__enter__ = MagicMock(return_value=mock_response)
-            mock_response.__exit__ = MagicMock(return_value=False)
-            mock_urlopen.return_value = mock_response
+        with patch("core.unified_brain.get_llm_transport") as mock_transport:
+            mock_transport.return_value.complete.return_value = MagicMock(content="Hello!", tool_calls=[])
 
             with patch.object(brain_service, "_ensure_session") as mock_session:
                 mock_session.return_value = ("test-session-id", True)
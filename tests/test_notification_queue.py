@@ -0,0 +1,226 @@
+"""
+Tests for the Notification Queue
+================================
+
+Unit tests for core/notification_queue.py and the Slack senders on top of it
+"""
+
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core.notification_queue import NotificationQueue, TokenBucket, render_slack_digest
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _make_queue(send=None, query=None, **channel_options):
+    clock = FakeClock()
+    query = query or MagicMock(return_value={"rows": []})
+    queue = NotificationQueue(query_fn=query, coalesce_seconds=300, digest_seconds=600,
+                              max_attempts=3, workers=0, autostart=False, clock=clock)
+    send = send or MagicMock(return_value=True)
+    queue.register_channel("slack", send, **channel_options)
+    return queue, send, query, clock
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test the per-channel rate limit."""
+
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate_per_minute=60, burst=2, now=0.0)
+        self.assertTrue(bucket.take(0.0))
+        self.assertTrue(bucket.take(0.0))
+        self.assertFalse(bucket.take(0.0))
+        self.assertAlmostEqual(bucket.wait(0.5), 0.5)
+        self.assertTrue(bucket.take(1.0))
+
+
+class TestNotificationQueue(unittest.TestCase):
+    """Test enqueue, coalescing, rate limits, digests and retries."""
+
+    def test_enqueue_does_not_deliver(self):
+        queue, send, _, _ = _make_queue()
+        self.assertTrue(queue.enqueue("slack", {"text": "hello"}))
+        send.assert_not_called()
+        queue.dispatch_once()
+        send.assert_called_once_with({"text": "hello"})
+
+    def test_unregistered_channel_rejected(self):
+        queue, _, _, _ = _make_queue()
+        self.assertFalse(queue.enqueue("pager", {"text": "hello"}))
+
+    def test_identical_pending_alerts_are_coalesced(self):
+        queue, send, _, _ = _make_queue()
+        for _ in range(3):
+            queue.enqueue("slack", {"text": "db down"}, key="db")
+        queue.dispatch_once()
+        send.assert_called_once_with({"text": "db down (x3)"})
+        self.assertEqual(queue.stats()["coalesced"], 2)
+
+    def test_repeats_after_delivery_are_summarized_once_per_window(self):
+        queue, send, _, clock = _make_queue()
+        queue.enqueue("slack", {"text": "db down"}, key="db")
+        queue.dispatch_once()
+        for _ in range(50):
+            queue.enqueue("slack", {"text": "db down"}, key="db")
+        queue.dispatch_once()
+        self.assertEqual(send.call_count, 1)
+
+        clock.now += 301
+        queue.dispatch_once()
+        self.assertEqual(send.call_count, 2)
+        self.assertEqual(send.call_args[0][0], {"text": "db down (x50)"})
+
+    def test_rate_limit_and_priority_order(self):
+        queue, send, _, clock = _make_queue(rate_per_minute=60, burst=1)
+        queue.enqueue("slack", {"text": "a"})
+        queue.enqueue("slack", {"text": "b"})
+        queue.enqueue("slack", {"text": "urgent"}, priority="critical")
+        queue.dispatch_once()
+        self.assertEqual([c[0][0]["text"] for c in send.call_args_list], ["urgent"])
+        self.assertAlmostEqual(queue.dispatch_once(), 1.0)
+
+        clock.now += 1
+        queue.dispatch_once()
+        clock.now += 1
+        queue.dispatch_once()
+        self.assertEqual([c[0][0]["text"] for c in send.call_args_list], ["urgent", "a", "b"])
+
+    def test_low_priority_goes_to_digest(self):
+        queue, send, _, clock = _make_queue(render_digest=render_slack_digest)
+        queue.enqueue("slack", {"text": "task 1 done", "channel": "#ops"}, priority="low")
+        queue.enqueue("slack", {"text": "task 2 done", "channel": "#ops"}, priority="low")
+        queue.dispatch_once()
+        send.assert_not_called()
+
+        clock.now += 601
+        queue.dispatch_once()
+        send.assert_called_once()
+        digest = send.call_args[0][0]
+        self.assertEqual(digest["channel"], "#ops")
+        self.assertIn("2 notifications", digest["text"])
+        self.assertIn("task 2 done", digest["text"])
+
+    def test_failed_delivery_is_persisted_to_outbox(self):
+        send = MagicMock(side_effect=RuntimeError("slack 500"))
+        queue, _, query, _ = _make_queue(send=send)
+        queue.enqueue("slack", {"text": "hello"}, priority="high")
+        with patch("core.notification_queue.logger"):
+            queue.dispatch_once()
+
+        sql = query.call_args[0][0]
+        self.assertIn("INSERT INTO notification_outbox", sql)
+        self.assertIn("'high'", sql)
+        self.assertIn("slack 500", sql)
+        self.assertIn("INTERVAL '30 seconds'", sql)
+        self.assertEqual(queue.stats()["pending"], 0)
+
+    def test_retry_in_memory_when_database_is_down(self):
+        send = MagicMock(side_effect=[False, True])
+        query = MagicMock(side_effect=RuntimeError("db down"))
+        queue, _, _, clock = _make_queue(send=send, query=query)
+        queue.enqueue("slack", {"text": "hello"})
+        with patch("core.notification_queue.logger"):
+            queue.dispatch_once()
+            self.assertEqual(queue.stats()["delayed"], 1)
+            clock.now += 31
+            queue.dispatch_once()
+        self.assertEqual(send.call_count, 2)
+        self.assertEqual(queue.stats()["delivered"], 1)
+
+    def test_outbox_rows_are_claimed_and_delivered(self):
+        def query(sql):
+            if "RETURNING" in sql:
+                return {"rows": [{"id": "row-1", "channel": "slack", "dedup_key": "k", "priority": "normal",
+                                  "payload": '{"text": "retry me"}', "coalesced_count": 2, "attempts": 1}]}
+            return {"rows": []}
+
+        query = MagicMock(side_effect=query)
+        queue, send, _, _ = _make_queue(query=query)
+        queue.dispatch_once()
+        send.assert_called_once_with({"text": "retry me (x2)"})
+        claim_sql = query.call_args_list[0][0][0]
+        self.assertIn("FOR UPDATE SKIP LOCKED", claim_sql)
+        self.assertIn("channel IN ('slack')", claim_sql)
+        self.assertIn("status = 'delivered'", query.call_args[0][0])
+
+    def test_stop_persists_queued_notifications(self):
+        queue, send, query, _ = _make_queue(rate_per_minute=0, burst=1)
+        queue.enqueue("slack", {"text": "a"})
+        queue.enqueue("slack", {"text": "b"})
+        queue.dispatch_once()
+        queue.stop()
+        self.assertEqual(send.call_count, 1)
+        sql = query.call_args[0][0]
+        self.assertIn("INSERT INTO notification_outbox", sql)
+        self.assertIn('"text": "b"', sql)
+
+
+class TestBackgroundDelivery(unittest.TestCase):
+    """Test the dispatcher thread."""
+
+    def test_enqueue_returns_before_slow_delivery(self):
+        delivered = []
+
+        def slow_send(payload):
+            time.sleep(0.2)
+            delivered.append(payload)
+            return True
+
+        queue = NotificationQueue(query_fn=MagicMock(return_value={"rows": []}), workers=1)
+        queue.register_channel("slack", slow_send)
+        started = time.monotonic()
+        queue.enqueue("slack", {"text": "hello"})
+        self.assertLess(time.monotonic() - started, 0.1)
+        try:
+            deadline = time.monotonic() + 2
+            while not delivered and time.monotonic() < deadline:
+                time.sleep(0.02)
+            self.assertEqual(delivered, [{"text": "hello"}])
+        finally:
+            queue.stop()
+        self.assertFalse(queue.running)
+
+    def test_low_priority_enqueue_starts_dispatcher_and_flushes_digest(self):
+        send = MagicMock(return_value=True)
+        queue = NotificationQueue(query_fn=MagicMock(return_value={"rows": []}), digest_seconds=0.1, workers=0)
+        queue.register_channel("slack", send, render_digest=render_slack_digest)
+        queue.enqueue("slack", {"text": "task 1 done", "channel": "#ops"}, priority="low")
+        try:
+            self.assertTrue(queue.running)
+            deadline = time.monotonic() + 2
+            while not send.called and time.monotonic() < deadline:
+                time.sleep(0.02)
+            send.assert_called_once()
+            self.assertIn("task 1 done", send.call_args[0][0]["text"])
+        finally:
+            queue.stop()
+
+
+class TestSlackSenders(unittest.TestCase):
+    """Test that the Slack senders enqueue instead of posting."""
+
+    @patch.dict("os.environ", {"SLACK_WEBHOOK_URL": "https://hooks.slack.com/services/x"})
+    def test_system_alert_is_queued_with_stable_key(self):
+        from core import slack_notifications
+
+        queue = MagicMock()
+        with patch.object(slack_notifications, "get_notification_queue", return_value=queue), \
+                patch.object(slack_notifications, "urlopen") as urlopen:
+            self.assertTrue(slack_notifications.send_system_alert(
+                "error", "db", "connection refused", {"Detected At": "now"}))
+        urlopen.assert_not_called()
+        kwargs = queue.enqueue.call_args.kwargs
+        self.assertEqual(kwargs["priority"], "critical")
+        self.assertEqual(kwargs["key"], "system:error:db:connection refused")
+
+
+if __name__ == "__main__":
+    unittest.main()
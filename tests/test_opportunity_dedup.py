@@ -0,0 +1,120 @@
+"""
+Tests for Opportunity Dedup Index
+=================================
+
+Unit tests for core/opportunity_dedup.py and the batch ingest path in
+core.proactive.identify_opportunities_with_dedup
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core.opportunity_dedup import (
+    MinHasher,
+    OpportunityDedupIndex,
+    load_dedup_index,
+    trigram_similarity,
+    trigrams,
+)
+from core.opportunity_rank_index import OpportunityRankIndex
+from core.proactive import compute_opportunity_fingerprint
+
+
+def _existing(opp_id, description, customer="Acme", external_id=None, category="stale_estimates"):
+    return {
+        "id": opp_id, "opportunity_type": "lead", "category": category, "description": description,
+        "status": "new", "customer_name": customer, "external_id": external_id,
+        "fingerprint": compute_opportunity_fingerprint("lead", category, description, external_id, customer),
+    }
+
+
+class TestTrigrams(unittest.TestCase):
+    """Test pg_trgm-compatible trigram similarity."""
+
+    def test_trigrams_match_pg_trgm(self):
+        # SELECT show_trgm('cat') => {"  c"," ca","at ","cat"}
+        self.assertEqual(trigrams("Cat"), frozenset({"  c", " ca", "cat", "at "}))
+        self.assertEqual(trigram_similarity(trigrams("word"), trigrams("two words")), 4 / 11)
+
+    def test_minhash_signatures_are_stable(self):
+        hasher = MinHasher()
+        grams = trigrams("furnace tune-up estimate")
+        self.assertEqual(hasher.signature(grams), MinHasher().signature(grams))
+        self.assertEqual(len(hasher.band_keys(hasher.signature(grams))), hasher.bands)
+        with self.assertRaises(ValueError):
+            MinHasher(num_perm=24, bands=8)
+
+
+class TestOpportunityDedupIndex(unittest.TestCase):
+    """Test the three duplicate checks in memory."""
+
+    def setUp(self):
+        self.index = OpportunityDedupIndex()
+        self.index.add_many([
+            _existing("o1", "Water heater replacement quote follow up", external_id="st-1"),
+            _existing("o2", "Furnace tune-up membership renewal"),
+            _existing("o3", "Drain leak inspection", customer=None),
+        ])
+
+    def test_external_id_match(self):
+        result = self.index.check("lead", "other", "anything", external_id="st-1")
+        self.assertEqual(result["match_type"], "external_id")
+        self.assertEqual(result["matching_opportunity"]["id"], "o1")
+
+    def test_fingerprint_match(self):
+        result = self.index.check("lead", "stale_estimates", "Furnace tune-up membership renewal", customer_name="Acme")
+        self.assertEqual(result["match_type"], "fingerprint")
+
+    def test_fuzzy_match_is_scoped_to_customer_and_category(self):
+        description = "Water heater replacement quote follow up asap"
+        result = self.index.check("lead", "stale_estimates", description, customer_name="ACME")
+        self.assertEqual(result["match_type"], "fuzzy_customer_description")
+        self.assertGreater(result["similarity"], 0.6)
+        self.assertFalse(self.index.check("lead", "stale_estimates", description, customer_name="Other")["is_duplicate"])
+        self.assertFalse(self.index.check("lead", "unbilled_work", description, customer_name="Acme")["is_duplicate"])
+
+    def test_new_opportunity_returns_fingerprint(self):
+        result = self.index.check("lead", "stale_estimates", "Brand new AC install", customer_name="Acme")
+        self.assertFalse(result["is_duplicate"])
+        self.assertEqual(result["fingerprint"],
+                         compute_opportunity_fingerprint("lead", "stale_estimates", "Brand new AC install", None, "Acme"))
+
+    def test_load_uses_one_query(self):
+        query = MagicMock(return_value={"rows": [_existing("o9", "x", external_id="st-9")]})
+        index = load_dedup_index(7, query_fn=query)
+        query.assert_called_once()
+        self.assertIn("INTERVAL '7 days'", query.call_args[0][0])
+        self.assertTrue(index.check("lead", "c", "d", external_id="st-9")["is_duplicate"])
+
+
+class TestBatchIngest(unittest.TestCase):
+    """Test that a scan batch is deduplicated and inserted in one statement."""
+
+    @patch("core.proactive.log_execution")
+    @patch("core.proactive.query_db")
+    def test_batch_inserts_non_duplicates_once(self, mock_query, _mock_log):
+        from core.proactive import identify_opportunities_with_dedup
+
+        index = OpportunityDedupIndex()
+        index.add(_existing("o1", "Water heater quote", external_id="st-1"))
+        mock_query.side_effect = lambda sql, *args: {"rows": [{"id": "x"}] * sql.count("'identified'")}
+        batch = [
+            {"opportunity_type": "lead", "category": "stale_estimates", "description": "Water heater quote", "external_id": "st-1"},
+            {"opportunity_type": "lead", "category": "stale_estimates", "description": "AC repair", "external_id": "st-2",
+             "customer_name": "Bob's HVAC"},
+            # Same as the previous item: caught within the batch
+            {"opportunity_type": "lead", "category": "stale_estimates", "description": "AC repair", "external_id": "st-2"},
+        ]
+        rank_index = OpportunityRankIndex(query_fn=MagicMock())
+        with patch("core.proactive.get_opportunity_rank_index", return_value=rank_index):
+            result = identify_opportunities_with_dedup(batch, dedup_index=index)
+
+        mock_query.assert_called_once()
+        self.assertIn("Bob''s HVAC", mock_query.call_args[0][0])
+        self.assertEqual(result["opportunities_found"], 1)
+        self.assertEqual(result["duplicates_skipped"], 2)
+        self.assertEqual(rank_index.get(result["opportunity_ids"][0])["status"], "new")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Tests for Batch Opportunity Scoring
+===================================
+
+Unit tests for core/opportunity_rank_index.py, the batch pipeline in
+core.proactive.bulk_score_opportunities and IdeaScorer.score_ideas
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core.idea_scorer import IdeaScorer
+from core.opportunity_rank_index import OpportunityRankIndex
+from core.proactive import compute_opportunity_scores
+
+
+def _opp(opp_id, score, value=0, status="new", opportunity_type="upsell"):
+    return {"id": opp_id, "confidence_score": score, "estimated_value": value,
+            "status": status, "opportunity_type": opportunity_type}
+
+
+class TestOpportunityRankIndex(unittest.TestCase):
+    """Test ordering, filtering and incremental sync."""
+
+    def setUp(self):
+        self.rows = [
+            {**_opp("a", 0.9, 100), "changed_at": "2026-01-01 00:00:00+00"},
+            {**_opp("b", 0.7, 5000), "changed_at": "2026-01-01 00:00:01+00"},
+            {**_opp("c", 0.7, 9000, opportunity_type="renewal"), "changed_at": "2026-01-01 00:00:02+00"},
+            {**_opp("d", 0.3, 100), "changed_at": "2026-01-01 00:00:03+00"},
+            {**_opp("e", 0.95, 100, status="won"), "changed_at": "2026-01-01 00:00:04+00"},
+        ]
+        self.query = MagicMock(side_effect=lambda sql: {"rows": self.rows})
+        self.index = OpportunityRankIndex(query_fn=self.query)
+
+    def test_top_is_not_served_before_load(self):
+        self.assertIsNone(self.index.top())
+
+    def test_top_orders_by_score_then_value(self):
+        self.index.sync()
+        self.assertEqual([r["id"] for r in self.index.top(limit=10, min_score=0.5)], ["a", "c", "b"])
+        self.assertEqual([r["id"] for r in self.index.top(limit=2, min_score=0.0)], ["a", "c"])
+        self.assertEqual([r["id"] for r in self.index.top(opportunity_type="renewal")], ["c"])
+        self.assertEqual([r["id"] for r in self.index.top(status="won")], ["e"])
+
+    def test_updates_rerank_and_move_between_statuses(self):
+        self.index.sync()
+        self.index.update_score("d", 0.99)
+        self.index.upsert(_opp("a", 0.9, 100, status="won"))
+        self.assertEqual([r["id"] for r in self.index.top(min_score=0.5)], ["d", "c", "b"])
+        self.assertEqual([r["id"] for r in self.index.top(status="won")], ["e", "a"])
+
+    def test_sync_is_incremental(self):
+        self.index.sync()
+        self.rows = []
+        self.index.sync()
+        self.assertIn(">= '2026-01-01 00:00:04+00'", self.query.call_args_list[1][0][0])
+        self.assertEqual(len(self.index), 5)
+
+
+class TestBulkScoreOpportunities(unittest.TestCase):
+    """Test that bulk scoring reads and writes in batches."""
+
+    def setUp(self):
+        self.index = OpportunityRankIndex(query_fn=MagicMock(return_value={"rows": []}))
+        self.index.sync()
+
+    @patch("core.proactive.log_execution")
+    @patch("core.proactive.query_db")
+    def test_one_read_and_one_write_per_batch(self, mock_query, _mock_log):
+        from core.proactive import bulk_score_opportunities
+
+        candidates = [_opp(f"o{i}", 0.5, value=i * 1000) for i in range(5)]
+        mock_query.side_effect = lambda sql, *args: {"rows": candidates if sql.lstrip().startswith("SELECT") else []}
+
+        with patch("core.proactive.get_opportunity_rank_index", return_value=self.index):
+            result = bulk_score_opportunities(batch_size=3)
+
+        statements = [c[0][0].lstrip() for c in mock_query.call_args_list]
+        self.assertEqual([s.split()[0] for s in statements], ["SELECT", "UPDATE", "INSERT", "UPDATE", "INSERT"])
+        self.assertIn("status = 'new'", statements[0])
+        self.assertIn("FROM (VALUES", statements[1])
+        self.assertEqual(result["count"], 5)
+        self.assertTrue(result["success"])
+        # value_potential 0.4, urgency 0.5, fit 0.6 weighted .25/.15/.20
+        self.assertEqual(result["scores"]["o4"], round((0.4 * 0.25 + 0.5 * 0.15 + 0.6 * 0.20) / 0.6, 4))
+        self.assertEqual(self.index.top(limit=1, min_score=0)[0]["id"], "o4")
+
+    @patch("core.proactive.log_execution")
+    @patch("core.proactive.query_db")
+    def test_failed_batch_is_reported(self, mock_query, _mock_log):
+        from core.proactive import bulk_score_opportunities
+
+        def query(sql, *args):
+            if sql.lstrip().startswith("UPDATE"):
+                raise RuntimeError("boom")
+            return {"rows": [_opp("x", 0.5)]}
+
+        mock_query.side_effect = query
+        with patch("core.proactive.get_opportunity_rank_index", return_value=self.index):
+            result = bulk_score_opportunities(["x"])
+        self.assertFalse(result["success"])
+        self.assertEqual(result["count"], 0)
+        self.assertIsNone(self.index.get("x"))
+
+
+class TestColumnWiseScoring(unittest.TestCase):
+    """Test vectorised scoring against the per-item results."""
+
+    def test_compute_opportunity_scores(self):
+        scores = compute_opportunity_scores([{"urgency": 1.0, "fit": 0.0}, {"unknown": 0.8}, {}])
+        self.assertEqual(scores, [round(0.15 / 0.35, 4), 0.8, 0.5])
+
+    def test_score_ideas_matches_score_idea(self):
+        scorer = IdeaScorer()
+        ideas = [
+            {"estimates": {}},
+            {"estimates": {"capital_required": 500, "time_to_first_dollar_days": 1, "scalability": "high"}},
+            {"estimates": {"effort_hours": 41, "risk_level": "very low", "capability_fit": 7}},
+        ]
+        batch = scorer.score_ideas(ideas)
+        self.assertEqual(batch, [scorer.score_idea(idea) for idea in ideas])
+        self.assertEqual(batch[1]["breakdown"]["capital_required"], 0.0)
+        self.assertEqual(batch[1]["breakdown"]["time_to_first_dollar"], 100.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Tests for PR Snapshot Service
+=============================
+
+Unit tests for core/pr_snapshot.py and the consumers that share it.
+"""
+
+import io
+import json
+import unittest
+import urllib.error
+from unittest.mock import MagicMock, patch
+
+from core.pr_snapshot import PRSnapshotService
+from core.pr_tracker import PRTracker, PRState
+
+
+def _node(number, state="OPEN", reviews=(), conclusions=("SUCCESS",), mergeable="MERGEABLE"):
+    return {
+        "number": number, "url": f"https://github.com/o/r/pull/{number}", "title": f"PR {number}",
+        "state": state, "merged": state == "MERGED", "mergeable": mergeable, "mergeStateStatus": "CLEAN",
+        "createdAt": "2026-01-01T00:00:00Z", "updatedAt": "2026-01-02T00:00:00Z", "mergedAt": None,
+        "headRefOid": f"sha{number}", "mergeCommit": None, "mergedBy": None,
+        "reviewRequests": {"nodes": [{"requestedReviewer": {"__typename": "Team", "slug": "core"}}]},
+        "reviews": {"nodes": [{"author": {"__typename": kind[0] if kind else "User", "login": who}, "state": st,
+                               "submittedAt": "2026-01-01T01:00:00Z"}
+                              for who, st, *kind in reviews]},
+        "commits": {"nodes": [{"commit": {"statusCheckRollup": {"contexts": {"nodes": [
+            {"__typename": "CheckRun", "name": f"ci{i}", "status": "COMPLETED", "conclusion": c}
+            for i, c in enumerate(conclusions)
+        ] + [{}]}}}}]},
+    }
+
+
+class TestPRSnapshotService(unittest.TestCase):
+    """Test batching, caching and the REST fallback."""
+
+    def setUp(self):
+        self.service = PRSnapshotService(token="t")
+        self.service._graphql = MagicMock(return_value={"data": {"repository": {
+            "p1": _node(1, reviews=[("coderabbitai", "APPROVED", "Bot"), ("alice", "COMMENTED")]),
+            "p2": _node(2, conclusions=("SUCCESS", "FAILURE")),
+            "p3": None,
+        }}})
+
+    def test_one_query_per_repo_then_cache(self):
+        self.service.prefetch([("o/r", 1), ("o/r", 2), ("o/r", 3), ("o/r", 1)])
+        self.assertEqual(self.service._graphql.call_count, 1)
+        query, variables = self.service._graphql.call_args[0]
+        self.assertEqual(variables, {"owner": "o", "name": "r"})
+        self.assertIn("p1: pullRequest(number: 1)", query)
+        self.assertIn("p3: pullRequest(number: 3)", query)
+
+        first, second = self.service.get("o/r", 1), self.service.get("o/r", 2)
+        self.assertEqual(self.service._graphql.call_count, 1)
+        self.assertTrue(first.checks_passed)
+        self.assertFalse(second.checks_passed)
+        self.assertEqual(first.pr["requested_teams"], [{"slug": "core"}])
+        # Bot logins carry the REST "[bot]" suffix whichever API served the snapshot
+        self.assertEqual([r["user"]["login"] for r in first.reviews], ["coderabbitai[bot]", "alice"])
+
+    def test_stale_snapshot_is_refetched(self):
+        self.service.ttl = 0
+        self.service.get("o/r", 1)
+        self.service.get("o/r", 1)
+        self.assertEqual(self.service._graphql.call_count, 2)
+
+    def test_no_token_makes_no_requests(self):
+        self.service.token = ""
+        self.assertIsNone(self.service.get("o/r", 1))
+        self.service._graphql.assert_not_called()
+
+    @patch("urllib.request.urlopen")
+    def test_rest_fallback_uses_etags(self, mock_urlopen):
+        self.service._graphql.side_effect = RuntimeError("graphql down")
+        bodies = {
+            "/pulls/5": {"number": 5, "state": "open", "head": {"sha": "abc"}},
+            "/pulls/5/reviews": [],
+            "/commits/abc/check-runs": {"check_runs": [{"conclusion": "success"}]},
+        }
+
+        def respond(req, timeout=None):
+            if req.get_header("If-none-match"):
+                raise urllib.error.HTTPError(req.full_url, 304, "Not Modified", {}, io.BytesIO())
+            path = req.full_url.split("/repos/o/r")[1]
+            response = MagicMock()
+            response.read.return_value = json.dumps(bodies[path]).encode()
+            response.headers = {"ETag": f'"{path}"'}
+            cm = MagicMock()
+            cm.__enter__.return_value = response
+            return cm
+
+        mock_urlopen.side_effect = respond
+        self.service.ttl = 0
+        first = self.service.get("o/r", 5)
+        second = self.service.get("o/r", 5)
+        self.assertEqual(first.source, "rest")
+        self.assertEqual(second.pr["number"], 5)
+        self.assertTrue(second.checks_passed)
+        self.assertEqual(self.service.stats["not_modified"], 3)
+
+
+class TestSharedConsumers(unittest.TestCase):
+    """PRTracker and GateChecker read the same snapshots."""
+
+    def setUp(self):
+        self.service = PRSnapshotService(token="t")
+        self.service._graphql = MagicMock(return_value={"data": {"repository": {
+            "p1": _node(1, reviews=[("coderabbitai", "APPROVED")]),
+            "p2": _node(2, reviews=[("alice", "CHANGES_REQUESTED")]),
+        }}})
+
+    @patch("core.pr_tracker.query_db")
+    def test_sync_and_gate_checks_share_one_query(self, mock_query):
+        from core.gate_checker import GateChecker
+
+        mock_query.side_effect = lambda sql: {"rows": [
+            {"repo": "o/r", "pr_number": 1, "current_state": "approved", "review_status": "approved"},
+            {"repo": "o/r", "pr_number": 2, "current_state": "changes_requested",
+             "review_status": "changes_requested"},
+        ]} if "FROM pr_tracking" in sql else {"rows": []}
+
+        tracker = PRTracker()
+        tracker.github_token = "t"
+        tracker.snapshots = self.service
+        self.assertEqual(tracker.sync_all_tracked_prs(), [])
+        self.assertEqual(tracker.get_pr_status("https://github.com/o/r/pull/1").state, PRState.APPROVED)
+
+        checker = GateChecker()
+        checker.github_token, checker.github_repo, checker.pr_snapshots = "t", "o/r", self.service
+        self.assertEqual(checker._get_pr_reviews(2)[0]["state"], "CHANGES_REQUESTED")
+        self.assertEqual(checker._get_github_pr(1)["state"], "open")
+
+        self.assertEqual(self.service._graphql.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,6 +16,7 @@ from core.pr_tracker import (
     track_pr_for_task, get_pr_status, sync_tracked_prs,
     is_pr_mergeable, merge_pr
 )
+from core.pr_snapshot import PRSnapshot
 
 
 class TestPRUrlParsing(unittest.TestCase):
@@ -257,13 +258,14 @@ class TestMockGitHubIntegration(unittest.TestCase):
         self.tracker = PRTracker()
         self.tracker.github_token = "test_token"
     
-    @patch.object(PRTracker, '_github_request')
-    def test_get_pr_status(self, mock_request):
-        """Test getting PR status with mocked GitHub API."""
-        # Mock PR data
-        mock_request.side_effect = [
-            # First call - PR data
-            {
+    def test_get_pr_status(self):
+        """Test getting PR status with a mocked PR snapshot."""
+        self.tracker.snapshots = MagicMock()
+        self.tracker.snapshots.get.return_value = PRSnapshot(
+            repo="test/repo",
+            number=123,
+            # PR data
+            pr={
                 "number": 123,
                 "html_url": "https://github.com/test/repo/pull/123",
                 "title": "Test PR",
@@ -276,13 +278,13 @@ class TestMockGitHubIntegration(unittest.TestCase):
                 "requested_teams": [],
                 "head": {"sha": "abc123"}
             },
-            # Second call - Reviews
-            [{
+            # Reviews
+            reviews=[{
                 "user": {"login": "coderabbitai"},
                 "state": "APPROVED",
                 "submitted_at": "2026-01-21T10:30:00Z"
             }]
-        ]
+        )
         
         status = self.tracker.get_pr_status("https://github.com/test/repo/pull/123")
         
@@ -0,0 +1,152 @@
+"""
+Tests for the Puppeteer service page pool
+=========================================
+
+Unit tests for services/puppeteer/pool.py using fake browser contexts
+(Playwright is not needed)
+"""
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from services.puppeteer.pool import BrowserPool, PooledPage, PoolTimeout
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+        self.goto = AsyncMock()
+
+    def is_closed(self):
+        return self.closed
+
+
+class FakeContext:
+    def __init__(self):
+        self.page = FakePage()
+        self.closed = False
+        self.route = AsyncMock()
+        self.clear_cookies = AsyncMock()
+
+    async def new_page(self):
+        return self.page
+
+    async def close(self):
+        self.closed = True
+
+
+class TestBrowserPool(unittest.IsolatedAsyncioTestCase):
+    """Test leases, queuing, sessions and recycling."""
+
+    async def asyncSetUp(self):
+        self.contexts = []
+
+        async def new_context():
+            context = FakeContext()
+            self.contexts.append(context)
+            return context
+
+        self.pool = BrowserPool(new_context, size=2, queue_timeout=5.0, max_uses=3)
+
+    async def test_concurrent_leases_get_distinct_pages(self):
+        async def use():
+            async with self.pool.lease() as page:
+                await asyncio.sleep(0.01)
+                return page
+
+        pages = await asyncio.gather(use(), use())
+        self.assertIsNot(pages[0], pages[1])
+        self.assertEqual(self.pool.stats()["free"], 2)
+
+    async def test_waits_for_free_page_then_times_out(self):
+        async with self.pool.lease(), self.pool.lease():
+            with self.assertRaises(PoolTimeout):
+                async with self.pool.lease(timeout=0.05):
+                    pass
+        self.assertEqual(self.pool.timeouts, 1)
+
+        order = []
+
+        async def hold():
+            async with self.pool.lease():
+                await asyncio.sleep(0.05)
+
+        async def queued(name):
+            async with self.pool.lease():
+                order.append(name)
+
+        await asyncio.gather(hold(), hold(), queued("a"), queued("b"))
+        self.assertEqual(order, ["a", "b"])
+        self.assertEqual(len(self.contexts), 2)
+
+    async def test_session_keeps_its_page_until_closed(self):
+        async with self.pool.lease("s1") as first:
+            pass
+        async with self.pool.lease() as other:
+            self.assertIsNot(other, first)
+        async with self.pool.lease("s1") as again:
+            self.assertIs(again, first)
+        self.assertEqual(self.pool.stats()["sessions"], 1)
+
+        self.assertTrue(await self.pool.end_session("s1"))
+        self.assertFalse(await self.pool.end_session("s1"))
+        self.assertEqual(self.pool.stats()["free"], 2)
+
+    async def test_session_requests_are_serialized(self):
+        active, peak = [0], [0]
+
+        async def step():
+            async with self.pool.lease("s1"):
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+                await asyncio.sleep(0.01)
+                active[0] -= 1
+
+        await asyncio.gather(step(), step(), step())
+        self.assertEqual(peak[0], 1)
+        self.assertEqual(len(self.contexts), 1)
+
+    async def test_idle_sessions_expire(self):
+        self.pool.session_ttl = 0.01
+        async with self.pool.lease("s1"):
+            pass
+        await asyncio.sleep(0.02)
+        async with self.pool.lease():
+            pass
+        self.assertEqual(self.pool.stats()["sessions"], 0)
+
+    async def test_pages_recycled_after_max_uses(self):
+        self.pool.size = 1
+        for _ in range(3):
+            async with self.pool.lease():
+                pass
+        self.assertTrue(self.contexts[0].closed)
+        self.assertEqual(self.pool.recycled, 1)
+        async with self.pool.lease():
+            pass
+        self.assertEqual(len(self.contexts), 2)
+
+
+class TestResourceBlocking(unittest.IsolatedAsyncioTestCase):
+    """Test that only flagged leases abort images and fonts."""
+
+    async def test_route_aborts_blocked_types_when_flagged(self):
+        pooled = PooledPage(FakeContext(), FakePage())
+        route = MagicMock(abort=AsyncMock(), continue_=AsyncMock())
+        route.request.resource_type = "image"
+
+        await pooled.route(route)
+        route.continue_.assert_awaited_once()
+
+        pooled.block_resources = True
+        await pooled.route(route)
+        route.abort.assert_awaited_once()
+
+        route.request.resource_type = "document"
+        await pooled.route(route)
+        self.assertEqual(route.continue_.await_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
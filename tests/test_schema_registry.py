@@ -0,0 +1,128 @@
+"""
+Tests for Schema Registry
+=========================
+
+Unit tests for core/schema_registry.py and the ensure-schema / column
+lookups that use it.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import core.schema_registry as schema_registry
+from core.schema_registry import SchemaRegistry
+
+
+def _schema_rows(tables, indexes=(), enums=None):
+    rows = [{"kind": "column", "owner": t, "name": c} for t, cols in tables.items() for c in cols]
+    rows += [{"kind": "index", "owner": "", "name": i} for i in indexes]
+    rows += [{"kind": "enum", "owner": e, "name": v} for e, vals in (enums or {}).items() for v in vals]
+    return {"rows": rows}
+
+
+class _FakeDB:
+    """Returns the schema for information_schema queries and records every statement."""
+
+    def __init__(self, tables, indexes=(), enums=None):
+        self.tables, self.indexes, self.enums = tables, list(indexes), enums
+        self.statements = []
+
+    def __call__(self, sql, params=None):
+        self.statements.append(sql)
+        if "information_schema" in sql:
+            return _schema_rows(self.tables, self.indexes, self.enums)
+        return {"rows": [], "rowCount": 0}
+
+    def schema_queries(self):
+        return [s for s in self.statements if "information_schema" in s]
+
+
+class TestSchemaRegistry(unittest.TestCase):
+    """Test lookups, reloads and ensure stamps."""
+
+    def setUp(self):
+        self.db = _FakeDB(
+            {"experiments": ["id", "title", "idea_id"], "revenue_ideas": ["id", "score"]},
+            indexes=["experiments_pkey"],
+            enums={"task_status": ["pending", "running", "done"]},
+        )
+        self.registry = SchemaRegistry(query_fn=self.db)
+
+    def test_lookups_are_answered_from_one_load(self):
+        self.assertEqual(self.registry.columns("experiments"), {"id", "title", "idea_id"})
+        self.assertTrue(self.registry.has_column("revenue_ideas", "score"))
+        self.assertFalse(self.registry.has_column("revenue_ideas", "score_breakdown"))
+        self.assertFalse(self.registry.has_table("missing"))
+        self.assertEqual(self.registry.columns("missing"), set())
+        self.assertTrue(self.registry.has_index("experiments_pkey"))
+        self.assertEqual(self.registry.enum_values("task_status"), ["pending", "running", "done"])
+        self.assertEqual(len(self.db.statements), 1)
+
+    def test_existing_schema_is_stamped_without_ddl(self):
+        self.assertTrue(self.registry.is_ensured("x", 1, columns={"experiments": ["idea_id"]},
+                                                 indexes=["experiments_pkey"]))
+        self.assertFalse(self.registry.is_ensured("y", 1, columns={"experiments": ["nope"]}))
+        self.assertFalse(self.registry.is_ensured("z", 1))
+
+    def test_version_bump_reruns_step(self):
+        self.registry.mark_ensured("step", 1)
+        self.assertTrue(self.registry.is_ensured("step", 1))
+        self.assertFalse(self.registry.is_ensured("step", 2))
+
+    def test_mark_ensured_with_columns_requires_confirmation(self):
+        self.assertFalse(self.registry.mark_ensured("step", 1, columns={"experiments": ["new_col"]}))
+        self.db.tables["experiments"].append("new_col")
+        self.assertTrue(self.registry.mark_ensured("step", 1, columns={"experiments": ["new_col"]}))
+        self.assertEqual(len(self.db.schema_queries()), 2)
+
+    def test_failed_load_falls_back_and_is_not_retried_immediately(self):
+        query = MagicMock(side_effect=RuntimeError("no db"))
+        registry = SchemaRegistry(query_fn=query)
+        self.assertIsNone(registry.columns("experiments"))
+        self.assertIsNone(registry.has_table("experiments"))
+        self.assertEqual(query.call_count, 1)
+
+
+class TestSteadyState(unittest.TestCase):
+    """After startup, cycles must not touch information_schema or re-run DDL."""
+
+    def setUp(self):
+        from core.conflict_manager import CONFLICT_SCHEMA_COLUMNS, CONFLICT_SCHEMA_INDEXES
+        from core.experiments import EXPERIMENT_SCHEMA_COLUMNS
+
+        tables = {t: list(c) for t, c in CONFLICT_SCHEMA_COLUMNS.items()}
+        tables.update({t: list(c) for t, c in EXPERIMENT_SCHEMA_COLUMNS.items()})
+        tables["experiments"] += ["id", "name", "status"]
+        self.db = _FakeDB(tables, indexes=CONFLICT_SCHEMA_INDEXES)
+        self.registry = SchemaRegistry(query_fn=self.db)
+        patcher = patch.object(schema_registry, "_registry", self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_zero_information_schema_queries_in_steady_state(self):
+        import core.experiments as experiments
+        from core.conflict_manager import ensure_tables_exist
+        from core.experiment_runner import _get_table_columns
+
+        execute_sql = MagicMock(side_effect=self.db)
+        with patch.object(experiments, "_SCHEMA_ENSURED", False), \
+                patch("core.conflict_manager._query", side_effect=self.db), \
+                patch.object(experiments, "_db_query", side_effect=self.db):
+            # Startup: one schema load, no DDL because everything exists
+            self.assertTrue(ensure_tables_exist())
+            experiments.ensure_experiment_schema()
+            self.assertEqual(len(self.db.statements), 1)
+
+            startup = len(self.db.statements)
+            for _ in range(5):
+                self.assertTrue(ensure_tables_exist())
+                experiments.ensure_experiment_schema()
+                self.assertIn("status", _get_table_columns(execute_sql, "experiments"))
+
+        self.assertEqual(len(self.db.statements), startup)
+        self.assertEqual(len(self.db.schema_queries()), 1)
+        execute_sql.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
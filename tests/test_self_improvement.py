@@ -0,0 +1,129 @@
+"""
+Tests for Self-Improvement Pattern Detection
+============================================
+
+Unit tests for incremental detection in core/self_improvement.py
+"""
+
+import json
+import re
+import unittest
+from unittest.mock import patch
+
+import core.self_improvement as self_improvement
+from core.self_improvement import SelfImprovementEngine
+
+
+def _failure(i, summary):
+    return {"id": f"l{i}", "category": "failure_pattern", "summary": summary, "details": {"source": "angi"},
+            "applied_count": 0, "created_at": f"2026-01-01T00:00:{i:02d}+00:00"}
+
+
+class _FakeDB:
+    """Routes query_db calls: learnings pages, system_config state, updates."""
+
+    def __init__(self, pages, saved_state=None):
+        self.pages = list(pages)
+        self.saved_state = saved_state
+        self.learning_queries = []
+
+    def __call__(self, sql, params=None):
+        if "FROM system_config" in sql:
+            return {"rows": [{"value": self.saved_state}] if self.saved_state else []}
+        if "INSERT INTO system_config" in sql:
+            self.saved_state = json.loads(params[1])
+            return {"rows": []}
+        if "FROM learnings" in sql:
+            self.learning_queries.append((sql, params))
+            return {"rows": self.pages.pop(0) if self.pages else []}
+        return {"rows": [], "rowCount": 1}
+
+
+class TestIncrementalDetection(unittest.TestCase):
+    """Test high-water mark, running counts and persistence."""
+
+    def setUp(self):
+        self_improvement._pattern_state = None
+        self.addCleanup(setattr, self_improvement, "_pattern_state", None)
+        patcher = patch.object(self_improvement, "log_execution")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, db):
+        with patch.object(self_improvement, "query_db", side_effect=db):
+            return SelfImprovementEngine().detect_patterns()
+
+    def test_counts_accumulate_across_cycles(self):
+        db = _FakeDB([
+            [_failure(1, "Navigation timeout"), _failure(2, "Failed to fetch page")],
+            [_failure(3, "Puppeteer navigation timeout again")],
+        ])
+        self.assertEqual(self._run(db), [])
+        patterns = self._run(db)
+        self.assertEqual(len(patterns), 1)
+        self.assertEqual(patterns[0].occurrence_count, 3)
+        self.assertEqual(patterns[0].pattern_id, "l3")
+        self.assertIsNone(db.learning_queries[0][1])
+        self.assertEqual(db.learning_queries[-1][1], ["2026-01-01T00:00:02+00:00", "l2"])
+
+    def test_state_survives_restart(self):
+        db = _FakeDB([[_failure(i, "rate limit hit") for i in range(1, 4)]])
+        self.assertEqual(len(self._run(db)), 1)
+        self_improvement._pattern_state = None
+        db.pages = [[]]
+        patterns = self._run(db)
+        self.assertEqual(patterns[0].occurrence_count, 3)
+        self.assertEqual(db.learning_queries[-1][1], ["2026-01-01T00:00:03+00:00", "l3"])
+
+    def test_applied_pattern_is_not_reported(self):
+        db = _FakeDB([[_failure(i, "invalid JSON body") for i in range(1, 4)]])
+        with patch.object(self_improvement, "query_db", side_effect=db):
+            engine = SelfImprovementEngine()
+            pattern = engine.detect_patterns()[0]
+            self.assertTrue(engine.mark_pattern_applied(pattern.pattern_id))
+            self.assertEqual(engine.detect_patterns(), [])
+        self.assertEqual(db.saved_state["groups"]["json_parse_error"]["applied"], 1)
+
+    def test_applied_pattern_is_reported_again_when_it_recurs(self):
+        db = _FakeDB([[_failure(i, "invalid JSON body") for i in range(1, 4)]])
+        with patch.object(self_improvement, "query_db", side_effect=db):
+            engine = SelfImprovementEngine()
+            engine.mark_pattern_applied(engine.detect_patterns()[0].pattern_id)
+            db.pages = [[_failure(4, "invalid JSON body"), _failure(5, "invalid JSON body")]]
+            self.assertEqual(engine.detect_patterns(), [])
+            db.pages = [[_failure(6, "invalid JSON body")]]
+            patterns = engine.detect_patterns()
+        self.assertEqual([p.pattern_id for p in patterns], ["l6"])
+        self.assertEqual(patterns[0].occurrence_count, 6)
+
+    def test_previously_applied_learning_resets_the_count(self):
+        rows = [_failure(i, "invalid JSON body") for i in range(1, 5)]
+        rows[1]["applied_count"] = 1
+        db = _FakeDB([rows])
+        self.assertEqual(self._run(db), [])
+        self.assertEqual(db.saved_state["groups"]["json_parse_error"]["applied_at_count"], 2)
+
+
+class TestCombinedMatcher(unittest.TestCase):
+    """The combined regex must agree with trying each matcher in order."""
+
+    def test_matches_first_matcher_in_list_order(self):
+        engine = SelfImprovementEngine()
+        samples = [
+            "missing 'query' in payload after timeout",
+            "Request timed out: 429 too many requests",
+            "table users does not exist",
+            "ModuleNotFoundError: no module named x, connection refused",
+            "nothing recognisable here",
+        ]
+        for text in samples:
+            expected = next(
+                (m["name"] for m in engine.pattern_matchers if re.search(m["regex"], text, re.IGNORECASE)),
+                None,
+            )
+            matcher = engine._match_matcher(text)
+            self.assertEqual(matcher["name"] if matcher else None, expected, text)
+
+
+if __name__ == "__main__":
+    unittest.main()
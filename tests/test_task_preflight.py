@@ -0,0 +1,168 @@
+"""
+Tests for Task Preflight Module
+===============================
+
+Unit tests for core/task_preflight.py
+"""
+
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from core.database import escape_sql_value
+from core.handlers import dispatch_task, get_handler
+from core.handlers.base import BaseHandler, HandlerResult
+from core.task_preflight import (
+    RoundTripCounter,
+    TaskContext,
+    build_preflight_sql,
+    load_task_context,
+    note_round_trip,
+    track_round_trips,
+)
+
+
+def _preflight_row(**overrides):
+    row = {
+        "task": {"id": "task-1", "task_type": "research", "requires_approval": True},
+        "approval": {"id": "appr-1", "decision": "approved"},
+        "worker": {"worker_id": "EXECUTOR", "role_name": "executor", "status": "active",
+                   "permissions": ["task.*"], "capabilities": ["task.execute"]},
+        "role": {"role_name": "executor", "permissions": ["task.*"], "forbidden_actions": []},
+        "budget": {"limit_cents": 10000, "spent_cents": 9990},
+    }
+    row.update(overrides)
+    return row
+
+
+def _counting_sql(rows):
+    """execute_sql stub that reports round-trips like main.execute_sql does."""
+    def _execute(sql):
+        note_round_trip()
+        return {"rows": rows}
+    return MagicMock(side_effect=_execute)
+
+
+class TestLoadTaskContext(unittest.TestCase):
+    """Test the single-query prefetch."""
+
+    def test_single_round_trip(self):
+        execute_sql = _counting_sql([_preflight_row()])
+        counter = RoundTripCounter()
+        with track_round_trips(counter):
+            ctx = load_task_context("task-1", "research", "EXECUTOR", execute_sql,
+                                    escape=escape_sql_value, counter=counter)
+        self.assertIsNotNone(ctx)
+        self.assertEqual(counter.count, 1)
+        self.assertEqual(execute_sql.call_count, 1)
+        self.assertIs(ctx.round_trips, counter)
+
+    def test_answers_preflight_checks_from_memory(self):
+        execute_sql = _counting_sql([_preflight_row()])
+        counter = RoundTripCounter()
+        with track_round_trips(counter):
+            ctx = load_task_context("task-1", "research", "EXECUTOR", execute_sql,
+                                    escape=escape_sql_value, counter=counter)
+            self.assertEqual(ctx.approval_status(True), (True, "appr-1", "approved"))
+            self.assertEqual(ctx.approval_status(False), (False, None, "not_required"))
+            ok, _ = ctx.check_budget(0.05)
+            self.assertTrue(ok)
+            ok, msg = ctx.check_budget(1.0)
+            self.assertFalse(ok)
+            self.assertIn("exceed monthly limit", msg)
+        self.assertEqual(counter.count, 1)
+
+    def test_json_string_columns_are_parsed(self):
+        row = {k: json.dumps(v) for k, v in _preflight_row().items()}
+        ctx = load_task_context("task-1", "research", "EXECUTOR", _counting_sql([row]),
+                                escape=escape_sql_value)
+        self.assertEqual(ctx.approval_id, "appr-1")
+        self.assertEqual(ctx.worker_info["role_name"], "executor")
+
+    def test_missing_budget_and_approval(self):
+        row = _preflight_row(budget=None, approval=None)
+        ctx = load_task_context("task-1", "research", "EXECUTOR", _counting_sql([row]),
+                                escape=escape_sql_value)
+        self.assertEqual(ctx.check_budget(1000.0), (True, "Within budget"))
+        self.assertEqual(ctx.approval_status(True), (True, None, "none"))
+
+    def test_failure_returns_none(self):
+        execute_sql = MagicMock(side_effect=Exception("boom"))
+        self.assertIsNone(load_task_context("task-1", "research", "EXECUTOR", execute_sql,
+                                            escape=escape_sql_value))
+
+    def test_context_is_immutable(self):
+        ctx = load_task_context("task-1", "research", "EXECUTOR", _counting_sql([_preflight_row()]),
+                                escape=escape_sql_value)
+        with self.assertRaises(Exception):
+            ctx.task_id = "other"
+        with self.assertRaises(TypeError):
+            ctx.worker_info["role_name"] = "admin"
+        self.assertIsInstance(ctx.worker_info["permissions"], tuple)
+
+    def test_sql_escapes_inputs(self):
+        sql = build_preflight_sql("t'1", "research", "EXEC'UTOR", escape_sql_value)
+        self.assertIn("'t''1'", sql)
+        self.assertIn("'EXEC''UTOR'", sql)
+
+    def test_sql_only_loads_what_execute_task_reads(self):
+        sql = build_preflight_sql("task-1", "research", "EXECUTOR", escape_sql_value)
+        self.assertNotIn("FROM learnings", sql)
+        self.assertNotIn("FROM resource_locks", sql)
+
+
+class TestRoundTripTracking(unittest.TestCase):
+    """Test thread-local round-trip attribution."""
+
+    def test_untracked_calls_are_ignored(self):
+        counter = RoundTripCounter()
+        note_round_trip()
+        self.assertEqual(counter.count, 0)
+
+    def test_nested_tracking_restores_outer(self):
+        outer, inner = RoundTripCounter(), RoundTripCounter()
+        with track_round_trips(outer):
+            note_round_trip()
+            with track_round_trips(inner):
+                note_round_trip()
+            note_round_trip()
+        self.assertEqual(outer.count, 2)
+        self.assertEqual(inner.count, 1)
+
+
+class _ContextHandler(BaseHandler):
+    task_type = "research"
+
+    def execute(self, task):
+        return HandlerResult(success=True, data={"approval_id": self.context.approval_id})
+
+
+class TestHandlerContext(unittest.TestCase):
+    """Test that dispatch_task hands the preflight context to handlers."""
+
+    def test_dispatch_passes_context(self):
+        from core import handlers as handlers_pkg
+
+        ctx = load_task_context("task-1", "research", "EXECUTOR", _counting_sql([_preflight_row()]),
+                                escape=escape_sql_value)
+        execute_sql = _counting_sql([])
+        original = handlers_pkg._HANDLER_REGISTRY.get("research")
+        handlers_pkg._HANDLER_REGISTRY["research"] = _ContextHandler
+        try:
+            counter = RoundTripCounter()
+            with track_round_trips(counter):
+                result = dispatch_task({"id": "task-1", "task_type": "research"}, execute_sql,
+                                       MagicMock(), context=ctx)
+        finally:
+            handlers_pkg._HANDLER_REGISTRY["research"] = original
+        self.assertTrue(result.success)
+        self.assertEqual(result.data["approval_id"], "appr-1")
+        self.assertEqual(counter.count, 0)
+
+    def test_get_handler_without_context(self):
+        handler = get_handler("database", MagicMock(), MagicMock())
+        self.assertIsNone(handler.context)
+
+
+if __name__ == "__main__":
+    unittest.main()